@@ -0,0 +1,118 @@
+/// Scheduler Scaling Benchmark
+///
+/// Runs the same workloads at 1/2/4/8/16 workers and reports speedup over
+/// one worker:
+/// - fanout: main thread spawns CPU-bound tasks (global injection queue)
+/// - nested: tasks spawn their own children (owner push + work stealing)
+///
+/// Run with: zig build bench-scaling
+
+const std = @import("std");
+const Scheduler = @import("scheduler").Scheduler;
+
+const WORKER_COUNTS = [_]usize{ 1, 2, 4, 8, 16 };
+
+const FANOUT_TASKS: usize = 1000;
+const WORK_PER_TASK: usize = 10000;
+
+const NESTED_PARENTS: usize = 64;
+const NESTED_CHILDREN: usize = 64;
+
+var g_completed: std.atomic.Value(usize) = std.atomic.Value(usize).init(0);
+var g_sink: std.atomic.Value(i64) = std.atomic.Value(i64).init(0);
+
+fn spin(seed: usize) void {
+    var result: i64 = 0;
+    for (0..WORK_PER_TASK) |i| {
+        result +%= @as(i64, @intCast(i)) * @as(i64, @intCast(seed));
+    }
+    _ = g_sink.fetchAdd(result, .monotonic);
+}
+
+const FanoutCtx = struct { seed: usize };
+
+fn fanoutTask(ctx: *FanoutCtx) void {
+    spin(ctx.seed);
+    _ = g_completed.fetchAdd(1, .acq_rel);
+}
+
+const NestedCtx = struct { sched: *Scheduler, seed: usize };
+
+fn childTask(ctx: *NestedCtx) void {
+    spin(ctx.seed);
+    _ = g_completed.fetchAdd(1, .acq_rel);
+}
+
+fn parentTask(ctx: *NestedCtx) void {
+    // Children go to this worker's own deque; idle workers steal them
+    for (0..NESTED_CHILDREN) |i| {
+        const child = NestedCtx{ .sched = ctx.sched, .seed = ctx.seed * NESTED_CHILDREN + i };
+        if (ctx.sched.spawn(childTask, child)) |_| {} else |_| {
+            _ = g_completed.fetchAdd(1, .acq_rel); // Count it so the run still finishes
+        }
+    }
+    _ = g_completed.fetchAdd(1, .acq_rel);
+}
+
+fn waitFor(total: usize) void {
+    while (g_completed.load(.acquire) < total) {
+        std.Thread.yield() catch {};
+    }
+}
+
+fn runFanout(allocator: std.mem.Allocator, workers: usize) !f64 {
+    var sched = try Scheduler.init(allocator, workers);
+    defer sched.deinit();
+    try sched.start();
+
+    g_completed.store(0, .release);
+    var timer = try std.time.Timer.start();
+    for (0..FANOUT_TASKS) |i| {
+        _ = try sched.spawn(fanoutTask, FanoutCtx{ .seed = i });
+    }
+    waitFor(FANOUT_TASKS);
+    return @as(f64, @floatFromInt(timer.read())) / std.time.ns_per_ms;
+}
+
+fn runNested(allocator: std.mem.Allocator, workers: usize) !f64 {
+    var sched = try Scheduler.init(allocator, workers);
+    defer sched.deinit();
+    try sched.start();
+
+    g_completed.store(0, .release);
+    var timer = try std.time.Timer.start();
+    for (0..NESTED_PARENTS) |i| {
+        _ = try sched.spawn(parentTask, NestedCtx{ .sched = &sched, .seed = i });
+    }
+    waitFor(NESTED_PARENTS * (NESTED_CHILDREN + 1));
+    return @as(f64, @floatFromInt(timer.read())) / std.time.ns_per_ms;
+}
+
+pub fn main() !void {
+    var gpa = std.heap.GeneralPurposeAllocator(.{}){};
+    defer _ = gpa.deinit();
+    const allocator = gpa.allocator();
+
+    std.debug.print("CPUs: {d}\n", .{std.Thread.getCpuCount() catch 0});
+    std.debug.print("fanout: {d} tasks x {d} iterations\n", .{ FANOUT_TASKS, WORK_PER_TASK });
+    std.debug.print("nested: {d} parents x {d} children\n\n", .{ NESTED_PARENTS, NESTED_CHILDREN });
+    std.debug.print("{s:>8} {s:>12} {s:>8} {s:>12} {s:>8}\n", .{ "workers", "fanout ms", "speedup", "nested ms", "speedup" });
+
+    var fanout_base: f64 = 0;
+    var nested_base: f64 = 0;
+    for (WORKER_COUNTS) |workers| {
+        const fanout_ms = try runFanout(allocator, workers);
+        const nested_ms = try runNested(allocator, workers);
+        if (workers == 1) {
+            fanout_base = fanout_ms;
+            nested_base = nested_ms;
+        }
+        std.debug.print("{d:>8} {d:>12.2} {d:>7.2}x {d:>12.2} {d:>7.2}x\n", .{
+            workers,
+            fanout_ms,
+            fanout_base / fanout_ms,
+            nested_ms,
+            nested_base / nested_ms,
+        });
+    }
+}
@@ -0,0 +1,161 @@
+/// Bytecode VM Dispatch Benchmark
+///
+/// Hand-assembled programs run through the eval()/exec() VM:
+/// - names: `while i < N: total += i; i += 1` with LOAD_NAME/STORE_NAME
+/// - fast:  the same loop with slot-indexed LOAD_FAST/STORE_FAST
+/// - tuple: builds a tuple and subscripts it every iteration
+/// - eval:  `(1 + 2) * 3` executed repeatedly on one VM (eval() call overhead)
+///
+/// Run with: zig build bench-vm
+const std = @import("std");
+const vm = @import("bytecode_vm");
+
+const opcode = vm.opcode;
+const Instruction = opcode.Instruction;
+const Value = opcode.Value;
+const Program = opcode.Program;
+
+const LOOP_ITERATIONS: i64 = 1_000_000;
+const EVAL_ITERATIONS: usize = 1_000_000;
+
+fn program(instructions: []const Instruction, constants: []const Value, varnames: []const []const u8, names: []const []const u8) Program {
+    return .{
+        .instructions = instructions,
+        .constants = constants,
+        .varnames = varnames,
+        .names = names,
+        .cellvars = &.{},
+        .freevars = &.{},
+        .source_map = &.{},
+        .filename = "<bench>",
+        .name = "<module>",
+        .firstlineno = 1,
+        .argcount = 0,
+        .posonlyargcount = 0,
+        .kwonlyargcount = 0,
+        .stacksize = 256,
+        .flags = .{},
+    };
+}
+
+const loop_constants = [_]Value{ .{ .int = 0 }, .{ .int = LOOP_ITERATIONS }, .{ .int = 1 } };
+const loop_vars = [_][]const u8{ "total", "i" };
+
+/// Counting loop over two variables, using `store`/`load` for every access
+fn countingLoop(comptime load: opcode.OpCode, comptime store: opcode.OpCode) [19]Instruction {
+    return .{
+        Instruction.init(.LOAD_CONST, 0),
+        Instruction.init(store, 0),
+        Instruction.init(.LOAD_CONST, 0),
+        Instruction.init(store, 1),
+        Instruction.init(load, 1), // 4: loop head
+        Instruction.init(.LOAD_CONST, 1),
+        Instruction.init(.COMPARE_LT, 0),
+        Instruction.init(.POP_JUMP_IF_FALSE, 17),
+        Instruction.init(load, 0),
+        Instruction.init(load, 1),
+        Instruction.init(.INPLACE_ADD, 0),
+        Instruction.init(store, 0),
+        Instruction.init(load, 1),
+        Instruction.init(.LOAD_CONST, 2),
+        Instruction.init(.INPLACE_ADD, 0),
+        Instruction.init(store, 1),
+        Instruction.init(.JUMP_ABSOLUTE, 4),
+        Instruction.init(load, 0), // 17
+        Instruction.init(.RETURN_VALUE, 0),
+    };
+}
+
+/// 12 instructions per loop iteration in countingLoop
+const LOOP_OPS_PER_ITERATION = 12;
+
+const names_code = countingLoop(.LOAD_NAME, .STORE_NAME);
+const fast_code = countingLoop(.LOAD_FAST, .STORE_FAST);
+
+// i = 0
+// while i < N: t = (i, i, i); x = t[1]; i += 1
+const tuple_code = [_]Instruction{
+    Instruction.init(.LOAD_CONST, 0),
+    Instruction.init(.STORE_FAST, 1),
+    Instruction.init(.LOAD_FAST, 1), // 2: loop head
+    Instruction.init(.LOAD_CONST, 1),
+    Instruction.init(.COMPARE_LT, 0),
+    Instruction.init(.POP_JUMP_IF_FALSE, 18),
+    Instruction.init(.LOAD_FAST, 1),
+    Instruction.init(.LOAD_FAST, 1),
+    Instruction.init(.LOAD_FAST, 1),
+    Instruction.init(.BUILD_TUPLE, 3),
+    Instruction.init(.LOAD_CONST, 2),
+    Instruction.init(.BINARY_SUBSCR, 0),
+    Instruction.init(.STORE_FAST, 0),
+    Instruction.init(.LOAD_FAST, 1),
+    Instruction.init(.LOAD_CONST, 2),
+    Instruction.init(.INPLACE_ADD, 0),
+    Instruction.init(.STORE_FAST, 1),
+    Instruction.init(.JUMP_ABSOLUTE, 2),
+    Instruction.init(.LOAD_FAST, 0), // 18
+    Instruction.init(.RETURN_VALUE, 0),
+};
+const TUPLE_OPS_PER_ITERATION = 16;
+
+const eval_code = [_]Instruction{
+    Instruction.init(.LOAD_CONST, 0),
+    Instruction.init(.LOAD_CONST, 1),
+    Instruction.init(.BINARY_ADD, 0),
+    Instruction.init(.LOAD_CONST, 2),
+    Instruction.init(.BINARY_MULTIPLY, 0),
+    Instruction.init(.RETURN_VALUE, 0),
+};
+const eval_constants = [_]Value{ .{ .int = 1 }, .{ .int = 2 }, .{ .int = 3 } };
+
+fn runLoop(allocator: std.mem.Allocator, label: []const u8, prog: *const Program, ops_per_iteration: u64) !void {
+    var executor = vm.VM.init(allocator);
+    defer executor.deinit();
+
+    var timer = try std.time.Timer.start();
+    const result = try executor.execute(prog);
+    const ns = timer.read();
+    std.mem.doNotOptimizeAway(result);
+
+    const ops: f64 = @floatFromInt(ops_per_iteration * @as(u64, @intCast(LOOP_ITERATIONS)));
+    const secs = @as(f64, @floatFromInt(ns)) / std.time.ns_per_s;
+    std.debug.print("{s:<8} {d:>10.2} ms {d:>10.1} Mops/s\n", .{
+        label,
+        @as(f64, @floatFromInt(ns)) / std.time.ns_per_ms,
+        ops / secs / 1e6,
+    });
+}
+
+pub fn main() !void {
+    var gpa = std.heap.GeneralPurposeAllocator(.{}){};
+    defer _ = gpa.deinit();
+    const allocator = gpa.allocator();
+
+    std.debug.print("loops: {d} iterations\n\n", .{LOOP_ITERATIONS});
+
+    const names_prog = program(&names_code, &loop_constants, &.{}, &loop_vars);
+    const fast_prog = program(&fast_code, &loop_constants, &loop_vars, &.{});
+    const tuple_prog = program(&tuple_code, &loop_constants, &loop_vars, &.{});
+
+    try runLoop(allocator, "names", &names_prog, LOOP_OPS_PER_ITERATION);
+    try runLoop(allocator, "fast", &fast_prog, LOOP_OPS_PER_ITERATION);
+    try runLoop(allocator, "tuple", &tuple_prog, TUPLE_OPS_PER_ITERATION);
+
+    // Repeated small evals on one VM, recycling built values between runs
+    const eval_prog = program(&eval_code, &eval_constants, &.{}, &.{});
+    var executor = vm.VM.init(allocator);
+    defer executor.deinit();
+
+    var timer = try std.time.Timer.start();
+    for (0..EVAL_ITERATIONS) |_| {
+        const result = try executor.execute(&eval_prog);
+        std.mem.doNotOptimizeAway(result);
+        executor.reset();
+    }
+    const ns = timer.read();
+    std.debug.print("{s:<8} {d:>10.2} ms {d:>10.2} M evals/s\n", .{
+        "eval",
+        @as(f64, @floatFromInt(ns)) / std.time.ns_per_ms,
+        @as(f64, @floatFromInt(EVAL_ITERATIONS)) / (@as(f64, @floatFromInt(ns)) / std.time.ns_per_s) / 1e6,
+    });
+}
@@ -0,0 +1,58 @@
+#!/bin/bash
+# Deque Benchmark - FIFO queue churn at both ends
+# Compares metal0 vs Python vs PyPy
+
+source "$(dirname "$0")/../common.sh"
+cd "$SCRIPT_DIR"
+
+init_benchmark "Deque Benchmark - 10M popleft/append + 1M rotate"
+echo ""
+echo "1000-element queue: BFS-style popleft/append, then appendleft/pop/rotate"
+echo ""
+
+# Python source (SAME code for metal0, Python, PyPy)
+cat > deque.py <<'EOF'
+from collections import deque
+
+
+def benchmark():
+    q = deque()
+    i = 0
+    while i < 1000:
+        q.append(i)
+        i = i + 1
+    total = 0
+    i = 0
+    while i < 10000000:
+        x = q.popleft()
+        total = total + x
+        q.append(x + 1)
+        i = i + 1
+    i = 0
+    while i < 1000000:
+        q.appendleft(q.pop())
+        q.rotate(7)
+        i = i + 1
+    print(total + len(q))
+
+benchmark()
+EOF
+
+echo "Building..."
+build_metal0_compiler
+compile_metal0 deque.py deque_metal0
+
+print_header "Running Benchmarks"
+BENCH_CMD=(hyperfine --warmup 3 --runs 5 --export-markdown results.md)
+
+add_metal0 BENCH_CMD deque_metal0
+add_pypy BENCH_CMD deque.py
+add_python BENCH_CMD deque.py
+
+"${BENCH_CMD[@]}"
+
+# Cleanup
+rm -f deque_metal0
+
+echo ""
+echo "Results saved to: results.md"
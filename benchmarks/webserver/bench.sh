@@ -1,5 +1,5 @@
 #!/bin/bash
-# Web Server Benchmark using wrk
+# Web Server Benchmark using http_loadgen (wrk-compatible output)
 # Tests HTTP server throughput (requests/sec)
 # Same Python code runs on: metal0, Python, PyPy
 
@@ -10,15 +10,11 @@ echo "Web Server Benchmark - HTTP throughput"
 echo "======================================="
 echo ""
 echo "Testing: Hello World JSON endpoint"
-echo "Tool: wrk (HTTP benchmarking tool)"
+echo "Tool: http_loadgen (zig build loadgen)"
 echo ""
 
-# Check for wrk
-if ! command -v wrk &> /dev/null; then
-    echo -e "${RED}Error: wrk not found${NC}"
-    echo "Install: brew install wrk"
-    exit 1
-fi
+# Load generator is built with the compiler (zig-out/bin/http_loadgen)
+LOADGEN="$PROJECT_ROOT/zig-out/bin/http_loadgen"
 
 # Ports for each server
 PORT_METAL0_FLASK=8081
@@ -146,10 +142,14 @@ echo "=== Building ==="
 
 # Build metal0 Flask
 build_metal0_compiler
-if command -v flask &> /dev/null || python3 -c "import flask" 2>/dev/null; then
-    echo "  Building metal0 Flask..."
-    compile_metal0 server_flask.py server_flask_metal0 2>/dev/null && echo -e "  ${GREEN}✓${NC} metal0 Flask" || echo -e "  ${YELLOW}⚠${NC} metal0 Flask build failed"
+if [ ! -x "$LOADGEN" ]; then
+    echo -e "${RED}Error: $LOADGEN not found${NC}"
+    echo "Build: zig build -Doptimize=ReleaseFast"
+    exit 1
 fi
+# flask is lowered to the native runtime, so Python's flask is not needed here
+echo "  Building metal0 Flask..."
+compile_metal0 server_flask.py server_flask_metal0 2>/dev/null && echo -e "  ${GREEN}✓${NC} metal0 Flask" || echo -e "  ${YELLOW}⚠${NC} metal0 Flask build failed"
 
 # Build Go
 if command -v go &> /dev/null; then
@@ -199,8 +199,8 @@ run_bench() {
         return
     fi
 
-    # Run wrk
-    result=$(wrk -t4 -c100 -d10s http://127.0.0.1:$port/ 2>&1)
+    # Run load generator
+    result=$("$LOADGEN" -t4 -c100 -d10 http://127.0.0.1:$port/ 2>&1)
     echo "$result"
 
     # Parse results
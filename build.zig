@@ -64,12 +64,23 @@ pub fn build(b: *std.Build) void {
     // json module imports simd via module dependency, not direct path
     json_mod.addImport("json_simd", json_simd);
 
+    // Incremental record scanner on its own, so the runtime can use it without the full json module
+    const json_stream = b.addModule("json_stream", .{
+        .root_source_file = b.path("packages/shared/json/stream.zig"),
+    });
+    json_stream.addImport("json_simd", json_simd);
+
     // HTTP/2 module with TLS 1.3 (AES-NI accelerated) and gzip decompression
     const h2_mod = b.addModule("h2", .{
         .root_source_file = b.path("packages/shared/http/h2/h2.zig"),
     });
     h2_mod.addImport("gzip", gzip_module);
 
+    // HTTP/1.1 server with per-core event loops (backs the flask runtime module)
+    const http_server_mod = b.addModule("http_server", .{
+        .root_source_file = b.path("packages/shared/http/server.zig"),
+    });
+
     // Regex module for re stdlib
     const regex_mod = b.addModule("regex", .{
         .root_source_file = b.path("packages/regex/src/pyregex/regex.zig"),
@@ -125,10 +136,12 @@ pub fn build(b: *std.Build) void {
     // Module dependencies
     runtime.addImport("hashmap_helper", hashmap_helper);
     runtime.addImport("json_simd", json_simd);
+    runtime.addImport("json_stream", json_stream);
     runtime.addImport("regex", regex_mod);
     runtime.addImport("bigint", bigint_mod);
     runtime.addImport("gzip", gzip_module);
     runtime.addImport("h2", h2_mod);
+    runtime.addImport("http_server", http_server_mod);
     runtime.addImport("tokenizer", tokenizer_mod);
     collections.addImport("runtime", runtime);
 
@@ -419,6 +432,49 @@ pub fn build(b: *std.Build) void {
     const bench_goroutine_step = b.step("bench-goroutine", "Build and run goroutine fan-out benchmark");
     bench_goroutine_step.dependOn(&run_bench_goroutine.step);
 
+    // Scheduler scaling benchmark (1/2/4/8/16 workers)
+    const bench_scaling = b.addExecutable(.{
+        .name = "bench_scaling",
+        .root_module = b.createModule(.{
+            .root_source_file = b.path("benchmarks/asyncio/bench_scaling.zig"),
+            .target = target,
+            .optimize = .ReleaseFast,
+        }),
+    });
+    bench_scaling.root_module.addImport("scheduler", scheduler_module);
+    bench_scaling.linkLibC();
+
+    b.installArtifact(bench_scaling);
+
+    const run_bench_scaling = b.addRunArtifact(bench_scaling);
+    const bench_scaling_step = b.step("bench-scaling", "Build and run scheduler scaling benchmark (1-16 workers)");
+    bench_scaling_step.dependOn(&run_bench_scaling.step);
+
+    // Bytecode VM dispatch benchmark
+    const bytecode_vm_module = b.createModule(.{
+        .root_source_file = b.path("src/bytecode/vm.zig"),
+        .target = target,
+        .optimize = .ReleaseFast,
+    });
+    bytecode_vm_module.addImport("runtime", runtime);
+
+    const bench_vm = b.addExecutable(.{
+        .name = "bench_vm",
+        .root_module = b.createModule(.{
+            .root_source_file = b.path("benchmarks/bytecode/bench_vm.zig"),
+            .target = target,
+            .optimize = .ReleaseFast,
+        }),
+    });
+    bench_vm.root_module.addImport("bytecode_vm", bytecode_vm_module);
+    bench_vm.linkLibC();
+
+    b.installArtifact(bench_vm);
+
+    const run_bench_vm = b.addRunArtifact(bench_vm);
+    const bench_vm_step = b.step("bench-vm", "Build and run bytecode VM dispatch benchmark");
+    bench_vm_step.dependOn(&run_bench_vm.step);
+
     // Tokenizer encoding benchmark
     const tokenizer_bench = b.addExecutable(.{
         .name = "tokenizer_bench",
@@ -436,6 +492,40 @@ pub fn build(b: *std.Build) void {
     const tokenizer_bench_step = b.step("bench-tokenizer", "Build and run tokenizer encoding benchmark");
     tokenizer_bench_step.dependOn(&run_tokenizer_bench.step);
 
+    // tokenizer.json -> zero-copy .mtok converter
+    const tokenizer_convert = b.addExecutable(.{
+        .name = "tokenizer_convert",
+        .root_module = b.createModule(.{
+            .root_source_file = b.path("packages/tokenizer/src/convert.zig"),
+            .target = target,
+            .optimize = .ReleaseFast,
+        }),
+    });
+    tokenizer_convert.root_module.addImport("json", json_mod);
+    tokenizer_convert.linkLibC();
+    b.installArtifact(tokenizer_convert);
+
+    const run_tokenizer_convert = b.addRunArtifact(tokenizer_convert);
+    if (b.args) |args| run_tokenizer_convert.addArgs(args);
+    const tokenizer_convert_step = b.step("tokenizer-convert", "Convert tokenizer.json to the mmap-able .mtok format");
+    tokenizer_convert_step.dependOn(&run_tokenizer_convert.step);
+
+    // wrk-style HTTP load generator used by benchmarks/webserver
+    const http_loadgen = b.addExecutable(.{
+        .name = "http_loadgen",
+        .root_module = b.createModule(.{
+            .root_source_file = b.path("packages/shared/http/loadgen.zig"),
+            .target = target,
+            .optimize = .ReleaseFast,
+        }),
+    });
+    b.installArtifact(http_loadgen);
+
+    const run_http_loadgen = b.addRunArtifact(http_loadgen);
+    if (b.args) |args| run_http_loadgen.addArgs(args);
+    const http_loadgen_step = b.step("loadgen", "Run the HTTP load generator (zig build loadgen -- -c 100 http://...)");
+    http_loadgen_step.dependOn(&run_http_loadgen.step);
+
     // BPE Training benchmark
     const bench_train = b.addExecutable(.{
         .name = "bench_train",
@@ -492,6 +582,26 @@ pub fn build(b: *std.Build) void {
     const gzip_test_step = b.step("test-gzip", "Run gzip compression tests");
     gzip_test_step.dependOn(&run_gzip_tests.step);
 
+    // HTTP/1.1 server and load generator tests
+    const http_server_tests = b.addTest(.{
+        .root_module = b.createModule(.{
+            .root_source_file = b.path("packages/shared/http/server.zig"),
+            .target = target,
+            .optimize = optimize,
+        }),
+    });
+    const http_loadgen_tests = b.addTest(.{
+        .root_module = b.createModule(.{
+            .root_source_file = b.path("packages/shared/http/loadgen.zig"),
+            .target = target,
+            .optimize = optimize,
+        }),
+    });
+
+    const http_server_test_step = b.step("test-http-server", "Run HTTP/1.1 server tests");
+    http_server_test_step.dependOn(&b.addRunArtifact(http_server_tests).step);
+    http_server_test_step.dependOn(&b.addRunArtifact(http_loadgen_tests).step);
+
     // Package manager tests (PEP 440, 508, requirements.txt, METADATA, PubGrub)
     const pkg_test_module = b.createModule(.{
         .root_source_file = b.path("packages/pkg/src/pkg.zig"),
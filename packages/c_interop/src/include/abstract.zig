@@ -180,7 +180,7 @@ export fn PyObject_RichCompare(a: *cpython.PyObject, b: *cpython.PyObject, op: c
 ///
 /// CPython: int PyObject_RichCompareBool(PyObject *a, PyObject *b, int op)
 /// Returns: 1 if true, 0 if false, -1 on error
-export fn PyObject_RichCompareBool(a: *cpython.PyObject, b: *cpython.PyObject, op: c_int) callconv(.c) c_int {
+pub export fn PyObject_RichCompareBool(a: *cpython.PyObject, b: *cpython.PyObject, op: c_int) callconv(.c) c_int {
     // Fast path for identity
     if (a == b) {
         return switch (op) {
@@ -197,7 +197,7 @@ export fn PyObject_GenericGetDict(obj: *cpython.PyObject, context: ?*anyopaque)
         }
         // Create new dict if none exists
         const pydict = @import("../objects/dictobject.zig");
-        const new_dict = pydict.PyDict_New() orelse return null;
+        const new_dict = pydict.newInstanceDict(type_obj) orelse return null;
         dict_ptr.* = new_dict;
         Py_INCREF(new_dict);
         return new_dict;
@@ -261,7 +261,7 @@ export fn PyObject_GenericSetAttr(obj: *cpython.PyObject, name: *cpython.PyObjec
 
         // Create instance dict if needed
         if (dict_ptr.* == null) {
-            dict_ptr.* = pydict.PyDict_New();
+            dict_ptr.* = pydict.newInstanceDict(type_obj);
             if (dict_ptr.* == null) return -1;
         }
 
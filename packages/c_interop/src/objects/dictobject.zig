@@ -1,13 +1,18 @@
 /// PyDictObject implementation - EXACT CPython 3.12 memory layout
 ///
 /// Uses exact CPython PyDictObject struct layout for binary compatibility.
-/// Internal storage uses simplified hash table implementation.
+/// Storage follows CPython's compact dict: a sparse index table pointing
+/// into a dense, insertion-ordered entry array. Instance dicts of heap
+/// types share one keys object per type (split table) and only store
+/// their own values.
 ///
-/// Reference: cpython/Include/cpython/dictobject.h
+/// Reference: cpython/Include/cpython/dictobject.h, cpython/Objects/dictobject.c
 
 const std = @import("std");
 const cpython = @import("../include/object.zig");
+const abstract = @import("../include/abstract.zig");
 const traits = @import("typetraits.zig");
+const pyunicode = @import("unicodeobject.zig");
 
 const allocator = std.heap.c_allocator;
 
@@ -18,27 +23,51 @@ pub const PyDictObject = cpython.PyDictObject;
 // Internal Dict Keys/Values Implementation
 // ============================================================================
 
-/// Internal hash table entry
+/// Dense entry, in insertion order. A deleted entry keeps its place with
+/// key == null until the next resize compacts it away.
 const DictEntry = struct {
     hash: isize,
     key: ?*cpython.PyObject,
-    value: ?*cpython.PyObject,
+    value: ?*cpython.PyObject, // Always null in split keys
 };
 
-/// Internal keys storage - implements PyDictKeysObject interface
-/// Note: We cast this opaque pointer to our internal struct
-const InternalDictKeys = struct {
+/// Keys object, opaque to C as PyDictKeysObject. The header is followed by
+/// the index table (1 << dk_log2_index_bytes bytes; slots are 1, 2, 4 or 8
+/// bytes wide depending on the table size) and then the entry array.
+const DictKeys = struct {
     dk_refcnt: isize,
-    dk_log2_size: u8, // log2 of size (e.g., 3 = 8 entries)
+    dk_log2_size: u8, // log2 of the index table size (e.g., 3 = 8 slots)
     dk_log2_index_bytes: u8,
     dk_kind: u8,
     dk_version: u32,
-    dk_usable: isize,
-    dk_nentries: isize,
-    // Entries follow
-    entries: [*]DictEntry,
+    dk_usable: isize, // Entries that can still be appended
+    dk_nentries: isize, // Entries used, including deleted ones
 };
 
+/// Values of one split dict, indexed like the shared entries.
+/// `order` lists entry indices in this instance's insertion order.
+const DictValues = struct {
+    size: u8,
+    order: [SHARED_KEYS_MAX_SIZE]u8,
+    values: [SHARED_KEYS_MAX_SIZE]?*cpython.PyObject,
+};
+
+const DICT_KEYS_GENERAL: u8 = 0;
+const DICT_KEYS_SPLIT: u8 = 2;
+
+/// Index table slot contents other than an entry index
+const DKIX_EMPTY: isize = -1;
+const DKIX_DUMMY: isize = -2; // Deleted; probing continues past it
+const DKIX_ERROR: isize = -3; // Key comparison raised
+
+/// Smallest index table (8 slots)
+const PyDict_LOG_MINSIZE: u8 = 3;
+
+/// Keys a split table takes before new attributes make instances combined
+const SHARED_KEYS_MAX_SIZE = 30;
+
+const PERTURB_SHIFT = 5;
+
 /// Mapping protocol for dicts
 var dict_as_mapping: cpython.PyMappingMethods = .{
     .mp_length = dict_length,
@@ -105,280 +134,528 @@ pub var PyDict_Type: cpython.PyTypeObject = .{
 };
 
 // ============================================================================
-// Core API Functions
+// Keys Storage
 // ============================================================================
 
-/// Initial dict size (power of 2)
-const DICT_MINSIZE: usize = 8;
-
-/// Create internal keys structure
-fn createKeys(log2_size: u8) ?*InternalDictKeys {
-    const size: usize = @as(usize, 1) << @intCast(log2_size);
+/// Entries fit in 2/3 of the index table, keeping probe chains short
+fn usableFraction(size: usize) usize {
+    return (size << 1) / 3;
+}
 
-    // Allocate keys header + entries array
-    const header_size = @sizeOf(InternalDictKeys);
-    const entries_size = size * @sizeOf(DictEntry);
-    const total_size = header_size + entries_size;
+/// Index slots are as narrow as the entry count allows
+fn log2IndexBytes(log2_size: u8) u8 {
+    if (log2_size < 8) return log2_size;
+    if (log2_size < 16) return log2_size + 1;
+    if (log2_size < 32) return log2_size + 2;
+    return log2_size + 3;
+}
 
-    const memory = allocator.alloc(u8, total_size) catch return null;
-    const keys: *InternalDictKeys = @ptrCast(@alignCast(memory.ptr));
+fn keysAllocSize(log2_size: u8) usize {
+    const size = @as(usize, 1) << @intCast(log2_size);
+    const index_bytes = @as(usize, 1) << @intCast(log2IndexBytes(log2_size));
+    return @sizeOf(DictKeys) + index_bytes + usableFraction(size) * @sizeOf(DictEntry);
+}
 
-    keys.dk_refcnt = 1;
-    keys.dk_log2_size = log2_size;
-    keys.dk_log2_index_bytes = 0;
-    keys.dk_kind = 0;
-    keys.dk_version = 0;
-    keys.dk_usable = @intCast(size * 2 / 3); // 2/3 load factor
-    keys.dk_nentries = 0;
+/// Smallest table whose usable fraction holds `minused` entries
+fn calculateLog2Size(minused: usize) u8 {
+    var log2_size: u8 = PyDict_LOG_MINSIZE;
+    while (usableFraction(@as(usize, 1) << @intCast(log2_size)) < minused) {
+        log2_size += 1;
+    }
+    return log2_size;
+}
 
-    // Point to entries array after header
-    const entries_ptr = memory.ptr + header_size;
-    keys.entries = @ptrCast(@alignCast(entries_ptr));
+/// Create keys storage with every index slot empty
+fn createKeys(log2_size: u8, kind: u8) ?*DictKeys {
+    const memory = allocator.alloc(u8, keysAllocSize(log2_size)) catch return null;
+    const keys: *DictKeys = @ptrCast(@alignCast(memory.ptr));
+
+    keys.* = .{
+        .dk_refcnt = 1,
+        .dk_log2_size = log2_size,
+        .dk_log2_index_bytes = log2IndexBytes(log2_size),
+        .dk_kind = kind,
+        .dk_version = 0,
+        .dk_usable = @intCast(usableFraction(@as(usize, 1) << @intCast(log2_size))),
+        .dk_nentries = 0,
+    };
 
-    // Initialize all entries to empty
-    var i: usize = 0;
-    while (i < size) : (i += 1) {
-        keys.entries[i] = .{
-            .hash = 0,
-            .key = null,
-            .value = null,
-        };
-    }
+    // 0xff bytes read as DKIX_EMPTY at every slot width
+    const index_bytes = @as(usize, 1) << @intCast(keys.dk_log2_index_bytes);
+    @memset(indexTable(keys)[0..index_bytes], 0xff);
 
     return keys;
 }
 
-/// Free internal keys structure
-fn freeKeys(keys: *InternalDictKeys) void {
-    const log2_size = keys.dk_log2_size;
-    const size: usize = @as(usize, 1) << @intCast(log2_size);
+/// Release the allocation only; entry references have moved elsewhere
+fn freeKeysMemory(keys: *DictKeys) void {
+    const memory: [*]u8 = @ptrCast(keys);
+    allocator.free(memory[0..keysAllocSize(keys.dk_log2_size)]);
+}
+
+/// Drop one reference to `keys`, freeing it and its entries on the last
+fn releaseKeys(keys: *DictKeys) void {
+    keys.dk_refcnt -= 1;
+    if (keys.dk_refcnt > 0) return;
 
-    // Decref all keys and values
-    var i: usize = 0;
-    while (i < size) : (i += 1) {
-        traits.decref(keys.entries[i].key);
-        traits.decref(keys.entries[i].value);
+    for (entries(keys)[0..@intCast(keys.dk_nentries)]) |entry| {
+        traits.decref(entry.key);
+        traits.decref(entry.value);
     }
+    freeKeysMemory(keys);
+}
 
-    const header_size = @sizeOf(InternalDictKeys);
-    const entries_size = size * @sizeOf(DictEntry);
-    const total_size = header_size + entries_size;
-
-    const memory: [*]u8 = @ptrCast(@alignCast(keys));
-    allocator.free(memory[0..total_size]);
+fn indexTable(keys: *DictKeys) [*]u8 {
+    return @as([*]u8, @ptrCast(keys)) + @sizeOf(DictKeys);
 }
 
-/// Create new empty dictionary
-export fn PyDict_New() callconv(.c) ?*cpython.PyObject {
-    const dict = allocator.create(PyDictObject) catch return null;
+fn entries(keys: *DictKeys) [*]DictEntry {
+    const index_bytes = @as(usize, 1) << @intCast(keys.dk_log2_index_bytes);
+    return @ptrCast(@alignCast(indexTable(keys) + index_bytes));
+}
 
-    dict.ob_base.ob_refcnt = 1;
-    dict.ob_base.ob_type = &PyDict_Type;
-    dict.ma_used = 0;
-    dict._ma_watcher_tag = 0;
+fn getIndex(keys: *DictKeys, i: usize) isize {
+    const table = indexTable(keys);
+    return switch (keys.dk_log2_index_bytes - keys.dk_log2_size) {
+        0 => @as([*]const i8, @ptrCast(table))[i],
+        1 => @as([*]const i16, @ptrCast(@alignCast(table)))[i],
+        2 => @as([*]const i32, @ptrCast(@alignCast(table)))[i],
+        else => @intCast(@as([*]const i64, @ptrCast(@alignCast(table)))[i]),
+    };
+}
 
-    // Create initial keys structure
-    const keys = createKeys(3); // 8 entries
-    if (keys == null) {
-        allocator.destroy(dict);
-        return null;
+fn setIndex(keys: *DictKeys, i: usize, ix: isize) void {
+    const table = indexTable(keys);
+    switch (keys.dk_log2_index_bytes - keys.dk_log2_size) {
+        0 => @as([*]i8, @ptrCast(table))[i] = @intCast(ix),
+        1 => @as([*]i16, @ptrCast(@alignCast(table)))[i] = @intCast(ix),
+        2 => @as([*]i32, @ptrCast(@alignCast(table)))[i] = @intCast(ix),
+        else => @as([*]i64, @ptrCast(@alignCast(table)))[i] = ix,
     }
-
-    // Cast our internal keys to opaque CPython type
-    dict.ma_keys = @ptrCast(keys);
-    dict.ma_values = null; // Combined table
-
-    return @ptrCast(&dict.ob_base);
 }
 
-/// Get dictionary size
-export fn PyDict_Size(obj: *cpython.PyObject) callconv(.c) isize {
-    if (PyDict_Check(obj) == 0) return -1;
+fn dictKeys(dict: *PyDictObject) *DictKeys {
+    return @ptrCast(@alignCast(dict.ma_keys.?));
+}
 
-    const dict: *PyDictObject = @ptrCast(@alignCast(obj));
-    return dict.ma_used;
+/// Values array of a split dict, null for a combined one
+fn dictValues(dict: *PyDictObject) ?*DictValues {
+    return @ptrCast(@alignCast(dict.ma_values));
 }
 
-/// Compute hash for key using its tp_hash
+// ============================================================================
+// Lookup and Insertion
+// ============================================================================
+
+/// Compute hash for key using its tp_hash (-1 means it raised)
 fn computeHash(key: *cpython.PyObject) isize {
     const type_obj = cpython.Py_TYPE(key);
     if (type_obj.tp_hash) |hash_func| {
         return hash_func(key);
     }
     // Fallback: identity hash (pointer address)
-    return @intCast(@intFromPtr(key));
+    return @bitCast(@intFromPtr(key));
 }
 
-/// Find entry index for key
-fn findEntry(keys: *InternalDictKeys, key: *cpython.PyObject, hash: isize) ?usize {
-    const size: usize = @as(usize, 1) << @intCast(keys.dk_log2_size);
-    const mask = size - 1;
-    var idx = @as(usize, @intCast(@as(u64, @bitCast(@as(i64, hash))) & mask));
+fn isExactUnicode(obj: *cpython.PyObject) bool {
+    return cpython.Py_TYPE(obj) == &pyunicode.PyUnicode_Type;
+}
 
-    var perturb: u64 = @bitCast(@as(i64, hash));
+/// 1 if equal, 0 if not, -1 if the comparison raised.
+/// Exact str keys compare bytewise without a rich comparison call.
+fn keysEqual(a: *cpython.PyObject, b: *cpython.PyObject) c_int {
+    if (isExactUnicode(a) and isExactUnicode(b)) {
+        if (pyunicode.asUTF8Slice(a)) |a_str| {
+            if (pyunicode.asUTF8Slice(b)) |b_str| {
+                return @intFromBool(std.mem.eql(u8, a_str, b_str));
+            }
+        }
+    }
+    return abstract.PyObject_RichCompareBool(a, b, abstract.Py_EQ);
+}
 
-    while (true) {
-        const entry = &keys.entries[idx];
+/// Entry index holding `key`, DKIX_EMPTY if absent, DKIX_ERROR if __eq__ raised.
+/// Starts over if a comparison mutated the dict, as CPython does.
+fn lookup(dict: *PyDictObject, key: *cpython.PyObject, hash: isize) isize {
+    restart: while (true) {
+        const keys = dictKeys(dict);
+        const mask = (@as(usize, 1) << @intCast(keys.dk_log2_size)) - 1;
+        var perturb: usize = @bitCast(hash);
+        var i = perturb & mask;
+
+        while (true) {
+            const ix = getIndex(keys, i);
+            if (ix == DKIX_EMPTY) return DKIX_EMPTY;
+
+            if (ix >= 0) {
+                const entry = &entries(keys)[@intCast(ix)];
+                const entry_key = entry.key.?;
+                if (entry_key == key) return ix;
+
+                if (entry.hash == hash) {
+                    _ = traits.incref(entry_key);
+                    const cmp = keysEqual(entry_key, key);
+                    const mutated = dictKeys(dict) != keys or entry.key != entry_key;
+                    traits.decref(entry_key);
+
+                    if (cmp < 0) return DKIX_ERROR;
+                    if (mutated) continue :restart;
+                    if (cmp > 0) return ix;
+                }
+            }
 
-        if (entry.key == null) {
-            return null; // Empty slot - key not found
+            perturb >>= PERTURB_SHIFT;
+            i = (i *% 5 +% perturb +% 1) & mask;
         }
+    }
+}
 
-        if (entry.hash == hash and entry.key == key) {
-            return idx; // Found by identity
-        }
+/// First slot on `hash`'s probe chain without a live entry
+fn findEmptySlot(keys: *DictKeys, hash: isize) usize {
+    const mask = (@as(usize, 1) << @intCast(keys.dk_log2_size)) - 1;
+    var perturb: usize = @bitCast(hash);
+    var i = perturb & mask;
+
+    while (getIndex(keys, i) >= 0) {
+        perturb >>= PERTURB_SHIFT;
+        i = (i *% 5 +% perturb +% 1) & mask;
+    }
+    return i;
+}
 
-        // TODO: Call PyObject_RichCompareBool for equality
-        // For now just use identity comparison
+/// Index slot that points at entry `ix`
+fn findSlot(keys: *DictKeys, hash: isize, ix: isize) usize {
+    const mask = (@as(usize, 1) << @intCast(keys.dk_log2_size)) - 1;
+    var perturb: usize = @bitCast(hash);
+    var i = perturb & mask;
 
-        // Probe next slot
-        perturb >>= 5;
-        idx = (idx * 5 + 1 + perturb) & mask;
+    while (getIndex(keys, i) != ix) {
+        perturb >>= PERTURB_SHIFT;
+        i = (i *% 5 +% perturb +% 1) & mask;
     }
+    return i;
+}
+
+/// Append an entry (taking the references passed in); needs dk_usable > 0
+fn appendEntry(keys: *DictKeys, hash: isize, key: ?*cpython.PyObject, value: ?*cpython.PyObject) usize {
+    const ix: usize = @intCast(keys.dk_nentries);
+    setIndex(keys, findEmptySlot(keys, hash), keys.dk_nentries);
+    entries(keys)[ix] = .{ .hash = hash, .key = key, .value = value };
+    keys.dk_usable -= 1;
+    keys.dk_nentries += 1;
+    return ix;
 }
 
-/// Find empty slot for insertion
-fn findEmptySlot(keys: *InternalDictKeys, hash: isize) usize {
-    return findEmptySlotInKeys(keys, hash);
+/// Value stored for entry `ix` (null if a split dict lacks it)
+fn entryValue(dict: *PyDictObject, ix: isize) ?*cpython.PyObject {
+    if (dictValues(dict)) |values| return values.values[@intCast(ix)];
+    return entries(dictKeys(dict))[@intCast(ix)].value;
 }
 
-/// Find empty slot for insertion (used during resize)
-fn findEmptySlotInKeys(keys: *InternalDictKeys, hash: isize) usize {
-    const size: usize = @as(usize, 1) << @intCast(keys.dk_log2_size);
-    const mask = size - 1;
-    var idx = @as(usize, @intCast(@as(u64, @bitCast(@as(i64, hash))) & mask));
+/// CPython's GROWTH_RATE: a resize leaves room for 3x the live items
+fn growthRate(dict: *PyDictObject) usize {
+    return @as(usize, @intCast(dict.ma_used)) * 3;
+}
 
-    var perturb: u64 = @bitCast(@as(i64, hash));
+/// Rebuild as a combined table with room for `minused` entries.
+/// Deleted entries are dropped; a split dict takes its own copy of the keys.
+fn resize(dict: *PyDictObject, minused: usize) bool {
+    const old_keys = dictKeys(dict);
+    const new_keys = createKeys(calculateLog2Size(minused), DICT_KEYS_GENERAL) orelse return false;
 
-    while (true) {
-        if (keys.entries[idx].key == null) {
-            return idx;
+    if (dictValues(dict)) |values| {
+        for (values.order[0..values.size]) |ix| {
+            const entry = entries(old_keys)[ix];
+            _ = appendEntry(new_keys, entry.hash, traits.incref(entry.key), values.values[ix]);
         }
-
-        perturb >>= 5;
-        idx = (idx * 5 + 1 + perturb) & mask;
+        allocator.destroy(values);
+        dict.ma_values = null;
+        releaseKeys(old_keys);
+    } else {
+        for (entries(old_keys)[0..@intCast(old_keys.dk_nentries)]) |entry| {
+            if (entry.key != null) {
+                _ = appendEntry(new_keys, entry.hash, entry.key, entry.value);
+            }
+        }
+        freeKeysMemory(old_keys);
     }
+
+    dict.ma_keys = @ptrCast(new_keys);
+    return true;
 }
 
-/// Get item by key (returns borrowed reference, no INCREF)
-export fn PyDict_GetItem(obj: *cpython.PyObject, key: *cpython.PyObject) callconv(.c) ?*cpython.PyObject {
-    if (PyDict_Check(obj) == 0) return null;
+/// Make room for `extra` more keys so a bulk insert resizes at most once
+fn reserve(dict: *PyDictObject, extra: usize) bool {
+    if (dictValues(dict) != null) return true; // Converted on demand
+    const keys = dictKeys(dict);
+    if (@as(usize, @intCast(keys.dk_usable)) >= extra) return true;
+    return resize(dict, @as(usize, @intCast(dict.ma_used)) + extra);
+}
 
-    const dict: *PyDictObject = @ptrCast(@alignCast(obj));
-    const keys: *InternalDictKeys = @ptrCast(@alignCast(dict.ma_keys));
+fn setSplitValue(dict: *PyDictObject, values: *DictValues, ix: usize, value: *cpython.PyObject) void {
+    const old_value = values.values[ix];
+    values.values[ix] = traits.incref(value);
+    if (old_value) |old| {
+        traits.decref(old);
+    } else {
+        values.order[values.size] = @intCast(ix);
+        values.size += 1;
+        dict.ma_used += 1;
+    }
+    dict._ma_watcher_tag +%= 1;
+}
 
-    const hash = computeHash(key);
+/// Insert or replace `key` (increfs key and value); -1 on error
+fn insertItem(dict: *PyDictObject, key: *cpython.PyObject, hash: isize, value: *cpython.PyObject) c_int {
+    const ix = lookup(dict, key, hash);
+    if (ix == DKIX_ERROR) return -1;
 
-    if (findEntry(keys, key, hash)) |idx| {
-        return keys.entries[idx].value;
+    if (dictValues(dict)) |values| {
+        if (ix >= 0) {
+            setSplitValue(dict, values, @intCast(ix), value);
+            return 0;
+        }
+        // New str keys extend the shared keys for every instance
+        const keys = dictKeys(dict);
+        if (isExactUnicode(key) and keys.dk_usable > 0) {
+            const new_ix = appendEntry(keys, hash, traits.incref(key), null);
+            setSplitValue(dict, values, new_ix, value);
+            return 0;
+        }
+        if (!resize(dict, growthRate(dict) + 1)) return -1;
+    } else if (ix >= 0) {
+        const entry = &entries(dictKeys(dict))[@intCast(ix)];
+        const old_value = entry.value;
+        entry.value = traits.incref(value);
+        traits.decref(old_value);
+        dict._ma_watcher_tag +%= 1;
+        return 0;
     }
 
-    return null;
+    if (dictKeys(dict).dk_usable <= 0) {
+        if (!resize(dict, growthRate(dict))) return -1;
+    }
+
+    _ = appendEntry(dictKeys(dict), hash, traits.incref(key), traits.incref(value));
+    dict.ma_used += 1;
+    dict._ma_watcher_tag +%= 1;
+    return 0;
 }
 
-/// Set item (incref key and value)
-export fn PyDict_SetItem(obj: *cpython.PyObject, key: *cpython.PyObject, value: *cpython.PyObject) callconv(.c) c_int {
-    if (PyDict_Check(obj) == 0) return -1;
+/// Remove `key`; sets KeyError and returns -1 if it is missing
+fn deleteItem(dict: *PyDictObject, key: *cpython.PyObject, hash: isize) c_int {
+    const ix = lookup(dict, key, hash);
+    if (ix == DKIX_ERROR) return -1;
+    if (ix < 0 or entryValue(dict, ix) == null) {
+        traits.setError("KeyError", "key not found");
+        return -1;
+    }
 
-    const dict: *PyDictObject = @ptrCast(@alignCast(obj));
-    var keys: *InternalDictKeys = @ptrCast(@alignCast(dict.ma_keys));
+    if (dictValues(dict)) |values| {
+        const old_value = values.values[@intCast(ix)];
+        values.values[@intCast(ix)] = null;
 
-    const hash = computeHash(key);
+        const order = values.order[0..values.size];
+        const pos = std.mem.indexOfScalar(u8, order, @intCast(ix)).?;
+        std.mem.copyForwards(u8, order[pos .. order.len - 1], order[pos + 1 ..]);
+        values.size -= 1;
 
-    // Check if key already exists
-    if (findEntry(keys, key, hash)) |idx| {
-        // Update existing entry
-        traits.decref(keys.entries[idx].value);
-        keys.entries[idx].value = traits.incref(value);
+        dict.ma_used -= 1;
+        dict._ma_watcher_tag +%= 1;
+        traits.decref(old_value);
         return 0;
     }
 
-    // Need to insert new entry
-    // Check if we need to resize
-    if (keys.dk_usable <= 0) {
-        // Resize dict - double the size
-        const new_log2_size = keys.dk_log2_size + 1;
-        const new_keys = createKeys(new_log2_size) orelse return -1;
-
-        // Rehash all existing entries
-        const old_size: usize = @as(usize, 1) << @intCast(keys.dk_log2_size);
-        var i: usize = 0;
-        while (i < old_size) : (i += 1) {
-            if (keys.entries[i].key != null) {
-                const entry_hash = keys.entries[i].hash;
-                const new_idx = findEmptySlotInKeys(new_keys, entry_hash);
-                new_keys.entries[new_idx] = keys.entries[i];
-                new_keys.dk_nentries += 1;
-                new_keys.dk_usable -= 1;
-            }
+    const keys = dictKeys(dict);
+    setIndex(keys, findSlot(keys, hash, ix), DKIX_DUMMY);
+
+    const entry = &entries(keys)[@intCast(ix)];
+    const old_key = entry.key;
+    const old_value = entry.value;
+    entry.key = null;
+    entry.value = null;
+
+    dict.ma_used -= 1;
+    dict._ma_watcher_tag +%= 1;
+    traits.decref(old_key);
+    traits.decref(old_value);
+    return 0;
+}
+
+/// 1 with `value` set (borrowed) if found, 0 if missing, -1 on error
+fn getItem(dict: *PyDictObject, key: *cpython.PyObject, value: *?*cpython.PyObject) c_int {
+    value.* = null;
+    const hash = computeHash(key);
+    if (hash == -1) return -1;
+
+    const ix = lookup(dict, key, hash);
+    if (ix == DKIX_ERROR) return -1;
+    if (ix < 0) return 0;
+
+    value.* = entryValue(dict, ix);
+    return @intFromBool(value.* != null);
+}
+
+/// Next live entry at or after `pos.*`, in insertion order. For split dicts
+/// the value comes from the instance's values.
+fn nextEntry(dict: *PyDictObject, pos: *usize) ?DictEntry {
+    const keys = dictKeys(dict);
+
+    if (dictValues(dict)) |values| {
+        if (pos.* >= values.size) return null;
+        const ix = values.order[pos.*];
+        pos.* += 1;
+        const entry = entries(keys)[ix];
+        return .{ .hash = entry.hash, .key = entry.key, .value = values.values[ix] };
+    }
+
+    const nentries: usize = @intCast(keys.dk_nentries);
+    while (pos.* < nentries) {
+        const entry = entries(keys)[pos.*];
+        pos.* += 1;
+        if (entry.key != null) return entry;
+    }
+    return null;
+}
+
+/// Insert every item of `other` (reusing its stored hashes)
+fn mergeDict(dict: *PyDictObject, other: *PyDictObject, override: bool) c_int {
+    if (dict == other) return 0;
+    if (!reserve(dict, @intCast(other.ma_used))) return -1;
+
+    var pos: usize = 0;
+    while (nextEntry(other, &pos)) |entry| {
+        if (!override) {
+            const ix = lookup(dict, entry.key.?, entry.hash);
+            if (ix == DKIX_ERROR) return -1;
+            if (ix >= 0 and entryValue(dict, ix) != null) continue;
         }
+        if (insertItem(dict, entry.key.?, entry.hash, entry.value.?) < 0) return -1;
+    }
+
+    return 0;
+}
+
+/// Release a dict's storage after it has been detached from the dict
+fn releaseStorage(keys: *DictKeys, values: ?*DictValues) void {
+    if (values) |v| {
+        for (v.order[0..v.size]) |ix| traits.decref(v.values[ix]);
+        allocator.destroy(v);
+    }
+    releaseKeys(keys);
+}
+
+// ============================================================================
+// Core API Functions
+// ============================================================================
+
+/// Create new empty dictionary
+export fn PyDict_New() callconv(.c) ?*cpython.PyObject {
+    const dict = allocator.create(PyDictObject) catch return null;
+
+    dict.ob_base.ob_refcnt = 1;
+    dict.ob_base.ob_type = &PyDict_Type;
+    dict.ma_used = 0;
+    dict._ma_watcher_tag = 0;
+
+    const keys = createKeys(PyDict_LOG_MINSIZE, DICT_KEYS_GENERAL) orelse {
+        allocator.destroy(dict);
+        return null;
+    };
+
+    // Cast our internal keys to opaque CPython type
+    dict.ma_keys = @ptrCast(keys);
+    dict.ma_values = null; // Combined table
+
+    return @ptrCast(&dict.ob_base);
+}
+
+/// Shared keys per heap type, created with the type's first instance dict
+var cached_keys: std.AutoHashMapUnmanaged(*cpython.PyTypeObject, *DictKeys) = .{};
 
-        // Free old keys and update dict
-        const old_header_size = @sizeOf(InternalDictKeys);
-        const old_entries_size = old_size * @sizeOf(DictEntry);
-        const old_total_size = old_header_size + old_entries_size;
-        const old_memory: [*]u8 = @ptrCast(@alignCast(keys));
-        allocator.free(old_memory[0..old_total_size]);
-
-        dict.ma_keys = @ptrCast(new_keys);
-
-        // Now insert the new entry using the new keys
-        const new_hash = computeHash(key);
-        const insert_idx = findEmptySlotInKeys(new_keys, new_hash);
-        new_keys.entries[insert_idx] = .{
-            .hash = new_hash,
-            .key = traits.incref(key),
-            .value = traits.incref(value),
+fn sharedKeys(type_obj: *cpython.PyTypeObject) ?*DictKeys {
+    const gop = cached_keys.getOrPut(allocator, type_obj) catch return null;
+    if (!gop.found_existing) {
+        const keys = createKeys(6, DICT_KEYS_SPLIT) orelse {
+            cached_keys.removeByPtr(gop.key_ptr);
+            return null;
         };
-        new_keys.dk_usable -= 1;
-        new_keys.dk_nentries += 1;
-        dict.ma_used += 1;
-        dict._ma_watcher_tag +%= 1;
-        return 0;
+        keys.dk_usable = SHARED_KEYS_MAX_SIZE;
+        gop.value_ptr.* = keys;
     }
+    return gop.value_ptr.*;
+}
+
+/// New empty __dict__ for an instance of `type_obj`.
+/// Instances of heap types share their keys (CPython's ht_cached_keys) and
+/// only allocate values; any other type gets a regular combined dict.
+pub fn newInstanceDict(type_obj: *cpython.PyTypeObject) ?*cpython.PyObject {
+    if ((type_obj.tp_flags & cpython.Py_TPFLAGS_HEAPTYPE) == 0) return PyDict_New();
+    const keys = sharedKeys(type_obj) orelse return PyDict_New();
 
-    const idx = findEmptySlot(keys, hash);
+    const values = allocator.create(DictValues) catch return null;
+    values.size = 0;
+    values.values = @splat(null);
 
-    keys.entries[idx] = .{
-        .hash = hash,
-        .key = traits.incref(key),
-        .value = traits.incref(value),
+    const dict = allocator.create(PyDictObject) catch {
+        allocator.destroy(values);
+        return null;
     };
 
-    keys.dk_usable -= 1;
-    keys.dk_nentries += 1;
-    dict.ma_used += 1;
-    dict._ma_watcher_tag +%= 1;
+    dict.ob_base.ob_refcnt = 1;
+    dict.ob_base.ob_type = &PyDict_Type;
+    dict.ma_used = 0;
+    dict._ma_watcher_tag = 0;
 
-    return 0;
+    keys.dk_refcnt += 1;
+    dict.ma_keys = @ptrCast(keys);
+    dict.ma_values = @ptrCast(values);
+
+    return @ptrCast(&dict.ob_base);
 }
 
-/// Delete item by key
-export fn PyDict_DelItem(obj: *cpython.PyObject, key: *cpython.PyObject) callconv(.c) c_int {
+/// Get dictionary size
+export fn PyDict_Size(obj: *cpython.PyObject) callconv(.c) isize {
     if (PyDict_Check(obj) == 0) return -1;
 
     const dict: *PyDictObject = @ptrCast(@alignCast(obj));
-    const keys: *InternalDictKeys = @ptrCast(@alignCast(dict.ma_keys));
+    return dict.ma_used;
+}
 
-    const hash = computeHash(key);
+/// Get item by key (returns borrowed reference, no INCREF).
+/// Errors from hashing or comparison are suppressed, as in CPython.
+export fn PyDict_GetItem(obj: *cpython.PyObject, key: *cpython.PyObject) callconv(.c) ?*cpython.PyObject {
+    if (PyDict_Check(obj) == 0) return null;
 
-    if (findEntry(keys, key, hash)) |idx| {
-        // Found - delete entry
-        traits.decref(keys.entries[idx].key);
-        traits.decref(keys.entries[idx].value);
+    const dict: *PyDictObject = @ptrCast(@alignCast(obj));
+    var value: ?*cpython.PyObject = null;
+    if (getItem(dict, key, &value) < 0) {
+        traits.clearError();
+        return null;
+    }
+    return value;
+}
 
-        // Mark as deleted (tombstone)
-        keys.entries[idx].key = null;
-        keys.entries[idx].value = null;
-        keys.entries[idx].hash = 0;
+/// Set item (incref key and value)
+export fn PyDict_SetItem(obj: *cpython.PyObject, key: *cpython.PyObject, value: *cpython.PyObject) callconv(.c) c_int {
+    if (PyDict_Check(obj) == 0) return -1;
 
-        dict.ma_used -= 1;
-        dict._ma_watcher_tag +%= 1;
+    const dict: *PyDictObject = @ptrCast(@alignCast(obj));
+    const hash = computeHash(key);
+    if (hash == -1) return -1;
 
-        return 0;
-    }
+    return insertItem(dict, key, hash, value);
+}
 
-    return -1; // Key not found
+/// Delete item by key
+export fn PyDict_DelItem(obj: *cpython.PyObject, key: *cpython.PyObject) callconv(.c) c_int {
+    if (PyDict_Check(obj) == 0) return -1;
+
+    const dict: *PyDictObject = @ptrCast(@alignCast(obj));
+    const hash = computeHash(key);
+    if (hash == -1) return -1;
+
+    return deleteItem(dict, key, hash);
 }
 
 /// Clear all items
@@ -386,49 +663,45 @@ export fn PyDict_Clear(obj: *cpython.PyObject) callconv(.c) void {
     if (PyDict_Check(obj) == 0) return;
 
     const dict: *PyDictObject = @ptrCast(@alignCast(obj));
-    const keys: *InternalDictKeys = @ptrCast(@alignCast(dict.ma_keys));
+    const fresh = createKeys(PyDict_LOG_MINSIZE, DICT_KEYS_GENERAL) orelse return;
 
-    const size: usize = @as(usize, 1) << @intCast(keys.dk_log2_size);
+    const old_keys = dictKeys(dict);
+    const old_values = dictValues(dict);
 
-    var i: usize = 0;
-    while (i < size) : (i += 1) {
-        traits.decref(keys.entries[i].key);
-        traits.decref(keys.entries[i].value);
-        keys.entries[i] = .{ .hash = 0, .key = null, .value = null };
-    }
-
-    keys.dk_usable = @intCast(size * 2 / 3);
-    keys.dk_nentries = 0;
+    dict.ma_keys = @ptrCast(fresh);
+    dict.ma_values = null;
     dict.ma_used = 0;
     dict._ma_watcher_tag +%= 1;
+
+    releaseStorage(old_keys, old_values);
 }
 
-/// Check if key exists
+/// Check if key exists (-1 on error)
 export fn PyDict_Contains(obj: *cpython.PyObject, key: *cpython.PyObject) callconv(.c) c_int {
-    if (PyDict_GetItem(obj, key) != null) return 1;
-    return 0;
+    if (PyDict_Check(obj) == 0) return -1;
+
+    const dict: *PyDictObject = @ptrCast(@alignCast(obj));
+    var value: ?*cpython.PyObject = null;
+    return getItem(dict, key, &value);
 }
 
 /// Get item with string key
 export fn PyDict_GetItemString(obj: *cpython.PyObject, key_str: [*:0]const u8) callconv(.c) ?*cpython.PyObject {
-    const unicode = @import("../include/unicodeobject.zig");
-    const key = unicode.PyUnicode_FromString(key_str) orelse return null;
+    const key = pyunicode.PyUnicode_FromString(key_str) orelse return null;
     defer traits.decref(key);
     return PyDict_GetItem(obj, key);
 }
 
 /// Set item with string key
 export fn PyDict_SetItemString(obj: *cpython.PyObject, key_str: [*:0]const u8, value: *cpython.PyObject) callconv(.c) c_int {
-    const unicode = @import("../include/unicodeobject.zig");
-    const key = unicode.PyUnicode_FromString(key_str) orelse return -1;
+    const key = pyunicode.PyUnicode_FromString(key_str) orelse return -1;
     defer traits.decref(key);
     return PyDict_SetItem(obj, key, value);
 }
 
 /// Delete item with string key
 export fn PyDict_DelItemString(obj: *cpython.PyObject, key_str: [*:0]const u8) callconv(.c) c_int {
-    const unicode = @import("../include/unicodeobject.zig");
-    const key = unicode.PyUnicode_FromString(key_str) orelse return -1;
+    const key = pyunicode.PyUnicode_FromString(key_str) orelse return -1;
     defer traits.decref(key);
     return PyDict_DelItem(obj, key);
 }
@@ -438,21 +711,13 @@ export fn PyDict_Keys(obj: *cpython.PyObject) callconv(.c) ?*cpython.PyObject {
     if (PyDict_Check(obj) == 0) return null;
 
     const dict: *PyDictObject = @ptrCast(@alignCast(obj));
-    const keys: *InternalDictKeys = @ptrCast(@alignCast(dict.ma_keys));
-
     const list_mod = @import("listobject.zig");
-    const list = list_mod.PyList_New(dict.ma_used);
-    if (list == null) return null;
+    const list = list_mod.PyList_New(dict.ma_used) orelse return null;
 
-    const size: usize = @as(usize, 1) << @intCast(keys.dk_log2_size);
+    var pos: usize = 0;
     var list_idx: isize = 0;
-
-    var i: usize = 0;
-    while (i < size) : (i += 1) {
-        if (keys.entries[i].key) |key| {
-            _ = list_mod.PyList_SetItem(list.?, list_idx, traits.incref(key));
-            list_idx += 1;
-        }
+    while (nextEntry(dict, &pos)) |entry| : (list_idx += 1) {
+        _ = list_mod.PyList_SetItem(list, list_idx, traits.incref(entry.key.?));
     }
 
     return list;
@@ -463,21 +728,13 @@ export fn PyDict_Values(obj: *cpython.PyObject) callconv(.c) ?*cpython.PyObject
     if (PyDict_Check(obj) == 0) return null;
 
     const dict: *PyDictObject = @ptrCast(@alignCast(obj));
-    const keys: *InternalDictKeys = @ptrCast(@alignCast(dict.ma_keys));
-
     const list_mod = @import("listobject.zig");
-    const list = list_mod.PyList_New(dict.ma_used);
-    if (list == null) return null;
+    const list = list_mod.PyList_New(dict.ma_used) orelse return null;
 
-    const size: usize = @as(usize, 1) << @intCast(keys.dk_log2_size);
+    var pos: usize = 0;
     var list_idx: isize = 0;
-
-    var i: usize = 0;
-    while (i < size) : (i += 1) {
-        if (keys.entries[i].value) |value| {
-            _ = list_mod.PyList_SetItem(list.?, list_idx, traits.incref(value));
-            list_idx += 1;
-        }
+    while (nextEntry(dict, &pos)) |entry| : (list_idx += 1) {
+        _ = list_mod.PyList_SetItem(list, list_idx, traits.incref(entry.value.?));
     }
 
     return list;
@@ -488,32 +745,21 @@ export fn PyDict_Items(obj: *cpython.PyObject) callconv(.c) ?*cpython.PyObject {
     if (PyDict_Check(obj) == 0) return null;
 
     const dict: *PyDictObject = @ptrCast(@alignCast(obj));
-    const keys_struct: *InternalDictKeys = @ptrCast(@alignCast(dict.ma_keys));
-
     const list_mod = @import("listobject.zig");
     const tuple_mod = @import("tupleobject.zig");
 
-    const list = list_mod.PyList_New(dict.ma_used);
-    if (list == null) return null;
+    const list = list_mod.PyList_New(dict.ma_used) orelse return null;
 
-    const size: usize = @as(usize, 1) << @intCast(keys_struct.dk_log2_size);
+    var pos: usize = 0;
     var list_idx: isize = 0;
-
-    var i: usize = 0;
-    while (i < size) : (i += 1) {
-        if (keys_struct.entries[i].key) |key| {
-            const tuple = tuple_mod.PyTuple_New(2);
-            if (tuple == null) return null;
-
-            _ = tuple_mod.PyTuple_SetItem(tuple.?, 0, traits.incref(key));
-
-            if (keys_struct.entries[i].value) |value| {
-                _ = tuple_mod.PyTuple_SetItem(tuple.?, 1, traits.incref(value));
-            }
-
-            _ = list_mod.PyList_SetItem(list.?, list_idx, tuple.?);
-            list_idx += 1;
-        }
+    while (nextEntry(dict, &pos)) |entry| : (list_idx += 1) {
+        const tuple = tuple_mod.PyTuple_New(2) orelse {
+            traits.decref(list);
+            return null;
+        };
+        _ = tuple_mod.PyTuple_SetItem(tuple, 0, traits.incref(entry.key.?));
+        _ = tuple_mod.PyTuple_SetItem(tuple, 1, traits.incref(entry.value.?));
+        _ = list_mod.PyList_SetItem(list, list_idx, tuple);
     }
 
     return list;
@@ -528,8 +774,14 @@ fn dict_length(obj: *cpython.PyObject) callconv(.c) isize {
 }
 
 fn dict_subscript(obj: *cpython.PyObject, key: *cpython.PyObject) callconv(.c) ?*cpython.PyObject {
-    const result = PyDict_GetItem(obj, key);
-    return traits.incref(result); // Return new reference
+    const dict: *PyDictObject = @ptrCast(@alignCast(obj));
+    var value: ?*cpython.PyObject = null;
+    switch (getItem(dict, key, &value)) {
+        1 => return traits.incref(value), // Return new reference
+        0 => traits.setError("KeyError", "key not found"),
+        else => {},
+    }
+    return null;
 }
 
 fn dict_ass_subscript(obj: *cpython.PyObject, key: *cpython.PyObject, value: ?*cpython.PyObject) callconv(.c) c_int {
@@ -543,9 +795,8 @@ fn dict_ass_subscript(obj: *cpython.PyObject, key: *cpython.PyObject, value: ?*c
 fn dict_dealloc(obj: *cpython.PyObject) callconv(.c) void {
     const dict: *PyDictObject = @ptrCast(@alignCast(obj));
 
-    if (dict.ma_keys) |keys_opaque| {
-        const keys: *InternalDictKeys = @ptrCast(@alignCast(keys_opaque));
-        freeKeys(keys);
+    if (dict.ma_keys != null) {
+        releaseStorage(dictKeys(dict), dictValues(dict));
     }
 
     allocator.destroy(dict);
@@ -555,33 +806,24 @@ fn dict_dealloc(obj: *cpython.PyObject) callconv(.c) void {
 // Iteration Functions
 // ============================================================================
 
-/// PyDict_Next - Iterate over dict entries
+/// PyDict_Next - Iterate over dict entries in insertion order
 /// pos should start at 0 and will be updated on each call
 /// Returns 1 if an entry was returned, 0 when iteration is done
 export fn PyDict_Next(obj: *cpython.PyObject, ppos: *isize, pkey: ?*?*cpython.PyObject, pvalue: ?*?*cpython.PyObject) callconv(.c) c_int {
-    if (PyDict_Check(obj) == 0) return 0;
+    if (PyDict_Check(obj) == 0 or ppos.* < 0) return 0;
 
     const dict: *PyDictObject = @ptrCast(@alignCast(obj));
-    const keys: *InternalDictKeys = @ptrCast(@alignCast(dict.ma_keys));
-
-    const size: usize = @as(usize, 1) << @intCast(keys.dk_log2_size);
     var pos: usize = @intCast(ppos.*);
+    const entry = nextEntry(dict, &pos) orelse return 0;
 
-    // Find next non-empty entry
-    while (pos < size) : (pos += 1) {
-        if (keys.entries[pos].key != null) {
-            if (pkey) |pk| {
-                pk.* = keys.entries[pos].key;
-            }
-            if (pvalue) |pv| {
-                pv.* = keys.entries[pos].value;
-            }
-            ppos.* = @intCast(pos + 1);
-            return 1;
-        }
+    if (pkey) |pk| {
+        pk.* = entry.key;
     }
-
-    return 0;
+    if (pvalue) |pv| {
+        pv.* = entry.value;
+    }
+    ppos.* = @intCast(pos);
+    return 1;
 }
 
 /// PyDict_Copy - Create a shallow copy of dict
@@ -589,18 +831,9 @@ export fn PyDict_Copy(obj: *cpython.PyObject) callconv(.c) ?*cpython.PyObject {
     if (PyDict_Check(obj) == 0) return null;
 
     const new_dict = PyDict_New() orelse return null;
-
-    var pos: isize = 0;
-    var key: ?*cpython.PyObject = null;
-    var value: ?*cpython.PyObject = null;
-
-    while (PyDict_Next(obj, &pos, &key, &value) != 0) {
-        if (key != null and value != null) {
-            if (PyDict_SetItem(new_dict, key.?, value.?) < 0) {
-                traits.decref(new_dict);
-                return null;
-            }
-        }
+    if (mergeDict(@ptrCast(@alignCast(new_dict)), @ptrCast(@alignCast(obj)), true) < 0) {
+        traits.decref(new_dict);
+        return null;
     }
 
     return new_dict;
@@ -608,21 +841,7 @@ export fn PyDict_Copy(obj: *cpython.PyObject) callconv(.c) ?*cpython.PyObject {
 
 /// PyDict_Update - Update dict a with entries from dict b (a.update(b))
 export fn PyDict_Update(a: *cpython.PyObject, b: *cpython.PyObject) callconv(.c) c_int {
-    if (PyDict_Check(a) == 0 or PyDict_Check(b) == 0) return -1;
-
-    var pos: isize = 0;
-    var key: ?*cpython.PyObject = null;
-    var value: ?*cpython.PyObject = null;
-
-    while (PyDict_Next(b, &pos, &key, &value) != 0) {
-        if (key != null and value != null) {
-            if (PyDict_SetItem(a, key.?, value.?) < 0) {
-                return -1;
-            }
-        }
-    }
-
-    return 0;
+    return PyDict_Merge(a, b, 1);
 }
 
 /// PyDict_Merge - Merge dict b into dict a
@@ -630,23 +849,7 @@ export fn PyDict_Update(a: *cpython.PyObject, b: *cpython.PyObject) callconv(.c)
 export fn PyDict_Merge(a: *cpython.PyObject, b: *cpython.PyObject, override: c_int) callconv(.c) c_int {
     if (PyDict_Check(a) == 0 or PyDict_Check(b) == 0) return -1;
 
-    var pos: isize = 0;
-    var key: ?*cpython.PyObject = null;
-    var value: ?*cpython.PyObject = null;
-
-    while (PyDict_Next(b, &pos, &key, &value) != 0) {
-        if (key != null and value != null) {
-            // Check if key exists and we shouldn't override
-            if (override == 0 and PyDict_Contains(a, key.?) != 0) {
-                continue;
-            }
-            if (PyDict_SetItem(a, key.?, value.?) < 0) {
-                return -1;
-            }
-        }
-    }
-
-    return 0;
+    return mergeDict(@ptrCast(@alignCast(a)), @ptrCast(@alignCast(b)), override != 0);
 }
 
 /// PyDict_MergeFromSeq2 - Merge key-value pairs from sequence into dict
@@ -659,23 +862,27 @@ export fn PyDict_MergeFromSeq2(obj: *cpython.PyObject, seq: *cpython.PyObject, o
     return -1;
 }
 
-/// PyDict_GetItemWithError - Like GetItem but sets KeyError on failure
+/// PyDict_GetItemWithError - Like GetItem but errors are reported, not suppressed.
+/// A missing key returns null without setting an exception, as in CPython.
 export fn PyDict_GetItemWithError(obj: *cpython.PyObject, key: *cpython.PyObject) callconv(.c) ?*cpython.PyObject {
-    const result = PyDict_GetItem(obj, key);
-    if (result == null) {
-        // Set KeyError (in real CPython)
-        traits.setError("KeyError", "key not found");
-    }
-    return result;
+    if (PyDict_Check(obj) == 0) return null;
+
+    const dict: *PyDictObject = @ptrCast(@alignCast(obj));
+    var value: ?*cpython.PyObject = null;
+    _ = getItem(dict, key, &value);
+    return value;
 }
 
 /// PyDict_SetDefault - Get value or set default if key not present
 export fn PyDict_SetDefault(obj: *cpython.PyObject, key: *cpython.PyObject, default_value: *cpython.PyObject) callconv(.c) ?*cpython.PyObject {
     if (PyDict_Check(obj) == 0) return null;
 
-    // Check if key exists
-    if (PyDict_GetItem(obj, key)) |existing| {
-        return existing;
+    const dict: *PyDictObject = @ptrCast(@alignCast(obj));
+    var value: ?*cpython.PyObject = null;
+    switch (getItem(dict, key, &value)) {
+        1 => return value,
+        0 => {},
+        else => return null,
     }
 
     // Key doesn't exist, set default
@@ -690,14 +897,17 @@ export fn PyDict_SetDefault(obj: *cpython.PyObject, key: *cpython.PyObject, defa
 export fn PyDict_Pop(obj: *cpython.PyObject, key: *cpython.PyObject, default_value: ?*cpython.PyObject) callconv(.c) ?*cpython.PyObject {
     if (PyDict_Check(obj) == 0) return null;
 
-    const value = PyDict_GetItem(obj, key);
-    if (value) |v| {
-        const result = traits.incref(v); // Return new reference
-        _ = PyDict_DelItem(obj, key);
-        return result;
+    const dict: *PyDictObject = @ptrCast(@alignCast(obj));
+    var value: ?*cpython.PyObject = null;
+    switch (getItem(dict, key, &value)) {
+        1 => {
+            const result = traits.incref(value); // Return new reference
+            _ = PyDict_DelItem(obj, key);
+            return result;
+        },
+        0 => return traits.incref(default_value),
+        else => return null,
     }
-
-    return traits.incref(default_value);
 }
 
 // ============================================================================
@@ -727,7 +937,6 @@ pub const PyDictKV = extern struct {
 /// 3-5x faster than calling PyDict_SetItem in a loop
 /// - Single type check
 /// - Pre-computed resize
-/// - Bulk hash computation possible
 ///
 /// Example:
 ///   var pairs = [_]PyDictKV{ .{ .key = k1, .value = v1 }, .{ .key = k2, .value = v2 } };
@@ -736,7 +945,7 @@ export fn PyDict_SetItemBatch(obj: *cpython.PyObject, pairs: [*]const PyDictKV,
     if (count == 0) return 0;
     if (PyDict_Check(obj) == 0) return -1;
 
-    // Insert each pair (could be optimized further with pre-resize)
+    if (!reserve(@ptrCast(@alignCast(obj)), count)) return -1;
     for (0..count) |i| {
         if (PyDict_SetItem(obj, pairs[i].key, pairs[i].value) < 0) {
             return -1;
@@ -750,6 +959,10 @@ export fn PyDict_SetItemBatch(obj: *cpython.PyObject, pairs: [*]const PyDictKV,
 /// Faster than New + multiple SetItem
 export fn PyDict_FromArrays(keys: [*]*cpython.PyObject, values: [*]*cpython.PyObject, count: usize) callconv(.c) ?*cpython.PyObject {
     const dict = PyDict_New() orelse return null;
+    if (!reserve(@ptrCast(@alignCast(dict)), count)) {
+        traits.decref(dict);
+        return null;
+    }
 
     for (0..count) |i| {
         if (PyDict_SetItem(dict, keys[i], values[i]) < 0) {
@@ -764,6 +977,10 @@ export fn PyDict_FromArrays(keys: [*]*cpython.PyObject, values: [*]*cpython.PyOb
 /// Create dict from key-value pairs array
 export fn PyDict_FromPairs(pairs: [*]const PyDictKV, count: usize) callconv(.c) ?*cpython.PyObject {
     const dict = PyDict_New() orelse return null;
+    if (!reserve(@ptrCast(@alignCast(dict)), count)) {
+        traits.decref(dict);
+        return null;
+    }
 
     for (0..count) |i| {
         if (PyDict_SetItem(dict, pairs[i].key, pairs[i].value) < 0) {
@@ -818,3 +1035,74 @@ test "dict exports" {
     _ = PyDict_SetDefault;
     _ = PyDict_Pop;
 }
+
+test "dict matches equal keys and keeps insertion order" {
+    const dict = PyDict_New().?;
+    defer traits.decref(dict);
+
+    const key = pyunicode.PyUnicode_FromString("alpha").?;
+    defer traits.decref(key);
+    const same_key = pyunicode.PyUnicode_FromString("alpha").?;
+    defer traits.decref(same_key);
+    try std.testing.expect(key != same_key);
+
+    try std.testing.expectEqual(@as(c_int, 0), PyDict_SetItem(dict, key, key));
+    try std.testing.expectEqual(@as(c_int, 0), PyDict_SetItem(dict, same_key, same_key));
+    try std.testing.expectEqual(@as(isize, 1), PyDict_Size(dict));
+    try std.testing.expectEqual(same_key, PyDict_GetItem(dict, key).?);
+
+    // Grow through several resizes, deleting as we go
+    var buf: [16]u8 = undefined;
+    for (0..100) |i| {
+        const name = try std.fmt.bufPrintZ(&buf, "k{d}", .{i});
+        const k = pyunicode.PyUnicode_FromString(name).?;
+        defer traits.decref(k);
+        try std.testing.expectEqual(@as(c_int, 0), PyDict_SetItem(dict, k, k));
+    }
+    try std.testing.expectEqual(@as(c_int, 0), PyDict_DelItemString(dict, "alpha"));
+    try std.testing.expectEqual(@as(c_int, 0), PyDict_SetItemString(dict, "alpha", key));
+    try std.testing.expectEqual(@as(isize, 101), PyDict_Size(dict));
+
+    var pos: isize = 0;
+    var k: ?*cpython.PyObject = null;
+    var i: usize = 0;
+    while (PyDict_Next(dict, &pos, &k, null) != 0) : (i += 1) {
+        const expected = if (i < 100) try std.fmt.bufPrint(&buf, "k{d}", .{i}) else "alpha";
+        try std.testing.expectEqualStrings(expected, pyunicode.asUTF8Slice(k.?).?);
+    }
+    try std.testing.expectEqual(@as(usize, 101), i);
+}
+
+test "instance dicts share keys until they diverge" {
+    var heap_type: cpython.PyTypeObject = undefined;
+    heap_type.tp_flags = cpython.Py_TPFLAGS_HEAPTYPE;
+
+    const a = newInstanceDict(&heap_type).?;
+    defer traits.decref(a);
+    const b = newInstanceDict(&heap_type).?;
+    defer traits.decref(b);
+
+    const value = pyunicode.PyUnicode_FromString("v").?;
+    defer traits.decref(value);
+
+    try std.testing.expectEqual(@as(c_int, 0), PyDict_SetItemString(a, "x", value));
+    try std.testing.expectEqual(@as(c_int, 0), PyDict_SetItemString(b, "y", value));
+    try std.testing.expectEqual(@as(c_int, 0), PyDict_SetItemString(b, "x", value));
+
+    const dict_a: *PyDictObject = @ptrCast(@alignCast(a));
+    const dict_b: *PyDictObject = @ptrCast(@alignCast(b));
+    try std.testing.expect(dict_a.ma_keys == dict_b.ma_keys);
+    try std.testing.expect(PyDict_GetItemString(a, "y") == null);
+
+    // b iterates in its own insertion order
+    var pos: isize = 0;
+    var k: ?*cpython.PyObject = null;
+    try std.testing.expectEqual(@as(c_int, 1), PyDict_Next(b, &pos, &k, null));
+    try std.testing.expectEqualStrings("y", pyunicode.asUTF8Slice(k.?).?);
+
+    // A non-str key moves b to its own combined table
+    try std.testing.expectEqual(@as(c_int, 0), PyDict_SetItem(b, a, value));
+    try std.testing.expect(dict_b.ma_values == null);
+    try std.testing.expectEqual(@as(isize, 3), PyDict_Size(b));
+    try std.testing.expect(PyDict_GetItemString(b, "x") == value);
+}
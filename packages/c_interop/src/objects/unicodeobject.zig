@@ -240,6 +240,17 @@ pub fn asUTF8(obj: *cpython.PyObject) ?[*:0]const u8 {
     return compact_obj.utf8;
 }
 
+/// UTF-8 bytes of the string, excluding the terminating NUL
+pub fn asUTF8Slice(obj: *cpython.PyObject) ?[]const u8 {
+    const str = asUTF8(obj) orelse return null;
+    const ascii_obj: *PyASCIIObject = @ptrCast(@alignCast(obj));
+    if (isAscii(ascii_obj.state)) {
+        return str[0..@intCast(ascii_obj.length)];
+    }
+    const compact_obj: *PyCompactUnicodeObject = @ptrCast(@alignCast(obj));
+    return str[0..@intCast(compact_obj.utf8_length)];
+}
+
 // NOTE: All PyUnicode_* functions are exported from cpython_unicode.zig
 // to avoid duplicate exports. This file provides:
 // - PyUnicodeObject type definition and helpers
@@ -343,24 +354,16 @@ fn unicode_hash(obj: *cpython.PyObject) callconv(.c) isize {
     }
 
     // Compute hash using SipHash-like algorithm
-    const str = asUTF8(obj);
-    if (str == null) return 0;
-
-    var len: usize = undefined;
-    if (isAscii(ascii_obj.state)) {
-        len = @intCast(ascii_obj.length);
-    } else {
-        const compact_obj: *PyCompactUnicodeObject = @ptrCast(@alignCast(obj));
-        len = @intCast(compact_obj.utf8_length);
-    }
+    const str = asUTF8Slice(obj) orelse return 0;
 
-    var hash: u64 = 0;
-    var i: usize = 0;
-    while (i < len) : (i += 1) {
-        hash = hash *% 1000003 +% str.?[i];
+    var hash: usize = 0;
+    for (str) |c| {
+        hash = hash *% 1000003 +% c;
     }
 
-    const result: isize = @intCast(hash);
+    // Reinterpret the bits; -1 means "not cached", so map it to -2 like CPython
+    var result: isize = @bitCast(hash);
+    if (result == -1) result = -2;
     ascii_obj.hash = result;
     return result;
 }
@@ -389,6 +392,15 @@ test "PyUnicode creation and access" {
     try std.testing.expectEqualStrings("hello", std.mem.span(str.?));
 }
 
+test "unicode_hash wraps high-bit hashes" {
+    // "abcdefgh" hashes above maxInt(i64) on 64-bit targets
+    const obj = PyUnicode_FromString("abcdefgh").?;
+    const h = unicode_hash(obj);
+    try std.testing.expect(h != -1);
+    if (@bitSizeOf(isize) == 64) try std.testing.expect(h < 0);
+    try std.testing.expectEqual(h, unicode_hash(obj));
+}
+
 test "unicode internal helpers" {
     _ = PyUnicode_FromString;
     _ = PyUnicode_FromStringAndSize;
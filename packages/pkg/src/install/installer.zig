@@ -1,7 +1,8 @@
 //! Wheel Installer
 //!
 //! Downloads and installs Python wheel packages to site-packages.
-//! Uses HTTP/2 multiplexing for parallel downloads.
+//! Uses HTTP/2 multiplexing for parallel downloads, streamed to disk and
+//! unpacked once into a shared content-addressed store (see store.zig).
 //!
 //! ## Wheel Format (PEP 427)
 //! A wheel is a ZIP archive with:
@@ -14,6 +15,8 @@ const std = @import("std");
 const h2 = @import("h2");
 const builtin = @import("builtin");
 const record = @import("../parse/record.zig");
+const store_mod = @import("store.zig");
+const Store = store_mod.Store;
 
 pub const InstallerError = error{
     NoWheelUrl,
@@ -31,7 +34,11 @@ pub const InstallResult = struct {
     name: []const u8,
     version: []const u8,
     files_installed: usize,
+    /// Bytes downloaded (0 when the wheel was already in the store)
     size_bytes: u64,
+    /// Why this package was not installed (null on success); one failed
+    /// wheel does not stop the others
+    err: ?anyerror = null,
 };
 
 /// Installer configuration
@@ -42,6 +49,8 @@ pub const InstallerConfig = struct {
     verify_hashes: bool = true,
     /// Show progress output
     show_progress: bool = true,
+    /// Content-addressed wheel store (~/.metal0/store if null)
+    store_dir: ?[]const u8 = null,
 };
 
 /// Package installer
@@ -229,36 +238,71 @@ pub const Installer = struct {
     }
 
     /// Install packages from resolved wheel URLs
+    ///
+    /// Wheels stream to disk (hashed as the bytes arrive) instead of being
+    /// buffered in memory. Each finished download is extracted into the
+    /// content-addressed store and linked into site-packages on a worker
+    /// pool while the other downloads are still in flight. Wheels already
+    /// in the store are not downloaded at all.
     pub fn installPackages(
         self: *Installer,
         packages: []const PackageInfo,
     ) ![]InstallResult {
         if (packages.len == 0) return &[_]InstallResult{};
 
-        // Collect URLs for download
-        var pypi_urls = std.ArrayList([]const u8){};
-        defer pypi_urls.deinit(self.allocator);
-
-        var url_to_pkg = std.StringHashMap(usize).init(self.allocator);
-        defer url_to_pkg.deinit();
+        var store = try Store.init(self.allocator, self.config.store_dir);
+        defer store.deinit();
+        std.fs.cwd().makePath(self.site_packages) catch {};
 
-        for (packages, 0..) |pkg, i| {
-            if (pkg.wheel_url) |url| {
-                try pypi_urls.append(self.allocator, url);
-                try url_to_pkg.put(url, i);
+        const jobs = try self.allocator.alloc(WheelJob, packages.len);
+        defer self.allocator.free(jobs);
+        var job_count: usize = 0;
+        defer for (jobs[0..job_count]) |*job| job.deinit();
+
+        // Declared after jobs so it is joined before they are torn down
+        var pool: std.Thread.Pool = undefined;
+        try pool.init(.{ .allocator = self.allocator });
+        defer pool.deinit();
+        var wg: std.Thread.WaitGroup = .{};
+
+        var urls = std.ArrayList([]const u8){};
+        defer urls.deinit(self.allocator);
+        var sinks = std.ArrayList(h2.BodySink){};
+        defer sinks.deinit(self.allocator);
+
+        for (packages) |pkg| {
+            const url = pkg.wheel_url orelse continue;
+            const job = &jobs[job_count];
+            job.* = .{ .installer = self, .store = &store, .pkg = pkg, .pool = &pool, .wg = &wg };
+            job_count += 1;
+
+            if (job.cachedHash()) |hash| {
+                job.hash = hash;
+                pool.spawnWg(&wg, WheelJob.install, .{job});
+                continue;
             }
+            job.begin() catch |err| {
+                job.err = err;
+                continue;
+            };
+            try urls.append(self.allocator, url);
+            try sinks.append(self.allocator, job.sink());
         }
 
         // Download all wheels in parallel using H2 multiplexing
-        const wheel_data = try self.downloadWheelsParallel(pypi_urls.items);
-        defer {
-            for (wheel_data) |data| {
-                if (data) |d| self.allocator.free(d);
+        if (urls.items.len > 0) {
+            var h2_client = h2.Client.init(self.allocator);
+            defer h2_client.deinit();
+
+            if (h2_client.getAllStreaming(urls.items, sinks.items)) |responses| {
+                for (responses) |*resp| resp.deinit();
+                self.allocator.free(responses);
+            } else |err| {
+                std.debug.print("H2 getAll failed: {any}\n", .{err});
             }
-            self.allocator.free(wheel_data);
         }
+        pool.waitAndWork(&wg);
 
-        // Install each wheel
         var results = std.ArrayList(InstallResult){};
         errdefer {
             for (results.items) |r| {
@@ -268,83 +312,29 @@ pub const Installer = struct {
             results.deinit(self.allocator);
         }
 
-        for (pypi_urls.items, 0..) |url, i| {
-            const pkg_idx = url_to_pkg.get(url) orelse continue;
-            const pkg = packages[pkg_idx];
-            const data = wheel_data[i] orelse continue;
-
-            // Verify hash if configured
-            if (self.config.verify_hashes) {
-                if (pkg.sha256) |expected_hash| {
-                    var hasher = std.crypto.hash.sha2.Sha256.init(.{});
-                    hasher.update(data);
-                    var hash_buf: [64]u8 = undefined;
-                    const actual_hash = std.fmt.bytesToHex(hasher.finalResult(), .lower);
-                    @memcpy(hash_buf[0..64], &actual_hash);
-                    if (!std.mem.eql(u8, hash_buf[0..64], expected_hash)) {
-                        continue; // Skip invalid wheel
-                    }
-                }
-            }
-
-            // Extract wheel to site-packages
-            const result = try self.extractWheel(data, pkg.name, pkg.version);
-            try results.append(self.allocator, result);
+        for (jobs[0..job_count]) |*job| {
+            // A job with no error that never installed was never fetched
+            // (the batch request itself failed)
+            const failure: ?anyerror = job.err orelse if (job.installed) null else error.DownloadFailed;
+
+            const name = try self.allocator.dupe(u8, job.pkg.name);
+            errdefer self.allocator.free(name);
+            const version = try self.allocator.dupe(u8, job.pkg.version);
+            errdefer self.allocator.free(version);
+            try results.append(self.allocator, .{
+                .name = name,
+                .version = version,
+                .files_installed = if (failure == null) job.files_installed else 0,
+                .size_bytes = job.size,
+                .err = failure,
+            });
         }
 
         return try results.toOwnedSlice(self.allocator);
     }
 
-    /// Download wheels in parallel using H2 multiplexing
-    fn downloadWheelsParallel(self: *Installer, urls: []const []const u8) ![]?[]const u8 {
-        if (urls.len == 0) return &[_]?[]const u8{};
-
-        var results = try self.allocator.alloc(?[]const u8, urls.len);
-        @memset(results, null);
-        errdefer {
-            for (results) |r| {
-                if (r) |data| self.allocator.free(data);
-            }
-            self.allocator.free(results);
-        }
-
-        // Use H2 Client with getAll for parallel fetching
-        var h2_client = h2.Client.init(self.allocator);
-        defer h2_client.deinit();
-
-        // Fetch all wheels using full URLs
-        const responses = h2_client.getAll(urls) catch |err| {
-            std.debug.print("H2 getAll failed: {any}\n", .{err});
-            return results;
-        };
-        defer {
-            for (0..responses.len) |j| {
-                var r = &responses[j];
-                r.deinit();
-            }
-            self.allocator.free(responses);
-        }
-
-        // Copy response bodies to results
-        for (responses, 0..) |resp, i| {
-            if (resp.status == 200) {
-                if (resp.body.len > 0) {
-                    results[i] = try self.allocator.dupe(u8, resp.body);
-                }
-            }
-        }
-
-        return results;
-    }
-
-    /// Extract wheel ZIP to site-packages
-    fn extractWheel(
-        self: *Installer,
-        wheel_data: []const u8,
-        name: []const u8,
-        version: []const u8,
-    ) !InstallResult {
-        // Remove existing package directories if they exist
+    /// Remove a previous install of this package from site-packages
+    fn removeExisting(self: *Installer, name: []const u8, version: []const u8) !void {
         // Convert name to filesystem form (e.g., charset-normalizer -> charset_normalizer)
         var fs_name_buf: [256]u8 = undefined;
         var fs_name_len: usize = 0;
@@ -363,43 +353,104 @@ pub const Installer = struct {
         const pkg_dir = try std.fmt.allocPrint(self.allocator, "{s}/{s}", .{ self.site_packages, fs_name });
         defer self.allocator.free(pkg_dir);
         std.fs.cwd().deleteTree(pkg_dir) catch {};
+    }
+};
 
-        // Write wheel to temp file (std.zip requires File.Reader)
-        const tmp_path = try std.fmt.allocPrint(self.allocator, "/tmp/metal0-wheel-{s}-{s}.whl", .{ name, version });
-        defer self.allocator.free(tmp_path);
+/// One wheel on its way from PyPI into site-packages.
+/// onData/onFinish run on the h2 thread serving the wheel's host;
+/// install runs on the extraction pool.
+const WheelJob = struct {
+    installer: *Installer,
+    store: *const Store,
+    pkg: PackageInfo,
+    pool: *std.Thread.Pool,
+    wg: *std.Thread.WaitGroup,
+
+    // Download state (null when served from the store)
+    tmp_path: ?[]u8 = null,
+    file: ?std.fs.File = null,
+    hasher: std.crypto.hash.sha2.Sha256 = std.crypto.hash.sha2.Sha256.init(.{}),
+    size: u64 = 0,
+
+    hash: store_mod.Hash = undefined,
+    err: ?anyerror = null,
+    installed: bool = false,
+    files_installed: usize = 0,
+
+    /// The expected hash, if that tree is already in the store
+    fn cachedHash(self: *const WheelJob) ?store_mod.Hash {
+        const expected = self.pkg.sha256 orelse return null;
+        if (expected.len != 64) return null;
+        const hash: store_mod.Hash = expected[0..64].*;
+        return if (self.store.hasTree(&hash)) hash else null;
+    }
 
-        {
-            const tmp_file = try std.fs.cwd().createFile(tmp_path, .{});
-            defer tmp_file.close();
-            try tmp_file.writeAll(wheel_data);
-        }
-        defer std.fs.cwd().deleteFile(tmp_path) catch {};
+    fn begin(self: *WheelJob) !void {
+        const tmp_path = try self.store.tmpPath(self.pkg.name);
+        errdefer self.installer.allocator.free(tmp_path);
+        self.file = try std.fs.cwd().createFile(tmp_path, .{});
+        self.tmp_path = tmp_path;
+    }
 
-        // Open and extract
-        const file = try std.fs.cwd().openFile(tmp_path, .{});
-        defer file.close();
+    fn sink(self: *WheelJob) h2.BodySink {
+        return .{ .context = self, .writeFn = onData, .finishFn = onFinish };
+    }
 
-        var read_buffer: [8192]u8 = undefined;
-        var file_reader = file.reader(&read_buffer);
+    fn onData(context: *anyopaque, data: []const u8) void {
+        const self: *WheelJob = @ptrCast(@alignCast(context));
+        if (self.err != null) return;
+        self.hasher.update(data);
+        self.size += data.len;
+        self.file.?.writeAll(data) catch |err| {
+            self.err = err;
+        };
+    }
 
-        // Create site-packages dir if needed
-        std.fs.cwd().makePath(self.site_packages) catch {};
+    fn onFinish(context: *anyopaque, status: ?u16) void {
+        const self: *WheelJob = @ptrCast(@alignCast(context));
+        self.file.?.close();
+        self.file = null;
 
-        var dest_dir = try std.fs.cwd().openDir(self.site_packages, .{});
-        defer dest_dir.close();
+        if (self.err == null and ((status orelse 0) != 200 or self.size == 0)) self.err = error.DownloadFailed;
+        if (self.err != null) return;
 
-        // Use std.zip.extract
-        std.zip.extract(dest_dir, &file_reader, .{}) catch |err| {
-            std.debug.print("ZIP extract failed for {s}: {any}\n", .{ name, err });
-            return error.ExtractionFailed;
-        };
+        self.hash = std.fmt.bytesToHex(self.hasher.finalResult(), .lower);
+        if (self.installer.config.verify_hashes) {
+            if (self.pkg.sha256) |expected_hash| {
+                if (!std.mem.eql(u8, &self.hash, expected_hash)) {
+                    self.err = error.HashMismatch;
+                    return;
+                }
+            }
+        }
+        self.pool.spawnWg(self.wg, install, .{self});
+    }
 
-        return .{
-            .name = try self.allocator.dupe(u8, name),
-            .version = try self.allocator.dupe(u8, version),
-            .files_installed = 1, // TODO: count actual files
-            .size_bytes = wheel_data.len,
+    fn install(self: *WheelJob) void {
+        self.installInto() catch |err| {
+            self.err = err;
+            return;
         };
+        self.installed = true;
+    }
+
+    fn installInto(self: *WheelJob) !void {
+        if (self.tmp_path) |path| {
+            self.store.addWheel(path, &self.hash) catch |err| {
+                std.debug.print("ZIP extract failed for {s}: {any}\n", .{ self.pkg.name, err });
+                return error.ExtractionFailed;
+            };
+        }
+        try self.installer.removeExisting(self.pkg.name, self.pkg.version);
+        self.files_installed = try self.store.linkTree(&self.hash, self.installer.site_packages);
+    }
+
+    fn deinit(self: *WheelJob) void {
+        if (self.file) |file| file.close();
+        if (self.tmp_path) |path| {
+            std.fs.cwd().deleteFile(path) catch {};
+            self.installer.allocator.free(path);
+        }
     }
 };
 
@@ -0,0 +1,189 @@
+//! Content-Addressed Wheel Store
+//!
+//! Every wheel is extracted once per machine, keyed by its SHA-256:
+//! - {root}/trees/{sha256}/  - extracted wheel contents
+//! - {root}/tmp/             - downloads and extractions in progress
+//!
+//! site-packages is populated from trees/ by hardlink, falling back to
+//! reflink (Linux FICLONE) and then a plain copy when the store lives on
+//! another filesystem. Identical wheels are never downloaded or extracted
+//! twice, however many environments use them.
+//!
+//! Entries only appear via rename(), so concurrent installers never see a
+//! half-written tree.
+
+const std = @import("std");
+const builtin = @import("builtin");
+
+/// Hex SHA-256 of a wheel file
+pub const Hash = [64]u8;
+
+pub const Store = struct {
+    allocator: std.mem.Allocator,
+    root: []const u8,
+
+    /// Open (creating if needed) the store at `root`, or ~/.metal0/store
+    pub fn init(allocator: std.mem.Allocator, root: ?[]const u8) !Store {
+        const path = if (root) |r|
+            try allocator.dupe(u8, r)
+        else blk: {
+            const home = std.posix.getenv("HOME") orelse return error.NoStoreDir;
+            break :blk try std.fmt.allocPrint(allocator, "{s}/.metal0/store", .{home});
+        };
+        errdefer allocator.free(path);
+
+        var dir = try std.fs.cwd().makeOpenPath(path, .{});
+        defer dir.close();
+        try dir.makePath("trees");
+        try dir.makePath("tmp");
+
+        return .{ .allocator = allocator, .root = path };
+    }
+
+    pub fn deinit(self: *Store) void {
+        self.allocator.free(self.root);
+    }
+
+    pub fn treePath(self: *const Store, hash: *const Hash) ![]u8 {
+        return std.fmt.allocPrint(self.allocator, "{s}/trees/{s}", .{ self.root, hash });
+    }
+
+    pub fn hasTree(self: *const Store, hash: *const Hash) bool {
+        var buf: [std.fs.max_path_bytes]u8 = undefined;
+        const path = std.fmt.bufPrint(&buf, "{s}/trees/{s}", .{ self.root, hash }) catch return false;
+        std.fs.cwd().access(path, .{}) catch return false;
+        return true;
+    }
+
+    /// Unique scratch path under tmp/ (caller creates and removes it)
+    pub fn tmpPath(self: *const Store, name: []const u8) ![]u8 {
+        return std.fmt.allocPrint(self.allocator, "{s}/tmp/{s}-{x}", .{ self.root, name, std.crypto.random.int(u64) });
+    }
+
+    /// Extract the verified wheel at `wheel_path` into trees/{hash}.
+    /// A tree that already exists (e.g. from a concurrent install) wins.
+    pub fn addWheel(self: *const Store, wheel_path: []const u8, hash: *const Hash) !void {
+        if (self.hasTree(hash)) return;
+
+        const staging = try self.tmpPath(hash);
+        defer self.allocator.free(staging);
+        errdefer std.fs.cwd().deleteTree(staging) catch {};
+
+        {
+            var dest = try std.fs.cwd().makeOpenPath(staging, .{});
+            defer dest.close();
+
+            const file = try std.fs.cwd().openFile(wheel_path, .{});
+            defer file.close();
+            var read_buffer: [64 * 1024]u8 = undefined;
+            var file_reader = file.reader(&read_buffer);
+            try std.zip.extract(dest, &file_reader, .{});
+        }
+
+        const tree = try self.treePath(hash);
+        defer self.allocator.free(tree);
+        std.fs.cwd().rename(staging, tree) catch |err| {
+            if (!self.hasTree(hash)) return err;
+            std.fs.cwd().deleteTree(staging) catch {};
+        };
+    }
+
+    /// Populate `dest_path` with the files of trees/{hash}; returns the
+    /// number of files linked. Existing files are replaced.
+    pub fn linkTree(self: *const Store, hash: *const Hash, dest_path: []const u8) !usize {
+        const tree_path = try self.treePath(hash);
+        defer self.allocator.free(tree_path);
+
+        var tree = try std.fs.cwd().openDir(tree_path, .{ .iterate = true });
+        defer tree.close();
+        var dest = try std.fs.cwd().makeOpenPath(dest_path, .{});
+        defer dest.close();
+
+        var walker = try tree.walk(self.allocator);
+        defer walker.deinit();
+
+        var mode: LinkMode = .hardlink;
+        var files: usize = 0;
+        while (try walker.next()) |entry| {
+            switch (entry.kind) {
+                .directory => try dest.makePath(entry.path),
+                .file => {
+                    dest.deleteFile(entry.path) catch |err| switch (err) {
+                        error.FileNotFound => {},
+                        else => return err,
+                    };
+                    try linkFile(&mode, tree, dest, entry.path);
+                    files += 1;
+                },
+                else => {},
+            }
+        }
+        return files;
+    }
+};
+
+/// How files get from the store into an environment; downgraded the first
+/// time a cheaper mode is unavailable so later files skip the failed syscall
+const LinkMode = enum { hardlink, reflink, copy };
+
+fn linkFile(mode: *LinkMode, src_dir: std.fs.Dir, dest_dir: std.fs.Dir, path: []const u8) !void {
+    if (mode.* == .hardlink) {
+        std.posix.linkat(src_dir.fd, path, dest_dir.fd, path, 0) catch |err| switch (err) {
+            error.NotSameFileSystem, error.AccessDenied => mode.* = .reflink,
+            else => return err,
+        };
+        if (mode.* == .hardlink) return;
+    }
+    if (mode.* == .reflink) {
+        if (reflinkFile(src_dir, dest_dir, path)) return;
+        mode.* = .copy;
+    }
+    try src_dir.copyFile(path, dest_dir, path, .{});
+}
+
+/// Copy-on-write clone (btrfs, XFS, ...); false if unsupported here
+fn reflinkFile(src_dir: std.fs.Dir, dest_dir: std.fs.Dir, path: []const u8) bool {
+    if (builtin.os.tag != .linux) return false;
+    const FICLONE = 0x40049409;
+
+    const src = src_dir.openFile(path, .{}) catch return false;
+    defer src.close();
+    const mode = (src.stat() catch return false).mode;
+    const dst = dest_dir.createFile(path, .{ .mode = mode }) catch return false;
+    defer dst.close();
+
+    const rc = std.os.linux.ioctl(dst.handle, FICLONE, @intCast(src.handle));
+    if (std.os.linux.E.init(rc) == .SUCCESS) return true;
+    dest_dir.deleteFile(path) catch {};
+    return false;
+}
+
+test "store links trees into site-packages" {
+    const allocator = std.testing.allocator;
+    var tmp = std.testing.tmpDir(.{});
+    defer tmp.cleanup();
+
+    const root = try tmp.dir.realpathAlloc(allocator, ".");
+    defer allocator.free(root);
+    const store_path = try std.fmt.allocPrint(allocator, "{s}/store", .{root});
+    defer allocator.free(store_path);
+    const site_path = try std.fmt.allocPrint(allocator, "{s}/site", .{root});
+    defer allocator.free(site_path);
+
+    var store = try Store.init(allocator, store_path);
+    defer store.deinit();
+
+    const hash: Hash = ("ab" ** 32).*;
+    try std.testing.expect(!store.hasTree(&hash));
+    try tmp.dir.makePath("store/trees/" ++ hash ++ "/pkg");
+    try tmp.dir.writeFile(.{ .sub_path = "store/trees/" ++ hash ++ "/pkg/__init__.py", .data = "x = 1\n" });
+    try std.testing.expect(store.hasTree(&hash));
+
+    try std.testing.expectEqual(@as(usize, 1), try store.linkTree(&hash, site_path));
+    // Linking again replaces rather than failing
+    try std.testing.expectEqual(@as(usize, 1), try store.linkTree(&hash, site_path));
+
+    const content = try tmp.dir.readFileAlloc(allocator, "site/pkg/__init__.py", 64);
+    defer allocator.free(content);
+    try std.testing.expectEqualStrings("x = 1\n", content);
+}
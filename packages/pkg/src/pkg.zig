@@ -37,6 +37,7 @@ pub const pubgrub = @import("pubgrub/pubgrub.zig");
 
 // Phase 4: Installer
 pub const installer = @import("install/installer.zig");
+pub const store = @import("install/store.zig");
 
 // Conformance tests (from Python packaging library)
 pub const pep440_conformance = @import("parse/pep440_conformance.zig");
@@ -75,6 +76,7 @@ pub const PyPIProvider = pubgrub.PyPIProvider;
 pub const Installer = installer.Installer;
 pub const PackageInfo = installer.PackageInfo;
 pub const InstallResult = installer.InstallResult;
+pub const Store = store.Store;
 
 test {
     std.testing.refAllDecls(@This());
@@ -2,6 +2,7 @@
 /// Converts NFA subset construction to a cached DFA for O(n) matching
 const std = @import("std");
 const nfa_mod = @import("nfa.zig");
+const PikeVM = @import("pikevm.zig").PikeVM;
 const NFA = nfa_mod.NFA;
 const StateId = nfa_mod.StateId;
 const Transition = nfa_mod.Transition;
@@ -146,6 +147,35 @@ inline fn scanDigits(text: []const u8, start: usize) ?struct { start: usize, end
 const DfaStateId = u32;
 const DEAD_STATE: DfaStateId = 0;
 const START_STATE: DfaStateId = 1;
+/// Transition not computed yet
+const UNKNOWN_STATE: DfaStateId = std.math.maxInt(DfaStateId);
+
+/// Memory budget for the state cache (defaults follow Rust's regex-automata)
+pub const Config = struct {
+    /// Approximate bytes of DFA states kept before the cache is cleared
+    cache_capacity: usize = 2 * 1024 * 1024,
+    /// Clears tolerated before the thrashing check applies
+    min_cache_clears: usize = 3,
+    /// Give up on the DFA if fewer bytes than this are scanned per state built
+    min_bytes_per_state: usize = 10,
+};
+
+/// Cache counters, for tuning Config
+pub const Stats = struct {
+    /// Transitions served from the cache
+    hits: u64 = 0,
+    /// Transitions computed from the NFA
+    misses: u64 = 0,
+    /// Times the cache was cleared for exceeding cache_capacity
+    resets: u64 = 0,
+    /// Searches run on the PikeVM after the DFA gave up
+    fallbacks: u64 = 0,
+};
+
+/// Approximate heap cost of one cached DFA state
+fn stateMemoryUsage(nfa_state_count: usize) usize {
+    return @sizeOf(DfaState) + nfa_state_count * @sizeOf(StateId) + @sizeOf(u64) + @sizeOf(DfaStateId);
+}
 
 /// Match result
 pub const Match = struct {
@@ -171,10 +201,8 @@ const DfaState = struct {
             .is_match = is_match,
         };
 
-        // Initialize all transitions to DEAD_STATE
-        for (&state.transitions) |*t| {
-            t.* = DEAD_STATE;
-        }
+        // Transitions are computed on first use
+        @memset(&state.transitions, UNKNOWN_STATE);
 
         return state;
     }
@@ -193,6 +221,18 @@ fn hashStateSet(states: []const StateId) u64 {
     return hasher.final();
 }
 
+/// Sort and remove duplicates so equal sets hash equally
+fn normalizeStateSet(states: *std.ArrayList(StateId)) void {
+    std.mem.sort(StateId, states.items, {}, comptime std.sort.asc(StateId));
+    var len: usize = 0;
+    for (states.items) |state| {
+        if (len > 0 and states.items[len - 1] == state) continue;
+        states.items[len] = state;
+        len += 1;
+    }
+    states.shrinkRetainingCapacity(len);
+}
+
 /// Check if two state sets are equal
 fn stateSetEqual(a: []const StateId, b: []const StateId) bool {
     if (a.len != b.len) return false;
@@ -227,7 +267,20 @@ pub const LazyDFA = struct {
     /// Fast path for Word Boundary pattern (\b[a-z]{4,}\b)
     use_word_boundary_fast_path: bool,
 
+    config: Config,
+    stats: Stats = .{},
+    /// Approximate bytes held by cached states
+    cache_bytes: usize = 0,
+    /// hits + misses at the last cache clear
+    bytes_at_clear: u64 = 0,
+    /// Set once the cache thrashes; every later search runs on the PikeVM
+    gave_up: bool = false,
+
     pub fn init(allocator: std.mem.Allocator, nfa_ptr: *const NFA) LazyDFA {
+        return initWithConfig(allocator, nfa_ptr, .{});
+    }
+
+    pub fn initWithConfig(allocator: std.mem.Allocator, nfa_ptr: *const NFA, config: Config) LazyDFA {
         return .{
             .nfa = nfa_ptr,
             .allocator = allocator,
@@ -239,6 +292,7 @@ pub const LazyDFA = struct {
             .use_url_fast_path = false,
             .use_digits_fast_path = false,
             .use_word_boundary_fast_path = false,
+            .config = config,
         };
     }
 
@@ -277,6 +331,43 @@ pub const LazyDFA = struct {
 
     /// Find first match in text
     pub fn find(self: *LazyDFA, text: []const u8) !?Match {
+        if (!self.gave_up) {
+            if (self.findDfa(text)) |result| return result else |err| if (err != error.CacheThrashing) return err;
+        }
+        self.stats.fallbacks += 1;
+        var vm = PikeVM.init(self.allocator, self.nfa);
+        var m = (try vm.find(text)) orelse return null;
+        defer m.deinit(self.allocator);
+        return .{ .start = m.span.start, .end = m.span.end };
+    }
+
+    /// Find all matches in text (like Rust find_iter)
+    /// Falls back to the PikeVM if the DFA cache thrashes
+    pub fn findAll(self: *LazyDFA, text: []const u8, allocator: std.mem.Allocator) ![]Match {
+        if (!self.gave_up) {
+            if (self.findAllDfa(text, allocator)) |result| return result else |err| if (err != error.CacheThrashing) return err;
+        }
+        self.stats.fallbacks += 1;
+        return self.findAllPike(text, allocator);
+    }
+
+    fn findAllPike(self: *LazyDFA, text: []const u8, allocator: std.mem.Allocator) ![]Match {
+        var matches = std.ArrayList(Match){};
+        errdefer matches.deinit(allocator);
+
+        var vm = PikeVM.init(self.allocator, self.nfa);
+        var pos: usize = 0;
+        while (pos < text.len) {
+            var m = (try vm.findFrom(text, pos)) orelse break;
+            defer m.deinit(self.allocator);
+            try matches.append(allocator, .{ .start = m.span.start, .end = m.span.end });
+            // Empty match, advance by 1 to avoid infinite loop
+            pos = if (m.span.end > m.span.start) m.span.end else m.span.end + 1;
+        }
+        return matches.toOwnedSlice(allocator);
+    }
+
+    fn findDfa(self: *LazyDFA, text: []const u8) !?Match {
         // Try matching at each starting position
         var start: usize = 0;
         while (start <= text.len) : (start += 1) {
@@ -287,8 +378,7 @@ pub const LazyDFA = struct {
         return null;
     }
 
-    /// Find all matches in text (like Rust find_iter)
-    pub fn findAll(self: *LazyDFA, text: []const u8, allocator: std.mem.Allocator) ![]Match {
+    fn findAllDfa(self: *LazyDFA, text: []const u8, allocator: std.mem.Allocator) ![]Match {
         if (text.len == 0) return allocator.alloc(Match, 0);
 
         // Initialize DFA if needed
@@ -317,6 +407,7 @@ pub const LazyDFA = struct {
         }
 
         var matches = std.ArrayList(Match){};
+        errdefer matches.deinit(allocator);
 
         var search_start: usize = 0;
         while (search_start < text.len) {
@@ -377,6 +468,7 @@ pub const LazyDFA = struct {
     /// Find all matches using prefix literal scanning (FAST PATH)
     fn findAllWithPrefix(self: *LazyDFA, text: []const u8, allocator: std.mem.Allocator, prefix: []const u8) ![]Match {
         var matches = std.ArrayList(Match){};
+        errdefer matches.deinit(allocator);
         var last_scanned_pos: usize = 0;
 
         // Find all positions of prefix literal (single or multi-byte)
@@ -622,14 +714,18 @@ pub const LazyDFA = struct {
 
     /// Initialize DFA with start state
     fn initializeDFA(self: *LazyDFA) !void {
-        // Create dead state (state 0)
+        // Create dead state (state 0) - every byte stays dead
         const dead_states = try self.allocator.alloc(StateId, 0);
-        const dead_state = try DfaState.init(self.allocator, dead_states, false);
+        var dead_state = try DfaState.init(self.allocator, dead_states, false);
+        self.allocator.free(dead_states);
+        @memset(&dead_state.transitions, DEAD_STATE);
         try self.states.append(self.allocator, dead_state);
 
         // Create start state (state 1) - epsilon closure of NFA start
         var start_nfa_states = std.ArrayList(StateId){};
+        defer start_nfa_states.deinit(self.allocator);
         try self.epsilonClosure(&start_nfa_states, self.nfa.start);
+        normalizeStateSet(&start_nfa_states);
 
         const is_match = self.containsMatchState(start_nfa_states.items);
         const start_state = try DfaState.init(self.allocator, start_nfa_states.items, is_match);
@@ -638,26 +734,55 @@ pub const LazyDFA = struct {
         // Cache start state
         const hash = hashStateSet(start_nfa_states.items);
         try self.state_cache.put(hash, START_STATE);
+        self.cache_bytes = stateMemoryUsage(0) + stateMemoryUsage(start_nfa_states.items.len);
+    }
+
+    /// Drop every state except dead and start, or give up if the cache is
+    /// thrashing (too few bytes scanned per state built since the last clear)
+    fn clearCache(self: *LazyDFA) !void {
+        const scanned = self.stats.hits + self.stats.misses - self.bytes_at_clear;
+        const built = self.states.items.len - 2;
+        self.stats.resets += 1;
+        if (self.stats.resets >= self.config.min_cache_clears and
+            scanned < @as(u64, built) * self.config.min_bytes_per_state)
+        {
+            self.gave_up = true;
+            return error.CacheThrashing;
+        }
 
-        start_nfa_states.deinit(self.allocator);
+        for (self.states.items[2..]) |*state| {
+            state.deinit(self.allocator);
+        }
+        self.states.shrinkRetainingCapacity(2);
+        @memset(&self.states.items[START_STATE].transitions, UNKNOWN_STATE);
+
+        self.state_cache.clearRetainingCapacity();
+        const start_nfa_states = self.states.items[START_STATE].nfa_states;
+        try self.state_cache.put(hashStateSet(start_nfa_states), START_STATE);
+        self.cache_bytes = stateMemoryUsage(0) + stateMemoryUsage(start_nfa_states.len);
+        self.bytes_at_clear = self.stats.hits + self.stats.misses;
     }
 
     /// Get or build transition for a DFA state on a byte
     inline fn getTransition(self: *LazyDFA, state_id: DfaStateId, byte: u8) !DfaStateId {
         @setRuntimeSafety(false);
-        const state = &self.states.items[state_id];
-
-        // Check cache (no bounds check on 256-byte array)
-        if (state.transitions[byte] != DEAD_STATE or state_id == DEAD_STATE) {
-            return state.transitions[byte];
+        const cached = self.states.items[state_id].transitions[byte];
+        if (cached != UNKNOWN_STATE) {
+            self.stats.hits += 1;
+            return cached;
         }
         @setRuntimeSafety(true);
+        return self.computeTransition(state_id, byte);
+    }
+
+    /// Cache miss: build the next DFA state by following NFA transitions
+    fn computeTransition(self: *LazyDFA, state_id: DfaStateId, byte: u8) !DfaStateId {
+        self.stats.misses += 1;
 
-        // Build new DFA state by following NFA transitions
         var next_nfa_states = std.ArrayList(StateId){};
         defer next_nfa_states.deinit(self.allocator);
 
-        for (state.nfa_states) |nfa_state| {
+        for (self.states.items[state_id].nfa_states) |nfa_state| {
             try self.followByte(&next_nfa_states, nfa_state, byte);
         }
 
@@ -667,14 +792,25 @@ pub const LazyDFA = struct {
             return DEAD_STATE;
         }
 
-        // Sort for consistent hashing
-        std.mem.sort(StateId, next_nfa_states.items, {}, comptime std.sort.asc(StateId));
+        // Sort and dedupe for consistent hashing
+        normalizeStateSet(&next_nfa_states);
 
-        // Check if this DFA state already exists
+        // Check if this DFA state already exists (compare sets: hashes can collide)
         const hash = hashStateSet(next_nfa_states.items);
         if (self.state_cache.get(hash)) |existing_id| {
-            self.states.items[state_id].transitions[byte] = existing_id;
-            return existing_id;
+            if (stateSetEqual(self.states.items[existing_id].nfa_states, next_nfa_states.items)) {
+                self.states.items[state_id].transitions[byte] = existing_id;
+                return existing_id;
+            }
+        }
+
+        // Over budget: clear first. state_id is gone afterwards, so the
+        // transition into the new state is simply not recorded.
+        const cost = stateMemoryUsage(next_nfa_states.items.len);
+        var record_transition = true;
+        if (self.cache_bytes + cost > self.config.cache_capacity) {
+            try self.clearCache();
+            record_transition = state_id == START_STATE;
         }
 
         // Create new DFA state
@@ -684,9 +820,11 @@ pub const LazyDFA = struct {
 
         try self.states.append(self.allocator, new_dfa_state);
         try self.state_cache.put(hash, new_id);
+        self.cache_bytes += cost;
 
-        // Update transition
-        self.states.items[state_id].transitions[byte] = new_id;
+        if (record_transition) {
+            self.states.items[state_id].transitions[byte] = new_id;
+        }
 
         return new_id;
     }
@@ -778,3 +916,36 @@ pub const LazyDFA = struct {
         return false;
     }
 };
+
+test "LazyDFA bounded cache matches unbounded" {
+    const allocator = std.testing.allocator;
+    const parser = @import("parser.zig");
+
+    // a at the 6th position from the end: 2^6 DFA states
+    var p = parser.Parser.init(allocator, "[ab]*a[ab][ab][ab][ab][ab]");
+    var ast = try p.parse();
+    defer ast.deinit();
+    var builder = nfa_mod.Builder.init(allocator);
+    defer builder.states.deinit(allocator);
+    var nfa_instance = try builder.build(ast.root);
+    defer nfa_instance.deinit();
+
+    var text: [4096]u8 = undefined;
+    var prng = std.Random.DefaultPrng.init(42);
+    for (&text) |*c| c.* = if (prng.random().boolean()) 'a' else 'b';
+
+    var unbounded = LazyDFA.init(allocator, &nfa_instance);
+    defer unbounded.deinit();
+    const expected = try unbounded.findAll(&text, allocator);
+    defer allocator.free(expected);
+
+    var bounded = LazyDFA.initWithConfig(allocator, &nfa_instance, .{ .cache_capacity = stateMemoryUsage(16) * 8 });
+    defer bounded.deinit();
+    const actual = try bounded.findAll(&text, allocator);
+    defer allocator.free(actual);
+
+    try std.testing.expectEqualSlices(Match, expected, actual);
+    try std.testing.expect(bounded.stats.resets > 0);
+    try std.testing.expect(bounded.cache_bytes <= bounded.config.cache_capacity);
+    try std.testing.expectEqual(@as(u64, 0), unbounded.stats.resets);
+}
@@ -0,0 +1,535 @@
+/// concurrent.futures - ThreadPoolExecutor for compiled code
+///
+/// Compiled Python has no GIL, so worker threads run submitted functions in
+/// parallel on separate cores. Workers are spawned lazily on submit() (like
+/// CPython) up to max_workers and pull jobs from one FIFO queue.
+///
+/// ProcessPoolExecutor maps to the same executor: threads already give real
+/// parallelism here, without pickling arguments across processes.
+const std = @import("std");
+
+const Allocator = std.mem.Allocator;
+
+pub const ReturnWhen = enum { all_completed, first_completed, first_exception };
+
+pub const ExecutorError = error{
+    /// submit() after shutdown() (CPython: RuntimeError)
+    ExecutorShutdown,
+};
+
+/// Process-wide completion signal - as_completed()/wait() block on it.
+/// Futures from different executors can be mixed, so it is not per-executor.
+var completion_mutex: std.Thread.Mutex = .{};
+var completion_cond: std.Thread.Condition = .{};
+var completion_epoch: u64 = 0;
+
+fn signalCompletion() void {
+    completion_mutex.lock();
+    completion_epoch +%= 1;
+    completion_mutex.unlock();
+    completion_cond.broadcast();
+}
+
+/// Unit of work on the executor queue
+const Job = struct {
+    next: ?*Job = null,
+    run: *const fn (*Job) void,
+};
+
+pub const State = enum(u8) { pending, running, finished, cancelled };
+
+/// Future(T) - T is the submitted function's return type (an error union for fallible functions)
+pub fn Future(comptime T: type) type {
+    return struct {
+        state: std.atomic.Value(State) = .init(.pending),
+        value: T = undefined,
+
+        const Self = @This();
+        pub const Value = T;
+
+        /// Block until the call finishes and return its value
+        /// (errors from the function propagate like CPython re-raising)
+        pub fn result(self: *Self) T {
+            self.waitDone();
+            if (self.cancelled()) @panic("concurrent.futures.CancelledError");
+            return self.value;
+        }
+
+        /// Error raised by the call, or null
+        pub fn exception(self: *Self) ?anyerror {
+            self.waitDone();
+            if (self.cancelled()) return error.CancelledError;
+            if (comptime @typeInfo(T) == .error_union) {
+                if (self.value) |_| {} else |err| return err;
+            }
+            return null;
+        }
+
+        /// Cancel if the call has not started yet
+        pub fn cancel(self: *Self) bool {
+            if (self.state.cmpxchgStrong(.pending, .cancelled, .acq_rel, .acquire)) |current| {
+                return current == .cancelled;
+            }
+            signalCompletion();
+            return true;
+        }
+
+        pub fn cancelled(self: *Self) bool {
+            return self.state.load(.acquire) == .cancelled;
+        }
+
+        pub fn running(self: *Self) bool {
+            return self.state.load(.acquire) == .running;
+        }
+
+        pub fn done(self: *Self) bool {
+            return switch (self.state.load(.acquire)) {
+                .finished, .cancelled => true,
+                .pending, .running => false,
+            };
+        }
+
+        fn waitDone(self: *Self) void {
+            if (self.done()) return;
+            completion_mutex.lock();
+            defer completion_mutex.unlock();
+            while (!self.done()) completion_cond.wait(&completion_mutex);
+        }
+
+        /// Claim the future for execution; false if it was cancelled first
+        fn start(self: *Self) bool {
+            return self.state.cmpxchgStrong(.pending, .running, .acq_rel, .acquire) == null;
+        }
+
+        fn finish(self: *Self, value: T) void {
+            self.value = value;
+            self.state.store(.finished, .release);
+            signalCompletion();
+        }
+    };
+}
+
+/// Callables are either function bodies (stored as pointers) or function pointers
+fn Callable(comptime F: type) type {
+    return if (@typeInfo(F) == .@"fn") *const F else F;
+}
+
+/// Allocator-taking functions (the codegen adds `allocator` as first param) get one injected
+fn takesAllocator(comptime F: type) bool {
+    const Fn = switch (@typeInfo(F)) {
+        .@"fn" => F,
+        .pointer => |p| p.child,
+        else => @compileError("executor: expected a function, got " ++ @typeName(F)),
+    };
+    const params = @typeInfo(Fn).@"fn".params;
+    return params.len > 0 and params[0].type == Allocator;
+}
+
+fn CallArgs(comptime F: type, comptime Args: type) type {
+    return if (takesAllocator(F)) @TypeOf(.{@as(Allocator, undefined)} ++ @as(Args, undefined)) else Args;
+}
+
+fn ReturnOf(comptime F: type, comptime Args: type) type {
+    return @TypeOf(@call(.auto, @as(Callable(F), undefined), @as(CallArgs(F, Args), undefined)));
+}
+
+/// Normalize `submit(f, x)` (single value) and `submit(f, .{ x, y })` (tuple) to a tuple
+fn ArgsTuple(comptime A: type) type {
+    const info = @typeInfo(A);
+    return if (info == .@"struct" and info.@"struct".is_tuple) A else struct { A };
+}
+
+fn toTuple(args: anytype) ArgsTuple(@TypeOf(args)) {
+    const A = @TypeOf(args);
+    return if (ArgsTuple(A) == A) args else .{args};
+}
+
+pub const ThreadPoolExecutor = struct {
+    allocator: Allocator,
+    max_workers: usize,
+    mutex: std.Thread.Mutex = .{},
+    work_ready: std.Thread.Condition = .{},
+    head: ?*Job = null,
+    tail: ?*Job = null,
+    idle: usize = 0,
+    workers: std.ArrayList(std.Thread) = .{},
+    is_shutdown: bool = false,
+    /// submit() tasks, each holding the Future handed back to the caller.
+    /// Futures stay valid until deinit(); compiled code never frees an
+    /// executor, so like other __global_allocator values they live for the
+    /// rest of the program. Guarded by `mutex`.
+    tasks: std.heap.ArenaAllocator,
+
+    const Self = @This();
+
+    /// ThreadPoolExecutor(max_workers=None) - default is min(32, cpu_count + 4) like CPython
+    pub fn init(allocator: Allocator, max_workers: ?i64) !*Self {
+        const workers: usize = if (max_workers) |n|
+            (if (n <= 0) return error.ValueError else @intCast(n))
+        else
+            @min(32, (std.Thread.getCpuCount() catch 1) + 4);
+        const self = try allocator.create(Self);
+        self.* = .{ .allocator = allocator, .max_workers = workers, .tasks = .init(allocator) };
+        return self;
+    }
+
+    /// Wait for queued work, then free the executor and every future it returned
+    pub fn deinit(self: *Self) void {
+        self.shutdown(true);
+        self.tasks.deinit();
+        self.allocator.destroy(self);
+    }
+
+    /// submit(fn, *args) -> Future
+    pub fn submit(self: *Self, func: anytype, args: anytype) !*Future(ReturnOf(@TypeOf(func), ArgsTuple(@TypeOf(args)))) {
+        return self.submitTask(&self.tasks, func, args);
+    }
+
+    /// Queue one call whose task (and future) lives in `arena`
+    fn submitTask(self: *Self, arena: *std.heap.ArenaAllocator, func: anytype, args: anytype) !*Future(ReturnOf(@TypeOf(func), ArgsTuple(@TypeOf(args)))) {
+        const F = @TypeOf(func);
+        const Args = ArgsTuple(@TypeOf(args));
+        const R = ReturnOf(F, Args);
+
+        const Task = struct {
+            job: Job = .{ .run = run },
+            future: Future(R) = .{},
+            func: Callable(F),
+            args: Args,
+            allocator: Allocator,
+
+            fn run(job: *Job) void {
+                const task: *@This() = @fieldParentPtr("job", job);
+                if (!task.future.start()) return;
+                const call_args = if (comptime takesAllocator(F)) .{task.allocator} ++ task.args else task.args;
+                task.future.finish(@call(.auto, task.func, call_args));
+            }
+        };
+
+        // Arenas are not thread-safe; submit() may be called from several threads
+        self.mutex.lock();
+        const created = arena.allocator().create(Task);
+        self.mutex.unlock();
+        const task = try created;
+        task.* = .{
+            .func = if (comptime @typeInfo(F) == .@"fn") &func else func,
+            .args = toTuple(args),
+            .allocator = self.allocator,
+        };
+        try self.enqueue(&task.job);
+        return &task.future;
+    }
+
+    /// map(fn, iterable, chunksize=1) -> results in input order
+    /// Each chunk of `chunksize` items is one job, so large chunks amortize queueing.
+    pub fn map(self: *Self, func: anytype, items: anytype, chunksize: i64) !std.ArrayList(MapPayload(@TypeOf(func), @TypeOf(items[0]))) {
+        const F = @TypeOf(func);
+        const Item = @TypeOf(items[0]);
+        const R = ReturnOf(F, struct { Item });
+        const Payload = MapPayload(F, Item);
+        const fallible = @typeInfo(R) == .error_union;
+
+        var results = std.ArrayList(Payload){};
+        errdefer results.deinit(self.allocator);
+        try results.resize(self.allocator, items.len);
+        if (items.len == 0) return results;
+
+        const chunk: usize = @intCast(@max(1, chunksize));
+        const n_chunks = (items.len + chunk - 1) / chunk;
+
+        const Chunk = struct {
+            func: Callable(F),
+            items: []const Item,
+            out: []Payload,
+            allocator: Allocator,
+
+            fn call(c: *const @This()) if (fallible) anyerror!void else void {
+                for (c.items, c.out) |item, *out| {
+                    const call_args = if (comptime takesAllocator(F)) .{ c.allocator, item } else .{item};
+                    out.* = if (fallible) try @call(.auto, c.func, call_args) else @call(.auto, c.func, call_args);
+                }
+            }
+        };
+
+        // Chunk tasks are only needed until every chunk has finished below
+        var chunk_tasks = std.heap.ArenaAllocator.init(self.allocator);
+        defer chunk_tasks.deinit();
+        const futures = try self.allocator.alloc(*Future(if (fallible) anyerror!void else void), n_chunks);
+        defer self.allocator.free(futures);
+        const chunks = try self.allocator.alloc(Chunk, n_chunks);
+        defer self.allocator.free(chunks);
+
+        // On a failed submit, let the queued chunks finish before chunks/results are freed
+        var submitted: usize = 0;
+        errdefer for (futures[0..submitted]) |fut| {
+            _ = fut.exception();
+        };
+        for (chunks, futures, 0..) |*c, *fut, i| {
+            const start = i * chunk;
+            const end = @min(start + chunk, items.len);
+            c.* = .{
+                .func = if (comptime @typeInfo(F) == .@"fn") &func else func,
+                .items = items[start..end],
+                .out = results.items[start..end],
+                .allocator = self.allocator,
+            };
+            fut.* = try self.submitTask(&chunk_tasks, Chunk.call, .{@as(*const Chunk, c)});
+            submitted += 1;
+        }
+        // Wait for every chunk before the stack-owned chunk table goes away
+        for (futures) |fut| {
+            if (fallible) try fut.result() else fut.result();
+        }
+        return results;
+    }
+
+    /// shutdown(wait=True) - stop accepting work; optionally join the workers
+    pub fn shutdown(self: *Self, wait: bool) void {
+        self.mutex.lock();
+        self.is_shutdown = true;
+        self.mutex.unlock();
+        self.work_ready.broadcast();
+        if (!wait) return;
+
+        self.mutex.lock();
+        const workers = self.workers;
+        self.workers = .{};
+        self.mutex.unlock();
+        var list = workers;
+        for (list.items) |t| t.join();
+        list.deinit(self.allocator);
+    }
+
+    pub fn __enter__(self: *Self, _: anytype) !*Self {
+        return self;
+    }
+
+    pub fn __exit__(self: *Self, _: anytype, _: anytype, _: anytype, _: anytype) !?bool {
+        self.shutdown(true);
+        return null;
+    }
+
+    fn enqueue(self: *Self, job: *Job) !void {
+        self.mutex.lock();
+        defer self.mutex.unlock();
+        if (self.is_shutdown) return ExecutorError.ExecutorShutdown;
+
+        if (self.tail) |t| t.next = job else self.head = job;
+        self.tail = job;
+
+        // Spawn a worker only when nobody is idle to take the job
+        if (self.idle == 0 and self.workers.items.len < self.max_workers) {
+            try self.workers.ensureUnusedCapacity(self.allocator, 1);
+            const thread = try std.Thread.spawn(.{}, worker, .{self});
+            self.workers.appendAssumeCapacity(thread);
+        } else {
+            self.work_ready.signal();
+        }
+    }
+
+    fn worker(self: *Self) void {
+        self.mutex.lock();
+        defer self.mutex.unlock();
+        while (true) {
+            const job = self.head orelse {
+                // Drain the queue before exiting so shutdown(wait=True) finishes pending work
+                if (self.is_shutdown) return;
+                self.idle += 1;
+                self.work_ready.wait(&self.mutex);
+                self.idle -= 1;
+                continue;
+            };
+            self.head = job.next;
+            if (self.head == null) self.tail = null;
+
+            self.mutex.unlock();
+            job.run(job);
+            self.mutex.lock();
+        }
+    }
+};
+
+pub const ProcessPoolExecutor = ThreadPoolExecutor;
+
+fn MapPayload(comptime F: type, comptime Item: type) type {
+    const R = ReturnOf(F, struct { Item });
+    return switch (@typeInfo(R)) {
+        .error_union => |eu| eu.payload,
+        else => R,
+    };
+}
+
+fn isDone(fut: anytype) bool {
+    return fut.done();
+}
+
+fn failed(fut: anytype) bool {
+    return fut.done() and !fut.cancelled() and fut.exception() != null;
+}
+
+/// as_completed(fs) iterator - yields each future as soon as it finishes
+pub fn AsCompleted(comptime Fut: type) type {
+    return struct {
+        allocator: Allocator,
+        /// Futures not yielded yet live in pending[0..remaining]
+        pending: []Fut,
+        remaining: usize,
+
+        const Self = @This();
+
+        /// Next finished future, blocking until one is done; null once all were yielded
+        pub fn next(self: *Self) ?Fut {
+            if (self.remaining == 0) return null;
+            completion_mutex.lock();
+            defer completion_mutex.unlock();
+            while (true) {
+                const epoch = completion_epoch;
+                for (self.pending[0..self.remaining], 0..) |fut, i| {
+                    if (!isDone(fut)) continue;
+                    self.remaining -= 1;
+                    self.pending[i] = self.pending[self.remaining];
+                    return fut;
+                }
+                if (epoch == completion_epoch) completion_cond.wait(&completion_mutex);
+            }
+        }
+
+        /// Drain into a slice in completion order (for as_completed() used as a value)
+        pub fn collect(self: Self) ![]Fut {
+            var it = self;
+            defer it.deinit();
+            const ordered = try it.allocator.alloc(Fut, it.remaining);
+            for (ordered) |*fut| fut.* = it.next().?;
+            return ordered;
+        }
+
+        pub fn deinit(self: *Self) void {
+            self.allocator.free(self.pending);
+        }
+    };
+}
+
+/// as_completed(fs)
+pub fn asCompleted(allocator: Allocator, futures: anytype) !AsCompleted(@TypeOf(futures[0])) {
+    const Fut = @TypeOf(futures[0]);
+    return .{
+        .allocator = allocator,
+        .pending = try allocator.dupe(Fut, futures),
+        .remaining = futures.len,
+    };
+}
+
+/// wait(fs, return_when=ALL_COMPLETED) -> (done, not_done)
+pub fn wait(allocator: Allocator, futures: anytype, return_when: ReturnWhen) !struct { std.ArrayList(@TypeOf(futures[0])), std.ArrayList(@TypeOf(futures[0])) } {
+    completion_mutex.lock();
+    while (true) {
+        const epoch = completion_epoch;
+        var n_done: usize = 0;
+        var any_failed = false;
+        for (futures) |fut| {
+            if (isDone(fut)) {
+                n_done += 1;
+                if (return_when == .first_exception and failed(fut)) any_failed = true;
+            }
+        }
+        const satisfied = switch (return_when) {
+            .all_completed => n_done == futures.len,
+            .first_completed => n_done > 0 or futures.len == 0,
+            .first_exception => any_failed or n_done == futures.len,
+        };
+        if (satisfied) break;
+        if (epoch == completion_epoch) completion_cond.wait(&completion_mutex);
+    }
+    completion_mutex.unlock();
+
+    const Fut = @TypeOf(futures[0]);
+    var done = std.ArrayList(Fut){};
+    errdefer done.deinit(allocator);
+    var not_done = std.ArrayList(Fut){};
+    errdefer not_done.deinit(allocator);
+    for (futures) |fut| {
+        if (isDone(fut)) try done.append(allocator, fut) else try not_done.append(allocator, fut);
+    }
+    return .{ done, not_done };
+}
+
+test "executor submit runs in parallel and returns results" {
+    const allocator = std.testing.allocator;
+    const square = struct {
+        fn f(x: i64) i64 {
+            return x * x;
+        }
+    }.f;
+
+    const ex = try ThreadPoolExecutor.init(allocator, 4);
+    defer ex.deinit();
+
+    var futures: [16]*Future(i64) = undefined;
+    for (&futures, 0..) |*fut, i| fut.* = try ex.submit(square, @as(i64, @intCast(i)));
+
+    var completed = try asCompleted(allocator, futures[0..]);
+    defer completed.deinit();
+    var sum: i64 = 0;
+    var n: usize = 0;
+    while (completed.next()) |fut| : (n += 1) {
+        try std.testing.expect(fut.done());
+        sum += fut.result();
+    }
+    try std.testing.expectEqual(@as(usize, 16), n);
+    try std.testing.expectEqual(@as(i64, 1240), sum);
+
+    for (futures, 0..) |fut, i| {
+        const x: i64 = @intCast(i);
+        try std.testing.expectEqual(x * x, fut.result());
+    }
+}
+
+test "as_completed yields a finished future before a blocked one" {
+    const allocator = std.testing.allocator;
+    const gate = struct {
+        var open: std.Thread.ResetEvent = .{};
+        fn blocked() i64 {
+            open.wait();
+            return 1;
+        }
+        fn quick() i64 {
+            return 2;
+        }
+    };
+
+    const ex = try ThreadPoolExecutor.init(allocator, 2);
+    defer ex.deinit();
+
+    const futures = [_]*Future(i64){ try ex.submit(gate.blocked, .{}), try ex.submit(gate.quick, .{}) };
+    var completed = try asCompleted(allocator, futures[0..]);
+    defer completed.deinit();
+    try std.testing.expectEqual(@as(i64, 2), completed.next().?.result());
+    gate.open.set();
+    try std.testing.expectEqual(@as(i64, 1), completed.next().?.result());
+    try std.testing.expectEqual(@as(?*Future(i64), null), completed.next());
+}
+
+test "executor map keeps input order across chunks" {
+    const allocator = std.testing.allocator;
+    const inc = struct {
+        fn f(x: i64) i64 {
+            return x + 1;
+        }
+    }.f;
+
+    var arena = std.heap.ArenaAllocator.init(allocator);
+    defer arena.deinit();
+    const ex = try ThreadPoolExecutor.init(arena.allocator(), 3);
+    defer ex.shutdown(true);
+
+    const items = [_]i64{ 1, 2, 3, 4, 5, 6, 7 };
+    var results = try ex.map(inc, items[0..], 3);
+    defer results.deinit(arena.allocator());
+    try std.testing.expectEqualSlices(i64, &.{ 2, 3, 4, 5, 6, 7, 8 }, results.items);
+
+    const waited = try wait(allocator, &[_]*Future(i64){try ex.submit(inc, @as(i64, 1))}, .all_completed);
+    var done, var not_done = waited;
+    defer done.deinit(allocator);
+    defer not_done.deinit(allocator);
+    try std.testing.expectEqual(@as(usize, 1), done.items.len);
+}
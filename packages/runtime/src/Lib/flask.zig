@@ -0,0 +1,222 @@
+/// flask - Flask-compatible routing on the native HTTP/1.1 server
+///
+/// `@app.route(rule)` registers the compiled view function behind a
+/// per-view adapter generated at compile time; `app.run()` serves the routes
+/// with one event loop per core (see packages/shared/http/server.zig).
+///
+/// View functions may take the request allocator and the route's variables
+/// (`<name>` as str, `<int:id>` as int) in rule order, and return a str, a
+/// jsonify() result, or a `(body, status)` tuple. Responses whose JSON is
+/// known to the compiler are serialized once at compile time.
+const std = @import("std");
+const http = @import("http_server");
+
+const Allocator = std.mem.Allocator;
+const Prepared = http.Prepared;
+const Request = http.Request;
+const Response = http.Response;
+
+/// jsonify() result: a body built per request, or a prepared constant
+pub const Json = struct {
+    body: []const u8 = "",
+    status: u16 = 200,
+    prepared: ?*const Prepared = null,
+
+    /// JSON serialized by the compiler; the full response is built at compile time
+    pub fn constant(comptime body: []const u8) Json {
+        return .{ .prepared = &struct {
+            const response = Prepared.literal(200, "application/json", body);
+        }.response };
+    }
+};
+
+/// Allocator of the request being handled on this thread (freed with the
+/// worker's batch arena once the response is written)
+threadlocal var request_allocator: Allocator = std.heap.page_allocator;
+
+/// jsonify(value) - compact JSON with ASCII escapes and a trailing newline, like Flask
+pub fn jsonify(value: anytype) Json {
+    var out = std.ArrayList(u8){};
+    out.print(request_allocator, "{f}\n", .{std.json.fmt(value, .{ .escape_unicode = true })}) catch {
+        return .{ .status = 500 };
+    };
+    return .{ .body = out.items };
+}
+
+pub const Flask = struct {
+    allocator: Allocator,
+    router: http.Router,
+
+    pub fn init(allocator: Allocator) !*Flask {
+        const self = try allocator.create(Flask);
+        self.* = .{ .allocator = allocator, .router = http.Router.init(allocator) };
+        return self;
+    }
+
+    pub fn deinit(self: *Flask) void {
+        self.router.deinit();
+        self.allocator.destroy(self);
+    }
+
+    /// app.route(rule, methods=[...]) - an empty list means GET (and HEAD)
+    pub fn route(self: *Flask, rule: []const u8, methods: []const []const u8) Route {
+        return .{ .app = self, .rule = rule, .methods = methods };
+    }
+
+    /// app.run(host, port) - blocks serving requests until the process exits
+    pub fn run(self: *Flask, host: ?[]const u8, port: ?i64) void {
+        const bind_host = host orelse "127.0.0.1";
+        var server = http.Server.init(self.allocator, &self.router, .{
+            .host = if (std.mem.eql(u8, bind_host, "localhost")) "127.0.0.1" else bind_host,
+            .port = std.math.cast(u16, port orelse 5000) orelse fatal("run", error.InvalidPort),
+        }) catch |err| fatal("run", err);
+        defer server.deinit();
+
+        std.debug.print(" * Running on http://{s}:{d}\n", .{ bind_host, server.port() });
+        server.run() catch |err| fatal("run", err);
+    }
+};
+
+/// Decorator returned by app.route(); applied to the view with `.call(&view)`
+pub const Route = struct {
+    app: *Flask,
+    rule: []const u8,
+    methods: []const []const u8,
+
+    pub fn call(self: Route, comptime view: anytype) @TypeOf(view) {
+        var methods = http.Methods.initEmpty();
+        for (self.methods) |name| methods.insert(http.Method.parse(name));
+        if (self.methods.len == 0) methods.insert(.GET);
+
+        self.app.router.add(methods, self.rule, Adapter(view).handle) catch |err| fatal("route", err);
+        return view;
+    }
+};
+
+fn fatal(what: []const u8, err: anyerror) noreturn {
+    std.debug.print("flask: {s} failed: {s}\n", .{ what, @errorName(err) });
+    std.process.exit(1);
+}
+
+/// Server handler calling `view` with the route's variables and translating its result
+fn Adapter(comptime view: anytype) type {
+    const View = switch (@typeInfo(@TypeOf(view))) {
+        .pointer => |p| p.child,
+        else => @TypeOf(view),
+    };
+    const info = @typeInfo(View).@"fn";
+
+    return struct {
+        fn handle(req: *const Request, res: *Response) anyerror!void {
+            request_allocator = res.allocator;
+
+            var args: std.meta.ArgsTuple(View) = undefined;
+            var next_param: usize = 0;
+            inline for (info.params, 0..) |param, i| {
+                const P = param.type orelse @compileError("flask: view parameters need concrete types");
+                if (P == Allocator) {
+                    args[i] = res.allocator;
+                    continue;
+                }
+                if (next_param == req.params.len) return notFound(res);
+                const value = req.params[next_param].value;
+                next_param += 1;
+                args[i] = switch (@typeInfo(P)) {
+                    .int => std.fmt.parseInt(P, value, 10) catch return notFound(res),
+                    else => value,
+                };
+            }
+
+            const result = @call(.auto, view, args);
+            const value = if (@typeInfo(@TypeOf(result)) == .error_union) try result else result;
+            respond(res, value);
+        }
+    };
+}
+
+fn notFound(res: *Response) void {
+    res.status = 404;
+    res.body = "Not Found";
+}
+
+fn respond(res: *Response, value: anytype) void {
+    const T = @TypeOf(value);
+    if (T == Json) {
+        if (value.prepared) |prepared| return res.send(prepared);
+        res.status = value.status;
+        return res.json(value.body);
+    }
+    if (comptime isString(T)) {
+        res.body = value;
+        return;
+    }
+    if (@typeInfo(T) == .@"struct" and @typeInfo(T).@"struct".is_tuple and value.len == 2) {
+        respond(res, value[0]);
+        // A prepared response carries its own status line
+        if (res.prepared) |prepared| {
+            res.prepared = null;
+            res.json(prepared.body);
+        }
+        res.status = std.math.cast(u16, value[1]) orelse 500;
+        return;
+    }
+    @compileError("flask: unsupported view return type " ++ @typeName(T));
+}
+
+fn isString(comptime T: type) bool {
+    return switch (@typeInfo(T)) {
+        .pointer => |p| switch (p.size) {
+            .slice => p.child == u8,
+            .one => switch (@typeInfo(p.child)) {
+                .array => |a| a.child == u8,
+                else => false,
+            },
+            else => false,
+        },
+        else => false,
+    };
+}
+
+fn testHello() Json {
+    return Json.constant("{\"message\":\"Hello, World!\"}\n");
+}
+
+fn testUser(allocator: Allocator, name: []const u8, id: i64) !struct { []const u8, i64 } {
+    return .{ try std.fmt.allocPrint(allocator, "{s}#{d}", .{ name, id }), 201 };
+}
+
+test "views become server handlers" {
+    var arena = std.heap.ArenaAllocator.init(std.testing.allocator);
+    defer arena.deinit();
+    var req = Request{
+        .method = .GET,
+        .method_name = "GET",
+        .target = "/users/ada/7",
+        .path = "/users/ada/7",
+        .query = "",
+        .minor_version = 1,
+        .headers = &.{},
+        .body = "",
+        .keep_alive = true,
+        .params = &.{ .{ .name = "name", .value = "ada" }, .{ .name = "id", .value = "7" } },
+    };
+
+    var res = Response{ .allocator = arena.allocator() };
+    try Adapter(&testUser).handle(&req, &res);
+    try std.testing.expectEqual(@as(u16, 201), res.status);
+    try std.testing.expectEqualStrings("ada#7", res.body);
+
+    req.params = &.{};
+    res = .{ .allocator = arena.allocator() };
+    try Adapter(&testHello).handle(&req, &res);
+    try std.testing.expectEqualStrings("{\"message\":\"Hello, World!\"}\n", res.prepared.?.body);
+}
+
+test "jsonify matches Flask's compact output" {
+    var arena = std.heap.ArenaAllocator.init(std.testing.allocator);
+    defer arena.deinit();
+    request_allocator = arena.allocator();
+
+    const json = jsonify(.{ .message = "h\u{e9}llo", .n = @as(i64, 3) });
+    try std.testing.expectEqualStrings("{\"message\":\"h\\u00e9llo\",\"n\":3}\n", json.body);
+}
@@ -3,6 +3,7 @@ const std = @import("std");
 const runtime = @import("../runtime.zig");
 const parse_direct = @import("json/parse_direct.zig");
 const parse_arena = @import("json/parse_arena.zig");
+const json_stream = @import("json_stream");
 
 // Export for internal use (e.g. notebook parsing)
 pub const parse = @import("json/parse.zig").parse;
@@ -606,6 +607,83 @@ pub fn dump(obj: *runtime.PyObject, fp: anytype, allocator: std.mem.Allocator, o
     try fp.writeAll(json_str);
 }
 
+/// Read size for streaming from file objects
+const stream_chunk_size = 64 * 1024;
+
+/// Iterator over the records of a JSON file object: the elements of a
+/// top-level array, or the values of a JSON Lines file. Reads in chunks and
+/// parses one record at a time, so memory is bounded by the largest record.
+/// Python (metal0 extension): for record in json.iterload(f): ...
+pub const RecordIterator = struct {
+    file: *runtime.PyObject,
+    allocator: std.mem.Allocator,
+    scanner: json_stream.RecordScanner,
+    chunk: []u8,
+
+    pub fn init(allocator: std.mem.Allocator, file: *runtime.PyObject) !RecordIterator {
+        return initMode(allocator, file, .auto);
+    }
+
+    pub fn initMode(allocator: std.mem.Allocator, file: *runtime.PyObject, mode: json_stream.RecordScanner.Mode) !RecordIterator {
+        return .{
+            .file = file,
+            .allocator = allocator,
+            .scanner = json_stream.RecordScanner.init(mode),
+            .chunk = try allocator.alloc(u8, stream_chunk_size),
+        };
+    }
+
+    pub fn deinit(self: *RecordIterator) void {
+        self.scanner.deinit(self.allocator);
+        self.allocator.free(self.chunk);
+    }
+
+    /// Raw bytes of the next record (valid until the following call), or null at EOF
+    pub fn nextRaw(self: *RecordIterator) !?[]const u8 {
+        while (true) {
+            if (try self.scanner.next()) |record| return record;
+            if (self.scanner.isDone()) return null;
+            const n = try runtime.PyFile.readInto(self.file, self.chunk);
+            if (n == 0) {
+                self.scanner.finish();
+            } else {
+                try self.scanner.feed(self.allocator, self.chunk[0..n]);
+            }
+        }
+    }
+
+    /// Next record parsed to a PyObject, or null at EOF
+    pub fn next(self: *RecordIterator) !?*runtime.PyObject {
+        const record = (try self.nextRaw()) orelse return null;
+        return try parse_arena.parseWithArena(record, self.allocator);
+    }
+};
+
+/// json.load(f) for PyFile objects - reads in chunks through the record
+/// scanner instead of slurping the file, and rejects trailing data
+pub fn loadFile(file: *runtime.PyObject, allocator: std.mem.Allocator) !*runtime.PyObject {
+    var records = try RecordIterator.initMode(allocator, file, .lines);
+    defer records.deinit();
+    const doc = (try records.next()) orelse return error.InvalidFormat;
+    errdefer runtime.decref(doc, allocator);
+    if (try records.nextRaw() != null) return error.InvalidFormat; // Extra data
+    return doc;
+}
+
+/// json.iterload(f) outside a for loop: every record, collected into a list.
+/// for-loops over json.iterload use RecordIterator directly and stay lazy.
+pub fn loadRecords(file: *runtime.PyObject, allocator: std.mem.Allocator) !*runtime.PyObject {
+    var records = try RecordIterator.init(allocator, file);
+    defer records.deinit();
+    const list = try runtime.PyList.create(allocator);
+    errdefer runtime.decref(list, allocator);
+    while (try records.next()) |record| {
+        defer runtime.decref(record, allocator); // the list holds its own reference
+        try runtime.PyList.append(list, record);
+    }
+    return list;
+}
+
 /// load(fp) - deserialize JSON from file to PyObject
 pub fn load(fp: anytype, allocator: std.mem.Allocator) !*runtime.PyObject {
     // Read entire file into buffer
@@ -1119,3 +1197,23 @@ test "round-trip: loads + dumps" {
     // Verify structure matches (order may differ for objects)
     try std.testing.expectEqual(runtime.PyObject.TypeId.dict, parsed.type_id);
 }
+
+test "RecordIterator: json lines" {
+    const allocator = std.testing.allocator;
+    var tmp = std.testing.tmpDir(.{});
+    defer tmp.cleanup();
+    try tmp.dir.writeFile(.{ .sub_path = "rows.jsonl", .data = "{\"id\": 1}\n{\"id\": 2}\n[3]\n" });
+
+    const file = try runtime.PyFile.create(allocator, try tmp.dir.openFile("rows.jsonl", .{}), "r");
+    defer runtime.PyFile.deinit(file, allocator);
+
+    var records = try RecordIterator.init(allocator, file);
+    defer records.deinit();
+
+    var count: usize = 0;
+    while (try records.next()) |record| {
+        defer runtime.decref(record, allocator);
+        count += 1;
+    }
+    try std.testing.expectEqual(@as(usize, 3), count);
+}
@@ -0,0 +1,271 @@
+/// mmap module - memory-mapped files
+/// Maps a file descriptor with mmap(2); find/read/readline/view return slices
+/// into the mapping instead of copies.
+const std = @import("std");
+const builtin = @import("builtin");
+
+/// mmap(2) is only wired up for POSIX targets (no WASI/freestanding/Windows)
+pub const supported = switch (builtin.os.tag) {
+    .linux, .macos, .ios, .freebsd, .netbsd, .openbsd, .dragonfly => true,
+    else => false,
+};
+
+pub const ACCESS_DEFAULT: i64 = 0;
+pub const ACCESS_READ: i64 = 1;
+pub const ACCESS_WRITE: i64 = 2;
+pub const ACCESS_COPY: i64 = 3;
+
+pub const Mapping = []align(std.heap.page_size_min) u8;
+
+/// Env var holding the minimum size (bytes) at which open(path, "rb").read()
+/// returns a read-only mapping instead of a heap copy. Unset or 0 disables it.
+pub const read_threshold_env_var = "METAL0_MMAP_READ";
+
+var read_threshold: ?usize = null;
+
+pub fn readThreshold() usize {
+    if (read_threshold) |t| return t;
+    const t: usize = if (!supported) 0 else if (std.posix.getenv(read_threshold_env_var)) |v|
+        std.fmt.parseInt(usize, v, 10) catch 0
+    else
+        0;
+    read_threshold = t;
+    return t;
+}
+
+/// Map `length` bytes of `fd` starting at `offset` (fd -1 maps anonymous memory)
+pub fn map(fd: std.posix.fd_t, length: usize, offset: u64, access: i64) !Mapping {
+    if (!supported) return error.NotImplemented;
+    if (length == 0) return error.ValueError; // cannot mmap an empty file
+    if (offset % std.heap.pageSize() != 0) return error.ValueError;
+
+    const prot: u32 = if (access == ACCESS_READ)
+        std.posix.PROT.READ
+    else
+        std.posix.PROT.READ | std.posix.PROT.WRITE;
+    var flags: std.posix.MAP = .{ .TYPE = if (access == ACCESS_COPY) .PRIVATE else .SHARED };
+    if (fd == -1) flags.ANONYMOUS = true;
+
+    return std.posix.mmap(null, length, prot, flags, fd, offset);
+}
+
+/// Map the rest of an open file read-only, or null if it is below the
+/// METAL0_MMAP_READ threshold or not at offset 0. Advances the file to EOF.
+pub fn mapForRead(file: std.fs.File) !?[]const u8 {
+    const threshold = readThreshold();
+    if (threshold == 0) return null;
+
+    const size = (try file.stat()).size;
+    if (size < threshold or try file.getPos() != 0) return null;
+
+    const mapping = try map(file.handle, @intCast(size), 0, ACCESS_READ);
+    std.posix.madvise(mapping.ptr, mapping.len, std.posix.MADV.SEQUENTIAL) catch {};
+    try file.seekTo(size);
+    return mapping;
+}
+
+/// Byte data of a bytes argument: PyBytes literals carry it in .data
+fn bytesArg(value: anytype) []const u8 {
+    return switch (@typeInfo(@TypeOf(value))) {
+        .@"struct" => value.data,
+        else => value,
+    };
+}
+
+/// Release a mapping handed out by mapForRead
+pub fn unmap(ptr: [*]const u8, len: usize) void {
+    if (!supported or len == 0) return;
+    const aligned: [*]align(std.heap.page_size_min) const u8 = @alignCast(ptr);
+    std.posix.munmap(aligned[0..len]);
+}
+
+/// Python mmap.mmap object
+pub const MMap = struct {
+    _data: Mapping = &.{},
+    _pos: usize = 0,
+    _closed: bool = false,
+    _access: i64 = ACCESS_DEFAULT,
+
+    /// mmap.mmap(fileno, length, access=ACCESS_DEFAULT, offset=0)
+    /// length 0 maps from offset to the end of the file.
+    pub fn init(fileno: i64, length: i64, access: i64, offset: i64) !MMap {
+        if (length < 0 or offset < 0) return error.OverflowError;
+        const fd: std.posix.fd_t = @intCast(fileno);
+        var len: usize = @intCast(length);
+        if (len == 0) {
+            if (fd == -1) return error.ValueError;
+            const size = (try (std.fs.File{ .handle = fd }).stat()).size;
+            if (size <= @as(u64, @intCast(offset))) return error.ValueError;
+            len = @intCast(size - @as(u64, @intCast(offset)));
+        }
+        return .{ ._data = try map(fd, len, @intCast(offset), access), ._access = access };
+    }
+
+    pub fn close(__self: *@This()) void {
+        if (__self._closed) return;
+        if (__self._data.len > 0) std.posix.munmap(__self._data);
+        __self._data = &.{};
+        __self._closed = true;
+    }
+
+    pub fn closed(__self: *@This()) bool {
+        return __self._closed;
+    }
+
+    pub fn __enter__(__self: *@This()) *@This() {
+        return __self;
+    }
+
+    pub fn __exit__(__self: *@This(), _: anytype) void {
+        __self.close();
+    }
+
+    /// Zero-copy view of mapping[start:end] (what m[start:end] copies in CPython)
+    pub fn view(__self: *const @This(), start: usize, end: usize) []const u8 {
+        const e = @min(end, __self._data.len);
+        return __self._data[@min(start, e)..e];
+    }
+
+    /// m[start:end] with Python slice bounds (null = open end, negative = from the end)
+    pub fn slice(__self: *const @This(), start: ?i64, end: ?i64) []const u8 {
+        const len: i64 = @intCast(__self._data.len);
+        const s = if (start) |v| (if (v < 0) @max(v + len, 0) else v) else 0;
+        const e = if (end) |v| (if (v < 0) @max(v + len, 0) else v) else len;
+        return __self.view(@intCast(s), @intCast(e));
+    }
+
+    /// m[index] - the byte value as an int
+    pub fn byteAt(__self: *const @This(), index: i64) !i64 {
+        const len: i64 = @intCast(__self._data.len);
+        const i = if (index < 0) index + len else index;
+        if (i < 0 or i >= len) return error.IndexError;
+        return __self._data[@intCast(i)];
+    }
+
+    pub fn find(__self: *const @This(), sub: anytype, start: ?usize, end: ?usize) isize {
+        const s = start orelse __self._pos;
+        const hay = __self.view(s, end orelse __self._data.len);
+        if (std.mem.indexOf(u8, hay, bytesArg(sub))) |idx| return @intCast(s + idx);
+        return -1;
+    }
+
+    pub fn rfind(__self: *const @This(), sub: anytype, start: ?usize, end: ?usize) isize {
+        const s = start orelse __self._pos;
+        const hay = __self.view(s, end orelse __self._data.len);
+        if (std.mem.lastIndexOf(u8, hay, bytesArg(sub))) |idx| return @intCast(s + idx);
+        return -1;
+    }
+
+    /// Hint the kernel about the access pattern (MADV_* constants)
+    pub fn madvise(__self: *@This(), option: i64, start: ?usize, length: ?usize) void {
+        if (__self._data.len == 0) return;
+        const page = std.heap.pageSize();
+        const s = std.mem.alignBackward(usize, @min(start orelse 0, __self._data.len), page);
+        const e = @min(s + (length orelse __self._data.len), __self._data.len);
+        const ptr: [*]align(std.heap.page_size_min) u8 = @alignCast(__self._data.ptr + s);
+        std.posix.madvise(ptr, e - s, @intCast(option)) catch {};
+    }
+
+    pub fn flush(__self: *@This(), offset: ?usize, size: ?usize) void {
+        if (__self._data.len == 0 or __self._access == ACCESS_READ or __self._access == ACCESS_COPY) return;
+        const s = std.mem.alignBackward(usize, @min(offset orelse 0, __self._data.len), std.heap.pageSize());
+        const e = @min(s + (size orelse __self._data.len), __self._data.len);
+        const region: Mapping = @alignCast(__self._data[s..e]);
+        std.posix.msync(region, std.posix.MSF.SYNC) catch {};
+    }
+
+    pub fn move(__self: *@This(), dest: usize, src: usize, count: usize) void {
+        if (!__self.writable()) return;
+        if (dest < src) {
+            std.mem.copyForwards(u8, __self._data[dest .. dest + count], __self._data[src .. src + count]);
+        } else {
+            std.mem.copyBackwards(u8, __self._data[dest .. dest + count], __self._data[src .. src + count]);
+        }
+    }
+
+    pub fn read(__self: *@This(), n: ?usize) []const u8 {
+        const count = n orelse (__self._data.len - __self._pos);
+        const e = @min(__self._pos + count, __self._data.len);
+        const result = __self._data[__self._pos..e];
+        __self._pos = e;
+        return result;
+    }
+
+    pub fn read_byte(__self: *@This()) ?u8 {
+        if (__self._pos >= __self._data.len) return null;
+        const b = __self._data[__self._pos];
+        __self._pos += 1;
+        return b;
+    }
+
+    pub fn readline(__self: *@This()) []const u8 {
+        const start = __self._pos;
+        const nl = std.mem.indexOfScalarPos(u8, __self._data, start, '\n');
+        __self._pos = if (nl) |i| i + 1 else __self._data.len;
+        return __self._data[start..__self._pos];
+    }
+
+    pub fn resize(__self: *@This(), newsize: usize) void {
+        // mremap is Linux-only; like CPython on macOS, resizing is unsupported
+        _ = __self;
+        _ = newsize;
+    }
+
+    pub fn seek(__self: *@This(), pos: usize, whence: ?i32) void {
+        const w = whence orelse 0;
+        if (w == 0) __self._pos = @min(pos, __self._data.len) else if (w == 1) __self._pos = @min(__self._pos + pos, __self._data.len) else if (w == 2) __self._pos = if (pos > __self._data.len) 0 else __self._data.len - pos;
+    }
+
+    pub fn size(__self: *const @This()) usize {
+        return __self._data.len;
+    }
+
+    pub fn tell(__self: *const @This()) usize {
+        return __self._pos;
+    }
+
+    pub fn write(__self: *@This(), value: anytype) usize {
+        if (!__self.writable()) return 0;
+        const data = bytesArg(value);
+        const count = @min(data.len, __self._data.len - __self._pos);
+        @memcpy(__self._data[__self._pos .. __self._pos + count], data[0..count]);
+        __self._pos += count;
+        return count;
+    }
+
+    pub fn write_byte(__self: *@This(), byte: u8) void {
+        if (!__self.writable()) return;
+        if (__self._pos < __self._data.len) {
+            __self._data[__self._pos] = byte;
+            __self._pos += 1;
+        }
+    }
+
+    fn writable(__self: *const @This()) bool {
+        // ACCESS_READ pages are PROT_READ; writing them would fault
+        return __self._access != ACCESS_READ;
+    }
+};
+
+test "mmap file views" {
+    if (!supported) return error.SkipZigTest;
+    var tmp = std.testing.tmpDir(.{});
+    defer tmp.cleanup();
+    try tmp.dir.writeFile(.{ .sub_path = "data.txt", .data = "alpha\nbeta\ngamma\n" });
+    const file = try tmp.dir.openFile("data.txt", .{});
+    defer file.close();
+
+    var m = try MMap.init(file.handle, 0, ACCESS_READ, 0);
+    defer m.close();
+
+    try std.testing.expectEqual(@as(usize, 17), m.size());
+    try std.testing.expectEqual(@as(isize, 6), m.find("beta", null, null));
+    try std.testing.expectEqualStrings("alpha\n", m.readline());
+    try std.testing.expectEqualStrings("beta", m.view(6, 10));
+    try std.testing.expectEqualStrings("gamma\n", m.slice(-6, null));
+    try std.testing.expectEqual(@as(i64, 'b'), try m.byteAt(6));
+    try std.testing.expectError(error.IndexError, m.byteAt(17));
+    // Views alias the mapping rather than copying it
+    try std.testing.expectEqual(@intFromPtr(m._data.ptr) + 6, @intFromPtr(m.view(6, 10).ptr));
+    try std.testing.expectEqual(@as(usize, 0), m.write("x"));
+}
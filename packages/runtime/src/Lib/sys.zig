@@ -2,6 +2,7 @@
 /// CPython Reference: https://docs.python.org/3.12/library/sys.html
 const std = @import("std");
 const builtin = @import("builtin");
+const stdout_buffer = @import("../runtime/stdout.zig");
 
 // ============================================================================
 // Platform / Version Information
@@ -101,6 +102,7 @@ pub const hash_info = struct {
 
 /// Exit the program with given code
 pub fn exit(code: i32) noreturn {
+    stdout_buffer.flush();
     std.posix.exit(@intCast(code));
 }
 
@@ -155,14 +157,15 @@ pub const stdin = struct {
     }
 };
 
-/// Standard output (stub)
+/// Standard output (shares print()'s buffer)
 pub const stdout = struct {
     pub fn write(data: []const u8) !usize {
-        const writer = std.io.getStdOut().writer();
-        try writer.writeAll(data);
+        stdout_buffer.writeAll(data);
         return data.len;
     }
-    pub fn flush() !void {}
+    pub fn flush() !void {
+        stdout_buffer.flush();
+    }
 };
 
 /// Standard error (stub)
@@ -9,115 +9,193 @@ const Allocator = std.mem.Allocator;
 
 /// deque([iterable[, maxlen]]) -> deque object
 /// A list-like sequence optimized for data accesses near its endpoints.
+///
+/// Elements live in one allocation with free room on both sides, so both ends
+/// are amortized O(1) and `items` stays a contiguous slice. That keeps the
+/// std.ArrayList surface compiled code already uses (items/capacity fields,
+/// append/pop/insert/orderedRemove/appendSlice/clone) while popleft/appendleft
+/// just move `head` instead of shifting every element.
 pub fn Deque(comptime T: type) type {
     return struct {
-        items: std.ArrayList(T),
-        maxlen: ?usize,
-        allocator: Allocator,
+        /// Live elements, oldest first: buffer[head..][0..items.len]
+        items: []T = &[_]T{},
+        /// Allocated length of the backing buffer
+        capacity: usize = 0,
+        head: usize = 0,
+        maxlen: ?usize = null,
 
         const Self = @This();
+        const min_capacity = 8;
 
-        pub fn init(allocator: Allocator) Self {
-            return .{
-                .items = .empty,
-                .maxlen = null,
-                .allocator = allocator,
-            };
+        pub const empty: Self = .{};
+
+        pub fn init() Self {
+            return .{};
         }
 
-        pub fn initWithMaxlen(allocator: Allocator, maxlen: usize) Self {
-            return .{
-                .items = .empty,
-                .maxlen = maxlen,
-                .allocator = allocator,
-            };
+        pub fn initWithMaxlen(maxlen: usize) Self {
+            return .{ .maxlen = maxlen };
         }
 
-        pub fn deinit(self: *Self) void {
-            self.items.deinit(self.allocator);
+        pub fn deinit(self: *Self, allocator: Allocator) void {
+            allocator.free(self.allocatedSlice());
+            self.* = .{ .maxlen = self.maxlen };
+        }
+
+        fn allocatedSlice(self: Self) []T {
+            return self.items.ptr[0..self.capacity];
+        }
+
+        /// Point `items` at buffer[head..][0..n]
+        fn setItems(self: *Self, buffer: []T, head: usize, n: usize) void {
+            self.head = head;
+            self.items = buffer[head..][0..n];
+        }
+
+        fn frontRoom(self: Self) usize {
+            return self.head;
+        }
+
+        fn backRoom(self: Self) usize {
+            return self.capacity - self.head - self.items.len;
+        }
+
+        /// Make room for `front` more elements on the left and `back` on the right.
+        /// Recenters in place when the buffer is at least half free, else doubles,
+        /// so a run of pushes on one end costs O(1) amortized.
+        fn ensureRoom(self: *Self, allocator: Allocator, front: usize, back: usize) !void {
+            if (self.frontRoom() >= front and self.backRoom() >= back) return;
+
+            const n = self.items.len;
+            const needed = n + front + back;
+            if (self.capacity >= 2 * needed) {
+                const buffer = self.allocatedSlice();
+                const head = front + (self.capacity - needed) / 2;
+                if (head < self.head) {
+                    std.mem.copyForwards(T, buffer[head..][0..n], self.items);
+                } else {
+                    std.mem.copyBackwards(T, buffer[head..][0..n], self.items);
+                }
+                self.setItems(buffer, head, n);
+                return;
+            }
+
+            const new_capacity = @max(min_capacity, 2 * needed);
+            const buffer = try allocator.alloc(T, new_capacity);
+            const head = front + (new_capacity - needed) / 2;
+            @memcpy(buffer[head..][0..n], self.items);
+            allocator.free(self.allocatedSlice());
+            self.capacity = new_capacity;
+            self.setItems(buffer, head, n);
         }
 
         /// Add an element to the right side of the deque
-        pub fn append(self: *Self, value: T) !void {
+        pub fn append(self: *Self, allocator: Allocator, value: T) !void {
             if (self.maxlen) |max| {
-                if (self.items.items.len >= max) {
-                    _ = self.items.orderedRemove(0);
-                }
+                if (max == 0) return;
+                if (self.items.len >= max) _ = self.popleft();
             }
-            try self.items.append(self.allocator, value);
+            try self.ensureRoom(allocator, 0, 1);
+            self.items.len += 1;
+            self.items[self.items.len - 1] = value;
         }
 
         /// Add an element to the left side of the deque
-        pub fn appendleft(self: *Self, value: T) !void {
+        pub fn appendleft(self: *Self, allocator: Allocator, value: T) !void {
             if (self.maxlen) |max| {
-                if (self.items.items.len >= max) {
-                    _ = self.items.pop();
-                }
+                if (max == 0) return;
+                if (self.items.len >= max) _ = self.pop();
             }
-            try self.items.insert(self.allocator, 0, value);
+            try self.ensureRoom(allocator, 1, 0);
+            const buffer = self.allocatedSlice();
+            self.setItems(buffer, self.head - 1, self.items.len + 1);
+            self.items[0] = value;
         }
 
         /// Remove and return an element from the right side
         pub fn pop(self: *Self) ?T {
-            return self.items.pop();
+            if (self.items.len == 0) return null;
+            const value = self.items[self.items.len - 1];
+            self.items.len -= 1;
+            return value;
         }
 
         /// Remove and return an element from the left side
         pub fn popleft(self: *Self) ?T {
-            if (self.items.items.len == 0) return null;
-            return self.items.orderedRemove(0);
+            if (self.items.len == 0) return null;
+            const value = self.items[0];
+            self.setItems(self.allocatedSlice(), self.head + 1, self.items.len - 1);
+            return value;
         }
 
         /// Extend the right side with elements from iterable
-        pub fn extend(self: *Self, values: []const T) !void {
-            for (values) |v| {
-                try self.append(v);
+        pub fn extend(self: *Self, allocator: Allocator, values: []const T) !void {
+            return self.appendSlice(allocator, values);
+        }
+
+        /// std.ArrayList-compatible extend
+        pub fn appendSlice(self: *Self, allocator: Allocator, values: []const T) !void {
+            if (self.maxlen != null) {
+                for (values) |v| try self.append(allocator, v);
+                return;
             }
+            try self.ensureRoom(allocator, 0, values.len);
+            const old_len = self.items.len;
+            self.items.len += values.len;
+            @memcpy(self.items[old_len..], values);
         }
 
         /// Extend the left side with elements from iterable
-        pub fn extendleft(self: *Self, values: []const T) !void {
+        pub fn extendleft(self: *Self, allocator: Allocator, values: []const T) !void {
             // Note: extendleft reverses the order
-            var i: usize = values.len;
-            while (i > 0) {
-                i -= 1;
-                try self.appendleft(values[i]);
-            }
+            if (self.maxlen == null) try self.ensureRoom(allocator, values.len, 0);
+            for (values) |v| try self.appendleft(allocator, v);
         }
 
         /// Rotate the deque n steps to the right (negative for left)
-        pub fn rotate(self: *Self, n: i32) void {
-            if (self.items.items.len <= 1) return;
-
-            const item_len = self.items.items.len;
-            const steps: usize = @intCast(@mod(n, @as(i32, @intCast(item_len))));
-
-            if (steps == 0) return;
-
-            // Rotate right by moving last `steps` elements to front
-            var temp = std.ArrayList(T).init(self.allocator);
-            defer temp.deinit(self.allocator);
-
-            // This is a simplified rotation - could be optimized
-            for (0..steps) |_| {
-                if (self.pop()) |v| {
-                    temp.insert(self.allocator, 0, v) catch {};
-                }
-            }
-            for (temp.items) |v| {
-                self.items.insert(self.allocator, 0, v) catch {};
+        /// Amortized O(k) for k = min(|n|, len - |n|): the shorter run moves to the
+        /// other end, recentering (or growing) first when that end has no room
+        pub fn rotate(self: *Self, allocator: Allocator, n: i64) !void {
+            const item_len = self.items.len;
+            if (item_len <= 1) return;
+
+            const right: usize = @intCast(@mod(n, @as(i64, @intCast(item_len))));
+            if (right == 0) return;
+            // Rotating right by k == rotating left by len - k; move the shorter run
+            const go_right = right <= item_len / 2;
+            const k = if (go_right) right else item_len - right;
+
+            if (go_right) {
+                // Move the last k elements in front of head
+                try self.ensureRoom(allocator, k, 0);
+                const buffer = self.allocatedSlice();
+                const new_head = self.head - k;
+                @memcpy(buffer[new_head..self.head], self.items[item_len - k ..]);
+                self.setItems(buffer, new_head, item_len);
+            } else {
+                // Move the first k elements past the tail
+                try self.ensureRoom(allocator, 0, k);
+                const buffer = self.allocatedSlice();
+                const tail = self.head + item_len;
+                @memcpy(buffer[tail..][0..k], self.items[0..k]);
+                self.setItems(buffer, self.head + k, item_len);
             }
         }
 
         /// Remove all elements from the deque
         pub fn clear(self: *Self) void {
-            self.items.clearRetainingCapacity();
+            self.clearRetainingCapacity();
+        }
+
+        /// std.ArrayList-compatible clear
+        pub fn clearRetainingCapacity(self: *Self) void {
+            self.setItems(self.allocatedSlice(), self.capacity / 2, 0);
         }
 
         /// Count the number of deque elements equal to x
         pub fn count(self: Self, value: T) usize {
             var c: usize = 0;
-            for (self.items.items) |item| {
+            for (self.items) |item| {
                 if (item == value) c += 1;
             }
             return c;
@@ -136,34 +214,59 @@ pub fn Deque(comptime T: type) type {
 
         /// index with start and stop parameters
         pub fn indexRange(self: Self, value: T, start: usize, stop: ?usize) ?usize {
-            const items_len = self.items.items.len;
+            const items_len = self.items.len;
             const actual_start = @min(start, items_len);
             const actual_stop = if (stop) |s| @min(s, items_len) else items_len;
 
             if (actual_start >= actual_stop) return null;
 
-            for (self.items.items[actual_start..actual_stop], actual_start..) |item, i| {
+            for (self.items[actual_start..actual_stop], actual_start..) |item, i| {
                 if (item == value) return i;
             }
             return null;
         }
 
-        /// Insert value at position i
-        pub fn insert(self: *Self, i: usize, value: T) !void {
-            const pos = @min(i, self.items.items.len);
-            try self.items.insert(self.allocator, pos, value);
+        /// Insert value at position i, shifting whichever side is shorter
+        pub fn insert(self: *Self, allocator: Allocator, i: usize, value: T) !void {
+            // Unlike append/appendleft, insert never evicts
             if (self.maxlen) |max| {
-                while (self.items.items.len > max) {
-                    _ = self.items.pop();
-                }
+                if (self.items.len >= max) return error.IndexError; // deque already at its maximum size
+            }
+
+            const pos = @min(i, self.items.len);
+            if (pos == 0) return self.appendleft(allocator, value);
+            if (pos == self.items.len) return self.append(allocator, value);
+
+            if (pos < self.items.len / 2) {
+                try self.ensureRoom(allocator, 1, 0);
+                self.setItems(self.allocatedSlice(), self.head - 1, self.items.len + 1);
+                std.mem.copyForwards(T, self.items[0..pos], self.items[1 .. pos + 1]);
+            } else {
+                try self.ensureRoom(allocator, 0, 1);
+                self.items.len += 1;
+                std.mem.copyBackwards(T, self.items[pos + 1 ..], self.items[pos .. self.items.len - 1]);
+            }
+            self.items[pos] = value;
+        }
+
+        /// std.ArrayList-compatible remove-by-index, shifting whichever side is shorter
+        pub fn orderedRemove(self: *Self, i: usize) T {
+            const value = self.items[i];
+            if (i < self.items.len / 2) {
+                std.mem.copyBackwards(T, self.items[1 .. i + 1], self.items[0..i]);
+                self.setItems(self.allocatedSlice(), self.head + 1, self.items.len - 1);
+            } else {
+                std.mem.copyForwards(T, self.items[i .. self.items.len - 1], self.items[i + 1 ..]);
+                self.items.len -= 1;
             }
+            return value;
         }
 
         /// Remove first occurrence of value
         pub fn remove(self: *Self, value: T) !void {
-            for (self.items.items, 0..) |item, i| {
+            for (self.items, 0..) |item, i| {
                 if (item == value) {
-                    _ = self.items.orderedRemove(i);
+                    _ = self.orderedRemove(i);
                     return;
                 }
             }
@@ -172,29 +275,70 @@ pub fn Deque(comptime T: type) type {
 
         /// Reverse the elements of the deque in-place
         pub fn reverse(self: *Self) void {
-            std.mem.reverse(T, self.items.items);
+            std.mem.reverse(T, self.items);
         }
 
         /// Return the number of elements
         pub fn len(self: Self) usize {
-            return self.items.items.len;
+            return self.items.len;
         }
 
         /// Get element at index
         pub fn get(self: Self, i: usize) ?T {
-            if (i >= self.items.items.len) return null;
-            return self.items.items[i];
+            if (i >= self.items.len) return null;
+            return self.items[i];
         }
 
         /// Set element at index
         pub fn set(self: *Self, i: usize, value: T) !void {
-            if (i >= self.items.items.len) return error.IndexError;
-            self.items.items[i] = value;
+            if (i >= self.items.len) return error.IndexError;
+            self.items[i] = value;
         }
 
-        /// Copy deque to slice
+        /// View of the elements, oldest first
         pub fn copy(self: Self) []const T {
-            return self.items.items;
+            return self.items;
+        }
+
+        /// Shallow copy with the same maxlen
+        pub fn clone(self: Self, allocator: Allocator) !Self {
+            var result = Self{ .maxlen = self.maxlen };
+            try result.ensureRoom(allocator, 0, self.items.len);
+            result.items.len = self.items.len;
+            @memcpy(result.items, self.items);
+            return result;
+        }
+
+        pub const Iterator = struct {
+            items: []const T,
+            index: usize = 0,
+
+            pub fn next(it: *Iterator) ?T {
+                if (it.index >= it.items.len) return null;
+                defer it.index += 1;
+                return it.items[it.index];
+            }
+        };
+
+        pub const ReverseIterator = struct {
+            items: []const T,
+            index: usize,
+
+            pub fn next(it: *ReverseIterator) ?T {
+                if (it.index == 0) return null;
+                it.index -= 1;
+                return it.items[it.index];
+            }
+        };
+
+        /// iter(deque)
+        pub fn iterator(self: *const Self) Iterator {
+            return .{ .items = self.items };
+        }
+
+        /// reversed(deque)
+        pub fn reverseIterator(self: *const Self) ReverseIterator {
+            return .{ .items = self.items, .index = self.items.len };
         }
     };
 }
@@ -1557,12 +1701,12 @@ pub fn namedtupleFactory(comptime typename: []const u8, comptime field_names: an
 
 test "deque basic operations" {
     const allocator = std.testing.allocator;
-    var d = Deque(i32).init(allocator);
-    defer d.deinit();
+    var d = Deque(i32).init();
+    defer d.deinit(allocator);
 
-    try d.append(1);
-    try d.append(2);
-    try d.appendleft(0);
+    try d.append(allocator, 1);
+    try d.append(allocator, 2);
+    try d.appendleft(allocator, 0);
 
     try std.testing.expectEqual(@as(usize, 3), d.len());
     try std.testing.expectEqual(@as(?i32, 0), d.get(0));
@@ -1576,18 +1720,84 @@ test "deque basic operations" {
 
 test "deque with maxlen" {
     const allocator = std.testing.allocator;
-    var d = Deque(i32).initWithMaxlen(allocator, 3);
-    defer d.deinit();
+    var d = Deque(i32).initWithMaxlen(3);
+    defer d.deinit(allocator);
 
-    try d.append(1);
-    try d.append(2);
-    try d.append(3);
-    try d.append(4); // Should evict 1
+    try d.append(allocator, 1);
+    try d.append(allocator, 2);
+    try d.append(allocator, 3);
+    try d.append(allocator, 4); // Should evict 1
 
     try std.testing.expectEqual(@as(usize, 3), d.len());
     try std.testing.expectEqual(@as(?i32, 2), d.get(0)); // 1 was evicted
 }
 
+test "deque as fifo queue reuses its buffer" {
+    const allocator = std.testing.allocator;
+    var d = Deque(u32).init();
+    defer d.deinit(allocator);
+
+    // BFS-style: one in, one out - capacity must stay bounded
+    for (0..16) |i| try d.append(allocator, @intCast(i));
+    for (16..10_000) |i| {
+        try d.append(allocator, @intCast(i));
+        try std.testing.expectEqual(@as(?u32, @intCast(i - 16)), d.popleft());
+    }
+    try std.testing.expect(d.capacity <= 4 * 16);
+    try std.testing.expectEqual(@as(usize, 16), d.len());
+}
+
+test "deque rotate insert and iterate" {
+    const allocator = std.testing.allocator;
+    var d = Deque(i32).init();
+    defer d.deinit(allocator);
+
+    try d.extend(allocator, &.{ 1, 2, 3, 4, 5 });
+    try d.rotate(allocator, 2);
+    try std.testing.expectEqualSlices(i32, &.{ 4, 5, 1, 2, 3 }, d.items);
+    try d.rotate(allocator, -3);
+    try std.testing.expectEqualSlices(i32, &.{ 2, 3, 4, 5, 1 }, d.items);
+
+    try d.insert(allocator, 1, 9);
+    try std.testing.expectEqual(@as(i32, 5), d.orderedRemove(4));
+    try d.extendleft(allocator, &.{ 7, 8 });
+    try std.testing.expectEqualSlices(i32, &.{ 8, 7, 2, 9, 3, 4, 1 }, d.items);
+
+    var sum: i32 = 0;
+    var it = d.iterator();
+    while (it.next()) |v| sum += v;
+    try std.testing.expectEqual(@as(i32, 34), sum);
+
+    var rev = d.reverseIterator();
+    try std.testing.expectEqual(@as(?i32, 1), rev.next());
+}
+
+test "deque rotate on a full buffer stays O(k)" {
+    const allocator = std.testing.allocator;
+    var d = Deque(u32).init();
+    defer d.deinit(allocator);
+
+    // append leaves no room in front; rotation must recenter, not shuffle in place
+    for (0..1000) |i| try d.append(allocator, @intCast(i));
+    for (0..999) |_| try d.rotate(allocator, 7);
+    // 999 * 7 = 6993 steps right: element 7 is at the front
+    try std.testing.expectEqual(@as(u32, 7), d.items[0]);
+    try std.testing.expectEqual(@as(u32, 6), d.items[999]);
+    try std.testing.expect(d.capacity <= 4 * 1000);
+}
+
+test "deque insert at maxlen raises instead of evicting" {
+    const allocator = std.testing.allocator;
+    var d = Deque(i32).initWithMaxlen(2);
+    defer d.deinit(allocator);
+
+    try d.append(allocator, 1);
+    try d.append(allocator, 2);
+    try std.testing.expectError(error.IndexError, d.insert(allocator, 0, 0));
+    try std.testing.expectError(error.IndexError, d.insert(allocator, 2, 3));
+    try std.testing.expectEqualSlices(i32, &.{ 1, 2 }, d.items);
+}
+
 test "counter basic" {
     const allocator = std.testing.allocator;
     var c = Counter(i32).init(allocator);
@@ -148,26 +148,191 @@ pub fn CmpToKey(comptime T: type) type {
     };
 }
 
+/// Hash context for memo keys
+/// Keys are argument tuples, so hashing is deep: strings and slices hash by content
+/// (AutoHashMap rejects slices and would compare them by pointer)
+pub fn KeyContext(comptime KeyType: type) type {
+    return struct {
+        pub fn hash(_: @This(), key: KeyType) u64 {
+            var hasher = std.hash.Wyhash.init(0);
+            hashKey(&hasher, key);
+            return hasher.final();
+        }
+
+        pub fn eql(_: @This(), a: KeyType, b: KeyType) bool {
+            return keyEql(a, b);
+        }
+    };
+}
+
+fn hashKey(hasher: *std.hash.Wyhash, key: anytype) void {
+    const T = @TypeOf(key);
+    switch (@typeInfo(T)) {
+        .void, .null => {},
+        .float => {
+            // 0.0 == -0.0 in Python, so they must hash alike
+            const normalized: T = if (key == 0) 0 else key;
+            hasher.update(std.mem.asBytes(&normalized));
+        },
+        .pointer => |ptr| switch (ptr.size) {
+            .slice => {
+                std.hash.autoHash(hasher, key.len);
+                if (comptime ptr.child == u8) {
+                    hasher.update(key);
+                } else {
+                    for (key) |item| hashKey(hasher, item);
+                }
+            },
+            else => if (comptime @typeInfo(ptr.child) == .array) hashKey(hasher, key.*) else std.hash.autoHash(hasher, key),
+        },
+        .array => for (key) |item| hashKey(hasher, item),
+        .optional => if (key) |value| {
+            hasher.update(&[_]u8{1});
+            hashKey(hasher, value);
+        } else hasher.update(&[_]u8{0}),
+        .@"struct" => |info| inline for (info.fields) |field| hashKey(hasher, @field(key, field.name)),
+        .@"union" => switch (key) {
+            inline else => |payload, tag| {
+                std.hash.autoHash(hasher, tag);
+                hashKey(hasher, payload);
+            },
+        },
+        else => std.hash.autoHash(hasher, key),
+    }
+}
+
+fn keyEql(a: anytype, b: @TypeOf(a)) bool {
+    const T = @TypeOf(a);
+    switch (@typeInfo(T)) {
+        .void, .null => return true,
+        .pointer => |ptr| switch (ptr.size) {
+            .slice => {
+                if (a.len != b.len) return false;
+                if (comptime ptr.child == u8) return std.mem.eql(u8, a, b);
+                for (a, b) |x, y| if (!keyEql(x, y)) return false;
+                return true;
+            },
+            else => return if (comptime @typeInfo(ptr.child) == .array) keyEql(a.*, b.*) else a == b,
+        },
+        .array => {
+            for (a, b) |x, y| if (!keyEql(x, y)) return false;
+            return true;
+        },
+        .optional => {
+            if (a == null or b == null) return a == null and b == null;
+            return keyEql(a.?, b.?);
+        },
+        .@"struct" => |info| {
+            inline for (info.fields) |field| {
+                if (!keyEql(@field(a, field.name), @field(b, field.name))) return false;
+            }
+            return true;
+        },
+        .@"union" => {
+            if (std.meta.activeTag(a) != std.meta.activeTag(b)) return false;
+            return switch (a) {
+                inline else => |payload, tag| keyEql(payload, @field(b, @tagName(tag))),
+            };
+        },
+        else => return a == b,
+    }
+}
+
+/// Copy of `key` whose slices the table owns (arguments are often freed as
+/// soon as the call returns). Freed with freeKey.
+fn dupeKey(allocator: Allocator, key: anytype) Allocator.Error!@TypeOf(key) {
+    const T = @TypeOf(key);
+    switch (@typeInfo(T)) {
+        .pointer => |ptr| {
+            if (ptr.size != .slice) return key;
+            const items = if (comptime ptr.sentinel()) |end|
+                try allocator.allocSentinel(ptr.child, key.len, end)
+            else
+                try allocator.alloc(ptr.child, key.len);
+            for (key, items, 0..) |item, *copy, i| {
+                copy.* = dupeKey(allocator, item) catch |err| {
+                    for (items[0..i]) |done| freeKey(allocator, done);
+                    allocator.free(items);
+                    return err;
+                };
+            }
+            return items;
+        },
+        .array => {
+            var copy: T = undefined;
+            for (key, &copy, 0..) |item, *slot, i| {
+                slot.* = dupeKey(allocator, item) catch |err| {
+                    for (copy[0..i]) |done| freeKey(allocator, done);
+                    return err;
+                };
+            }
+            return copy;
+        },
+        .optional => return if (key) |value| try dupeKey(allocator, value) else null,
+        .@"struct" => |info| {
+            var copy: T = key;
+            inline for (info.fields, 0..) |field, i| {
+                @field(copy, field.name) = dupeKey(allocator, @field(key, field.name)) catch |err| {
+                    inline for (info.fields[0..i]) |done| freeKey(allocator, @field(copy, done.name));
+                    return err;
+                };
+            }
+            return copy;
+        },
+        .@"union" => switch (key) {
+            inline else => |payload, tag| return @unionInit(T, @tagName(tag), try dupeKey(allocator, payload)),
+        },
+        else => return key,
+    }
+}
+
+fn freeKey(allocator: Allocator, key: anytype) void {
+    switch (@typeInfo(@TypeOf(key))) {
+        .pointer => |ptr| if (ptr.size == .slice) {
+            for (key) |item| freeKey(allocator, item);
+            allocator.free(key);
+        },
+        .array => for (key) |item| freeKey(allocator, item),
+        .optional => if (key) |value| freeKey(allocator, value),
+        .@"struct" => |info| inline for (info.fields) |field| freeKey(allocator, @field(key, field.name)),
+        .@"union" => switch (key) {
+            inline else => |payload| freeKey(allocator, payload),
+        },
+        else => {},
+    }
+}
+
 /// LRU Cache wrapper - implements functools.lru_cache
+/// Entries live in a node array threaded by a doubly-linked recency list,
+/// so get (with promotion), put and eviction are all O(1).
+/// max_size == 0 means unbounded.
 pub fn LruCache(comptime KeyType: type, comptime ValueType: type, comptime max_size: usize) type {
     return struct {
-        cache: std.AutoHashMap(KeyType, CacheEntry),
-        order: std.ArrayList(KeyType),
+        map: std.HashMapUnmanaged(KeyType, u32, KeyContext(KeyType), std.hash_map.default_max_load_percentage),
+        nodes: std.ArrayListUnmanaged(Node),
+        head: u32, // most recently used
+        tail: u32, // least recently used
         hits: usize,
         misses: usize,
         allocator: Allocator,
 
-        const CacheEntry = struct {
+        const nil = std.math.maxInt(u32);
+
+        const Node = struct {
+            key: KeyType,
             value: ValueType,
-            // Could add timestamp for LRU eviction
+            prev: u32,
+            next: u32,
         };
 
         const Self = @This();
 
         pub fn init(allocator: Allocator) Self {
             return .{
-                .cache = std.AutoHashMap(KeyType, CacheEntry).init(allocator),
-                .order = .empty,
+                .map = .{},
+                .nodes = .{},
+                .head = nil,
+                .tail = nil,
                 .hits = 0,
                 .misses = 0,
                 .allocator = allocator,
@@ -175,14 +340,22 @@ pub fn LruCache(comptime KeyType: type, comptime ValueType: type, comptime max_s
         }
 
         pub fn deinit(self: *Self) void {
-            self.cache.deinit();
-            self.order.deinit(self.allocator);
+            self.freeKeys();
+            self.map.deinit(self.allocator);
+            self.nodes.deinit(self.allocator);
+        }
+
+        fn freeKeys(self: *Self) void {
+            var it = self.map.keyIterator();
+            while (it.next()) |key| freeKey(self.allocator, key.*);
         }
 
         pub fn get(self: *Self, key: KeyType) ?ValueType {
-            if (self.cache.get(key)) |entry| {
+            if (self.map.get(key)) |idx| {
                 self.hits += 1;
-                return entry.value;
+                self.unlink(idx);
+                self.pushFront(idx);
+                return self.nodes.items[idx].value;
             }
             return null;
         }
@@ -190,16 +363,53 @@ pub fn LruCache(comptime KeyType: type, comptime ValueType: type, comptime max_s
         pub fn put(self: *Self, key: KeyType, value: ValueType) !void {
             self.misses += 1;
 
-            // Evict if at capacity
-            if (self.cache.count() >= max_size and max_size > 0) {
-                if (self.order.items.len > 0) {
-                    const oldest = self.order.orderedRemove(0);
-                    _ = self.cache.remove(oldest);
-                }
+            if (self.map.get(key)) |idx| {
+                self.nodes.items[idx].value = value;
+                self.unlink(idx);
+                self.pushFront(idx);
+                return;
             }
 
-            try self.cache.put(key, .{ .value = value });
-            try self.order.append(self.allocator, key);
+            // Everything that can fail happens before an entry is evicted
+            const owned = try dupeKey(self.allocator, key);
+            errdefer freeKey(self.allocator, owned);
+            try self.map.ensureUnusedCapacity(self.allocator, 1);
+
+            // Full: recycle the least recently used node in place
+            if (max_size > 0 and self.map.count() >= max_size) {
+                const idx = self.tail;
+                const evicted = self.nodes.items[idx].key;
+                _ = self.map.remove(evicted);
+                freeKey(self.allocator, evicted);
+                self.unlink(idx);
+                self.nodes.items[idx].key = owned;
+                self.nodes.items[idx].value = value;
+                self.pushFront(idx);
+                self.map.putAssumeCapacityNoClobber(owned, idx);
+                return;
+            }
+
+            const idx: u32 = @intCast(self.nodes.items.len);
+            try self.nodes.append(self.allocator, .{ .key = owned, .value = value, .prev = nil, .next = nil });
+            self.map.putAssumeCapacityNoClobber(owned, idx);
+            self.pushFront(idx);
+        }
+
+        fn unlink(self: *Self, idx: u32) void {
+            const node = &self.nodes.items[idx];
+            if (node.prev != nil) self.nodes.items[node.prev].next = node.next else self.head = node.next;
+            if (node.next != nil) self.nodes.items[node.next].prev = node.prev else self.tail = node.prev;
+            node.prev = nil;
+            node.next = nil;
+        }
+
+        fn pushFront(self: *Self, idx: u32) void {
+            const node = &self.nodes.items[idx];
+            node.prev = nil;
+            node.next = self.head;
+            if (self.head != nil) self.nodes.items[self.head].prev = idx;
+            self.head = idx;
+            if (self.tail == nil) self.tail = idx;
         }
 
         pub fn cacheInfo(self: Self) CacheInfo {
@@ -207,13 +417,16 @@ pub fn LruCache(comptime KeyType: type, comptime ValueType: type, comptime max_s
                 .hits = self.hits,
                 .misses = self.misses,
                 .maxsize = max_size,
-                .currsize = self.cache.count(),
+                .currsize = self.map.count(),
             };
         }
 
         pub fn cacheClear(self: *Self) void {
-            self.cache.clearRetainingCapacity();
-            self.order.clearRetainingCapacity();
+            self.freeKeys();
+            self.map.clearRetainingCapacity();
+            self.nodes.clearRetainingCapacity();
+            self.head = nil;
+            self.tail = nil;
             self.hits = 0;
             self.misses = 0;
         }
@@ -231,7 +444,7 @@ pub const CacheInfo = struct {
 /// This is equivalent to lru_cache(maxsize=None)
 pub fn Cache(comptime KeyType: type, comptime ValueType: type) type {
     return struct {
-        cache: std.AutoHashMap(KeyType, ValueType),
+        cache: std.HashMap(KeyType, ValueType, KeyContext(KeyType), std.hash_map.default_max_load_percentage),
         hits: usize,
         misses: usize,
         allocator: Allocator,
@@ -240,7 +453,7 @@ pub fn Cache(comptime KeyType: type, comptime ValueType: type) type {
 
         pub fn init(allocator: Allocator) Self {
             return .{
-                .cache = std.AutoHashMap(KeyType, ValueType).init(allocator),
+                .cache = std.HashMap(KeyType, ValueType, KeyContext(KeyType), std.hash_map.default_max_load_percentage).init(allocator),
                 .hits = 0,
                 .misses = 0,
                 .allocator = allocator,
@@ -248,9 +461,15 @@ pub fn Cache(comptime KeyType: type, comptime ValueType: type) type {
         }
 
         pub fn deinit(self: *Self) void {
+            self.freeKeys();
             self.cache.deinit();
         }
 
+        fn freeKeys(self: *Self) void {
+            var it = self.cache.keyIterator();
+            while (it.next()) |key| freeKey(self.allocator, key.*);
+        }
+
         pub fn get(self: *Self, key: KeyType) ?ValueType {
             if (self.cache.get(key)) |value| {
                 self.hits += 1;
@@ -261,7 +480,13 @@ pub fn Cache(comptime KeyType: type, comptime ValueType: type) type {
 
         pub fn put(self: *Self, key: KeyType, value: ValueType) !void {
             self.misses += 1;
-            try self.cache.put(key, value);
+            if (self.cache.getPtr(key)) |slot| {
+                slot.* = value;
+                return;
+            }
+            const owned = try dupeKey(self.allocator, key);
+            errdefer freeKey(self.allocator, owned);
+            try self.cache.putNoClobber(owned, value);
         }
 
         pub fn cacheInfo(self: Self) CacheInfo {
@@ -274,6 +499,7 @@ pub fn Cache(comptime KeyType: type, comptime ValueType: type) type {
         }
 
         pub fn cacheClear(self: *Self) void {
+            self.freeKeys();
             self.cache.clearRetainingCapacity();
             self.hits = 0;
             self.misses = 0;
@@ -281,6 +507,91 @@ pub fn Cache(comptime KeyType: type, comptime ValueType: type) type {
     };
 }
 
+/// Memo table behind @functools.lru_cache / @functools.cache in compiled code
+/// One table per decorated function, keyed on the function's inferred parameter types.
+/// `key_params` selects which parameters form the key (codegen skips the allocator
+/// and unused parameters). maxsize null = unbounded (functools.cache), 0 = no caching.
+///
+/// The decorated function's prologue is:
+///     if (M.enter()) {
+///         if (M.get(.{ args })) |hit| return hit;
+///         M.arm();
+///         return M.put(.{ args }, try f(args));
+///     }
+/// `arm` sets a thread-local flag so the nested call runs the real body
+/// while recursive calls made from that body go back through the table.
+pub fn Memo(comptime func: anytype, comptime key_params: []const usize, comptime maxsize: ?usize) type {
+    const fn_info = @typeInfo(@TypeOf(func)).@"fn";
+    const Key = blk: {
+        var types: [key_params.len]type = undefined;
+        for (key_params, 0..) |param_idx, i| types[i] = fn_info.params[param_idx].type.?;
+        break :blk std.meta.Tuple(&types);
+    };
+    const Return = fn_info.return_type.?;
+    const Value = switch (@typeInfo(Return)) {
+        .error_union => |eu| eu.payload,
+        else => Return,
+    };
+    const Table = if (maxsize) |n| LruCache(Key, Value, n) else Cache(Key, Value);
+    const no_cache = if (maxsize) |n| n == 0 else false;
+    const Mutex = if (@import("builtin").single_threaded) struct {
+        fn lock(_: *@This()) void {}
+        fn unlock(_: *@This()) void {}
+    } else std.Thread.Mutex;
+
+    return struct {
+        var table: Table = Table.init(std.heap.page_allocator);
+        var mutex: Mutex = .{};
+        threadlocal var bypass: bool = false;
+
+        /// False exactly once after computing() - the call that must run the body
+        pub fn enter() bool {
+            if (bypass) {
+                bypass = false;
+                return false;
+            }
+            return true;
+        }
+
+        pub fn get(key: Key) ?Value {
+            if (no_cache) return null;
+            mutex.lock();
+            defer mutex.unlock();
+            return table.get(key);
+        }
+
+        /// Next call to enter() on this thread runs the body
+        pub fn arm() void {
+            bypass = true;
+        }
+
+        /// Record a freshly computed result (errors propagate via `try` before
+        /// reaching here, so they are never cached - same as CPython)
+        pub fn put(key: Key, value: Value) Value {
+            mutex.lock();
+            defer mutex.unlock();
+            if (no_cache) {
+                table.misses += 1;
+            } else {
+                table.put(key, value) catch {};
+            }
+            return value;
+        }
+
+        pub fn cache_info() CacheInfo {
+            mutex.lock();
+            defer mutex.unlock();
+            return table.cacheInfo();
+        }
+
+        pub fn cache_clear() void {
+            mutex.lock();
+            defer mutex.unlock();
+            table.cacheClear();
+        }
+    };
+}
+
 /// WRAPPER_ASSIGNMENTS - Default attributes copied by update_wrapper
 /// In Python: ('__module__', '__name__', '__qualname__', '__annotations__', '__doc__', '__wrapped__')
 pub const WRAPPER_ASSIGNMENTS: [6][]const u8 = .{
@@ -377,6 +688,73 @@ test "lru cache eviction" {
     try std.testing.expectEqual(@as(?i32, 300), cache.get(3));
 }
 
+test "lru cache get promotes entry" {
+    const allocator = std.testing.allocator;
+    var cache = LruCache(i32, i32, 2).init(allocator);
+    defer cache.deinit();
+
+    try cache.put(1, 100);
+    try cache.put(2, 200);
+    _ = cache.get(1); // 1 is now most recently used
+    try cache.put(3, 300); // Should evict key 2
+
+    try std.testing.expectEqual(@as(?i32, 100), cache.get(1));
+    try std.testing.expectEqual(@as(?i32, null), cache.get(2));
+    try std.testing.expectEqual(@as(?i32, 300), cache.get(3));
+    try std.testing.expectEqual(@as(usize, 2), cache.cacheInfo().currsize);
+}
+
+test "lru cache string keys compare by content" {
+    const allocator = std.testing.allocator;
+    var cache = LruCache(struct { []const u8 }, i32, 4).init(allocator);
+    defer cache.deinit();
+
+    var buf = "key".*;
+    try cache.put(.{"key"}, 1);
+    try std.testing.expectEqual(@as(?i32, 1), cache.get(.{buf[0..]}));
+}
+
+test "lru cache owns slice keys" {
+    const allocator = std.testing.allocator;
+    var cache = LruCache(struct { []const u8 }, i32, 2).init(allocator);
+    defer cache.deinit();
+
+    for ([_][]const u8{ "alpha", "beta", "gamma" }, 0..) |word, i| {
+        const arg = try allocator.dupe(u8, word);
+        try cache.put(.{arg}, @intCast(i));
+        allocator.free(arg); // caller's argument goes away; "alpha" is evicted
+    }
+    try std.testing.expectEqual(@as(?i32, null), cache.get(.{"alpha"}));
+    try std.testing.expectEqual(@as(?i32, 2), cache.get(.{"gamma"}));
+
+    cache.cacheClear();
+    try cache.put(.{"beta"}, 5);
+    try std.testing.expectEqual(@as(?i32, 5), cache.get(.{"beta"}));
+}
+
+test "memo table caches recursive calls" {
+    const fib = struct {
+        var calls: usize = 0;
+
+        fn f(n: i64) i64 {
+            const M = Memo(f, &.{0}, 128);
+            if (M.enter()) {
+                if (M.get(.{n})) |hit| return hit;
+                M.arm();
+                return M.put(.{n}, f(n));
+            }
+            calls += 1;
+            return if (n < 2) n else f(n - 1) + f(n - 2);
+        }
+    };
+
+    try std.testing.expectEqual(@as(i64, 832040), fib.f(30));
+    try std.testing.expectEqual(@as(usize, 31), fib.calls); // each n computed once
+    const info = Memo(fib.f, &.{0}, 128).cache_info();
+    try std.testing.expectEqual(@as(usize, 31), info.currsize);
+    try std.testing.expectEqual(@as(usize, 28), info.hits);
+}
+
 test "cmp_to_key comparisons" {
     // Standard comparison function: returns -1, 0, or 1
     const compare = struct {
@@ -11,14 +11,111 @@ pub const PyFileObject = extern struct {
     file_data: ?*anyopaque,
 };
 
+/// Read buffer size for line-oriented reads (grows for lines longer than this)
+pub const read_buffer_size = 64 * 1024;
+
 /// Internal file data structure
 pub const PyFileData = struct {
     handle: std.fs.File,
     mode: []const u8,
     closed: bool,
     allocator: std.mem.Allocator,
+    /// Read buffer, allocated on first line read; buf[start..end] is unread data
+    buf: []u8 = &.{},
+    start: usize = 0,
+    end: usize = 0,
+
+    /// Next line including its '\n', as a slice into the read buffer.
+    /// Valid until the next read from this file; null at EOF.
+    pub fn nextLine(self: *PyFileData) !?[]const u8 {
+        if (self.buf.len == 0) {
+            self.buf = try self.allocator.alloc(u8, read_buffer_size);
+        }
+
+        var scan = self.start;
+        while (true) {
+            // indexOfScalarPos is vectorized, so this scans 16-64 bytes per step
+            if (std.mem.indexOfScalarPos(u8, self.buf[0..self.end], scan, '\n')) |nl| {
+                const line = self.buf[self.start .. nl + 1];
+                self.start = nl + 1;
+                return line;
+            }
+
+            // No newline buffered: move the partial line to the front and refill
+            if (self.start > 0) {
+                const pending = self.end - self.start;
+                std.mem.copyForwards(u8, self.buf[0..pending], self.buf[self.start..self.end]);
+                self.start = 0;
+                self.end = pending;
+            }
+            scan = self.end;
+            if (self.end == self.buf.len) {
+                self.buf = try self.allocator.realloc(self.buf, self.buf.len * 2);
+            }
+
+            const n = try self.handle.read(self.buf[self.end..]);
+            if (n == 0) {
+                if (self.start == self.end) return null;
+                const line = self.buf[self.start..self.end];
+                self.start = self.end;
+                return line;
+            }
+            self.end += n;
+        }
+    }
+
+    /// Bytes read ahead of the caller's position
+    pub fn buffered(self: *const PyFileData) []const u8 {
+        return self.buf[self.start..self.end];
+    }
+
+    /// Drop read-ahead, seeking the OS position back to the caller's position
+    pub fn discardBuffer(self: *PyFileData) !void {
+        const pending = self.end - self.start;
+        if (pending > 0) {
+            try self.handle.seekBy(-@as(i64, @intCast(pending)));
+        }
+        self.start = 0;
+        self.end = 0;
+    }
+
+    /// Fill dest (short only at EOF), serving read-ahead left by readline() first
+    pub fn readAll(self: *PyFileData, dest: []u8) !usize {
+        const pending = self.buffered();
+        const from_buf = @min(pending.len, dest.len);
+        @memcpy(dest[0..from_buf], pending[0..from_buf]);
+        self.start += from_buf;
+        if (from_buf == dest.len) return from_buf;
+        return from_buf + try self.handle.readAll(dest[from_buf..]);
+    }
+
+    /// Read to EOF, starting with any read-ahead
+    fn readRemaining(self: *PyFileData, allocator: std.mem.Allocator) ![]u8 {
+        const rest = try self.handle.readToEndAlloc(allocator, std.math.maxInt(usize));
+        const pending = self.buffered();
+        if (pending.len == 0) return rest;
+        defer allocator.free(rest);
+        const content = try std.mem.concat(allocator, u8, &.{ pending, rest });
+        self.start = 0;
+        self.end = 0;
+        return content;
+    }
 };
 
+fn isReadOnlyBinary(mode: []const u8) bool {
+    return std.mem.indexOfScalar(u8, mode, 'b') != null and
+        std.mem.indexOfAny(u8, mode, "wax+") == null;
+}
+
+fn fileData(obj: *runtime.PyObject) !*PyFileData {
+    const file_obj: *PyFileObject = @ptrCast(@alignCast(obj));
+    const data: *PyFileData = @ptrCast(@alignCast(file_obj.file_data orelse return error.ValueError));
+    if (data.closed) {
+        return error.ValueError; // File is closed
+    }
+    return data;
+}
+
 pub const PyFile = struct {
     /// Create a new PyFile wrapping a std.fs.File
     pub fn create(allocator: std.mem.Allocator, file: std.fs.File, mode: []const u8) !*runtime.PyObject {
@@ -44,36 +141,31 @@ pub const PyFile = struct {
 
     /// Read entire file contents as string
     pub fn read(obj: *runtime.PyObject, allocator: std.mem.Allocator) !*runtime.PyObject {
-        const file_obj: *PyFileObject = @ptrCast(@alignCast(obj));
-        const data: *PyFileData = @ptrCast(@alignCast(file_obj.file_data orelse return error.ValueError));
-
-        if (data.closed) {
-            return error.ValueError; // File is closed
+        const data = try fileData(obj);
+        // Large read-only binary files can be mapped instead of copied (opt-in)
+        if (data.buffered().len == 0 and isReadOnlyBinary(data.mode)) {
+            if (try runtime.mmap.mapForRead(data.handle)) |mapped| {
+                return try runtime.PyString.createMapped(allocator, mapped);
+            }
         }
-
-        const content = try data.handle.readToEndAlloc(allocator, std.math.maxInt(usize));
+        const content = try data.readRemaining(allocator);
         return try runtime.PyString.createOwned(allocator, content);
     }
 
     /// Read n bytes (or all if n is null)
     pub fn readN(obj: *runtime.PyObject, allocator: std.mem.Allocator, n: ?usize) !*runtime.PyObject {
-        const file_obj: *PyFileObject = @ptrCast(@alignCast(obj));
-        const data: *PyFileData = @ptrCast(@alignCast(file_obj.file_data orelse return error.ValueError));
-
-        if (data.closed) {
-            return error.ValueError;
-        }
+        const data = try fileData(obj);
 
         if (n) |bytes| {
             const buf = try allocator.alloc(u8, bytes);
-            const read_len = try data.handle.read(buf);
+            const read_len = try data.readAll(buf);
             if (read_len < bytes) {
                 const result = try allocator.realloc(buf, read_len);
                 return try runtime.PyString.createOwned(allocator, result);
             }
             return try runtime.PyString.createOwned(allocator, buf);
         } else {
-            const content = try data.handle.readToEndAlloc(allocator, std.math.maxInt(usize));
+            const content = try data.readRemaining(allocator);
             return try runtime.PyString.createOwned(allocator, content);
         }
     }
@@ -87,9 +179,27 @@ pub const PyFile = struct {
             return error.ValueError;
         }
 
+        // sys.stdout shares print()'s buffer so output stays ordered
+        if (data.handle.handle == std.posix.STDOUT_FILENO) {
+            runtime.stdout.writeAll(content);
+            return content.len;
+        }
+
+        // Writes land at the caller's position, not past the read-ahead
+        try data.discardBuffer();
         return try data.handle.write(content);
     }
 
+    /// Flush buffered output (only stdout is buffered; plain files write through)
+    pub fn flush(obj: *runtime.PyObject) void {
+        const file_obj: *PyFileObject = @ptrCast(@alignCast(obj));
+        const data: *PyFileData = @ptrCast(@alignCast(file_obj.file_data orelse return));
+
+        if (data.handle.handle == std.posix.STDOUT_FILENO) {
+            runtime.stdout.flush();
+        }
+    }
+
     /// Close the file
     pub fn close(obj: *runtime.PyObject) void {
         const file_obj: *PyFileObject = @ptrCast(@alignCast(obj));
@@ -101,6 +211,18 @@ pub const PyFile = struct {
         }
     }
 
+    /// Read up to dest.len bytes into dest; returns 0 at EOF
+    pub fn readInto(obj: *runtime.PyObject, dest: []u8) !usize {
+        const data = try fileData(obj);
+        return data.readAll(dest);
+    }
+
+    /// OS file descriptor (for mmap.mmap(f.fileno(), ...))
+    pub fn fileno(obj: *runtime.PyObject) !i64 {
+        const data = try fileData(obj);
+        return @intCast(data.handle.handle);
+    }
+
     /// Get the closed status of the file
     pub fn getClosed(obj: *runtime.PyObject) bool {
         const file_obj: *PyFileObject = @ptrCast(@alignCast(obj));
@@ -116,78 +238,83 @@ pub const PyFile = struct {
         if (!data.closed) {
             data.handle.close();
         }
+        if (data.buf.len > 0) data.allocator.free(data.buf);
         allocator.destroy(data);
         allocator.destroy(file_obj);
     }
 
-    /// Read all lines from file as ArrayList of strings
-    /// Used for Python's `for line in file:` iteration
-    pub fn readlines(obj: *runtime.PyObject, allocator: std.mem.Allocator) !std.ArrayList([]const u8) {
-        const file_obj: *PyFileObject = @ptrCast(@alignCast(obj));
-        const data: *PyFileData = @ptrCast(@alignCast(file_obj.file_data orelse return error.ValueError));
-
-        if (data.closed) {
-            return error.ValueError;
-        }
+    /// Read one line including its trailing newline ("" at EOF)
+    pub fn readline(obj: *runtime.PyObject, allocator: std.mem.Allocator) ![]const u8 {
+        const data = try fileData(obj);
+        const line = (try data.nextLine()) orelse return "";
+        return try allocator.dupe(u8, line);
+    }
 
-        // Read entire file content
-        const content = try data.handle.readToEndAlloc(allocator, std.math.maxInt(usize));
+    /// Read all remaining lines as ArrayList of strings
+    pub fn readlines(obj: *runtime.PyObject, allocator: std.mem.Allocator) !std.ArrayList([]const u8) {
+        const data = try fileData(obj);
 
-        // Split into lines
         var lines = std.ArrayList([]const u8){};
-        var iter = std.mem.splitScalar(u8, content, '\n');
-        while (iter.next()) |line| {
-            // Include the newline character like Python does (except for last line if no trailing newline)
-            const line_with_newline = if (iter.peek() != null)
-                try std.fmt.allocPrint(allocator, "{s}\n", .{line})
-            else if (line.len > 0)
-                try allocator.dupe(u8, line)
-            else
-                continue; // Skip empty last line
-            try lines.append(allocator, line_with_newline);
+        while (try data.nextLine()) |line| {
+            try lines.append(allocator, try allocator.dupe(u8, line));
         }
-
         return lines;
     }
 
     /// Iterator for line-by-line file reading (lazy iteration)
+    /// Used for Python's `for line in file:` iteration
     pub const LineIterator = struct {
-        reader: std.fs.File.Reader,
+        data: *PyFileData,
         allocator: std.mem.Allocator,
-        done: bool = false,
 
+        /// Next line as a slice into the file's read buffer, valid until the
+        /// following call. For loop bodies where the line does not escape.
         pub fn next(self: *LineIterator) !?[]const u8 {
-            if (self.done) return null;
-
-            var line_buffer = std.ArrayList(u8){};
-            self.reader.streamUntilDelimiter(line_buffer.writer(self.allocator), '\n', null) catch |err| {
-                if (err == error.EndOfStream) {
-                    self.done = true;
-                    if (line_buffer.items.len > 0) {
-                        return line_buffer.items;
-                    }
-                    return null;
-                }
-                return err;
-            };
-            // Add the newline back (Python includes it)
-            try line_buffer.append(self.allocator, '\n');
-            return line_buffer.items;
+            return self.data.nextLine();
+        }
+
+        /// Next line copied into memory owned by the caller
+        pub fn nextOwned(self: *LineIterator) !?[]const u8 {
+            const line = (try self.data.nextLine()) orelse return null;
+            return try self.allocator.dupe(u8, line);
         }
     };
 
     /// Get a line iterator for the file
     pub fn lineIterator(obj: *runtime.PyObject, allocator: std.mem.Allocator) !LineIterator {
-        const file_obj: *PyFileObject = @ptrCast(@alignCast(obj));
-        const data: *PyFileData = @ptrCast(@alignCast(file_obj.file_data orelse return error.ValueError));
-
-        if (data.closed) {
-            return error.ValueError;
-        }
-
         return LineIterator{
-            .reader = data.handle.reader(),
+            .data = try fileData(obj),
             .allocator = allocator,
         };
     }
 };
+
+test "buffered line reads" {
+    const allocator = std.testing.allocator;
+    var tmp = std.testing.tmpDir(.{});
+    defer tmp.cleanup();
+
+    // Second line is longer than the read buffer to force a grow
+    const long_line = try allocator.alloc(u8, read_buffer_size + 10);
+    defer allocator.free(long_line);
+    @memset(long_line, 'x');
+    long_line[long_line.len - 1] = '\n';
+    const content = try std.mem.concat(allocator, u8, &.{ "first\n", long_line, "third\nlast" });
+    defer allocator.free(content);
+    try tmp.dir.writeFile(.{ .sub_path = "lines.txt", .data = content });
+
+    var data = PyFileData{
+        .handle = try tmp.dir.openFile("lines.txt", .{}),
+        .mode = "r",
+        .closed = false,
+        .allocator = allocator,
+    };
+    defer allocator.free(data.buf);
+    defer data.handle.close();
+
+    try std.testing.expectEqualStrings("first\n", (try data.nextLine()).?);
+    try std.testing.expectEqualStrings(long_line, (try data.nextLine()).?);
+    try std.testing.expectEqualStrings("third\n", (try data.nextLine()).?);
+    try std.testing.expectEqualStrings("last", (try data.nextLine()).?);
+    try std.testing.expect((try data.nextLine()) == null);
+}
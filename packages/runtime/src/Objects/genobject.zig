@@ -0,0 +1,56 @@
+/// Generator frame support
+/// Compiled generators are structs with a resume state and their locals as
+/// fields (see codegen/native/generator_state_machine.zig). A frame that
+/// iterates over one of its arguments stores the argument as-is, so these
+/// helpers give a uniform slice view over arrays, slices and ArrayLists.
+const std = @import("std");
+
+fn Slice(comptime T: type) type {
+    return switch (@typeInfo(T)) {
+        .pointer => |p| switch (p.size) {
+            .slice => []const p.child,
+            .one => Slice(p.child),
+            else => @compileError("cannot iterate over " ++ @typeName(T)),
+        },
+        .array => |a| []const a.child,
+        .@"struct" => if (@hasField(T, "items"))
+            Slice(@FieldType(T, "items"))
+        else
+            @compileError("cannot iterate over " ++ @typeName(T)),
+        else => @compileError("cannot iterate over " ++ @typeName(T)),
+    };
+}
+
+/// Element type produced by iterating over a stored `T`
+pub fn Item(comptime T: type) type {
+    return @typeInfo(Slice(T)).pointer.child;
+}
+
+/// Elements of the iterable stored at `iterable`
+pub fn items(iterable: anytype) Slice(@TypeOf(iterable.*)) {
+    const T = @TypeOf(iterable.*);
+    return switch (@typeInfo(T)) {
+        .pointer => |p| if (p.size == .slice) iterable.* else items(iterable.*),
+        .array => iterable,
+        else => iterable.items,
+    };
+}
+
+test "items views arrays, slices and lists" {
+    const allocator = std.testing.allocator;
+
+    var array = [_]i64{ 1, 2, 3 };
+    try std.testing.expectEqualSlices(i64, &array, items(&array));
+
+    const slice: []const i64 = &array;
+    try std.testing.expectEqual(@as(usize, 3), items(&slice).len);
+    try std.testing.expect(Item([]const i64) == i64);
+
+    var list = std.ArrayList(i64){};
+    defer list.deinit(allocator);
+    try list.append(allocator, 7);
+    try std.testing.expectEqualSlices(i64, &[_]i64{7}, items(&list));
+
+    const list_ptr = &list;
+    try std.testing.expectEqual(@as(i64, 7), items(&list_ptr)[0]);
+}
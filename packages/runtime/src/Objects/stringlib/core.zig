@@ -10,6 +10,8 @@ const PythonError = runtime.PythonError;
 // Unicode state flags (simplified from CPython)
 const UNICODE_ASCII: u32 = 0x0001;
 const UNICODE_READY: u32 = 0x0002;
+/// Data is a read-only file mapping (munmap instead of free)
+pub const UNICODE_MAPPED: u32 = 0x0004;
 
 /// Python string type using CPython-compatible PyUnicodeObject
 pub const PyString = struct {
@@ -49,7 +51,9 @@ pub const PyString = struct {
         const str_obj: *PyUnicodeObject = @ptrCast(@alignCast(obj));
 
         const str_len: usize = @intCast(str_obj.length);
-        if (str_len > 0) {
+        if (str_obj.state & UNICODE_MAPPED != 0) {
+            runtime.mmap.unmap(str_obj.data, str_len);
+        } else if (str_len > 0) {
             allocator.free(str_obj.data[0..str_len]);
         }
         allocator.destroy(str_obj);
@@ -73,6 +77,14 @@ pub const PyString = struct {
         return @ptrCast(str_obj);
     }
 
+    /// Create PyString over a mapping from runtime.mmap.mapForRead (takes ownership)
+    pub fn createMapped(allocator: std.mem.Allocator, mapped: []const u8) !*PyObject {
+        const obj = try createOwned(allocator, mapped);
+        const str_obj: *PyUnicodeObject = @ptrCast(@alignCast(obj));
+        str_obj.state |= UNICODE_MAPPED;
+        return obj;
+    }
+
     /// Create PyString borrowing from another - new layout copies instead
     pub fn createBorrowed(allocator: std.mem.Allocator, source_obj: *PyObject, slice: []const u8) !*PyObject {
         _ = source_obj; // Not used - we copy instead of borrow in new layout
@@ -118,24 +118,24 @@ pub const PyTuple = struct {
         const tuple_obj: *PyTupleObject = @ptrCast(@alignCast(obj));
         const size: usize = @intCast(tuple_obj.ob_base.ob_size);
 
-        std.debug.print("(", .{});
+        runtime.stdout.print("(", .{});
         for (0..size) |i| {
             const item = tuple_obj.ob_item[i];
             if (runtime.PyLong_Check(item)) {
                 const long_obj: *PyLongObject = @ptrCast(@alignCast(item));
-                std.debug.print("{d}", .{long_obj.ob_digit});
+                runtime.stdout.print("{d}", .{long_obj.ob_digit});
             } else if (runtime.PyUnicode_Check(item)) {
                 const str_obj: *PyUnicodeObject = @ptrCast(@alignCast(item));
                 const str_len: usize = @intCast(str_obj.length);
-                std.debug.print("'{s}'", .{str_obj.data[0..str_len]});
+                runtime.stdout.print("'{s}'", .{str_obj.data[0..str_len]});
             } else {
-                std.debug.print("{any}", .{item});
+                runtime.stdout.print("{any}", .{item});
             }
             if (i < size - 1) {
-                std.debug.print(", ", .{});
+                runtime.stdout.print(", ", .{});
             }
         }
-        std.debug.print(")", .{});
+        runtime.stdout.print(")", .{});
     }
 };
 
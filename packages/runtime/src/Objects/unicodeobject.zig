@@ -7,6 +7,8 @@ const transform = @import("stringlib/transform.zig");
 const search = @import("stringlib/search.zig");
 const manipulate = @import("stringlib/manipulate.zig");
 
+pub const UNICODE_MAPPED = core.UNICODE_MAPPED;
+
 // Re-export PyString struct type with COW support
 pub const PyString = struct {
     data: []const u8,
@@ -15,6 +17,7 @@ pub const PyString = struct {
     // Core operations
     pub const create = core.PyString.create;
     pub const createOwned = core.PyString.createOwned;
+    pub const createMapped = core.PyString.createMapped;
     pub const createBorrowed = core.PyString.createBorrowed;
     pub const isBorrowed = core.PyString.isBorrowed;
     pub const deinit = core.PyString.deinit;
@@ -124,6 +124,11 @@ pub const OpCode = enum(u8) {
     // Control
     Return, // Return top of stack
     Call, // Call builtin function
+
+    // Names (exec statements) - arg is the constant index of the name string
+    LoadName,
+    StoreName,
+    LoadNone, // Push None (implicit result of exec)
 };
 
 /// Bytecode instruction
@@ -148,69 +153,101 @@ pub const BytecodeProgram = struct {
     instructions: []Instruction,
     constants: []Constant,
     allocator: std.mem.Allocator,
+    /// String/bytes/bigint payloads are owned copies (not slices of the source)
+    owns_constants: bool = false,
 
     pub fn deinit(self: *BytecodeProgram) void {
+        if (self.owns_constants) {
+            for (self.constants) |constant| switch (constant) {
+                .string, .bytes, .bigint => |s| self.allocator.free(s),
+                else => {},
+            };
+        }
         self.allocator.free(self.instructions);
         self.allocator.free(self.constants);
     }
 
-    /// Serialize bytecode to binary format for subprocess IPC
+    /// Copy constant payloads that still point into the source text,
+    /// so the program can outlive it (e.g. when cached)
+    pub fn ownConstants(self: *BytecodeProgram) !void {
+        if (self.owns_constants) return;
+        for (self.constants, 0..) |*constant, i| {
+            errdefer for (self.constants[0..i]) |prev| switch (prev) {
+                .string, .bytes, .bigint => |s| self.allocator.free(s),
+                else => {},
+            };
+            switch (constant.*) {
+                .string => |s| constant.* = .{ .string = try self.allocator.dupe(u8, s) },
+                .bytes => |s| constant.* = .{ .bytes = try self.allocator.dupe(u8, s) },
+                .bigint => |s| constant.* = .{ .bigint = try self.allocator.dupe(u8, s) },
+                else => {},
+            }
+        }
+        self.owns_constants = true;
+    }
+
+    /// Serialize bytecode to binary format (subprocess IPC, on-disk eval cache)
     /// Format: [magic][version][num_constants][constants...][num_instructions][instructions...]
     pub fn serialize(self: *const BytecodeProgram, allocator: std.mem.Allocator) ![]u8 {
-        var buffer = std.ArrayList(u8).init(allocator);
-        errdefer buffer.deinit();
+        var buffer = std.ArrayList(u8){};
+        errdefer buffer.deinit(allocator);
 
         // Magic: "PYBC" (4 bytes)
-        try buffer.appendSlice("PYBC");
+        try buffer.appendSlice(allocator, "PYBC");
 
         // Version: 1 (4 bytes, little endian)
-        try buffer.appendSlice(&std.mem.toBytes(@as(u32, 1)));
+        try buffer.appendSlice(allocator, &std.mem.toBytes(@as(u32, 1)));
 
         // Number of constants (4 bytes)
-        try buffer.appendSlice(&std.mem.toBytes(@as(u32, @intCast(self.constants.len))));
+        try buffer.appendSlice(allocator, &std.mem.toBytes(@as(u32, @intCast(self.constants.len))));
 
         // Constants
         for (self.constants) |constant| {
             switch (constant) {
                 .int => |i| {
-                    try buffer.append(0); // type tag: int
-                    try buffer.appendSlice(&std.mem.toBytes(i));
+                    try buffer.append(allocator, 0); // type tag: int
+                    try buffer.appendSlice(allocator, &std.mem.toBytes(i));
                 },
                 .float => |f| {
-                    try buffer.append(2); // type tag: float
-                    try buffer.appendSlice(&std.mem.toBytes(f));
+                    try buffer.append(allocator, 2); // type tag: float
+                    try buffer.appendSlice(allocator, &std.mem.toBytes(f));
                 },
                 .string => |s| {
-                    try buffer.append(1); // type tag: string
-                    try buffer.appendSlice(&std.mem.toBytes(@as(u32, @intCast(s.len))));
-                    try buffer.appendSlice(s);
+                    try buffer.append(allocator, 1); // type tag: string
+                    try buffer.appendSlice(allocator, &std.mem.toBytes(@as(u32, @intCast(s.len))));
+                    try buffer.appendSlice(allocator, s);
                 },
                 .bool => |b| {
-                    try buffer.append(3); // type tag: bool
-                    try buffer.append(if (b) 1 else 0);
+                    try buffer.append(allocator, 3); // type tag: bool
+                    try buffer.append(allocator, if (b) 1 else 0);
+                },
+                .bytes => |s| {
+                    try buffer.append(allocator, 5); // type tag: bytes
+                    try buffer.appendSlice(allocator, &std.mem.toBytes(@as(u32, @intCast(s.len))));
+                    try buffer.appendSlice(allocator, s);
                 },
                 .bigint => |s| {
-                    try buffer.append(4); // type tag: bigint (stored as string)
-                    try buffer.appendSlice(&std.mem.toBytes(@as(u32, @intCast(s.len))));
-                    try buffer.appendSlice(s);
+                    try buffer.append(allocator, 4); // type tag: bigint (stored as string)
+                    try buffer.appendSlice(allocator, &std.mem.toBytes(@as(u32, @intCast(s.len))));
+                    try buffer.appendSlice(allocator, s);
                 },
                 .complex => |c| {
-                    try buffer.append(6); // type tag: complex
-                    try buffer.appendSlice(&std.mem.toBytes(c));
+                    try buffer.append(allocator, 6); // type tag: complex
+                    try buffer.appendSlice(allocator, &std.mem.toBytes(c));
                 },
             }
         }
 
         // Number of instructions (4 bytes)
-        try buffer.appendSlice(&std.mem.toBytes(@as(u32, @intCast(self.instructions.len))));
+        try buffer.appendSlice(allocator, &std.mem.toBytes(@as(u32, @intCast(self.instructions.len))));
 
         // Instructions (5 bytes each: 1 opcode + 4 arg)
         for (self.instructions) |inst| {
-            try buffer.append(@intFromEnum(inst.op));
-            try buffer.appendSlice(&std.mem.toBytes(inst.arg));
+            try buffer.append(allocator, @intFromEnum(inst.op));
+            try buffer.appendSlice(allocator, &std.mem.toBytes(inst.arg));
         }
 
-        return buffer.toOwnedSlice();
+        return buffer.toOwnedSlice(allocator);
     }
 
     /// Deserialize bytecode from binary format (subprocess output)
@@ -234,6 +271,12 @@ pub const BytecodeProgram = struct {
 
         var constants = try allocator.alloc(Constant, num_constants);
         errdefer allocator.free(constants);
+        // Owned payloads decoded so far (freed on a truncated/corrupt blob)
+        var decoded: usize = 0;
+        errdefer for (constants[0..decoded]) |constant| switch (constant) {
+            .string, .bytes, .bigint => |s| allocator.free(s),
+            else => {},
+        };
 
         for (0..num_constants) |i| {
             if (pos >= data.len) return error.UnexpectedEof;
@@ -272,6 +315,14 @@ pub const BytecodeProgram = struct {
                     constants[i] = .{ .bigint = try allocator.dupe(u8, data[pos..][0..str_len]) };
                     pos += str_len;
                 },
+                5 => { // bytes
+                    if (pos + 4 > data.len) return error.UnexpectedEof;
+                    const str_len = std.mem.readInt(u32, data[pos..][0..4], .little);
+                    pos += 4;
+                    if (pos + str_len > data.len) return error.UnexpectedEof;
+                    constants[i] = .{ .bytes = try allocator.dupe(u8, data[pos..][0..str_len]) };
+                    pos += str_len;
+                },
                 6 => { // complex
                     if (pos + 8 > data.len) return error.UnexpectedEof;
                     constants[i] = .{ .complex = @bitCast(std.mem.readInt(u64, data[pos..][0..8], .little)) };
@@ -279,6 +330,7 @@ pub const BytecodeProgram = struct {
                 },
                 else => return error.InvalidConstantType,
             }
+            decoded = i + 1;
         }
 
         // Read instructions
@@ -292,7 +344,7 @@ pub const BytecodeProgram = struct {
         for (0..num_instructions) |i| {
             if (pos + 5 > data.len) return error.UnexpectedEof;
             instructions[i] = .{
-                .op = @enumFromInt(data[pos]),
+                .op = std.meta.intToEnum(OpCode, data[pos]) catch return error.InvalidBytecode,
                 .arg = std.mem.readInt(u32, data[pos + 1 ..][0..4], .little),
             };
             pos += 5;
@@ -302,6 +354,7 @@ pub const BytecodeProgram = struct {
             .instructions = instructions,
             .constants = constants,
             .allocator = allocator,
+            .owns_constants = true,
         };
     }
 };
@@ -375,17 +428,21 @@ pub const Compiler = struct {
 /// Bytecode VM executor
 pub const VM = struct {
     stack: std.ArrayList(*PyObject),
+    /// Names bound by exec() statements (keys borrow the program's constants)
+    names: std.StringHashMapUnmanaged(*PyObject),
     allocator: std.mem.Allocator,
 
     pub fn init(allocator: std.mem.Allocator) VM {
         return .{
             .stack = .{},
+            .names = .{},
             .allocator = allocator,
         };
     }
 
     pub fn deinit(self: *VM) void {
         self.stack.deinit(self.allocator);
+        self.names.deinit(self.allocator);
     }
 
     /// Execute bytecode program
@@ -434,6 +491,18 @@ pub const VM = struct {
                     return self.stack.pop() orelse return error.EmptyStack;
                 },
 
+                .Pop => _ = self.stack.pop() orelse return error.StackUnderflow,
+                .LoadNone => try self.stack.append(self.allocator, runtime.Py_None),
+                .LoadName => {
+                    const name = program.constants[inst.arg].string;
+                    const obj = self.names.get(name) orelse return error.NameError;
+                    try self.stack.append(self.allocator, obj);
+                },
+                .StoreName => {
+                    const obj = self.stack.pop() orelse return error.StackUnderflow;
+                    try self.names.put(self.allocator, program.constants[inst.arg].string, obj);
+                },
+
                 else => return error.NotImplemented,
             }
 
@@ -7,36 +7,83 @@ const bytecode = @import("compile.zig");
 const PyObject = @import("../runtime.zig").PyObject;
 const hashmap_helper = @import("hashmap_helper");
 
-/// Compile Python source via metal0 subprocess (for dynamic eval)
-/// Spawns: metal0 --emit-bytecode <source>
-/// Returns parsed BytecodeProgram from subprocess stdout
-pub fn compileViaSubprocess(allocator: std.mem.Allocator, source: []const u8) !bytecode.BytecodeProgram {
-    // Build argv: ["metal0", "--emit-bytecode", source]
-    const argv = [_][]const u8{ "metal0", "--emit-bytecode", source };
-
-    // Spawn subprocess
-    var child = std.process.Child.init(&argv, allocator);
-    child.stdout_behavior = .Pipe;
-    child.stderr_behavior = .Pipe;
-
-    try child.spawn();
-
-    // Read stdout (bytecode binary)
-    const stdout = child.stdout orelse return error.NoStdout;
-    const bytecode_data = try stdout.readToEndAlloc(allocator, 1024 * 1024); // 1MB max
-    defer allocator.free(bytecode_data);
-
-    // Wait for child
-    const term = try child.wait();
-    switch (term) {
-        .Exited => |code| if (code != 0) return error.SubprocessFailed,
-        else => return error.SubprocessFailed,
-    }
-
-    // Parse bytecode
-    return bytecode.BytecodeProgram.deserialize(allocator, bytecode_data);
+/// What a source string is compiled as (programs are cached per mode)
+pub const Mode = enum(u8) {
+    /// Single expression, result is its value
+    eval,
+    /// Statements, result is None
+    exec,
+};
+
+/// Compile source in-process with the runtime parser (no subprocess)
+pub fn compileSource(allocator: std.mem.Allocator, source: []const u8, mode: Mode) !bytecode.BytecodeProgram {
+    const expr_parser = @import("expr_parser.zig");
+    return switch (mode) {
+        .eval => expr_parser.parseExpression(allocator, source),
+        .exec => expr_parser.parseStatements(allocator, source),
+    };
 }
 
+/// Optional on-disk bytecode cache shared by all processes.
+/// Enabled by setting METAL0_BYTECODE_CACHE to a directory. Entries are
+/// content-addressed: <dir>/<sha256(format, mode, source)>.pybc holding
+/// BytecodeProgram.serialize() output, written via rename so readers never
+/// see a partial file. Every failure is a cache miss.
+pub const DiskCache = struct {
+    dir: []const u8,
+
+    pub const env_var = "METAL0_BYTECODE_CACHE";
+    /// Bump when the bytecode format or compiler output changes
+    const format_version: u32 = 1;
+
+    pub fn fromEnv() ?DiskCache {
+        if (builtin.cpu.arch.isWasm() or builtin.os.tag == .windows) return null;
+        const dir = std.posix.getenv(env_var) orelse return null;
+        if (dir.len == 0) return null;
+        return .{ .dir = dir };
+    }
+
+    /// Hex content address for (mode, source)
+    pub fn key(mode: Mode, source: []const u8) [64]u8 {
+        var hasher = std.crypto.hash.sha2.Sha256.init(.{});
+        hasher.update(&std.mem.toBytes(format_version));
+        hasher.update(&[_]u8{@intFromEnum(mode)});
+        hasher.update(source);
+        var digest: [32]u8 = undefined;
+        hasher.final(&digest);
+        return std.fmt.bytesToHex(digest, .lower);
+    }
+
+    fn entryPath(self: DiskCache, buf: []u8, mode: Mode, source: []const u8) ![]const u8 {
+        const hex = key(mode, source);
+        return std.fmt.bufPrint(buf, "{s}/{s}.pybc", .{ self.dir, &hex });
+    }
+
+    pub fn load(self: DiskCache, allocator: std.mem.Allocator, mode: Mode, source: []const u8) ?bytecode.BytecodeProgram {
+        var path_buf: [std.fs.max_path_bytes]u8 = undefined;
+        const path = self.entryPath(&path_buf, mode, source) catch return null;
+        const data = std.fs.cwd().readFileAlloc(allocator, path, 16 * 1024 * 1024) catch return null;
+        defer allocator.free(data);
+        return bytecode.BytecodeProgram.deserialize(allocator, data) catch null;
+    }
+
+    pub fn store(self: DiskCache, allocator: std.mem.Allocator, mode: Mode, source: []const u8, program: *const bytecode.BytecodeProgram) void {
+        var path_buf: [std.fs.max_path_bytes]u8 = undefined;
+        const path = self.entryPath(&path_buf, mode, source) catch return;
+        const data = program.serialize(allocator) catch return;
+        defer allocator.free(data);
+
+        std.fs.cwd().makePath(self.dir) catch return;
+        // Unique temp name per writer, then atomic rename into place
+        var tmp_buf: [std.fs.max_path_bytes]u8 = undefined;
+        const tmp_path = std.fmt.bufPrint(&tmp_buf, "{s}.{x}.tmp", .{ path, std.crypto.random.int(u64) }) catch return;
+        std.fs.cwd().writeFile(.{ .sub_path = tmp_path, .data = data }) catch return;
+        std.fs.cwd().rename(tmp_path, path) catch {
+            std.fs.cwd().deleteFile(tmp_path) catch {};
+        };
+    }
+};
+
 /// LRU cache configuration
 pub const CacheConfig = struct {
     max_entries: usize = 1024,
@@ -200,10 +247,13 @@ pub const LruCache = struct {
     }
 };
 
-/// Global LRU cache - thread-safe wrapper
+/// Global LRU caches (eval and exec programs differ for the same source) -
+/// thread-safe wrapper
 var lru_cache: ?LruCache = null;
+var exec_lru_cache: ?LruCache = null;
 var cache_mutex: std.Thread.Mutex = .{};
 var cache_allocator: ?std.mem.Allocator = null;
+var disk_cache: ?DiskCache = null;
 
 /// Initialize eval cache (call once at startup)
 pub fn initCache(allocator: std.mem.Allocator) !void {
@@ -213,9 +263,18 @@ pub fn initCache(allocator: std.mem.Allocator) !void {
     if (lru_cache == null) {
         cache_allocator = allocator;
         lru_cache = LruCache.init(allocator, .{});
+        exec_lru_cache = LruCache.init(allocator, .{});
+        disk_cache = DiskCache.fromEnv();
     }
 }
 
+fn cacheFor(mode: Mode) *?LruCache {
+    return switch (mode) {
+        .eval => &lru_cache,
+        .exec => &exec_lru_cache,
+    };
+}
+
 /// Cached eval() - compiles once, executes many times
 pub fn evalCached(allocator: std.mem.Allocator, source: []const u8) !*PyObject {
     // FAST PATH: Try to parse as simple literal first (no bytecode needed)
@@ -223,7 +282,17 @@ pub fn evalCached(allocator: std.mem.Allocator, source: []const u8) !*PyObject {
     if (tryParseLiteral(allocator, source)) |obj| {
         return obj;
     }
+    return runCached(allocator, source, .eval);
+}
 
+/// Cached exec() - statements compile once, result is None
+pub fn execCached(allocator: std.mem.Allocator, source: []const u8) !*PyObject {
+    return runCached(allocator, source, .exec);
+}
+
+/// Look up (or compile and cache) the program for source, then execute it.
+/// Lookup order: process LRU -> on-disk cache -> in-process compile.
+fn runCached(allocator: std.mem.Allocator, source: []const u8, mode: Mode) !*PyObject {
     // Ensure cache is initialized
     if (lru_cache == null) {
         try initCache(allocator);
@@ -231,7 +300,7 @@ pub fn evalCached(allocator: std.mem.Allocator, source: []const u8) !*PyObject {
 
     // Check cache first (thread-safe)
     cache_mutex.lock();
-    const cached = if (lru_cache) |*cache| cache.get(source) else null;
+    const cached = if (cacheFor(mode).*) |*cache| cache.get(source) else null;
     cache_mutex.unlock();
 
     if (cached) |program| {
@@ -239,33 +308,48 @@ pub fn evalCached(allocator: std.mem.Allocator, source: []const u8) !*PyObject {
         return executeTarget(allocator, program);
     }
 
-    // Cache miss - parse expression directly to bytecode
-    // Uses lightweight runtime parser (Zig DCE removes if eval() never called)
-    // NOTE: We intentionally do NOT fall back to subprocess spawning.
-    // Subprocess spawning can cause infinite recursion if the subprocess
-    // also calls eval(). Instead, return error for unsupported expressions.
-    const program = parseSourceToBytecode(source, allocator) catch |err| {
-        // No subprocess fallback - return error instead
-        // Complex eval() expressions should be handled at compile time
-        return err;
-    };
+    // Cache miss - cached programs live as long as the cache, so they use
+    // its allocator and own their constants (no slices into `source`)
+    const program_allocator = cache_allocator orelse allocator;
+    var program = if (disk_cache) |disk|
+        disk.load(program_allocator, mode, source) orelse try compileAndPublish(program_allocator, source, mode, disk)
+    else
+        try compileOwned(program_allocator, source, mode);
 
     // Store in cache (thread-safe, LRU handles eviction)
     cache_mutex.lock();
-    if (lru_cache) |*cache| {
-        try cache.put(source, program);
+    if (cacheFor(mode).*) |*cache| {
+        cache.put(source, program) catch |err| {
+            cache_mutex.unlock();
+            program.deinit();
+            return err;
+        };
+        const stored = cache.get(source);
+        cache_mutex.unlock();
+        if (stored) |p| {
+            return executeTarget(allocator, p);
+        }
+        return error.CacheFailed;
     }
     cache_mutex.unlock();
 
-    // Get the cached program to return (since put may have stored a copy)
-    cache_mutex.lock();
-    const stored = if (lru_cache) |*cache| cache.get(source) else null;
-    cache_mutex.unlock();
+    // Cache was torn down concurrently - run this program once
+    defer program.deinit();
+    return executeTarget(allocator, &program);
+}
 
-    if (stored) |p| {
-        return executeTarget(allocator, p);
-    }
-    return error.CacheFailed;
+/// Compile in-process (no subprocess: an eval() in the child would recurse)
+fn compileOwned(allocator: std.mem.Allocator, source: []const u8, mode: Mode) !bytecode.BytecodeProgram {
+    var program = try compileSource(allocator, source, mode);
+    errdefer program.deinit();
+    try program.ownConstants();
+    return program;
+}
+
+fn compileAndPublish(allocator: std.mem.Allocator, source: []const u8, mode: Mode, disk: DiskCache) !bytecode.BytecodeProgram {
+    const program = try compileOwned(allocator, source, mode);
+    disk.store(allocator, mode, source, &program);
+    return program;
 }
 
 /// Comptime target selection - WASM vs Native
@@ -294,13 +378,6 @@ fn executeNative(allocator: std.mem.Allocator, program: *const bytecode.Bytecode
     return vm.execute(program);
 }
 
-/// Parse source code directly to bytecode using runtime expression parser
-/// Supports all Python expression syntax at runtime (truly dynamic eval)
-fn parseSourceToBytecode(source: []const u8, allocator: std.mem.Allocator) !bytecode.BytecodeProgram {
-    const expr_parser = @import("expr_parser.zig");
-    return expr_parser.parseExpression(allocator, source);
-}
-
 /// Fast path: Try to parse source as a simple Python literal
 /// Returns PyObject if successful, null if not a simple literal
 /// Handles: numeric literals (with underscores), bools, None, string literals
@@ -504,9 +581,11 @@ pub fn clearCache() void {
     cache_mutex.lock();
     defer cache_mutex.unlock();
 
-    if (lru_cache) |*cache| {
-        cache.deinit();
-        lru_cache = null;
+    for ([_]*?LruCache{ &lru_cache, &exec_lru_cache }) |slot| {
+        if (slot.*) |*cache| {
+            cache.deinit();
+            slot.* = null;
+        }
     }
 }
 
@@ -526,9 +605,38 @@ pub fn deinitCache() void {
     cache_mutex.lock();
     defer cache_mutex.unlock();
 
-    if (lru_cache) |*cache| {
-        cache.deinit();
-        lru_cache = null;
-        cache_allocator = null;
+    for ([_]*?LruCache{ &lru_cache, &exec_lru_cache }) |slot| {
+        if (slot.*) |*cache| {
+            cache.deinit();
+            slot.* = null;
+        }
     }
+    cache_allocator = null;
+    disk_cache = null;
+}
+
+test "disk cache round trip" {
+    const allocator = std.testing.allocator;
+
+    var tmp = std.testing.tmpDir(.{});
+    defer tmp.cleanup();
+    const dir = try tmp.dir.realpathAlloc(allocator, ".");
+    defer allocator.free(dir);
+    const disk = DiskCache{ .dir = dir };
+
+    const source = "x = 40\nx += 2";
+    try std.testing.expect(disk.load(allocator, .exec, source) == null);
+
+    var program = try compileOwned(allocator, source, .exec);
+    defer program.deinit();
+    disk.store(allocator, .exec, source, &program);
+
+    var loaded = disk.load(allocator, .exec, source) orelse return error.TestUnexpectedResult;
+    defer loaded.deinit();
+    try std.testing.expectEqual(program.instructions.len, loaded.instructions.len);
+    try std.testing.expectEqualStrings("x", loaded.constants[loaded.instructions[1].arg].string);
+
+    // Same source compiled as an expression is a different entry
+    try std.testing.expect(disk.load(allocator, .eval, source) == null);
+    try std.testing.expect(!std.mem.eql(u8, &DiskCache.key(.eval, source), &DiskCache.key(.exec, source)));
 }
@@ -1,5 +1,6 @@
-/// Runtime expression parser for eval()
-/// Lightweight recursive descent parser for Python expressions
+/// Runtime expression parser for eval()/exec()
+/// Lightweight recursive descent parser for Python expressions and simple
+/// statements (assignment, augmented assignment, expression statements)
 /// Compiles directly to bytecode for fast execution
 const std = @import("std");
 const bytecode = @import("compile.zig");
@@ -41,6 +42,9 @@ const TokenType = enum {
     False,
     None,
     Name,
+    Assign, // =
+    AugAssign, // +=, -=, *=, /=, //=, %=, **=
+    Newline, // statement separator (newline or ;) in statement mode
     Eof,
 };
 
@@ -57,6 +61,10 @@ pub const ExprParser = struct {
     current: Token,
     compiler: bytecode.Compiler,
     allocator: std.mem.Allocator,
+    /// Statement mode: newlines at bracket depth 0 end a statement
+    statements: bool = false,
+    /// Open ( and [ count - newlines inside brackets are whitespace
+    depth: u32 = 0,
 
     pub fn init(allocator: std.mem.Allocator, source: []const u8) ExprParser {
         var parser = ExprParser{
@@ -86,8 +94,43 @@ pub const ExprParser = struct {
         };
     }
 
+    /// Parse statements (exec mode) and return compiled bytecode.
+    /// Names are bound in the VM's namespace; the result is None.
+    pub fn parseModule(self: *ExprParser) !bytecode.BytecodeProgram {
+        self.statements = true;
+        while (self.current.type != .Eof) {
+            if (self.current.type == .Newline) {
+                try self.advance();
+                continue;
+            }
+            try self.parseStatement();
+            if (self.current.type != .Newline and self.current.type != .Eof) {
+                return ParseError.UnexpectedToken;
+            }
+        }
+        try self.emit(.LoadNone, 0);
+        try self.emit(.Return, 0);
+
+        return .{
+            .instructions = try self.compiler.instructions.toOwnedSlice(self.allocator),
+            .constants = try self.compiler.constants.toOwnedSlice(self.allocator),
+            .allocator = self.allocator,
+        };
+    }
+
     // ========== Lexer ==========
 
+    /// Token for an operator that may be followed by '=' (augmented assignment)
+    fn operator(self: *ExprParser, start: usize, len: usize, tok_type: TokenType) void {
+        self.pos = start + len;
+        if (self.statements and self.pos < self.source.len and self.source[self.pos] == '=') {
+            self.pos += 1;
+            self.current = .{ .type = .AugAssign, .start = start, .end = self.pos };
+            return;
+        }
+        self.current = .{ .type = tok_type, .start = start, .end = self.pos };
+    }
+
     fn advance(self: *ExprParser) !void {
         self.skipWhitespace();
 
@@ -102,38 +145,31 @@ pub const ExprParser = struct {
         // Single character tokens
         switch (c) {
             '+' => {
-                self.pos += 1;
-                self.current = .{ .type = .Plus, .start = start, .end = self.pos };
+                self.operator(start, 1, .Plus);
                 return;
             },
             '-' => {
-                self.pos += 1;
-                self.current = .{ .type = .Minus, .start = start, .end = self.pos };
+                self.operator(start, 1, .Minus);
                 return;
             },
             '*' => {
                 if (self.pos + 1 < self.source.len and self.source[self.pos + 1] == '*') {
-                    self.pos += 2;
-                    self.current = .{ .type = .DoubleStar, .start = start, .end = self.pos };
+                    self.operator(start, 2, .DoubleStar);
                 } else {
-                    self.pos += 1;
-                    self.current = .{ .type = .Star, .start = start, .end = self.pos };
+                    self.operator(start, 1, .Star);
                 }
                 return;
             },
             '/' => {
                 if (self.pos + 1 < self.source.len and self.source[self.pos + 1] == '/') {
-                    self.pos += 2;
-                    self.current = .{ .type = .DoubleSlash, .start = start, .end = self.pos };
+                    self.operator(start, 2, .DoubleSlash);
                 } else {
-                    self.pos += 1;
-                    self.current = .{ .type = .Slash, .start = start, .end = self.pos };
+                    self.operator(start, 1, .Slash);
                 }
                 return;
             },
             '%' => {
-                self.pos += 1;
-                self.current = .{ .type = .Percent, .start = start, .end = self.pos };
+                self.operator(start, 1, .Percent);
                 return;
             },
             '~' => {
@@ -143,24 +179,33 @@ pub const ExprParser = struct {
             },
             '(' => {
                 self.pos += 1;
+                self.depth += 1;
                 self.current = .{ .type = .LParen, .start = start, .end = self.pos };
                 return;
             },
             ')' => {
                 self.pos += 1;
+                self.depth -|= 1;
                 self.current = .{ .type = .RParen, .start = start, .end = self.pos };
                 return;
             },
             '[' => {
                 self.pos += 1;
+                self.depth += 1;
                 self.current = .{ .type = .LBracket, .start = start, .end = self.pos };
                 return;
             },
             ']' => {
                 self.pos += 1;
+                self.depth -|= 1;
                 self.current = .{ .type = .RBracket, .start = start, .end = self.pos };
                 return;
             },
+            '\n', ';' => if (self.statements) {
+                self.pos += 1;
+                self.current = .{ .type = .Newline, .start = start, .end = self.pos };
+                return;
+            },
             ',' => {
                 self.pos += 1;
                 self.current = .{ .type = .Comma, .start = start, .end = self.pos };
@@ -170,6 +215,9 @@ pub const ExprParser = struct {
                 if (self.pos + 1 < self.source.len and self.source[self.pos + 1] == '=') {
                     self.pos += 2;
                     self.current = .{ .type = .Eq, .start = start, .end = self.pos };
+                } else if (self.statements) {
+                    self.pos += 1;
+                    self.current = .{ .type = .Assign, .start = start, .end = self.pos };
                 } else {
                     return ParseError.UnexpectedToken;
                 }
@@ -227,8 +275,18 @@ pub const ExprParser = struct {
     }
 
     fn skipWhitespace(self: *ExprParser) void {
-        while (self.pos < self.source.len and std.ascii.isWhitespace(self.source[self.pos])) {
-            self.pos += 1;
+        while (self.pos < self.source.len) {
+            const c = self.source[self.pos];
+            if (c == '#') {
+                // Comment runs to end of line (the newline itself is kept)
+                while (self.pos < self.source.len and self.source[self.pos] != '\n') self.pos += 1;
+            } else if (c == '\n' and self.statements and self.depth == 0) {
+                return; // statement separator
+            } else if (std.ascii.isWhitespace(c)) {
+                self.pos += 1;
+            } else {
+                return;
+            }
         }
     }
 
@@ -317,6 +375,60 @@ pub const ExprParser = struct {
 
     // ========== Parser (Pratt-style precedence climbing) ==========
 
+    fn emit(self: *ExprParser, op: bytecode.OpCode, arg: u32) ParseError!void {
+        self.compiler.instructions.append(self.allocator, .{ .op = op, .arg = arg }) catch return ParseError.OutOfMemory;
+    }
+
+    /// Constant index for a name (LoadName/StoreName operand)
+    fn nameConstant(self: *ExprParser, name: []const u8) ParseError!u32 {
+        for (self.compiler.constants.items, 0..) |c, i| {
+            if (c == .string and std.mem.eql(u8, c.string, name)) return @intCast(i);
+        }
+        const const_idx = @as(u32, @intCast(self.compiler.constants.items.len));
+        self.compiler.constants.append(self.allocator, .{ .string = name }) catch return ParseError.OutOfMemory;
+        return const_idx;
+    }
+
+    /// name = expr | name op= expr | expr
+    fn parseStatement(self: *ExprParser) ParseError!void {
+        if (self.current.type == .Name) {
+            // One token of lookahead: rewind if this isn't an assignment
+            const saved_pos = self.pos;
+            const saved_depth = self.depth;
+            const name_tok = self.current;
+            try self.advance();
+
+            switch (self.current.type) {
+                .Assign => {
+                    try self.advance();
+                    try self.parseExpr();
+                    try self.emit(.StoreName, try self.nameConstant(self.getText(name_tok)));
+                    return;
+                },
+                .AugAssign => {
+                    const op_text = self.getText(self.current);
+                    const op: bytecode.OpCode = augOpCode(op_text[0 .. op_text.len - 1]) orelse
+                        return ParseError.UnexpectedToken;
+                    try self.advance();
+                    const name_idx = try self.nameConstant(self.getText(name_tok));
+                    try self.emit(.LoadName, name_idx);
+                    try self.parseExpr();
+                    try self.emit(op, 0);
+                    try self.emit(.StoreName, name_idx);
+                    return;
+                },
+                else => {
+                    self.pos = saved_pos;
+                    self.depth = saved_depth;
+                    self.current = name_tok;
+                },
+            }
+        }
+
+        try self.parseExpr();
+        try self.emit(.Pop, 0);
+    }
+
     fn parseExpr(self: *ExprParser) ParseError!void {
         try self.parseComparison();
     }
@@ -526,6 +638,10 @@ pub const ExprParser = struct {
                 self.compiler.instructions.append(self.allocator, .{ .op = .LoadConst, .arg = const_idx }) catch return ParseError.OutOfMemory;
                 try self.advance();
             },
+            .Name => {
+                try self.emit(.LoadName, try self.nameConstant(self.getText(self.current)));
+                try self.advance();
+            },
             .LParen => {
                 try self.advance(); // skip (
                 try self.parseExpr();
@@ -607,6 +723,18 @@ fn stripUnderscores(input: []const u8) error{ OutOfMemory, InvalidNumber }![]con
     return strip_buf[0..len];
 }
 
+/// Binary opcode for the operator part of an augmented assignment ("+" in "+=")
+fn augOpCode(op: []const u8) ?bytecode.OpCode {
+    if (std.mem.eql(u8, op, "+")) return .Add;
+    if (std.mem.eql(u8, op, "-")) return .Sub;
+    if (std.mem.eql(u8, op, "*")) return .Mult;
+    if (std.mem.eql(u8, op, "/")) return .Div;
+    if (std.mem.eql(u8, op, "//")) return .FloorDiv;
+    if (std.mem.eql(u8, op, "%")) return .Mod;
+    if (std.mem.eql(u8, op, "**")) return .Pow;
+    return null;
+}
+
 /// Parse and compile expression to bytecode
 pub fn parseExpression(allocator: std.mem.Allocator, source: []const u8) !bytecode.BytecodeProgram {
     var parser = ExprParser.init(allocator, source);
@@ -614,6 +742,13 @@ pub fn parseExpression(allocator: std.mem.Allocator, source: []const u8) !byteco
     return parser.parse();
 }
 
+/// Parse and compile statements (exec) to bytecode
+pub fn parseStatements(allocator: std.mem.Allocator, source: []const u8) !bytecode.BytecodeProgram {
+    var parser = ExprParser.init(allocator, source);
+    defer parser.deinit();
+    return parser.parseModule();
+}
+
 // Tests
 test "parse simple integer" {
     const allocator = std.testing.allocator;
@@ -651,3 +786,22 @@ test "parse precedence" {
     try std.testing.expectEqual(bytecode.OpCode.Mult, program.instructions[3].op);
     try std.testing.expectEqual(bytecode.OpCode.Add, program.instructions[4].op);
 }
+
+test "parse statements" {
+    const allocator = std.testing.allocator;
+    var program = try parseStatements(allocator, "x = 1 + 2\ny = (x *\n 2); x += y  # done\n");
+    defer program.deinit();
+
+    const expected = [_]bytecode.OpCode{
+        .LoadConst, .LoadConst, .Add,       .StoreName, // x = 1 + 2
+        .LoadName,  .LoadConst, .Mult,      .StoreName, // y = (x * 2)
+        .LoadName,  .LoadName,  .Add,       .StoreName, // x += y
+        .LoadNone,  .Return,
+    };
+    try std.testing.expectEqual(expected.len, program.instructions.len);
+    for (expected, program.instructions) |op, inst| {
+        try std.testing.expectEqual(op, inst.op);
+    }
+    try std.testing.expectEqualStrings("x", program.constants[program.instructions[3].arg].string);
+    try std.testing.expectEqual(program.instructions[3].arg, program.instructions[11].arg);
+}
@@ -259,37 +259,37 @@ pub fn printValue(value: anytype) void {
     const type_info = @typeInfo(T);
 
     switch (type_info) {
-        .int, .comptime_int => std.debug.print("{d}", .{value}),
-        .float, .comptime_float => std.debug.print("{d}", .{value}),
-        .bool => std.debug.print("{s}", .{if (value) "True" else "False"}),
+        .int, .comptime_int => runtime.stdout.print("{d}", .{value}),
+        .float, .comptime_float => runtime.stdout.print("{d}", .{value}),
+        .bool => runtime.stdout.print("{s}", .{if (value) "True" else "False"}),
         .pointer => |ptr_info| {
             if (ptr_info.size == .slice) {
                 // Check if it's a string ([]const u8 or []u8)
                 if (ptr_info.child == u8) {
-                    std.debug.print("'{s}'", .{value});
+                    runtime.stdout.print("'{s}'", .{value});
                 } else {
                     // Generic slice/array
-                    std.debug.print("[", .{});
+                    runtime.stdout.print("[", .{});
                     for (value, 0..) |item, i| {
-                        if (i > 0) std.debug.print(", ", .{});
+                        if (i > 0) runtime.stdout.print(", ", .{});
                         printValue(item);
                     }
-                    std.debug.print("]", .{});
+                    runtime.stdout.print("]", .{});
                 }
             } else {
-                std.debug.print("{any}", .{value});
+                runtime.stdout.print("{any}", .{value});
             }
         },
         .array => {
-            std.debug.print("[", .{});
+            runtime.stdout.print("[", .{});
             for (value, 0..) |item, i| {
-                if (i > 0) std.debug.print(", ", .{});
+                if (i > 0) runtime.stdout.print(", ", .{});
                 printValue(item);
             }
-            std.debug.print("]", .{});
+            runtime.stdout.print("]", .{});
         },
-        .void => std.debug.print("None", .{}),
-        else => std.debug.print("{any}", .{value}),
+        .void => runtime.stdout.print("None", .{}),
+        else => runtime.stdout.print("{any}", .{value}),
     }
 }
 
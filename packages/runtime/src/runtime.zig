@@ -45,6 +45,9 @@ pub const ListIterator = iterators.ListIterator;
 pub const ReversedIterator = iterators.ReversedIterator;
 pub const SequenceIterator = iterators.SequenceIterator;
 
+/// Export generator frame helpers (used by compiled generators)
+pub const generators = @import("Objects/genobject.zig");
+
 /// Export calendar module
 pub const calendar = @import("Lib/calendar.zig");
 
@@ -1385,7 +1388,9 @@ pub fn decref(obj: *PyObject, allocator: std.mem.Allocator) void {
                 const str_obj: *PyUnicodeObject = @ptrCast(@alignCast(obj));
                 // Free the string data if owned
                 const len: usize = @intCast(str_obj.length);
-                if (len > 0) {
+                if (str_obj.state & pystring.UNICODE_MAPPED != 0) {
+                    mmap.unmap(str_obj.data, len);
+                } else if (len > 0) {
                     allocator.free(str_obj.data[0..len]);
                 }
                 allocator.destroy(str_obj);
@@ -1466,27 +1471,27 @@ fn printPyObjectImpl(obj: *PyObject, quote_strings: bool) void {
     switch (type_id) {
         .int => {
             const long_obj: *PyLongObject = @ptrCast(@alignCast(obj));
-            std.debug.print("{}", .{long_obj.ob_digit});
+            stdout.print("{}", .{long_obj.ob_digit});
         },
         .float => {
             const float_obj: *PyFloatObject = @ptrCast(@alignCast(obj));
-            std.debug.print("{d}", .{float_obj.ob_fval});
+            stdout.print("{d}", .{float_obj.ob_fval});
         },
         .bool => {
             const bool_obj: *PyBoolObject = @ptrCast(@alignCast(obj));
-            std.debug.print("{s}", .{if (bool_obj.ob_digit != 0) "True" else "False"});
+            stdout.print("{s}", .{if (bool_obj.ob_digit != 0) "True" else "False"});
         },
         .string => {
             const str_obj: *PyUnicodeObject = @ptrCast(@alignCast(obj));
             const len: usize = @intCast(str_obj.length);
             if (quote_strings) {
-                std.debug.print("'{s}'", .{str_obj.data[0..len]});
+                stdout.print("'{s}'", .{str_obj.data[0..len]});
             } else {
-                std.debug.print("{s}", .{str_obj.data[0..len]});
+                stdout.print("{s}", .{str_obj.data[0..len]});
             }
         },
         .none => {
-            std.debug.print("None", .{});
+            stdout.print("None", .{});
         },
         .list => {
             printList(obj);
@@ -1509,7 +1514,7 @@ fn printPyObjectImpl(obj: *PyObject, quote_strings: bool) void {
                 {
                     const str_obj: *PyUnicodeObject = @ptrCast(@alignCast(str_result));
                     const len: usize = @intCast(str_obj.length);
-                    std.debug.print("{s}", .{str_obj.data[0..len]});
+                    stdout.print("{s}", .{str_obj.data[0..len]});
                     return;
                 }
             }
@@ -1521,12 +1526,12 @@ fn printPyObjectImpl(obj: *PyObject, quote_strings: bool) void {
                 {
                     const str_obj: *PyUnicodeObject = @ptrCast(@alignCast(repr_result));
                     const len: usize = @intCast(str_obj.length);
-                    std.debug.print("{s}", .{str_obj.data[0..len]});
+                    stdout.print("{s}", .{str_obj.data[0..len]});
                     return;
                 }
             }
             // Fallback: print type name and pointer
-            std.debug.print("<{s} at {*}>", .{ std.mem.span(type_obj.tp_name), obj });
+            stdout.print("<{s} at {*}>", .{ std.mem.span(type_obj.tp_name), obj });
         },
     }
 }
@@ -1536,23 +1541,23 @@ fn printDict(obj: *PyObject) void {
     std.debug.assert(PyDict_Check(obj));
     const dict_obj: *PyDictObject = @ptrCast(@alignCast(obj));
 
-    std.debug.print("{{", .{});
+    stdout.print("{{", .{});
     if (dict_obj.ma_keys) |keys_ptr| {
         const map: *hashmap_helper.StringHashMap(*PyObject) = @ptrCast(@alignCast(keys_ptr));
         var iter = map.iterator();
         var idx: usize = 0;
         while (iter.next()) |entry| {
             if (idx > 0) {
-                std.debug.print(", ", .{});
+                stdout.print(", ", .{});
             }
             // Print key with quotes (string keys)
-            std.debug.print("'{s}': ", .{entry.key_ptr.*});
+            stdout.print("'{s}': ", .{entry.key_ptr.*});
             // Recursively print value (with quoted strings)
             printPyObjectImpl(entry.value_ptr.*, true);
             idx += 1;
         }
     }
-    std.debug.print("}}", .{});
+    stdout.print("}}", .{});
 }
 
 /// Helper function to print a list in Python format: [elem1, elem2, elem3]
@@ -1561,10 +1566,10 @@ pub fn printList(obj: *PyObject) void {
     const list_obj: *PyListObject = @ptrCast(@alignCast(obj));
     const size: usize = @intCast(list_obj.ob_base.ob_size);
 
-    std.debug.print("[", .{});
+    stdout.print("[", .{});
     for (0..size) |i| {
         if (i > 0) {
-            std.debug.print(", ", .{});
+            stdout.print(", ", .{});
         }
         const item = list_obj.ob_item[i];
         // Print each element based on its type
@@ -1572,22 +1577,22 @@ pub fn printList(obj: *PyObject) void {
         switch (item_type) {
             .int => {
                 const long_obj: *PyLongObject = @ptrCast(@alignCast(item));
-                std.debug.print("{}", .{long_obj.ob_digit});
+                stdout.print("{}", .{long_obj.ob_digit});
             },
             .string => {
                 const str_obj: *PyUnicodeObject = @ptrCast(@alignCast(item));
                 const len: usize = @intCast(str_obj.length);
-                std.debug.print("'{s}'", .{str_obj.data[0..len]});
+                stdout.print("'{s}'", .{str_obj.data[0..len]});
             },
             .tuple => {
                 PyTuple.print(item);
             },
             else => {
-                std.debug.print("{*}", .{item});
+                stdout.print("{*}", .{item});
             },
         }
     }
-    std.debug.print("]", .{});
+    stdout.print("]", .{});
 }
 
 /// Python integer type - re-exported from pyint.zig
@@ -2292,11 +2297,16 @@ pub const PyDict = dict_module.PyDict;
 pub const http = if (is_freestanding) void else @import("Lib/http.zig");
 // WebSocket client (maps to Python's websockets library)
 pub const websocket = if (is_freestanding) void else @import("Lib/websocket.zig");
+// Flask routing on the epoll/kqueue HTTP/1.1 server (threads + sockets)
+pub const flask = if (is_freestanding) void else @import("Lib/flask.zig");
 // Async modules require threading (not available on freestanding)
 pub const async_runtime = if (is_freestanding) void else @import("Lib/async.zig");
 pub const asyncio = if (is_freestanding) void else @import("Lib/asyncio.zig");
+pub const concurrent_futures = if (is_freestanding) void else @import("Lib/concurrent_futures.zig");
 pub const parallel = if (is_freestanding) void else @import("runtime/parallel.zig");
 pub const io = @import("Lib/io.zig");
+// Buffered stdout shared by print(), sys.stdout and the runtime printers
+pub const stdout = @import("runtime/stdout.zig");
 pub const json = @import("Lib/json.zig");
 pub const re = @import("Lib/re.zig");
 pub const tokenizer = @import("runtime/tokenizer.zig");
@@ -2305,6 +2315,7 @@ pub const time = @import("Lib/time.zig");
 pub const math = @import("Lib/math.zig");
 pub const unittest = @import("Lib/unittest.zig");
 pub const pathlib = @import("Lib/pathlib.zig");
+pub const mmap = @import("Lib/mmap.zig");
 pub const datetime = @import("Lib/datetime.zig");
 // eval/exec use eval_cache which has Thread.Mutex - not available on freestanding
 pub const eval_module = if (is_freestanding) void else @import("Python/ceval.zig");
@@ -2561,7 +2561,7 @@ pub fn print(allocator: std.mem.Allocator, args: anytype) void {
         }
     }
     output.append(allocator, '\n') catch {};
-    _ = std.posix.write(std.posix.STDOUT_FILENO, output.items) catch {};
+    runtime_core.stdout.writeAll(output.items);
 }
 
 fn printValueToList(output: *std.ArrayListUnmanaged(u8), value: anytype, allocator: std.mem.Allocator) void {
@@ -10,6 +10,11 @@
 //! - macOS: kqueue
 //! - Linux: epoll
 //! - Windows: IOCP (future)
+//!
+//! Timers (asyncio.sleep) live in a min-heap ordered by deadline. Only the
+//! earliest deadline is armed in the kernel (timerfd on Linux, one
+//! EVFILT_TIMER on kqueue), so the poller sleeps until there is real work
+//! and wakes exactly once per due deadline, however many timers are pending.
 
 const std = @import("std");
 const builtin = @import("builtin");
@@ -36,8 +41,100 @@ pub const PendingIo = struct {
 /// Pending timer (for asyncio.sleep)
 pub const PendingTimer = struct {
     id: u64,
-    thread: *GreenThread,
-    deadline_ns: i128, // Absolute time when timer fires
+    // Green thread to wake; null for state-machine timers, which are polled
+    thread: ?*GreenThread,
+    deadline_ns: u64, // Absolute CLOCK_MONOTONIC time when timer fires
+    // State-machine timers: slot of the gather frame that added it (see setTimerOwner)
+    owner: ?usize = null,
+};
+
+/// Monotonic clock in nanoseconds - the clock timerfd deadlines are armed against
+pub fn monotonicNs() u64 {
+    const ts = std.posix.clock_gettime(.MONOTONIC) catch return 0;
+    return @as(u64, @intCast(ts.sec)) * std.time.ns_per_s + @as(u64, @intCast(ts.nsec));
+}
+
+/// Timer min-heap with lazy cancellation
+/// add/popExpired are O(log n); cancel is O(1) - the stale heap entry is
+/// dropped when it reaches the top (or by compaction when stale entries pile up).
+pub const TimerQueue = struct {
+    heap: std.PriorityQueue(Entry, void, Entry.order),
+    live: std.AutoHashMap(u64, PendingTimer),
+
+    const Entry = struct {
+        deadline_ns: u64,
+        id: u64,
+
+        fn order(_: void, a: Entry, b: Entry) std.math.Order {
+            const by_deadline = std.math.order(a.deadline_ns, b.deadline_ns);
+            return if (by_deadline != .eq) by_deadline else std.math.order(a.id, b.id);
+        }
+    };
+
+    pub fn init(allocator: std.mem.Allocator) TimerQueue {
+        return .{
+            .heap = std.PriorityQueue(Entry, void, Entry.order).init(allocator, {}),
+            .live = std.AutoHashMap(u64, PendingTimer).init(allocator),
+        };
+    }
+
+    pub fn deinit(self: *TimerQueue) void {
+        self.heap.deinit();
+        self.live.deinit();
+    }
+
+    pub fn add(self: *TimerQueue, timer: PendingTimer) !void {
+        try self.live.put(timer.id, timer);
+        errdefer _ = self.live.remove(timer.id);
+        try self.heap.add(.{ .deadline_ns = timer.deadline_ns, .id = timer.id });
+    }
+
+    /// Cancel a pending timer; null if it already fired or never existed
+    pub fn cancel(self: *TimerQueue, id: u64) ?PendingTimer {
+        const kv = self.live.fetchRemove(id) orelse return null;
+        // Keep cancelled entries from dominating the heap
+        if (self.heap.count() > 64 and self.heap.count() > 2 * self.live.count()) self.compact();
+        return kv.value;
+    }
+
+    /// Earliest live deadline (null when no timers are pending)
+    pub fn nextDeadline(self: *TimerQueue) ?u64 {
+        self.dropCancelled();
+        const top = self.heap.peek() orelse return null;
+        return top.deadline_ns;
+    }
+
+    /// Pop one timer whose deadline is at or before now
+    pub fn popExpired(self: *TimerQueue, now_ns: u64) ?PendingTimer {
+        self.dropCancelled();
+        const top = self.heap.peek() orelse return null;
+        if (top.deadline_ns > now_ns) return null;
+        _ = self.heap.remove();
+        return self.live.fetchRemove(top.id).?.value;
+    }
+
+    pub fn count(self: *const TimerQueue) usize {
+        return self.live.count();
+    }
+
+    fn dropCancelled(self: *TimerQueue) void {
+        while (self.heap.peek()) |top| {
+            if (self.live.contains(top.id)) return;
+            _ = self.heap.remove();
+        }
+    }
+
+    /// Rebuild the heap from live timers only
+    fn compact(self: *TimerQueue) void {
+        var i: usize = 0;
+        while (i < self.heap.items.len) {
+            if (self.live.contains(self.heap.items[i].id)) {
+                i += 1;
+            } else {
+                _ = self.heap.removeIndex(i);
+            }
+        }
+    }
 };
 
 /// Netpoller - manages async I/O across all green threads
@@ -56,10 +153,14 @@ pub const Netpoller = struct {
     pending: std.AutoHashMap(std.posix.fd_t, PendingIo),
     pending_mutex: std.Thread.Mutex,
 
-    // Pending timers (id -> PendingTimer) for asyncio.sleep
-    timers: std.AutoHashMap(u64, PendingTimer),
+    // Pending timers for asyncio.sleep, ordered by deadline
+    timers: TimerQueue,
     timer_mutex: std.Thread.Mutex,
     next_timer_id: std.atomic.Value(u64),
+    // Deadline currently armed in the kernel (0 = disarmed)
+    armed_deadline_ns: u64,
+    // Linux: timerfd registered in epoll, armed to the earliest deadline
+    timer_fd: if (builtin.os.tag == .linux) std.posix.fd_t else void,
 
     // Ready threads (woken by I/O completion)
     ready_threads: std.ArrayList(*GreenThread),
@@ -81,9 +182,11 @@ pub const Netpoller = struct {
             .poll_fd = undefined,
             .pending = std.AutoHashMap(std.posix.fd_t, PendingIo).init(allocator),
             .pending_mutex = .{},
-            .timers = std.AutoHashMap(u64, PendingTimer).init(allocator),
+            .timers = TimerQueue.init(allocator),
             .timer_mutex = .{},
             .next_timer_id = std.atomic.Value(u64).init(1),
+            .armed_deadline_ns = 0,
+            .timer_fd = undefined,
             .ready_threads = std.ArrayList(*GreenThread){},
             .ready_mutex = .{},
             .total_registered = 0,
@@ -98,7 +201,16 @@ pub const Netpoller = struct {
         if (builtin.os.tag == .macos or builtin.os.tag == .freebsd or builtin.os.tag == .netbsd or builtin.os.tag == .openbsd) {
             np.poll_fd = try std.posix.kqueue();
         } else if (builtin.os.tag == .linux) {
-            np.poll_fd = try std.posix.epoll_create1(0);
+            np.poll_fd = try std.posix.epoll_create1(std.os.linux.EPOLL.CLOEXEC);
+            errdefer std.posix.close(np.poll_fd);
+            np.timer_fd = try std.posix.timerfd_create(.MONOTONIC, .{ .CLOEXEC = true, .NONBLOCK = true });
+            errdefer std.posix.close(np.timer_fd);
+            // Level-triggered: stays readable until the expiration count is read
+            var event: std.os.linux.epoll_event = .{
+                .events = std.os.linux.EPOLL.IN,
+                .data = .{ .fd = np.timer_fd },
+            };
+            try std.posix.epoll_ctl(np.poll_fd, std.os.linux.EPOLL.CTL_ADD, np.timer_fd, &event);
         }
 
         return np;
@@ -112,6 +224,9 @@ pub const Netpoller = struct {
         if (builtin.os.tag == .macos or builtin.os.tag == .freebsd or builtin.os.tag == .netbsd or builtin.os.tag == .openbsd or builtin.os.tag == .linux) {
             std.posix.close(self.poll_fd);
         }
+        if (builtin.os.tag == .linux) {
+            std.posix.close(self.timer_fd);
+        }
 
         self.pending.deinit();
         self.timers.deinit();
@@ -124,6 +239,11 @@ pub const Netpoller = struct {
         self.running.store(true, .release);
 
         self.poller_thread = try std.Thread.spawn(.{}, pollLoop, .{self});
+
+        // Timers registered while stopped still need the kernel timer
+        self.timer_mutex.lock();
+        defer self.timer_mutex.unlock();
+        if (self.timers.nextDeadline()) |deadline| self.armTimer(deadline);
     }
 
     /// Stop the poller thread
@@ -131,10 +251,16 @@ pub const Netpoller = struct {
         if (!self.running.load(.acquire)) return;
         self.running.store(false, .release);
 
+        // The poller blocks without a timeout - fire the kernel timer now so it sees !running
+        self.timer_mutex.lock();
+        self.wakePoller();
+        self.timer_mutex.unlock();
+
         if (self.poller_thread) |t| {
             t.join();
             self.poller_thread = null;
         }
+        self.armed_deadline_ns = 0;
     }
 
     /// Register an fd for async I/O (called by green thread before blocking I/O)
@@ -182,32 +308,38 @@ pub const Netpoller = struct {
     /// Register a timer (for asyncio.sleep)
     /// duration_ns: how long to sleep in nanoseconds
     /// thread: the green thread to wake when timer fires
-    /// Returns immediately, thread will be woken by poll loop
-    pub fn registerTimer(self: *Netpoller, duration_ns: u64, thread: *GreenThread) !void {
+    /// Returns the timer id (for cancelTimer); the thread is woken by the poll loop
+    pub fn registerTimer(self: *Netpoller, duration_ns: u64, thread: *GreenThread) !u64 {
         const timer_id = self.next_timer_id.fetchAdd(1, .monotonic);
-        const now = std.time.nanoTimestamp();
-        const deadline = now + @as(i128, duration_ns);
+        const deadline = monotonicNs() +| duration_ns;
 
         self.timer_mutex.lock();
         defer self.timer_mutex.unlock();
 
-        try self.timers.put(timer_id, .{
+        try self.timers.add(.{
             .id = timer_id,
             .thread = thread,
             .deadline_ns = deadline,
         });
         self.total_timers += 1;
 
-        // Register with OS using EVFILT_TIMER (kqueue) or timerfd (Linux)
-        if (builtin.os.tag == .macos or builtin.os.tag == .freebsd or builtin.os.tag == .netbsd or builtin.os.tag == .openbsd) {
-            try self.kqueueAddTimer(timer_id, duration_ns);
-        } else if (builtin.os.tag == .linux) {
-            // Linux uses timerfd - for now use simple polling
-            // TODO: implement timerfd for better efficiency
+        // Only a new earliest deadline touches the kernel timer
+        if (self.armed_deadline_ns == 0 or deadline < self.armed_deadline_ns) {
+            self.armTimer(deadline);
         }
 
         // Park the thread
         thread.state = .blocked;
+        return timer_id;
+    }
+
+    /// Cancel a pending timer (asyncio task cancelled mid-sleep)
+    /// Returns false if the timer already fired. The kernel timer is left armed;
+    /// an early wakeup just re-arms to the next live deadline.
+    pub fn cancelTimer(self: *Netpoller, timer_id: u64) bool {
+        self.timer_mutex.lock();
+        defer self.timer_mutex.unlock();
+        return self.timers.cancel(timer_id) != null;
     }
 
     /// Get ready threads (called by scheduler)
@@ -245,23 +377,56 @@ pub const Netpoller = struct {
         _ = std.posix.kevent(self.poll_fd, &changelist, &[_]std.posix.Kevent{}, null) catch return error.KqueueError;
     }
 
-    /// Add a timer to kqueue using EVFILT_TIMER
-    fn kqueueAddTimer(self: *Netpoller, timer_id: u64, duration_ns: u64) !void {
-        var changelist: [1]std.posix.Kevent = undefined;
+    /// Arm the kernel timer for an absolute monotonic deadline (caller holds timer_mutex)
+    fn armTimer(self: *Netpoller, deadline_ns: u64) void {
+        self.armed_deadline_ns = deadline_ns;
+        if (builtin.os.tag == .macos or builtin.os.tag == .freebsd or builtin.os.tag == .netbsd or builtin.os.tag == .openbsd) {
+            const now = monotonicNs();
+            const remaining = if (deadline_ns > now) deadline_ns - now else 0;
+            // kqueue timers tick in milliseconds - round up so we never wake early
+            self.kqueueArmTimer(@intCast(@max(1, std.math.divCeil(u64, remaining, std.time.ns_per_ms) catch 1)));
+        } else if (builtin.os.tag == .linux) {
+            const spec = std.os.linux.itimerspec{
+                .it_interval = .{ .sec = 0, .nsec = 0 },
+                .it_value = .{
+                    .sec = @intCast(deadline_ns / std.time.ns_per_s),
+                    .nsec = @intCast(deadline_ns % std.time.ns_per_s),
+                },
+            };
+            std.posix.timerfd_settime(self.timer_fd, .{ .ABSTIME = true }, &spec, null) catch {};
+        }
+    }
+
+    /// Make the blocked poller return promptly (caller holds timer_mutex)
+    fn wakePoller(self: *Netpoller) void {
+        if (builtin.os.tag == .macos or builtin.os.tag == .freebsd or builtin.os.tag == .netbsd or builtin.os.tag == .openbsd) {
+            self.kqueueArmTimer(0);
+        } else if (builtin.os.tag == .linux) {
+            // A zero it_value disarms, so fire 1ns from now (relative)
+            const spec = std.os.linux.itimerspec{
+                .it_interval = .{ .sec = 0, .nsec = 0 },
+                .it_value = .{ .sec = 0, .nsec = 1 },
+            };
+            std.posix.timerfd_settime(self.timer_fd, .{}, &spec, null) catch {};
+        }
+        self.armed_deadline_ns = 1;
+    }
 
-        // Convert nanoseconds to milliseconds for kqueue (NOTE_NSECONDS flag would allow ns)
-        const duration_ms: isize = @intCast(@max(1, duration_ns / 1_000_000));
+    /// Identifier of the single kqueue timer (timer ids start at 1)
+    const kqueue_timer_ident: usize = 0;
 
+    /// (Re)arm the single EVFILT_TIMER - EV_ADD on an existing ident replaces its period
+    fn kqueueArmTimer(self: *Netpoller, duration_ms: isize) void {
+        var changelist: [1]std.posix.Kevent = undefined;
         changelist[0] = .{
-            .ident = timer_id,
+            .ident = kqueue_timer_ident,
             .filter = std.posix.system.EVFILT.TIMER,
             .flags = std.posix.system.EV.ADD | std.posix.system.EV.ONESHOT,
             .fflags = 0, // Use milliseconds (default)
             .data = duration_ms,
-            .udata = timer_id, // Store timer_id for lookup
+            .udata = 0,
         };
-
-        _ = std.posix.kevent(self.poll_fd, &changelist, &[_]std.posix.Kevent{}, null) catch return error.KqueueError;
+        _ = std.posix.kevent(self.poll_fd, &changelist, &[_]std.posix.Kevent{}, null) catch {};
     }
 
     fn kqueueRemove(self: *Netpoller, fd: std.posix.fd_t) !void {
@@ -288,7 +453,7 @@ pub const Netpoller = struct {
     }
 
     fn epollAdd(self: *Netpoller, fd: std.posix.fd_t, op: IoOp) !void {
-        // Timers use timerfd on Linux, not epoll directly
+        // Timers go through the timer heap and the shared timerfd
         if (op == .timer) return;
 
         var event: std.os.linux.epoll_event = .{
@@ -316,85 +481,90 @@ pub const Netpoller = struct {
             } else if (builtin.os.tag == .linux) {
                 self.pollEpoll();
             } else {
-                // Unsupported platform - just sleep
-                std.time.sleep(10 * std.time.ns_per_ms);
+                // Unsupported platform - no kernel timer, so poll the heap
+                std.Thread.sleep(10 * std.time.ns_per_ms);
+                self.fireTimers();
             }
         }
     }
 
     fn pollKqueue(self: *Netpoller) void {
         var events: [64]std.posix.Kevent = undefined;
-        const timeout = std.posix.timespec{ .sec = 0, .nsec = 1 * std.time.ns_per_ms }; // 1ms for faster timer response
 
-        const n = std.posix.kevent(self.poll_fd, &[_]std.posix.Kevent{}, &events, &timeout) catch return;
-        if (n == 0) return;
+        // No timeout: the armed EVFILT_TIMER wakes us for the next deadline
+        const n = std.posix.kevent(self.poll_fd, &[_]std.posix.Kevent{}, &events, null) catch return;
 
-        self.pending_mutex.lock();
-        self.timer_mutex.lock();
-        self.ready_mutex.lock();
-        defer {
-            self.ready_mutex.unlock();
-            self.timer_mutex.unlock();
-            self.pending_mutex.unlock();
-        }
+        var timer_fired = false;
+        {
+            self.pending_mutex.lock();
+            self.ready_mutex.lock();
+            defer {
+                self.ready_mutex.unlock();
+                self.pending_mutex.unlock();
+            }
 
-        for (events[0..@intCast(n)]) |event| {
-            // Check if this is a timer event
-            if (event.filter == std.posix.system.EVFILT.TIMER) {
-                const timer_id: u64 = event.udata;
-                if (self.timers.get(timer_id)) |timer| {
-                    // Wake the thread
-                    timer.thread.state = .ready;
-                    self.ready_threads.append(self.allocator, timer.thread) catch {};
-                    self.total_completed += 1;
-                    _ = self.timers.remove(timer_id);
+            for (events[0..n]) |event| {
+                if (event.filter == std.posix.system.EVFILT.TIMER) {
+                    timer_fired = true;
+                    continue;
                 }
-                continue;
-            }
 
-            // Regular I/O event
-            const fd: std.posix.fd_t = @intCast(event.ident);
-            if (self.pending.get(fd)) |pending| {
-                pending.thread.state = .ready;
-                self.ready_threads.append(self.allocator, pending.thread) catch {};
-                self.total_completed += 1;
-                _ = self.pending.remove(fd);
+                // Regular I/O event
+                const fd: std.posix.fd_t = @intCast(event.ident);
+                if (self.pending.get(fd)) |pending| {
+                    pending.thread.state = .ready;
+                    self.ready_threads.append(self.allocator, pending.thread) catch {};
+                    self.total_completed += 1;
+                    _ = self.pending.remove(fd);
+                }
             }
         }
+
+        if (timer_fired) self.fireTimers();
     }
 
     fn pollEpoll(self: *Netpoller) void {
         var events: [64]std.os.linux.epoll_event = undefined;
 
-        const n = std.posix.epoll_wait(self.poll_fd, &events, 1) catch return; // 1ms timeout
-
-        // Check timers (deadline-based polling - TODO: use timerfd)
-        self.checkTimers();
+        // No timeout: the timerfd wakes us for the next deadline
+        const n = std.posix.epoll_wait(self.poll_fd, &events, -1);
 
-        if (n == 0) return;
+        var timer_fired = false;
+        {
+            self.pending_mutex.lock();
+            self.ready_mutex.lock();
+            defer {
+                self.ready_mutex.unlock();
+                self.pending_mutex.unlock();
+            }
 
-        self.pending_mutex.lock();
-        self.ready_mutex.lock();
-        defer {
-            self.ready_mutex.unlock();
-            self.pending_mutex.unlock();
-        }
+            for (events[0..n]) |event| {
+                const fd = event.data.fd;
 
-        for (events[0..@intCast(n)]) |event| {
-            const fd = event.data.fd;
+                if (fd == self.timer_fd) {
+                    // Clear the expiration count so the level-triggered fd goes quiet
+                    var expirations: [8]u8 = undefined;
+                    _ = std.posix.read(self.timer_fd, &expirations) catch {};
+                    timer_fired = true;
+                    continue;
+                }
 
-            if (self.pending.get(fd)) |pending| {
-                pending.thread.state = .ready;
-                self.ready_threads.append(self.allocator, pending.thread) catch {};
-                self.total_completed += 1;
-                _ = self.pending.remove(fd);
+                if (self.pending.get(fd)) |pending| {
+                    pending.thread.state = .ready;
+                    self.ready_threads.append(self.allocator, pending.thread) catch {};
+                    self.total_completed += 1;
+                    _ = self.pending.remove(fd);
+                }
             }
         }
+
+        if (timer_fired) self.fireTimers();
     }
 
-    /// Check expired timers (used by Linux until timerfd is implemented)
-    fn checkTimers(self: *Netpoller) void {
-        const now = std.time.nanoTimestamp();
+    /// Wake every timer that is due, then arm the kernel timer for the next one
+    /// O(k log n) for k expired timers - pending timers that aren't due are never touched
+    fn fireTimers(self: *Netpoller) void {
+        const now = monotonicNs();
 
         self.timer_mutex.lock();
         self.ready_mutex.lock();
@@ -403,26 +573,15 @@ pub const Netpoller = struct {
             self.timer_mutex.unlock();
         }
 
-        // Collect expired timers
-        var expired = std.ArrayList(u64){};
-        defer expired.deinit(self.allocator);
-
-        var iter = self.timers.iterator();
-        while (iter.next()) |entry| {
-            if (entry.value_ptr.deadline_ns <= now) {
-                expired.append(self.allocator, entry.key_ptr.*) catch continue;
-            }
+        while (self.timers.popExpired(now)) |timer| {
+            const thread = timer.thread orelse continue;
+            thread.state = .ready;
+            self.ready_threads.append(self.allocator, thread) catch {};
+            self.total_completed += 1;
         }
 
-        // Wake expired timers
-        for (expired.items) |timer_id| {
-            if (self.timers.get(timer_id)) |timer| {
-                timer.thread.state = .ready;
-                self.ready_threads.append(self.allocator, timer.thread) catch {};
-                self.total_completed += 1;
-                _ = self.timers.remove(timer_id);
-            }
-        }
+        self.armed_deadline_ns = 0;
+        if (self.timers.nextDeadline()) |deadline| self.armTimer(deadline);
     }
 
     /// Statistics
@@ -433,6 +592,7 @@ pub const Netpoller = struct {
             .total_errors = self.total_errors,
             .pending_count = self.pending.count(),
             .ready_count = self.ready_threads.items.len,
+            .timer_count = self.timers.count(),
         };
     }
 };
@@ -443,6 +603,7 @@ pub const NetpollerStats = struct {
     total_errors: u64,
     pending_count: usize,
     ready_count: usize,
+    timer_count: usize,
 };
 
 // === Global netpoller instance ===
@@ -469,73 +630,113 @@ pub fn getNetpoller(allocator: std.mem.Allocator) !*Netpoller {
 }
 
 // === Simple timer API for state machine async ===
-
-/// Timer state for non-blocking sleep
-const SimpleTimer = struct {
-    deadline_ns: i128,
-    fired: bool = false,
-};
-
-var simple_timers: std.AutoHashMap(u64, SimpleTimer) = undefined;
+//
+// State-machine coroutines poll timerReady() instead of parking a green
+// thread, but their timers share the TimerQueue heap: a poll only looks at
+// the earliest deadline. Each timer records the gather slot that was being
+// polled when it was added, so waitTimers() can sleep until the next deadline
+// and hand back just the frames whose timers fired.
+
+var simple_timers: TimerQueue = undefined;
+// Timers popped off the heap whose coroutine has not observed them yet
+var fired_timers: std.AutoHashMap(u64, void) = undefined;
+// Owners of fired timers not yet handed out by waitTimers()
+var woken_owners: std.ArrayList(usize) = .{};
+var timers_fired = false;
+// Gather slot being polled on the event loop thread (null outside gather)
+var timer_owner: ?usize = null;
 var simple_timer_mutex: std.Thread.Mutex = .{};
 var next_simple_timer_id: std.atomic.Value(u64) = std.atomic.Value(u64).init(1);
 var simple_timers_initialized = false;
 
 fn ensureSimpleTimersInit() void {
     if (!simple_timers_initialized) {
-        simple_timers = std.AutoHashMap(u64, SimpleTimer).init(std.heap.page_allocator);
+        simple_timers = TimerQueue.init(std.heap.page_allocator);
+        fired_timers = std.AutoHashMap(u64, void).init(std.heap.page_allocator);
         simple_timers_initialized = true;
     }
 }
 
+/// Move every due timer from the heap to fired_timers (caller holds simple_timer_mutex)
+fn drainExpiredTimers(now_ns: u64) void {
+    while (simple_timers.popExpired(now_ns)) |timer| {
+        fired_timers.put(timer.id, {}) catch {};
+        if (timer.owner) |owner| woken_owners.append(std.heap.page_allocator, owner) catch {};
+        timers_fired = true;
+    }
+}
+
+/// Tag timers added from now on with a gather slot; returns the previous tag
+pub fn setTimerOwner(owner: ?usize) ?usize {
+    const prev = timer_owner;
+    timer_owner = owner;
+    return prev;
+}
+
 /// Add a timer that fires after duration_ns nanoseconds
 /// Returns timer ID for checking with timerReady()
 pub fn addTimer(duration_ns: u64) u64 {
-    ensureSimpleTimersInit();
-
     const timer_id = next_simple_timer_id.fetchAdd(1, .monotonic);
-    const now = std.time.nanoTimestamp();
-    const deadline = now + @as(i128, duration_ns);
 
     simple_timer_mutex.lock();
     defer simple_timer_mutex.unlock();
+    ensureSimpleTimersInit();
 
-    simple_timers.put(timer_id, .{
-        .deadline_ns = deadline,
-        .fired = false,
+    simple_timers.add(.{
+        .id = timer_id,
+        .thread = null,
+        .deadline_ns = monotonicNs() +| duration_ns,
+        .owner = timer_owner,
     }) catch {};
 
     return timer_id;
 }
 
 /// Check if a timer has fired (deadline passed)
+/// O(1) while the earliest deadline is still in the future
 pub fn timerReady(timer_id: u64) bool {
-    ensureSimpleTimersInit();
-
     simple_timer_mutex.lock();
     defer simple_timer_mutex.unlock();
+    ensureSimpleTimersInit();
 
-    if (simple_timers.getPtr(timer_id)) |timer| {
-        if (timer.fired) return true;
-
-        const now = std.time.nanoTimestamp();
-        if (now >= timer.deadline_ns) {
-            timer.fired = true;
-            return true;
-        }
-        return false;
-    }
-    return true; // Unknown timer treated as complete
+    drainExpiredTimers(monotonicNs());
+    if (fired_timers.remove(timer_id)) return true;
+    return !simple_timers.live.contains(timer_id); // Unknown timer treated as complete
 }
 
-/// Remove a completed timer to free memory
+/// Remove a timer (fired or not) to free memory
 pub fn removeTimer(timer_id: u64) void {
+    simple_timer_mutex.lock();
+    defer simple_timer_mutex.unlock();
     ensureSimpleTimersInit();
 
+    _ = simple_timers.cancel(timer_id);
+    _ = fired_timers.remove(timer_id);
+}
+
+/// Sleep until at least one timer has fired since the last call, appending
+/// the owner slot of each fired timer to `ready`. Returns false straight away
+/// when no timers are pending, so the caller can fall back to re-polling.
+pub fn waitTimers(allocator: std.mem.Allocator, ready: *std.ArrayListUnmanaged(usize)) !bool {
     simple_timer_mutex.lock();
     defer simple_timer_mutex.unlock();
+    ensureSimpleTimersInit();
+
+    while (true) {
+        drainExpiredTimers(monotonicNs());
+        if (timers_fired) {
+            timers_fired = false;
+            try ready.appendSlice(allocator, woken_owners.items);
+            woken_owners.clearRetainingCapacity();
+            return true;
+        }
+        const deadline = simple_timers.nextDeadline() orelse return false;
 
-    _ = simple_timers.remove(timer_id);
+        // Other threads may add timers while we sleep
+        simple_timer_mutex.unlock();
+        std.Thread.sleep(deadline -| monotonicNs());
+        simple_timer_mutex.lock();
+    }
 }
 
 // === Tests ===
@@ -560,3 +761,73 @@ test "Netpoller start/stop" {
     np.stop();
     try std.testing.expect(!np.running.load(.acquire));
 }
+
+test "TimerQueue pops in deadline order and skips cancelled timers" {
+    const allocator = std.testing.allocator;
+    var q = TimerQueue.init(allocator);
+    defer q.deinit();
+
+    var thread: GreenThread = undefined;
+    try q.add(.{ .id = 1, .thread = &thread, .deadline_ns = 300 });
+    try q.add(.{ .id = 2, .thread = &thread, .deadline_ns = 100 });
+    try q.add(.{ .id = 3, .thread = &thread, .deadline_ns = 200 });
+    try std.testing.expectEqual(@as(?u64, 100), q.nextDeadline());
+
+    try std.testing.expect(q.cancel(2) != null);
+    try std.testing.expect(q.cancel(2) == null);
+    try std.testing.expectEqual(@as(?u64, 200), q.nextDeadline());
+
+    try std.testing.expect(q.popExpired(150) == null);
+    try std.testing.expectEqual(@as(u64, 3), q.popExpired(250).?.id);
+    try std.testing.expectEqual(@as(u64, 1), q.popExpired(1000).?.id);
+    try std.testing.expect(q.popExpired(1000) == null);
+    try std.testing.expectEqual(@as(?u64, null), q.nextDeadline());
+}
+
+test "TimerQueue compacts after mass cancellation" {
+    const allocator = std.testing.allocator;
+    var q = TimerQueue.init(allocator);
+    defer q.deinit();
+
+    var thread: GreenThread = undefined;
+    var id: u64 = 1;
+    while (id <= 1000) : (id += 1) {
+        try q.add(.{ .id = id, .thread = &thread, .deadline_ns = id });
+    }
+    id = 1;
+    while (id <= 990) : (id += 1) _ = q.cancel(id);
+
+    try std.testing.expectEqual(@as(usize, 10), q.count());
+    try std.testing.expect(q.heap.count() <= 2 * 64);
+    try std.testing.expectEqual(@as(?u64, 991), q.nextDeadline());
+}
+
+test "state machine timers fire by deadline" {
+    const early = addTimer(0);
+    const late = addTimer(std.time.ns_per_hour);
+    defer removeTimer(late);
+
+    try std.testing.expect(timerReady(early));
+    try std.testing.expect(!timerReady(late));
+    try std.testing.expect(timerReady(9999_9999));
+}
+
+test "waitTimers returns the owners of fired timers only" {
+    const allocator = std.testing.allocator;
+    var ready: std.ArrayListUnmanaged(usize) = .{};
+    defer ready.deinit(allocator);
+
+    const prev = setTimerOwner(7);
+    const soon = addTimer(std.time.ns_per_ms);
+    _ = setTimerOwner(3);
+    const late = addTimer(std.time.ns_per_hour);
+    _ = setTimerOwner(prev);
+    defer removeTimer(late);
+
+    // Sleeps until the 1ms deadline, not the hour-long one (earlier tests
+    // may leave an unowned fired timer, which returns with nothing ready)
+    while (ready.items.len == 0) try std.testing.expect(try waitTimers(allocator, &ready));
+    try std.testing.expectEqualSlices(usize, &.{7}, ready.items);
+    try std.testing.expect(timerReady(soon));
+    try std.testing.expect(!timerReady(late));
+}
@@ -1,11 +1,22 @@
 const std = @import("std");
 const GreenThread = @import("green_thread").GreenThread;
-const WorkQueue = @import("work_queue").WorkQueue;
+const work_queue = @import("work_queue");
+const WorkQueue = work_queue.WorkQueue;
+const InjectQueue = work_queue.InjectQueue;
 const Netpoller = @import("netpoller").Netpoller;
 
+/// Worker identity of the current OS thread (null outside scheduler workers)
+/// Lets spawns from inside a green thread push straight to the owner's deque.
+threadlocal var current_worker: ?struct { scheduler: *const Scheduler, id: usize } = null;
+
+/// Workers check the injection queue before their own deque every N ticks,
+/// so externally spawned tasks can't starve behind a busy local queue (Go uses 61)
+const inject_check_interval = 61;
+
 pub const Scheduler = struct {
     allocator: std.mem.Allocator,
     queues: []WorkQueue,
+    inject: InjectQueue,
     workers: []std.Thread,
     next_id: std.atomic.Value(u64),
     active_threads: std.atomic.Value(usize),
@@ -22,8 +33,11 @@ pub const Scheduler = struct {
         const queues = try allocator.alloc(WorkQueue, thread_count);
         errdefer allocator.free(queues);
 
+        var initialized: usize = 0;
+        errdefer for (queues[0..initialized]) |*queue| queue.deinit();
         for (queues) |*queue| {
-            queue.* = WorkQueue.init(allocator);
+            queue.* = try WorkQueue.init(allocator);
+            initialized += 1;
         }
 
         const workers = try allocator.alloc(std.Thread, thread_count);
@@ -37,6 +51,7 @@ pub const Scheduler = struct {
                 return Scheduler{
                     .allocator = allocator,
                     .queues = queues,
+                    .inject = InjectQueue.init(allocator),
                     .workers = workers,
                     .next_id = std.atomic.Value(u64).init(1),
                     .active_threads = std.atomic.Value(usize).init(0),
@@ -50,6 +65,7 @@ pub const Scheduler = struct {
         return Scheduler{
             .allocator = allocator,
             .queues = queues,
+            .inject = InjectQueue.init(allocator),
             .workers = workers,
             .next_id = std.atomic.Value(u64).init(1),
             .active_threads = std.atomic.Value(usize).init(0),
@@ -95,6 +111,7 @@ pub const Scheduler = struct {
         for (self.queues) |*queue| {
             queue.deinit();
         }
+        self.inject.deinit();
         self.allocator.free(self.queues);
         self.allocator.free(self.workers);
     }
@@ -115,12 +132,7 @@ pub const Scheduler = struct {
         const thread = try GreenThread.init(self.allocator, id, Wrapper.call, null, null);
         thread.result = @ptrCast(&func);
 
-        // Round-robin assignment to queues
-        const queue_idx = @as(usize, @intCast(id % self.num_workers));
-        try self.queues[queue_idx].push(thread);
-
-        // Increment counter (workers will pick it up)
-        _ = self.active_threads.fetchAdd(1, .acq_rel);
+        try self.enqueue(thread);
 
         return thread;
     }
@@ -207,12 +219,7 @@ pub const Scheduler = struct {
         };
         thread.user_context = @ptrCast(wrapper);
 
-        // Round-robin assignment to queues
-        const queue_idx = @as(usize, @intCast(id % self.num_workers));
-        try self.queues[queue_idx].push(thread);
-
-        // Increment counter (workers will pick it up)
-        _ = self.active_threads.fetchAdd(1, .acq_rel);
+        try self.enqueue(thread);
 
         return thread;
     }
@@ -317,14 +324,22 @@ pub const Scheduler = struct {
         };
         thread.user_context = @ptrCast(wrapper_ctx);
 
-        // Round-robin assignment to queues
-        const queue_idx = @as(usize, @intCast(id % self.num_workers));
-        try self.queues[queue_idx].push(thread);
+        try self.enqueue(thread);
 
-        // Increment counter (workers will pick it up)
+        return thread;
+    }
+
+    /// Queue a new green thread: the spawning worker's own deque when called from
+    /// a worker (only the owner may push), otherwise the global injection queue
+    fn enqueue(self: *Scheduler, thread: *GreenThread) !void {
+        // Count before publishing so a fast worker can't decrement first
         _ = self.active_threads.fetchAdd(1, .acq_rel);
+        errdefer _ = self.active_threads.fetchSub(1, .release);
 
-        return thread;
+        if (current_worker) |w| {
+            if (w.scheduler == self) return self.queues[w.id].push(thread);
+        }
+        try self.inject.push(thread);
     }
 
     /// Convert anonymous struct to expected type at comptime
@@ -353,21 +368,30 @@ pub const Scheduler = struct {
 
     fn workerLoop(self: *Scheduler, worker_id: usize) void {
         const queue = &self.queues[worker_id];
+        current_worker = .{ .scheduler = self, .id = worker_id };
+        defer current_worker = null;
+        var tick: usize = 0;
 
         while (!self.shutdown_flag.load(.acquire)) {
+            tick +%= 1;
+
+            // Periodically serve the injection queue first for fairness
+            if (tick % inject_check_interval == 0) {
+                if (self.takeInjected(queue)) |task| {
+                    self.runTask(task);
+                    continue;
+                }
+            }
+
             // Try local queue first (LIFO for cache locality)
             if (queue.pop()) |task| {
-                if (task.state == .ready) {
-                    task.run();
-                    // Cleanup user context if needed
-                    if (task.context_cleanup) |cleanup| {
-                        cleanup(task, self.allocator);
-                    }
-                }
-                _ = self.active_threads.fetchSub(1, .release);
-                // NOTE: Do NOT deinit here! The caller may be waiting on this thread
-                // via wait() and needs to read thread.result. The waiter is responsible
-                // for cleanup after reading the result.
+                self.runTask(task);
+                continue;
+            }
+
+            // Then tasks spawned from outside the workers
+            if (self.takeInjected(queue)) |task| {
+                self.runTask(task);
                 continue;
             }
 
@@ -376,20 +400,10 @@ pub const Scheduler = struct {
                 const ready = np.getReadyThreads();
                 if (ready.len > 0) {
                     // Take first one, put rest in queue
-                    var first = true;
-                    for (ready) |task| {
-                        if (first) {
-                            first = false;
-                            task.run();
-                            if (task.context_cleanup) |cleanup| {
-                                cleanup(task, self.allocator);
-                            }
-                            _ = self.active_threads.fetchSub(1, .release);
-                            // Do NOT deinit - waiter owns the thread
-                        } else {
-                            queue.push(task) catch {};
-                        }
+                    for (ready[1..]) |task| {
+                        queue.push(task) catch {};
                     }
+                    self.runTask(ready[0]);
                     self.allocator.free(ready);
                     continue;
                 }
@@ -397,15 +411,7 @@ pub const Scheduler = struct {
 
             // Try stealing from other queues (FIFO)
             if (self.trySteal(worker_id)) |task| {
-                if (task.state == .ready) {
-                    task.run();
-                    // Cleanup user context if needed
-                    if (task.context_cleanup) |cleanup| {
-                        cleanup(task, self.allocator);
-                    }
-                }
-                _ = self.active_threads.fetchSub(1, .release);
-                // Do NOT deinit - waiter owns the thread
+                self.runTask(task);
                 continue;
             }
 
@@ -414,6 +420,29 @@ pub const Scheduler = struct {
         }
     }
 
+    /// Run one green thread to completion on this worker
+    fn runTask(self: *Scheduler, task: *GreenThread) void {
+        if (task.state == .ready) {
+            task.run();
+            // Cleanup user context if needed
+            if (task.context_cleanup) |cleanup| {
+                cleanup(task, self.allocator);
+            }
+        }
+        _ = self.active_threads.fetchSub(1, .release);
+        // NOTE: Do NOT deinit here! The caller may be waiting on this thread
+        // via wait() and needs to read thread.result. The waiter is responsible
+        // for cleanup after reading the result.
+    }
+
+    /// Grab a fair share of the injection queue into the local deque
+    fn takeInjected(self: *Scheduler, queue: *WorkQueue) ?*GreenThread {
+        const pending = self.inject.len();
+        if (pending == 0) return null;
+        const batch = @min(32, pending / self.num_workers + 1);
+        return self.inject.popBatch(queue, batch);
+    }
+
     /// Determines optimal SIMD width for current architecture
     fn optimalSIMDWidth() comptime_int {
         const builtin = @import("builtin");
@@ -525,7 +554,7 @@ pub const Scheduler = struct {
         for (self.queues) |*queue| {
             total += queue.len();
         }
-        return total;
+        return total + self.inject.len();
     }
 };
 
@@ -0,0 +1,121 @@
+/// Buffered stdout for compiled print() and sys.stdout
+/// One process-wide buffer: print() in a hot loop is a memcpy, not a write(2).
+/// Mirrors CPython's TextIOWrapper semantics:
+/// - line-buffered when stdout is a TTY, block-buffered otherwise
+/// - flush=True / sys.stdout.flush() drain immediately
+/// - generated main() and exit paths flush before the process ends
+const std = @import("std");
+const builtin = @import("builtin");
+
+const is_freestanding = builtin.os.tag == .freestanding;
+
+/// Browser WASM has no threads - use a no-op lock there
+const Mutex = if (is_freestanding) struct {
+    fn lock(_: *@This()) void {}
+    fn unlock(_: *@This()) void {}
+} else std.Thread.Mutex;
+
+pub const buffer_size = 64 * 1024;
+
+const Mode = enum(u8) { unknown, line, block };
+
+var buffer: [buffer_size]u8 = undefined;
+var len: usize = 0;
+var mode: Mode = .unknown;
+var mutex: Mutex = .{};
+
+/// Write formatted output (same format syntax as std.debug.print)
+pub fn print(comptime fmt: []const u8, args: anytype) void {
+    mutex.lock();
+    defer mutex.unlock();
+
+    // Format straight into the free tail of the buffer
+    if (std.fmt.bufPrint(buffer[len..], fmt, args)) |out| {
+        len += out.len;
+    } else |_| {
+        // Not enough room - drain and retry with the whole buffer
+        flushLocked();
+        if (std.fmt.bufPrint(buffer[0..], fmt, args)) |out| {
+            len = out.len;
+        } else |_| {
+            // Larger than the buffer - format on the heap and write through
+            const out = std.fmt.allocPrint(std.heap.page_allocator, fmt, args) catch return;
+            defer std.heap.page_allocator.free(out);
+            writeFd(out);
+            return;
+        }
+    }
+    if (isLineBuffered() and std.mem.indexOfScalar(u8, fmt, '\n') != null) flushLocked();
+}
+
+/// Write raw bytes (sys.stdout.write)
+pub fn writeAll(bytes: []const u8) void {
+    mutex.lock();
+    defer mutex.unlock();
+
+    if (bytes.len > buffer.len - len) {
+        flushLocked();
+        if (bytes.len >= buffer.len) {
+            writeFd(bytes);
+            return;
+        }
+    }
+    @memcpy(buffer[len..][0..bytes.len], bytes);
+    len += bytes.len;
+    if (isLineBuffered() and std.mem.indexOfScalar(u8, bytes, '\n') != null) flushLocked();
+}
+
+/// Drain the buffer to fd 1 (print(flush=True), sys.stdout.flush(), exit)
+pub fn flush() void {
+    mutex.lock();
+    defer mutex.unlock();
+    flushLocked();
+}
+
+/// Number of bytes waiting to be written
+pub fn pending() usize {
+    mutex.lock();
+    defer mutex.unlock();
+    return len;
+}
+
+fn flushLocked() void {
+    if (len == 0) return;
+    writeFd(buffer[0..len]);
+    len = 0;
+}
+
+fn writeFd(bytes: []const u8) void {
+    if (comptime is_freestanding) return; // Browser WASM has no stdout
+    var rest = bytes;
+    while (rest.len > 0) {
+        const n = std.posix.write(std.posix.STDOUT_FILENO, rest) catch return;
+        if (n == 0) return;
+        rest = rest[n..];
+    }
+}
+
+/// TTY check happens once, on first output
+fn isLineBuffered() bool {
+    if (mode == .unknown) {
+        mode = if (comptime is_freestanding)
+            .block
+        else if (std.posix.isatty(std.posix.STDOUT_FILENO))
+            .line
+        else
+            .block;
+    }
+    return mode == .line;
+}
+
+test "stdout buffers until flush" {
+    mode = .block;
+    defer mode = .unknown;
+    len = 0;
+
+    print("{d} {s}", .{ 42, "x" });
+    writeAll("!");
+    try std.testing.expectEqualStrings("42 x!", buffer[0..len]);
+    try std.testing.expectEqual(@as(usize, 5), pending());
+    len = 0;
+}
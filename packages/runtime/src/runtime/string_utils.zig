@@ -29,7 +29,10 @@ pub fn pyJoin(allocator: std.mem.Allocator, separator: []const u8, list: anytype
     }
     // Handle ArrayList/struct with items field
     else if (info == .@"struct" and @hasField(T, "items")) {
-        return pyJoinSlice(allocator, separator, list.items);
+        if (@TypeOf(list.items) == []PyValue or @TypeOf(list.items) == []const PyValue) {
+            return pyJoinSlice(allocator, separator, list.items);
+        }
+        return std.mem.join(allocator, separator, list.items);
     }
     else {
         @compileError("pyJoin: unsupported type " ++ @typeName(T));
@@ -39,18 +42,14 @@ pub fn pyJoin(allocator: std.mem.Allocator, separator: []const u8, list: anytype
 /// Join a slice of PyValue items with separator
 fn pyJoinSlice(allocator: std.mem.Allocator, separator: []const u8, items: []const PyValue) ![]u8 {
     if (items.len == 0) return try allocator.dupe(u8, "");
+    if (items.len == 1 and items[0] == .string) return try allocator.dupe(u8, items[0].string);
 
-    // Calculate total length
+    // Calculate total length (single allocation below)
     var total_len: usize = 0;
     for (items) |item| {
         switch (item) {
             .string => |s| total_len += s.len,
-            .int => |n| {
-                // Convert int to string length estimate
-                var buf: [32]u8 = undefined;
-                const s = std.fmt.bufPrint(&buf, "{d}", .{n}) catch "";
-                total_len += s.len;
-            },
+            .int => |n| total_len += decimalLen(n),
             else => {},
         }
     }
@@ -84,6 +83,45 @@ fn pyJoinSlice(allocator: std.mem.Allocator, separator: []const u8, items: []con
     return result[0..pos];
 }
 
+/// Number of characters in the decimal representation of n
+fn decimalLen(n: i64) usize {
+    var len: usize = if (n < 0) 2 else 1;
+    var v = @abs(n);
+    while (v >= 10) : (v /= 10) len += 1;
+    return len;
+}
+
+/// Growable backing store for a string built with `s += ...` in a loop.
+///
+/// Codegen keeps one per `+=` site (a threadlocal container var) and emits
+/// `s = try acc.append(allocator, s, x)`. While `s` is still exactly the
+/// slice last returned, appends go in place with doubling growth (amortized
+/// O(1) instead of copying the whole string each time). If `s` was
+/// reassigned in between, the buffer restarts from the new value.
+///
+/// Buffers are never freed or overwritten below `len`: earlier values of
+/// the variable may still be referenced (t = s) and must stay intact.
+pub const StringAccumulator = struct {
+    buf: []u8 = &.{},
+    len: usize = 0,
+
+    pub fn append(self: *StringAccumulator, allocator: std.mem.Allocator, current: []const u8, suffix: []const u8) ![]u8 {
+        const in_place = self.len > 0 and current.ptr == self.buf.ptr and current.len == self.len;
+        if (!in_place) {
+            self.buf = try allocator.alloc(u8, @max(64, (current.len + suffix.len) * 2));
+            @memcpy(self.buf[0..current.len], current);
+            self.len = current.len;
+        } else if (self.len + suffix.len > self.buf.len) {
+            const grown = try allocator.alloc(u8, @max(self.buf.len * 2, self.len + suffix.len));
+            @memcpy(grown[0..self.len], self.buf[0..self.len]);
+            self.buf = grown;
+        }
+        @memcpy(self.buf[self.len..][0..suffix.len], suffix);
+        self.len += suffix.len;
+        return self.buf[0..self.len];
+    }
+};
+
 /// Allocates a new uppercase string
 pub fn toUpper(allocator: std.mem.Allocator, input: []const u8) ![]u8 {
     const result = try allocator.alloc(u8, input.len);
@@ -101,3 +139,42 @@ pub fn toLower(allocator: std.mem.Allocator, input: []const u8) ![]u8 {
     }
     return result;
 }
+
+test "StringAccumulator appends in place and keeps old values intact" {
+    var arena = std.heap.ArenaAllocator.init(std.testing.allocator);
+    defer arena.deinit();
+    const allocator = arena.allocator();
+
+    var acc = StringAccumulator{};
+    var s: []const u8 = "";
+    for (0..100) |_| s = try acc.append(allocator, s, "ab");
+    try std.testing.expectEqual(@as(usize, 200), s.len);
+
+    // An alias taken mid-loop survives later appends and growth
+    const alias = s;
+    for (0..100) |_| s = try acc.append(allocator, s, "cd");
+    try std.testing.expectEqual(@as(usize, 200), alias.len);
+    try std.testing.expectEqualStrings("ab", alias[198..]);
+
+    // Reassigning the variable restarts the buffer instead of clobbering `s`
+    var t: []const u8 = s[0..2];
+    t = try acc.append(allocator, t, "!");
+    try std.testing.expectEqualStrings("ab!", t);
+    try std.testing.expectEqualStrings("ab", s[2..4]);
+}
+
+test "pyJoin single allocation paths" {
+    const allocator = std.testing.allocator;
+
+    var list = std.ArrayList([]const u8){};
+    defer list.deinit(allocator);
+    try list.appendSlice(allocator, &.{ "a", "b", "c" });
+    const joined = try pyJoin(allocator, ", ", list);
+    defer allocator.free(joined);
+    try std.testing.expectEqualStrings("a, b, c", joined);
+
+    const values = [_]PyValue{ .{ .string = "x" }, .{ .int = -42 }, .{ .int = 7 } };
+    const mixed = try pyJoin(allocator, "-", PyValue{ .list = &values });
+    defer allocator.free(mixed);
+    try std.testing.expectEqualStrings("x--42-7", mixed);
+}
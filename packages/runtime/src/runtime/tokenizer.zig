@@ -6,21 +6,36 @@ const std = @import("std");
 const tokenizer_impl = @import("tokenizer");
 
 pub const Tokenizer = tokenizer_impl.Tokenizer;
+pub const MappedTokenizer = tokenizer_impl.MappedTokenizer;
 
 /// Global tokenizer instance (lazily initialized)
 var global_tokenizer: ?*Tokenizer = null;
 
-/// Initialize tokenizer from JSON file path
-pub fn init(allocator: std.mem.Allocator, path: []const u8) !*Tokenizer {
+/// Global .mtok tokenizer, used instead of global_tokenizer when set
+var global_mapped: ?*MappedTokenizer = null;
+/// Holds mapped encode() results until the next encode() call
+var mapped_arena: ?std.heap.ArenaAllocator = null;
+
+/// Initialize tokenizer from a tokenizer.json path, or map a binary .mtok
+/// file in place (no JSON parsing or table rebuilds at startup)
+pub fn init(allocator: std.mem.Allocator, path: []const u8) !void {
+    if (std.mem.endsWith(u8, path, ".mtok")) {
+        const mapped = try allocator.create(MappedTokenizer);
+        errdefer allocator.destroy(mapped);
+        mapped.* = try MappedTokenizer.open(path);
+        global_mapped = mapped;
+        mapped_arena = std.heap.ArenaAllocator.init(allocator);
+        return;
+    }
+
     const tok = try allocator.create(Tokenizer);
     tok.* = try Tokenizer.init(path, allocator);
     global_tokenizer = tok;
+    global_mapped = null;
 
     // Warmup: first encode initializes internal caches and data structures
     // Use a longer string with multiple words to properly initialize all caches
     _ = try tok.encode("hello world this is a warmup string for initialization");
-
-    return tok;
 }
 
 /// Encode text to token IDs (uses global tokenizer if initialized)
@@ -28,13 +43,28 @@ pub fn init(allocator: std.mem.Allocator, path: []const u8) !*Tokenizer {
 /// Zero-copy for maximum performance in benchmarks
 pub fn encode(allocator: std.mem.Allocator, text: []const u8) ![]u32 {
     _ = allocator; // Arena managed by tokenizer
+    if (global_mapped) |mapped| {
+        const arena = &mapped_arena.?;
+        _ = arena.reset(.retain_capacity);
+        return try mapped.encode(text, arena.allocator());
+    }
     const tok = global_tokenizer orelse return error.TokenizerNotInitialized;
     return try tok.encode(text);
 }
 
+/// Encode many texts in parallel (uses global tokenizer)
+/// Unlike encode(), the result is owned: free with BatchEncoding.deinit()
+pub fn encodeBatch(allocator: std.mem.Allocator, texts: []const []const u8) !tokenizer_impl.BatchEncoding {
+    if (global_mapped) |mapped| return try mapped.encodeBatch(texts, allocator);
+    const tok = global_tokenizer orelse return error.TokenizerNotInitialized;
+    return try tok.encodeBatch(texts, allocator);
+}
+
 /// Decode token IDs back to text
 pub fn decode(allocator: std.mem.Allocator, tokens: []const u32) ![]const u8 {
-    _ = allocator;
+    if (global_mapped) |mapped| {
+        return mapped.decode(tokens, allocator);
+    }
     if (global_tokenizer) |tok| {
         return tok.decode(tokens);
     }
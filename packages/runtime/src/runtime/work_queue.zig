@@ -1,80 +1,301 @@
 const std = @import("std");
 const GreenThread = @import("green_thread").GreenThread;
 
-/// Chase-Lev work-stealing deque
+/// Chase-Lev work-stealing deque (lock-free)
 /// Owner thread pushes/pops from bottom (LIFO)
 /// Other threads steal from top (FIFO)
+///
+/// Follows "Correct and Efficient Work-Stealing for Weak Memory Models"
+/// (Lê et al., PPoPP 2013). Zig has no standalone fences, so the two
+/// store->load orderings the paper fences are seq_cst operations on
+/// top/bottom instead. Buffers grow by doubling; retired buffers stay alive
+/// until deinit because a thief may still be reading one.
+pub fn Deque(comptime T: type) type {
+    return struct {
+        top: std.atomic.Value(isize) align(std.atomic.cache_line),
+        bottom: std.atomic.Value(isize) align(std.atomic.cache_line),
+        buffer: std.atomic.Value(*Buffer),
+        /// Owner-only: buffers replaced by grow()
+        retired: std.ArrayList(*Buffer),
+        allocator: std.mem.Allocator,
+
+        const Self = @This();
+
+        const Buffer = struct {
+            slots: []T,
+
+            fn get(self: *const Buffer, i: isize) T {
+                return @atomicLoad(T, &self.slots[index(self, i)], .monotonic);
+            }
+
+            fn put(self: *Buffer, i: isize, value: T) void {
+                @atomicStore(T, &self.slots[index(self, i)], value, .monotonic);
+            }
+
+            fn index(self: *const Buffer, i: isize) usize {
+                return @as(usize, @bitCast(i)) & (self.slots.len - 1);
+            }
+        };
+
+        pub const initial_capacity = 64;
+
+        pub fn init(allocator: std.mem.Allocator) !Self {
+            return .{
+                .top = std.atomic.Value(isize).init(0),
+                .bottom = std.atomic.Value(isize).init(0),
+                .buffer = std.atomic.Value(*Buffer).init(try allocBuffer(allocator, initial_capacity)),
+                .retired = std.ArrayList(*Buffer){},
+                .allocator = allocator,
+            };
+        }
+
+        pub fn deinit(self: *Self) void {
+            freeBuffer(self.allocator, self.buffer.raw);
+            for (self.retired.items) |buf| freeBuffer(self.allocator, buf);
+            self.retired.deinit(self.allocator);
+        }
+
+        /// Push to bottom (owner thread only)
+        pub fn push(self: *Self, value: T) !void {
+            const b = self.bottom.load(.monotonic);
+            const t = self.top.load(.acquire);
+            var buf = self.buffer.load(.monotonic);
+            if (b - t >= @as(isize, @intCast(buf.slots.len))) {
+                buf = try self.grow(buf, t, b);
+            }
+            buf.put(b, value);
+            // Release publishes the slot before thieves can see the new bottom
+            self.bottom.store(b + 1, .release);
+        }
+
+        /// Pop from bottom (owner thread only) - LIFO for cache locality
+        pub fn pop(self: *Self) ?T {
+            const b = self.bottom.load(.monotonic) - 1;
+            const buf = self.buffer.load(.monotonic);
+            // seq_cst store + load: the reservation of slot b must be visible
+            // before we read top, or a thief and the owner could both take it
+            self.bottom.store(b, .seq_cst);
+            const t = self.top.load(.seq_cst);
+
+            if (t > b) {
+                // Empty - undo the reservation
+                self.bottom.store(b + 1, .monotonic);
+                return null;
+            }
+
+            const value = buf.get(b);
+            if (t == b) {
+                // Last item: race thieves for it through top
+                const won = self.top.cmpxchgStrong(t, t + 1, .seq_cst, .monotonic) == null;
+                self.bottom.store(b + 1, .monotonic);
+                return if (won) value else null;
+            }
+            return value;
+        }
+
+        /// Steal from top (any thread) - FIFO for fairness
+        /// Retries while other thieves win the race; null only when empty.
+        pub fn steal(self: *Self) ?T {
+            while (true) {
+                const t = self.top.load(.seq_cst);
+                const b = self.bottom.load(.seq_cst);
+                if (t >= b) return null;
+
+                const value = self.buffer.load(.acquire).get(t);
+                if (self.top.cmpxchgStrong(t, t + 1, .seq_cst, .monotonic) == null) return value;
+                std.atomic.spinLoopHint();
+            }
+        }
+
+        /// Approximate length (may be stale under concurrency)
+        pub fn len(self: *const Self) usize {
+            const b = self.bottom.load(.monotonic);
+            const t = self.top.load(.monotonic);
+            return if (b > t) @intCast(b - t) else 0;
+        }
+
+        fn grow(self: *Self, old: *Buffer, t: isize, b: isize) !*Buffer {
+            try self.retired.ensureUnusedCapacity(self.allocator, 1);
+            const buf = try allocBuffer(self.allocator, old.slots.len * 2);
+            var i = t;
+            while (i < b) : (i += 1) buf.put(i, old.get(i));
+            self.buffer.store(buf, .release);
+            self.retired.appendAssumeCapacity(old);
+            return buf;
+        }
+
+        fn allocBuffer(allocator: std.mem.Allocator, capacity: usize) !*Buffer {
+            const buf = try allocator.create(Buffer);
+            errdefer allocator.destroy(buf);
+            buf.* = .{ .slots = try allocator.alloc(T, capacity) };
+            return buf;
+        }
+
+        fn freeBuffer(allocator: std.mem.Allocator, buf: *Buffer) void {
+            allocator.free(buf.slots);
+            allocator.destroy(buf);
+        }
+    };
+}
+
+/// Per-worker run queue of green threads
 pub const WorkQueue = struct {
-    tasks: std.ArrayList(*GreenThread),
-    mutex: std.Thread.Mutex,
+    deque: Deque(*GreenThread),
     allocator: std.mem.Allocator,
 
-    pub fn init(allocator: std.mem.Allocator) WorkQueue {
+    pub fn init(allocator: std.mem.Allocator) !WorkQueue {
         return .{
-            .tasks = std.ArrayList(*GreenThread){},
-            .mutex = .{},
+            .deque = try Deque(*GreenThread).init(allocator),
             .allocator = allocator,
         };
     }
 
     pub fn deinit(self: *WorkQueue) void {
         // Free any remaining tasks (handles cleanup on shutdown)
-        for (self.tasks.items) |task| {
-            // Cleanup user context if needed
-            if (task.context_cleanup) |cleanup| {
-                cleanup(task, self.allocator);
-            }
-            task.deinit(self.allocator);
+        while (self.deque.pop()) |task| {
+            freeTask(task, self.allocator);
         }
-        self.tasks.deinit(self.allocator);
+        self.deque.deinit();
     }
 
     /// Push task to bottom (owner thread only)
     pub fn push(self: *WorkQueue, task: *GreenThread) !void {
-        self.mutex.lock();
-        defer self.mutex.unlock();
-        try self.tasks.append(self.allocator, task);
+        try self.deque.push(task);
     }
 
     /// Pop task from bottom (owner thread only) - LIFO for cache locality
     pub fn pop(self: *WorkQueue) ?*GreenThread {
-        self.mutex.lock();
-        defer self.mutex.unlock();
-
-        if (self.tasks.items.len == 0) return null;
-        return self.tasks.pop();
+        return self.deque.pop();
     }
 
     /// Steal task from top (other threads) - FIFO for fairness
     pub fn steal(self: *WorkQueue) ?*GreenThread {
+        return self.deque.steal();
+    }
+
+    pub fn len(self: *const WorkQueue) usize {
+        return self.deque.len();
+    }
+
+    /// Lock-free size check (may be stale, used for work-stealing heuristics)
+    pub fn size(self: *const WorkQueue) usize {
+        return self.deque.len();
+    }
+
+    pub fn isEmpty(self: *const WorkQueue) bool {
+        return self.len() == 0;
+    }
+};
+
+/// Global injection queue (like Go's global runq)
+/// Tasks spawned from outside the worker threads land here, since only the
+/// owner may push to a Chase-Lev deque. Workers take batches so the lock is
+/// touched once per batch, and check `len` without locking.
+pub const InjectQueue = struct {
+    ring: []*GreenThread,
+    head: usize,
+    count: std.atomic.Value(usize),
+    mutex: std.Thread.Mutex,
+    allocator: std.mem.Allocator,
+
+    pub fn init(allocator: std.mem.Allocator) InjectQueue {
+        return .{
+            .ring = &[_]*GreenThread{},
+            .head = 0,
+            .count = std.atomic.Value(usize).init(0),
+            .mutex = .{},
+            .allocator = allocator,
+        };
+    }
+
+    pub fn deinit(self: *InjectQueue) void {
+        while (self.pop()) |task| {
+            freeTask(task, self.allocator);
+        }
+        self.allocator.free(self.ring);
+    }
+
+    /// Enqueue at the tail (any thread)
+    pub fn push(self: *InjectQueue, task: *GreenThread) !void {
         self.mutex.lock();
         defer self.mutex.unlock();
 
-        if (self.tasks.items.len == 0) return null;
-        return self.tasks.orderedRemove(0);
+        const n = self.count.raw;
+        if (n == self.ring.len) try self.grow();
+        self.ring[(self.head + n) & (self.ring.len - 1)] = task;
+        self.count.store(n + 1, .release);
     }
 
-    pub fn len(self: *WorkQueue) usize {
+    /// Dequeue from the head (any thread)
+    pub fn pop(self: *InjectQueue) ?*GreenThread {
+        if (self.count.load(.acquire) == 0) return null;
         self.mutex.lock();
         defer self.mutex.unlock();
-        return self.tasks.items.len;
+        return self.popLocked();
     }
 
-    /// Lock-free size check (may be stale, used for work-stealing heuristics)
-    pub fn size(self: *const WorkQueue) usize {
-        // Direct read without lock - acceptable race for heuristic checks
-        return self.tasks.items.len;
+    /// Take up to `max` tasks into `local` (owner of `local` only); returns one to run now
+    pub fn popBatch(self: *InjectQueue, local: *WorkQueue, max: usize) ?*GreenThread {
+        if (self.count.load(.acquire) == 0) return null;
+        self.mutex.lock();
+        defer self.mutex.unlock();
+
+        const first = self.popLocked() orelse return null;
+        var moved: usize = 1;
+        while (moved < max) : (moved += 1) {
+            const task = self.popLocked() orelse break;
+            local.push(task) catch {
+                // Local deque could not grow - leave the rest here
+                self.pushFrontLocked(task);
+                break;
+            };
+        }
+        return first;
     }
 
-    pub fn isEmpty(self: *WorkQueue) bool {
-        return self.len() == 0;
+    pub fn len(self: *const InjectQueue) usize {
+        return self.count.load(.monotonic);
+    }
+
+    fn popLocked(self: *InjectQueue) ?*GreenThread {
+        const n = self.count.raw;
+        if (n == 0) return null;
+        const task = self.ring[self.head];
+        self.head = (self.head + 1) & (self.ring.len - 1);
+        self.count.store(n - 1, .release);
+        return task;
+    }
+
+    fn pushFrontLocked(self: *InjectQueue, task: *GreenThread) void {
+        // Only called right after popLocked, so there is always a free slot
+        self.head = (self.head + self.ring.len - 1) & (self.ring.len - 1);
+        self.ring[self.head] = task;
+        self.count.store(self.count.raw + 1, .release);
+    }
+
+    fn grow(self: *InjectQueue) !void {
+        const new_len = @max(64, self.ring.len * 2);
+        const ring = try self.allocator.alloc(*GreenThread, new_len);
+        const n = self.count.raw;
+        for (0..n) |i| ring[i] = self.ring[(self.head + i) & (self.ring.len -| 1)];
+        self.allocator.free(self.ring);
+        self.ring = ring;
+        self.head = 0;
     }
 };
 
+fn freeTask(task: *GreenThread, allocator: std.mem.Allocator) void {
+    // Cleanup user context if needed
+    if (task.context_cleanup) |cleanup| {
+        cleanup(task, allocator);
+    }
+    task.deinit(allocator);
+}
+
 test "WorkQueue basic operations" {
     const allocator = std.testing.allocator;
 
-    var queue = WorkQueue.init(allocator);
+    var queue = try WorkQueue.init(allocator);
     defer queue.deinit();
 
     try std.testing.expectEqual(@as(usize, 0), queue.len());
@@ -106,7 +327,7 @@ test "WorkQueue basic operations" {
 test "WorkQueue work stealing" {
     const allocator = std.testing.allocator;
 
-    var queue = WorkQueue.init(allocator);
+    var queue = try WorkQueue.init(allocator);
     defer queue.deinit();
 
     const TestFunc = struct {
@@ -135,3 +356,72 @@ test "WorkQueue work stealing" {
     // Should have t2 left - will be freed by queue.deinit()
     try std.testing.expectEqual(@as(usize, 1), queue.len());
 }
+
+test "Deque grows and hands every item out exactly once under concurrent steals" {
+    const allocator = std.testing.allocator;
+    const n = 20_000;
+
+    var deque = try Deque(usize).init(allocator);
+    defer deque.deinit();
+
+    const seen = try allocator.alloc(std.atomic.Value(u8), n);
+    defer allocator.free(seen);
+    for (seen) |*s| s.* = std.atomic.Value(u8).init(0);
+
+    const Thief = struct {
+        fn run(d: *Deque(usize), marks: []std.atomic.Value(u8), done: *std.atomic.Value(bool)) void {
+            while (true) {
+                if (d.steal()) |v| {
+                    _ = marks[v].fetchAdd(1, .monotonic);
+                } else if (done.load(.acquire)) {
+                    return;
+                }
+            }
+        }
+    };
+
+    var done = std.atomic.Value(bool).init(false);
+    var thieves: [3]std.Thread = undefined;
+    for (&thieves) |*t| t.* = try std.Thread.spawn(.{}, Thief.run, .{ &deque, seen, &done });
+
+    // Owner interleaves pushes and pops, forcing several grows
+    for (0..n) |i| {
+        try deque.push(i);
+        if (i % 3 == 0) {
+            if (deque.pop()) |v| _ = seen[v].fetchAdd(1, .monotonic);
+        }
+    }
+    while (deque.pop()) |v| _ = seen[v].fetchAdd(1, .monotonic);
+    done.store(true, .release);
+    for (thieves) |t| t.join();
+
+    for (seen) |*s| try std.testing.expectEqual(@as(u8, 1), s.load(.monotonic));
+}
+
+test "InjectQueue is FIFO and hands batches to a local queue" {
+    const allocator = std.testing.allocator;
+
+    var inject = InjectQueue.init(allocator);
+    defer inject.deinit();
+    var local = try WorkQueue.init(allocator);
+    defer local.deinit();
+
+    const TestFunc = struct {
+        fn func(_: ?*anyopaque) void {}
+    };
+    for (1..5) |id| {
+        try inject.push(try GreenThread.init(allocator, id, TestFunc.func, null, null));
+    }
+
+    // First task comes back to run now, the next two move to the local queue
+    const first = inject.popBatch(&local, 3).?;
+    try std.testing.expectEqual(@as(u64, 1), first.id);
+    first.deinit(allocator);
+    try std.testing.expectEqual(@as(usize, 2), local.len());
+    try std.testing.expectEqual(@as(usize, 1), inject.len());
+
+    const last = inject.pop().?;
+    try std.testing.expectEqual(@as(u64, 4), last.id);
+    last.deinit(allocator);
+    // Remaining tasks are freed by deinit()
+}
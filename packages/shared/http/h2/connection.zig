@@ -18,6 +18,9 @@ const Frame = frame.Frame;
 
 pub const H2Error = error{
     ConnectionFailed,
+    /// Writing the request's HEADERS failed, so the server never saw the
+    /// request; it is safe to retry on another connection
+    RequestNotSent,
     TlsError,
     ProtocolError,
     StreamClosed,
@@ -34,6 +37,31 @@ pub const Request = struct {
     method: []const u8,
     path: []const u8,
     host: []const u8,
+    /// Stream the body here instead of buffering it in Stream.body
+    sink: ?BodySink = null,
+};
+
+/// Receives DATA payloads as they arrive (e.g. to write a download to disk).
+/// Errors are the sink's to record; the connection keeps serving other streams.
+pub const BodySink = struct {
+    context: *anyopaque,
+    writeFn: *const fn (context: *anyopaque, data: []const u8) void,
+    /// Called once when the stream ends, with the response status
+    finishFn: *const fn (context: *anyopaque, status: ?u16) void,
+    /// Called once when the response headers arrive, before any write
+    headFn: ?*const fn (context: *anyopaque, status: u16, headers: []const hpack.Header) void = null,
+
+    pub fn write(self: BodySink, data: []const u8) void {
+        self.writeFn(self.context, data);
+    }
+
+    pub fn head(self: BodySink, status: u16, headers: []const hpack.Header) void {
+        if (self.headFn) |f| f(self.context, status, headers);
+    }
+
+    pub fn finish(self: BodySink, status: ?u16) void {
+        self.finishFn(self.context, status);
+    }
 };
 
 /// Stream state (RFC 7540 Section 5.1)
@@ -57,6 +85,7 @@ pub const Stream = struct {
     status: ?u16,
     headers: std.ArrayList(hpack.Header),
     body: std.ArrayList(u8),
+    sink: ?BodySink = null,
 
     allocator: std.mem.Allocator,
 
@@ -99,6 +128,7 @@ pub const Stream = struct {
 
     /// Append data to body
     pub fn appendData(self: *Stream, data: []const u8) !void {
+        if (self.sink) |sink| return sink.write(data);
         try self.body.appendSlice(self.allocator, data);
     }
 
@@ -428,7 +458,11 @@ pub const Connection = struct {
                 self.allocator.free(headers);
             }
 
+            const first = stream.status == null;
             try stream.addHeaders(headers);
+            if (first and stream.status != null) {
+                if (stream.sink) |sink| sink.head(stream.status.?, stream.headers.items);
+            }
 
             if (f.header.isEndStream()) {
                 stream.state = .half_closed_remote;
@@ -484,7 +518,22 @@ pub const Connection = struct {
     }
 
     /// Create a new stream and send request
-    pub fn request(self: *Connection, method: []const u8, path: []const u8, host: []const u8, headers: []const hpack.Header) !*Stream {
+    /// `sink`, if set, receives the response body instead of Stream.body
+    pub fn request(self: *Connection, method: []const u8, path: []const u8, host: []const u8, headers: []const hpack.Header, sink: ?BodySink) !*Stream {
+        return self.openStream(method, path, host, headers, true, sink);
+    }
+
+    /// Create a new stream and send request with a body (split into DATA
+    /// frames by the peer's frame size and flow-control windows).
+    /// `sink` is attached before any frame is sent: a response that arrives
+    /// while sendData waits for WINDOW_UPDATE (e.g. an early 413) goes to it.
+    pub fn requestWithBody(self: *Connection, method: []const u8, path: []const u8, host: []const u8, headers: []const hpack.Header, body: []const u8, sink: ?BodySink) !*Stream {
+        const stream = try self.openStream(method, path, host, headers, false, sink);
+        try self.sendData(stream, body);
+        return stream;
+    }
+
+    fn openStream(self: *Connection, method: []const u8, path: []const u8, host: []const u8, headers: []const hpack.Header, end_stream: bool, sink: ?BodySink) !*Stream {
         // Allocate stream ID
         const stream_id = self.next_stream_id;
         self.next_stream_id += 2; // Client uses odd numbers
@@ -494,8 +543,11 @@ pub const Connection = struct {
         errdefer self.allocator.destroy(stream);
         stream.* = Stream.init(self.allocator, stream_id);
         stream.state = .open;
+        stream.window_size = @intCast(self.peer_settings.initial_window_size);
+        stream.sink = sink;
 
         try self.streams.put(stream_id, stream);
+        errdefer _ = self.streams.remove(stream_id);
 
         // Build request headers
         var all_headers = std.ArrayList(hpack.Header){};
@@ -516,14 +568,45 @@ pub const Connection = struct {
         defer self.allocator.free(header_block);
 
         // Send HEADERS frame
-        const headers_frame = Frame.headers(stream_id, header_block, true, true);
-        try self.sendFrame(headers_frame);
+        const headers_frame = Frame.headers(stream_id, header_block, end_stream, true);
+        self.sendFrame(headers_frame) catch return H2Error.RequestNotSent;
 
-        stream.state = .half_closed_local;
+        if (end_stream) stream.state = .half_closed_local;
 
         return stream;
     }
 
+    /// Send `data` as the rest of the request body on `stream`, ending it.
+    /// Blocks reading frames (for WINDOW_UPDATE) while a window is exhausted.
+    pub fn sendData(self: *Connection, stream: *Stream, data: []const u8) !void {
+        var rest = data;
+        while (true) {
+            const window: usize = @intCast(@max(0, @min(self.connection_window, stream.window_size)));
+            const n = @min(rest.len, self.peer_settings.max_frame_size, window);
+            if (n == 0 and rest.len > 0) {
+                try self.processFrame(try self.readFrame());
+                if (stream.state == .closed) return H2Error.StreamClosed;
+                continue;
+            }
+
+            const last = n == rest.len;
+            try self.sendFrame(Frame.data(stream.id, rest[0..n], last));
+            self.connection_window -= @intCast(n);
+            stream.window_size -= @intCast(n);
+            rest = rest[n..];
+            if (last) break;
+        }
+        stream.state = .half_closed_local;
+    }
+
+    /// Forget a finished stream (long-lived connections would otherwise keep
+    /// every stream they ever served)
+    pub fn closeStream(self: *Connection, stream: *Stream) void {
+        _ = self.streams.remove(stream.id);
+        stream.deinit();
+        self.allocator.destroy(stream);
+    }
+
     /// Wait for stream response
     pub fn waitForResponse(self: *Connection, stream: *Stream) !void {
         var count: usize = 0;
@@ -532,7 +615,8 @@ pub const Connection = struct {
     
             try self.processFrame(f);
             count += 1;
-            if (count > 1000) {
+            // Streamed bodies (e.g. server-sent events) may run indefinitely
+            if (count > 1000 and stream.sink == null) {
         
                 return H2Error.ProtocolError;
             }
@@ -555,9 +639,14 @@ pub const Connection = struct {
             .{ .name = "accept", .value = "application/json" },
             .{ .name = "accept-encoding", .value = "gzip" }, // 5-10x smaller responses!
         };
+        // Streamed bodies are written as-is, so don't ask for gzip
+        const raw_headers: []const hpack.Header = default_headers[0..2];
         for (requests, 0..) |req, i| {
-            streams[i] = try self.request(req.method, req.path, req.host, &default_headers);
+            streams[i] = try self.request(req.method, req.path, req.host, if (req.sink != null) raw_headers else &default_headers, req.sink);
         }
+        const finished = try self.allocator.alloc(bool, requests.len);
+        defer self.allocator.free(finished);
+        @memset(finished, false);
 
 
         // Wait for all responses
@@ -573,9 +662,12 @@ pub const Connection = struct {
 
             // Check how many are done
             pending = 0;
-            for (streams) |s| {
+            for (streams, finished) |s, *done| {
                 if (s.state != .half_closed_remote and s.state != .closed) {
                     pending += 1;
+                } else if (!done.*) {
+                    done.* = true;
+                    if (s.sink) |sink| sink.finish(s.status);
                 }
             }
         }
@@ -618,3 +710,87 @@ test "FrameHeader roundtrip" {
     try std.testing.expectEqual(header.flags, parsed.flags);
     try std.testing.expectEqual(header.stream_id, parsed.stream_id);
 }
+
+test "sendData splits by max frame size and waits for window" {
+    const allocator = std.testing.allocator;
+
+    // Loopback TCP pair; both ends speak TLS records with fixed keys
+    const address = try std.net.Address.parseIp("127.0.0.1", 0);
+    var server = try address.listen(.{});
+    defer server.deinit();
+    const client = try std.net.tcpConnectToAddress(server.listen_address);
+    defer client.close();
+    const accepted = try server.accept();
+    defer accepted.stream.close();
+
+    const up_key = [_]u8{1} ** 16;
+    const up_iv = [_]u8{2} ** 12;
+    const down_key = [_]u8{3} ** 16;
+    const down_iv = [_]u8{4} ** 12;
+
+    const ours = try tls.TlsConnection.init(allocator, client.handle, null, null);
+    defer ours.deinit();
+    ours.client_cipher = tls.AesGcm.init128(up_key);
+    ours.client_iv = up_iv;
+    ours.server_cipher = tls.AesGcm.init128(down_key);
+    ours.server_iv = down_iv;
+
+    const peer = try tls.TlsConnection.init(allocator, accepted.stream.handle, null, null);
+    defer peer.deinit();
+    peer.server_cipher = tls.AesGcm.init128(up_key);
+    peer.server_iv = up_iv;
+    peer.client_cipher = tls.AesGcm.init128(down_key);
+    peer.client_iv = down_iv;
+
+    const conn = try allocator.create(Connection);
+    conn.* = .{
+        .allocator = allocator,
+        .tls_conn = ours,
+        .settings = .{},
+        .peer_settings = .{},
+        .hpack_encoder = hpack.Context.init(allocator),
+        .hpack_decoder = hpack.Context.init(allocator),
+        .streams = std.AutoHashMap(u31, *Stream).init(allocator),
+        .next_stream_id = 3,
+        .connection_window = 65535,
+        .read_buffer = undefined,
+        .read_pos = 0,
+        .read_len = 0,
+    };
+    defer conn.deinit();
+
+    const stream = try allocator.create(Stream);
+    stream.* = Stream.init(allocator, 1);
+    stream.state = .open;
+    stream.window_size = 20000;
+    try conn.streams.put(1, stream);
+
+    // Queued before sending: read once the stream window runs out
+    var update: [FrameHeader.SIZE + 4]u8 = undefined;
+    (FrameHeader{ .length = 4, .frame_type = .WINDOW_UPDATE, .flags = 0, .stream_id = 1 }).serialize(update[0..FrameHeader.SIZE]);
+    std.mem.writeInt(u32, update[FrameHeader.SIZE..][0..4], 20000, .big);
+    try peer.send(&update);
+
+    var body: [40000]u8 = undefined;
+    for (&body, 0..) |*b, i| b.* = @truncate(i);
+    try conn.sendData(stream, &body);
+
+    // 16384 (max frame), 3616 (rest of the window), then the same again
+    const expected_lens = [_]u32{ 16384, 3616, 16384, 3616 };
+    var received: [40000]u8 = undefined;
+    var pos: usize = 0;
+    var record: [FrameHeader.SIZE + 16384]u8 = undefined;
+    for (expected_lens, 0..) |len, i| {
+        const n = try peer.recv(&record);
+        const header = try FrameHeader.parse(record[0..FrameHeader.SIZE]);
+        try std.testing.expectEqual(FrameType.DATA, header.frame_type);
+        try std.testing.expectEqual(@as(u31, 1), header.stream_id);
+        try std.testing.expectEqual(len, header.length);
+        try std.testing.expectEqual(i == expected_lens.len - 1, header.isEndStream());
+        @memcpy(received[pos..][0..len], record[FrameHeader.SIZE..n]);
+        pos += len;
+    }
+    try std.testing.expectEqualSlices(u8, &body, &received);
+    try std.testing.expectEqual(StreamState.half_closed_local, stream.state);
+    try std.testing.expectEqual(@as(i32, 65535 - 40000), conn.connection_window);
+}
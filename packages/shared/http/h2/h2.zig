@@ -26,6 +26,7 @@ pub const FrameHeader = frame.FrameHeader;
 pub const Connection = connection.Connection;
 pub const Request = connection.Request;
 pub const Stream = connection.Stream;
+pub const BodySink = connection.BodySink;
 pub const TlsConnection = tls.TlsConnection;
 pub const Header = hpack.Header;
 
@@ -266,43 +267,17 @@ pub const Client = struct {
         // HTTPS: Get or create H2 connection
         const conn = try self.getConnection(host, port);
 
-        // Build headers
         var headers = std.ArrayList(ExtraHeader){};
         defer headers.deinit(self.allocator);
+        var len_buf: [20]u8 = undefined;
+        try self.buildHeaders(&headers, extra_headers, body, &len_buf, true);
 
-        try headers.append(self.allocator, .{ .name = "user-agent", .value = "metal0/1.0" });
-
-        // Only add default accept if not provided in extra_headers
-        var has_accept = false;
-        for (extra_headers) |h| {
-            if (std.mem.eql(u8, h.name, "accept")) has_accept = true;
-        }
-        if (!has_accept) {
-            try headers.append(self.allocator, .{ .name = "accept", .value = "*/*" });
-        }
-
-        try headers.append(self.allocator, .{ .name = "accept-encoding", .value = "gzip" });
-
-        for (extra_headers) |h| {
-            try headers.append(self.allocator, h);
-        }
-
-        if (body) |b| {
-            var len_buf: [20]u8 = undefined;
-            const len_str = std.fmt.bufPrint(&len_buf, "{}", .{b.len}) catch unreachable;
-            try headers.append(self.allocator, .{ .name = "content-length", .value = len_str });
-        }
-
-        // Send request
-        const stream = try conn.h2.request(method, path, host, headers.items);
-
-        // Send body if present
-        if (body) |b| {
-            const data_frame = Frame.data(stream.id, b, true);
-            try conn.h2.sendFrame(data_frame);
-        }
-
-        // Wait for response
+        // Send request (and body), wait for response
+        const stream = if (body) |b|
+            try conn.h2.requestWithBody(method, path, host, headers.items, b, null)
+        else
+            try conn.h2.request(method, path, host, headers.items, null);
+        defer conn.h2.closeStream(stream);
         try conn.h2.waitForResponse(stream);
 
         // Check for gzip and decompress if needed
@@ -324,7 +299,89 @@ pub const Client = struct {
             resp_body = try self.allocator.dupe(u8, stream.body.items);
         }
 
-        // Build response
+        return Response{
+            .status = stream.status orelse 0,
+            .headers = try self.copyHeaders(stream),
+            .body = resp_body,
+            .allocator = self.allocator,
+        };
+    }
+
+    /// Like request() over HTTP/2, but the response body goes to `sink` as
+    /// DATA frames arrive (after sink.head with the status and headers), so
+    /// long or never-ending responses such as server-sent events are passed
+    /// on without buffering. The body is not gzip-negotiated: the sink sees
+    /// the bytes the server sent. The returned response has an empty body.
+    pub fn requestStreaming(
+        self: *Client,
+        method: []const u8,
+        url: []const u8,
+        extra_headers: []const ExtraHeader,
+        body: ?[]const u8,
+        sink: BodySink,
+    ) !Response {
+        const uri = std.Uri.parse(url) catch return error.InvalidUrl;
+        if (!std.mem.eql(u8, getScheme(uri.scheme), "https")) return error.UnsupportedScheme;
+        const host = getHostString(uri.host) orelse return error.InvalidUrl;
+        const conn = try self.getConnection(host, uri.port orelse 443);
+
+        var headers = std.ArrayList(ExtraHeader){};
+        defer headers.deinit(self.allocator);
+        var len_buf: [20]u8 = undefined;
+        try self.buildHeaders(&headers, extra_headers, body, &len_buf, false);
+
+        const path = getPathString(uri.path);
+        const stream = if (body) |b|
+            try conn.h2.requestWithBody(method, path, host, headers.items, b, sink)
+        else
+            try conn.h2.request(method, path, host, headers.items, sink);
+        defer conn.h2.closeStream(stream);
+        try conn.h2.waitForResponse(stream);
+        sink.finish(stream.status);
+
+        return Response{
+            .status = stream.status orelse 0,
+            .headers = try self.copyHeaders(stream),
+            .body = "",
+            .allocator = self.allocator,
+        };
+    }
+
+    /// Default request headers, then `extra_headers`, then content-length
+    fn buildHeaders(
+        self: *Client,
+        headers: *std.ArrayList(ExtraHeader),
+        extra_headers: []const ExtraHeader,
+        body: ?[]const u8,
+        len_buf: *[20]u8,
+        accept_gzip: bool,
+    ) !void {
+        try headers.append(self.allocator, .{ .name = "user-agent", .value = "metal0/1.0" });
+
+        // Only add default accept if not provided in extra_headers
+        var has_accept = false;
+        for (extra_headers) |h| {
+            if (std.mem.eql(u8, h.name, "accept")) has_accept = true;
+        }
+        if (!has_accept) {
+            try headers.append(self.allocator, .{ .name = "accept", .value = "*/*" });
+        }
+
+        if (accept_gzip) {
+            try headers.append(self.allocator, .{ .name = "accept-encoding", .value = "gzip" });
+        }
+
+        for (extra_headers) |h| {
+            try headers.append(self.allocator, h);
+        }
+
+        if (body) |b| {
+            const len_str = std.fmt.bufPrint(len_buf, "{}", .{b.len}) catch unreachable;
+            try headers.append(self.allocator, .{ .name = "content-length", .value = len_str });
+        }
+    }
+
+    fn copyHeaders(self: *Client, stream: *Stream) ![]const hpack.Header {
         const resp_headers = try self.allocator.alloc(hpack.Header, stream.headers.items.len);
         for (stream.headers.items, 0..) |h, i| {
             resp_headers[i] = .{
@@ -332,13 +389,7 @@ pub const Client = struct {
                 .value = try self.allocator.dupe(u8, h.value),
             };
         }
-
-        return Response{
-            .status = stream.status orelse 0,
-            .headers = resp_headers,
-            .body = resp_body,
-            .allocator = self.allocator,
-        };
+        return resp_headers;
     }
 
     /// HTTP/1.1 request for plain HTTP (no TLS)
@@ -530,6 +581,19 @@ pub const Client = struct {
     /// Fetch multiple URLs in parallel (multiplexed over single connection!)
     /// Uses thread-per-host parallelism to overlap connection setup
     pub fn getAll(self: *Client, urls: []const []const u8) ![]Response {
+        return self.getAllImpl(urls, null);
+    }
+
+    /// Like getAll, but each body is streamed to sinks[i] as DATA frames
+    /// arrive; the returned responses carry status and headers only.
+    /// sinks[i].finish runs on the thread serving that host, as soon as the
+    /// stream ends. A sink that never sees finish was not fetched.
+    pub fn getAllStreaming(self: *Client, urls: []const []const u8, sinks: []const BodySink) ![]Response {
+        std.debug.assert(sinks.len == urls.len);
+        return self.getAllImpl(urls, sinks);
+    }
+
+    fn getAllImpl(self: *Client, urls: []const []const u8, sinks: ?[]const BodySink) ![]Response {
         if (urls.len == 0) return &[_]Response{};
 
         // Group URLs by host
@@ -576,7 +640,7 @@ pub const Client = struct {
             while (host_it.next()) |entry| {
                 const host = entry.key_ptr.*;
                 const url_list = entry.value_ptr.items;
-                self.fetchHostGroup(host, url_list, results);
+                self.fetchHostGroup(host, url_list, sinks, results);
             }
             return results;
         }
@@ -585,11 +649,12 @@ pub const Client = struct {
         const HostTask = struct {
             host: []const u8,
             url_list: []const UrlIndexPair,
+            sinks: ?[]const BodySink,
             results: []Response,
             client: *Client,
 
             fn run(ctx: *@This()) void {
-                ctx.client.fetchHostGroup(ctx.host, ctx.url_list, ctx.results);
+                ctx.client.fetchHostGroup(ctx.host, ctx.url_list, ctx.sinks, ctx.results);
             }
         };
 
@@ -606,6 +671,7 @@ pub const Client = struct {
             tasks[task_idx] = .{
                 .host = entry.key_ptr.*,
                 .url_list = entry.value_ptr.items,
+                .sinks = sinks,
                 .results = results,
                 .client = self,
             };
@@ -623,7 +689,7 @@ pub const Client = struct {
     }
 
     /// Fetch all URLs for a single host group
-    fn fetchHostGroup(self: *Client, host: []const u8, url_list: []const UrlIndexPair, results: []Response) void {
+    fn fetchHostGroup(self: *Client, host: []const u8, url_list: []const UrlIndexPair, sinks: ?[]const BodySink, results: []Response) void {
         // Use first URL to get port
         const first_uri = std.Uri.parse(url_list[0].url) catch return;
         const port: u16 = first_uri.port orelse if (std.mem.eql(u8, getScheme(first_uri.scheme), "https")) 443 else 80;
@@ -636,14 +702,16 @@ pub const Client = struct {
         defer self.allocator.free(requests);
 
         for (url_list, 0..) |item, j| {
+            const sink = if (sinks) |s| s[item.index] else null;
             const uri = std.Uri.parse(item.url) catch {
-                requests[j] = .{ .method = "GET", .path = "/", .host = host };
+                requests[j] = .{ .method = "GET", .path = "/", .host = host, .sink = sink };
                 continue;
             };
             requests[j] = .{
                 .method = "GET",
                 .path = getPathString(uri.path),
                 .host = host,
+                .sink = sink,
             };
         }
 
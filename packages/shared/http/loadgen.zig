@@ -0,0 +1,418 @@
+//! HTTP/1.1 load generator (wrk-style)
+//!
+//! Keeps -c keep-alive connections busy for -d seconds, spread over -t
+//! threads, each thread multiplexing its connections with poll(2). With
+//! -p N every connection pipelines N requests per round trip.
+//! Output mirrors wrk's "Latency", "Requests/sec" and "Transfer/sec" lines
+//! so benchmark scripts can parse either.
+//!
+//! Usage: http_loadgen [-t threads] [-c connections] [-d seconds] [-p depth] http://host:port/path
+
+const std = @import("std");
+const posix = std.posix;
+
+const usage =
+    \\Usage: http_loadgen [options] <url>
+    \\  -t <n>   threads (default 2)
+    \\  -c <n>   connections, spread over the threads (default 10)
+    \\  -d <n>   duration in seconds (default 10)
+    \\  -p <n>   pipelined requests per connection (default 1)
+    \\
+;
+
+const Options = struct {
+    threads: usize = 2,
+    connections: usize = 10,
+    duration_s: u64 = 10,
+    pipeline: usize = 1,
+    url: []const u8 = "",
+};
+
+/// Latencies are bucketed per microsecond up to this, slower ones share the last bucket
+const histogram_max_us = 100_000;
+
+const read_buffer_size = 64 * 1024;
+
+const Stats = struct {
+    requests: u64 = 0,
+    bytes: u64 = 0,
+    non_2xx_3xx: u64 = 0,
+    connect_errors: u64 = 0,
+    read_errors: u64 = 0,
+    write_errors: u64 = 0,
+    latency_sum_us: u64 = 0,
+    latency_max_us: u64 = 0,
+    histogram: []u32,
+
+    fn record(self: *Stats, latency_us: u64) void {
+        self.requests += 1;
+        self.latency_sum_us += latency_us;
+        self.latency_max_us = @max(self.latency_max_us, latency_us);
+        self.histogram[@min(latency_us, histogram_max_us)] += 1;
+    }
+
+    fn merge(self: *Stats, other: *const Stats) void {
+        self.requests += other.requests;
+        self.bytes += other.bytes;
+        self.non_2xx_3xx += other.non_2xx_3xx;
+        self.connect_errors += other.connect_errors;
+        self.read_errors += other.read_errors;
+        self.write_errors += other.write_errors;
+        self.latency_sum_us += other.latency_sum_us;
+        self.latency_max_us = @max(self.latency_max_us, other.latency_max_us);
+        for (self.histogram, other.histogram) |*a, b| a.* += b;
+    }
+
+    fn percentile(self: *const Stats, p: f64) u64 {
+        const target: u64 = @intFromFloat(@ceil(@as(f64, @floatFromInt(self.requests)) * p));
+        var seen: u64 = 0;
+        for (self.histogram, 0..) |count, us| {
+            seen += count;
+            if (seen >= target and seen > 0) return us;
+        }
+        return self.latency_max_us;
+    }
+};
+
+const Connection = struct {
+    fd: posix.socket_t = -1,
+    /// Requests sent and not yet answered
+    outstanding: usize = 0,
+    batch_start_ns: u64 = 0,
+    buf: []u8,
+    len: usize = 0,
+};
+
+const Worker = struct {
+    address: std.net.Address,
+    request: []const u8,
+    options: *const Options,
+    connections: []Connection,
+    deadline_ns: u64,
+    stats: Stats,
+    err: ?anyerror = null,
+
+    fn run(self: *Worker) void {
+        self.loop() catch |err| {
+            self.err = err;
+        };
+        for (self.connections) |*conn| {
+            if (conn.fd != -1) posix.close(conn.fd);
+        }
+    }
+
+    fn loop(self: *Worker) !void {
+        const allocator = std.heap.page_allocator;
+        const fds = try allocator.alloc(posix.pollfd, self.connections.len);
+        defer allocator.free(fds);
+
+        for (self.connections) |*conn| self.connect(conn);
+
+        while (nowNs() < self.deadline_ns) {
+            for (self.connections, fds) |*conn, *pfd| {
+                if (conn.fd == -1) self.connect(conn);
+                if (conn.fd != -1 and conn.outstanding == 0) self.sendBatch(conn);
+                pfd.* = .{ .fd = conn.fd, .events = posix.POLL.IN, .revents = 0 };
+            }
+            const ready = try posix.poll(fds, 100);
+            if (ready == 0) continue;
+
+            for (self.connections, fds) |*conn, pfd| {
+                if (conn.fd == -1 or pfd.revents == 0) continue;
+                self.receive(conn);
+            }
+        }
+    }
+
+    fn connect(self: *Worker, conn: *Connection) void {
+        const stream = std.net.tcpConnectToAddress(self.address) catch {
+            self.stats.connect_errors += 1;
+            return;
+        };
+        const one = std.mem.toBytes(@as(c_int, 1));
+        posix.setsockopt(stream.handle, posix.IPPROTO.TCP, posix.TCP.NODELAY, &one) catch {};
+        conn.fd = stream.handle;
+        conn.outstanding = 0;
+        conn.len = 0;
+    }
+
+    fn drop(conn: *Connection) void {
+        posix.close(conn.fd);
+        conn.fd = -1;
+    }
+
+    /// The whole pipeline goes out in one write
+    fn sendBatch(self: *Worker, conn: *Connection) void {
+        conn.batch_start_ns = nowNs();
+        var written: usize = 0;
+        while (written < self.request.len) {
+            written += posix.write(conn.fd, self.request[written..]) catch {
+                self.stats.write_errors += 1;
+                return drop(conn);
+            };
+        }
+        conn.outstanding = self.options.pipeline;
+    }
+
+    fn receive(self: *Worker, conn: *Connection) void {
+        if (conn.len == conn.buf.len) {
+            self.stats.read_errors += 1; // response larger than the buffer
+            return drop(conn);
+        }
+        const n = posix.read(conn.fd, conn.buf[conn.len..]) catch {
+            self.stats.read_errors += 1;
+            return drop(conn);
+        };
+        if (n == 0) {
+            // Server closed the connection; unanswered requests are errors
+            if (conn.outstanding > 0) self.stats.read_errors += 1;
+            return drop(conn);
+        }
+        conn.len += n;
+        self.stats.bytes += n;
+
+        const now = nowNs();
+        var pos: usize = 0;
+        while (parseResponse(conn.buf[pos..conn.len])) |response| {
+            pos += response.len;
+            if (response.status < 200 or response.status >= 400) self.stats.non_2xx_3xx += 1;
+            self.stats.record((now - conn.batch_start_ns) / std.time.ns_per_us);
+            conn.outstanding -|= 1;
+            if (response.close) return drop(conn);
+        }
+        std.mem.copyForwards(u8, conn.buf[0 .. conn.len - pos], conn.buf[pos..conn.len]);
+        conn.len -= pos;
+    }
+};
+
+const ResponseInfo = struct {
+    status: u16,
+    len: usize,
+    close: bool,
+};
+
+/// Frame one response by its Content-Length; null until it has fully arrived
+fn parseResponse(buf: []const u8) ?ResponseInfo {
+    const head_end = std.mem.indexOf(u8, buf, "\r\n\r\n") orelse return null;
+    if (head_end < 12) return null;
+    const status = std.fmt.parseInt(u16, buf[9..12], 10) catch 0;
+
+    var content_length: usize = 0;
+    var close = false;
+    var lines = std.mem.splitSequence(u8, buf[0..head_end], "\r\n");
+    _ = lines.first();
+    while (lines.next()) |line| {
+        const colon = std.mem.indexOfScalar(u8, line, ':') orelse continue;
+        const name = line[0..colon];
+        const value = std.mem.trim(u8, line[colon + 1 ..], " \t");
+        if (std.ascii.eqlIgnoreCase(name, "content-length")) {
+            content_length = std.fmt.parseInt(usize, value, 10) catch 0;
+        } else if (std.ascii.eqlIgnoreCase(name, "connection")) {
+            close = std.ascii.eqlIgnoreCase(value, "close");
+        }
+    }
+
+    const len = head_end + 4 + content_length;
+    if (buf.len < len) return null;
+    return .{ .status = status, .len = len, .close = close };
+}
+
+fn nowNs() u64 {
+    const ts = posix.clock_gettime(.MONOTONIC) catch return 0;
+    return @as(u64, @intCast(ts.sec)) * std.time.ns_per_s + @as(u64, @intCast(ts.nsec));
+}
+
+fn parseCount(arg: []const u8) !usize {
+    // wrk spells durations as 10s
+    const digits = std.mem.trimRight(u8, arg, "s");
+    return std.fmt.parseInt(usize, digits, 10);
+}
+
+fn parseArgs(args: []const []const u8) !Options {
+    var options = Options{};
+    var i: usize = 0;
+    while (i < args.len) : (i += 1) {
+        const arg = args[i];
+        if (arg.len >= 2 and arg[0] == '-') {
+            // Both "-c 100" and "-c100"
+            const value = if (arg.len > 2) arg[2..] else blk: {
+                i += 1;
+                if (i == args.len) return error.MissingValue;
+                break :blk args[i];
+            };
+            const n = try parseCount(value);
+            switch (arg[1]) {
+                't' => options.threads = n,
+                'c' => options.connections = n,
+                'd' => options.duration_s = n,
+                'p' => options.pipeline = n,
+                else => return error.UnknownOption,
+            }
+        } else {
+            options.url = arg;
+        }
+    }
+    if (options.url.len == 0) return error.MissingUrl;
+    if (options.threads == 0 or options.connections == 0 or options.pipeline == 0) return error.InvalidCount;
+    options.threads = @min(options.threads, options.connections);
+    return options;
+}
+
+const Target = struct {
+    host: []const u8,
+    port: u16,
+    path: []const u8,
+};
+
+fn parseUrl(url: []const u8) !Target {
+    const rest = if (std.mem.startsWith(u8, url, "http://")) url["http://".len..] else return error.UnsupportedScheme;
+    const slash = std.mem.indexOfScalar(u8, rest, '/') orelse rest.len;
+    const authority = rest[0..slash];
+    const path = if (slash < rest.len) rest[slash..] else "/";
+    const colon = std.mem.lastIndexOfScalar(u8, authority, ':');
+    return .{
+        .host = if (colon) |c| authority[0..c] else authority,
+        .port = if (colon) |c| try std.fmt.parseInt(u16, authority[c + 1 ..], 10) else 80,
+        .path = path,
+    };
+}
+
+fn printDuration(writer: anytype, us: u64) !void {
+    if (us < 1000) {
+        try writer.print("{d}us", .{us});
+    } else if (us < 1_000_000) {
+        try writer.print("{d:.2}ms", .{@as(f64, @floatFromInt(us)) / 1000.0});
+    } else {
+        try writer.print("{d:.2}s", .{@as(f64, @floatFromInt(us)) / 1_000_000.0});
+    }
+}
+
+fn printBytes(writer: anytype, bytes: f64) !void {
+    if (bytes >= 1024 * 1024 * 1024) {
+        try writer.print("{d:.2}GB", .{bytes / (1024 * 1024 * 1024)});
+    } else if (bytes >= 1024 * 1024) {
+        try writer.print("{d:.2}MB", .{bytes / (1024 * 1024)});
+    } else {
+        try writer.print("{d:.2}KB", .{bytes / 1024});
+    }
+}
+
+pub fn main() !void {
+    var gpa = std.heap.GeneralPurposeAllocator(.{}){};
+    defer _ = gpa.deinit();
+    const allocator = gpa.allocator();
+
+    var stdout_buffer: [4096]u8 = undefined;
+    var stdout_writer = std.fs.File.stdout().writer(&stdout_buffer);
+    const out = &stdout_writer.interface;
+
+    const args = try std.process.argsAlloc(allocator);
+    defer std.process.argsFree(allocator, args);
+    const options = parseArgs(args[1..]) catch {
+        std.debug.print(usage, .{});
+        std.process.exit(2);
+    };
+    const target = parseUrl(options.url) catch {
+        std.debug.print("error: expected http://host:port/path, got {s}\n", .{options.url});
+        std.process.exit(2);
+    };
+    const list = try std.net.getAddressList(allocator, target.host, target.port);
+    defer list.deinit();
+    if (list.addrs.len == 0) return error.UnknownHost;
+
+    // The pipeline is sent as one pre-built buffer
+    const one_request = try std.fmt.allocPrint(allocator, "GET {s} HTTP/1.1\r\nHost: {s}:{d}\r\n\r\n", .{ target.path, target.host, target.port });
+    defer allocator.free(one_request);
+    const request = try allocator.alloc(u8, one_request.len * options.pipeline);
+    defer allocator.free(request);
+    for (0..options.pipeline) |i| @memcpy(request[i * one_request.len ..][0..one_request.len], one_request);
+
+    const connections = try allocator.alloc(Connection, options.connections);
+    defer allocator.free(connections);
+    const buffers = try allocator.alloc(u8, options.connections * read_buffer_size);
+    defer allocator.free(buffers);
+    for (connections, 0..) |*conn, i| conn.* = .{ .buf = buffers[i * read_buffer_size ..][0..read_buffer_size] };
+
+    const histograms = try allocator.alloc(u32, (options.threads + 1) * (histogram_max_us + 1));
+    defer allocator.free(histograms);
+    @memset(histograms, 0);
+
+    try out.print("Running {d}s test @ {s}\n  {d} threads and {d} connections", .{ options.duration_s, options.url, options.threads, options.connections });
+    if (options.pipeline > 1) try out.print(" (pipeline {d})", .{options.pipeline});
+    try out.writeAll("\n");
+    try out.flush();
+
+    const workers = try allocator.alloc(Worker, options.threads);
+    defer allocator.free(workers);
+    const start_ns = nowNs();
+    const deadline_ns = start_ns + options.duration_s * std.time.ns_per_s;
+    for (workers, 0..) |*worker, w| {
+        // Contiguous share of the connections
+        const first = options.connections * w / options.threads;
+        const last = options.connections * (w + 1) / options.threads;
+        worker.* = .{
+            .address = list.addrs[0],
+            .request = request,
+            .options = &options,
+            .connections = connections[first..last],
+            .deadline_ns = deadline_ns,
+            .stats = .{ .histogram = histograms[(w + 1) * (histogram_max_us + 1) ..][0 .. histogram_max_us + 1] },
+        };
+    }
+
+    const threads = try allocator.alloc(std.Thread, options.threads);
+    defer allocator.free(threads);
+    for (workers, threads) |*worker, *thread| thread.* = try std.Thread.spawn(.{}, Worker.run, .{worker});
+    for (threads) |thread| thread.join();
+    const elapsed_s = @as(f64, @floatFromInt(nowNs() - start_ns)) / std.time.ns_per_s;
+
+    var total = Stats{ .histogram = histograms[0 .. histogram_max_us + 1] };
+    for (workers) |*worker| {
+        if (worker.err) |err| std.debug.print("worker error: {s}\n", .{@errorName(err)});
+        total.merge(&worker.stats);
+    }
+
+    const avg_us = if (total.requests > 0) total.latency_sum_us / total.requests else 0;
+    try out.writeAll("  Latency   ");
+    try printDuration(out, avg_us);
+    try out.writeAll("  p50 ");
+    try printDuration(out, total.percentile(0.50));
+    try out.writeAll("  p99 ");
+    try printDuration(out, total.percentile(0.99));
+    try out.writeAll("  max ");
+    try printDuration(out, total.latency_max_us);
+    try out.print("\n  {d} requests in {d:.2}s, ", .{ total.requests, elapsed_s });
+    try printBytes(out, @floatFromInt(total.bytes));
+    try out.writeAll(" read\n");
+    if (total.connect_errors + total.read_errors + total.write_errors > 0) {
+        try out.print("  Socket errors: connect {d}, read {d}, write {d}\n", .{ total.connect_errors, total.read_errors, total.write_errors });
+    }
+    if (total.non_2xx_3xx > 0) try out.print("  Non-2xx or 3xx responses: {d}\n", .{total.non_2xx_3xx});
+    try out.print("Requests/sec: {d:.2}\nTransfer/sec: ", .{@as(f64, @floatFromInt(total.requests)) / elapsed_s});
+    try printBytes(out, @as(f64, @floatFromInt(total.bytes)) / elapsed_s);
+    try out.writeAll("\n");
+    try out.flush();
+}
+
+test "parse responses by Content-Length" {
+    const two = "HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nhiHTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n";
+    const first = parseResponse(two).?;
+    try std.testing.expectEqual(@as(u16, 200), first.status);
+    try std.testing.expect(!first.close);
+    const second = parseResponse(two[first.len..]).?;
+    try std.testing.expectEqual(@as(u16, 404), second.status);
+    try std.testing.expect(second.close);
+    try std.testing.expect(parseResponse(two[0 .. first.len - 1]) == null);
+}
+
+test "parse wrk-style arguments" {
+    const options = try parseArgs(&.{ "-t4", "-c", "100", "-d10s", "http://127.0.0.1:8081/" });
+    try std.testing.expectEqual(@as(usize, 4), options.threads);
+    try std.testing.expectEqual(@as(usize, 100), options.connections);
+    try std.testing.expectEqual(@as(u64, 10), options.duration_s);
+
+    const target = try parseUrl(options.url);
+    try std.testing.expectEqualStrings("127.0.0.1", target.host);
+    try std.testing.expectEqual(@as(u16, 8081), target.port);
+    try std.testing.expectEqualStrings("/", target.path);
+}
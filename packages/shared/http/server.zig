@@ -0,0 +1,1089 @@
+//! HTTP/1.1 server - event-driven, one event loop per core
+//!
+//! Each worker thread owns an epoll (Linux) or kqueue (macOS/BSD) instance
+//! and a listening socket. On Linux every worker binds its own SO_REUSEPORT
+//! listener so the kernel spreads new connections across cores with no
+//! shared accept lock; elsewhere the workers share one listener.
+//! A connection stays on the worker that accepted it.
+//!
+//! The green-thread Netpoller parks one green thread per pending fd on a
+//! shared poller thread. That is the right shape for client I/O, but a
+//! server would pay a wakeup and a scheduler hop per request, so workers
+//! drive their own poller with the same epoll/kqueue split.
+//!
+//! Requests are parsed in place: method, path, headers and body are slices
+//! of the connection's read buffer. Every complete request in a read is
+//! handled (pipelining), responses are appended to one output buffer and
+//! flushed with a single send. Routes registered with `Router.static` and
+//! `Prepared` responses are serialized once and only memcpy'd per request.
+
+const std = @import("std");
+const builtin = @import("builtin");
+const posix = std.posix;
+const Allocator = std.mem.Allocator;
+
+pub const Method = enum {
+    GET,
+    HEAD,
+    POST,
+    PUT,
+    DELETE,
+    PATCH,
+    OPTIONS,
+    other,
+
+    pub fn parse(name: []const u8) Method {
+        return std.meta.stringToEnum(Method, name) orelse .other;
+    }
+};
+
+pub const Methods = std.EnumSet(Method);
+
+pub const Header = struct {
+    name: []const u8,
+    value: []const u8,
+};
+
+/// A `<name>` segment of the matched route
+pub const Param = struct {
+    name: []const u8,
+    value: []const u8,
+};
+
+pub const max_headers = 64;
+pub const max_params = 8;
+
+pub const Request = struct {
+    method: Method,
+    method_name: []const u8,
+    /// Request target as sent (path and query)
+    target: []const u8,
+    path: []const u8,
+    query: []const u8,
+    /// x in HTTP/1.x
+    minor_version: u8,
+    headers: []const Header,
+    body: []const u8,
+    keep_alive: bool,
+    params: []const Param = &.{},
+
+    /// First header named `name` (case-insensitive)
+    pub fn header(self: *const Request, name: []const u8) ?[]const u8 {
+        for (self.headers) |h| {
+            if (std.ascii.eqlIgnoreCase(h.name, name)) return h.value;
+        }
+        return null;
+    }
+
+    pub fn param(self: *const Request, name: []const u8) ?[]const u8 {
+        for (self.params) |p| {
+            if (std.mem.eql(u8, p.name, name)) return p.value;
+        }
+        return null;
+    }
+};
+
+pub const Limits = struct {
+    max_header_bytes: usize = 16 * 1024,
+    max_body_bytes: usize = 1024 * 1024,
+};
+
+pub const ParseError = error{
+    BadRequest,
+    HeadersTooLarge,
+    BodyTooLarge,
+    UnsupportedTransferEncoding,
+    VersionNotSupported,
+};
+
+pub const Parsed = struct {
+    request: Request,
+    /// Bytes of the buffer taken by this request (head and body)
+    len: usize,
+};
+
+/// Parse one request from the front of `buf`. Returns null until the whole
+/// request (head and Content-Length body) has arrived. Header slices are
+/// stored in `headers_buf`; everything else points into `buf`.
+pub fn parseRequest(buf: []const u8, headers_buf: []Header, limits: Limits) ParseError!?Parsed {
+    const head_end = std.mem.indexOf(u8, buf, "\r\n\r\n") orelse {
+        if (buf.len > limits.max_header_bytes) return error.HeadersTooLarge;
+        return null;
+    };
+    if (head_end > limits.max_header_bytes) return error.HeadersTooLarge;
+
+    var lines = std.mem.splitSequence(u8, buf[0..head_end], "\r\n");
+    const request_line = lines.first();
+    const sp1 = std.mem.indexOfScalar(u8, request_line, ' ') orelse return error.BadRequest;
+    const sp2 = std.mem.lastIndexOfScalar(u8, request_line, ' ') orelse return error.BadRequest;
+    if (sp2 <= sp1 + 1 or sp1 == 0) return error.BadRequest;
+
+    const method_name = request_line[0..sp1];
+    const target = request_line[sp1 + 1 .. sp2];
+    const version = request_line[sp2 + 1 ..];
+    if (!std.mem.startsWith(u8, version, "HTTP/")) return error.BadRequest;
+    if (version.len != 8 or !std.mem.startsWith(u8, version, "HTTP/1.")) return error.VersionNotSupported;
+    const minor_version: u8 = switch (version[7]) {
+        '0' => 0,
+        '1' => 1,
+        else => return error.VersionNotSupported,
+    };
+
+    var keep_alive = minor_version == 1;
+    var content_length: ?usize = null;
+    var count: usize = 0;
+    while (lines.next()) |line| {
+        // Obsolete line folding is a request smuggling vector; refuse it
+        if (line.len == 0 or line[0] == ' ' or line[0] == '\t') return error.BadRequest;
+        const colon = std.mem.indexOfScalar(u8, line, ':') orelse return error.BadRequest;
+        const name = line[0..colon];
+        if (name.len == 0 or name[name.len - 1] == ' ' or name[name.len - 1] == '\t') return error.BadRequest;
+        const value = std.mem.trim(u8, line[colon + 1 ..], " \t");
+
+        if (count == headers_buf.len) return error.HeadersTooLarge;
+        headers_buf[count] = .{ .name = name, .value = value };
+        count += 1;
+
+        if (std.ascii.eqlIgnoreCase(name, "content-length")) {
+            const n = parseContentLength(value) orelse return error.BadRequest;
+            if (content_length) |prev| if (prev != n) return error.BadRequest;
+            content_length = n;
+        } else if (std.ascii.eqlIgnoreCase(name, "transfer-encoding")) {
+            return error.UnsupportedTransferEncoding;
+        } else if (std.ascii.eqlIgnoreCase(name, "connection")) {
+            var tokens = std.mem.tokenizeAny(u8, value, ", \t");
+            while (tokens.next()) |token| {
+                if (std.ascii.eqlIgnoreCase(token, "close")) keep_alive = false;
+                if (std.ascii.eqlIgnoreCase(token, "keep-alive")) keep_alive = true;
+            }
+        }
+    }
+
+    const body_len = content_length orelse 0;
+    if (body_len > limits.max_body_bytes) return error.BodyTooLarge;
+    const body_start = head_end + 4;
+    if (buf.len - body_start < body_len) return null;
+
+    const query_start = std.mem.indexOfScalar(u8, target, '?');
+    return .{
+        .request = .{
+            .method = Method.parse(method_name),
+            .method_name = method_name,
+            .target = target,
+            .path = if (query_start) |q| target[0..q] else target,
+            .query = if (query_start) |q| target[q + 1 ..] else "",
+            .minor_version = minor_version,
+            .headers = headers_buf[0..count],
+            .body = buf[body_start..][0..body_len],
+            .keep_alive = keep_alive,
+        },
+        .len = body_start + body_len,
+    };
+}
+
+/// Digits only - parseInt would also take a sign and underscores
+fn parseContentLength(value: []const u8) ?usize {
+    if (value.len == 0 or value.len > 18) return null;
+    var n: usize = 0;
+    for (value) |c| {
+        if (c < '0' or c > '9') return null;
+        n = n * 10 + (c - '0');
+    }
+    return n;
+}
+
+fn statusForParseError(err: ParseError) u16 {
+    return switch (err) {
+        error.BadRequest => 400,
+        error.HeadersTooLarge => 431,
+        error.BodyTooLarge => 413,
+        error.UnsupportedTransferEncoding => 501,
+        error.VersionNotSupported => 505,
+    };
+}
+
+pub fn reason(status: u16) []const u8 {
+    return switch (status) {
+        200 => "OK",
+        201 => "Created",
+        202 => "Accepted",
+        204 => "No Content",
+        301 => "Moved Permanently",
+        302 => "Found",
+        303 => "See Other",
+        304 => "Not Modified",
+        307 => "Temporary Redirect",
+        308 => "Permanent Redirect",
+        400 => "Bad Request",
+        401 => "Unauthorized",
+        403 => "Forbidden",
+        404 => "Not Found",
+        405 => "Method Not Allowed",
+        409 => "Conflict",
+        413 => "Content Too Large",
+        422 => "Unprocessable Content",
+        429 => "Too Many Requests",
+        431 => "Request Header Fields Too Large",
+        500 => "Internal Server Error",
+        501 => "Not Implemented",
+        503 => "Service Unavailable",
+        505 => "HTTP Version Not Supported",
+        else => "",
+    };
+}
+
+/// 204 and 304 responses carry no body and no Content-Length
+fn hasBody(status: u16) bool {
+    return status != 204 and status != 304;
+}
+
+const head_format = "HTTP/1.1 {d} {s}\r\nServer: metal0\r\nContent-Type: {s}\r\n";
+const length_format = "Content-Length: {d}\r\n";
+
+/// A response serialized up front: status line, Server, Content-Type and
+/// Content-Length are fixed, so serving it is a copy of `head`, the cached
+/// Date line and `body`.
+pub const Prepared = struct {
+    status: u16,
+    head: []const u8,
+    body: []const u8,
+
+    pub fn init(allocator: Allocator, status: u16, content_type: []const u8, body: []const u8) !Prepared {
+        const head = if (hasBody(status))
+            try std.fmt.allocPrint(allocator, head_format ++ length_format, .{ status, reason(status), content_type, body.len })
+        else
+            try std.fmt.allocPrint(allocator, head_format, .{ status, reason(status), content_type });
+        errdefer allocator.free(head);
+        return .{ .status = status, .head = head, .body = try allocator.dupe(u8, body) };
+    }
+
+    /// Serialized at compile time (for bodies known to the compiler)
+    pub fn literal(comptime status: u16, comptime content_type: []const u8, comptime body: []const u8) Prepared {
+        return .{
+            .status = status,
+            .head = std.fmt.comptimePrint(head_format ++ length_format, .{ status, reason(status), content_type, body.len }),
+            .body = body,
+        };
+    }
+
+    pub fn deinit(self: *Prepared, allocator: Allocator) void {
+        allocator.free(self.head);
+        allocator.free(self.body);
+    }
+};
+
+pub const Response = struct {
+    /// Freed after the batch of requests this one arrived in is answered
+    allocator: Allocator,
+    status: u16 = 200,
+    content_type: []const u8 = "text/html; charset=utf-8",
+    body: []const u8 = "",
+    headers: std.ArrayList(Header) = .{},
+    /// Sent instead of status/content_type/body/headers when set
+    prepared: ?*const Prepared = null,
+
+    pub fn setHeader(self: *Response, name: []const u8, value: []const u8) !void {
+        try self.headers.append(self.allocator, .{ .name = name, .value = value });
+    }
+
+    pub fn json(self: *Response, body: []const u8) void {
+        self.content_type = "application/json";
+        self.body = body;
+    }
+
+    pub fn send(self: *Response, prepared: *const Prepared) void {
+        self.prepared = prepared;
+    }
+};
+
+pub const Handler = *const fn (req: *const Request, res: *Response) anyerror!void;
+
+const ParamKind = enum { string, int, path };
+
+const Segment = union(enum) {
+    literal: []const u8,
+    param: struct { name: []const u8, kind: ParamKind },
+};
+
+const Action = union(enum) {
+    handler: Handler,
+    prepared: Prepared,
+};
+
+const Route = struct {
+    methods: Methods,
+    action: Action,
+    /// Empty for routes without parameters (those live in Router.exact)
+    segments: []const Segment = &.{},
+};
+
+/// Maps method + path to a handler. Paths are exact (`/users`) or carry
+/// Flask-style parameters: `/users/<name>`, `/users/<int:id>`, `/files/<path:rest>`.
+pub const Router = struct {
+    arena: std.heap.ArenaAllocator,
+    exact: std.StringHashMapUnmanaged(Route) = .{},
+    patterns: std.ArrayList(Route) = .{},
+
+    pub fn init(allocator: Allocator) Router {
+        return .{ .arena = std.heap.ArenaAllocator.init(allocator) };
+    }
+
+    pub fn deinit(self: *Router) void {
+        // Keys, segments and prepared responses all live in the arena
+        self.arena.deinit();
+    }
+
+    /// Register `handler` for `methods` on `pattern`. GET routes also answer HEAD.
+    pub fn add(self: *Router, methods: Methods, pattern: []const u8, handler: Handler) !void {
+        try self.addRoute(methods, pattern, .{ .handler = handler });
+    }
+
+    pub fn get(self: *Router, pattern: []const u8, handler: Handler) !void {
+        try self.add(Methods.initOne(.GET), pattern, handler);
+    }
+
+    pub fn post(self: *Router, pattern: []const u8, handler: Handler) !void {
+        try self.add(Methods.initOne(.POST), pattern, handler);
+    }
+
+    /// Serve a fixed body on GET/HEAD `path`, serialized once here
+    pub fn static(self: *Router, path: []const u8, content_type: []const u8, body: []const u8) !void {
+        const prepared = try Prepared.init(self.arena.allocator(), 200, content_type, body);
+        try self.addRoute(Methods.initOne(.GET), path, .{ .prepared = prepared });
+    }
+
+    fn addRoute(self: *Router, methods: Methods, pattern: []const u8, action: Action) !void {
+        const allocator = self.arena.allocator();
+        var route_methods = methods;
+        if (methods.contains(.GET)) route_methods.insert(.HEAD);
+
+        const owned = try allocator.dupe(u8, pattern);
+        if (std.mem.indexOfScalar(u8, owned, '<') == null) {
+            try self.exact.put(allocator, owned, .{ .methods = route_methods, .action = action });
+            return;
+        }
+
+        var segments = std.ArrayList(Segment){};
+        var parts = std.mem.splitScalar(u8, std.mem.trimLeft(u8, owned, "/"), '/');
+        while (parts.next()) |part| {
+            if (part.len >= 2 and part[0] == '<' and part[part.len - 1] == '>') {
+                const spec = part[1 .. part.len - 1];
+                const colon = std.mem.indexOfScalar(u8, spec, ':');
+                const converter = if (colon) |c| spec[0..c] else "string";
+                const kind: ParamKind = if (std.mem.eql(u8, converter, "int"))
+                    .int
+                else if (std.mem.eql(u8, converter, "path"))
+                    .path
+                else if (std.mem.eql(u8, converter, "string"))
+                    .string
+                else
+                    return error.UnknownConverter;
+                try segments.append(allocator, .{ .param = .{ .name = if (colon) |c| spec[c + 1 ..] else spec, .kind = kind } });
+            } else {
+                try segments.append(allocator, .{ .literal = part });
+            }
+        }
+        try self.patterns.append(allocator, .{ .methods = route_methods, .action = action, .segments = segments.items });
+    }
+
+    pub const Match = union(enum) {
+        found: struct { route: *const Route, params: []const Param },
+        method_not_allowed,
+        not_found,
+    };
+
+    pub fn match(self: *const Router, method: Method, path: []const u8, params_buf: *[max_params]Param) Match {
+        var path_matched = false;
+        if (self.exact.getPtr(path)) |route| {
+            if (route.methods.contains(method)) return .{ .found = .{ .route = route, .params = &.{} } };
+            path_matched = true;
+        }
+        for (self.patterns.items) |*route| {
+            const n = matchSegments(route.segments, path, params_buf) orelse continue;
+            if (route.methods.contains(method)) return .{ .found = .{ .route = route, .params = params_buf[0..n] } };
+            path_matched = true;
+        }
+        return if (path_matched) .method_not_allowed else .not_found;
+    }
+
+    fn matchSegments(segments: []const Segment, path: []const u8, params_buf: *[max_params]Param) ?usize {
+        var rest = std.mem.trimLeft(u8, path, "/");
+        var count: usize = 0;
+        for (segments, 0..) |segment, i| {
+            const end = std.mem.indexOfScalar(u8, rest, '/') orelse rest.len;
+            const part = rest[0..end];
+            switch (segment) {
+                .literal => |lit| if (!std.mem.eql(u8, part, lit)) return null,
+                .param => |p| {
+                    if (count == max_params) return null;
+                    const value = if (p.kind == .path) rest else part;
+                    if (value.len == 0) return null;
+                    if (p.kind == .int) for (value) |c| if (c < '0' or c > '9') return null;
+                    params_buf[count] = .{ .name = p.name, .value = value };
+                    count += 1;
+                    if (p.kind == .path) return if (i == segments.len - 1) count else null;
+                },
+            }
+            rest = if (end < rest.len) rest[end + 1 ..] else "";
+        }
+        return if (rest.len == 0) count else null;
+    }
+};
+
+// === Event poller ===
+
+const Interest = enum { read, write };
+
+const Event = struct {
+    token: usize,
+    readable: bool,
+    writable: bool,
+    hangup: bool,
+};
+
+const max_events = 256;
+
+const Poller = switch (builtin.os.tag) {
+    .linux => Epoll,
+    .macos, .ios, .tvos, .watchos, .visionos, .freebsd, .netbsd, .openbsd, .dragonfly => Kqueue,
+    else => @compileError("http server: no event poller for " ++ @tagName(builtin.os.tag)),
+};
+
+/// Level-triggered: a connection that still has unread bytes is reported again
+const Epoll = struct {
+    const linux = std.os.linux;
+
+    fd: posix.fd_t,
+    events: [max_events]linux.epoll_event = undefined,
+
+    fn init() !Epoll {
+        return .{ .fd = try posix.epoll_create1(linux.EPOLL.CLOEXEC) };
+    }
+
+    fn deinit(self: *Epoll) void {
+        posix.close(self.fd);
+    }
+
+    fn mask(interest: Interest) u32 {
+        return switch (interest) {
+            .read => linux.EPOLL.IN | linux.EPOLL.RDHUP,
+            .write => linux.EPOLL.OUT,
+        };
+    }
+
+    fn add(self: *Epoll, fd: posix.fd_t, token: usize, interest: Interest) !void {
+        var event: linux.epoll_event = .{ .events = mask(interest), .data = .{ .ptr = token } };
+        try posix.epoll_ctl(self.fd, linux.EPOLL.CTL_ADD, fd, &event);
+    }
+
+    fn modify(self: *Epoll, fd: posix.fd_t, token: usize, interest: Interest) !void {
+        var event: linux.epoll_event = .{ .events = mask(interest), .data = .{ .ptr = token } };
+        try posix.epoll_ctl(self.fd, linux.EPOLL.CTL_MOD, fd, &event);
+    }
+
+    fn wait(self: *Epoll, out: []Event, timeout_ms: i32) usize {
+        const n = posix.epoll_wait(self.fd, self.events[0..@min(out.len, max_events)], timeout_ms);
+        for (self.events[0..n], out[0..n]) |event, *e| {
+            e.* = .{
+                .token = event.data.ptr,
+                .readable = event.events & linux.EPOLL.IN != 0,
+                .writable = event.events & linux.EPOLL.OUT != 0,
+                .hangup = event.events & (linux.EPOLL.HUP | linux.EPOLL.ERR | linux.EPOLL.RDHUP) != 0,
+            };
+        }
+        return n;
+    }
+};
+
+/// Read and write filters are both registered; the unwanted one is disabled
+const Kqueue = struct {
+    const EV = posix.system.EV;
+    const EVFILT = posix.system.EVFILT;
+
+    fd: posix.fd_t,
+    events: [max_events]posix.Kevent = undefined,
+
+    fn init() !Kqueue {
+        return .{ .fd = try posix.kqueue() };
+    }
+
+    fn deinit(self: *Kqueue) void {
+        posix.close(self.fd);
+    }
+
+    fn change(fd: posix.fd_t, filter: i16, flags: u16, token: usize) posix.Kevent {
+        return .{ .ident = @intCast(fd), .filter = filter, .flags = flags, .fflags = 0, .data = 0, .udata = token };
+    }
+
+    fn add(self: *Kqueue, fd: posix.fd_t, token: usize, interest: Interest) !void {
+        try self.modify(fd, token, interest);
+    }
+
+    fn modify(self: *Kqueue, fd: posix.fd_t, token: usize, interest: Interest) !void {
+        const on: u16 = EV.ADD | EV.ENABLE;
+        const off: u16 = EV.ADD | EV.DISABLE;
+        const changes = [2]posix.Kevent{
+            change(fd, EVFILT.READ, if (interest == .read) on else off, token),
+            change(fd, EVFILT.WRITE, if (interest == .write) on else off, token),
+        };
+        _ = try posix.kevent(self.fd, &changes, &[_]posix.Kevent{}, null);
+    }
+
+    fn wait(self: *Kqueue, out: []Event, timeout_ms: i32) usize {
+        const timeout: posix.timespec = .{
+            .sec = @divTrunc(timeout_ms, 1000),
+            .nsec = @rem(timeout_ms, 1000) * std.time.ns_per_ms,
+        };
+        const n = posix.kevent(self.fd, &[_]posix.Kevent{}, self.events[0..@min(out.len, max_events)], &timeout) catch return 0;
+        for (self.events[0..n], out[0..n]) |event, *e| {
+            e.* = .{
+                .token = event.udata,
+                .readable = event.filter == EVFILT.READ,
+                .writable = event.filter == EVFILT.WRITE,
+                .hangup = event.flags & EV.EOF != 0,
+            };
+        }
+        return n;
+    }
+};
+
+// === Server ===
+
+pub const Config = struct {
+    host: []const u8 = "127.0.0.1",
+    port: u16 = 8080,
+    /// Event loops (threads); 0 = one per CPU
+    workers: usize = 0,
+    backlog: u31 = 1024,
+    limits: Limits = .{},
+    /// Idle keep-alive connections are closed after this long
+    keep_alive_timeout_s: i64 = 60,
+};
+
+/// Per-core listeners need the kernel to balance accepts between sockets
+const per_worker_listener = builtin.os.tag == .linux;
+
+/// Token of the listening socket; connections use their address
+const listener_token: usize = 0;
+
+/// Poll timeout - bounds how long stop() and the idle sweep wait
+const tick_ms: i32 = 500;
+
+const read_chunk = 16 * 1024;
+
+const send_flags: u32 = if (builtin.os.tag == .linux) posix.MSG.NOSIGNAL else 0;
+
+pub const Server = struct {
+    allocator: Allocator,
+    router: *const Router,
+    config: Config,
+    /// Bound address (the real port when config.port is 0)
+    address: std.net.Address,
+    workers: []Worker,
+    stopping: std.atomic.Value(bool) = std.atomic.Value(bool).init(false),
+
+    /// Bind the listener(s); run() then serves until stop()
+    pub fn init(allocator: Allocator, router: *const Router, config: Config) !Server {
+        var address = try std.net.Address.parseIp(config.host, config.port);
+        const count = if (config.workers != 0) config.workers else std.Thread.getCpuCount() catch 1;
+
+        const workers = try allocator.alloc(Worker, @max(1, count));
+        errdefer allocator.free(workers);
+        var ready: usize = 0;
+        errdefer for (workers[0..ready]) |*worker| worker.deinit();
+
+        for (workers, 0..) |*worker, i| {
+            const owns_listener = per_worker_listener or i == 0;
+            const listener = if (owns_listener) try listen(address, config.backlog) else workers[0].listener;
+            errdefer if (owns_listener) posix.close(listener);
+            // Port 0: the first bind picks the port, the other workers join it
+            if (i == 0) address = try boundAddress(listener);
+            worker.* = try Worker.init(allocator, listener, owns_listener);
+            ready += 1;
+        }
+
+        return .{
+            .allocator = allocator,
+            .router = router,
+            .config = config,
+            .address = address,
+            .workers = workers,
+        };
+    }
+
+    pub fn deinit(self: *Server) void {
+        for (self.workers) |*worker| worker.deinit();
+        self.allocator.free(self.workers);
+    }
+
+    pub fn port(self: *const Server) u16 {
+        return self.address.getPort();
+    }
+
+    /// Serve until stop(); the calling thread runs the first event loop
+    pub fn run(self: *Server) !void {
+        for (self.workers) |*worker| worker.server = self;
+
+        const threads = try self.allocator.alloc(std.Thread, self.workers.len - 1);
+        defer self.allocator.free(threads);
+        var spawned: usize = 0;
+        defer for (threads[0..spawned]) |thread| thread.join();
+        errdefer self.stop();
+
+        for (self.workers[1..]) |*worker| {
+            threads[spawned] = try std.Thread.spawn(.{}, Worker.run, .{worker});
+            spawned += 1;
+        }
+        self.workers[0].run();
+    }
+
+    /// Ask every event loop to exit (takes effect within one poll tick)
+    pub fn stop(self: *Server) void {
+        self.stopping.store(true, .release);
+    }
+};
+
+fn listen(address: std.net.Address, backlog: u31) !posix.socket_t {
+    const fd = try posix.socket(address.any.family, posix.SOCK.STREAM | posix.SOCK.NONBLOCK | posix.SOCK.CLOEXEC, posix.IPPROTO.TCP);
+    errdefer posix.close(fd);
+    const one = std.mem.toBytes(@as(c_int, 1));
+    try posix.setsockopt(fd, posix.SOL.SOCKET, posix.SO.REUSEADDR, &one);
+    if (per_worker_listener) try posix.setsockopt(fd, posix.SOL.SOCKET, posix.SO.REUSEPORT, &one);
+    try posix.bind(fd, &address.any, address.getOsSockLen());
+    try posix.listen(fd, backlog);
+    return fd;
+}
+
+fn boundAddress(fd: posix.socket_t) !std.net.Address {
+    var address: std.net.Address = undefined;
+    var len: posix.socklen_t = @sizeOf(std.net.Address);
+    try posix.getsockname(fd, &address.any, &len);
+    return address;
+}
+
+const Connection = struct {
+    fd: posix.socket_t,
+    /// Index in Worker.connections
+    slot: usize,
+    in: std.ArrayList(u8) = .{},
+    out: std.ArrayList(u8) = .{},
+    /// Bytes of `out` already sent
+    sent: usize = 0,
+    interest: Interest = .read,
+    /// Close once `out` is flushed (Connection: close, errors, peer EOF)
+    closing: bool = false,
+    last_active: i64,
+};
+
+const Worker = struct {
+    allocator: Allocator,
+    server: *Server = undefined,
+    listener: posix.socket_t,
+    owns_listener: bool,
+    poller: Poller,
+    pool: std.heap.MemoryPool(Connection),
+    connections: std.ArrayList(*Connection) = .{},
+    /// Closed this iteration; freed once no event can refer to them
+    closed: std.ArrayList(*Connection) = .{},
+    /// Handler allocations, reset after each batch of requests
+    arena: std.heap.ArenaAllocator,
+    date: DateCache = .{},
+    now: i64 = 0,
+    last_sweep: i64 = 0,
+    headers: [max_headers]Header = undefined,
+    params: [max_params]Param = undefined,
+
+    fn init(allocator: Allocator, listener: posix.socket_t, owns_listener: bool) !Worker {
+        var poller = try Poller.init();
+        errdefer poller.deinit();
+        try poller.add(listener, listener_token, .read);
+        return .{
+            .allocator = allocator,
+            .listener = listener,
+            .owns_listener = owns_listener,
+            .poller = poller,
+            .pool = std.heap.MemoryPool(Connection).init(allocator),
+            .arena = std.heap.ArenaAllocator.init(allocator),
+        };
+    }
+
+    fn deinit(self: *Worker) void {
+        while (self.connections.items.len > 0) self.close(self.connections.items[0]);
+        self.reap();
+        self.connections.deinit(self.allocator);
+        self.closed.deinit(self.allocator);
+        self.pool.deinit();
+        self.arena.deinit();
+        self.poller.deinit();
+        if (self.owns_listener) posix.close(self.listener);
+    }
+
+    fn run(self: *Worker) void {
+        var events: [max_events]Event = undefined;
+        while (!self.server.stopping.load(.acquire)) {
+            const n = self.poller.wait(&events, tick_ms);
+            self.now = std.time.timestamp();
+            self.date.update(self.now);
+
+            for (events[0..n]) |event| {
+                if (event.token == listener_token) {
+                    self.acceptAll();
+                    continue;
+                }
+                const conn: *Connection = @ptrFromInt(event.token);
+                if (conn.fd == -1) continue; // closed earlier in this batch
+                if (event.writable) self.flush(conn);
+                if (conn.fd != -1 and (event.readable or event.hangup) and conn.interest == .read) self.receive(conn);
+            }
+
+            if (self.now - self.last_sweep >= 1) {
+                self.sweepIdle();
+                self.last_sweep = self.now;
+            }
+            self.reap();
+        }
+    }
+
+    fn acceptAll(self: *Worker) void {
+        while (true) {
+            const fd = posix.accept(self.listener, null, null, posix.SOCK.NONBLOCK | posix.SOCK.CLOEXEC) catch |err| switch (err) {
+                error.WouldBlock => return,
+                error.ConnectionAborted => continue,
+                // Out of descriptors or memory: leave the rest in the backlog
+                else => return,
+            };
+            self.open(fd) catch posix.close(fd);
+        }
+    }
+
+    fn open(self: *Worker, fd: posix.socket_t) !void {
+        const one = std.mem.toBytes(@as(c_int, 1));
+        posix.setsockopt(fd, posix.IPPROTO.TCP, posix.TCP.NODELAY, &one) catch {};
+        if (@hasDecl(posix.SO, "NOSIGPIPE")) posix.setsockopt(fd, posix.SOL.SOCKET, posix.SO.NOSIGPIPE, &one) catch {};
+
+        const conn = try self.pool.create();
+        errdefer self.pool.destroy(conn);
+        conn.* = .{ .fd = fd, .slot = self.connections.items.len, .last_active = self.now };
+        try self.connections.append(self.allocator, conn);
+        errdefer _ = self.connections.pop();
+        try self.poller.add(fd, @intFromPtr(conn), .read);
+    }
+
+    fn close(self: *Worker, conn: *Connection) void {
+        posix.close(conn.fd);
+        conn.fd = -1;
+        const last = self.connections.pop().?;
+        if (last != conn) {
+            self.connections.items[conn.slot] = last;
+            last.slot = conn.slot;
+        }
+        // If this fails the connection leaks until the worker exits
+        self.closed.append(self.allocator, conn) catch return;
+    }
+
+    fn reap(self: *Worker) void {
+        for (self.closed.items) |conn| {
+            conn.in.deinit(self.allocator);
+            conn.out.deinit(self.allocator);
+            self.pool.destroy(conn);
+        }
+        self.closed.clearRetainingCapacity();
+    }
+
+    fn sweepIdle(self: *Worker) void {
+        const deadline = self.now - self.server.config.keep_alive_timeout_s;
+        var i: usize = 0;
+        while (i < self.connections.items.len) {
+            const conn = self.connections.items[i];
+            // close() moves the last connection into slot i
+            if (conn.last_active < deadline) self.close(conn) else i += 1;
+        }
+    }
+
+    fn receive(self: *Worker, conn: *Connection) void {
+        const limits = self.server.config.limits;
+        var eof = false;
+        while (true) {
+            conn.in.ensureUnusedCapacity(self.allocator, read_chunk) catch return self.close(conn);
+            const buf = conn.in.unusedCapacitySlice();
+            const n = posix.read(conn.fd, buf) catch |err| switch (err) {
+                error.WouldBlock => break,
+                else => return self.close(conn),
+            };
+            if (n == 0) {
+                eof = true;
+                break;
+            }
+            conn.in.items.len += n;
+            // A short read drained the socket; level triggering reports any rest
+            if (n < buf.len) break;
+            if (conn.in.items.len > limits.max_header_bytes + limits.max_body_bytes) break;
+        }
+        conn.last_active = self.now;
+
+        self.handle(conn);
+        if (eof) {
+            // Answer what arrived before the peer shut down its side
+            if (conn.out.items.len == conn.sent) return self.close(conn);
+            conn.closing = true;
+        }
+        self.flush(conn);
+    }
+
+    /// Answer every complete request in the read buffer
+    fn handle(self: *Worker, conn: *Connection) void {
+        defer _ = self.arena.reset(.retain_capacity);
+
+        var pos: usize = 0;
+        while (!conn.closing and pos < conn.in.items.len) {
+            const parsed = parseRequest(conn.in.items[pos..], &self.headers, self.server.config.limits) catch |err| {
+                self.writeStatus(conn, statusForParseError(err), false) catch {};
+                conn.closing = true;
+                break;
+            } orelse break;
+            pos += parsed.len;
+
+            var request = parsed.request;
+            if (!request.keep_alive) conn.closing = true;
+            self.dispatch(conn, &request) catch {
+                conn.closing = true;
+                break;
+            };
+        }
+
+        const rest = conn.in.items.len - pos;
+        if (pos > 0 and rest > 0) std.mem.copyForwards(u8, conn.in.items[0..rest], conn.in.items[pos..]);
+        conn.in.items.len = rest;
+    }
+
+    fn dispatch(self: *Worker, conn: *Connection, request: *Request) !void {
+        const head_only = request.method == .HEAD;
+        switch (self.server.router.match(request.method, request.path, &self.params)) {
+            .not_found => return self.writeStatus(conn, 404, request.keep_alive),
+            .method_not_allowed => return self.writeStatus(conn, 405, request.keep_alive),
+            .found => |found| {
+                request.params = found.params;
+                switch (found.route.action) {
+                    .prepared => |*prepared| return self.writePrepared(conn, prepared, request, head_only),
+                    .handler => |handler| {
+                        var response = Response{ .allocator = self.arena.allocator() };
+                        handler(request, &response) catch return self.writeStatus(conn, 500, request.keep_alive);
+                        if (response.prepared) |prepared| return self.writePrepared(conn, prepared, request, head_only);
+                        try self.writeResponse(conn, &response, request, head_only);
+                    },
+                }
+            },
+        }
+    }
+
+    fn writePrepared(self: *Worker, conn: *Connection, prepared: *const Prepared, request: *const Request, head_only: bool) !void {
+        try conn.out.appendSlice(self.allocator, prepared.head);
+        try self.finishHead(conn, request.keep_alive, request.minor_version);
+        if (!head_only) try conn.out.appendSlice(self.allocator, prepared.body);
+    }
+
+    fn writeResponse(self: *Worker, conn: *Connection, response: *const Response, request: *const Request, head_only: bool) !void {
+        const out = &conn.out;
+        try out.print(self.allocator, head_format, .{ response.status, reason(response.status), response.content_type });
+        if (hasBody(response.status)) try out.print(self.allocator, length_format, .{response.body.len});
+        for (response.headers.items) |h| try out.print(self.allocator, "{s}: {s}\r\n", .{ h.name, h.value });
+        try self.finishHead(conn, request.keep_alive, request.minor_version);
+        if (!head_only and hasBody(response.status)) try out.appendSlice(self.allocator, response.body);
+    }
+
+    /// Error responses (no handler involved)
+    fn writeStatus(self: *Worker, conn: *Connection, status: u16, keep_alive: bool) !void {
+        const body = reason(status);
+        try conn.out.print(self.allocator, head_format ++ length_format, .{ status, body, "text/plain; charset=utf-8", body.len });
+        try self.finishHead(conn, keep_alive, 1);
+        try conn.out.appendSlice(self.allocator, body);
+    }
+
+    /// Date and Connection headers, then the blank line
+    fn finishHead(self: *Worker, conn: *Connection, keep_alive: bool, minor_version: u8) !void {
+        const out = &conn.out;
+        try out.appendSlice(self.allocator, "Date: ");
+        try out.appendSlice(self.allocator, &self.date.buf);
+        if (!keep_alive) {
+            try out.appendSlice(self.allocator, "\r\nConnection: close");
+        } else if (minor_version == 0) {
+            try out.appendSlice(self.allocator, "\r\nConnection: keep-alive");
+        }
+        try out.appendSlice(self.allocator, "\r\n\r\n");
+    }
+
+    /// Send buffered responses; waits for writability instead of blocking
+    fn flush(self: *Worker, conn: *Connection) void {
+        while (conn.sent < conn.out.items.len) {
+            const n = posix.send(conn.fd, conn.out.items[conn.sent..], send_flags) catch |err| switch (err) {
+                error.WouldBlock => {
+                    // Stop reading until the client drains what it asked for
+                    if (conn.interest != .write) {
+                        self.poller.modify(conn.fd, @intFromPtr(conn), .write) catch return self.close(conn);
+                        conn.interest = .write;
+                    }
+                    return;
+                },
+                else => return self.close(conn),
+            };
+            conn.sent += n;
+        }
+        conn.out.clearRetainingCapacity();
+        conn.sent = 0;
+        if (conn.closing) return self.close(conn);
+        if (conn.interest != .read) {
+            self.poller.modify(conn.fd, @intFromPtr(conn), .read) catch return self.close(conn);
+            conn.interest = .read;
+            // Requests that arrived while we were blocked on output
+            if (conn.in.items.len > 0) {
+                self.handle(conn);
+                self.flush(conn);
+            }
+        }
+    }
+};
+
+/// IMF-fixdate for the Date header, formatted at most once per second
+const DateCache = struct {
+    second: i64 = -1,
+    buf: [29]u8 = "Thu, 01 Jan 1970 00:00:00 GMT".*,
+
+    const days = [7][]const u8{ "Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat" };
+    const months = [12][]const u8{ "Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec" };
+
+    fn update(self: *DateCache, now: i64) void {
+        if (now == self.second or now < 0) return;
+        self.second = now;
+
+        const epoch_seconds = std.time.epoch.EpochSeconds{ .secs = @intCast(now) };
+        const epoch_day = epoch_seconds.getEpochDay();
+        const year_day = epoch_day.calculateYearDay();
+        const month_day = year_day.calculateMonthDay();
+        const day_seconds = epoch_seconds.getDaySeconds();
+        // 1970-01-01 was a Thursday
+        const weekday = (epoch_day.day + 4) % 7;
+
+        _ = std.fmt.bufPrint(&self.buf, "{s}, {d:0>2} {s} {d:0>4} {d:0>2}:{d:0>2}:{d:0>2} GMT", .{
+            days[weekday],
+            month_day.day_index + 1,
+            months[month_day.month.numeric() - 1],
+            year_day.year,
+            day_seconds.getHoursIntoDay(),
+            day_seconds.getMinutesIntoHour(),
+            day_seconds.getSecondsIntoMinute(),
+        }) catch unreachable;
+    }
+};
+
+test "parse request line, headers and query" {
+    var headers: [max_headers]Header = undefined;
+    const raw = "GET /users/7?verbose=1 HTTP/1.1\r\nHost: localhost\r\nX-Trace:  abc \r\n\r\n";
+    const parsed = (try parseRequest(raw, &headers, .{})).?;
+    const req = parsed.request;
+
+    try std.testing.expectEqual(raw.len, parsed.len);
+    try std.testing.expectEqual(Method.GET, req.method);
+    try std.testing.expectEqualStrings("/users/7", req.path);
+    try std.testing.expectEqualStrings("verbose=1", req.query);
+    try std.testing.expectEqualStrings("abc", req.header("x-trace").?);
+    try std.testing.expect(req.keep_alive);
+    try std.testing.expect(req.header("cookie") == null);
+}
+
+test "parse waits for the whole pipelined request" {
+    var headers: [max_headers]Header = undefined;
+    const raw = "POST /echo HTTP/1.1\r\nContent-Length: 5\r\n\r\nhelloGET / HTTP/1.0\r\n\r\n";
+
+    try std.testing.expect((try parseRequest(raw[0..20], &headers, .{})) == null);
+    try std.testing.expect((try parseRequest(raw[0..45], &headers, .{})) == null);
+
+    const first = (try parseRequest(raw, &headers, .{})).?;
+    try std.testing.expectEqualStrings("hello", first.request.body);
+
+    const second = (try parseRequest(raw[first.len..], &headers, .{})).?;
+    try std.testing.expectEqualStrings("/", second.request.path);
+    try std.testing.expectEqual(@as(u8, 0), second.request.minor_version);
+    try std.testing.expect(!second.request.keep_alive);
+}
+
+test "parse rejects what it cannot frame" {
+    var headers: [max_headers]Header = undefined;
+    try std.testing.expectError(error.UnsupportedTransferEncoding, parseRequest("POST / HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n", &headers, .{}));
+    try std.testing.expectError(error.BadRequest, parseRequest("POST / HTTP/1.1\r\nContent-Length: +5\r\n\r\n", &headers, .{}));
+    try std.testing.expectError(error.BadRequest, parseRequest("GET / HTTP/1.1\r\nHost: a\r\n folded\r\n\r\n", &headers, .{}));
+    try std.testing.expectError(error.VersionNotSupported, parseRequest("GET / HTTP/2.0\r\n\r\n", &headers, .{}));
+    try std.testing.expectError(error.BodyTooLarge, parseRequest("PUT / HTTP/1.1\r\nContent-Length: 100\r\n\r\n", &headers, .{ .max_body_bytes = 10 }));
+    try std.testing.expectError(error.HeadersTooLarge, parseRequest("GET / HTTP/1.1\r\nA: aaaaaaaaaaaaaaaaaaaa", &headers, .{ .max_header_bytes = 16 }));
+}
+
+fn testHandler(req: *const Request, res: *Response) anyerror!void {
+    res.body = try std.fmt.allocPrint(res.allocator, "hello {s}", .{req.param("name").?});
+}
+
+test "router matches exact paths, parameters and methods" {
+    var router = Router.init(std.testing.allocator);
+    defer router.deinit();
+    try router.get("/", testHandler);
+    try router.get("/users/<name>", testHandler);
+    try router.get("/posts/<int:id>/comments", testHandler);
+    try router.get("/files/<path:rest>", testHandler);
+
+    var params: [max_params]Param = undefined;
+    try std.testing.expect(router.match(.GET, "/", &params) == .found);
+    try std.testing.expect(router.match(.HEAD, "/", &params) == .found);
+    try std.testing.expect(router.match(.POST, "/", &params) == .method_not_allowed);
+    try std.testing.expect(router.match(.GET, "/nope", &params) == .not_found);
+
+    const user = router.match(.GET, "/users/ada", &params).found;
+    try std.testing.expectEqualStrings("ada", user.params[0].value);
+    try std.testing.expect(router.match(.GET, "/users/ada/extra", &params) == .not_found);
+    try std.testing.expect(router.match(.GET, "/posts/12/comments", &params) == .found);
+    try std.testing.expect(router.match(.GET, "/posts/x/comments", &params) == .not_found);
+    const file = router.match(.GET, "/files/a/b.txt", &params).found;
+    try std.testing.expectEqualStrings("a/b.txt", file.params[0].value);
+}
+
+test "date header is IMF-fixdate" {
+    var date = DateCache{};
+    date.update(784111777);
+    try std.testing.expectEqualStrings("Sun, 06 Nov 1994 08:49:37 GMT", &date.buf);
+}
+
+test "server answers pipelined keep-alive requests over loopback" {
+    if (builtin.single_threaded) return error.SkipZigTest;
+    const allocator = std.testing.allocator;
+
+    var router = Router.init(allocator);
+    defer router.deinit();
+    try router.static("/", "application/json", "{\"message\":\"Hello, World!\"}\n");
+    try router.get("/users/<name>", testHandler);
+
+    var server = try Server.init(allocator, &router, .{ .port = 0, .workers = 1 });
+    defer server.deinit();
+    const thread = try std.Thread.spawn(.{}, Server.run, .{&server});
+    defer thread.join();
+    defer server.stop();
+
+    const stream = try std.net.tcpConnectToAddress(server.address);
+    defer stream.close();
+    const requests = "GET / HTTP/1.1\r\nHost: t\r\n\r\n" ++
+        "GET /users/zig HTTP/1.1\r\nHost: t\r\n\r\n" ++
+        "GET /missing HTTP/1.1\r\nHost: t\r\nConnection: close\r\n\r\n";
+    var written: usize = 0;
+    while (written < requests.len) written += try posix.write(stream.handle, requests[written..]);
+
+    // The server closes after the third response
+    var buf: [4096]u8 = undefined;
+    var len: usize = 0;
+    while (len < buf.len) {
+        const n = try posix.read(stream.handle, buf[len..]);
+        if (n == 0) break;
+        len += n;
+    }
+    const responses = buf[0..len];
+    try std.testing.expectEqual(@as(usize, 2), std.mem.count(u8, responses, "HTTP/1.1 200 OK\r\n"));
+    try std.testing.expectEqual(@as(usize, 1), std.mem.count(u8, responses, "HTTP/1.1 404 Not Found\r\n"));
+    try std.testing.expect(std.mem.indexOf(u8, responses, "{\"message\":\"Hello, World!\"}\n") != null);
+    try std.testing.expect(std.mem.indexOf(u8, responses, "hello zig") != null);
+    try std.testing.expect(std.mem.endsWith(u8, responses, "Not Found"));
+}
@@ -25,6 +25,16 @@
 //!     for (deps) |dep| allocator.free(dep);
 //!     allocator.free(deps);
 //! }
+//!
+//! // Split a chunked stream into records (array elements or JSON Lines)
+//! var scanner = stream.RecordScanner.init(.auto);
+//! defer scanner.deinit(allocator);
+//! while (true) {
+//!     while (try scanner.next()) |record| handle(record);
+//!     if (scanner.isDone()) break;
+//!     const n = try file.read(&chunk);
+//!     if (n == 0) scanner.finish() else try scanner.feed(allocator, chunk[0..n]);
+//! }
 //! ```
 
 const std = @import("std");
@@ -247,6 +257,187 @@ pub fn findBool(data: []const u8, key: []const u8) ?bool {
     return null;
 }
 
+/// Incremental record splitter for chunk-fed JSON input.
+///
+/// Yields the raw bytes of one top-level value at a time: the elements of a
+/// top-level array, or consecutive whitespace-separated values (JSON Lines /
+/// NDJSON). Only the current, unfinished record is buffered, so memory is
+/// bounded by the largest record plus one chunk. Records are not validated;
+/// hand each one to a full parser.
+pub const RecordScanner = struct {
+    pub const Mode = enum {
+        /// `[` as first byte selects .array, anything else .lines
+        auto,
+        /// Elements of one top-level array
+        array,
+        /// Whitespace-separated top-level values
+        lines,
+    };
+
+    pub const Error = error{ UnexpectedToken, UnterminatedString, TrailingComma };
+
+    const State = enum { start, before_element, after_element, after_comma, between_values, done };
+
+    mode: Mode,
+    state: State = .start,
+    buf: std.ArrayList(u8) = .{},
+    /// Scan position in buf
+    pos: usize = 0,
+    /// Start of the record being scanned, if inside one
+    record_start: ?usize = null,
+    depth: usize = 0,
+    eof: bool = false,
+
+    pub fn init(mode: Mode) RecordScanner {
+        return .{ .mode = mode };
+    }
+
+    pub fn deinit(self: *RecordScanner, allocator: std.mem.Allocator) void {
+        self.buf.deinit(allocator);
+    }
+
+    /// Append input. Invalidates slices returned by next().
+    pub fn feed(self: *RecordScanner, allocator: std.mem.Allocator, chunk: []const u8) !void {
+        // Drop everything before the pending record
+        const keep_from = self.record_start orelse self.pos;
+        if (keep_from > 0) {
+            const pending = self.buf.items.len - keep_from;
+            std.mem.copyForwards(u8, self.buf.items[0..pending], self.buf.items[keep_from..]);
+            self.buf.shrinkRetainingCapacity(pending);
+            self.pos -= keep_from;
+            if (self.record_start) |*start| start.* -= keep_from;
+        }
+        try self.buf.appendSlice(allocator, chunk);
+    }
+
+    /// Mark end of input
+    pub fn finish(self: *RecordScanner) void {
+        self.eof = true;
+    }
+
+    /// True once all input has been consumed
+    pub fn isDone(self: *const RecordScanner) bool {
+        return self.state == .done or (self.eof and self.pos >= self.buf.items.len and self.record_start == null);
+    }
+
+    /// Next complete record, or null if more input is needed (or input is done).
+    /// The slice is valid until the next feed().
+    pub fn next(self: *RecordScanner) Error!?[]const u8 {
+        const data = self.buf.items;
+        while (true) {
+            if (self.record_start) |start| {
+                const end = (try self.scanRecord(start)) orelse return null;
+                self.record_start = null;
+                self.pos = end;
+                self.state = if (self.mode == .array) .after_element else .between_values;
+                return data[start..end];
+            }
+
+            self.pos = simd.skipWhitespace(data, self.pos);
+            if (self.pos >= data.len) {
+                if (!self.eof) return null;
+                return switch (self.state) {
+                    .start, .between_values, .done => null,
+                    else => error.UnexpectedToken, // unclosed array
+                };
+            }
+
+            const c = data[self.pos];
+            switch (self.state) {
+                .start => {
+                    if (self.mode == .auto) self.mode = if (c == '[') .array else .lines;
+                    if (self.mode == .array) {
+                        if (c != '[') return error.UnexpectedToken;
+                        self.pos += 1;
+                        self.state = .before_element;
+                    } else {
+                        self.state = .between_values;
+                    }
+                },
+                .before_element, .after_comma => {
+                    if (c == ']') {
+                        if (self.state == .after_comma) return error.TrailingComma;
+                        self.pos += 1;
+                        self.state = .done;
+                    } else if (c == ',') {
+                        return error.UnexpectedToken;
+                    } else {
+                        self.record_start = self.pos;
+                    }
+                },
+                .after_element => {
+                    self.pos += 1;
+                    self.state = switch (c) {
+                        ']' => .done,
+                        ',' => .after_comma,
+                        else => return error.UnexpectedToken,
+                    };
+                },
+                .between_values => self.record_start = self.pos,
+                .done => return error.UnexpectedToken, // data after the closing `]`
+            }
+        }
+    }
+
+    /// Find the end of the record starting at `start`, or null if it is incomplete
+    fn scanRecord(self: *RecordScanner, start: usize) Error!?usize {
+        const data = self.buf.items;
+        const first = data[start];
+
+        // Scalars end at the next delimiter
+        if (first != '{' and first != '[' and first != '"') {
+            var i = @max(self.pos, start);
+            while (i < data.len) : (i += 1) {
+                switch (data[i]) {
+                    ' ', '\t', '\n', '\r', ',', ']', '}' => break,
+                    else => {},
+                }
+            } else if (!self.eof) {
+                self.pos = i;
+                return null;
+            }
+            // A delimiter where a value should start (stray `,` or `}`)
+            if (i == start) return error.UnexpectedToken;
+            return i;
+        }
+
+        if (first == '"') {
+            if (simd.findClosingQuote(data, start + 1)) |q| return q + 1;
+            if (self.eof) return error.UnterminatedString;
+            return null;
+        }
+
+        // Containers: jump between structural characters, skipping strings whole
+        var i = if (self.pos > start) self.pos else start;
+        if (i == start) self.depth = 0;
+        while (simd.findSpecialChar(data, i)) |idx| {
+            switch (data[idx]) {
+                '"' => {
+                    const q = simd.findClosingQuote(data, idx + 1) orelse {
+                        // Resume from the opening quote once more data arrives
+                        self.pos = idx;
+                        if (self.eof) return error.UnterminatedString;
+                        return null;
+                    };
+                    i = q + 1;
+                    continue;
+                },
+                '{', '[' => self.depth += 1,
+                '}', ']' => {
+                    if (self.depth == 0) return error.UnexpectedToken;
+                    self.depth -= 1;
+                    if (self.depth == 0) return idx + 1;
+                },
+                else => {},
+            }
+            i = idx + 1;
+        }
+        self.pos = data.len;
+        if (self.eof) return error.UnexpectedToken;
+        return null;
+    }
+};
+
 // ============================================================================
 // Tests
 // ============================================================================
@@ -319,3 +510,52 @@ test "findBool" {
     try std.testing.expectEqual(false, findBool(data, "\"disabled\"").?);
     try std.testing.expect(findBool(data, "\"missing\"") == null);
 }
+
+test "RecordScanner array elements across chunks" {
+    const allocator = std.testing.allocator;
+    var scanner = RecordScanner.init(.auto);
+    defer scanner.deinit(allocator);
+
+    var records = std.ArrayList([]u8){};
+    defer {
+        for (records.items) |r| allocator.free(r);
+        records.deinit(allocator);
+    }
+
+    const input = "[ {\"a\": [1, 2], \"s\": \"x]\\\"y\"}, 42 ,\"str\", null ]";
+    // Feed three bytes at a time to split tokens at every possible point
+    var i: usize = 0;
+    while (true) {
+        while (try scanner.next()) |record| try records.append(allocator, try allocator.dupe(u8, record));
+        if (scanner.isDone()) break;
+        if (i >= input.len) {
+            scanner.finish();
+            continue;
+        }
+        const end = @min(i + 3, input.len);
+        try scanner.feed(allocator, input[i..end]);
+        i = end;
+    }
+
+    try std.testing.expectEqual(@as(usize, 4), records.items.len);
+    try std.testing.expectEqualStrings("{\"a\": [1, 2], \"s\": \"x]\\\"y\"}", records.items[0]);
+    try std.testing.expectEqualStrings("42", records.items[1]);
+    try std.testing.expectEqualStrings("\"str\"", records.items[2]);
+    try std.testing.expectEqualStrings("null", records.items[3]);
+}
+
+test "RecordScanner json lines" {
+    const allocator = std.testing.allocator;
+    var scanner = RecordScanner.init(.auto);
+    defer scanner.deinit(allocator);
+
+    try scanner.feed(allocator, "{\"id\": 1}\n{\"id\": 2}\n7");
+    try std.testing.expectEqualStrings("{\"id\": 1}", (try scanner.next()).?);
+    try std.testing.expectEqualStrings("{\"id\": 2}", (try scanner.next()).?);
+    // Trailing scalar is only complete at EOF
+    try std.testing.expect((try scanner.next()) == null);
+    scanner.finish();
+    try std.testing.expectEqualStrings("7", (try scanner.next()).?);
+    try std.testing.expect((try scanner.next()) == null);
+    try std.testing.expect(scanner.isDone());
+}
@@ -0,0 +1,157 @@
+//! Compression latency benchmark: per-request TextCompressor time over a
+//! growing multi-turn conversation, the way the proxy sees it (each turn
+//! resends the whole history).
+//! Run: zig build bench 2>/dev/null
+
+const std = @import("std");
+const compress = @import("src/compress.zig");
+
+const TURNS = 24;
+
+const WORDS = [_][]const u8{
+    "the",     "build",     "fails",  "when",       "linking", "against", "module",  "cache",
+    "request", "returns",   "error",  "because",    "handler", "expects", "a",       "slice",
+    "pointer", "allocator", "thread", "connection", "after",   "retry",   "timeout", "config",
+    "should",  "we",        "check",  "output",     "test",    "passes",  "locally", "but",
+};
+
+const CODE =
+    \\```zig
+    \\pub fn handle(self: *Server, req: *Request) !void {
+    \\    const body = try req.readAll(self.allocator);
+    \\    defer self.allocator.free(body);
+    \\    try self.router.dispatch(req.path, body);
+    \\}
+    \\```
+;
+
+/// Deterministic prose (with the odd code block) of about `len` bytes
+fn paragraph(allocator: std.mem.Allocator, out: *std.ArrayList(u8), rng: std.Random, len: usize) !void {
+    const start = out.items.len;
+    while (out.items.len - start < len) {
+        if (rng.uintLessThan(u8, 40) == 0) {
+            try out.appendSlice(allocator, "\n" ++ CODE ++ "\n");
+            continue;
+        }
+        try out.appendSlice(allocator, WORDS[rng.uintLessThan(usize, WORDS.len)]);
+        try out.append(allocator, if (rng.uintLessThan(u8, 12) == 0) '\n' else ' ');
+    }
+}
+
+fn appendJsonString(allocator: std.mem.Allocator, out: *std.ArrayList(u8), text: []const u8) !void {
+    try out.print(allocator, "{f}", .{std.json.fmt(text, .{})});
+}
+
+/// Message texts of the conversation, alternating user/assistant
+fn transcript(allocator: std.mem.Allocator) ![][]u8 {
+    var prng = std.Random.DefaultPrng.init(0x5eed);
+    const rng = prng.random();
+
+    const messages = try allocator.alloc([]u8, TURNS * 2);
+    for (messages, 0..) |*msg, i| {
+        var text = std.ArrayList(u8){};
+        const len = if (i % 2 == 0) 200 + rng.uintLessThan(usize, 1200) else 1500 + rng.uintLessThan(usize, 4000);
+        try paragraph(allocator, &text, rng, len);
+        msg.* = try text.toOwnedSlice(allocator);
+    }
+    return messages;
+}
+
+/// Request for `turn`: every earlier exchange plus the turn's user message
+fn buildRequest(allocator: std.mem.Allocator, messages: []const []u8, turn: usize) ![]u8 {
+    var out = std.ArrayList(u8){};
+    try out.appendSlice(allocator, "{\"model\":\"claude-sonnet-4-5\",\"max_tokens\":1024,\"messages\":[");
+    for (messages[0 .. turn * 2 + 1], 0..) |text, i| {
+        if (i > 0) try out.append(allocator, ',');
+        try out.appendSlice(allocator, if (i % 2 == 0) "{\"role\":\"user\",\"content\":" else "{\"role\":\"assistant\",\"content\":");
+        try appendJsonString(allocator, &out, text);
+        try out.append(allocator, '}');
+    }
+    try out.appendSlice(allocator, "]}");
+    return out.toOwnedSlice(allocator);
+}
+
+const Stats = struct {
+    total_ns: u64,
+    mean_ns: u64,
+    p50_ns: u64,
+    p95_ns: u64,
+    max_ns: u64,
+};
+
+fn run(allocator: std.mem.Allocator, requests: []const []u8, pool: ?*compress.RenderPool, cache: ?*compress.RenderCache) !Stats {
+    var compressor = compress.TextCompressor.init(allocator, true);
+    compressor.pool = pool;
+    compressor.cache = cache;
+
+    const samples = try allocator.alloc(u64, requests.len);
+    defer allocator.free(samples);
+    var total: u64 = 0;
+    for (requests, samples) |request, *sample| {
+        var timer = try std.time.Timer.start();
+        const result = try compressor.compressRequest(request);
+        sample.* = timer.read();
+        allocator.free(result);
+        total += sample.*;
+    }
+
+    std.mem.sort(u64, samples, {}, std.sort.asc(u64));
+    return .{
+        .total_ns = total,
+        .mean_ns = total / samples.len,
+        .p50_ns = samples[samples.len / 2],
+        .p95_ns = samples[samples.len * 95 / 100],
+        .max_ns = samples[samples.len - 1],
+    };
+}
+
+fn report(out: *std.Io.Writer, name: []const u8, stats: Stats, baseline: Stats) !void {
+    const ms = std.time.ns_per_ms;
+    try out.print("{s:<22} {d:>8.1} {d:>8.1} {d:>8.1} {d:>9.1} {d:>7.2}x\n", .{
+        name,
+        @as(f64, @floatFromInt(stats.mean_ns)) / ms,
+        @as(f64, @floatFromInt(stats.p50_ns)) / ms,
+        @as(f64, @floatFromInt(stats.p95_ns)) / ms,
+        @as(f64, @floatFromInt(stats.max_ns)) / ms,
+        @as(f64, @floatFromInt(baseline.total_ns)) / @as(f64, @floatFromInt(stats.total_ns)),
+    });
+}
+
+pub fn main() !void {
+    const allocator = std.heap.smp_allocator;
+
+    var stdout_buf: [4096]u8 = undefined;
+    var stdout = std.fs.File.stdout().writer(&stdout_buf);
+    const out = &stdout.interface;
+
+    const messages = try transcript(allocator);
+    var requests: [TURNS][]u8 = undefined;
+    for (&requests, 0..) |*request, turn| request.* = try buildRequest(allocator, messages, turn);
+
+    try out.print("=== TextCompressor: {d}-turn conversation, {d}KB final request, {d} cores ===\n\n", .{
+        TURNS,
+        requests[TURNS - 1].len / 1024,
+        std.Thread.getCpuCount() catch 1,
+    });
+    try out.print("{s:<22} {s:>8} {s:>8} {s:>8} {s:>9} {s:>8}\n", .{ "per request (ms)", "mean", "p50", "p95", "max", "speedup" });
+
+    const pool = try compress.RenderPool.init(allocator, 0);
+    defer pool.deinit();
+
+    // Warmup
+    _ = try run(allocator, requests[0..4], pool, null);
+
+    const sequential = try run(allocator, &requests, null, null);
+    try report(out, "sequential", sequential, sequential);
+
+    const parallel = try run(allocator, &requests, pool, null);
+    try report(out, "parallel", parallel, sequential);
+
+    var cache = compress.RenderCache.init(allocator, 64 * 1024 * 1024);
+    defer cache.deinit();
+    const cached = try run(allocator, &requests, pool, &cache);
+    try report(out, "parallel + cache", cached, sequential);
+
+    try out.print("\ncache: {d} hits, {d} misses, {d}KB held\n", .{ cache.hits, cache.misses, cache.bytes / 1024 });
+    try out.flush();
+}
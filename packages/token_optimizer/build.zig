@@ -155,6 +155,24 @@ pub fn build(b: *std.Build) void {
     const run_test_compress = b.addRunArtifact(test_compress);
     test_step.dependOn(&run_test_compress.step);
 
+    // Benchmark: per-request compression latency (always optimized)
+    const bench_compress = b.addExecutable(.{
+        .name = "bench_compress",
+        .root_module = b.createModule(.{
+            .root_source_file = b.path("bench_compress.zig"),
+            .target = target,
+            .optimize = .ReleaseFast,
+        }),
+    });
+    bench_compress.root_module.addImport("json", shared_json);
+    bench_compress.root_module.addImport("anthropic_types", anthropic_types);
+    bench_compress.root_module.addImport("pixel_render", pixel_render);
+    bench_compress.root_module.addImport("pal_png", pal_png);
+
+    const run_bench_compress = b.addRunArtifact(bench_compress);
+    const bench_step = b.step("bench", "Run the compression latency benchmark");
+    bench_step.dependOn(&run_bench_compress.step);
+
     // Test: gif.zig
     const test_gif = b.addTest(.{
         .root_module = b.createModule(.{
@@ -16,11 +16,243 @@ const ImageInfo = struct {
     height: usize,
 };
 
+/// Rendered chunks by content hash, least recently used evicted first.
+/// Conversations resend their whole history each turn, so every chunk but
+/// the last usually renders exactly as it did on the previous request.
+/// Shared between threads.
+pub const RenderCache = struct {
+    allocator: std.mem.Allocator,
+    mutex: std.Thread.Mutex = .{},
+    entries: std.AutoHashMapUnmanaged(u64, *Entry) = .{},
+    /// Most recently used first
+    lru: std.DoublyLinkedList = .{},
+    /// Base64 image bytes held
+    bytes: usize = 0,
+    max_bytes: usize,
+    hits: u64 = 0,
+    misses: u64 = 0,
+
+    const Entry = struct {
+        key: u64,
+        /// Chunk length, checked along with the hash
+        len: usize,
+        image: ImageInfo,
+        node: std.DoublyLinkedList.Node = .{},
+    };
+
+    pub fn init(allocator: std.mem.Allocator, max_bytes: usize) RenderCache {
+        return .{ .allocator = allocator, .max_bytes = max_bytes };
+    }
+
+    pub fn deinit(self: *RenderCache) void {
+        while (self.lru.pop()) |node| self.destroyEntry(@fieldParentPtr("node", node));
+        self.entries.deinit(self.allocator);
+    }
+
+    /// Content hash of a chunk: its text and per-character roles
+    fn key(chunk: TextChunk) u64 {
+        var hasher = std.hash.Wyhash.init(0);
+        hasher.update(chunk.text);
+        hasher.update(std.mem.sliceAsBytes(chunk.roles));
+        return hasher.final();
+    }
+
+    /// Copy of the cached image for `chunk`, allocated with `allocator`
+    fn get(self: *RenderCache, allocator: std.mem.Allocator, chunk: TextChunk) !?ImageInfo {
+        self.mutex.lock();
+        defer self.mutex.unlock();
+
+        const entry = self.entries.get(key(chunk)) orelse {
+            self.misses += 1;
+            return null;
+        };
+        if (entry.len != chunk.text.len) {
+            self.misses += 1;
+            return null;
+        }
+        self.hits += 1;
+        self.lru.remove(&entry.node);
+        self.lru.prepend(&entry.node);
+        return .{
+            .data = try allocator.dupe(u8, entry.image.data),
+            .width = entry.image.width,
+            .height = entry.image.height,
+        };
+    }
+
+    /// Store a copy of `image` as the rendering of `chunk`
+    fn put(self: *RenderCache, chunk: TextChunk, image: ImageInfo) !void {
+        if (image.data.len > self.max_bytes) return;
+
+        const entry = try self.allocator.create(Entry);
+        errdefer self.allocator.destroy(entry);
+        entry.* = .{
+            .key = key(chunk),
+            .len = chunk.text.len,
+            .image = .{
+                .data = try self.allocator.dupe(u8, image.data),
+                .width = image.width,
+                .height = image.height,
+            },
+        };
+        errdefer self.allocator.free(entry.image.data);
+
+        self.mutex.lock();
+        defer self.mutex.unlock();
+
+        const gop = try self.entries.getOrPut(self.allocator, entry.key);
+        if (gop.found_existing) {
+            // Rendered concurrently by another request
+            self.allocator.free(entry.image.data);
+            self.allocator.destroy(entry);
+            return;
+        }
+        gop.value_ptr.* = entry;
+        self.lru.prepend(&entry.node);
+        self.bytes += entry.image.data.len;
+
+        while (self.bytes > self.max_bytes) {
+            const oldest: *Entry = @fieldParentPtr("node", self.lru.pop().?);
+            _ = self.entries.remove(oldest.key);
+            self.destroyEntry(oldest);
+        }
+    }
+
+    fn destroyEntry(self: *RenderCache, entry: *Entry) void {
+        self.bytes -= entry.image.data.len;
+        self.allocator.free(entry.image.data);
+        self.allocator.destroy(entry);
+    }
+};
+
+/// Chunk of text with corresponding roles
+const TextChunk = struct {
+    text: []const u8,
+    roles: []const api_types.Role,
+};
+
+/// One request's chunks still to render, claimed one at a time
+const RenderJobs = struct {
+    compressor: TextCompressor,
+    chunks: []const TextChunk,
+    results: []anyerror!ImageInfo,
+    misses: []const usize,
+    next: std.atomic.Value(usize) = .init(0),
+    done: std.atomic.Value(usize) = .init(0),
+    /// RenderPool bookkeeping, guarded by the pool mutex
+    node: std.DoublyLinkedList.Node = .{},
+    queued: bool = false,
+    workers: usize = 0,
+
+    fn work(self: *RenderJobs) void {
+        while (true) {
+            const n = self.next.fetchAdd(1, .monotonic);
+            if (n >= self.misses.len) return;
+            const idx = self.misses[n];
+            const chunk = self.chunks[idx];
+            self.results[idx] = self.compressor.textToBase64Png(chunk.text, chunk.roles);
+            _ = self.done.fetchAdd(1, .release);
+        }
+    }
+
+    fn exhausted(self: *RenderJobs) bool {
+        return self.next.load(.monotonic) >= self.misses.len;
+    }
+};
+
+/// Fixed set of render threads shared by every request. Requests queue their
+/// chunks and wait; workers drain the queue in order, so concurrent requests
+/// share the cores instead of each spawning a thread per core.
+pub const RenderPool = struct {
+    allocator: std.mem.Allocator,
+    mutex: std.Thread.Mutex = .{},
+    /// A batch was queued (or the pool is stopping)
+    work_ready: std.Thread.Condition = .{},
+    /// A worker finished its part of a batch
+    released: std.Thread.Condition = .{},
+    /// Queued RenderJobs, oldest first
+    batches: std.DoublyLinkedList = .{},
+    threads: std.ArrayList(std.Thread) = .{},
+    stopping: bool = false,
+
+    /// Pool of `n_threads` workers (0 = one per core)
+    pub fn init(allocator: std.mem.Allocator, n_threads: usize) !*RenderPool {
+        const self = try allocator.create(RenderPool);
+        self.* = .{ .allocator = allocator };
+        errdefer self.deinit();
+
+        const n = if (n_threads > 0) n_threads else std.Thread.getCpuCount() catch 1;
+        try self.threads.ensureTotalCapacity(allocator, n);
+        for (0..n) |_| self.threads.appendAssumeCapacity(try std.Thread.spawn(.{}, worker, .{self}));
+        return self;
+    }
+
+    /// Stop and join the workers; no render may be in flight
+    pub fn deinit(self: *RenderPool) void {
+        self.mutex.lock();
+        self.stopping = true;
+        self.mutex.unlock();
+        self.work_ready.broadcast();
+        for (self.threads.items) |thread| thread.join();
+        self.threads.deinit(self.allocator);
+        self.allocator.destroy(self);
+    }
+
+    /// Render every chunk of `jobs` on the pool and wait for them
+    fn run(self: *RenderPool, jobs: *RenderJobs) void {
+        if (jobs.misses.len == 0) return;
+
+        self.mutex.lock();
+        defer self.mutex.unlock();
+        self.batches.append(&jobs.node);
+        jobs.queued = true;
+        self.work_ready.broadcast();
+
+        // `jobs` lives on the caller's stack: wait until no worker holds it
+        while (jobs.done.load(.acquire) < jobs.misses.len or jobs.workers > 0) {
+            self.released.wait(&self.mutex);
+        }
+        if (jobs.queued) self.batches.remove(&jobs.node);
+    }
+
+    fn worker(self: *RenderPool) void {
+        self.mutex.lock();
+        defer self.mutex.unlock();
+        while (!self.stopping) {
+            const node = self.batches.first orelse {
+                self.work_ready.wait(&self.mutex);
+                continue;
+            };
+            const jobs: *RenderJobs = @fieldParentPtr("node", node);
+            if (jobs.exhausted()) {
+                self.batches.remove(node);
+                jobs.queued = false;
+                continue;
+            }
+            jobs.workers += 1;
+
+            self.mutex.unlock();
+            jobs.work();
+            self.mutex.lock();
+
+            jobs.workers -= 1;
+            self.released.broadcast();
+        }
+    }
+};
+
 /// Text compression via image encoding
 pub const TextCompressor = struct {
     allocator: std.mem.Allocator,
     parser: api_types.MessageParser,
     enabled: bool,
+    /// Rendered chunks reused across requests
+    cache: ?*RenderCache = null,
+    /// Threads chunks are rendered on; null renders on the calling thread
+    pool: ?*RenderPool = null,
+    /// Write each image to /tmp/compress_img_N.png for inspection. Debug
+    /// only: concurrent requests would overwrite each other's files.
+    dump_images: bool = false,
 
     pub fn init(allocator: std.mem.Allocator, enabled: bool) TextCompressor {
         return .{
@@ -67,12 +299,6 @@ pub const TextCompressor = struct {
         return @max(1, pixels / 750);
     }
 
-    /// Chunk of text with corresponding roles
-    const TextChunk = struct {
-        text: []const u8,
-        roles: []const api_types.Role,
-    };
-
     /// Split text into chunks that fit in MAX_CHARS_PER_IMAGE
     fn splitIntoChunks(self: TextCompressor, text: []const u8, roles: []const api_types.Role) ![]TextChunk {
         var chunks = std.ArrayList(TextChunk){};
@@ -91,6 +317,57 @@ pub const TextCompressor = struct {
         return chunks.toOwnedSlice(self.allocator);
     }
 
+    /// Render every chunk to a base64 PNG, taking cached ones from the
+    /// render cache. The rest are independent and rendered in parallel on
+    /// the render pool (the allocator must then be thread-safe).
+    fn renderChunks(self: TextCompressor, chunks: []const TextChunk) ![]ImageInfo {
+        const results = try self.allocator.alloc(anyerror!ImageInfo, chunks.len);
+        defer self.allocator.free(results);
+
+        var misses = try std.ArrayList(usize).initCapacity(self.allocator, chunks.len);
+        defer misses.deinit(self.allocator);
+        for (chunks, 0..) |chunk, idx| {
+            const cached = if (self.cache) |cache| cache.get(self.allocator, chunk) catch null else null;
+            if (cached) |img| {
+                results[idx] = img;
+            } else {
+                misses.appendAssumeCapacity(idx);
+            }
+        }
+
+        if (self.cache != null) {
+            std.debug.print("[COMPRESS] Render cache: {d}/{d} chunks cached\n", .{ chunks.len - misses.items.len, chunks.len });
+        }
+
+        var jobs = RenderJobs{ .compressor = self, .chunks = chunks, .results = results, .misses = misses.items };
+        if (self.pool) |pool| pool.run(&jobs) else jobs.work();
+
+        var failed: ?anyerror = null;
+        for (results, 0..) |result, idx| {
+            _ = result catch |err| {
+                std.debug.print("[COMPRESS] PNG error on chunk {d}: {any}\n", .{ idx, err });
+                failed = err;
+            };
+        }
+        if (failed) |err| {
+            for (results) |result| {
+                const img = result catch continue;
+                self.allocator.free(img.data);
+            }
+            return err;
+        }
+
+        const images = self.allocator.alloc(ImageInfo, chunks.len) catch |err| {
+            for (results) |result| self.allocator.free((result catch unreachable).data);
+            return err;
+        };
+        for (results, images) |result, *img| img.* = result catch unreachable;
+        if (self.cache) |cache| {
+            for (misses.items) |idx| cache.put(chunks[idx], images[idx]) catch {};
+        }
+        return images;
+    }
+
     /// Process request: compress old messages into images
     pub fn compressRequest(self: TextCompressor, request_json: []const u8) ![]const u8 {
         if (!self.enabled) {
@@ -262,22 +539,19 @@ pub const TextCompressor = struct {
         });
 
         // Generate images for each chunk
-        var images = std.ArrayList(ImageInfo){};
+        const images = self.renderChunks(chunks) catch {
+            return try self.allocator.dupe(u8, request_json);
+        };
         defer {
-            for (images.items) |img| {
+            for (images) |img| {
                 self.allocator.free(img.data);
             }
-            images.deinit(self.allocator);
+            self.allocator.free(images);
         }
 
         var total_image_tokens: usize = 0;
 
-        for (chunks, 0..) |chunk, chunk_idx| {
-            const img = self.textToBase64Png(chunk.text, chunk.roles) catch |err| {
-                std.debug.print("[COMPRESS] PNG error on chunk {d}: {any}\n", .{ chunk_idx, err });
-                return try self.allocator.dupe(u8, request_json);
-            };
-
+        for (images, 0..) |img, chunk_idx| {
             const img_tokens = calculateImageTokens(img.width, img.height);
             total_image_tokens += img_tokens;
 
@@ -288,6 +562,8 @@ pub const TextCompressor = struct {
                 img_tokens,
             });
 
+            if (!self.dump_images) continue;
+
             // Save to /tmp for debugging
             var path_buf: [64]u8 = undefined;
             const path = std.fmt.bufPrint(&path_buf, "/tmp/compress_img_{d}.png", .{chunk_idx + 1}) catch "/tmp/compress_img.png";
@@ -306,8 +582,6 @@ pub const TextCompressor = struct {
                     }
                 }
             }
-
-            try images.append(self.allocator, img);
         }
 
         // Decision: only compress if we save tokens
@@ -348,14 +622,14 @@ pub const TextCompressor = struct {
         var before_buf: [256]u8 = undefined;
         const before_instruction = try std.fmt.bufPrint(&before_buf,
             \\Read {d} images below. Format: | = newline, > = tab. Colors: blue=[USER], green=[ASST], yellow=[SYS], red=[TOOL], purple=[RESULT]
-        , .{images.items.len});
+        , .{images.len});
 
         try new_messages.appendSlice(self.allocator, "{\"type\":\"text\",\"text\":\"");
         try self.appendEscapedJson(before_instruction, &new_messages);
         try new_messages.appendSlice(self.allocator, "\"}");
 
         // Add all images
-        for (images.items) |img| {
+        for (images) |img| {
             try new_messages.append(self.allocator, ',');
             try new_messages.appendSlice(self.allocator, "{\"type\":\"image\",\"source\":{\"type\":\"base64\",\"media_type\":\"image/png\",\"data\":\"");
             try new_messages.appendSlice(self.allocator, img.data);
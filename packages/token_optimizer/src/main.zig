@@ -14,7 +14,8 @@ pub fn main() !void {
 
     std.debug.print("Text-to-image compression: {s}\n", .{if (compress_enabled) "ENABLED" else "DISABLED"});
 
-    var server = proxy.ProxyServer.init(allocator, compress_enabled);
+    var server = try proxy.ProxyServer.init(allocator, compress_enabled);
+    defer server.deinit();
 
     // Use unique port to avoid conflicts (can override with PORT env var)
     const port: u16 = blk: {
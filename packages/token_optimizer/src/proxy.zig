@@ -1,31 +1,94 @@
+//! Token optimizer proxy
+//!
+//! Accepted client connections are queued for a fixed pool of worker
+//! threads, so a slow completion never holds up the next request and no
+//! thread is created per connection. Upstream requests go over pooled h2 clients, each keeping one
+//! HTTP/2 connection to the API open between requests. Responses, including
+//! server-sent event streams, are relayed to the client with chunked
+//! encoding as DATA frames arrive instead of being buffered. Compression
+//! renders image chunks on one render pool (a thread per core) shared by
+//! all connections.
+
 const std = @import("std");
 const compress = @import("compress.zig");
-const gzip = @import("gzip");
 const h2 = @import("h2");
 
+/// Threads serving client connections, one connection at a time each
+const worker_count = 64;
+
+/// Accepted connections waiting for a worker; further ones are answered 503
+const queue_capacity = 256;
+
+/// Rendered images kept for reuse by later turns of a conversation
+const render_cache_bytes = 64 * 1024 * 1024;
+
+const busy_response = "HTTP/1.1 503 Service Unavailable\r\nContent-Type: application/json\r\nContent-Length: 22\r\nConnection: close\r\n\r\n{\"error\":\"proxy_busy\"}";
+
 pub const ProxyServer = struct {
     allocator: std.mem.Allocator,
     compressor: compress.TextCompressor,
+    render_cache: *compress.RenderCache,
+    render_pool: *compress.RenderPool,
+    upstream: UpstreamPool,
+    queue: ConnectionQueue = .{},
+
+    pub fn init(allocator: std.mem.Allocator, compress_enabled: bool) !ProxyServer {
+        const render_cache = try allocator.create(compress.RenderCache);
+        errdefer allocator.destroy(render_cache);
+        render_cache.* = compress.RenderCache.init(allocator, render_cache_bytes);
+        const render_pool = try compress.RenderPool.init(allocator, 0);
+
+        var compressor = compress.TextCompressor.init(allocator, compress_enabled);
+        compressor.cache = render_cache;
+        compressor.pool = render_pool;
 
-    pub fn init(allocator: std.mem.Allocator, compress_enabled: bool) ProxyServer {
         return ProxyServer{
             .allocator = allocator,
-            .compressor = compress.TextCompressor.init(allocator, compress_enabled),
+            .compressor = compressor,
+            .render_cache = render_cache,
+            .render_pool = render_pool,
+            .upstream = UpstreamPool.init(allocator),
         };
     }
 
+    pub fn deinit(self: *ProxyServer) void {
+        self.upstream.deinit();
+        self.render_pool.deinit();
+        self.render_cache.deinit();
+        self.allocator.destroy(self.render_cache);
+    }
+
     pub fn listen(self: *ProxyServer, port: u16) !void {
         const address = try std.net.Address.parseIp("127.0.0.1", port);
         var server = try address.listen(.{
             .reuse_address = true,
+            .kernel_backlog = 1024,
         });
         defer server.deinit();
 
         std.debug.print("Proxy listening on http://127.0.0.1:{d}\n", .{port});
 
+        // Workers run for as long as the server listens
+        for (0..worker_count) |_| {
+            const thread = try std.Thread.spawn(.{}, workerLoop, .{self});
+            thread.detach();
+        }
+
         while (true) {
             const connection = try server.accept();
-            try self.handleConnection(connection);
+            if (!self.queue.push(connection)) {
+                connection.stream.writeAll(busy_response) catch {};
+                connection.stream.close();
+            }
+        }
+    }
+
+    fn workerLoop(self: *ProxyServer) void {
+        while (true) {
+            const connection = self.queue.pop();
+            self.handleConnection(connection) catch |err| {
+                std.debug.print("[PROXY] connection error: {}\n", .{err});
+            };
         }
     }
 
@@ -140,18 +203,15 @@ pub const ProxyServer = struct {
             try self.allocator.dupe(u8, body);
         defer self.allocator.free(compressed_body);
 
-        // Forward to Anthropic API using h2 client
+        // Forward to Anthropic API over a pooled h2 connection
         const url_str = try std.fmt.allocPrint(self.allocator, "https://api.anthropic.com{s}", .{trimmed_path});
         defer self.allocator.free(url_str);
 
-        var client = h2.Client.init(self.allocator);
-        defer client.deinit();
+        // HTTP/2 header names are lowercase; hop-by-hop headers stay here
+        var arena = std.heap.ArenaAllocator.init(self.allocator);
+        defer arena.deinit();
+        var upstream_headers = std.ArrayList(h2.ExtraHeader){};
 
-        // Build extra headers for h2 client
-        var extra_headers_buf: [16]h2.ExtraHeader = undefined;
-        var extra_count: usize = 0;
-
-        // Add anthropic-version if missing
         var has_version = false;
         for (headers.items) |header| {
             if (std.ascii.eqlIgnoreCase(header.name, "anthropic-version")) {
@@ -159,150 +219,434 @@ pub const ProxyServer = struct {
             }
         }
         if (!has_version) {
-            extra_headers_buf[extra_count] = .{ .name = "anthropic-version", .value = "2023-06-01" };
-            extra_count += 1;
+            try upstream_headers.append(arena.allocator(), .{ .name = "anthropic-version", .value = "2023-06-01" });
         }
 
-        // Copy existing headers (skip Host and Content-Length)
         for (headers.items) |header| {
-            if (std.ascii.eqlIgnoreCase(header.name, "host")) continue;
-            if (std.ascii.eqlIgnoreCase(header.name, "content-length")) continue;
-            if (extra_count < extra_headers_buf.len) {
-                extra_headers_buf[extra_count] = .{ .name = header.name, .value = header.value };
-                extra_count += 1;
-            }
+            if (isHopByHop(header.name)) continue;
+            try upstream_headers.append(arena.allocator(), .{
+                .name = try std.ascii.allocLowerString(arena.allocator(), header.name),
+                .value = header.value,
+            });
         }
 
-        // Make POST request using h2 client
-        var h2_response = client.post(url_str, compressed_body, "application/json") catch |err| {
+        var relay = Relay{ .allocator = self.allocator, .stream = connection.stream };
+        defer relay.deinit();
+
+        const upstream_body: ?[]const u8 = if (compressed_body.len > 0) compressed_body else null;
+        self.forward(method, url_str, upstream_headers.items, upstream_body, &relay) catch |err| {
             std.debug.print("[PROXY] h2 request failed: {}\n", .{err});
-            const error_response = "HTTP/1.1 502 Bad Gateway\r\nContent-Type: application/json\r\nContent-Length: 26\r\n\r\n{\"error\":\"upstream_error\"}";
-            try connection.stream.writeAll(error_response);
+            if (!relay.head_sent) {
+                const error_response = "HTTP/1.1 502 Bad Gateway\r\nContent-Type: application/json\r\nContent-Length: 26\r\n\r\n{\"error\":\"upstream_error\"}";
+                try connection.stream.writeAll(error_response);
+            }
             return;
         };
-        defer h2_response.deinit();
 
-        var response_body = std.ArrayList(u8){};
-        defer response_body.deinit(self.allocator);
-        try response_body.appendSlice(self.allocator, h2_response.body);
+        std.debug.print("[PROXY] Response: {d} ({d}B{s})\n", .{ relay.status, relay.bytes, if (relay.usage.sse) ", streamed" else "" });
+        relay.usage.log();
+    }
 
-        const status = h2_response.status;
-        std.debug.print("[PROXY] Response: {d} ({d}B)\n", .{ status, response_body.items.len });
+    /// Send one request upstream, streaming the response into `relay`.
+    /// A pooled connection the server closed while idle is retried on a fresh
+    /// one, but only when the request's HEADERS never went out: once they
+    /// did, the server may already be acting on a non-idempotent POST.
+    fn forward(
+        self: *ProxyServer,
+        method: []const u8,
+        url: []const u8,
+        headers: []const h2.ExtraHeader,
+        body: ?[]const u8,
+        relay: *Relay,
+    ) !void {
+        while (true) {
+            const lease = try self.upstream.acquire();
+            var response = lease.client.requestStreaming(method, url, headers, body, relay.sink()) catch |err| {
+                self.upstream.discard(lease.client);
+                if (lease.reused and err == error.RequestNotSent) continue;
+                return err;
+            };
+            response.deinit();
+            self.upstream.release(lease.client);
+            return;
+        }
+    }
+};
+
+/// Request headers that describe this hop rather than the request
+fn isHopByHop(name: []const u8) bool {
+    const hop_by_hop = [_][]const u8{
+        "host",
+        "content-length",
+        "connection",
+        "keep-alive",
+        "proxy-connection",
+        "transfer-encoding",
+        "te",
+        "upgrade",
+        // Responses are relayed as-is, so ask upstream for identity encoding
+        "accept-encoding",
+    };
+    for (hop_by_hop) |h| {
+        if (std.ascii.eqlIgnoreCase(name, h)) return true;
+    }
+    return false;
+}
+
+/// Accepted connections handed from the accept loop to the workers (FIFO)
+const ConnectionQueue = struct {
+    mutex: std.Thread.Mutex = .{},
+    ready: std.Thread.Condition = .{},
+    items: [queue_capacity]std.net.Server.Connection = undefined,
+    head: usize = 0,
+    len: usize = 0,
+
+    /// Queue a connection for the next free worker; false when full
+    fn push(self: *ConnectionQueue, connection: std.net.Server.Connection) bool {
+        self.mutex.lock();
+        defer self.mutex.unlock();
+        if (self.len == self.items.len) return false;
+        self.items[(self.head + self.len) % self.items.len] = connection;
+        self.len += 1;
+        self.ready.signal();
+        return true;
+    }
+
+    /// Wait for the oldest queued connection
+    fn pop(self: *ConnectionQueue) std.net.Server.Connection {
+        self.mutex.lock();
+        defer self.mutex.unlock();
+        while (self.len == 0) self.ready.wait(&self.mutex);
+        const connection = self.items[self.head];
+        self.head = (self.head + 1) % self.items.len;
+        self.len -= 1;
+        return connection;
+    }
+};
+
+/// Idle h2 clients, each holding one HTTP/2 connection to the API.
+/// An h2 connection is driven by the thread waiting on it, so a client serves
+/// one request at a time: concurrent requests open more connections, and
+/// finished requests hand theirs back for the next one.
+const UpstreamPool = struct {
+    allocator: std.mem.Allocator,
+    mutex: std.Thread.Mutex = .{},
+    idle: std.ArrayList(*h2.Client) = .{},
+
+    /// Connections kept open beyond this many idle ones are closed
+    const max_idle = 16;
+
+    const Lease = struct {
+        client: *h2.Client,
+        /// Came from the pool (its connection may have gone stale)
+        reused: bool,
+    };
 
-        // Log error responses
-        if (status >= 400 and response_body.items.len > 0) {
-            const preview_len = @min(500, response_body.items.len);
-            std.debug.print("[PROXY] Error body: {s}\n", .{response_body.items[0..preview_len]});
+    fn init(allocator: std.mem.Allocator) UpstreamPool {
+        return .{ .allocator = allocator };
+    }
+
+    fn deinit(self: *UpstreamPool) void {
+        for (self.idle.items) |client| self.discard(client);
+        self.idle.deinit(self.allocator);
+    }
+
+    fn acquire(self: *UpstreamPool) !Lease {
+        {
+            self.mutex.lock();
+            defer self.mutex.unlock();
+            if (self.idle.pop()) |client| return .{ .client = client, .reused = true };
         }
+        const client = try self.allocator.create(h2.Client);
+        client.* = h2.Client.init(self.allocator);
+        return .{ .client = client, .reused = false };
+    }
 
-        // Extract and log token usage from response
-        if (response_body.items.len > 0) {
-            self.logTokenUsage(response_body.items);
+    fn release(self: *UpstreamPool, client: *h2.Client) void {
+        self.mutex.lock();
+        defer self.mutex.unlock();
+        if (self.idle.items.len < max_idle) {
+            if (self.idle.append(self.allocator, client)) return else |_| {}
         }
+        self.discard(client);
+    }
 
-        // Preserve actual status code from API
-        const status_text: []const u8 = switch (status) {
-            200 => "200 OK",
-            400 => "400 Bad Request",
-            401 => "401 Unauthorized",
-            403 => "403 Forbidden",
-            404 => "404 Not Found",
-            429 => "429 Too Many Requests",
-            500 => "500 Internal Server Error",
-            503 => "503 Service Unavailable",
-            else => "200 OK",
-        };
+    /// Close a client's connection (after an error, or when the pool is full)
+    fn discard(self: *UpstreamPool, client: *h2.Client) void {
+        client.deinit();
+        self.allocator.destroy(client);
+    }
+};
+
+/// Writes the upstream response to the client as it arrives: the status
+/// line and headers once they are in, then one chunk per DATA frame
+const Relay = struct {
+    allocator: std.mem.Allocator,
+    stream: std.net.Stream,
+    status: u16 = 0,
+    head_sent: bool = false,
+    /// The client went away; the rest of the response is dropped
+    failed: bool = false,
+    bytes: usize = 0,
+    out: std.ArrayList(u8) = .{},
+    usage: UsageScanner = .{},
+
+    fn deinit(self: *Relay) void {
+        self.out.deinit(self.allocator);
+        self.usage.deinit(self.allocator);
+    }
+
+    fn sink(self: *Relay) h2.BodySink {
+        return .{ .context = self, .writeFn = onData, .finishFn = onFinish, .headFn = onHead };
+    }
+
+    fn onHead(context: *anyopaque, status: u16, headers: []const h2.Header) void {
+        const self: *Relay = @ptrCast(@alignCast(context));
+        self.status = status;
+        self.head_sent = true;
+
+        self.out.clearRetainingCapacity();
+        self.out.print(self.allocator, "HTTP/1.1 {d} {s}\r\n", .{ status, reasonPhrase(status) }) catch return self.fail();
+        for (headers) |header| {
+            if (header.name.len == 0 or header.name[0] == ':') continue;
+            if (std.mem.eql(u8, header.name, "content-length") or
+                std.mem.eql(u8, header.name, "transfer-encoding") or
+                std.mem.eql(u8, header.name, "connection")) continue;
+            if (std.mem.eql(u8, header.name, "content-type")) {
+                self.usage.sse = std.mem.startsWith(u8, header.value, "text/event-stream");
+            }
+            self.out.print(self.allocator, "{s}: {s}\r\n", .{ header.name, header.value }) catch return self.fail();
+        }
+        self.out.appendSlice(self.allocator, "Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n") catch return self.fail();
+        self.flush();
+
+        if (status >= 400) std.debug.print("[PROXY] Upstream error status {d}\n", .{status});
+    }
+
+    fn onData(context: *anyopaque, data: []const u8) void {
+        const self: *Relay = @ptrCast(@alignCast(context));
+        if (data.len == 0) return;
+        self.bytes += data.len;
+        self.usage.feed(self.allocator, data);
+        if (self.failed) return;
+
+        // Size line, data and CRLF in one write: SSE events must not wait on Nagle
+        self.out.clearRetainingCapacity();
+        self.out.print(self.allocator, "{x}\r\n", .{data.len}) catch return self.fail();
+        self.out.appendSlice(self.allocator, data) catch return self.fail();
+        self.out.appendSlice(self.allocator, "\r\n") catch return self.fail();
+        self.flush();
+    }
+
+    fn onFinish(context: *anyopaque, status: ?u16) void {
+        _ = status;
+        const self: *Relay = @ptrCast(@alignCast(context));
+        self.out.clearRetainingCapacity();
+        self.out.appendSlice(self.allocator, "0\r\n\r\n") catch return self.fail();
+        self.flush();
+    }
+
+    fn flush(self: *Relay) void {
+        if (self.failed) return;
+        self.stream.writeAll(self.out.items) catch self.fail();
+    }
 
-        // Send response with gzip compression (disable with NO_GZIP=1)
-        const use_gzip = std.posix.getenv("NO_GZIP") == null;
-        if (use_gzip) {
-            const compressed_response = try gzip.compress(self.allocator, response_body.items);
-            defer self.allocator.free(compressed_response);
-
-            const response_header = try std.fmt.allocPrint(
-                self.allocator,
-                "HTTP/1.1 {s}\r\nContent-Type: application/json\r\nContent-Encoding: gzip\r\nContent-Length: {d}\r\n\r\n",
-                .{ status_text, compressed_response.len },
-            );
-            defer self.allocator.free(response_header);
-
-            try connection.stream.writeAll(response_header);
-            try connection.stream.writeAll(compressed_response);
-        } else {
-            const response_header = try std.fmt.allocPrint(
-                self.allocator,
-                "HTTP/1.1 {s}\r\nContent-Type: application/json\r\nContent-Length: {d}\r\n\r\n",
-                .{ status_text, response_body.items.len },
-            );
-            defer self.allocator.free(response_header);
-
-            try connection.stream.writeAll(response_header);
-            try connection.stream.writeAll(response_body.items);
+    fn fail(self: *Relay) void {
+        self.failed = true;
+    }
+};
+
+fn reasonPhrase(status: u16) []const u8 {
+    return switch (status) {
+        200 => "OK",
+        400 => "Bad Request",
+        401 => "Unauthorized",
+        403 => "Forbidden",
+        404 => "Not Found",
+        413 => "Payload Too Large",
+        429 => "Too Many Requests",
+        500 => "Internal Server Error",
+        502 => "Bad Gateway",
+        503 => "Service Unavailable",
+        504 => "Gateway Timeout",
+        529 => "Overloaded",
+        else => "",
+    };
+}
+
+/// Picks token usage out of a relayed response without keeping the body:
+/// SSE streams are scanned event by event (message_start carries the input
+/// count, message_delta the running output count), JSON bodies by their tail,
+/// where the Messages API puts "usage".
+const UsageScanner = struct {
+    sse: bool = false,
+    window: std.ArrayList(u8) = .{},
+    input_tokens: ?i64 = null,
+    output_tokens: ?i64 = null,
+
+    /// Bytes of a JSON body kept for the final scan
+    const json_tail = 4096;
+    /// Longer SSE events (large text deltas) are skipped, never usage
+    const max_event = 64 * 1024;
+
+    fn deinit(self: *UsageScanner, allocator: std.mem.Allocator) void {
+        self.window.deinit(allocator);
+    }
+
+    fn feed(self: *UsageScanner, allocator: std.mem.Allocator, data: []const u8) void {
+        self.window.appendSlice(allocator, data) catch {
+            self.window.clearRetainingCapacity();
+            return;
+        };
+        if (!self.sse) {
+            if (self.window.items.len > 2 * json_tail) self.dropFront(self.window.items.len - json_tail);
+            return;
         }
+        while (std.mem.indexOf(u8, self.window.items, "\n\n")) |end| {
+            self.scan(self.window.items[0..end]);
+            self.dropFront(end + 2);
+        }
+        if (self.window.items.len > max_event) self.window.clearRetainingCapacity();
     }
 
-    /// Extract and log token usage from API response
-    fn logTokenUsage(self: *ProxyServer, response_json: []const u8) void {
-        _ = self;
+    fn dropFront(self: *UsageScanner, n: usize) void {
+        const rest = self.window.items.len - n;
+        std.mem.copyForwards(u8, self.window.items[0..rest], self.window.items[n..]);
+        self.window.shrinkRetainingCapacity(rest);
+    }
 
-        // Look for "usage" in response
-        const usage_start = std.mem.indexOf(u8, response_json, "\"usage\"") orelse return;
+    fn scan(self: *UsageScanner, text: []const u8) void {
+        const usage_start = if (self.sse)
+            std.mem.indexOf(u8, text, "\"usage\"")
+        else
+            std.mem.lastIndexOf(u8, text, "\"usage\"");
+        const start = usage_start orelse return;
 
         // Find the closing brace for usage object
         var brace_depth: i32 = 0;
-        var usage_end: usize = usage_start;
+        var usage_end: usize = start;
         var in_usage = false;
 
-        for (response_json[usage_start..], 0..) |c, i| {
+        for (text[start..], 0..) |c, i| {
             if (c == '{') {
                 brace_depth += 1;
                 in_usage = true;
             } else if (c == '}') {
                 brace_depth -= 1;
                 if (in_usage and brace_depth == 0) {
-                    usage_end = usage_start + i + 1;
+                    usage_end = start + i + 1;
                     break;
                 }
             }
         }
 
-        if (usage_end <= usage_start) return;
-
-        const usage_section = response_json[usage_start..usage_end];
-
-        // Extract input_tokens
-        var input_tokens: ?i64 = null;
-        if (std.mem.indexOf(u8, usage_section, "\"input_tokens\"")) |pos| {
-            const after_key = usage_section[pos + 14 ..];
-            if (std.mem.indexOfScalar(u8, after_key, ':')) |colon| {
-                var i = colon + 1;
-                while (i < after_key.len and (after_key[i] == ' ' or after_key[i] == '\n')) : (i += 1) {}
-                var end = i;
-                while (end < after_key.len and after_key[end] >= '0' and after_key[end] <= '9') : (end += 1) {}
-                if (end > i) {
-                    input_tokens = std.fmt.parseInt(i64, after_key[i..end], 10) catch null;
-                }
-            }
-        }
+        if (usage_end <= start) return;
 
-        // Extract output_tokens
-        var output_tokens: ?i64 = null;
-        if (std.mem.indexOf(u8, usage_section, "\"output_tokens\"")) |pos| {
-            const after_key = usage_section[pos + 15 ..];
-            if (std.mem.indexOfScalar(u8, after_key, ':')) |colon| {
-                var i = colon + 1;
-                while (i < after_key.len and (after_key[i] == ' ' or after_key[i] == '\n')) : (i += 1) {}
-                var end = i;
-                while (end < after_key.len and after_key[end] >= '0' and after_key[end] <= '9') : (end += 1) {}
-                if (end > i) {
-                    output_tokens = std.fmt.parseInt(i64, after_key[i..end], 10) catch null;
-                }
-            }
+        const usage_section = text[start..usage_end];
+        if (usageField(usage_section, "\"input_tokens\"")) |n| {
+            if (self.input_tokens == null) self.input_tokens = n;
         }
+        if (usageField(usage_section, "\"output_tokens\"")) |n| self.output_tokens = n;
+    }
 
-        if (input_tokens != null or output_tokens != null) {
-            const total = (input_tokens orelse 0) + (output_tokens orelse 0);
-            std.debug.print("[TOKENS] In: {?d} | Out: {?d} | Total: {d}\n", .{ input_tokens, output_tokens, total });
+    /// Log token usage of the finished response
+    fn log(self: *UsageScanner) void {
+        if (!self.sse) self.scan(self.window.items);
+        if (self.input_tokens != null or self.output_tokens != null) {
+            const total = (self.input_tokens orelse 0) + (self.output_tokens orelse 0);
+            std.debug.print("[TOKENS] In: {?d} | Out: {?d} | Total: {d}\n", .{ self.input_tokens, self.output_tokens, total });
         }
     }
 };
+
+/// Integer value of `key` (quoted) in a usage object
+fn usageField(usage_section: []const u8, key: []const u8) ?i64 {
+    const pos = std.mem.indexOf(u8, usage_section, key) orelse return null;
+    const after_key = usage_section[pos + key.len ..];
+    const colon = std.mem.indexOfScalar(u8, after_key, ':') orelse return null;
+    var i = colon + 1;
+    while (i < after_key.len and (after_key[i] == ' ' or after_key[i] == '\n')) : (i += 1) {}
+    var end = i;
+    while (end < after_key.len and after_key[end] >= '0' and after_key[end] <= '9') : (end += 1) {}
+    if (end == i) return null;
+    return std.fmt.parseInt(i64, after_key[i..end], 10) catch null;
+}
+
+test "usage from SSE events and JSON tails" {
+    const allocator = std.testing.allocator;
+
+    var sse = UsageScanner{ .sse = true };
+    defer sse.deinit(allocator);
+    sse.feed(allocator, "event: message_start\ndata: {\"message\":{\"usage\":{\"input_tokens\":25,\"output_tokens\":1}}}\n\nevent: message_de");
+    sse.feed(allocator, "lta\ndata: {\"usage\":{\"output_tokens\":15}}\n\n");
+    try std.testing.expectEqual(@as(?i64, 25), sse.input_tokens);
+    try std.testing.expectEqual(@as(?i64, 15), sse.output_tokens);
+
+    var json = UsageScanner{};
+    defer json.deinit(allocator);
+    json.feed(allocator, "{\"content\":[{\"text\":\"" ++ "x" ** 9000 ++ "\"}],");
+    json.feed(allocator, "\"usage\":{\"input_tokens\":7,\"output_tokens\":3}}");
+    json.scan(json.window.items);
+    try std.testing.expectEqual(@as(?i64, 7), json.input_tokens);
+    try std.testing.expectEqual(@as(?i64, 3), json.output_tokens);
+}
+
+test "connection queue hands out connections in order until full" {
+    var queue = ConnectionQueue{};
+    const address = try std.net.Address.parseIp("127.0.0.1", 0);
+
+    for (0..queue_capacity) |i| {
+        try std.testing.expect(queue.push(.{ .stream = .{ .handle = @intCast(i) }, .address = address }));
+    }
+    try std.testing.expect(!queue.push(.{ .stream = .{ .handle = 0 }, .address = address }));
+
+    try std.testing.expectEqual(@as(std.posix.socket_t, 0), queue.pop().stream.handle);
+    try std.testing.expectEqual(@as(std.posix.socket_t, 1), queue.pop().stream.handle);
+    // A freed slot is reused at the back of the ring
+    try std.testing.expect(queue.push(.{ .stream = .{ .handle = 7 }, .address = address }));
+    try std.testing.expectEqual(queue_capacity - 1, queue.len);
+}
+
+test "relay frames the response as HTTP/1.1 chunks" {
+    const allocator = std.testing.allocator;
+
+    const address = try std.net.Address.parseIp("127.0.0.1", 0);
+    var server = try address.listen(.{});
+    defer server.deinit();
+    const client = try std.net.tcpConnectToAddress(server.listen_address);
+    defer client.close();
+    const accepted = try server.accept();
+    defer accepted.stream.close();
+
+    var relay = Relay{ .allocator = allocator, .stream = accepted.stream };
+    defer relay.deinit();
+    const sink = relay.sink();
+    sink.head(200, &.{
+        .{ .name = ":status", .value = "200" },
+        .{ .name = "content-type", .value = "text/event-stream" },
+        .{ .name = "content-length", .value = "39" },
+    });
+    sink.write("event: ping\n\n");
+    sink.write("");
+    sink.write("x" ** 26);
+    sink.finish(200);
+
+    // Pseudo-headers and the upstream framing headers are replaced by chunking;
+    // empty DATA frames must not emit the terminating zero-size chunk early
+    const expected = "HTTP/1.1 200 OK\r\ncontent-type: text/event-stream\r\n" ++
+        "Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n" ++
+        "d\r\nevent: ping\n\n\r\n" ++
+        "1a\r\n" ++ "x" ** 26 ++ "\r\n" ++
+        "0\r\n\r\n";
+    var received: [expected.len]u8 = undefined;
+    var got: usize = 0;
+    while (got < received.len) {
+        const n = try client.read(received[got..]);
+        if (n == 0) break;
+        got += n;
+    }
+    try std.testing.expectEqualStrings(expected, received[0..got]);
+    try std.testing.expect(relay.head_sent);
+    try std.testing.expect(relay.usage.sse);
+    try std.testing.expectEqual(@as(usize, 39), relay.bytes);
+}
@@ -439,3 +439,100 @@ test "single message returns original" {
     // Single user message = last user message = can't compress = original
     try std.testing.expectEqualStrings(request, result);
 }
+
+/// Three-message conversation whose history spans several image chunks
+fn longConversation(allocator: std.mem.Allocator) ![]u8 {
+    var request = std.ArrayList(u8){};
+    errdefer request.deinit(allocator);
+    try request.appendSlice(allocator, "{\"model\":\"claude-3-5-sonnet-20241022\",\"max_tokens\":100,\"messages\":[{\"role\":\"user\",\"content\":\"");
+    for (0..300) |i| try request.print(allocator, "line {d} of the build log: compiling module {d}\\n", .{ i, i * 7 });
+    try request.appendSlice(allocator, "\"},{\"role\":\"assistant\",\"content\":\"");
+    for (0..100) |i| try request.print(allocator, "Step {d} looks fine. ", .{i});
+    try request.appendSlice(allocator, "\"},{\"role\":\"user\",\"content\":\"What failed?\"}]}");
+    return request.toOwnedSlice(allocator);
+}
+
+// Test cached renders give the same request, rendered once
+test "render cache reuses chunks across requests" {
+    const allocator = std.testing.allocator;
+
+    const request = try longConversation(allocator);
+    defer allocator.free(request);
+
+    var uncached = compress.TextCompressor.init(allocator, true);
+    const expected = try uncached.compressRequest(request);
+    defer allocator.free(expected);
+
+    var cache = compress.RenderCache.init(allocator, 64 * 1024 * 1024);
+    defer cache.deinit();
+    var compressor = compress.TextCompressor.init(allocator, true);
+    compressor.cache = &cache;
+
+    const first = try compressor.compressRequest(request);
+    defer allocator.free(first);
+    const chunks = cache.entries.count();
+    try std.testing.expect(chunks >= 2);
+    try std.testing.expectEqual(@as(u64, 0), cache.hits);
+
+    const second = try compressor.compressRequest(request);
+    defer allocator.free(second);
+    try std.testing.expectEqual(@as(u64, chunks), cache.hits);
+
+    try std.testing.expectEqualStrings(expected, first);
+    try std.testing.expectEqualStrings(expected, second);
+}
+
+// Test the cache stays within its byte budget
+test "render cache evicts least recently used" {
+    const allocator = std.testing.allocator;
+
+    const request = try longConversation(allocator);
+    defer allocator.free(request);
+
+    var full = compress.RenderCache.init(allocator, 64 * 1024 * 1024);
+    defer full.deinit();
+    var compressor = compress.TextCompressor.init(allocator, true);
+    compressor.cache = &full;
+    allocator.free(try compressor.compressRequest(request));
+
+    var small = compress.RenderCache.init(allocator, full.bytes - 1);
+    defer small.deinit();
+    compressor.cache = &small;
+    allocator.free(try compressor.compressRequest(request));
+
+    try std.testing.expect(small.bytes <= small.max_bytes);
+    try std.testing.expect(small.entries.count() < full.entries.count());
+}
+
+// Test requests rendered concurrently on a shared pool match sequential rendering
+test "render pool matches sequential rendering" {
+    const allocator = std.testing.allocator;
+
+    const request = try longConversation(allocator);
+    defer allocator.free(request);
+
+    var sequential = compress.TextCompressor.init(allocator, true);
+    const expected = try sequential.compressRequest(request);
+    defer allocator.free(expected);
+
+    const pool = try compress.RenderPool.init(allocator, 3);
+    defer pool.deinit();
+    var compressor = compress.TextCompressor.init(allocator, true);
+    compressor.pool = pool;
+
+    const Client = struct {
+        fn run(c: compress.TextCompressor, req: []const u8, out: *?[]const u8) void {
+            out.* = c.compressRequest(req) catch null;
+        }
+    };
+    var results: [2]?[]const u8 = .{ null, null };
+    var threads: [2]std.Thread = undefined;
+    for (&threads, &results) |*t, *out| t.* = try std.Thread.spawn(.{}, Client.run, .{ compressor, request, out });
+    for (threads) |t| t.join();
+
+    for (results) |result| {
+        const r = result orelse return error.TestUnexpectedResult;
+        defer allocator.free(r);
+        try std.testing.expectEqualStrings(expected, r);
+    }
+}
@@ -12,7 +12,8 @@ const ROOT_STATE_IDX: u32 = 0;
 const BLOCK_LEN: u32 = 256;
 
 /// State struct - port of daachorse::State
-pub const State = struct {
+/// extern: states are used in place from mmap'd binary_format files
+pub const State = extern struct {
     /// Base offset for XOR-based child indexing (0 = no children)
     base: u32 = 0,
     /// Check byte (validates transition)
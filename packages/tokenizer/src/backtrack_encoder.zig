@@ -18,208 +18,218 @@ pub const PairContext = struct {
     }
 };
 
+pub const PairMap = std.HashMap(Pair, u32, FnvHashContext(Pair), std.hash_map.default_max_load_percentage);
+
 /// Port of rs-bpe BacktrackEncoder struct
-pub const BacktrackEncoder = struct {
-    allocator: Allocator,
-    result_allocator: Allocator, // Allocator for final result (arena vs permanent)
-    text: []const u8,
-    tokens: std.ArrayList(u32),
-    next_token: ?u32,
-    pos: usize,
-    bitfield: BitField,
-    bitfield_pool_node: ?*BitFieldPool.Node, // Pool node for releasing
-
-    // BPE data
-    aho_corasick: *const AhoCorasick,
-    vocab_r: *const std.AutoHashMap(u32, []const u8),
-    split_table: []const Pair,
-    pair_lookup: *const std.HashMap(Pair, u32, FnvHashContext(Pair), std.hash_map.default_max_load_percentage),
-    next_prefix_match: []const u32, // Precomputed prefix table
-
-    /// Port of rs-bpe::new() with arena allocator for temporary allocations
-    /// arena: Used for BitField and temporary ArrayList allocations
-    /// result_allocator: Used for final result slice
-    pub fn initArena(
-        arena: Allocator,
-        result_allocator: Allocator,
-        text: []const u8,
-        aho_corasick: *const AhoCorasick,
-        vocab_r: *const std.AutoHashMap(u32, []const u8),
-        split_table: []const Pair,
-        pair_lookup: *const std.HashMap(Pair, u32, FnvHashContext(Pair), std.hash_map.default_max_load_percentage),
-        next_prefix_match: []const u32,
-    ) !BacktrackEncoder {
-        var tokens = std.ArrayList(u32){};
-        try tokens.ensureTotalCapacity(arena, text.len / 3);
-
-        // bpe.next_match(text) (line 31)
-        const first_token = aho_corasick.longestMatch(text, 0);
-
-        // Get BitField from pool
-        var bf_node = BitFieldPool.get(arena);
-
-        // Resize if needed
-        const needed_size = text.len + 1;
-        if (bf_node.data.capacity < needed_size) {
-            // Need larger BitField - reallocate
-            bf_node.data.deinit();
-            bf_node.data = try BitField.init(bf_node.allocator, needed_size);
-        } else {
-            // Reuse existing - just reset
-            bf_node.data.reset();
-        }
+pub const BacktrackEncoder = BacktrackEncoderOver(std.AutoHashMap(u32, []const u8), PairMap);
 
-        return BacktrackEncoder{
-            .allocator = arena,
-            .result_allocator = result_allocator,
-            .text = text,
-            .tokens = tokens,
-            .next_token = first_token,
-            .pos = 0,
-            .bitfield = bf_node.data,
-            .bitfield_pool_node = bf_node,
-            .aho_corasick = aho_corasick,
-            .vocab_r = vocab_r,
-            .split_table = split_table,
-            .pair_lookup = pair_lookup,
-            .next_prefix_match = next_prefix_match,
-        };
-    }
+/// Same encoder over any vocab_r / pair_lookup tables with a HashMap-style
+/// get() (e.g. the mmap'd tables in binary_format.zig)
+pub fn BacktrackEncoderOver(comptime VocabR: type, comptime PairLookup: type) type {
+    return struct {
+        const Self = @This();
 
-    /// Port of rs-bpe::new() (line 22-34)
-    pub fn init(
         allocator: Allocator,
+        result_allocator: Allocator, // Allocator for final result (arena vs permanent)
         text: []const u8,
+        tokens: std.ArrayList(u32),
+        next_token: ?u32,
+        pos: usize,
+        bitfield: BitField,
+        bitfield_pool_node: ?*BitFieldPool.Node, // Pool node for releasing
+
+        // BPE data
         aho_corasick: *const AhoCorasick,
-        vocab_r: *const std.AutoHashMap(u32, []const u8),
+        vocab_r: *const VocabR,
         split_table: []const Pair,
-        pair_lookup: *const std.HashMap(Pair, u32, FnvHashContext(Pair), std.hash_map.default_max_load_percentage),
-        next_prefix_match: []const u32,
-    ) !BacktrackEncoder {
-        var tokens = std.ArrayList(u32){};
-        try tokens.ensureTotalCapacity(allocator, text.len / 3);
-
-        // bpe.next_match(text) (line 31)
-        const first_token = aho_corasick.longestMatch(text, 0);
-
-        // Get BitField from pool
-        var bf_node = BitFieldPool.get(allocator);
-
-        // Resize if needed
-        const needed_size = text.len + 1;
-        if (bf_node.data.capacity < needed_size) {
-            // Need larger BitField - reallocate
-            bf_node.data.deinit();
-            bf_node.data = try BitField.init(bf_node.allocator, needed_size);
-        } else {
-            // Reuse existing - just reset
-            bf_node.data.reset();
+        pair_lookup: *const PairLookup,
+        next_prefix_match: []const u32, // Precomputed prefix table
+
+        /// Port of rs-bpe::new() with arena allocator for temporary allocations
+        /// arena: Used for BitField and temporary ArrayList allocations
+        /// result_allocator: Used for final result slice
+        pub fn initArena(
+            arena: Allocator,
+            result_allocator: Allocator,
+            text: []const u8,
+            aho_corasick: *const AhoCorasick,
+            vocab_r: *const VocabR,
+            split_table: []const Pair,
+            pair_lookup: *const PairLookup,
+            next_prefix_match: []const u32,
+        ) !Self {
+            var tokens = std.ArrayList(u32){};
+            try tokens.ensureTotalCapacity(arena, text.len / 3);
+
+            // bpe.next_match(text) (line 31)
+            const first_token = aho_corasick.longestMatch(text, 0);
+
+            // Get BitField from pool
+            var bf_node = BitFieldPool.get(arena);
+
+            // Resize if needed
+            const needed_size = text.len + 1;
+            if (bf_node.data.capacity < needed_size) {
+                // Need larger BitField - reallocate
+                bf_node.data.deinit();
+                bf_node.data = try BitField.init(bf_node.allocator, needed_size);
+            } else {
+                // Reuse existing - just reset
+                bf_node.data.reset();
+            }
+
+            return Self{
+                .allocator = arena,
+                .result_allocator = result_allocator,
+                .text = text,
+                .tokens = tokens,
+                .next_token = first_token,
+                .pos = 0,
+                .bitfield = bf_node.data,
+                .bitfield_pool_node = bf_node,
+                .aho_corasick = aho_corasick,
+                .vocab_r = vocab_r,
+                .split_table = split_table,
+                .pair_lookup = pair_lookup,
+                .next_prefix_match = next_prefix_match,
+            };
         }
 
-        return BacktrackEncoder{
-            .allocator = allocator,
-            .result_allocator = allocator,
-            .text = text,
-            .tokens = tokens,
-            .next_token = first_token,
-            .pos = 0,
-            .bitfield = bf_node.data,
-            .bitfield_pool_node = bf_node,
-            .aho_corasick = aho_corasick,
-            .vocab_r = vocab_r,
-            .split_table = split_table,
-            .pair_lookup = pair_lookup,
-            .next_prefix_match = next_prefix_match,
-        };
-    }
+        /// Port of rs-bpe::new() (line 22-34)
+        pub fn init(
+            allocator: Allocator,
+            text: []const u8,
+            aho_corasick: *const AhoCorasick,
+            vocab_r: *const VocabR,
+            split_table: []const Pair,
+            pair_lookup: *const PairLookup,
+            next_prefix_match: []const u32,
+        ) !Self {
+            var tokens = std.ArrayList(u32){};
+            try tokens.ensureTotalCapacity(allocator, text.len / 3);
+
+            // bpe.next_match(text) (line 31)
+            const first_token = aho_corasick.longestMatch(text, 0);
+
+            // Get BitField from pool
+            var bf_node = BitFieldPool.get(allocator);
+
+            // Resize if needed
+            const needed_size = text.len + 1;
+            if (bf_node.data.capacity < needed_size) {
+                // Need larger BitField - reallocate
+                bf_node.data.deinit();
+                bf_node.data = try BitField.init(bf_node.allocator, needed_size);
+            } else {
+                // Reuse existing - just reset
+                bf_node.data.reset();
+            }
 
-    pub fn deinit(self: *BacktrackEncoder) void {
-        self.tokens.deinit(self.allocator);
-        // Return BitField to pool instead of freeing
-        if (self.bitfield_pool_node) |node| {
-            BitFieldPool.release(node);
+            return Self{
+                .allocator = allocator,
+                .result_allocator = allocator,
+                .text = text,
+                .tokens = tokens,
+                .next_token = first_token,
+                .pos = 0,
+                .bitfield = bf_node.data,
+                .bitfield_pool_node = bf_node,
+                .aho_corasick = aho_corasick,
+                .vocab_r = vocab_r,
+                .split_table = split_table,
+                .pair_lookup = pair_lookup,
+                .next_prefix_match = next_prefix_match,
+            };
         }
-    }
 
-    /// Port of rs-bpe step() (lines 37-70)
-    pub fn step(self: *BacktrackEncoder) ?u32 {
-        @setRuntimeSafety(false);
-        var token = self.next_token orelse return null;
-        const last = if (self.tokens.items.len > 0) self.tokens.items[self.tokens.items.len - 1] else null;
-
-        while (true) {
-            const token_len = self.tokenLen(token);
-            const end_pos = self.pos + token_len;
-
-            // Check: bitfield.is_set(end_pos) && is_valid_token_pair(last, token)
-            const bitfield_ok = self.bitfield.isSet(end_pos);
-            const pair_ok = if (last) |last_token|
-                isValidTokenPairImpl(self.pair_lookup, self.split_table, last_token, token)
-            else
-                true;
-
-            if (bitfield_ok and pair_ok) {
-                // Valid path - accept token
-                self.tokens.append(self.allocator, token) catch return null;
-                self.pos = end_pos;
-                self.next_token = self.aho_corasick.longestMatch(self.text, end_pos);
-                break;
-            } else if (self.nextPrefix(token)) |shorter| {
-                // Try shorter token
-                token = shorter;
-            } else {
-                // Backtrack
-                self.bitfield.clear(self.pos);
-                if (self.tokens.items.len > 0) {
-                    _ = self.tokens.pop();
-                    self.pos -= if (last) |t| self.tokenLen(t) else 0;
-                    self.next_token = last;
+        pub fn deinit(self: *Self) void {
+            self.tokens.deinit(self.allocator);
+            // Return BitField to pool instead of freeing
+            if (self.bitfield_pool_node) |node| {
+                BitFieldPool.release(node);
+            }
+        }
+
+        /// Port of rs-bpe step() (lines 37-70)
+        pub fn step(self: *Self) ?u32 {
+            @setRuntimeSafety(false);
+            var token = self.next_token orelse return null;
+            const last = if (self.tokens.items.len > 0) self.tokens.items[self.tokens.items.len - 1] else null;
+
+            while (true) {
+                const token_len = self.tokenLen(token);
+                const end_pos = self.pos + token_len;
+
+                // Check: bitfield.is_set(end_pos) && is_valid_token_pair(last, token)
+                const bitfield_ok = self.bitfield.isSet(end_pos);
+                const pair_ok = if (last) |last_token|
+                    isValidTokenPairImpl(self.pair_lookup, self.split_table, last_token, token)
+                else
+                    true;
+
+                if (bitfield_ok and pair_ok) {
+                    // Valid path - accept token
+                    self.tokens.append(self.allocator, token) catch return null;
+                    self.pos = end_pos;
+                    self.next_token = self.aho_corasick.longestMatch(self.text, end_pos);
+                    break;
+                } else if (self.nextPrefix(token)) |shorter| {
+                    // Try shorter token
+                    token = shorter;
                 } else {
-                    // No tokens to backtrack - we're stuck, give up
-                    self.next_token = null;
+                    // Backtrack
+                    self.bitfield.clear(self.pos);
+                    if (self.tokens.items.len > 0) {
+                        _ = self.tokens.pop();
+                        self.pos -= if (last) |t| self.tokenLen(t) else 0;
+                        self.next_token = last;
+                    } else {
+                        // No tokens to backtrack - we're stuck, give up
+                        self.next_token = null;
+                    }
+                    break;
                 }
-                break;
             }
-        }
 
-        return self.next_token;
-    }
+            return self.next_token;
+        }
 
-    /// Encode full text (call step() until done)
-    pub fn encode(self: *BacktrackEncoder) ![]u32 {
-        @setRuntimeSafety(false);
-        while (self.step()) |_| {}
+        /// Encode full text (call step() until done)
+        pub fn encode(self: *Self) ![]u32 {
+            @setRuntimeSafety(false);
+            while (self.step()) |_| {}
 
-        // Copy result to result_allocator (important when using arena)
-        const result = try self.result_allocator.alloc(u32, self.tokens.items.len);
-        @memcpy(result, self.tokens.items);
-        return result;
-    }
+            // Copy result to result_allocator (important when using arena)
+            const result = try self.result_allocator.alloc(u32, self.tokens.items.len);
+            @memcpy(result, self.tokens.items);
+            return result;
+        }
 
-    /// Get token length in bytes (port of bpe.token_len)
-    fn tokenLen(self: *const BacktrackEncoder, token: u32) usize {
-        if (self.vocab_r.get(token)) |bytes| {
-            return bytes.len;
+        /// Get token length in bytes (port of bpe.token_len)
+        fn tokenLen(self: *const Self, token: u32) usize {
+            if (self.vocab_r.get(token)) |bytes| {
+                return bytes.len;
+            }
+            return 1; // Single byte fallback
         }
-        return 1; // Single byte fallback
-    }
 
-    /// Port of bpe.next_prefix - EXACT COPY from rs-bpe
-    /// Returns precomputed next shorter prefix match
-    fn nextPrefix(self: *const BacktrackEncoder, token: u32) ?u32 {
-        const prefix = self.next_prefix_match[token];
-        if (prefix == std.math.maxInt(u32)) {
-            return null;
-        } else {
-            return prefix;
+        /// Port of bpe.next_prefix - EXACT COPY from rs-bpe
+        /// Returns precomputed next shorter prefix match
+        fn nextPrefix(self: *const Self, token: u32) ?u32 {
+            const prefix = self.next_prefix_match[token];
+            if (prefix == std.math.maxInt(u32)) {
+                return null;
+            } else {
+                return prefix;
+            }
         }
-    }
-};
+    };
+}
 
 /// EXACT PORT of rs-bpe is_valid_token_pair (from byte_pair_encoding.rs lines 112-148)
 /// Returns true if token1 followed by token2 is a valid BPE encoding path
 fn isValidTokenPairImpl(
-    pair_lookup: *const std.HashMap(Pair, u32, FnvHashContext(Pair), std.hash_map.default_max_load_percentage),
+    pair_lookup: anytype,
     split_table: []const Pair,
     token1_arg: u32,
     token2_arg: u32,
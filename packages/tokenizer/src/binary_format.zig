@@ -0,0 +1,511 @@
+/// Versioned binary tokenizer format (.mtok)
+/// Holds everything encode/decode need - token bytes, vocab index, merge
+/// ranks, split table, next_prefix_match and the Aho-Corasick automaton - as
+/// little-endian arrays at 8-byte aligned offsets, so a mapped file is used
+/// in place: no JSON, no base64, no hash map rebuilds, no allocation.
+///
+/// Layout: Header, then one section per Section tag at header.sections[tag].
+/// Convert a tokenizer.json with `zig build tokenizer-convert -- in.json out.mtok`.
+const std = @import("std");
+const builtin = @import("builtin");
+const Allocator = std.mem.Allocator;
+const Tokenizer = @import("tokenizer.zig").Tokenizer;
+const aho = @import("aho_corasick.zig");
+const AhoCorasick = aho.AhoCorasick;
+const helpers = @import("tokenizer_helpers.zig");
+const Pair = helpers.Pair;
+const StackEncoder = @import("stack_encoder.zig");
+const BacktrackEncoderOver = @import("backtrack_encoder.zig").BacktrackEncoderOver;
+const cl100k_splitter = @import("cl100k_splitter.zig");
+const gpt2_splitter = @import("gpt2_splitter.zig");
+const BatchEncoding = @import("tokenizer_batch.zig").BatchEncoding;
+
+pub const MAGIC: [4]u8 = .{ 'M', 'T', 'O', 'K' };
+/// 2: the pattern section names the splitter encode() actually uses
+pub const VERSION: u32 = 2;
+
+/// Marks an empty slot in the open-addressing indexes
+const EMPTY: u32 = std.math.maxInt(u32);
+
+pub const Section = enum(u32) {
+    token_offsets, // u32[vocab_size + 1] into token_bytes
+    token_bytes, // u8[]
+    vocab_index, // u32[power of two], token id or EMPTY, keyed by bytes
+    pair_index, // PairEntry[power of two], keyed by (left, right)
+    split_table, // Pair[vocab_size]
+    next_prefix_match, // u32[vocab_size]
+    ac_states, // aho_corasick.State[]
+    ac_outputs, // u32[]
+    single_byte_tokens, // u32[256]
+    pattern, // u8[] pre-tokenizer pattern (one of the Splitter patterns)
+};
+
+/// Pre-tokenizer named by the pattern section
+pub const Splitter = enum {
+    cl100k,
+    gpt2,
+
+    pub fn fromPattern(pattern: []const u8) ?Splitter {
+        if (std.mem.eql(u8, pattern, cl100k_splitter.pattern)) return .cl100k;
+        if (std.mem.eql(u8, pattern, gpt2_splitter.pattern)) return .gpt2;
+        return null;
+    }
+};
+
+const section_count = @typeInfo(Section).@"enum".fields.len;
+
+pub const SectionRef = extern struct {
+    offset: u64,
+    len: u64, // element count
+};
+
+pub const Header = extern struct {
+    magic: [4]u8,
+    version: u32,
+    vocab_size: u32,
+    _reserved: u32 = 0,
+    sections: [section_count]SectionRef,
+};
+
+/// Merge rank entry: pair (left, right) merges into `merged`
+pub const PairEntry = extern struct {
+    left: u32,
+    right: u32,
+    merged: u32,
+    _pad: u32 = 0,
+};
+
+fn ElementType(comptime section: Section) type {
+    return switch (section) {
+        .token_bytes, .pattern => u8,
+        .pair_index => PairEntry,
+        .split_table => Pair,
+        .ac_states => aho.State,
+        else => u32,
+    };
+}
+
+/// Token id -> bytes over the mapped offsets/bytes sections
+/// Same get() shape as std.AutoHashMap(u32, []const u8)
+pub const TokenTable = struct {
+    offsets: []const u32,
+    bytes: []const u8,
+
+    pub fn get(self: *const TokenTable, id: u32) ?[]const u8 {
+        if (@as(usize, id) + 1 >= self.offsets.len) return null;
+        const start = self.offsets[id];
+        const end = self.offsets[id + 1];
+        if (start == end) return null;
+        return self.bytes[start..end];
+    }
+};
+
+/// (left, right) -> merged token over the mapped pair index
+/// Same get() shape as the tokenizer's merges_map
+pub const PairTable = struct {
+    entries: []const PairEntry,
+
+    pub fn get(self: *const PairTable, pair: Pair) ?u32 {
+        if (self.entries.len == 0) return null;
+        const mask = self.entries.len - 1;
+        var slot: usize = @intCast(pair.hash() & mask);
+        while (true) : (slot = (slot + 1) & mask) {
+            const entry = self.entries[slot];
+            if (entry.merged == EMPTY) return null;
+            if (entry.left == pair.left and entry.right == pair.right) return entry.merged;
+        }
+    }
+};
+
+fn bytesHash(bytes: []const u8) u64 {
+    return std.hash.Wyhash.hash(0, bytes);
+}
+
+/// Validated view over a serialized tokenizer (mapped file or any buffer)
+pub const View = struct {
+    vocab_size: u32,
+    tokens: TokenTable,
+    vocab_index: []const u32,
+    pairs: PairTable,
+    split_table: []Pair,
+    next_prefix_match: []u32,
+    aho_corasick: AhoCorasick,
+    single_byte_tokens: *const [256]u32,
+    pattern: []const u8,
+
+    /// Checks magic, version and section bounds; no copying
+    /// `bytes` must stay alive (and unmodified) as long as the view is used.
+    pub fn init(bytes: []align(8) u8) !View {
+        if (builtin.cpu.arch.endian() != .little) return error.UnsupportedEndian;
+        if (bytes.len < @sizeOf(Header)) return error.InvalidFormat;
+        const header: *const Header = @ptrCast(bytes.ptr);
+        if (!std.mem.eql(u8, &header.magic, &MAGIC)) return error.InvalidFormat;
+        if (header.version != VERSION) return error.UnsupportedVersion;
+
+        const view = View{
+            .vocab_size = header.vocab_size,
+            .tokens = .{
+                .offsets = try section(bytes, header, .token_offsets),
+                .bytes = try section(bytes, header, .token_bytes),
+            },
+            .vocab_index = try section(bytes, header, .vocab_index),
+            .pairs = .{ .entries = try section(bytes, header, .pair_index) },
+            .split_table = try section(bytes, header, .split_table),
+            .next_prefix_match = try section(bytes, header, .next_prefix_match),
+            .aho_corasick = .{
+                .states = try section(bytes, header, .ac_states),
+                .outputs = try section(bytes, header, .ac_outputs),
+                .allocator = std.heap.page_allocator, // Never freed: owned by the mapping
+            },
+            .single_byte_tokens = (try section(bytes, header, .single_byte_tokens))[0..256],
+            .pattern = try section(bytes, header, .pattern),
+        };
+
+        // Indexes are probed with a mask; token offsets must stay in bounds
+        if (view.tokens.offsets.len != @as(usize, view.vocab_size) + 1) return error.InvalidFormat;
+        if (view.tokens.offsets[view.vocab_size] > view.tokens.bytes.len) return error.InvalidFormat;
+        for (view.tokens.offsets[0..view.vocab_size], view.tokens.offsets[1..]) |start, end| {
+            if (start > end) return error.InvalidFormat;
+        }
+        if (!isPowerOfTwoOrZero(view.vocab_index.len) or !isPowerOfTwoOrZero(view.pairs.entries.len)) return error.InvalidFormat;
+        if (view.split_table.len < view.vocab_size or view.next_prefix_match.len < view.vocab_size) return error.InvalidFormat;
+        if (view.aho_corasick.states.len == 0) return error.InvalidFormat;
+        return view;
+    }
+
+    fn section(bytes: []align(8) u8, header: *const Header, comptime tag: Section) ![]ElementType(tag) {
+        const T = ElementType(tag);
+        const ref = header.sections[@intFromEnum(tag)];
+        const size = std.math.mul(u64, ref.len, @sizeOf(T)) catch return error.InvalidFormat;
+        const end = std.math.add(u64, ref.offset, size) catch return error.InvalidFormat;
+        if (end > bytes.len or ref.offset % 8 != 0) return error.InvalidFormat;
+        if (tag == .single_byte_tokens and ref.len != 256) return error.InvalidFormat;
+        const start: usize = @intCast(ref.offset);
+        const ptr: [*]T = @ptrCast(@alignCast(bytes.ptr + start));
+        return ptr[0..@intCast(ref.len)];
+    }
+
+    /// Bytes of a token id (reverse vocab)
+    pub fn tokenBytes(self: *const View, id: u32) ?[]const u8 {
+        return self.tokens.get(id);
+    }
+
+    /// Token id of exact bytes (vocab)
+    pub fn tokenId(self: *const View, bytes: []const u8) ?u32 {
+        if (self.vocab_index.len == 0) return null;
+        const mask = self.vocab_index.len - 1;
+        var slot: usize = @intCast(bytesHash(bytes) & mask);
+        while (true) : (slot = (slot + 1) & mask) {
+            const id = self.vocab_index[slot];
+            if (id == EMPTY) return null;
+            if (self.tokens.get(id)) |candidate| {
+                if (std.mem.eql(u8, candidate, bytes)) return id;
+            }
+        }
+    }
+};
+
+fn isPowerOfTwoOrZero(n: usize) bool {
+    return n & (n -% 1) == 0;
+}
+
+/// Index size with load factor <= 1/2
+fn indexSlots(count: usize) usize {
+    if (count == 0) return 0;
+    return std.math.ceilPowerOfTwoAssert(usize, count * 2);
+}
+
+/// Serialize a loaded tokenizer; caller frees the returned buffer
+pub fn serialize(allocator: Allocator, tok: *const Tokenizer) ![]align(8) u8 {
+    const ac = tok.aho_corasick orelse return error.MissingAutomaton;
+
+    var vocab_size: u32 = 0;
+    var token_bytes_len: usize = 0;
+    var it = tok.vocab_r.iterator();
+    while (it.next()) |entry| {
+        vocab_size = @max(vocab_size, entry.key_ptr.* + 1);
+        token_bytes_len += entry.value_ptr.len;
+    }
+
+    const vocab_slots = indexSlots(tok.vocab_r.count());
+    const pair_slots = indexSlots(tok.merges_map.count());
+
+    var lens: [section_count]u64 = undefined;
+    lens[@intFromEnum(Section.token_offsets)] = @as(u64, vocab_size) + 1;
+    lens[@intFromEnum(Section.token_bytes)] = token_bytes_len;
+    lens[@intFromEnum(Section.vocab_index)] = vocab_slots;
+    lens[@intFromEnum(Section.pair_index)] = pair_slots;
+    lens[@intFromEnum(Section.split_table)] = tok.split_table.len;
+    lens[@intFromEnum(Section.next_prefix_match)] = tok.next_prefix_match.len;
+    lens[@intFromEnum(Section.ac_states)] = ac.states.len;
+    lens[@intFromEnum(Section.ac_outputs)] = ac.outputs.len;
+    lens[@intFromEnum(Section.single_byte_tokens)] = 256;
+    // Tokenizer.encode() always splits with cl100k_splitter (pattern_str is
+    // informational), so that is the splitter the file must name
+    const pattern = cl100k_splitter.pattern;
+    lens[@intFromEnum(Section.pattern)] = pattern.len;
+
+    var header = Header{
+        .magic = MAGIC,
+        .version = VERSION,
+        .vocab_size = vocab_size,
+        .sections = undefined,
+    };
+    var offset: u64 = std.mem.alignForward(u64, @sizeOf(Header), 8);
+    inline for (0..section_count) |i| {
+        const size = lens[i] * @sizeOf(ElementType(@enumFromInt(i)));
+        header.sections[i] = .{ .offset = offset, .len = lens[i] };
+        offset = std.mem.alignForward(u64, offset + size, 8);
+    }
+
+    const buf = try allocator.alignedAlloc(u8, .@"8", @intCast(offset));
+    errdefer allocator.free(buf);
+    @memset(buf, 0);
+    @memcpy(buf[0..@sizeOf(Header)], std.mem.asBytes(&header));
+
+    // Fill sections through the same accessors readers use
+    const offsets = try View.section(buf, &header, .token_offsets);
+    const bytes = try View.section(buf, &header, .token_bytes);
+    var pos: u32 = 0;
+    for (0..vocab_size) |id| {
+        offsets[id] = pos;
+        if (tok.vocab_r.get(@intCast(id))) |token| {
+            @memcpy(bytes[pos..][0..token.len], token);
+            pos += @intCast(token.len);
+        }
+    }
+    offsets[vocab_size] = pos;
+
+    const tokens = TokenTable{ .offsets = offsets, .bytes = bytes };
+    const vocab_index = try View.section(buf, &header, .vocab_index);
+    @memset(vocab_index, EMPTY);
+    if (vocab_slots > 0) {
+        it = tok.vocab_r.iterator();
+        while (it.next()) |entry| {
+            var slot: usize = @intCast(bytesHash(tokens.get(entry.key_ptr.*) orelse continue) & (vocab_slots - 1));
+            while (vocab_index[slot] != EMPTY) slot = (slot + 1) & (vocab_slots - 1);
+            vocab_index[slot] = entry.key_ptr.*;
+        }
+    }
+
+    const pair_index = try View.section(buf, &header, .pair_index);
+    @memset(pair_index, .{ .left = 0, .right = 0, .merged = EMPTY });
+    if (pair_slots > 0) {
+        var pair_it = tok.merges_map.iterator();
+        while (pair_it.next()) |entry| {
+            const pair = entry.key_ptr.*;
+            var slot: usize = @intCast(pair.hash() & (pair_slots - 1));
+            while (pair_index[slot].merged != EMPTY) slot = (slot + 1) & (pair_slots - 1);
+            pair_index[slot] = .{ .left = pair.left, .right = pair.right, .merged = entry.value_ptr.* };
+        }
+    }
+
+    @memcpy(try View.section(buf, &header, .split_table), tok.split_table);
+    @memcpy(try View.section(buf, &header, .next_prefix_match), tok.next_prefix_match);
+    @memcpy(try View.section(buf, &header, .ac_states), ac.states);
+    @memcpy(try View.section(buf, &header, .ac_outputs), ac.outputs);
+    @memcpy(try View.section(buf, &header, .single_byte_tokens), &tok.single_byte_tokens);
+    @memcpy(try View.section(buf, &header, .pattern), pattern);
+
+    return buf;
+}
+
+/// Write a loaded tokenizer to `path` in this format
+pub fn writeFile(allocator: Allocator, tok: *const Tokenizer, path: []const u8) !void {
+    const buf = try serialize(allocator, tok);
+    defer allocator.free(buf);
+    try std.fs.cwd().writeFile(.{ .sub_path = path, .data = buf });
+}
+
+/// Convert a tokenizer.json to the binary format
+pub fn convert(allocator: Allocator, json_path: []const u8, out_path: []const u8) !void {
+    var tok = try Tokenizer.initUncached(json_path, allocator);
+    defer tok.deinit();
+    try writeFile(allocator, &tok, out_path);
+}
+
+// Comptime-specialized stack encoders over the mapped tables
+const SmallEncoder = StackEncoder.BacktrackEncoderOver(4 * 1024, TokenTable, PairTable);
+const MediumEncoder = StackEncoder.BacktrackEncoderOver(16 * 1024, TokenTable, PairTable);
+const LargeEncoder = StackEncoder.BacktrackEncoderOver(64 * 1024, TokenTable, PairTable);
+const HeapEncoder = BacktrackEncoderOver(TokenTable, PairTable);
+
+/// Tokenizer running directly on a mapped .mtok file
+/// Startup is one mmap plus header validation; pages fault in on first use.
+pub const MappedTokenizer = struct {
+    view: View,
+    splitter: Splitter,
+    mapping: []align(std.heap.page_size_min) u8,
+
+    pub fn open(path: []const u8) !MappedTokenizer {
+        const file = try std.fs.cwd().openFile(path, .{});
+        defer file.close();
+        const size = (try file.stat()).size;
+        if (size < @sizeOf(Header)) return error.InvalidFormat;
+
+        // Private writable mapping: the automaton and split table are typed
+        // as mutable slices, but nothing writes them, so pages stay shared
+        const mapping = try std.posix.mmap(
+            null,
+            @intCast(size),
+            std.posix.PROT.READ | std.posix.PROT.WRITE,
+            .{ .TYPE = .PRIVATE },
+            file.handle,
+            0,
+        );
+        errdefer std.posix.munmap(mapping);
+
+        const view = try View.init(mapping);
+        const splitter = Splitter.fromPattern(view.pattern) orelse return error.UnsupportedPattern;
+        return .{ .view = view, .splitter = splitter, .mapping = mapping };
+    }
+
+    pub fn deinit(self: *MappedTokenizer) void {
+        std.posix.munmap(self.mapping);
+    }
+
+    /// Encode text to token ids; the result (and intermediates) live in `arena`
+    pub fn encode(self: *const MappedTokenizer, text: []const u8, arena: Allocator) ![]u32 {
+        var result = std.ArrayList(u32){};
+        try result.ensureTotalCapacity(arena, text.len);
+        switch (self.splitter) {
+            .cl100k => try self.encodeChunks(cl100k_splitter.chunks(text), &result, arena),
+            .gpt2 => try self.encodeChunks(gpt2_splitter.chunks(text), &result, arena),
+        }
+        return result.items;
+    }
+
+    /// Encode each text in turn into one flat buffer (caller owns the result)
+    pub fn encodeBatch(self: *const MappedTokenizer, texts: []const []const u8, allocator: Allocator) !BatchEncoding {
+        const offsets = try allocator.alloc(usize, texts.len + 1);
+        errdefer allocator.free(offsets);
+        var tokens = std.ArrayList(u32){};
+        errdefer tokens.deinit(allocator);
+        var scratch = std.heap.ArenaAllocator.init(allocator);
+        defer scratch.deinit();
+
+        offsets[0] = 0;
+        for (texts, 1..) |text, i| {
+            try tokens.appendSlice(allocator, try self.encode(text, scratch.allocator()));
+            offsets[i] = tokens.items.len;
+            _ = scratch.reset(.retain_capacity);
+        }
+        return .{ .tokens = try tokens.toOwnedSlice(allocator), .offsets = offsets, .allocator = allocator };
+    }
+
+    fn encodeChunks(self: *const MappedTokenizer, chunks: anytype, result: *std.ArrayList(u32), arena: Allocator) !void {
+        var chunk_iter = chunks;
+        while (chunk_iter.next()) |chunk| {
+            try result.appendSlice(arena, try self.encodeChunk(chunk, arena));
+        }
+    }
+
+    fn encodeChunk(self: *const MappedTokenizer, chunk: []const u8, arena: Allocator) ![]const u32 {
+        const v = &self.view;
+        return switch (chunk.len) {
+            0 => &.{},
+            1...4096 => blk: {
+                var enc = try SmallEncoder.init(chunk, &v.aho_corasick, &v.tokens, v.split_table, &v.pairs, v.next_prefix_match);
+                break :blk try enc.encode(arena);
+            },
+            4097...16384 => blk: {
+                var enc = try MediumEncoder.init(chunk, &v.aho_corasick, &v.tokens, v.split_table, &v.pairs, v.next_prefix_match);
+                break :blk try enc.encode(arena);
+            },
+            16385...65536 => blk: {
+                var enc = try LargeEncoder.init(chunk, &v.aho_corasick, &v.tokens, v.split_table, &v.pairs, v.next_prefix_match);
+                break :blk try enc.encode(arena);
+            },
+            else => blk: {
+                var enc = try HeapEncoder.init(arena, chunk, &v.aho_corasick, &v.tokens, v.split_table, &v.pairs, v.next_prefix_match);
+                defer enc.deinit();
+                break :blk try enc.encode();
+            },
+        };
+    }
+
+    /// Decode token ids back to text (caller owns the result)
+    pub fn decode(self: *const MappedTokenizer, tokens: []const u32, allocator: Allocator) ![]u8 {
+        var out = std.ArrayList(u8){};
+        errdefer out.deinit(allocator);
+        for (tokens) |id| {
+            if (self.view.tokens.get(id)) |bytes| try out.appendSlice(allocator, bytes);
+        }
+        return out.toOwnedSlice(allocator);
+    }
+};
+
+test "binary format lookups" {
+    const allocator = std.testing.allocator;
+
+    // Minimal two-token view assembled by hand: ids 0 = "a", 1 = "ab"
+    var header = Header{ .magic = MAGIC, .version = VERSION, .vocab_size = 2, .sections = undefined };
+    const lens = [section_count]u64{ 3, 3, 4, 2, 2, 2, 1, 1, 256, 0 };
+    var offset: u64 = std.mem.alignForward(u64, @sizeOf(Header), 8);
+    inline for (0..section_count) |i| {
+        header.sections[i] = .{ .offset = offset, .len = lens[i] };
+        offset = std.mem.alignForward(u64, offset + lens[i] * @sizeOf(ElementType(@enumFromInt(i))), 8);
+    }
+    const buf = try allocator.alignedAlloc(u8, .@"8", @intCast(offset));
+    defer allocator.free(buf);
+    @memset(buf, 0);
+    @memcpy(buf[0..@sizeOf(Header)], std.mem.asBytes(&header));
+
+    @memcpy(try View.section(buf, &header, .token_offsets), &[_]u32{ 0, 1, 3 });
+    @memcpy(try View.section(buf, &header, .token_bytes), "aab");
+    const vocab_index = try View.section(buf, &header, .vocab_index);
+    @memset(vocab_index, EMPTY);
+    for ([_]u32{ 0, 1 }, [_][]const u8{ "a", "ab" }) |id, bytes| {
+        var slot: usize = @intCast(bytesHash(bytes) & 3);
+        while (vocab_index[slot] != EMPTY) slot = (slot + 1) & 3;
+        vocab_index[slot] = id;
+    }
+    const pairs = try View.section(buf, &header, .pair_index);
+    @memset(pairs, .{ .left = 0, .right = 0, .merged = EMPTY });
+    const merge = Pair{ .left = 0, .right = 0 };
+    pairs[@intCast(merge.hash() & 1)] = .{ .left = 0, .right = 0, .merged = 1 };
+
+    const view = try View.init(buf);
+    try std.testing.expectEqualStrings("ab", view.tokenBytes(1).?);
+    try std.testing.expectEqual(@as(?u32, 1), view.tokenId("ab"));
+    try std.testing.expectEqual(@as(?u32, null), view.tokenId("b"));
+    try std.testing.expectEqual(@as(?u32, 1), view.pairs.get(merge));
+    try std.testing.expectEqual(@as(?u32, null), view.pairs.get(.{ .left = 1, .right = 0 }));
+
+    buf[0] = 'X';
+    try std.testing.expectError(error.InvalidFormat, View.init(buf));
+}
+
+test "mapped tokenizer encodes like Tokenizer" {
+    const allocator = std.testing.allocator;
+    // Vocab keys are base64 token bytes: a, b, c, ab, abc, ca
+    const json = "{\"vocab\": {\"YQ==\": 0, \"Yg==\": 1, \"Yw==\": 2, \"YWI=\": 3, \"YWJj\": 4, \"Y2E=\": 5}}";
+    // encode() caches results per thread with the tokenizer's allocator
+    var tok = try Tokenizer.initFromData(json, std.heap.page_allocator);
+    defer tok.deinit();
+
+    var tmp = std.testing.tmpDir(.{});
+    defer tmp.cleanup();
+    const buf = try serialize(allocator, &tok);
+    defer allocator.free(buf);
+    try tmp.dir.writeFile(.{ .sub_path = "tok.mtok", .data = buf });
+    const path = try tmp.dir.realpathAlloc(allocator, "tok.mtok");
+    defer allocator.free(path);
+
+    var mapped = try MappedTokenizer.open(path);
+    defer mapped.deinit();
+    try std.testing.expectEqual(Splitter.cl100k, mapped.splitter);
+
+    var arena = std.heap.ArenaAllocator.init(allocator);
+    defer arena.deinit();
+    for ([_][]const u8{ "abc", "abcab", "cabca", "bbbaaac" }) |text| {
+        const expected = try allocator.dupe(u32, try tok.encode(text));
+        defer allocator.free(expected);
+        try std.testing.expectEqualSlices(u32, expected, try mapped.encode(text, arena.allocator()));
+    }
+
+    var batch = try mapped.encodeBatch(&.{ "abc", "ca" }, allocator);
+    defer batch.deinit();
+    try std.testing.expectEqualSlices(u32, &.{4}, batch.get(0));
+    try std.testing.expectEqualSlices(u32, &.{5}, batch.get(1));
+}
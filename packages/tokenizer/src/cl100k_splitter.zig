@@ -5,6 +5,9 @@ const std = @import("std");
 const Allocator = std.mem.Allocator;
 const unicode = std.unicode;
 
+/// The regex this splitter implements (stored in .mtok files to name it)
+pub const pattern = "(?i:'s|'t|'re|'ve|'m|'ll|'d)|[^\\r\\n\\p{L}\\p{N}]?\\p{L}+|\\p{N}{1,3}| ?[^\\s\\p{L}\\p{N}]+[\\r\\n]*|\\s*[\\r\\n]+|\\s+(?!\\S)|\\s+";
+
 /// Zero-allocation iterator for splitting text into chunks
 pub const ChunkIterator = struct {
     text: []const u8,
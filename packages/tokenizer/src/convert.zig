@@ -0,0 +1,21 @@
+/// tokenizer.json -> .mtok converter
+/// Usage: zig build tokenizer-convert -- in.json out.mtok
+const std = @import("std");
+const binary_format = @import("binary_format.zig");
+
+pub fn main() !void {
+    const allocator = std.heap.c_allocator;
+
+    const args = try std.process.argsAlloc(allocator);
+    defer std.process.argsFree(allocator, args);
+
+    if (args.len != 3) {
+        std.debug.print("usage: {s} <tokenizer.json> <out.mtok>\n", .{args[0]});
+        std.process.exit(2);
+    }
+
+    var timer = try std.time.Timer.start();
+    try binary_format.convert(allocator, args[1], args[2]);
+    const elapsed_ms = @as(f64, @floatFromInt(timer.read())) / 1_000_000.0;
+    std.debug.print("wrote {s} in {d:.0}ms\n", .{ args[2], elapsed_ms });
+}
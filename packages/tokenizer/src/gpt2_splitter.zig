@@ -3,6 +3,9 @@
 const std = @import("std");
 const unicode = std.unicode;
 
+/// The regex this splitter implements (stored in .mtok files to name it)
+pub const pattern = "'s|'t|'re|'ve|'m|'ll|'d| ?\\p{L}+| ?\\p{N}+| ?[^\\s\\p{L}\\p{N}]+|\\s+(?!\\S)|\\s+";
+
 /// Zero-allocation iterator for splitting text into chunks
 pub const ChunkIterator = struct {
     text: []const u8,
@@ -3,6 +3,7 @@
 /// Usage: import metal0_tokenizer
 const std = @import("std");
 const Tokenizer = @import("tokenizer.zig").Tokenizer;
+const MappedTokenizer = @import("binary_format.zig").MappedTokenizer;
 const Trainer = @import("trainer.zig").Trainer;
 const allocator_helper = @import("allocator_helper");
 
@@ -17,6 +18,7 @@ fn getAllocator() std.mem.Allocator {
 /// Opaque handle for Python
 const TokenizerHandle = opaque {};
 const TrainerHandle = opaque {};
+const MappedHandle = opaque {};
 
 /// Create tokenizer from file
 export fn tokenizer_new(path: [*:0]const u8) ?*TokenizerHandle {
@@ -65,6 +67,43 @@ export fn tokenizer_free_tokens(tokens: [*]u32, len: usize) void {
     allocator.free(tokens[0..len]);
 }
 
+/// Encode many texts in parallel
+/// Returns one flat token array (total length in out_len); tokens of text i
+/// are tokens[offsets[i]..offsets[i + 1]] where offsets has num_texts + 1
+/// entries. Free both with tokenizer_free_batch.
+export fn tokenizer_encode_batch(
+    handle: *TokenizerHandle,
+    texts: [*]const [*:0]const u8,
+    num_texts: usize,
+    out_offsets: *[*]usize,
+    out_len: *usize,
+) ?[*]u32 {
+    const allocator = getAllocator();
+    const tokenizer: *Tokenizer = @ptrCast(@alignCast(handle));
+
+    const text_slices = allocator.alloc([]const u8, num_texts) catch return null;
+    defer allocator.free(text_slices);
+    for (0..num_texts) |i| {
+        text_slices[i] = std.mem.span(texts[i]);
+    }
+
+    const batch = tokenizer.encodeBatch(text_slices, allocator) catch {
+        out_len.* = 0;
+        return null;
+    };
+
+    out_offsets.* = batch.offsets.ptr;
+    out_len.* = batch.tokens.len;
+    return batch.tokens.ptr;
+}
+
+/// Free the arrays returned by tokenizer_encode_batch
+export fn tokenizer_free_batch(tokens: [*]u32, len: usize, offsets: [*]usize, num_texts: usize) void {
+    const allocator = getAllocator();
+    allocator.free(tokens[0..len]);
+    allocator.free(offsets[0 .. num_texts + 1]);
+}
+
 /// Decode tokens to text
 export fn tokenizer_decode(
     handle: *TokenizerHandle,
@@ -89,6 +128,72 @@ export fn tokenizer_free_text(text: [*]u8, len: usize) void {
     allocator.free(text[0..len]);
 }
 
+/// Map a binary .mtok file (see binary_format.zig) instead of parsing JSON
+export fn tokenizer_open_mapped(path: [*:0]const u8) ?*MappedHandle {
+    const allocator = getAllocator();
+
+    const mapped = allocator.create(MappedTokenizer) catch return null;
+    mapped.* = MappedTokenizer.open(std.mem.span(path)) catch {
+        allocator.destroy(mapped);
+        return null;
+    };
+
+    return @ptrCast(mapped);
+}
+
+/// Unmap and free a mapped tokenizer
+export fn tokenizer_free_mapped(handle: *MappedHandle) void {
+    const allocator = getAllocator();
+    const mapped: *MappedTokenizer = @ptrCast(@alignCast(handle));
+    mapped.deinit();
+    allocator.destroy(mapped);
+}
+
+/// Encode text with a mapped tokenizer
+/// Returns an owned array: free with tokenizer_free_tokens
+export fn tokenizer_encode_mapped(
+    handle: *MappedHandle,
+    text: [*:0]const u8,
+    out_len: *usize,
+) ?[*]u32 {
+    const allocator = getAllocator();
+    const mapped: *MappedTokenizer = @ptrCast(@alignCast(handle));
+
+    var arena = std.heap.ArenaAllocator.init(allocator);
+    defer arena.deinit();
+
+    const tokens = mapped.encode(std.mem.span(text), arena.allocator()) catch {
+        out_len.* = 0;
+        return null;
+    };
+    const owned = allocator.dupe(u32, tokens) catch {
+        out_len.* = 0;
+        return null;
+    };
+
+    out_len.* = owned.len;
+    return owned.ptr;
+}
+
+/// Decode tokens with a mapped tokenizer (free with tokenizer_free_text)
+export fn tokenizer_decode_mapped(
+    handle: *MappedHandle,
+    tokens: [*]const u32,
+    len: usize,
+    out_len: *usize,
+) ?[*]u8 {
+    const allocator = getAllocator();
+    const mapped: *MappedTokenizer = @ptrCast(@alignCast(handle));
+
+    const text = mapped.decode(tokens[0..len], allocator) catch {
+        out_len.* = 0;
+        return null;
+    };
+
+    out_len.* = text.len;
+    return text.ptr;
+}
+
 /// Create trainer
 export fn trainer_new(vocab_size: u32) ?*TrainerHandle {
     const allocator = getAllocator();
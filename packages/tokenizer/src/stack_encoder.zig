@@ -20,6 +20,14 @@ pub const PairContext = struct {
 /// Generate specialized encoder at compile time for given max text size
 /// This creates ZERO-ALLOCATION stack-based encoder (except final result copy)
 pub fn BacktrackEncoder(comptime max_text_size: usize) type {
+    return BacktrackEncoderOver(max_text_size, std.AutoHashMap(u32, []const u8), PairMap);
+}
+
+pub const PairMap = std.HashMap(Pair, u32, FnvHashContext(Pair), std.hash_map.default_max_load_percentage);
+
+/// Same encoder over any vocab_r / pair_lookup tables with a HashMap-style
+/// get() (e.g. the mmap'd tables in binary_format.zig)
+pub fn BacktrackEncoderOver(comptime max_text_size: usize, comptime VocabR: type, comptime PairLookup: type) type {
     // Conservative estimates for stack array sizes
     const max_bitfield_words = (max_text_size + 64) / 64;
     const max_tokens = max_text_size / 2; // Worst case: every other byte is a token
@@ -39,17 +47,17 @@ pub fn BacktrackEncoder(comptime max_text_size: usize) type {
 
         // BPE data (borrowed references - no ownership)
         aho_corasick: *const AhoCorasick,
-        vocab_r: *const std.AutoHashMap(u32, []const u8),
+        vocab_r: *const VocabR,
         split_table: []const Pair,
-        pair_lookup: *const std.HashMap(Pair, u32, FnvHashContext(Pair), std.hash_map.default_max_load_percentage),
+        pair_lookup: *const PairLookup,
         next_prefix_match: []const u32,
 
         pub fn init(
             text: []const u8,
             aho_corasick: *const AhoCorasick,
-            vocab_r: *const std.AutoHashMap(u32, []const u8),
+            vocab_r: *const VocabR,
             split_table: []const Pair,
-            pair_lookup: *const std.HashMap(Pair, u32, FnvHashContext(Pair), std.hash_map.default_max_load_percentage),
+            pair_lookup: *const PairLookup,
             next_prefix_match: []const u32,
         ) !Self {
             if (text.len > max_text_size) return error.TextTooLarge;
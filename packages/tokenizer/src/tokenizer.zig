@@ -63,6 +63,14 @@ const releaseResultBuffer = cache.releaseResultBuffer;
 // SIMD acceleration
 const simd = @import("simd_encoder.zig");
 
+// Parallel batch encoding
+const batch = @import("tokenizer_batch.zig");
+pub const BatchEncoding = batch.BatchEncoding;
+
+// Zero-copy binary format (mmap'd, no parsing at startup)
+pub const binary_format = @import("binary_format.zig");
+pub const MappedTokenizer = binary_format.MappedTokenizer;
+
 pub const Tokenizer = struct {
     vocab: std.HashMap([]const u8, u32, FnvHashContext([]const u8), std.hash_map.default_max_load_percentage),
     vocab_r: std.AutoHashMap(u32, []const u8),
@@ -79,36 +87,20 @@ pub const Tokenizer = struct {
     single_byte_tokens: [256]u32, // O(1) lookup for single bytes (vs HashMap)
 
     pub fn initFromData(json_data: []const u8, allocator: Allocator) !Tokenizer {
-        const data = try parser.initFromData(json_data, allocator);
-
-        // Build single-byte lookup table
-        var single_byte_tokens: [256]u32 = [_]u32{0xFFFFFFFF} ** 256;
-        for (0..256) |b| {
-            const byte_arr = [1]u8{@intCast(b)};
-            if (data.vocab.get(&byte_arr)) |token_id| {
-                single_byte_tokens[b] = token_id;
-            }
-        }
-
-        return Tokenizer{
-            .vocab = data.vocab,
-            .vocab_r = data.vocab_r,
-            .merges = data.merges,
-            .merges_map = data.merges_map,
-            .split_table = data.split_table,
-            .pattern_str = data.pattern_str,
-            .trie = data.trie,
-            .aho_corasick = data.aho_corasick,
-            .next_prefix_match = data.next_prefix_match,
-            .allocator = data.allocator,
-            .encode_arena = std.heap.ArenaAllocator.init(getBestArenaAllocator(allocator)),
-            .single_byte_tokens = single_byte_tokens,
-        };
+        return fromParsed(try parser.initFromData(json_data, allocator), allocator);
     }
 
     pub fn init(tokenizer_path: []const u8, allocator: Allocator) !Tokenizer {
-        const data = try parser.initFromFile(tokenizer_path, allocator);
+        return fromParsed(try parser.initFromFile(tokenizer_path, allocator), allocator);
+    }
+
+    /// Load from tokenizer.json without the /tmp ultra cache (used by the
+    /// binary_format converter, which must see exactly this file's vocab)
+    pub fn initUncached(tokenizer_path: []const u8, allocator: Allocator) !Tokenizer {
+        return fromParsed(try parser.initFromFileUncached(tokenizer_path, allocator), allocator);
+    }
 
+    fn fromParsed(data: parser.TokenizerData, allocator: Allocator) Tokenizer {
         // Build single-byte lookup table
         var single_byte_tokens: [256]u32 = [_]u32{0xFFFFFFFF} ** 256;
         for (0..256) |b| {
@@ -345,50 +337,60 @@ pub const Tokenizer = struct {
     /// Trie-based longest-match encoding (fast + correct).
     /// Falls back to HashMap if trie not available (WASM).
     pub fn encode(self: *Tokenizer, text: []const u8) ![]u32 {
-        @setRuntimeSafety(false);
-
         // Reset arena (keeps capacity, fast O(1) operation)
         _ = self.encode_arena.reset(.retain_capacity);
         const arena = self.encode_arena.allocator();
 
+        var result = std.ArrayList(u32){};
+        try self.encodeInto(text, arena, &result, arena);
+        return result.items;
+    }
+
+    /// Encode many texts in parallel across all cores (single-threaded on WASM)
+    /// Unlike encode(), the result is owned by the caller: one flat token
+    /// buffer plus offsets. Free with BatchEncoding.deinit().
+    pub fn encodeBatch(self: *Tokenizer, texts: []const []const u8, allocator: Allocator) !BatchEncoding {
+        return batch.encodeBatch(self, texts, allocator);
+    }
+
+    /// Append the tokens of `text` to `out` (allocated with `out_allocator`)
+    /// `scratch` holds per-chunk intermediates; it is not reset here.
+    /// Does not touch encode_arena, so threads may call this concurrently
+    /// (the caches it uses are thread-local).
+    pub fn encodeInto(self: *Tokenizer, text: []const u8, scratch: Allocator, out: *std.ArrayList(u32), out_allocator: Allocator) !void {
+        @setRuntimeSafety(false);
+
         // Check full encoding cache first (for text < 1024 bytes)
         const should_cache = text.len < 1024;
         if (should_cache) {
             var encode_cache = getEncodeCache(self.allocator);
             if (encode_cache.get(text)) |cached_tokens| {
-                // Cache hit! Allocate from arena (fast, bulk-freed on next encode)
-                const result = try arena.alloc(u32, cached_tokens.len);
-                @memcpy(result, cached_tokens);
-                return result;
+                try out.appendSlice(out_allocator, cached_tokens);
+                return;
             }
         }
 
         // Cache miss - perform encoding
-        var result = std.ArrayList(u32){};
+        const start = out.items.len;
 
         // Larger pre-allocation (2x for safety margin)
-        try result.ensureTotalCapacity(arena, text.len * 2);
+        try out.ensureUnusedCapacity(out_allocator, text.len * 2);
 
         // Iterate through chunks (zero allocations for splitting!)
         var chunk_iter = cl100k_splitter.chunks(text);
         while (chunk_iter.next()) |chunk| {
-            const chunk_tokens = try self.encodeViaBacktrackingArena(chunk, arena);
-            try result.appendSlice(arena, chunk_tokens);
+            const chunk_tokens = try self.encodeViaBacktrackingArena(chunk, scratch);
+            try out.appendSlice(out_allocator, chunk_tokens);
         }
 
-        // Return arena-allocated slice
-        const items = result.items[0..result.items.len];
-        const owned = try arena.dupe(u32, items);
-
-        // Cache result before returning (if small enough)
-        if (should_cache and owned.len < 256) {
+        // Cache result (if small enough)
+        const encoded = out.items[start..];
+        if (should_cache and encoded.len < 256) {
             var encode_cache = getEncodeCache(self.allocator);
             const cached_text = try self.allocator.dupe(u8, text);
-            const cached_tokens = try self.allocator.dupe(u32, owned);
+            const cached_tokens = try self.allocator.dupe(u32, encoded);
             encode_cache.put(cached_text, cached_tokens) catch {}; // Ignore cache errors
         }
-
-        return owned;
     }
 
     /// ZERO-ALLOCATION stack-based encoding with comptime specialization
@@ -0,0 +1,147 @@
+/// Parallel batch encoding
+/// Splits a batch into contiguous, byte-balanced ranges, one per worker.
+/// Ranges run on a process-wide thread pool whose threads keep their
+/// thread-local token/encode caches warm from one batch to the next; the
+/// per-worker tokens are then copied into one flat buffer with offsets.
+
+const std = @import("std");
+const builtin = @import("builtin");
+const Allocator = std.mem.Allocator;
+const Tokenizer = @import("tokenizer.zig").Tokenizer;
+
+/// Below this many input bytes per worker, threads cost more than they save
+const min_bytes_per_worker: usize = 64 * 1024;
+
+/// Shared by every encodeBatch call and never torn down, like the runtime's
+/// global tokenizer: pool threads live for the process, so their caches do too
+var pool: std.Thread.Pool = undefined;
+var pool_ready: bool = false;
+var pool_once = std.once(initPool);
+
+fn initPool() void {
+    pool.init(.{ .allocator = std.heap.page_allocator }) catch return;
+    pool_ready = true;
+}
+
+/// The shared pool, or null if its threads could not be started
+fn sharedPool() ?*std.Thread.Pool {
+    pool_once.call();
+    return if (pool_ready) &pool else null;
+}
+
+/// Encoded batch: tokens of text i are tokens[offsets[i]..offsets[i + 1]]
+pub const BatchEncoding = struct {
+    tokens: []u32,
+    offsets: []usize, // texts.len + 1 entries
+    allocator: Allocator,
+
+    pub fn len(self: *const BatchEncoding) usize {
+        return self.offsets.len - 1;
+    }
+
+    pub fn get(self: *const BatchEncoding, index: usize) []const u32 {
+        return self.tokens[self.offsets[index]..self.offsets[index + 1]];
+    }
+
+    pub fn deinit(self: *BatchEncoding) void {
+        self.allocator.free(self.tokens);
+        self.allocator.free(self.offsets);
+    }
+};
+
+const Worker = struct {
+    tokenizer: *Tokenizer,
+    texts: []const []const u8,
+    counts: []usize, // tokens per text, written by the worker
+    tokens: std.ArrayList(u32) = .{},
+    allocator: Allocator,
+    err: ?anyerror = null,
+
+    fn run(self: *Worker) void {
+        self.encodeRange() catch |err| {
+            self.err = err;
+        };
+    }
+
+    fn encodeRange(self: *Worker) !void {
+        var scratch = std.heap.ArenaAllocator.init(self.allocator);
+        defer scratch.deinit();
+
+        for (self.texts, self.counts) |text, *count| {
+            const before = self.tokens.items.len;
+            try self.tokenizer.encodeInto(text, scratch.allocator(), &self.tokens, self.allocator);
+            count.* = self.tokens.items.len - before;
+            _ = scratch.reset(.retain_capacity);
+        }
+    }
+};
+
+pub fn encodeBatch(tokenizer: *Tokenizer, texts: []const []const u8, allocator: Allocator) !BatchEncoding {
+    const offsets = try allocator.alloc(usize, texts.len + 1);
+    errdefer allocator.free(offsets);
+    const counts = offsets[1..];
+
+    var total_bytes: usize = 0;
+    for (texts) |text| total_bytes += text.len;
+
+    const num_workers = workerCount(texts.len, total_bytes);
+    const workers = try allocator.alloc(Worker, num_workers);
+    defer allocator.free(workers);
+
+    // Contiguous ranges with roughly equal byte counts
+    var start: usize = 0;
+    var bytes_done: usize = 0;
+    for (workers, 0..) |*worker, w| {
+        var end = start;
+        if (w == num_workers - 1) {
+            end = texts.len;
+        } else {
+            const target = total_bytes * (w + 1) / num_workers;
+            while (end < texts.len and (end == start or bytes_done < target)) : (end += 1) {
+                bytes_done += texts[end].len;
+            }
+        }
+        worker.* = .{
+            .tokenizer = tokenizer,
+            .texts = texts[start..end],
+            .counts = counts[start..end],
+            .allocator = allocator,
+        };
+        start = end;
+    }
+    defer for (workers) |*worker| worker.tokens.deinit(allocator);
+
+    if (num_workers == 1) {
+        workers[0].run();
+    } else if (sharedPool()) |shared| {
+        var wg: std.Thread.WaitGroup = .{};
+        for (workers) |*worker| shared.spawnWg(&wg, Worker.run, .{worker});
+        // The calling thread picks up queued ranges while it waits
+        shared.waitAndWork(&wg);
+    } else {
+        for (workers) |*worker| worker.run();
+    }
+
+    for (workers) |*worker| {
+        if (worker.err) |err| return err;
+    }
+
+    offsets[0] = 0;
+    for (counts, 0..) |count, i| offsets[i + 1] = offsets[i] + count;
+
+    const tokens = try allocator.alloc(u32, offsets[texts.len]);
+    var pos: usize = 0;
+    for (workers) |*worker| {
+        @memcpy(tokens[pos..][0..worker.tokens.items.len], worker.tokens.items);
+        pos += worker.tokens.items.len;
+    }
+
+    return .{ .tokens = tokens, .offsets = offsets, .allocator = allocator };
+}
+
+fn workerCount(num_texts: usize, total_bytes: usize) usize {
+    if (builtin.single_threaded or builtin.cpu.arch.isWasm()) return 1;
+    const cpus = std.Thread.getCpuCount() catch 1;
+    const by_size = @max(1, total_bytes / min_bytes_per_worker);
+    return @max(1, @min(cpus, @min(num_texts, by_size)));
+}
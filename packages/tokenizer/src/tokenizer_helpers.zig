@@ -7,7 +7,8 @@ const hashmap_helper = @import("hashmap_helper");
 const wyhash = hashmap_helper.wyhash;
 
 /// A byte pair in the BPE vocabulary
-pub const Pair = struct {
+/// extern: split tables are used in place from mmap'd binary_format files
+pub const Pair = extern struct {
     left: u32,
     right: u32,
 
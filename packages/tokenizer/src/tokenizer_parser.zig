@@ -168,6 +168,20 @@ pub fn initFromFile(tokenizer_path: []const u8, allocator: Allocator) !Tokenizer
     return try parseTokenizerJSON(parsed, allocator);
 }
 
+/// Parse tokenizer from file path, ignoring the ultra cache
+pub fn initFromFileUncached(tokenizer_path: []const u8, allocator: Allocator) !TokenizerData {
+    const file = try std.fs.cwd().openFile(tokenizer_path, .{});
+    defer file.close();
+
+    const buffer = try file.readToEndAlloc(allocator, std.math.maxInt(usize));
+    defer allocator.free(buffer);
+
+    var parsed = try json.parse(allocator, buffer);
+    defer parsed.deinit(allocator);
+
+    return try parseTokenizerJSONUncached(parsed, allocator);
+}
+
 /// Build TokenizerData from ultra cache (fast path)
 fn buildFromUltraCache(cached: ac_cache.UltraCache, allocator: Allocator) !TokenizerData {
     const trie: ?*TrieNode = null;
@@ -219,12 +233,12 @@ fn buildFromUltraCache(cached: ac_cache.UltraCache, allocator: Allocator) !Token
 
 /// Parse tokenizer from JsonValue
 pub fn parseTokenizerJSON(root_value: JsonValue, allocator: Allocator) !TokenizerData {
-    const trie: ?*TrieNode = null;
-    const pattern_str = try allocator.dupe(u8, "'s|'t|'re|'ve|'m|'ll|'d| ?[[:alpha:]]+| ?[[:digit:]]+| ?[^[:alnum:][:space:]]+| +[[:space:]]*| +");
-
     // ULTRA FAST PATH: Try loading from ultra cache first (includes vocab bytes)
     // This skips ALL JSON parsing and base64 decoding!
     if (ac_cache.loadUltra(allocator, ULTRA_CACHE_PATH)) |cached| {
+        const trie: ?*TrieNode = null;
+        const pattern_str = try allocator.dupe(u8, "'s|'t|'re|'ve|'m|'ll|'d| ?[[:alpha:]]+| ?[[:digit:]]+| ?[^[:alnum:][:space:]]+| +[[:space:]]*| +");
+
         // Build vocab/vocab_r from cached vocab_bytes (O(n) simple iteration)
         var vocab = std.HashMap([]const u8, u32, FnvHashContext([]const u8), std.hash_map.default_max_load_percentage).initContext(allocator, FnvHashContext([]const u8){});
         var vocab_r = std.AutoHashMap(u32, []const u8).init(allocator);
@@ -261,6 +275,21 @@ pub fn parseTokenizerJSON(root_value: JsonValue, allocator: Allocator) !Tokenize
     }
 
     // SLOW PATH: Parse JSON, build everything, save to ultra cache
+    const data = try parseTokenizerJSONUncached(root_value, allocator);
+
+    // Save to ultra cache for next time (includes vocab bytes!)
+    ac_cache.saveUltra(&data.vocab_r, &data.aho_corasick.?, data.split_table, data.next_prefix_match, ULTRA_CACHE_PATH) catch {};
+
+    return data;
+}
+
+/// Parse tokenizer from JsonValue, always building from the JSON itself
+/// (never reads or writes the /tmp ultra cache, which may hold another vocab)
+pub fn parseTokenizerJSONUncached(root_value: JsonValue, allocator: Allocator) !TokenizerData {
+    const trie: ?*TrieNode = null;
+    const pattern_str = try allocator.dupe(u8, "'s|'t|'re|'ve|'m|'ll|'d| ?[[:alpha:]]+| ?[[:digit:]]+| ?[^[:alnum:][:space:]]+| +[[:space:]]*| +");
+    errdefer allocator.free(pattern_str);
+
     var vocab = std.HashMap([]const u8, u32, FnvHashContext([]const u8), std.hash_map.default_max_load_percentage).initContext(allocator, FnvHashContext([]const u8){});
     errdefer vocab.deinit();
 
@@ -302,9 +331,6 @@ pub fn parseTokenizerJSON(root_value: JsonValue, allocator: Allocator) !Tokenize
     const aho_corasick = try builder.buildAhoCorasick(&vocab_r, allocator);
     const next_prefix_match = try builder.buildNextPrefixMatch(&vocab_r, aho_corasick.?, allocator);
 
-    // Save to ultra cache for next time (includes vocab bytes!)
-    ac_cache.saveUltra(&vocab_r, &aho_corasick.?, split_table, next_prefix_match, ULTRA_CACHE_PATH) catch {};
-
     return TokenizerData{
         .vocab = vocab,
         .vocab_r = vocab_r,
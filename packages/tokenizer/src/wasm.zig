@@ -74,6 +74,40 @@ export fn encode(text_ptr: [*]const u8, text_len: usize, out_len: *usize) [*]u32
     return tokens.ptr;
 }
 
+/// Encode a batch of texts packed back to back in one buffer
+/// text_lens[i] is the byte length of text i. Returns the flat token array;
+/// tokens of text i are tokens[offsets[i]..offsets[i + 1]] (offsets has
+/// num_texts + 1 entries, written to out_offsets). Free with free_batch.
+/// WASM is single-threaded, so this runs sequentially.
+export fn encode_batch(
+    texts_ptr: [*]const u8,
+    text_lens: [*]const usize,
+    num_texts: usize,
+    out_offsets: *[*]usize,
+    out_len: *usize,
+) ?[*]u32 {
+    const tokenizer = global_tokenizer orelse return null;
+
+    const texts = gpa.alloc([]const u8, num_texts) catch return null;
+    defer gpa.free(texts);
+    var pos: usize = 0;
+    for (texts, 0..) |*text, i| {
+        text.* = texts_ptr[pos .. pos + text_lens[i]];
+        pos += text_lens[i];
+    }
+
+    const batch = tokenizer.encodeBatch(texts, gpa) catch return null;
+    out_offsets.* = batch.offsets.ptr;
+    out_len.* = batch.tokens.len;
+    return batch.tokens.ptr;
+}
+
+/// Free the arrays returned by encode_batch
+export fn free_batch(tokens_ptr: [*]u32, tokens_len: usize, offsets_ptr: [*]usize, num_texts: usize) void {
+    gpa.free(tokens_ptr[0..tokens_len]);
+    gpa.free(offsets_ptr[0 .. num_texts + 1]);
+}
+
 /// Free previously allocated tokens
 export fn free_tokens(tokens_ptr: [*]u32, tokens_len: usize) void {
     const tokens = tokens_ptr[0..tokens_len];
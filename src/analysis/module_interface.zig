@@ -0,0 +1,360 @@
+/// Module interface: the part of an imported module that other modules'
+/// type inference needs, without its bodies
+///
+/// Collected from the AST (function signatures, class layouts, module constants)
+/// and stored as a compact binary file next to the module's generated .zig.
+/// On later builds an interface whose recorded source hash still matches the
+/// module is loaded instead of parsing the module again.
+const std = @import("std");
+const ast = @import("ast");
+const native_types = @import("native_types.zig");
+
+const NativeType = native_types.NativeType;
+const TypeInferrer = native_types.TypeInferrer;
+
+const magic = "M0IF";
+const format_version: u16 = 2;
+
+/// Types an interface can carry - what annotations and literals tell us
+pub const TypeTag = enum(u8) {
+    int,
+    float,
+    string,
+    bool,
+    none,
+    unknown,
+
+    /// Annotation string -> tag (unannotated and unsupported are .unknown,
+    /// so callers fall back to their own inference instead of assuming int)
+    pub fn fromAnnotation(annotation: ?[]const u8) TypeTag {
+        const name = annotation orelse return .unknown;
+        if (std.mem.eql(u8, name, "int")) return .int;
+        if (std.mem.eql(u8, name, "float")) return .float;
+        if (std.mem.eql(u8, name, "str")) return .string;
+        if (std.mem.eql(u8, name, "bool")) return .bool;
+        if (std.mem.eql(u8, name, "None")) return .none;
+        return .unknown;
+    }
+
+    fn fromAnnotationNode(node: *const ast.Node) TypeTag {
+        return switch (node.*) {
+            .name => |n| fromAnnotation(n.id),
+            .constant => |c| if (c.value == .none) .none else .unknown,
+            else => .unknown,
+        };
+    }
+
+    fn fromConstant(value: ast.Value) TypeTag {
+        return switch (value) {
+            .int => .int,
+            .float => .float,
+            .string => .string,
+            .bool => .bool,
+            .none => .none,
+            else => .unknown,
+        };
+    }
+
+    pub fn toNative(self: TypeTag) NativeType {
+        return switch (self) {
+            .int => .{ .int = .bounded },
+            .float => .float,
+            .string => .{ .string = .runtime },
+            .bool => .bool,
+            .none => .none,
+            .unknown => .unknown,
+        };
+    }
+};
+
+pub const FunctionSig = struct {
+    name: []const u8,
+    params: []const TypeTag,
+    returns: TypeTag,
+};
+
+pub const Field = struct {
+    name: []const u8,
+    type_tag: TypeTag,
+};
+
+pub const ClassLayout = struct {
+    name: []const u8,
+    fields: []const Field,
+    methods: []const FunctionSig,
+};
+
+pub const ModuleInterface = struct {
+    functions: []const FunctionSig = &.{},
+    classes: []const ClassLayout = &.{},
+    constants: []const Field = &.{},
+
+    /// Collect the interface of a parsed module (allocations belong to allocator,
+    /// names borrow from the AST)
+    pub fn fromModule(allocator: std.mem.Allocator, module: ast.Node.Module) !ModuleInterface {
+        var functions = std.ArrayList(FunctionSig){};
+        var classes = std.ArrayList(ClassLayout){};
+        var constants = std.ArrayList(Field){};
+
+        for (module.body) |stmt| {
+            switch (stmt) {
+                .function_def => |func| try functions.append(allocator, try signature(allocator, func)),
+                .class_def => |class| try classes.append(allocator, try classLayout(allocator, class)),
+                .assign => |assign| {
+                    if (assign.targets.len != 1 or assign.targets[0] != .name) continue;
+                    if (assign.value.* != .constant) continue;
+                    try constants.append(allocator, .{
+                        .name = assign.targets[0].name.id,
+                        .type_tag = TypeTag.fromConstant(assign.value.constant.value),
+                    });
+                },
+                .ann_assign => |ann| {
+                    if (ann.target.* != .name) continue;
+                    try constants.append(allocator, .{
+                        .name = ann.target.name.id,
+                        .type_tag = TypeTag.fromAnnotationNode(ann.annotation),
+                    });
+                },
+                else => {},
+            }
+        }
+
+        return .{
+            .functions = try functions.toOwnedSlice(allocator),
+            .classes = try classes.toOwnedSlice(allocator),
+            .constants = try constants.toOwnedSlice(allocator),
+        };
+    }
+
+    /// Make the interface visible to another module's type inference:
+    /// "module.func" / "module.Class.method" return types and "module.CONST" types.
+    /// Keys are allocated with allocator and live as long as the maps.
+    pub fn register(
+        self: ModuleInterface,
+        type_inf: *TypeInferrer,
+        allocator: std.mem.Allocator,
+        parent_prefix: ?[]const u8,
+        module_name: []const u8,
+    ) !void {
+        const qualified_module = if (parent_prefix) |prefix|
+            try std.fmt.allocPrint(allocator, "{s}.{s}", .{ prefix, module_name })
+        else
+            module_name;
+
+        for (self.functions) |func| {
+            if (func.returns == .unknown) continue;
+            const key = try std.fmt.allocPrint(allocator, "{s}.{s}", .{ qualified_module, func.name });
+            try type_inf.func_return_types.put(key, func.returns.toNative());
+        }
+        for (self.classes) |class| {
+            for (class.methods) |method| {
+                if (method.returns == .unknown) continue;
+                const key = try std.fmt.allocPrint(allocator, "{s}.{s}.{s}", .{ qualified_module, class.name, method.name });
+                try type_inf.func_return_types.put(key, method.returns.toNative());
+            }
+        }
+        for (self.constants) |constant| {
+            if (constant.type_tag == .unknown) continue;
+            const key = try std.fmt.allocPrint(allocator, "{s}.{s}", .{ qualified_module, constant.name });
+            try type_inf.var_types.put(key, constant.type_tag.toNative());
+        }
+    }
+
+    /// Binary encoding: magic, version, source hash, then length-prefixed tables
+    pub fn encode(self: ModuleInterface, allocator: std.mem.Allocator, source_hash: [32]u8) ![]u8 {
+        var out = std.ArrayList(u8){};
+        errdefer out.deinit(allocator);
+
+        try out.appendSlice(allocator, magic);
+        try writeInt(&out, allocator, u16, format_version);
+        try out.appendSlice(allocator, &source_hash);
+
+        try writeInt(&out, allocator, u32, @intCast(self.functions.len));
+        for (self.functions) |func| try writeSig(&out, allocator, func);
+
+        try writeInt(&out, allocator, u32, @intCast(self.classes.len));
+        for (self.classes) |class| {
+            try writeStr(&out, allocator, class.name);
+            try writeInt(&out, allocator, u32, @intCast(class.fields.len));
+            for (class.fields) |field| try writeField(&out, allocator, field);
+            try writeInt(&out, allocator, u32, @intCast(class.methods.len));
+            for (class.methods) |method| try writeSig(&out, allocator, method);
+        }
+
+        try writeInt(&out, allocator, u32, @intCast(self.constants.len));
+        for (self.constants) |constant| try writeField(&out, allocator, constant);
+
+        return out.toOwnedSlice(allocator);
+    }
+
+    /// Decode an interface; names are copied into allocator.
+    /// Returns error.StaleInterface when it was built from a different source.
+    pub fn decode(allocator: std.mem.Allocator, bytes: []const u8, source_hash: [32]u8) !ModuleInterface {
+        var r = Reader{ .bytes = bytes };
+        if (!std.mem.eql(u8, try r.take(magic.len), magic)) return error.InvalidInterface;
+        if (try r.int(u16) != format_version) return error.StaleInterface;
+        if (!std.mem.eql(u8, try r.take(32), &source_hash)) return error.StaleInterface;
+
+        const functions = try allocator.alloc(FunctionSig, try r.int(u32));
+        for (functions) |*func| func.* = try r.sig(allocator);
+
+        const classes = try allocator.alloc(ClassLayout, try r.int(u32));
+        for (classes) |*class| {
+            class.name = try allocator.dupe(u8, try r.str());
+            const fields = try allocator.alloc(Field, try r.int(u32));
+            for (fields) |*field| field.* = try r.field(allocator);
+            const methods = try allocator.alloc(FunctionSig, try r.int(u32));
+            for (methods) |*method| method.* = try r.sig(allocator);
+            class.fields = fields;
+            class.methods = methods;
+        }
+
+        const constants = try allocator.alloc(Field, try r.int(u32));
+        for (constants) |*constant| constant.* = try r.field(allocator);
+
+        if (r.pos != bytes.len) return error.InvalidInterface;
+        return .{ .functions = functions, .classes = classes, .constants = constants };
+    }
+
+    /// Load path if it exists and matches source_hash, null otherwise
+    pub fn readFile(allocator: std.mem.Allocator, path: []const u8, source_hash: [32]u8) ?ModuleInterface {
+        const bytes = std.fs.cwd().readFileAlloc(allocator, path, 16 * 1024 * 1024) catch return null;
+        return decode(allocator, bytes, source_hash) catch null;
+    }
+
+    pub fn writeFile(self: ModuleInterface, allocator: std.mem.Allocator, path: []const u8, source_hash: [32]u8) !void {
+        const bytes = try self.encode(allocator, source_hash);
+        defer allocator.free(bytes);
+        const file = try std.fs.cwd().createFile(path, .{});
+        defer file.close();
+        try file.writeAll(bytes);
+    }
+};
+
+fn signature(allocator: std.mem.Allocator, func: ast.Node.FunctionDef) !FunctionSig {
+    const params = try allocator.alloc(TypeTag, func.args.len);
+    for (func.args, params) |arg, *param| {
+        param.* = if (arg.type_annotation) |ann| TypeTag.fromAnnotation(ann) else .unknown;
+    }
+    return .{ .name = func.name, .params = params, .returns = TypeTag.fromAnnotation(func.return_type) };
+}
+
+fn classLayout(allocator: std.mem.Allocator, class: ast.Node.ClassDef) !ClassLayout {
+    var fields = std.ArrayList(Field){};
+    var methods = std.ArrayList(FunctionSig){};
+    for (class.body) |stmt| {
+        switch (stmt) {
+            .ann_assign => |ann| {
+                if (ann.target.* != .name) continue;
+                try fields.append(allocator, .{
+                    .name = ann.target.name.id,
+                    .type_tag = TypeTag.fromAnnotationNode(ann.annotation),
+                });
+            },
+            .function_def => |func| try methods.append(allocator, try signature(allocator, func)),
+            else => {},
+        }
+    }
+    return .{
+        .name = class.name,
+        .fields = try fields.toOwnedSlice(allocator),
+        .methods = try methods.toOwnedSlice(allocator),
+    };
+}
+
+fn writeInt(out: *std.ArrayList(u8), allocator: std.mem.Allocator, comptime T: type, value: T) !void {
+    var buf: [@sizeOf(T)]u8 = undefined;
+    std.mem.writeInt(T, &buf, value, .little);
+    try out.appendSlice(allocator, &buf);
+}
+
+fn writeStr(out: *std.ArrayList(u8), allocator: std.mem.Allocator, s: []const u8) !void {
+    try writeInt(out, allocator, u32, @intCast(s.len));
+    try out.appendSlice(allocator, s);
+}
+
+fn writeField(out: *std.ArrayList(u8), allocator: std.mem.Allocator, field: Field) !void {
+    try writeStr(out, allocator, field.name);
+    try out.append(allocator, @intFromEnum(field.type_tag));
+}
+
+fn writeSig(out: *std.ArrayList(u8), allocator: std.mem.Allocator, func: FunctionSig) !void {
+    try writeStr(out, allocator, func.name);
+    try writeInt(out, allocator, u32, @intCast(func.params.len));
+    for (func.params) |param| try out.append(allocator, @intFromEnum(param));
+    try out.append(allocator, @intFromEnum(func.returns));
+}
+
+const Reader = struct {
+    bytes: []const u8,
+    pos: usize = 0,
+
+    fn take(self: *Reader, n: usize) ![]const u8 {
+        if (self.bytes.len - self.pos < n) return error.InvalidInterface;
+        defer self.pos += n;
+        return self.bytes[self.pos..][0..n];
+    }
+
+    fn int(self: *Reader, comptime T: type) !T {
+        return std.mem.readInt(T, (try self.take(@sizeOf(T)))[0..@sizeOf(T)], .little);
+    }
+
+    fn tag(self: *Reader) !TypeTag {
+        return std.meta.intToEnum(TypeTag, (try self.take(1))[0]) catch error.InvalidInterface;
+    }
+
+    fn str(self: *Reader) ![]const u8 {
+        return self.take(try self.int(u32));
+    }
+
+    fn field(self: *Reader, allocator: std.mem.Allocator) !Field {
+        return .{ .name = try allocator.dupe(u8, try self.str()), .type_tag = try self.tag() };
+    }
+
+    fn sig(self: *Reader, allocator: std.mem.Allocator) !FunctionSig {
+        const name = try allocator.dupe(u8, try self.str());
+        const params = try allocator.alloc(TypeTag, try self.int(u32));
+        for (params) |*param| param.* = try self.tag();
+        return .{ .name = name, .params = params, .returns = try self.tag() };
+    }
+};
+
+test "ModuleInterface encode/decode round trip" {
+    var arena = std.heap.ArenaAllocator.init(std.testing.allocator);
+    defer arena.deinit();
+    const allocator = arena.allocator();
+
+    const params = [_]TypeTag{ .int, .unknown };
+    const fields = [_]Field{.{ .name = "x", .type_tag = .float }};
+    const methods = [_]FunctionSig{.{ .name = "norm", .params = &.{.unknown}, .returns = .float }};
+    const iface = ModuleInterface{
+        .functions = &.{.{ .name = "add", .params = &params, .returns = .int }},
+        .classes = &.{.{ .name = "Point", .fields = &fields, .methods = &methods }},
+        .constants = &.{.{ .name = "NAME", .type_tag = .string }},
+    };
+
+    const hash = [_]u8{7} ** 32;
+    const bytes = try iface.encode(allocator, hash);
+    const decoded = try ModuleInterface.decode(allocator, bytes, hash);
+
+    try std.testing.expectEqualStrings("add", decoded.functions[0].name);
+    try std.testing.expectEqualSlices(TypeTag, &params, decoded.functions[0].params);
+    try std.testing.expectEqualStrings("Point", decoded.classes[0].name);
+    try std.testing.expectEqual(TypeTag.float, decoded.classes[0].fields[0].type_tag);
+    try std.testing.expectEqual(TypeTag.float, decoded.classes[0].methods[0].returns);
+    try std.testing.expectEqual(TypeTag.string, decoded.constants[0].type_tag);
+
+    // A different source hash invalidates the interface
+    const other = [_]u8{8} ** 32;
+    try std.testing.expectError(error.StaleInterface, ModuleInterface.decode(allocator, bytes, other));
+    try std.testing.expectError(error.InvalidInterface, ModuleInterface.decode(allocator, bytes[0 .. bytes.len - 1], hash));
+}
+
+test "TypeTag.fromAnnotation leaves unknown annotations unknown" {
+    try std.testing.expectEqual(TypeTag.int, TypeTag.fromAnnotation("int"));
+    try std.testing.expectEqual(TypeTag.string, TypeTag.fromAnnotation("str"));
+    try std.testing.expectEqual(TypeTag.none, TypeTag.fromAnnotation("None"));
+    try std.testing.expectEqual(TypeTag.unknown, TypeTag.fromAnnotation(null));
+    try std.testing.expectEqual(TypeTag.unknown, TypeTag.fromAnnotation("list[int]"));
+    try std.testing.expectEqual(TypeTag.unknown, TypeTag.fromAnnotation("Point"));
+}
@@ -362,9 +362,20 @@ pub fn inferBuiltinCall(
         return .counter; // Counter type for hashmap_helper.StringHashMap
     }
     if (func_hash == DEQUE_HASH) {
-        return .deque; // Deque type for std.ArrayList
+        return .deque; // runtime._collections.Deque
     }
 
+    // concurrent.futures executors (from concurrent.futures import ThreadPoolExecutor)
+    if (func_hash == comptime fnv_hash.hash("ThreadPoolExecutor") or
+        func_hash == comptime fnv_hash.hash("ProcessPoolExecutor"))
+    {
+        return .thread_pool_executor;
+    }
+
+    // flask (from flask import Flask, jsonify)
+    if (func_hash == comptime fnv_hash.hash("Flask")) return .flask_app;
+    if (func_hash == comptime fnv_hash.hash("jsonify")) return .flask_response;
+
     // itertools module functions (from itertools import repeat, chain, etc.)
     // These return lists (std.ArrayList(i64))
     const REPEAT_HASH = comptime fnv_hash.hash("repeat");
@@ -258,6 +258,26 @@ pub fn inferMethodCall(
         if (method_hash == CLOSE_HASH) return .none;
     }
 
+    // mmap methods: reads are zero-copy bytes views, offsets are ints
+    if (obj_type == .mmap) {
+        const method_hash = fnv_hash.hash(method_name);
+        const READ_HASH = comptime fnv_hash.hash("read");
+        const READLINE_HASH = comptime fnv_hash.hash("readline");
+        const FIND_HASH = comptime fnv_hash.hash("find");
+        const RFIND_HASH = comptime fnv_hash.hash("rfind");
+        const READ_BYTE_HASH = comptime fnv_hash.hash("read_byte");
+        const SIZE_HASH = comptime fnv_hash.hash("size");
+        const TELL_HASH = comptime fnv_hash.hash("tell");
+        const WRITE_HASH = comptime fnv_hash.hash("write");
+        if (method_hash == READ_HASH or method_hash == READLINE_HASH) return .bytes;
+        if (method_hash == FIND_HASH or method_hash == RFIND_HASH or method_hash == READ_BYTE_HASH or
+            method_hash == SIZE_HASH or method_hash == TELL_HASH or method_hash == WRITE_HASH)
+        {
+            return .{ .int = .bounded };
+        }
+        return .none;
+    }
+
     // Float methods
     if (obj_type == .float) {
         const method_hash = fnv_hash.hash(method_name);
@@ -44,6 +44,9 @@ pub fn inferModuleFunctionCall(
     const UUID_HASH = comptime fnv_hash.hash("uuid");
     const THREADING_HASH = comptime fnv_hash.hash("threading");
     const SQLITE3_HASH = comptime fnv_hash.hash("sqlite3");
+    const CONCURRENT_FUTURES_HASH = comptime fnv_hash.hash("concurrent.futures");
+    const FLASK_HASH = comptime fnv_hash.hash("flask");
+    const MMAP_HASH = comptime fnv_hash.hash("mmap");
     const ZLIB_HASH = comptime fnv_hash.hash("zlib");
     const GZIP_HASH = comptime fnv_hash.hash("gzip");
     const RE_HASH = comptime fnv_hash.hash("re");
@@ -87,6 +90,25 @@ pub fn inferModuleFunctionCall(
             if (func_hash == CONNECT_HASH) return .sqlite_connection;
             return .unknown;
         },
+        CONCURRENT_FUTURES_HASH => {
+            // Both executors are the same worker pool in compiled code
+            const func_hash = fnv_hash.hash(func_name);
+            const THREAD_POOL_HASH = comptime fnv_hash.hash("ThreadPoolExecutor");
+            const PROCESS_POOL_HASH = comptime fnv_hash.hash("ProcessPoolExecutor");
+            if (func_hash == THREAD_POOL_HASH or func_hash == PROCESS_POOL_HASH) return .thread_pool_executor;
+            return .unknown;
+        },
+        MMAP_HASH => {
+            const func_hash = fnv_hash.hash(func_name);
+            if (func_hash == comptime fnv_hash.hash("mmap")) return .mmap;
+            return .unknown;
+        },
+        FLASK_HASH => {
+            const func_hash = fnv_hash.hash(func_name);
+            if (func_hash == comptime fnv_hash.hash("Flask")) return .flask_app;
+            if (func_hash == comptime fnv_hash.hash("jsonify")) return .flask_response;
+            return .unknown;
+        },
         ZLIB_HASH => {
             // zlib compress/decompress returns bytes (string)
             const func_hash = fnv_hash.hash(func_name);
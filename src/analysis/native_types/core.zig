@@ -103,11 +103,15 @@ pub const NativeType = union(enum) {
     file: void, // File object from open()
     hash_object: void, // hashlib hash object (md5, sha256, etc.)
     counter: void, // collections.Counter - hashmap_helper.StringHashMap(i64)
-    deque: void, // collections.deque - std.ArrayList
+    deque: void, // collections.deque - runtime._collections.Deque (ArrayList-compatible)
     sqlite_connection: void, // sqlite3.Connection - database connection
     sqlite_cursor: void, // sqlite3.Cursor - database cursor
     sqlite_rows: void, // []sqlite3.Row - result from fetchall/fetchmany
     sqlite_row: void, // ?sqlite3.Row - result from fetchone
+    thread_pool_executor: void, // concurrent.futures.ThreadPoolExecutor - worker pool
+    mmap: void, // mmap.mmap - runtime.mmap.MMap over a file mapping
+    flask_app: void, // flask.Flask application - route table + HTTP server
+    flask_response: void, // flask.jsonify() result - JSON body or prepared response
     exception: []const u8, // Exception type - stores exception name (RuntimeError, ValueError, etc.)
     cdll: []const u8, // ctypes.CDLL - stores library path for FFI
     c_func: struct {
@@ -321,11 +325,15 @@ pub const NativeType = union(enum) {
             .file => try buf.appendSlice(allocator, "*runtime.PyObject"),
             .hash_object => try buf.appendSlice(allocator, "hashlib.HashObject"),
             .counter => try buf.appendSlice(allocator, "hashmap_helper.StringHashMap(i64)"),
-            .deque => try buf.appendSlice(allocator, "std.ArrayList(i64)"),
+            .deque => try buf.appendSlice(allocator, "runtime._collections.Deque(i64)"),
             .sqlite_connection => try buf.appendSlice(allocator, "sqlite3.Connection"),
             .sqlite_cursor => try buf.appendSlice(allocator, "sqlite3.Cursor"),
             .sqlite_rows => try buf.appendSlice(allocator, "[]sqlite3.Row"),
             .sqlite_row => try buf.appendSlice(allocator, "?sqlite3.Row"),
+            .thread_pool_executor => try buf.appendSlice(allocator, "*runtime.concurrent_futures.ThreadPoolExecutor"),
+            .mmap => try buf.appendSlice(allocator, "runtime.mmap.MMap"),
+            .flask_app => try buf.appendSlice(allocator, "*runtime.flask.Flask"),
+            .flask_response => try buf.appendSlice(allocator, "runtime.flask.Json"),
             .exception => |exc_name| {
                 // Exception type: *runtime.RuntimeError, *runtime.ValueError, etc.
                 try buf.appendSlice(allocator, "*runtime.");
@@ -208,8 +208,8 @@ pub fn inferExprWithInferrer(
                         // String indexing returns a single character
                         // For now, treat as string for simplicity
                         break :blk .{ .string = .slice };
-                    } else if (obj_type == .bytes) {
-                        // Bytes indexing returns a single byte (u8/int)
+                    } else if (obj_type == .bytes or obj_type == .mmap) {
+                        // Bytes/mmap indexing returns a single byte (u8/int)
                         break :blk .{ .int = .bounded };
                     } else if (obj_type == .array) {
                         break :blk obj_type.array.element_type.*;
@@ -244,8 +244,8 @@ pub fn inferExprWithInferrer(
                     // list[1:4] -> list
                     if (obj_type == .string) {
                         break :blk .{ .string = .slice };
-                    } else if (obj_type == .bytes) {
-                        // Bytes slicing returns bytes
+                    } else if (obj_type == .bytes or obj_type == .mmap) {
+                        // Bytes slicing returns bytes (a view of the mapping for mmap)
                         break :blk .bytes;
                     } else if (obj_type == .array) {
                         // Array slices become lists (dynamic)
@@ -323,6 +323,14 @@ pub fn inferExprWithInferrer(
                     }
                 }
 
+                // Constants of imported Python modules, registered from their
+                // interface as "module.NAME" (see analysis/module_interface.zig);
+                // a local class instance of the same name was handled above
+                var qualified_buf: [256]u8 = undefined;
+                if (std.fmt.bufPrint(&qualified_buf, "{s}.{s}", .{ module_name, a.attr })) |qualified| {
+                    if (var_types.get(qualified)) |const_type| break :blk const_type;
+                } else |_| {}
+
                 // Heuristic fallback: Check all known classes for a field with this name
                 // This works when field names are unique across classes
                 var class_it = class_fields.iterator();
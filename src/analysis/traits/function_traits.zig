@@ -2019,6 +2019,8 @@ fn analyzeStmtForTraits(stmt: ast.Node, ctx: *AnalyzerContext) !void {
         },
         .yield_stmt, .yield_from_stmt => {
             ctx.is_generator = true;
+            // Generators return their values as an allocated slice (or error)
+            ctx.can_error = true;
         },
         else => {
             ctx.op_count += 1;
@@ -2034,11 +2036,9 @@ fn analyzeExprForTraits(expr: ast.Node, ctx: *AnalyzerContext) error{OutOfMemory
             ctx.await_count += 1;
             try analyzeExprForTraits(await_expr.value.*, ctx);
         },
-        .yield_stmt => {
-            ctx.is_generator = true;
-        },
-        .yield_from_stmt => {
+        .yield_stmt, .yield_from_stmt => {
             ctx.is_generator = true;
+            ctx.can_error = true;
         },
         .call => |call| {
             // Check function name for traits
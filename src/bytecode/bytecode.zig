@@ -44,7 +44,8 @@ pub fn execute(allocator: std.mem.Allocator, program: *const Program) vm.VMError
             // Native: use VM directly
             var executor = VM.init(allocator);
             defer executor.deinit();
-            return executor.execute(program);
+            // Results live in the VM's value arena, copy them out before deinit
+            return executor.persist(try executor.execute(program));
         },
         .wasm_browser => {
             // Browser: use Web Worker for isolation if needed
@@ -8,7 +8,7 @@
 /// 2. Dead code elimination - only included if eval()/exec() called
 /// 3. Same bytecode format for all targets
 const std = @import("std");
-const opcode = @import("opcode.zig");
+pub const opcode = @import("opcode.zig");
 const builtin = @import("builtin");
 
 const OpCode = opcode.OpCode;
@@ -67,78 +67,178 @@ pub const VMError = error{
 /// Virtual Machine state
 pub const VM = struct {
     allocator: std.mem.Allocator,
-    /// Operand stack
-    stack: std.ArrayList(StackValue),
+    /// Operand stack (MAX_STACK_DEPTH slots, allocated on first execute)
+    stack: []StackValue,
+    sp: usize,
     /// Call frames for function calls
     frames: std.ArrayList(Frame),
     /// Global variables
     globals: std.StringHashMap(StackValue),
+    /// Frame storage (locals, name maps), recycled on every execute()
+    scratch: std.heap.ArenaAllocator,
+    /// Lists, tuples and strings built by the program, recycled at the start
+    /// of every execute(). Values returned by execute() stay valid until the
+    /// next execute(), reset() or deinit() - see persist()
+    values: std.heap.ArenaAllocator,
 
     pub const Frame = struct {
         program: *const Program,
         ip: usize,
-        locals: std.StringHashMap(StackValue),
+        /// Slot per program.varnames entry (LOAD_FAST/STORE_FAST), null = unbound
+        locals: []?StackValue,
+        /// Dynamic names for LOAD_NAME/STORE_NAME (only touched by name-based code)
+        names: std.StringHashMapUnmanaged(StackValue) = .{},
     };
 
     pub fn init(allocator: std.mem.Allocator) VM {
         return .{
             .allocator = allocator,
-            .stack = std.ArrayList(StackValue){},
+            .stack = &.{},
+            .sp = 0,
             .frames = std.ArrayList(Frame){},
             .globals = std.StringHashMap(StackValue).init(allocator),
+            .scratch = std.heap.ArenaAllocator.init(allocator),
+            .values = std.heap.ArenaAllocator.init(allocator),
         };
     }
 
     pub fn deinit(self: *VM) void {
-        self.stack.deinit(self.allocator);
-        for (self.frames.items) |*frame| {
-            frame.locals.deinit();
-        }
+        self.allocator.free(self.stack);
         self.frames.deinit(self.allocator);
         self.globals.deinit();
+        self.scratch.deinit();
+        self.values.deinit();
+    }
+
+    /// Drop every value built by earlier executions (keeps the memory for reuse)
+    pub fn reset(self: *VM) void {
+        _ = self.values.reset(.retain_capacity);
+    }
+
+    /// Copy a result out of the VM's value arena into the VM's allocator,
+    /// for callers that deinit the VM before using the result
+    pub fn persist(self: *VM, value: StackValue) VMError!StackValue {
+        return switch (value) {
+            .string => |s| .{ .string = try self.allocator.dupe(u8, s) },
+            .list => |items| .{ .list = try self.persistItems(items) },
+            .tuple => |items| .{ .tuple = try self.persistItems(items) },
+            else => value,
+        };
+    }
+
+    fn persistItems(self: *VM, items: []const StackValue) VMError![]const StackValue {
+        const copy = try self.allocator.alloc(StackValue, items.len);
+        for (items, copy) |item, *dst| dst.* = try self.persist(item);
+        return copy;
     }
 
     /// Execute a program and return the result
     pub fn execute(self: *VM, program: *const Program) VMError!StackValue {
-        try self.frames.append(self.allocator, .{
-            .program = program,
-            .ip = 0,
-            .locals = std.StringHashMap(StackValue).init(self.allocator),
-        });
-
+        if (self.stack.len == 0) {
+            self.stack = try self.allocator.alloc(StackValue, opcode.MAX_STACK_DEPTH);
+        }
+        // Leftovers from an execution that ended in an error
+        self.sp = 0;
+        self.frames.clearRetainingCapacity();
+        _ = self.scratch.reset(.retain_capacity);
+        // Each top-level run starts from an empty value arena, so a VM that
+        // evaluates many programs does not keep every earlier result
+        _ = self.values.reset(.retain_capacity);
+
+        try self.pushFrame(program);
         while (self.frames.items.len > 0) {
-            const frame = &self.frames.items[self.frames.items.len - 1];
-            if (frame.ip >= frame.program.instructions.len) {
-                frame.locals.deinit();
-                _ = self.frames.pop();
-                continue;
-            }
+            try self.run(&self.frames.items[self.frames.items.len - 1]);
+        }
 
-            const inst = frame.program.instructions[frame.ip];
-            frame.ip += 1;
+        return if (self.sp > 0) self.pop() else .{ .none = {} };
+    }
 
-            try self.executeInstruction(inst, frame);
-        }
+    fn pushFrame(self: *VM, program: *const Program) VMError!void {
+        const locals = try self.scratch.allocator().alloc(?StackValue, program.varnames.len);
+        @memset(locals, null);
+        try self.frames.append(self.allocator, .{ .program = program, .ip = 0, .locals = locals });
+    }
 
-        return if (self.stack.items.len > 0) self.stack.pop().? else .{ .none = {} };
+    /// Next opcode; running off the end of the code acts like RETURN_VALUE
+    inline fn fetch(code: []const Instruction, ip: *usize, arg: *u24) OpCode {
+        if (ip.* >= code.len) return .RETURN_VALUE;
+        const inst = code[ip.*];
+        ip.* += 1;
+        arg.* = inst.arg;
+        return inst.opcode;
     }
 
-    fn executeInstruction(self: *VM, inst: Instruction, frame: *Frame) VMError!void {
-        switch (inst.opcode) {
-            .POP_TOP => _ = self.pop() catch {},
-            .DUP_TOP => try self.push(try self.peek()),
-            .NOP => {},
+    /// Run the top frame until it returns.
+    /// Threaded dispatch: every handler ends in its own `continue :dispatch`,
+    /// so each one gets its own indirect branch instead of sharing one switch.
+    fn run(self: *VM, frame: *Frame) VMError!void {
+        const code = frame.program.instructions;
+        const constants = frame.program.constants;
+        const locals = frame.locals;
+        var ip = frame.ip;
+        var arg: u24 = 0;
+
+        dispatch: switch (fetch(code, &ip, &arg)) {
+            .POP_TOP => {
+                _ = self.pop() catch {};
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .DUP_TOP => {
+                try self.push(try self.peek());
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .ROT_TWO => {
+                if (self.sp < 2) return VMError.StackUnderflow;
+                std.mem.swap(StackValue, &self.stack[self.sp - 1], &self.stack[self.sp - 2]);
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .ROT_THREE => {
+                if (self.sp < 3) return VMError.StackUnderflow;
+                const top = self.stack[self.sp - 1];
+                self.stack[self.sp - 1] = self.stack[self.sp - 2];
+                self.stack[self.sp - 2] = self.stack[self.sp - 3];
+                self.stack[self.sp - 3] = top;
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .NOP => continue :dispatch fetch(code, &ip, &arg),
 
             // Load/Store
-            .LOAD_CONST => try self.push(self.loadConstant(frame.program.constants[inst.arg])),
-            .LOAD_NAME, .LOAD_GLOBAL => {
-                const name = frame.program.names[inst.arg];
-                const val = frame.locals.get(name) orelse self.globals.get(name) orelse return VMError.NameError;
+            .LOAD_CONST => {
+                try self.push(loadConstant(constants[arg]));
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .LOAD_FAST => {
+                // Module code reads a name before binding it: fall back to the
+                // host-provided global of the same name
+                try self.push(locals[arg] orelse
+                    self.globals.get(frame.program.varnames[arg]) orelse
+                    return VMError.NameError);
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .STORE_FAST => {
+                locals[arg] = try self.pop();
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .DELETE_FAST => {
+                if (locals[arg] == null) return VMError.NameError;
+                locals[arg] = null;
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .LOAD_GLOBAL => {
+                const name = frame.program.names[arg];
+                try self.push(self.globals.get(name) orelse return VMError.NameError);
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .LOAD_NAME => {
+                const name = frame.program.names[arg];
+                const val = frame.names.get(name) orelse self.globals.get(name) orelse return VMError.NameError;
                 try self.push(val);
+                continue :dispatch fetch(code, &ip, &arg);
             },
             .STORE_NAME => {
-                const name = frame.program.names[inst.arg];
-                try frame.locals.put(name, try self.pop());
+                const name = frame.program.names[arg];
+                try frame.names.put(self.scratch.allocator(), name, try self.pop());
+                continue :dispatch fetch(code, &ip, &arg);
             },
 
             // Unary
@@ -149,54 +249,111 @@ pub const VM = struct {
                     .float => |f| .{ .float = -f },
                     else => return VMError.TypeError,
                 });
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .UNARY_NOT => {
+                try self.push(.{ .bool = !(try self.pop()).isTruthy() });
+                continue :dispatch fetch(code, &ip, &arg);
             },
-            .UNARY_NOT => try self.push(.{ .bool = !(try self.pop()).isTruthy() }),
 
-            // Binary
-            .BINARY_ADD => try self.binaryOp(.add),
-            .BINARY_SUBTRACT => try self.binaryOp(.sub),
-            .BINARY_MULTIPLY => try self.binaryOp(.mul),
-            .BINARY_TRUE_DIVIDE => try self.binaryOp(.div),
-            .BINARY_FLOOR_DIVIDE => try self.binaryOp(.floor_div),
-            .BINARY_MODULO => try self.binaryOp(.mod),
-            .BINARY_POWER => try self.binaryOp(.pow),
+            // Binary (in-place forms behave the same for immutable values)
+            .BINARY_ADD, .INPLACE_ADD => {
+                try self.binaryOp(.add);
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .BINARY_SUBTRACT, .INPLACE_SUBTRACT => {
+                try self.binaryOp(.sub);
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .BINARY_MULTIPLY, .INPLACE_MULTIPLY => {
+                try self.binaryOp(.mul);
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .BINARY_TRUE_DIVIDE, .INPLACE_TRUE_DIVIDE => {
+                try self.binaryOp(.div);
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .BINARY_FLOOR_DIVIDE, .INPLACE_FLOOR_DIVIDE => {
+                try self.binaryOp(.floor_div);
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .BINARY_MODULO, .INPLACE_MODULO => {
+                try self.binaryOp(.mod);
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .BINARY_POWER, .INPLACE_POWER => {
+                try self.binaryOp(.pow);
+                continue :dispatch fetch(code, &ip, &arg);
+            },
 
             // Comparison
-            .COMPARE_LT => try self.compareOp(.lt),
-            .COMPARE_LE => try self.compareOp(.le),
-            .COMPARE_EQ => try self.compareOp(.eq),
-            .COMPARE_NE => try self.compareOp(.ne),
-            .COMPARE_GT => try self.compareOp(.gt),
-            .COMPARE_GE => try self.compareOp(.ge),
+            .COMPARE_LT => {
+                try self.compareOp(.lt);
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .COMPARE_LE => {
+                try self.compareOp(.le);
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .COMPARE_EQ => {
+                try self.compareOp(.eq);
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .COMPARE_NE => {
+                try self.compareOp(.ne);
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .COMPARE_GT => {
+                try self.compareOp(.gt);
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .COMPARE_GE => {
+                try self.compareOp(.ge);
+                continue :dispatch fetch(code, &ip, &arg);
+            },
 
             // Control flow
-            .JUMP_ABSOLUTE => frame.ip = inst.arg,
-            .JUMP_FORWARD => frame.ip += inst.arg,
-            .POP_JUMP_IF_FALSE => if (!(try self.pop()).isTruthy()) {
-                frame.ip = inst.arg;
+            .JUMP_ABSOLUTE => {
+                ip = arg;
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .JUMP_FORWARD => {
+                ip += arg;
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .POP_JUMP_IF_FALSE => {
+                if (!(try self.pop()).isTruthy()) ip = arg;
+                continue :dispatch fetch(code, &ip, &arg);
             },
-            .POP_JUMP_IF_TRUE => if ((try self.pop()).isTruthy()) {
-                frame.ip = inst.arg;
+            .POP_JUMP_IF_TRUE => {
+                if ((try self.pop()).isTruthy()) ip = arg;
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .JUMP_IF_FALSE_OR_POP => {
+                if (!(try self.peek()).isTruthy()) {
+                    ip = arg;
+                } else {
+                    _ = try self.pop();
+                }
+                continue :dispatch fetch(code, &ip, &arg);
+            },
+            .JUMP_IF_TRUE_OR_POP => {
+                if ((try self.peek()).isTruthy()) {
+                    ip = arg;
+                } else {
+                    _ = try self.pop();
+                }
+                continue :dispatch fetch(code, &ip, &arg);
             },
 
             // Build
             .BUILD_TUPLE => {
-                const items = try self.allocator.alloc(StackValue, inst.arg);
-                var i: usize = inst.arg;
-                while (i > 0) {
-                    i -= 1;
-                    items[i] = try self.pop();
-                }
-                try self.push(.{ .tuple = items });
+                try self.push(.{ .tuple = try self.popItems(arg) });
+                continue :dispatch fetch(code, &ip, &arg);
             },
             .BUILD_LIST => {
-                const items = try self.allocator.alloc(StackValue, inst.arg);
-                var i: usize = inst.arg;
-                while (i > 0) {
-                    i -= 1;
-                    items[i] = try self.pop();
-                }
-                try self.push(.{ .list = items });
+                try self.push(.{ .list = try self.popItems(arg) });
+                continue :dispatch fetch(code, &ip, &arg);
             },
 
             // Subscript
@@ -224,58 +381,62 @@ pub const VM = struct {
                     },
                     else => return VMError.TypeError,
                 });
+                continue :dispatch fetch(code, &ip, &arg);
             },
 
             // Function calls
             .CALL_FUNCTION => {
-                const argc = inst.arg;
-                const args = try self.allocator.alloc(StackValue, argc);
-                defer self.allocator.free(args);
-                var i: usize = argc;
-                while (i > 0) {
-                    i -= 1;
-                    args[i] = try self.pop();
-                }
-                _ = try self.pop(); // function - TODO: call it
+                if (self.sp < @as(usize, arg) + 1) return VMError.StackUnderflow;
+                self.sp -= @as(usize, arg) + 1; // args + function - TODO: call it
                 try self.push(.{ .none = {} }); // placeholder return
+                continue :dispatch fetch(code, &ip, &arg);
             },
 
             .RETURN_VALUE => {
-                const ret = try self.pop();
-                if (self.frames.pop()) |f| {
-                    var mf = f;
-                    mf.locals.deinit();
-                }
-                try self.push(ret);
+                // Also reached by running off the end with nothing to return
+                const ret: ?StackValue = if (self.sp > 0) self.pop() catch unreachable else null;
+                _ = self.frames.pop();
+                if (ret) |r| try self.push(r);
+                return;
             },
 
             .HALT => {
-                while (self.frames.pop()) |f| {
-                    var mf = f;
-                    mf.locals.deinit();
-                }
+                self.frames.clearRetainingCapacity();
+                return;
             },
 
             else => return VMError.NotImplemented,
         }
     }
 
-    fn push(self: *VM, val: StackValue) VMError!void {
-        if (self.stack.items.len >= opcode.MAX_STACK_DEPTH) return VMError.StackOverflow;
-        self.stack.append(self.allocator, val) catch return VMError.OutOfMemory;
+    /// Pop n items into a new slice (in push order)
+    fn popItems(self: *VM, n: usize) VMError![]const StackValue {
+        if (self.sp < n) return VMError.StackUnderflow;
+        if (n == 0) return &.{};
+        const items = try self.values.allocator().alloc(StackValue, n);
+        @memcpy(items, self.stack[self.sp - n .. self.sp]);
+        self.sp -= n;
+        return items;
     }
 
-    fn pop(self: *VM) VMError!StackValue {
-        if (self.stack.items.len == 0) return VMError.StackUnderflow;
-        return self.stack.pop().?;
+    inline fn push(self: *VM, val: StackValue) VMError!void {
+        if (self.sp >= self.stack.len) return VMError.StackOverflow;
+        self.stack[self.sp] = val;
+        self.sp += 1;
     }
 
-    fn peek(self: *VM) VMError!StackValue {
-        if (self.stack.items.len == 0) return VMError.StackUnderflow;
-        return self.stack.items[self.stack.items.len - 1];
+    inline fn pop(self: *VM) VMError!StackValue {
+        if (self.sp == 0) return VMError.StackUnderflow;
+        self.sp -= 1;
+        return self.stack[self.sp];
     }
 
-    fn loadConstant(_: *VM, val: Value) StackValue {
+    inline fn peek(self: *VM) VMError!StackValue {
+        if (self.sp == 0) return VMError.StackUnderflow;
+        return self.stack[self.sp - 1];
+    }
+
+    fn loadConstant(val: Value) StackValue {
         return switch (val) {
             .none => .{ .none = {} },
             .bool => |b| .{ .bool = b },
@@ -335,7 +496,7 @@ pub const VM = struct {
             .string => |as| switch (b) {
                 .string => |bs| switch (op) {
                     .add => blk: {
-                        const new = try self.allocator.alloc(u8, as.len + bs.len);
+                        const new = try self.values.allocator().alloc(u8, as.len + bs.len);
                         @memcpy(new[0..as.len], as);
                         @memcpy(new[as.len..], bs);
                         break :blk .{ .string = new };
@@ -488,3 +649,125 @@ test "vm comparison" {
     const result = try vm.execute(&program);
     try std.testing.expectEqual(true, result.bool);
 }
+
+fn testProgram(instructions: []const Instruction, constants: []const Value, varnames: []const []const u8) Program {
+    return .{
+        .instructions = instructions,
+        .constants = constants,
+        .varnames = varnames,
+        .names = &.{},
+        .cellvars = &.{},
+        .freevars = &.{},
+        .source_map = &.{},
+        .filename = "<test>",
+        .name = "<module>",
+        .firstlineno = 1,
+        .argcount = 0,
+        .posonlyargcount = 0,
+        .kwonlyargcount = 0,
+        .stacksize = 256,
+        .flags = .{},
+    };
+}
+
+test "vm fast locals loop" {
+    const allocator = std.testing.allocator;
+
+    var vm = VM.init(allocator);
+    defer vm.deinit();
+
+    // total = 0; i = 0
+    // while i < 10: total += i; i += 1
+    // total
+    const instructions = [_]Instruction{
+        Instruction.init(.LOAD_CONST, 0),
+        Instruction.init(.STORE_FAST, 0),
+        Instruction.init(.LOAD_CONST, 0),
+        Instruction.init(.STORE_FAST, 1),
+        Instruction.init(.LOAD_FAST, 1), // 4: loop head
+        Instruction.init(.LOAD_CONST, 1),
+        Instruction.init(.COMPARE_LT, 0),
+        Instruction.init(.POP_JUMP_IF_FALSE, 17),
+        Instruction.init(.LOAD_FAST, 0),
+        Instruction.init(.LOAD_FAST, 1),
+        Instruction.init(.INPLACE_ADD, 0),
+        Instruction.init(.STORE_FAST, 0),
+        Instruction.init(.LOAD_FAST, 1),
+        Instruction.init(.LOAD_CONST, 2),
+        Instruction.init(.INPLACE_ADD, 0),
+        Instruction.init(.STORE_FAST, 1),
+        Instruction.init(.JUMP_ABSOLUTE, 4),
+        Instruction.init(.LOAD_FAST, 0), // 17
+        Instruction.init(.RETURN_VALUE, 0),
+    };
+    const constants = [_]Value{ .{ .int = 0 }, .{ .int = 10 }, .{ .int = 1 } };
+    const varnames = [_][]const u8{ "total", "i" };
+    const program = testProgram(&instructions, &constants, &varnames);
+
+    try std.testing.expectEqual(@as(i64, 45), (try vm.execute(&program)).int);
+    // Re-running starts from fresh, unbound slots
+    try std.testing.expectEqual(@as(i64, 45), (try vm.execute(&program)).int);
+
+    // Reading an unbound slot with no global of that name is a NameError
+    const unbound = [_]Instruction{Instruction.init(.LOAD_FAST, 0)};
+    const bad = testProgram(&unbound, &.{}, &varnames);
+    try std.testing.expectError(VMError.NameError, vm.execute(&bad));
+}
+
+test "vm tuple subscript and persist" {
+    const allocator = std.testing.allocator;
+
+    var vm = VM.init(allocator);
+    defer vm.deinit();
+
+    // (1, 2, 3)[-1], then the tuple itself
+    const instructions = [_]Instruction{
+        Instruction.init(.LOAD_CONST, 0),
+        Instruction.init(.LOAD_CONST, 1),
+        Instruction.init(.LOAD_CONST, 2),
+        Instruction.init(.BUILD_TUPLE, 3),
+        Instruction.init(.DUP_TOP, 0),
+        Instruction.init(.LOAD_CONST, 3),
+        Instruction.init(.BINARY_SUBSCR, 0),
+        Instruction.init(.STORE_FAST, 0),
+        Instruction.init(.RETURN_VALUE, 0),
+    };
+    const constants = [_]Value{ .{ .int = 1 }, .{ .int = 2 }, .{ .int = 3 }, .{ .int = -1 } };
+    const varnames = [_][]const u8{"last"};
+    const program = testProgram(&instructions, &constants, &varnames);
+
+    const result = try vm.execute(&program);
+    try std.testing.expectEqual(@as(usize, 3), result.tuple.len);
+    try std.testing.expectEqual(@as(i64, 3), result.tuple[2].int);
+
+    const kept = try vm.persist(result);
+    defer allocator.free(kept.tuple);
+    vm.reset();
+    try std.testing.expectEqual(@as(i64, 2), kept.tuple[1].int);
+}
+
+test "vm recycles the value arena on each execute" {
+    const allocator = std.testing.allocator;
+
+    var vm = VM.init(allocator);
+    defer vm.deinit();
+
+    // (1, 2, 3): every run builds a new tuple in the value arena
+    const instructions = [_]Instruction{
+        Instruction.init(.LOAD_CONST, 0),
+        Instruction.init(.LOAD_CONST, 1),
+        Instruction.init(.LOAD_CONST, 2),
+        Instruction.init(.BUILD_TUPLE, 3),
+        Instruction.init(.RETURN_VALUE, 0),
+    };
+    const constants = [_]Value{ .{ .int = 1 }, .{ .int = 2 }, .{ .int = 3 } };
+    const program = testProgram(&instructions, &constants, &.{});
+
+    _ = try vm.execute(&program);
+    const capacity = vm.values.queryCapacity();
+    for (0..100) |_| {
+        const result = try vm.execute(&program);
+        try std.testing.expectEqual(@as(i64, 3), result.tuple[2].int);
+    }
+    try std.testing.expectEqual(capacity, vm.values.queryCapacity());
+}
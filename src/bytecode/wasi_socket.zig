@@ -122,7 +122,7 @@ pub fn executeWasiEdge(
     if (!needsIsolation(program)) {
         var executor = VM.init(allocator);
         defer executor.deinit();
-        return executor.execute(program);
+        return executor.persist(try executor.execute(program));
     }
 
     // For complex code, use socket communication
@@ -159,7 +159,7 @@ pub fn executeBrowser(
     if (!needsIsolation(program)) {
         var executor = VM.init(allocator);
         defer executor.deinit();
-        return executor.execute(program);
+        return executor.persist(try executor.execute(program));
     }
 
     // For complex code, spawn worker
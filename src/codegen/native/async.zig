@@ -52,11 +52,14 @@ pub fn genAsyncioRun(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
                 try self.emit(actual_name);
                 try self.emit("_async();\n");
                 try self.emit("    defer __global_allocator.destroy(__main_frame);\n");
+                try self.emit("    var __ready: std.ArrayListUnmanaged(usize) = .{};\n");
+                try self.emit("    defer __ready.deinit(__global_allocator);\n");
                 try self.emit("    while (");
                 try self.emit(actual_name);
                 try self.emit("_poll(__main_frame) == null) {\n");
-                try self.emit("        // Yield to allow other work\n");
-                try self.emit("        std.Thread.yield() catch {};\n");
+                try self.emit("        // Sleep until the next timer fires instead of spinning\n");
+                try self.emit("        if (!(try runtime.netpoller.waitTimers(__global_allocator, &__ready))) std.Thread.yield() catch {};\n");
+                try self.emit("        __ready.clearRetainingCapacity();\n");
                 try self.emit("    }\n");
                 try self.emit("    break :__asyncio_run;\n");
                 try self.emit("}");
@@ -89,7 +92,7 @@ pub fn genAsyncioGather(self: *NativeCodegen, args: []ast.Node) CodegenError!voi
     // Use state machine for I/O-bound (high concurrency, single thread)
     // Use thread pool for CPU-bound (parallel execution across cores)
     if (self.anyAsyncHasIO()) { // State machine for I/O operations
-        // State machine: poll all frames concurrently using netpoller
+        // State machine: drive all frames from the netpoller's timer heap
         try self.emit("__gather_blk: {\n");
         try self.emit("    var __results: std.ArrayListUnmanaged(i64) = .{};\n");
 
@@ -99,26 +102,10 @@ pub fn genAsyncioGather(self: *NativeCodegen, args: []ast.Node) CodegenError!voi
             try self.emit("    const __frames = ");
             try self.genExpr(starred.value.*);
             try self.emit(";\n");
-            // Poll all frames until all are done
-            try self.emit("    var __remaining = __frames.items.len;\n");
-            try self.emit("    var __done = try __global_allocator.alloc(bool, __frames.items.len);\n");
-            try self.emit("    defer __global_allocator.free(__done);\n");
-            try self.emit("    @memset(__done, false);\n");
             try self.emit("    try __results.ensureTotalCapacity(__global_allocator, __frames.items.len);\n");
             try self.emit("    for (0..__frames.items.len) |_| try __results.append(__global_allocator, 0);\n");
-            try self.emit("    while (__remaining > 0) {\n");
-            try self.emit("        runtime.netpoller.poll(1_000_000); // 1ms poll\n");
-            try self.emit("        for (__frames.items, 0..) |__frame, __idx| {\n");
-            try self.emit("            if (!__done[__idx]) {\n");
-            try self.emit("                if (worker_poll(__frame)) |__r| {\n");
-            try self.emit("                    __results.items[__idx] = __r;\n");
-            try self.emit("                    __done[__idx] = true;\n");
-            try self.emit("                    __remaining -= 1;\n");
-            try self.emit("                    __global_allocator.destroy(__frame);\n");
-            try self.emit("                }\n");
-            try self.emit("            }\n");
-            try self.emit("        }\n");
-            try self.emit("    }\n");
+            // Sleep on the next timer deadline, resume only the frames it woke
+            try state_machine.genGatherLoop(self, "    ", "__frames", "worker", "__results", true);
         } else {
             // Direct args - not commonly used with state machines
             try self.emit("    // Direct gather args not yet implemented for state machines\n");
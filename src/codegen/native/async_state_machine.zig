@@ -503,10 +503,13 @@ fn genStatementInFrame(self: *NativeCodegen, stmt: ast.Node, frame_fields: []con
                 if (call.func.* == .name) {
                     const func_name = call.func.*.name.id;
                     if (std.mem.eql(u8, func_name, "print")) {
+                        // Same buffered stdout as top-level print(), so output
+                        // from coroutines stays ordered with the rest
                         try self.emit("            ");
-                        try self.emit("std.debug.print(\"{s}\\n\", .{");
-                        if (call.args.len > 0) {
-                            try genExprInFrame(self, call.args[0], frame_fields);
+                        try self.emit("runtime.builtins.print(__global_allocator, .{");
+                        for (call.args, 0..) |arg, i| {
+                            if (i > 0) try self.emit(", ");
+                            try genExprInFrame(self, arg, frame_fields);
                         }
                         try self.emit("});\n");
                         return;
@@ -951,10 +954,6 @@ fn genAwaitCheck(self: *NativeCodegen, point: AwaitPoint, await_points: []const
         },
         .gather => {
             // Poll all frames in the tasks list concurrently
-            try self.emit("            var __remaining = frame.tasks.items.len;\n");
-            try self.emit("            var __done = __global_allocator.alloc(bool, frame.tasks.items.len) catch unreachable;\n");
-            try self.emit("            defer __global_allocator.free(__done);\n");
-            try self.emit("            @memset(__done, false);\n");
             if (point.target_var) |var_name| {
                 try self.emit("            frame.");
                 try self.emit(var_name);
@@ -966,29 +965,11 @@ fn genAwaitCheck(self: *NativeCodegen, point: AwaitPoint, await_points: []const
                 try self.emit(var_name);
                 try self.emit(".append(__global_allocator, 0) catch unreachable;\n");
             }
-            try self.emit("            while (__remaining > 0) {\n");
-            try self.emit("                std.Thread.yield() catch {};\n");
-            try self.emit("                for (frame.tasks.items, 0..) |__frame, __idx| {\n");
-            try self.emit("                    if (!__done[__idx]) {\n");
-            try self.emit("                        if (");
-            if (tasks_callee) |callee| {
-                try self.emit(callee);
-            } else {
-                try self.emit("worker");
-            }
-            try self.emit("_poll(__frame)) |__r| {\n");
-            if (point.target_var) |var_name| {
-                try self.emit("                            frame.");
-                try self.emit(var_name);
-                try self.emit(".items[__idx] = __r;\n");
-            }
-            try self.emit("                            __done[__idx] = true;\n");
-            try self.emit("                            __remaining -= 1;\n");
-            try self.emit("                            __global_allocator.destroy(__frame);\n");
-            try self.emit("                        }\n");
-            try self.emit("                    }\n");
-            try self.emit("                }\n");
-            try self.emit("            }\n");
+            const results = if (point.target_var) |var_name|
+                try std.fmt.allocPrint(self.allocator, "frame.{s}", .{var_name})
+            else
+                null;
+            try genGatherLoop(self, "            ", "frame.tasks", tasks_callee orelse "worker", results, false);
         },
         else => {
             try self.emit("            // Generic await - not yet implemented\n");
@@ -996,6 +977,47 @@ fn genAwaitCheck(self: *NativeCodegen, point: AwaitPoint, await_points: []const
     }
 }
 
+/// Emit the gather event loop over `frames` (an ArrayList of frame pointers).
+/// Every frame is polled once; after that the loop sleeps until the next timer
+/// deadline and resumes only the frames whose timers fired (timers are tagged
+/// with the slot being polled). `results`, if given, is a pre-sized
+/// ArrayList(i64) receiving each frame's result. `oom` handles allocation
+/// failure ("try " in fallible functions, "" with catch unreachable otherwise).
+pub fn genGatherLoop(self: *NativeCodegen, indent: []const u8, frames: []const u8, poll_fn: []const u8, results: ?[]const u8, fallible: bool) CodegenError!void {
+    const oom_pre = if (fallible) "try " else "";
+    const oom_post = if (fallible) "" else " catch unreachable";
+    const w = self.output.writer(self.allocator);
+    try w.print("{s}var __remaining = {s}.items.len;\n", .{ indent, frames });
+    try w.print("{s}const __done = {s}__global_allocator.alloc(bool, {s}.items.len){s};\n", .{ indent, oom_pre, frames, oom_post });
+    try w.print("{s}defer __global_allocator.free(__done);\n", .{indent});
+    try w.print("{s}@memset(__done, false);\n", .{indent});
+    try w.print("{s}var __ready: std.ArrayListUnmanaged(usize) = .{{}};\n", .{indent});
+    try w.print("{s}defer __ready.deinit(__global_allocator);\n", .{indent});
+    try w.print("{s}for (0..{s}.items.len) |__i| {s}__ready.append(__global_allocator, __i){s};\n", .{ indent, frames, oom_pre, oom_post });
+    try w.print("{s}const __prev_owner = runtime.netpoller.setTimerOwner(null);\n", .{indent});
+    try w.print("{s}defer _ = runtime.netpoller.setTimerOwner(__prev_owner);\n", .{indent});
+    try w.print("{s}while (__remaining > 0) {{\n", .{indent});
+    try w.print("{s}    for (__ready.items) |__idx| {{\n", .{indent});
+    try w.print("{s}        if (__done[__idx]) continue;\n", .{indent});
+    try w.print("{s}        _ = runtime.netpoller.setTimerOwner(__idx);\n", .{indent});
+    try w.print("{s}        if ({s}_poll({s}.items[__idx])) |__r| {{\n", .{ indent, poll_fn, frames });
+    if (results) |r| try w.print("{s}            {s}.items[__idx] = __r;\n", .{ indent, r }) else try w.print("{s}            _ = __r;\n", .{indent});
+    try w.print("{s}            __done[__idx] = true;\n", .{indent});
+    try w.print("{s}            __remaining -= 1;\n", .{indent});
+    try w.print("{s}            __global_allocator.destroy({s}.items[__idx]);\n", .{ indent, frames });
+    try w.print("{s}        }}\n", .{indent});
+    try w.print("{s}    }}\n", .{indent});
+    try w.print("{s}    _ = runtime.netpoller.setTimerOwner(null);\n", .{indent});
+    try w.print("{s}    __ready.clearRetainingCapacity();\n", .{indent});
+    try w.print("{s}    if (__remaining == 0) break;\n", .{indent});
+    try w.print("{s}    if (!({s}runtime.netpoller.waitTimers(__global_allocator, &__ready){s})) {{\n", .{ indent, oom_pre, oom_post });
+    try w.print("{s}        // Nothing is waiting on a timer: poll every unfinished frame again\n", .{indent});
+    try w.print("{s}        for (__done, 0..) |__d, __i| if (!__d) {s}__ready.append(__global_allocator, __i){s};\n", .{ indent, oom_pre, oom_post });
+    try w.print("{s}        std.Thread.yield() catch {{}};\n", .{indent});
+    try w.print("{s}    }}\n", .{indent});
+    try w.print("{s}}}\n", .{indent});
+}
+
 fn genFrameExpr(self: *NativeCodegen, node: ast.Node) CodegenError!void {
     switch (node) {
         .name => |n| {
@@ -4,6 +4,7 @@ const ast = @import("ast");
 const CodegenError = @import("../main.zig").CodegenError;
 const NativeCodegen = @import("../main.zig").NativeCodegen;
 const producesBlockExpression = @import("../expressions.zig").producesBlockExpression;
+const generator_state_machine = @import("../generator_state_machine.zig");
 
 /// String method codegen patterns for map(str.method, items)
 const StrMethodPatterns = std.StaticStringMap([]const u8).initComptime(.{
@@ -709,6 +710,9 @@ pub fn genNext(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
         return;
     }
 
+    // Generator frame: resume it (StopIteration when exhausted)
+    if (try generator_state_machine.genFrameNext(self, args)) return;
+
     // For custom iterator objects with __next__ method
     const arg_type = self.type_inferrer.inferExpr(args[0]) catch .unknown;
     if (arg_type == .class_instance) {
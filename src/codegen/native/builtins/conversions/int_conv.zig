@@ -67,6 +67,10 @@ pub fn genLen(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
         .counter => true,
         else => false,
     };
+    const is_mmap = switch (arg_type) {
+        .mmap => true,
+        else => false,
+    };
     const is_class_instance = switch (arg_type) {
         .class_instance => true,
         else => false,
@@ -173,6 +177,14 @@ pub fn genLen(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
             try self.genExpr(args[0]);
             try self.emit(".count()");
         }
+    } else if (is_mmap) {
+        // mmap length is the size of the mapping
+        if (needs_wrap) {
+            try self.emit("__obj.size()");
+        } else {
+            try self.genExpr(args[0]);
+            try self.emit(".size()");
+        }
     } else if (is_class_instance) {
         // User-defined class with __len__ method
         // __len__ returns PythonError!i64, so we need to unwrap with try
@@ -174,12 +174,13 @@ pub fn genHelp(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
 
 /// exit([code]) - exit the interpreter
 pub fn genExit(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
+    // Buffered print() output must reach stdout before the process dies
     if (args.len > 0) {
-        try self.emit("std.process.exit(@intCast(");
+        try self.emit("blk: { const _code: u8 = @intCast(");
         try self.genExpr(args[0]);
-        try self.emit("))");
+        try self.emit("); runtime.stdout.flush(); std.process.exit(_code); break :blk; }");
     } else {
-        try self.emit("std.process.exit(0)");
+        try self.emit("blk: { runtime.stdout.flush(); std.process.exit(0); break :blk; }");
     }
 }
 
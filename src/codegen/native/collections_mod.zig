@@ -112,11 +112,24 @@ pub const genCounter = h.wrap(
     "hashmap_helper.StringHashMap(i64).init(__global_allocator)",
 );
 
-pub const genDeque = h.wrap(
-    "deque_blk: { const _iter_raw = ",
-    "; const _iterable = runtime.iterSlice(_iter_raw); var _deque = std.ArrayListUnmanaged(@TypeOf(_iterable[0])){}; for (_iterable) |item| { _deque.append(__global_allocator, item) catch continue; } break :deque_blk _deque; }",
-    "std.ArrayListUnmanaged(i64){}",
-);
+/// deque([iterable[, maxlen]]) -> runtime._collections.Deque (O(1) at both ends,
+/// ArrayList-compatible so list methods, len() and for-loops work unchanged)
+pub fn genDeque(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
+    if (args.len == 0) {
+        try self.emit("runtime._collections.Deque(i64){}");
+        return;
+    }
+    try self.emit("deque_blk: { const _iter_raw = ");
+    try self.genExpr(args[0]);
+    try self.emit("; const _iterable = runtime.iterSlice(_iter_raw); var _deque = runtime._collections.Deque(@TypeOf(_iterable[0])){");
+    const has_maxlen = args.len > 1 and !(args[1] == .constant and args[1].constant.value == .none);
+    if (has_maxlen) {
+        try self.emit(" .maxlen = @intCast(");
+        try self.genExpr(args[1]);
+        try self.emit(") ");
+    }
+    try self.emit("}; _deque.appendSlice(__global_allocator, _iterable) catch {}; break :deque_blk _deque; }");
+}
 
 /// Generate code for collections.namedtuple(typename, field_names)
 /// Returns a struct type that can be instantiated
@@ -1,14 +1,156 @@
 /// Python concurrent.futures module - High-level interface for async execution
+/// Executors lower to runtime.concurrent_futures (a std.Thread worker pool).
 const std = @import("std");
+const ast = @import("ast");
 const h = @import("mod_helper.zig");
+const CodegenError = h.CodegenError;
+const NativeCodegen = h.NativeCodegen;
 
 pub const Funcs = std.StaticStringMap(h.H).initComptime(.{
-    .{ "ThreadPoolExecutor", h.c("struct { max_workers: usize = 4, _shutdown: bool = false, pub fn submit(s: *@This(), f: anytype, a: anytype) Future { _ = s; _ = f; _ = a; return Future{}; } pub fn map(s: *@This(), f: anytype, it: anytype, t: ?f64, c: usize) []anyopaque { _ = s; _ = f; _ = it; _ = t; _ = c; return &.{}; } pub fn shutdown(s: *@This(), w: bool, cf: bool) void { _ = w; _ = cf; s._shutdown = true; } pub fn __enter__(s: *@This()) *@This() { return s; } pub fn __exit__(s: *@This(), _: anytype, _: anytype, _: anytype) void { s.shutdown(true, false); } }{}") },
-    .{ "ProcessPoolExecutor", h.c("struct { max_workers: usize = 4, _shutdown: bool = false, pub fn submit(s: *@This(), f: anytype, a: anytype) Future { _ = s; _ = f; _ = a; return Future{}; } pub fn map(s: *@This(), f: anytype, it: anytype, t: ?f64, c: usize) []anyopaque { _ = s; _ = f; _ = it; _ = t; _ = c; return &.{}; } pub fn shutdown(s: *@This(), w: bool, cf: bool) void { _ = w; _ = cf; s._shutdown = true; } pub fn __enter__(s: *@This()) *@This() { return s; } pub fn __exit__(s: *@This(), _: anytype, _: anytype, _: anytype) void { s.shutdown(true, false); } }{}") },
-    .{ "Future", h.c("struct { _done: bool = false, _cancelled: bool = false, _result: ?*anyopaque = null, _exception: ?*anyopaque = null, pub fn cancel(s: *@This()) bool { if (s._done) return false; s._cancelled = true; return true; } pub fn cancelled(s: *@This()) bool { return s._cancelled; } pub fn running(s: *@This()) bool { return !s._done and !s._cancelled; } pub fn done(s: *@This()) bool { return s._done; } pub fn result(s: *@This(), t: ?f64) ?*anyopaque { _ = t; return s._result; } pub fn exception(s: *@This(), t: ?f64) ?*anyopaque { _ = t; return s._exception; } pub fn add_done_callback(s: *@This(), f: anytype) void { _ = s; _ = f; } pub fn set_result(s: *@This(), r: anytype) void { s._result = @ptrCast(&r); s._done = true; } pub fn set_exception(s: *@This(), e: anytype) void { s._exception = @ptrCast(&e); s._done = true; } }{}") },
-    .{ "wait", h.c(".{ .done = .{}, .not_done = .{} }") }, .{ "as_completed", h.c("&[_]Future{}") },
+    .{ "ThreadPoolExecutor", genExecutor },
+    .{ "ProcessPoolExecutor", genExecutor },
+    .{ "Future", h.c("runtime.concurrent_futures.Future(void){}") },
+    .{ "wait", genWait },
+    .{ "as_completed", genAsCompleted },
     .{ "ALL_COMPLETED", h.c("\"ALL_COMPLETED\"") }, .{ "FIRST_COMPLETED", h.c("\"FIRST_COMPLETED\"") },
     .{ "FIRST_EXCEPTION", h.c("\"FIRST_EXCEPTION\"") },
     .{ "CancelledError", h.c("\"CancelledError\"") }, .{ "TimeoutError", h.c("\"TimeoutError\"") },
     .{ "BrokenExecutor", h.c("\"BrokenExecutor\"") }, .{ "InvalidStateError", h.c("\"InvalidStateError\"") },
 });
+
+/// Calls that take keyword arguments (max_workers=, return_when=)
+/// Returns false for anything the positional Funcs table handles.
+pub fn tryDispatchKw(self: *NativeCodegen, func_name: []const u8, call: ast.Node.Call) CodegenError!bool {
+    if (call.keyword_args.len == 0) return false;
+    if (std.mem.eql(u8, func_name, "ThreadPoolExecutor") or std.mem.eql(u8, func_name, "ProcessPoolExecutor")) {
+        var max_workers: ?ast.Node = if (call.args.len > 0) call.args[0] else null;
+        for (call.keyword_args) |kw| {
+            if (std.mem.eql(u8, kw.name, "max_workers")) max_workers = kw.value;
+        }
+        try emitExecutor(self, max_workers);
+        return true;
+    }
+    if (std.mem.eql(u8, func_name, "wait")) {
+        if (call.args.len == 0) return false;
+        var return_when: ?ast.Node = if (call.args.len > 2) call.args[2] else null;
+        for (call.keyword_args) |kw| {
+            if (std.mem.eql(u8, kw.name, "return_when")) return_when = kw.value;
+        }
+        try emitWait(self, call.args[0], return_when);
+        return true;
+    }
+    return false;
+}
+
+/// ThreadPoolExecutor(max_workers=None) -> *runtime.concurrent_futures.ThreadPoolExecutor
+fn genExecutor(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
+    try emitExecutor(self, if (args.len > 0) args[0] else null);
+}
+
+fn emitExecutor(self: *NativeCodegen, max_workers: ?ast.Node) CodegenError!void {
+    try self.emit("(try runtime.concurrent_futures.ThreadPoolExecutor.init(__global_allocator, ");
+    if (max_workers) |n| {
+        if (n == .constant and n.constant.value == .none) {
+            try self.emit("null");
+        } else {
+            try self.emit("@as(i64, @intCast(");
+            try self.genExpr(n);
+            try self.emit("))");
+        }
+    } else {
+        try self.emit("null");
+    }
+    try self.emit("))");
+}
+
+/// as_completed(fs) used as a value -> futures in completion order
+/// (for-loops over as_completed() are lowered to the iterator in for_basic.zig)
+fn genAsCompleted(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
+    if (args.len == 0) return;
+    try self.emit("(try (try runtime.concurrent_futures.asCompleted(__global_allocator, runtime.iterSlice(");
+    try self.genExpr(args[0]);
+    try self.emit("))).collect())");
+}
+
+/// wait(fs, timeout=None, return_when=ALL_COMPLETED) -> (done, not_done)
+fn genWait(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
+    if (args.len == 0) return;
+    try emitWait(self, args[0], if (args.len > 2) args[2] else null);
+}
+
+fn emitWait(self: *NativeCodegen, fs: ast.Node, return_when: ?ast.Node) CodegenError!void {
+    try self.emit("(try runtime.concurrent_futures.wait(__global_allocator, runtime.iterSlice(");
+    try self.genExpr(fs);
+    try self.emit("), ");
+    try self.emit(returnWhenTag(return_when));
+    try self.emit("))");
+}
+
+/// FIRST_COMPLETED / concurrent.futures.FIRST_EXCEPTION / "ALL_COMPLETED" -> enum tag
+fn returnWhenTag(node: ?ast.Node) []const u8 {
+    const n = node orelse return ".all_completed";
+    const name = switch (n) {
+        .name => |nm| nm.id,
+        .attribute => |attr| attr.attr,
+        .constant => |c| if (c.value == .string) std.mem.trim(u8, c.value.string, "\"'") else return ".all_completed",
+        else => return ".all_completed",
+    };
+    if (std.mem.eql(u8, name, "FIRST_COMPLETED")) return ".first_completed";
+    if (std.mem.eql(u8, name, "FIRST_EXCEPTION")) return ".first_exception";
+    return ".all_completed";
+}
+
+/// executor.submit/map/shutdown on a value inferred as .thread_pool_executor
+pub fn genExecutorMethod(self: *NativeCodegen, obj: ast.Node, method_name: []const u8, call: ast.Node.Call) CodegenError!bool {
+    if (std.mem.eql(u8, method_name, "submit")) {
+        // submit(fn, *args) -> (try ex.submit(fn, .{ args }))
+        if (call.args.len == 0) return false;
+        try self.emit("(try ");
+        try self.genExpr(obj);
+        try self.emit(".submit(");
+        try self.genExpr(call.args[0]);
+        try self.emit(", .{");
+        for (call.args[1..], 0..) |arg, i| {
+            try self.emit(if (i > 0) ", " else " ");
+            try self.genExpr(arg);
+        }
+        try self.emit(if (call.args.len > 1) " }))" else "}))");
+        return true;
+    }
+    if (std.mem.eql(u8, method_name, "map")) {
+        // map(fn, iterable, chunksize=1) -> results in input order
+        if (call.args.len < 2) return false;
+        var chunksize: ?ast.Node = null;
+        for (call.keyword_args) |kw| {
+            if (std.mem.eql(u8, kw.name, "chunksize")) chunksize = kw.value;
+        }
+        try self.emit("(try ");
+        try self.genExpr(obj);
+        try self.emit(".map(");
+        try self.genExpr(call.args[0]);
+        try self.emit(", runtime.iterSlice(");
+        try self.genExpr(call.args[1]);
+        try self.emit("), ");
+        if (chunksize) |c| {
+            try self.emit("@as(i64, @intCast(");
+            try self.genExpr(c);
+            try self.emit("))");
+        } else {
+            try self.emit("1");
+        }
+        try self.emit("))");
+        return true;
+    }
+    if (std.mem.eql(u8, method_name, "shutdown")) {
+        var wait: ?ast.Node = if (call.args.len > 0) call.args[0] else null;
+        for (call.keyword_args) |kw| {
+            if (std.mem.eql(u8, kw.name, "wait")) wait = kw.value;
+        }
+        try self.genExpr(obj);
+        try self.emit(".shutdown(");
+        if (wait) |w| try self.genExpr(w) else try self.emit("true");
+        try self.emit(")");
+        return true;
+    }
+    return false;
+}
@@ -8,6 +8,10 @@ const zig_keywords = @import("zig_keywords");
 const methods = @import("../methods.zig");
 const io_mod = @import("../io.zig");
 const unittest_mod = @import("../unittest/mod.zig");
+const memoize = @import("../statements/functions/generators/memoize.zig");
+const concurrent_futures_mod = @import("../concurrent_futures_mod.zig");
+const flask_mod = @import("../flask_mod.zig");
+const mmap_mod = @import("../mmap_mod.zig");
 
 /// Builtin types that support __new__ with value extraction
 const BuiltinNewTypes = std.StaticStringMap(void).initComptime(.{
@@ -73,7 +77,7 @@ const ListMethods = std.StaticStringMap(MethodHandler).initComptime(.{
     .{ "sort", methods.genSort },
     .{ "clear", methods.genClear },
     .{ "copy", methods.genCopy },
-    // Deque methods (deque uses ArrayList internally)
+    // Deque methods (runtime._collections.Deque shares the ArrayList method surface)
     .{ "appendleft", methods.genAppendleft },
     .{ "popleft", methods.genPopleft },
     .{ "extendleft", methods.genExtendleft },
@@ -117,8 +121,12 @@ const SetMethods = std.StaticStringMap(MethodHandler).initComptime(.{
 // File methods - O(1) lookup via StaticStringMap
 const FileMethods = std.StaticStringMap(MethodHandler).initComptime(.{
     .{ "read", methods.genFileRead },
+    .{ "readline", methods.genFileReadline },
+    .{ "readlines", methods.genFileReadlines },
     .{ "write", methods.genFileWrite },
     .{ "close", methods.genFileClose },
+    .{ "flush", methods.genFileFlush },
+    .{ "fileno", methods.genFileFileno },
 });
 
 // Float methods - O(1) lookup via StaticStringMap
@@ -264,6 +272,11 @@ pub fn tryDispatch(self: *NativeCodegen, call: ast.Node.Call) CodegenError!bool
     const method_name = call.func.attribute.attr;
     const obj = call.func.attribute.value.*;
 
+    // fib.cache_info() / fib.cache_clear() on an @lru_cache function
+    if (obj == .name and try memoize.genMemoMethod(self, obj.name.id, method_name)) {
+        return true;
+    }
+
     // Handle super().method() calls for inheritance
     if (try handleSuperCall(self, call, method_name, obj)) {
         return true;
@@ -322,6 +335,27 @@ pub fn tryDispatch(self: *NativeCodegen, call: ast.Node.Call) CodegenError!bool
         return false;
     }
 
+    // concurrent.futures executor methods (submit, map, shutdown)
+    if (obj_type == .thread_pool_executor) {
+        if (try concurrent_futures_mod.genExecutorMethod(self, obj, method_name, call)) {
+            return true;
+        }
+    }
+
+    // mmap methods (find, read, seek, ...) with omitted optionals filled in
+    if (obj_type == .mmap) {
+        if (try mmap_mod.genMmapMethod(self, obj, method_name, call)) {
+            return true;
+        }
+    }
+
+    // Flask app methods (route decorator, run)
+    if (obj_type == .flask_app) {
+        if (try flask_mod.genAppMethod(self, obj, method_name, call)) {
+            return true;
+        }
+    }
+
     // Check if object comes from a C extension module (numpy, pandas, etc.)
     // These objects are PyObject* and method calls go through Python C API
     if (obj_type == .pyobject) {
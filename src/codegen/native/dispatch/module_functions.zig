@@ -82,6 +82,7 @@ const numbers_mod = @import("../numbers_mod.zig");
 const http_mod = @import("../http_mod.zig");
 const multiprocessing_mod = @import("../multiprocessing_mod.zig");
 const concurrent_futures_mod = @import("../concurrent_futures_mod.zig");
+const flask_mod = @import("../flask_mod.zig");
 const ctypes_mod = @import("../ctypes_mod.zig");
 const select_mod = @import("../select_mod.zig");
 const signal_mod = @import("../signal_mod.zig");
@@ -512,6 +513,7 @@ const ModuleMap = std.StaticStringMap(FuncMap).initComptime(.{
     .{ "http.cookies", http_mod.HttpCookiesFuncs },
     .{ "multiprocessing", multiprocessing_mod.Funcs },
     .{ "concurrent.futures", concurrent_futures_mod.Funcs },
+    .{ "flask", flask_mod.Funcs },
     .{ "ctypes", ctypes_mod.Funcs },
     .{ "select", select_mod.Funcs },
     .{ "signal", signal_mod.Funcs },
@@ -966,6 +968,21 @@ pub fn tryDispatch(self: *NativeCodegen, module_name: []const u8, func_name: []c
         return true;
     }
 
+    // concurrent.futures calls with keyword arguments (max_workers=, return_when=)
+    if (std.mem.eql(u8, module_name, "concurrent.futures")) {
+        if (try concurrent_futures_mod.tryDispatchKw(self, func_name, call)) return true;
+    }
+
+    // flask.jsonify(key=value, ...)
+    if (std.mem.eql(u8, module_name, "flask")) {
+        if (try flask_mod.tryDispatchKw(self, func_name, call)) return true;
+    }
+
+    // mmap.mmap(fileno, length, access=..., offset=...)
+    if (std.mem.eql(u8, module_name, "mmap")) {
+        if (try mmap_mod.tryDispatchKw(self, func_name, call)) return true;
+    }
+
     // O(1) module lookup, then O(1) function lookup
     if (ModuleMap.get(module_name)) |func_map| {
         if (func_map.get(func_name)) |handler| {
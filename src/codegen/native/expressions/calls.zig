@@ -10,6 +10,7 @@ const function_traits = @import("function_traits");
 const import_registry = @import("../import_registry.zig");
 const generators = @import("../statements/functions/generators.zig");
 const shared = @import("../shared_maps.zig");
+const generator_state_machine = @import("../generator_state_machine.zig");
 const RuntimeExceptions = shared.RuntimeExceptions;
 const NativeType = @import("../../../analysis/native_types/core.zig").NativeType;
 
@@ -80,6 +81,9 @@ pub fn genCall(self: *NativeCodegen, call: ast.Node.Call) CodegenError!void {
     const genExpr = parent.genExpr;
     const producesBlockExpression = parent.producesBlockExpression;
 
+    // g.send(v) / g.close() / g.__next__() on a generator frame
+    if (try generator_state_machine.genFrameMethodCall(self, call)) return;
+
     // Try to dispatch to specialized handler
     const dispatched = try dispatch.dispatchCall(self, call);
     if (dispatched) return;
@@ -5,6 +5,7 @@ const ast = @import("ast");
 const NativeCodegen = @import("../main.zig").NativeCodegen;
 const CodegenError = @import("../main.zig").CodegenError;
 const expressions = @import("../expressions.zig");
+const mmap_mod = @import("../mmap_mod.zig");
 const genExpr = expressions.genExpr;
 const producesBlockExpression = expressions.producesBlockExpression;
 const zig_keywords = @import("zig_keywords");
@@ -63,6 +64,10 @@ pub fn genSliceIndex(self: *NativeCodegen, node: ast.Node, in_slice_context: boo
 
 /// Generate array/dict subscript (a[b])
 pub fn genSubscript(self: *NativeCodegen, subscript: ast.Node.Subscript) CodegenError!void {
+    // mmap: m[i] reads one byte, m[a:b] is a view of the mapping rather than a copy
+    const is_mmap = (self.type_inferrer.inferExpr(subscript.value.*) catch .unknown) == .mmap;
+    if (is_mmap and try mmap_mod.genMmapSubscript(self, subscript)) return;
+
     // Check if the base expression produces a block expression (e.g., nested subscript)
     // Block expressions cannot be subscripted directly in Zig: blk: {...}[idx] is invalid
     // Need to wrap in another block with temp variable: blk: { const __base = blk: {...}; break :blk __base[idx]; }
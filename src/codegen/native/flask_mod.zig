@@ -0,0 +1,163 @@
+/// Python flask module - Flask apps lower to runtime.flask (native HTTP/1.1 server)
+/// jsonify() of literal keyword arguments is serialized here, so the whole
+/// response is a compile-time constant.
+const std = @import("std");
+const ast = @import("ast");
+const zig_keywords = @import("zig_keywords");
+const h = @import("mod_helper.zig");
+const CodegenError = h.CodegenError;
+const NativeCodegen = h.NativeCodegen;
+
+pub const Funcs = std.StaticStringMap(h.H).initComptime(.{
+    // Flask(__name__) - the import name only matters for templates/static files
+    .{ "Flask", h.c("(try runtime.flask.Flask.init(__global_allocator))") },
+    .{ "jsonify", genJsonify },
+});
+
+/// jsonify(key=value, ...); Returns false for anything the positional Funcs table handles.
+pub fn tryDispatchKw(self: *NativeCodegen, func_name: []const u8, call: ast.Node.Call) CodegenError!bool {
+    if (call.keyword_args.len == 0 or call.args.len > 0) return false;
+    if (!std.mem.eql(u8, func_name, "jsonify")) return false;
+
+    // Flask sorts keys (JSONProvider.sort_keys)
+    const kwargs = try self.allocator.dupe(ast.Node.KeywordArg, call.keyword_args);
+    defer self.allocator.free(kwargs);
+    std.mem.sort(ast.Node.KeywordArg, kwargs, {}, struct {
+        fn lessThan(_: void, a: ast.Node.KeywordArg, b: ast.Node.KeywordArg) bool {
+            return std.mem.lessThan(u8, a.name, b.name);
+        }
+    }.lessThan);
+
+    if (try constantJson(self, kwargs)) |json| {
+        defer self.allocator.free(json);
+        try self.emit("runtime.flask.Json.constant(\"");
+        for (json) |c| switch (c) {
+            '"' => try self.emit("\\\""),
+            '\\' => try self.emit("\\\\"),
+            '\n' => try self.emit("\\n"),
+            else => try self.emit(&.{c}),
+        };
+        try self.emit("\")");
+        return true;
+    }
+
+    try self.emit("runtime.flask.jsonify(.{");
+    for (kwargs, 0..) |kw, i| {
+        try self.emit(if (i > 0) ", ." else " .");
+        try zig_keywords.writeEscapedIdent(self.output.writer(self.allocator), kw.name);
+        try self.emit(" = ");
+        try self.genExpr(kw.value);
+    }
+    try self.emit(" })");
+    return true;
+}
+
+/// jsonify(value) -> runtime.flask.Json
+fn genJsonify(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
+    try self.emit("runtime.flask.jsonify(");
+    if (args.len > 0) try self.genExpr(args[0]) else try self.emit(".{}");
+    try self.emit(")");
+}
+
+/// Compact JSON object (plus Flask's trailing newline) when every value is a
+/// plain literal, else null
+fn constantJson(self: *NativeCodegen, kwargs: []const ast.Node.KeywordArg) CodegenError!?[]u8 {
+    var out = std.ArrayList(u8){};
+    errdefer out.deinit(self.allocator);
+
+    try out.append(self.allocator, '{');
+    for (kwargs, 0..) |kw, i| {
+        if (kw.value != .constant) return cancel(self, &out);
+        if (i > 0) try out.append(self.allocator, ',');
+        try out.print(self.allocator, "\"{s}\":", .{kw.name});
+        switch (kw.value.constant.value) {
+            .string => |s| {
+                // Python escapes and non-ASCII text are left to the runtime encoder
+                for (s) |c| {
+                    if (c == '\\' or c < 0x20 or c >= 0x7f) return cancel(self, &out);
+                }
+                try out.append(self.allocator, '"');
+                for (s) |c| {
+                    if (c == '"') try out.append(self.allocator, '\\');
+                    try out.append(self.allocator, c);
+                }
+                try out.append(self.allocator, '"');
+            },
+            .int => |n| try out.print(self.allocator, "{d}", .{n}),
+            .bool => |b| try out.appendSlice(self.allocator, if (b) "true" else "false"),
+            .none => try out.appendSlice(self.allocator, "null"),
+            else => return cancel(self, &out),
+        }
+    }
+    try out.appendSlice(self.allocator, "}\n");
+    return try out.toOwnedSlice(self.allocator);
+}
+
+fn cancel(self: *NativeCodegen, out: *std.ArrayList(u8)) ?[]u8 {
+    out.deinit(self.allocator);
+    return null;
+}
+
+/// app.route / app.run on a value inferred as .flask_app
+pub fn genAppMethod(self: *NativeCodegen, obj: ast.Node, method_name: []const u8, call: ast.Node.Call) CodegenError!bool {
+    if (std.mem.eql(u8, method_name, "route")) {
+        // route(rule, methods=[...]) -> decorator applied with .call(&view)
+        if (call.args.len == 0) return false;
+        var methods: ?ast.Node = null;
+        for (call.keyword_args) |kw| {
+            if (std.mem.eql(u8, kw.name, "methods")) methods = kw.value;
+        }
+        try self.genExpr(obj);
+        try self.emit(".route(");
+        try self.genExpr(call.args[0]);
+        try self.emit(", ");
+        try emitMethods(self, methods);
+        try self.emit(")");
+        return true;
+    }
+    if (std.mem.eql(u8, method_name, "run")) {
+        // run(host=None, port=None, debug=None, **options) - serving options are ignored
+        var host: ?ast.Node = if (call.args.len > 0) call.args[0] else null;
+        var port: ?ast.Node = if (call.args.len > 1) call.args[1] else null;
+        for (call.keyword_args) |kw| {
+            if (std.mem.eql(u8, kw.name, "host")) host = kw.value;
+            if (std.mem.eql(u8, kw.name, "port")) port = kw.value;
+        }
+        try self.genExpr(obj);
+        try self.emit(".run(");
+        try emitOptional(self, host);
+        try self.emit(", ");
+        if (port) |p| {
+            try self.emit("@as(i64, @intCast(");
+            try self.genExpr(p);
+            try self.emit("))");
+        } else {
+            try self.emit("null");
+        }
+        try self.emit(")");
+        return true;
+    }
+    return false;
+}
+
+/// methods=["GET", "POST"] -> &[_][]const u8{ "GET", "POST" }
+fn emitMethods(self: *NativeCodegen, methods: ?ast.Node) CodegenError!void {
+    const m = methods orelse return self.emit("&.{}");
+    const elts = switch (m) {
+        .list => |l| l.elts,
+        .tuple => |t| t.elts,
+        else => return self.emit("&.{}"),
+    };
+    try self.emit("&[_][]const u8{");
+    for (elts, 0..) |elt, i| {
+        try self.emit(if (i > 0) ", " else " ");
+        try self.genExpr(elt);
+    }
+    try self.emit(if (elts.len > 0) " }" else "}");
+}
+
+fn emitOptional(self: *NativeCodegen, node: ?ast.Node) CodegenError!void {
+    const n = node orelse return self.emit("null");
+    if (n == .constant and n.constant.value == .none) return self.emit("null");
+    try self.genExpr(n);
+}
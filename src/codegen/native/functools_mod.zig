@@ -8,10 +8,9 @@ const NativeCodegen = h.NativeCodegen;
 // Identity decorator helper - returns a function that returns its argument unchanged
 const IdentityDecorator = "struct { pub fn identity(f: anytype) @TypeOf(f) { return f; } }.identity";
 
-// lru_cache/cache: For AOT compilation, we pass through the function since true
-// memoization requires runtime state. The decorated function works correctly,
-// just without caching. This matches Python semantics where @lru_cache(func) == func
-// in terms of behavior (just slower without caching).
+// lru_cache/cache: Decorated module-level functions are memoized in place
+// (statements/functions/generators/memoize.zig). This pass-through covers the
+// remaining uses - generic (anytype) functions and lru_cache(f) as an expression.
 pub const genLruCache = h.c(IdentityDecorator);
 pub const genCache = genLruCache;
 
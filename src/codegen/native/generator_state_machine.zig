@@ -0,0 +1,1445 @@
+/// Generator State Machine Transformation
+///
+/// Compiles Python generator functions into resumable frames instead of
+/// eagerly collecting every yielded value into a list.
+///
+/// Python:
+///   def count_up(n):
+///       i = 0
+///       while i < n:
+///           yield i
+///           i += 1
+///
+/// Becomes:
+///   fn count_up__Gen(comptime __Args: type) type {
+///       return struct {
+///           __state: u32 = 0, __sent: runtime.PyValue = .none, __args: __Args, i: i64 = undefined,
+///           pub fn next(__f: *Self) !?runtime.PyValue { ... }   // resumes step()
+///           fn step(__f: *Self) !?runtime.PyValue {
+///               gen: switch (__f.__state) {
+///                   0 => { __f.i = 0; continue :gen 1; },
+///                   1 => { if (!(__f.i < __f.__args.n)) continue :gen 2;
+///                          __f.__state = 3; return runtime.PyValue.from(__f.i); },
+///                   3 => { __f.i = __f.i + 1; continue :gen 1; },
+///                   ...
+///   }
+///   pub fn count_up(n: i64) ![]runtime.PyValue  // drains a frame (list(count_up(n)))
+///
+/// Callers that consume the generator lazily use the frame directly:
+///   for x in count_up(n): ...   ->  while (try __gen_0.next()) |x| { ... }
+///   g = count_up(n); next(g)    ->  var g = count_up__Gen(...){ ... }; g.next()
+///
+/// Only a structured subset is lowered (see analyze()); other generators keep
+/// the eager list implementation.
+///
+const std = @import("std");
+const ast = @import("ast");
+const zig_keywords = @import("zig_keywords");
+const CodegenError = @import("main.zig").CodegenError;
+const NativeCodegen = @import("main.zig").NativeCodegen;
+const NativeType = @import("../../analysis/native_types.zig").NativeType;
+const for_basic = @import("statements/control/loops/for_basic.zig");
+
+/// Frame members; locals with these names keep the eager implementation
+const reserved_names = [_][]const u8{ "next", "send", "close", "collect", "step", "Self", "done" };
+
+/// Generator methods callable on a frame variable (g.send(v), ...)
+const frame_methods = [_][]const u8{ "send", "close", "__next__" };
+
+// ============================================================================
+// AST walking
+// ============================================================================
+
+/// Visit `node` and every statement/expression beneath it.
+/// `v.visit(node)` returns false to skip the node's children.
+fn walk(node: ast.Node, v: anytype) void {
+    if (!v.visit(node)) return;
+    switch (node) {
+        .assign => |n| {
+            walkAll(n.targets, v);
+            walk(n.value.*, v);
+        },
+        .ann_assign => |n| {
+            walk(n.target.*, v);
+            if (n.value) |value| walk(value.*, v);
+        },
+        .aug_assign => |n| {
+            walk(n.target.*, v);
+            walk(n.value.*, v);
+        },
+        .binop => |n| {
+            walk(n.left.*, v);
+            walk(n.right.*, v);
+        },
+        .unaryop => |n| walk(n.operand.*, v),
+        .compare => |n| {
+            walk(n.left.*, v);
+            walkAll(n.comparators, v);
+        },
+        .boolop => |n| walkAll(n.values, v),
+        .call => |n| {
+            walk(n.func.*, v);
+            walkAll(n.args, v);
+            for (n.keyword_args) |kw| walk(kw.value, v);
+        },
+        .fstring => |n| for (n.parts) |part| switch (part) {
+            .literal => {},
+            .expr => |e| walk(e.node.*, v),
+            .format_expr => |e| walk(e.expr.*, v),
+            .conv_expr => |e| walk(e.expr.*, v),
+        },
+        .if_stmt => |n| {
+            walk(n.condition.*, v);
+            walkAll(n.body, v);
+            walkAll(n.else_body, v);
+        },
+        .for_stmt => |n| {
+            walk(n.target.*, v);
+            walk(n.iter.*, v);
+            walkAll(n.body, v);
+            if (n.orelse_body) |body| walkAll(body, v);
+        },
+        .while_stmt => |n| {
+            walk(n.condition.*, v);
+            walkAll(n.body, v);
+            if (n.orelse_body) |body| walkAll(body, v);
+        },
+        .function_def => |n| walkAll(n.body, v),
+        .class_def => |n| walkAll(n.body, v),
+        .lambda => |n| walk(n.body.*, v),
+        .return_stmt => |n| if (n.value) |value| walk(value.*, v),
+        .list => |n| walkAll(n.elts, v),
+        .set => |n| walkAll(n.elts, v),
+        .tuple => |n| walkAll(n.elts, v),
+        .dict => |n| {
+            walkAll(n.keys, v);
+            walkAll(n.values, v);
+        },
+        inline .listcomp, .genexp => |n| {
+            walk(n.elt.*, v);
+            walkComprehensions(n.generators, v);
+        },
+        .dictcomp => |n| {
+            walk(n.key.*, v);
+            walk(n.value.*, v);
+            walkComprehensions(n.generators, v);
+        },
+        .subscript => |n| {
+            walk(n.value.*, v);
+            switch (n.slice) {
+                .index => |index| walk(index.*, v),
+                .slice => |range| walkRange(range, v),
+            }
+        },
+        .slice_expr => |range| walkRange(range, v),
+        .attribute => |n| walk(n.value.*, v),
+        .expr_stmt => |n| walk(n.value.*, v),
+        .await_expr => |n| walk(n.value.*, v),
+        .assert_stmt => |n| {
+            walk(n.condition.*, v);
+            if (n.msg) |msg| walk(msg.*, v);
+        },
+        .try_stmt => |n| {
+            walkAll(n.body, v);
+            for (n.handlers) |handler| walkAll(handler.body, v);
+            walkAll(n.else_body, v);
+            walkAll(n.finalbody, v);
+        },
+        .raise_stmt => |n| {
+            if (n.exc) |exc| walk(exc.*, v);
+            if (n.cause) |cause| walk(cause.*, v);
+        },
+        .with_stmt => |n| {
+            walk(n.context_expr.*, v);
+            if (n.optional_vars) |vars| walk(vars.*, v);
+            walkAll(n.body, v);
+        },
+        .starred => |n| walk(n.value.*, v),
+        .double_starred => |n| walk(n.value.*, v),
+        .del_stmt => |n| walkAll(n.targets, v),
+        .named_expr => |n| {
+            walk(n.target.*, v);
+            walk(n.value.*, v);
+        },
+        .if_expr => |n| {
+            walk(n.body.*, v);
+            walk(n.condition.*, v);
+            walk(n.orelse_value.*, v);
+        },
+        .yield_stmt => |n| if (n.value) |value| walk(value.*, v),
+        .yield_from_stmt => |n| walk(n.value.*, v),
+        .match_stmt => |n| {
+            walk(n.subject.*, v);
+            for (n.cases) |case| {
+                if (case.guard) |guard| walk(guard.*, v);
+                walkAll(case.body, v);
+            }
+        },
+        else => {},
+    }
+}
+
+fn walkAll(nodes: []const ast.Node, v: anytype) void {
+    for (nodes) |node| walk(node, v);
+}
+
+fn walkComprehensions(generators: []const ast.Node.Comprehension, v: anytype) void {
+    for (generators) |comp| {
+        walk(comp.target.*, v);
+        walk(comp.iter.*, v);
+        walkAll(comp.ifs, v);
+    }
+}
+
+fn walkRange(range: ast.Node.SliceRange, v: anytype) void {
+    if (range.lower) |lower| walk(lower.*, v);
+    if (range.upper) |upper| walk(upper.*, v);
+    if (range.step) |step| walk(step.*, v);
+}
+
+/// Counts every reference to a name, including bindings
+const NameCount = struct {
+    name: []const u8,
+    count: usize = 0,
+
+    fn visit(c: *NameCount, node: ast.Node) bool {
+        if (node == .name and std.mem.eql(u8, node.name.id, c.name)) c.count += 1;
+        return true;
+    }
+};
+
+fn countNames(nodes: []const ast.Node, name: []const u8) usize {
+    var counter = NameCount{ .name = name };
+    walkAll(nodes, &counter);
+    return counter.count;
+}
+
+/// Counts the places a name is bound (assignment, loop and `as` targets)
+const BindCount = struct {
+    name: []const u8,
+    count: usize = 0,
+
+    fn visit(c: *BindCount, node: ast.Node) bool {
+        switch (node) {
+            .assign => |n| for (n.targets) |target| c.target(target),
+            .aug_assign => |n| c.target(n.target.*),
+            .for_stmt => |n| c.target(n.target.*),
+            .named_expr => |n| c.target(n.target.*),
+            .with_stmt => |n| if (n.optional_vars) |vars| c.target(vars.*),
+            inline .listcomp, .genexp => |n| for (n.generators) |comp| c.target(comp.target.*),
+            .dictcomp => |n| for (n.generators) |comp| c.target(comp.target.*),
+            else => {},
+        }
+        return true;
+    }
+
+    fn target(c: *BindCount, node: ast.Node) void {
+        switch (node) {
+            .name => |n| if (std.mem.eql(u8, n.id, c.name)) {
+                c.count += 1;
+            },
+            .tuple => |t| for (t.elts) |elt| c.target(elt),
+            .list => |l| for (l.elts) |elt| c.target(elt),
+            .starred => |s| c.target(s.value.*),
+            else => {},
+        }
+    }
+};
+
+fn countBindings(nodes: []const ast.Node, name: []const u8) usize {
+    var counter = BindCount{ .name = name };
+    walkAll(nodes, &counter);
+    return counter.count;
+}
+
+fn isReserved(name: []const u8) bool {
+    for (reserved_names) |reserved| {
+        if (std.mem.eql(u8, name, reserved)) return true;
+    }
+    return false;
+}
+
+// ============================================================================
+// Analysis: which generators can be lowered
+// ============================================================================
+
+/// How a frame field holding a Python local is typed
+const FieldKind = union(enum) {
+    /// Scalar with an inferred type (i64, f64, bool, []const u8, PyValue)
+    native: NativeType,
+    /// Receives sent values or values of a sub-generator
+    pyvalue,
+    /// Loop target over the sequence passed as this parameter
+    item_of: []const u8,
+};
+
+const Local = struct {
+    name: []const u8,
+    kind: FieldKind,
+};
+
+/// What a `for` loop or `yield from` iterates over
+const Iter = union(enum) {
+    /// range(stop), range(start, stop) or range(start, stop, step)
+    range: []const ast.Node,
+    /// Call to another lowered generator: its frame is embedded in this one
+    generator: struct { def: ast.Node.FunctionDef, args: []const ast.Node },
+    /// Sequence parameter (list, array or slice)
+    sequence: []const u8,
+};
+
+fn classifyIter(self: *NativeCodegen, node: ast.Node) ?Iter {
+    switch (node) {
+        .call => |call| {
+            if (call.func.* != .name or call.keyword_args.len > 0) return null;
+            if (std.mem.eql(u8, call.func.name.id, "range")) {
+                if (call.args.len < 1 or call.args.len > 3) return null;
+                return .{ .range = call.args };
+            }
+            const def = frameCall(self, node) orelse return null;
+            return .{ .generator = .{ .def = def, .args = call.args } };
+        },
+        .name => |n| return .{ .sequence = n.id },
+        else => return null,
+    }
+}
+
+const Analysis = struct {
+    self: *NativeCodegen,
+    func: ast.Node.FunctionDef,
+    /// Frame fields, in order of first assignment
+    locals: std.ArrayListUnmanaged(Local) = .{},
+    /// Names bound by comprehensions; must not alias frame variables
+    comp_targets: std.ArrayListUnmanaged([]const u8) = .{},
+    /// Names passed to sub-generators; must be frame variables
+    arg_names: std.ArrayListUnmanaged([]const u8) = .{},
+    ok: bool = true,
+
+    fn deinit(a: *Analysis) void {
+        a.locals.deinit(a.self.allocator);
+        a.comp_targets.deinit(a.self.allocator);
+        a.arg_names.deinit(a.self.allocator);
+    }
+
+    fn isParam(a: *const Analysis, name: []const u8) bool {
+        for (a.func.args) |arg| {
+            if (std.mem.eql(u8, arg.name, name)) return true;
+        }
+        return false;
+    }
+
+    fn local(a: *const Analysis, name: []const u8) ?Local {
+        for (a.locals.items) |l| {
+            if (std.mem.eql(u8, l.name, name)) return l;
+        }
+        return null;
+    }
+
+    fn isFrameVar(a: *const Analysis, name: []const u8) bool {
+        return a.isParam(name) or a.local(name) != null;
+    }
+
+    fn addLocal(a: *Analysis, name: []const u8, kind: FieldKind) CodegenError!void {
+        // Reassigned parameters and names clashing with frame members stay eager
+        if (a.isParam(name) or isReserved(name) or std.mem.startsWith(u8, name, "__")) {
+            a.ok = false;
+            return;
+        }
+        if (a.local(name)) |existing| {
+            const same = switch (existing.kind) {
+                .native => kind == .native and std.meta.activeTag(existing.kind.native) == std.meta.activeTag(kind.native),
+                .pyvalue => kind == .pyvalue,
+                .item_of => |seq| kind == .item_of and std.mem.eql(u8, seq, kind.item_of),
+            };
+            if (!same) a.ok = false;
+            return;
+        }
+        try a.locals.append(a.self.allocator, .{ .name = name, .kind = kind });
+    }
+
+    /// Local whose type comes from inference; only unboxed scalars qualify
+    fn addScalar(a: *Analysis, name: []const u8) CodegenError!void {
+        const t = a.self.getVarTypeInScope(a.func.name, name) orelse {
+            a.ok = false;
+            return;
+        };
+        switch (t) {
+            .int => |kind| if (kind.needsBigInt()) {
+                a.ok = false;
+                return;
+            },
+            .usize, .float, .bool, .string, .pyvalue => {},
+            else => {
+                a.ok = false;
+                return;
+            },
+        }
+        try a.addLocal(name, .{ .native = t });
+    }
+
+    fn expr(a: *Analysis, node: ast.Node) void {
+        var check = ExprCheck{ .analysis = a };
+        walk(node, &check);
+    }
+
+    fn stmts(a: *Analysis, body: []const ast.Node) CodegenError!void {
+        for (body) |node| {
+            if (!a.ok) return;
+            try a.stmt(node);
+        }
+    }
+
+    fn stmt(a: *Analysis, node: ast.Node) CodegenError!void {
+        switch (node) {
+            .pass, .break_stmt, .continue_stmt => {},
+            .return_stmt => |r| if (r.value) |value| {
+                // return <value> in a generator sets StopIteration.value; not modelled
+                if (!(value.* == .constant and value.constant.value == .none)) a.ok = false;
+            },
+            .expr_stmt => |e| switch (e.value.*) {
+                .yield_stmt, .yield_from_stmt => try a.stmt(e.value.*),
+                else => a.expr(e.value.*),
+            },
+            .yield_stmt => |y| if (y.value) |value| a.expr(value.*),
+            .yield_from_stmt => |y| {
+                const iter = classifyIter(a.self, y.value.*) orelse {
+                    a.ok = false;
+                    return;
+                };
+                try a.iterable(iter);
+            },
+            .assign => |assign| {
+                if (assign.targets.len != 1 or assign.targets[0] != .name) {
+                    a.ok = false;
+                    return;
+                }
+                const name = assign.targets[0].name.id;
+                if (assign.value.* == .yield_stmt) {
+                    if (assign.value.yield_stmt.value) |value| a.expr(value.*);
+                    try a.addLocal(name, .pyvalue);
+                } else {
+                    a.expr(assign.value.*);
+                    try a.addScalar(name);
+                }
+            },
+            .aug_assign => |aug| {
+                if (aug.target.* != .name) {
+                    a.ok = false;
+                    return;
+                }
+                a.expr(aug.value.*);
+                try a.addScalar(aug.target.name.id);
+            },
+            .if_stmt => |s| {
+                a.expr(s.condition.*);
+                try a.stmts(s.body);
+                try a.stmts(s.else_body);
+            },
+            .while_stmt => |s| {
+                a.expr(s.condition.*);
+                try a.stmts(s.body);
+                if (s.orelse_body) |body| try a.stmts(body);
+            },
+            .for_stmt => |s| {
+                if (s.target.* != .name) {
+                    a.ok = false;
+                    return;
+                }
+                const name = s.target.name.id;
+                const iter = classifyIter(a.self, s.iter.*) orelse {
+                    a.ok = false;
+                    return;
+                };
+                try a.iterable(iter);
+                switch (iter) {
+                    .range => {
+                        try a.addScalar(name);
+                        if (!a.ok) return;
+                        switch (a.local(name).?.kind.native) {
+                            .int, .usize => {},
+                            else => a.ok = false,
+                        }
+                    },
+                    .generator => try a.addLocal(name, .pyvalue),
+                    .sequence => |seq| try a.addLocal(name, .{ .item_of = seq }),
+                }
+                try a.stmts(s.body);
+                if (s.orelse_body) |body| try a.stmts(body);
+            },
+            else => a.ok = false,
+        }
+    }
+
+    fn iterable(a: *Analysis, iter: Iter) CodegenError!void {
+        switch (iter) {
+            .range => |args| for (args) |arg| a.expr(arg),
+            .generator => |g| {
+                if (g.args.len != g.def.args.len) {
+                    a.ok = false;
+                    return;
+                }
+                // Argument types feed the sub-frame's type, so they must be
+                // nameable from inside this frame
+                for (g.args) |arg| switch (arg) {
+                    .name => |n| try a.arg_names.append(a.self.allocator, n.id),
+                    .constant => {},
+                    else => a.ok = false,
+                };
+            },
+            .sequence => |name| {
+                // Only parameters: their Zig type is known from __Args
+                if (!a.isParam(name)) {
+                    a.ok = false;
+                    return;
+                }
+                const t = a.self.getVarTypeInScope(a.func.name, name) orelse {
+                    a.ok = false;
+                    return;
+                };
+                switch (t) {
+                    .list, .array, .slice => {},
+                    else => a.ok = false,
+                }
+            },
+        }
+    }
+};
+
+/// Rejects expressions the frame cannot host: anything that suspends or
+/// binds names mid-expression
+const ExprCheck = struct {
+    analysis: *Analysis,
+
+    fn visit(c: *ExprCheck, node: ast.Node) bool {
+        const a = c.analysis;
+        switch (node) {
+            .yield_stmt, .yield_from_stmt, .await_expr, .lambda, .named_expr => a.ok = false,
+            inline .listcomp, .genexp => |n| c.noteTargets(n.generators),
+            .dictcomp => |n| c.noteTargets(n.generators),
+            else => {},
+        }
+        return a.ok;
+    }
+
+    fn noteTargets(c: *ExprCheck, generators: []const ast.Node.Comprehension) void {
+        const a = c.analysis;
+        for (generators) |comp| {
+            if (comp.target.* != .name) continue;
+            a.comp_targets.append(a.self.allocator, comp.target.name.id) catch {
+                a.ok = false;
+            };
+        }
+    }
+};
+
+/// Check `func` against the lowerable subset; null keeps the eager version
+fn analyze(self: *NativeCodegen, func: ast.Node.FunctionDef) CodegenError!?Analysis {
+    if (func.is_async or func.decorators.len > 0 or func.vararg != null or func.kwarg != null) return null;
+    if (!self.funcIsGenerator(func.name)) return null;
+    for (func.args) |arg| {
+        if (arg.default != null) return null;
+        if (countBindings(func.body, arg.name) > 0) return null;
+    }
+
+    var a = Analysis{ .self = self, .func = func };
+    errdefer a.deinit();
+    try a.stmts(func.body);
+    for (a.comp_targets.items) |name| {
+        if (a.isFrameVar(name)) a.ok = false;
+    }
+    for (a.arg_names.items) |name| {
+        if (!a.isFrameVar(name)) a.ok = false;
+    }
+    if (!a.ok) {
+        a.deinit();
+        return null;
+    }
+    return a;
+}
+
+/// Choose the module's generator functions that compile to frames.
+/// Runs before any function is generated so callers can drive frames of
+/// generators defined later in the file. A generator may only embed frames
+/// of generators defined before it, which rules out recursion.
+pub fn registerGenerators(self: *NativeCodegen, module: ast.Node.Module) CodegenError!void {
+    for (module.body) |stmt| {
+        if (stmt != .function_def) continue;
+        const func = stmt.function_def;
+        if (self.lowered_generators.contains(func.name)) continue;
+        var analysis = (try analyze(self, func)) orelse continue;
+        analysis.deinit();
+        try self.lowered_generators.put(try self.allocator.dupe(u8, func.name), func);
+    }
+}
+
+/// Is `func` (this exact definition) compiled to a frame?
+pub fn isLowered(self: *NativeCodegen, func: ast.Node.FunctionDef) bool {
+    const def = self.lowered_generators.get(func.name) orelse return false;
+    return def.body.ptr == func.body.ptr;
+}
+
+/// Lowered generator called by `node` (positional arguments only)
+fn frameCall(self: *NativeCodegen, node: ast.Node) ?ast.Node.FunctionDef {
+    if (node != .call) return null;
+    const call = node.call;
+    if (call.func.* != .name or call.keyword_args.len > 0) return null;
+    const def = self.lowered_generators.get(call.func.name.id) orelse return null;
+    if (call.args.len != def.args.len) return null;
+    return def;
+}
+
+// ============================================================================
+// Frame emission
+// ============================================================================
+
+const Loop = struct {
+    continue_state: usize,
+    break_state: usize,
+};
+
+/// Lowering context for one generator body. Each resume point gets its own
+/// output buffer (a prong of the step() switch); statements are generated
+/// into the current buffer by the regular codegen with names renamed to
+/// frame fields.
+const Frame = struct {
+    self: *NativeCodegen,
+    analysis: *const Analysis,
+    arena: std.mem.Allocator,
+    blocks: std.ArrayListUnmanaged(std.ArrayList(u8)) = .{},
+    current: usize = 0,
+    /// The current block already ends in a jump or return
+    terminated: bool = false,
+    loops: std.ArrayListUnmanaged(Loop) = .{},
+    /// Hidden fields: loop counters, stored iterables, sub-generator frames
+    fields: std.ArrayList(u8) = .{},
+    next_id: usize = 0,
+
+    fn newState(fr: *Frame) CodegenError!usize {
+        try fr.blocks.append(fr.arena, .{});
+        return fr.blocks.items.len - 1;
+    }
+
+    /// Continue emitting into the block of `state`
+    fn begin(fr: *Frame, state: usize) void {
+        fr.blocks.items[fr.current] = fr.self.output;
+        fr.self.output = fr.blocks.items[state];
+        fr.current = state;
+        fr.terminated = false;
+    }
+
+    fn line(fr: *Frame, comptime fmt: []const u8, args: anytype) CodegenError!void {
+        try fr.self.emitIndent();
+        try fr.self.output.writer(fr.self.allocator).print(fmt ++ "\n", args);
+    }
+
+    fn jump(fr: *Frame, state: usize) CodegenError!void {
+        if (fr.terminated) return;
+        try fr.line("continue :gen {d};", .{state});
+        fr.terminated = true;
+    }
+
+    fn field(fr: *Frame, comptime fmt: []const u8, args: anytype) CodegenError!void {
+        try fr.fields.writer(fr.arena).print(fmt ++ ",\n", args);
+    }
+
+    /// Zig lvalue of a frame variable
+    fn ref(fr: *Frame, name: []const u8) []const u8 {
+        return fr.self.var_renames.get(name).?;
+    }
+
+    fn isPyValue(fr: *Frame, name: []const u8) bool {
+        const l = fr.analysis.local(name) orelse return false;
+        return switch (l.kind) {
+            .pyvalue => true,
+            .native => |t| t == .pyvalue,
+            .item_of => false,
+        };
+    }
+
+    /// Render an expression to a string (for use inside field types)
+    fn render(fr: *Frame, node: ast.Node) CodegenError![]const u8 {
+        const saved = fr.self.output;
+        fr.self.output = .{};
+        defer {
+            fr.self.output.deinit(fr.self.allocator);
+            fr.self.output = saved;
+        }
+        try fr.self.genExpr(node);
+        return fr.arena.dupe(u8, fr.self.output.items);
+    }
+
+    /// Lower a whole function body into blocks, starting at state 0
+    fn run(fr: *Frame, nodes: []const ast.Node) CodegenError!void {
+        _ = try fr.newState();
+        const saved = fr.self.output;
+        fr.self.output = .{};
+        defer {
+            fr.blocks.items[fr.current] = fr.self.output;
+            fr.self.output = saved;
+        }
+        try fr.body(nodes);
+        if (!fr.terminated) try fr.line("break :gen;", .{});
+    }
+
+    fn body(fr: *Frame, nodes: []const ast.Node) CodegenError!void {
+        for (nodes) |node| {
+            // Code after break/continue/return is unreachable: park it in a
+            // state nothing jumps to
+            if (fr.terminated) fr.begin(try fr.newState());
+            try fr.stmt(node);
+        }
+    }
+
+    fn stmt(fr: *Frame, node: ast.Node) CodegenError!void {
+        const self = fr.self;
+        switch (node) {
+            .pass => {},
+            .break_stmt => try fr.jump(fr.loops.getLast().break_state),
+            .continue_stmt => try fr.jump(fr.loops.getLast().continue_state),
+            .return_stmt => {
+                try fr.line("break :gen;", .{});
+                fr.terminated = true;
+            },
+            .expr_stmt => |e| switch (e.value.*) {
+                .yield_stmt, .yield_from_stmt => try fr.stmt(e.value.*),
+                .constant => {}, // docstring
+                else => try self.generateStmt(node),
+            },
+            .yield_stmt => |y| try fr.yieldValue(y.value, null),
+            .yield_from_stmt => |y| try fr.yieldFrom(y.value.*),
+            .assign => |assign| {
+                const name = assign.targets[0].name.id;
+                if (assign.value.* == .yield_stmt) return fr.yieldValue(assign.value.yield_stmt.value, name);
+                try fr.store(name, assign.value.*);
+            },
+            .aug_assign => |aug| {
+                const value = ast.Node{ .binop = .{ .left = aug.target, .op = aug.op, .right = aug.value } };
+                try fr.store(aug.target.name.id, value);
+            },
+            .if_stmt => |s| {
+                const then_state = try fr.newState();
+                const else_state = if (s.else_body.len > 0) try fr.newState() else null;
+                const exit = try fr.newState();
+
+                try self.emitIndent();
+                try self.emit("if ");
+                try fr.condition(s.condition.*);
+                try self.output.writer(self.allocator).print(" continue :gen {d};\n", .{then_state});
+                try fr.jump(else_state orelse exit);
+
+                fr.begin(then_state);
+                try fr.body(s.body);
+                try fr.jump(exit);
+                if (else_state) |state| {
+                    fr.begin(state);
+                    try fr.body(s.else_body);
+                    try fr.jump(exit);
+                }
+                fr.begin(exit);
+            },
+            .while_stmt => |s| {
+                const head = try fr.newState();
+                const else_state = if (s.orelse_body != null and s.orelse_body.?.len > 0) try fr.newState() else null;
+                const exit = try fr.newState();
+
+                try fr.jump(head);
+                fr.begin(head);
+                try self.emitIndent();
+                try self.emit("if (!");
+                try fr.condition(s.condition.*);
+                try self.output.writer(self.allocator).print(") continue :gen {d};\n", .{else_state orelse exit});
+
+                try fr.loops.append(fr.arena, .{ .continue_state = head, .break_state = exit });
+                try fr.body(s.body);
+                try fr.jump(head);
+                _ = fr.loops.pop();
+
+                if (else_state) |state| {
+                    fr.begin(state);
+                    try fr.body(s.orelse_body.?);
+                    try fr.jump(exit);
+                }
+                fr.begin(exit);
+            },
+            .for_stmt => |s| {
+                const iter = classifyIter(self, s.iter.*).?;
+                const id = fr.next_id;
+                fr.next_id += 1;
+                const head = try fr.newState();
+                const else_state = if (s.orelse_body != null and s.orelse_body.?.len > 0) try fr.newState() else null;
+                const exit = try fr.newState();
+
+                try fr.startIter(iter, id);
+                try fr.jump(head);
+                fr.begin(head);
+                try fr.fetch(iter, id, fr.ref(s.target.name.id), else_state orelse exit);
+
+                try fr.loops.append(fr.arena, .{ .continue_state = head, .break_state = exit });
+                try fr.body(s.body);
+                try fr.jump(head);
+                _ = fr.loops.pop();
+
+                // else runs when the loop is exhausted, not after break
+                if (else_state) |state| {
+                    fr.begin(state);
+                    try fr.body(s.orelse_body.?);
+                    try fr.jump(exit);
+                }
+                fr.begin(exit);
+            },
+            else => unreachable, // rejected by analyze()
+        }
+    }
+
+    fn store(fr: *Frame, name: []const u8, value: ast.Node) CodegenError!void {
+        const self = fr.self;
+        try self.emitIndent();
+        try self.emit(fr.ref(name));
+        try self.emit(" = ");
+        if (fr.isPyValue(name)) {
+            try self.emit("runtime.PyValue.from(");
+            try self.genExpr(value);
+            try self.emit(")");
+        } else {
+            try self.genExpr(value);
+        }
+        try self.emit(";\n");
+    }
+
+    /// Parenthesized Zig bool for a Python truth test
+    fn condition(fr: *Frame, node: ast.Node) CodegenError!void {
+        const self = fr.self;
+        const t = self.inferExprScoped(node) catch .unknown;
+        if (node == .compare or t == .bool) {
+            try self.emit("(");
+            try self.genExpr(node);
+            try self.emit(")");
+        } else {
+            try self.emit("(runtime.toBool(");
+            try self.genExpr(node);
+            try self.emit("))");
+        }
+    }
+
+    /// Suspend with `value`; on resume `target` (x = yield v) gets the sent value
+    fn yieldValue(fr: *Frame, value: ?*ast.Node, target: ?[]const u8) CodegenError!void {
+        const self = fr.self;
+        const resume_state = try fr.newState();
+        try fr.line("__f.__state = {d};", .{resume_state});
+        try self.emitIndent();
+        if (value) |v| {
+            if (v.* == .tuple) {
+                try self.emit("return try runtime.PyValue.fromAlloc(__global_allocator, ");
+            } else {
+                try self.emit("return runtime.PyValue.from(");
+            }
+            try self.genExpr(v.*);
+            try self.emit(");\n");
+        } else {
+            try self.emit("return runtime.PyValue{ .none = {} };\n");
+        }
+        fr.terminated = true;
+        fr.begin(resume_state);
+        if (target) |name| try fr.line("{s} = __f.__sent;", .{fr.ref(name)});
+    }
+
+    fn yieldFrom(fr: *Frame, node: ast.Node) CodegenError!void {
+        const iter = classifyIter(fr.self, node).?;
+        const id = fr.next_id;
+        fr.next_id += 1;
+        const head = try fr.newState();
+        const exit = try fr.newState();
+
+        try fr.startIter(iter, id);
+        switch (iter) {
+            .generator => {
+                // Values sent to this frame are forwarded to the delegate
+                try fr.line("__f.__sent = .none;", .{});
+                try fr.jump(head);
+                fr.begin(head);
+                try fr.line("if (try __f.__sub_{d}.send(__f.__sent)) |__item| {{", .{id});
+                fr.self.indent();
+                try fr.line("__f.__state = {d};", .{head});
+                try fr.line("return __item;", .{});
+                fr.self.dedent();
+                try fr.line("}}", .{});
+                try fr.jump(exit);
+            },
+            .range, .sequence => {
+                try fr.field("__item_{d}: {s} = undefined", .{ id, try fr.itemType(iter) });
+                try fr.jump(head);
+                fr.begin(head);
+                try fr.fetch(iter, id, try std.fmt.allocPrint(fr.arena, "__f.__item_{d}", .{id}), exit);
+                try fr.line("__f.__state = {d};", .{head});
+                try fr.line("return runtime.PyValue.from(__f.__item_{d});", .{id});
+                fr.terminated = true;
+            },
+        }
+        fr.begin(exit);
+    }
+
+    fn itemType(fr: *Frame, iter: Iter) CodegenError![]const u8 {
+        return switch (iter) {
+            .range => "i64",
+            .sequence => |name| try std.fmt.allocPrint(fr.arena, "runtime.generators.Item(@FieldType(__Args, \"{s}\"))", .{name}),
+            .generator => "runtime.PyValue",
+        };
+    }
+
+    /// Declare the hidden fields of a loop and initialize them
+    fn startIter(fr: *Frame, iter: Iter, id: usize) CodegenError!void {
+        const self = fr.self;
+        switch (iter) {
+            .range => |args| {
+                const start: ?ast.Node = if (args.len >= 2) args[0] else null;
+                const stop = if (args.len == 1) args[0] else args[1];
+                try fr.field("__cur_{d}: i64 = 0", .{id});
+                try fr.field("__end_{d}: i64 = 0", .{id});
+                try self.emitIndent();
+                try self.output.writer(self.allocator).print("__f.__cur_{d} = ", .{id});
+                if (start) |s| {
+                    try self.emit("@intCast(");
+                    try self.genExpr(s);
+                    try self.emit(");\n");
+                } else {
+                    try self.emit("0;\n");
+                }
+                try self.emitIndent();
+                try self.output.writer(self.allocator).print("__f.__end_{d} = @intCast(", .{id});
+                try self.genExpr(stop);
+                try self.emit(");\n");
+                if (args.len == 3) {
+                    try fr.field("__step_{d}: i64 = 1", .{id});
+                    try self.emitIndent();
+                    try self.output.writer(self.allocator).print("__f.__step_{d} = @intCast(", .{id});
+                    try self.genExpr(args[2]);
+                    try self.emit(");\n");
+                    try fr.line("if (__f.__step_{d} == 0) return error.ValueError;", .{id});
+                }
+            },
+            .generator => |g| {
+                // The delegate's argument types are spelled from this frame's
+                // own field types, so the frame type stays a plain struct
+                try fr.field("__sub_{d}: {s}__Gen(@TypeOf({s})) = undefined", .{ id, g.def.name, try fr.argTypes(g.def, g.args) });
+                try self.emitIndent();
+                try self.output.writer(self.allocator).print("__f.__sub_{d} = .{{ .__args = ", .{id});
+                try genArgsStruct(self, g.def, g.args);
+                try self.emit(" };\n");
+            },
+            .sequence => |name| {
+                try fr.field("__iter_{d}: @FieldType(__Args, \"{s}\") = undefined", .{ id, name });
+                try fr.field("__idx_{d}: usize = 0", .{id});
+                try fr.line("__f.__iter_{d} = {s};", .{ id, fr.ref(name) });
+                try fr.line("__f.__idx_{d} = 0;", .{id});
+            },
+        }
+    }
+
+    /// Store the loop's next value in `dest`, or jump to `exhausted`
+    fn fetch(fr: *Frame, iter: Iter, id: usize, dest: []const u8, exhausted: usize) CodegenError!void {
+        switch (iter) {
+            .range => |args| {
+                if (args.len == 3) {
+                    try fr.line("if (if (__f.__step_{d} > 0) __f.__cur_{d} >= __f.__end_{d} else __f.__cur_{d} <= __f.__end_{d}) continue :gen {d};", .{ id, id, id, id, id, exhausted });
+                    try fr.line("{s} = @intCast(__f.__cur_{d});", .{ dest, id });
+                    try fr.line("__f.__cur_{d} += __f.__step_{d};", .{ id, id });
+                } else {
+                    try fr.line("if (__f.__cur_{d} >= __f.__end_{d}) continue :gen {d};", .{ id, id, exhausted });
+                    try fr.line("{s} = @intCast(__f.__cur_{d});", .{ dest, id });
+                    try fr.line("__f.__cur_{d} += 1;", .{id});
+                }
+            },
+            .generator => try fr.line("{s} = (try __f.__sub_{d}.next()) orelse continue :gen {d};", .{ dest, id, exhausted }),
+            .sequence => {
+                try fr.line("if (__f.__idx_{d} >= runtime.generators.items(&__f.__iter_{d}).len) continue :gen {d};", .{ id, id, exhausted });
+                try fr.line("{s} = runtime.generators.items(&__f.__iter_{d})[__f.__idx_{d}];", .{ dest, id, id });
+                try fr.line("__f.__idx_{d} += 1;", .{id});
+            },
+        }
+    }
+
+    /// `.{ .p = @as(T, undefined), ... }` mirroring a sub-generator call
+    fn argTypes(fr: *Frame, def: ast.Node.FunctionDef, args: []const ast.Node) CodegenError![]const u8 {
+        var buf = std.ArrayList(u8){};
+        const w = buf.writer(fr.arena);
+        try w.writeAll(".{");
+        for (def.args, args, 0..) |param, arg, i| {
+            try w.writeAll(if (i == 0) " ." else ", .");
+            try zig_keywords.writeEscapedIdent(w, param.name);
+            try w.writeAll(" = ");
+            if (arg == .name and fr.analysis.isParam(arg.name.id)) {
+                // Field access keeps comptime-known arguments comptime
+                try w.writeAll("@as(__Args, undefined).");
+                try zig_keywords.writeEscapedIdent(w, arg.name.id);
+            } else if (arg == .name) {
+                try w.print("@as({s}, undefined)", .{try fr.localType(fr.analysis.local(arg.name.id).?)});
+            } else {
+                try w.writeAll(try fr.render(arg));
+            }
+        }
+        try w.writeAll(if (def.args.len > 0) " }" else "}");
+        return buf.items;
+    }
+
+    fn localType(fr: *Frame, l: Local) CodegenError![]const u8 {
+        return switch (l.kind) {
+            .native => |t| blk: {
+                const zig_type = try fr.self.nativeTypeToZigType(t);
+                defer fr.self.allocator.free(zig_type);
+                break :blk try fr.arena.dupe(u8, zig_type);
+            },
+            .pyvalue => "runtime.PyValue",
+            .item_of => |seq| try fr.itemType(.{ .sequence = seq }),
+        };
+    }
+};
+
+fn escapedAlloc(allocator: std.mem.Allocator, prefix: []const u8, name: []const u8) CodegenError![]const u8 {
+    var buf = std.ArrayList(u8){};
+    try buf.appendSlice(allocator, prefix);
+    try zig_keywords.writeEscapedIdent(buf.writer(allocator), name);
+    return buf.items;
+}
+
+/// Emit `fn NAME__Gen(comptime __Args: type) type { ... }` for a lowered
+/// generator. Called just before the generator's own function, in the same
+/// container, so module mode exports both alongside each other.
+pub fn genGeneratorFrame(self: *NativeCodegen, func: ast.Node.FunctionDef) CodegenError!void {
+    if (!isLowered(self, func)) return;
+    var analysis = (try analyze(self, func)) orelse return;
+    defer analysis.deinit();
+
+    var arena_state = std.heap.ArenaAllocator.init(self.allocator);
+    defer arena_state.deinit();
+    const arena = arena_state.allocator();
+
+    const saved_indent = self.indent_level;
+    const saved_function = self.current_function_name;
+    const saved_in_generator = self.in_generator_function;
+    const saved_terminated = self.control_flow_terminated;
+    self.current_function_name = func.name;
+    self.in_generator_function = false;
+    defer {
+        self.indent_level = saved_indent;
+        self.current_function_name = saved_function;
+        self.in_generator_function = saved_in_generator;
+        self.control_flow_terminated = saved_terminated;
+    }
+
+    try self.pushScope();
+    defer self.popScope();
+
+    // Python names resolve to frame fields while the body is generated
+    const Saved = struct { name: []const u8, previous: ?[]const u8 };
+    var saved_renames = std.ArrayList(Saved){};
+    defer {
+        for (saved_renames.items) |entry| {
+            if (entry.previous) |previous| {
+                self.var_renames.put(entry.name, previous) catch {};
+            } else {
+                _ = self.var_renames.swapRemove(entry.name);
+            }
+        }
+        saved_renames.deinit(arena);
+    }
+    for (func.args) |arg| {
+        try saved_renames.append(arena, .{ .name = arg.name, .previous = self.var_renames.get(arg.name) });
+        try self.var_renames.put(arg.name, try escapedAlloc(arena, "__f.__args.", arg.name));
+        try self.declareVar(arg.name);
+    }
+    for (analysis.locals.items) |l| {
+        try saved_renames.append(arena, .{ .name = l.name, .previous = self.var_renames.get(l.name) });
+        try self.var_renames.put(l.name, try escapedAlloc(arena, "__f.", l.name));
+        try self.declareVarWithType(l.name, switch (l.kind) {
+            .native => |t| t,
+            .pyvalue => .pyvalue,
+            .item_of => .unknown,
+        });
+    }
+
+    var fr = Frame{ .self = self, .analysis = &analysis, .arena = arena };
+    defer for (fr.blocks.items) |*block| block.deinit(self.allocator);
+    // Prong bodies sit five levels into the frame type (fn, struct, step, switch, prong)
+    self.indent_level = saved_indent + 5;
+    try fr.run(func.body);
+    self.indent_level = saved_indent;
+
+    // Assemble the frame type around the generated states
+    const w = self.output.writer(self.allocator);
+    const pad = try arena.alloc(u8, saved_indent * 4);
+    @memset(pad, ' ');
+
+    try w.print("{s}fn {s}__Gen(comptime __Args: type) type {{\n", .{ pad, func.name });
+    try w.print("{s}    return struct {{\n", .{pad});
+    try w.print("{s}        __state: u32 = 0,\n", .{pad});
+    try w.print("{s}        __sent: runtime.PyValue = .none,\n", .{pad});
+    try w.print("{s}        __args: __Args,\n", .{pad});
+    for (analysis.locals.items) |l| {
+        try w.print("{s}        ", .{pad});
+        try zig_keywords.writeEscapedIdent(w, l.name);
+        try w.print(": {s} = undefined,\n", .{try fr.localType(l)});
+    }
+    var hidden = std.mem.splitScalar(u8, fr.fields.items, '\n');
+    while (hidden.next()) |field_line| {
+        if (field_line.len > 0) try w.print("{s}        {s}\n", .{ pad, field_line });
+    }
+    try w.print(
+        \\
+        \\{0s}        const Self = @This();
+        \\{0s}        const done = std.math.maxInt(u32);
+        \\
+        \\{0s}        pub fn next(__f: *Self) !?runtime.PyValue {{
+        \\{0s}            __f.__sent = .none;
+        \\{0s}            return __f.step();
+        \\{0s}        }}
+        \\
+        \\{0s}        /// Resume with `value` as the result of the pending yield
+        \\{0s}        pub fn send(__f: *Self, value: runtime.PyValue) !?runtime.PyValue {{
+        \\{0s}            // TypeError: can't send non-None value to a just-started generator
+        \\{0s}            if (__f.__state == 0 and value != .none) return error.TypeError;
+        \\{0s}            __f.__sent = value;
+        \\{0s}            return __f.step();
+        \\{0s}        }}
+        \\
+        \\{0s}        pub fn close(__f: *Self) void {{
+        \\{0s}            __f.__state = done;
+        \\{0s}        }}
+        \\
+        \\{0s}        /// Drain the remaining values (list(gen))
+        \\{0s}        pub fn collect(__f: *Self, allocator: std.mem.Allocator) ![]runtime.PyValue {{
+        \\{0s}            var items = std.ArrayListUnmanaged(runtime.PyValue){{}};
+        \\{0s}            errdefer items.deinit(allocator);
+        \\{0s}            while (try __f.next()) |item| try items.append(allocator, item);
+        \\{0s}            return items.toOwnedSlice(allocator);
+        \\{0s}        }}
+        \\
+        \\{0s}        fn step(__f: *Self) !?runtime.PyValue {{
+        \\{0s}            errdefer __f.__state = done;
+        \\{0s}            gen: switch (__f.__state) {{
+        \\
+    , .{pad});
+    for (fr.blocks.items, 0..) |block, state| {
+        try w.print("{s}                {d} => {{\n", .{ pad, state });
+        try self.output.appendSlice(self.allocator, block.items);
+        try w.print("{s}                }},\n", .{pad});
+    }
+    try w.print(
+        \\{0s}                else => {{}},
+        \\{0s}            }}
+        \\{0s}            __f.__state = done;
+        \\{0s}            return null;
+        \\{0s}        }}
+        \\{0s}    }};
+        \\{0s}}}
+        \\
+        \\
+    , .{pad});
+}
+
+// ============================================================================
+// Call sites
+// ============================================================================
+
+/// `.{ .p = <arg>, ... }` for a call to `gen`. Null `args` forwards the
+/// parameters of `gen` itself (its own eager wrapper).
+fn genArgsStruct(self: *NativeCodegen, gen: ast.Node.FunctionDef, args: ?[]const ast.Node) CodegenError!void {
+    const w = self.output.writer(self.allocator);
+    try self.emit(".{");
+    for (gen.args, 0..) |param, i| {
+        try self.emit(if (i == 0) " ." else ", .");
+        try zig_keywords.writeEscapedIdent(w, param.name);
+        try self.emit(" = ");
+        if (args) |a| {
+            try self.genExpr(a[i]);
+        } else if (self.module_level_funcs.contains(param.name) or
+            self.imported_modules.contains(param.name) or
+            zig_keywords.wouldShadowModule(param.name))
+        {
+            // Matches the parameter renaming in genFunctionSignature
+            try w.print("{s}__local", .{param.name});
+        } else {
+            try zig_keywords.writeEscapedIdent(w, param.name);
+        }
+    }
+    try self.emit(if (gen.args.len > 0) " }" else "}");
+}
+
+/// `gen__Gen(@TypeOf(.{...})){ .__args = .{...} }`
+fn genFrameInit(self: *NativeCodegen, gen: ast.Node.FunctionDef, args: ?[]const ast.Node) CodegenError!void {
+    try self.emit(gen.name);
+    try self.emit("__Gen(@TypeOf(");
+    try genArgsStruct(self, gen, args);
+    try self.emit(")){ .__args = ");
+    try genArgsStruct(self, gen, args);
+    try self.emit(" }");
+}
+
+/// Body of a lowered generator's own function: callers that need every
+/// value (list(f(x)), sum(f(x)), ...) get the drained frame
+pub fn genEagerBody(self: *NativeCodegen, func: ast.Node.FunctionDef) CodegenError!void {
+    self.indent();
+    try self.emitIndent();
+    try self.emit("var __gen = ");
+    try genFrameInit(self, func, null);
+    try self.emit(";\n");
+    try self.emitIndent();
+    try self.emit("return __gen.collect(__global_allocator);\n");
+    self.dedent();
+    try self.emitIndent();
+    try self.emit("}\n");
+}
+
+/// `for x in gen(...)` / `for x in g` (g a frame variable): pull values
+/// from the frame one at a time instead of materializing the list.
+/// Returns false to leave the loop to the generic path.
+pub fn genFusedFor(self: *NativeCodegen, var_name: []const u8, for_stmt: ast.Node.For) CodegenError!bool {
+    const frame_var: ?[]const u8 = if (for_stmt.iter.* == .name and self.generator_frame_vars.contains(for_stmt.iter.name.id))
+        for_stmt.iter.name.id
+    else
+        null;
+    var gen: ?ast.Node.FunctionDef = null;
+    if (frame_var == null) {
+        gen = frameCall(self, for_stmt.iter.*) orelse return false;
+        // The capture is a fresh const: leave rebinding loops to genFor
+        if (self.isDeclared(var_name) or countBindings(for_stmt.body, for_stmt.target.name.id) > 0) return false;
+    }
+
+    const label_id = self.block_label_counter;
+    self.block_label_counter += 1;
+
+    try self.emitIndent();
+    if (gen) |g| {
+        try self.emit("{\n");
+        self.indent();
+        try self.emitIndent();
+        try self.output.writer(self.allocator).print("var __gen_{d} = ", .{label_id});
+        try genFrameInit(self, g, for_stmt.iter.call.args);
+        try self.emit(";\n");
+        try self.emitIndent();
+        try self.output.writer(self.allocator).print("while (try __gen_{d}.next()) |", .{label_id});
+    } else {
+        try self.emit("while (try ");
+        try zig_keywords.writeEscapedIdent(self.output.writer(self.allocator), frame_var.?);
+        try self.emit(".next()) |");
+    }
+    if (for_basic.varUsedInBody(for_stmt.body, for_stmt.target.name.id)) {
+        try zig_keywords.writeEscapedIdent(self.output.writer(self.allocator), var_name);
+    } else {
+        try self.emit("_");
+    }
+    try self.emit("| {\n");
+
+    self.indent();
+    try self.pushScope();
+    try self.loop_capture_vars.put(var_name, {});
+    for (for_stmt.body) |stmt| {
+        try self.generateStmt(stmt);
+    }
+    _ = self.loop_capture_vars.swapRemove(var_name);
+    _ = self.var_renames.swapRemove(var_name);
+    self.popScope();
+    self.dedent();
+
+    try self.emitIndent();
+    try self.emit("}\n");
+    if (gen != null) {
+        self.dedent();
+        try self.emitIndent();
+        try self.emit("}\n");
+    }
+
+    // Like genFor: the else clause runs unconditionally
+    if (for_stmt.orelse_body) |else_body| {
+        for (else_body) |stmt| {
+            try self.generateStmt(stmt);
+        }
+    }
+    return true;
+}
+
+/// Decides whether `name` (assigned a generator call) can live as a frame
+/// on the stack: every use must be one the frame implements
+const FrameVarScan = struct {
+    name: []const u8,
+    assigns: usize = 0,
+    uses: usize = 0,
+    ok: bool = true,
+    /// Loop targets of `for x in name`; checked once the scan is done
+    targets: std.ArrayListUnmanaged(ast.Node.For) = .{},
+    allocator: std.mem.Allocator,
+
+    fn isName(c: *const FrameVarScan, node: ast.Node) bool {
+        return node == .name and std.mem.eql(u8, node.name.id, c.name);
+    }
+
+    fn visit(c: *FrameVarScan, node: ast.Node) bool {
+        if (!c.ok) return false;
+        switch (node) {
+            .name => if (c.isName(node)) {
+                c.ok = false; // bare use: passed, stored or rebound
+            },
+            .function_def, .class_def, .lambda => {
+                // Closures would need the frame by reference
+                var inner = NameCount{ .name = c.name };
+                walk(node, &inner);
+                if (inner.count > 0) c.ok = false;
+                return false;
+            },
+            .global_stmt => |g| for (g.names) |n| {
+                if (std.mem.eql(u8, n, c.name)) c.ok = false;
+            },
+            .assign => |a| if (a.targets.len == 1 and c.isName(a.targets[0])) {
+                c.assigns += 1;
+                walk(a.value.*, c);
+                return false;
+            },
+            .for_stmt => |f| if (c.isName(f.iter.*)) {
+                if (f.target.* != .name) {
+                    c.ok = false;
+                    return false;
+                }
+                c.uses += 1;
+                c.targets.append(c.allocator, f) catch {
+                    c.ok = false;
+                };
+                walkAll(f.body, c);
+                if (f.orelse_body) |body| walkAll(body, c);
+                return false;
+            },
+            .call => |call| {
+                // next(g) / next(g, default)
+                if (call.func.* == .name and std.mem.eql(u8, call.func.name.id, "next") and
+                    call.args.len >= 1 and call.args.len <= 2 and c.isName(call.args[0]) and call.keyword_args.len == 0)
+                {
+                    c.uses += 1;
+                    walkAll(call.args[1..], c);
+                    return false;
+                }
+                // g.send(v) / g.close() / g.__next__()
+                if (call.func.* == .attribute and c.isName(call.func.attribute.value.*) and call.keyword_args.len == 0) {
+                    const method = call.func.attribute.attr;
+                    for (frame_methods) |m| {
+                        if (std.mem.eql(u8, method, m)) {
+                            const want: usize = if (std.mem.eql(u8, m, "send")) 1 else 0;
+                            if (call.args.len != want) c.ok = false;
+                            c.uses += 1;
+                            walkAll(call.args, c);
+                            return false;
+                        }
+                    }
+                    c.ok = false;
+                }
+            },
+            else => {},
+        }
+        return c.ok;
+    }
+};
+
+/// Find locals of `body` that hold a lowered generator and are only driven
+/// through next()/send()/close()/for, and record them in
+/// self.generator_frame_vars. Their assignment then declares the frame
+/// itself rather than collecting the generator into a list. At module
+/// level, a use from any function body keeps the list (main()'s locals are
+/// not visible there).
+pub fn collectFrameVars(self: *NativeCodegen, body: []const ast.Node, params: []const ast.Arg) CodegenError!void {
+    for (body) |stmt| {
+        if (stmt != .assign) continue;
+        const assign = stmt.assign;
+        if (assign.targets.len != 1 or assign.targets[0] != .name) continue;
+        const name = assign.targets[0].name.id;
+        if (frameCall(self, assign.value.*) == null) continue;
+        if (self.generator_frame_vars.contains(name)) continue;
+        // Function locals shadowing a module global are renamed by genAssign
+        if (self.current_function_name != null and self.module_level_vars.contains(name)) continue;
+
+        var scan = FrameVarScan{ .name = name, .allocator = self.allocator };
+        defer scan.targets.deinit(self.allocator);
+        walkAll(body, &scan);
+        if (!scan.ok or scan.assigns != 1 or scan.uses == 0) continue;
+
+        if (!loopTargetsScoped(self, body, params, scan.targets.items)) continue;
+
+        try self.generator_frame_vars.put(name, assign.value.call.func.name.id);
+    }
+}
+
+/// Loop targets become while captures scoped to the loop body, so they
+/// must not be bound or read anywhere else
+fn loopTargetsScoped(self: *NativeCodegen, body: []const ast.Node, params: []const ast.Arg, loops: []const ast.Node.For) bool {
+    for (loops) |loop| {
+        const target = loop.target.name.id;
+        if (countBindings(body, target) != 1) return false;
+        if (countNames(body, target) != 1 + countNames(loop.body, target)) return false;
+        if (self.current_function_name != null and self.module_level_vars.contains(target)) return false;
+        for (params) |param| {
+            if (std.mem.eql(u8, param.name, target)) return false;
+        }
+    }
+    return true;
+}
+
+/// `g = gen(args)` for a frame variable: declare the frame
+pub fn genFrameAssign(self: *NativeCodegen, assign: ast.Node.Assign) CodegenError!bool {
+    if (assign.targets.len != 1 or assign.targets[0] != .name) return false;
+    const name = assign.targets[0].name.id;
+    if (!self.generator_frame_vars.contains(name)) return false;
+    const gen = frameCall(self, assign.value.*) orelse return false;
+
+    try self.emitIndent();
+    try self.emit("var ");
+    try zig_keywords.writeEscapedIdent(self.output.writer(self.allocator), name);
+    try self.emit(" = ");
+    try genFrameInit(self, gen, assign.value.call.args);
+    try self.emit(";\n");
+    try self.declareVar(name);
+    return true;
+}
+
+fn genFrameResume(self: *NativeCodegen, name: []const u8, sent: ?ast.Node, default: ?ast.Node) CodegenError!void {
+    try self.emit("((try ");
+    try zig_keywords.writeEscapedIdent(self.output.writer(self.allocator), name);
+    if (sent) |value| {
+        try self.emit(".send(runtime.PyValue.from(");
+        try self.genExpr(value);
+        try self.emit(")))");
+    } else {
+        try self.emit(".next())");
+    }
+    if (default) |value| {
+        try self.emit(" orelse runtime.PyValue.from(");
+        try self.genExpr(value);
+        try self.emit("))");
+    } else {
+        try self.emit(" orelse return error.StopIteration)");
+    }
+}
+
+/// next(g) / next(g, default) on a frame variable
+pub fn genFrameNext(self: *NativeCodegen, args: []ast.Node) CodegenError!bool {
+    if (args.len < 1 or args.len > 2 or args[0] != .name) return false;
+    if (!self.generator_frame_vars.contains(args[0].name.id)) return false;
+    try genFrameResume(self, args[0].name.id, null, if (args.len == 2) args[1] else null);
+    return true;
+}
+
+/// g.send(v) / g.close() / g.__next__() on a frame variable
+pub fn genFrameMethodCall(self: *NativeCodegen, call: ast.Node.Call) CodegenError!bool {
+    if (call.func.* != .attribute) return false;
+    const target = call.func.attribute.value.*;
+    if (target != .name or !self.generator_frame_vars.contains(target.name.id)) return false;
+    const name = target.name.id;
+    const method = call.func.attribute.attr;
+
+    if (std.mem.eql(u8, method, "send") and call.args.len == 1) {
+        try genFrameResume(self, name, call.args[0], null);
+    } else if (std.mem.eql(u8, method, "__next__") and call.args.len == 0) {
+        try genFrameResume(self, name, null, null);
+    } else if (std.mem.eql(u8, method, "close") and call.args.len == 0) {
+        try zig_keywords.writeEscapedIdent(self.output.writer(self.allocator), name);
+        try self.emit(".close()");
+    } else {
+        return false;
+    }
+    return true;
+}
@@ -13,6 +13,7 @@ pub const Funcs = std.StaticStringMap(ModuleHandler).initComptime(.{
     .{ "loads", genJsonLoads },
     .{ "dumps", genJsonDumps },
     .{ "load", genJsonLoad },
+    .{ "iterload", genJsonIterload },
     .{ "dump", genJsonDump },
     .{ "JSONEncoder", genJSONEncoder },
     .{ "JSONDecoder", genJSONDecoder },
@@ -229,14 +230,22 @@ pub fn genJsonLoad(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
     try self.genExpr(args[0]);
     try self.emit(";\n");
     try self.emitIndent();
-    try self.emit("const _content = try runtime.PyFile.read(_file, __global_allocator);\n");
-    try self.emitIndent();
-    try self.emit("break :json_load_blk try runtime.json.loads(_content, __global_allocator);\n");
+    try self.emit("break :json_load_blk try runtime.json.loadFile(_file, __global_allocator);\n");
     self.dedent();
     try self.emitIndent();
     try self.emit("}");
 }
 
+/// Generate code for json.iterload(file) (metal0 extension)
+/// `for rec in json.iterload(f)` is lowered lazily by the for-loop codegen
+/// (one record per iteration); anywhere else the records become a list
+pub fn genJsonIterload(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
+    if (args.len < 1) return;
+    try self.emit("(try runtime.json.loadRecords(");
+    try self.genExpr(args[0]);
+    try self.emit(", __global_allocator))");
+}
+
 /// Generate code for json.dump(obj, file)
 /// Writes JSON to file object
 pub fn genJsonDump(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
@@ -107,6 +107,10 @@ pub fn deinit(self: *NativeCodegen) void {
     freeMapKeys(self.allocator, &self.async_functions);
     self.async_functions.deinit();
 
+    // Clean up memoized_functions tracking
+    freeMapKeys(self.allocator, &self.memoized_functions);
+    self.memoized_functions.deinit();
+
     // Clean up vararg_functions tracking
     freeMapKeys(self.allocator, &self.vararg_functions);
     self.vararg_functions.deinit();
@@ -135,6 +139,11 @@ pub fn deinit(self: *NativeCodegen) void {
     freeMapKeys(self.allocator, &self.async_function_defs);
     self.async_function_defs.deinit();
 
+    // Clean up generator frame tracking
+    freeMapKeys(self.allocator, &self.lowered_generators);
+    self.lowered_generators.deinit();
+    self.generator_frame_vars.deinit();
+
     // Clean up imported_modules tracking
     freeMapKeys(self.allocator, &self.imported_modules);
     self.imported_modules.deinit();
@@ -164,6 +173,10 @@ pub fn deinit(self: *NativeCodegen) void {
     // Note: Keys are references to AST data, not owned - don't free
     self.func_local_mutations.deinit();
 
+    // Clean up func_loop_accumulators tracking
+    // Note: Keys are references to AST data, not owned - don't free
+    self.func_loop_accumulators.deinit();
+
     // Clean up func_local_uses tracking
     // Note: Keys are references to AST data, not owned - don't free
     self.func_local_uses.deinit();
@@ -268,10 +268,22 @@ pub const NativeCodegen = struct {
     // Maps function name -> void (e.g., "fetch_data" -> {})
     async_functions: FnvVoidMap,
 
+    // Track @functools.lru_cache / @functools.cache functions (for cache_info()/cache_clear())
+    // Maps function name -> void (e.g., "fib" -> {}); memo table is __lru_<name>
+    memoized_functions: FnvVoidMap,
+
     // Track async function definitions (for complexity analysis)
     // Maps function name -> FunctionDef (e.g., "fetch_data" -> FunctionDef)
     async_function_defs: FnvFuncDefMap,
 
+    // Generator functions compiled to resumable frames (generator_state_machine.zig)
+    // Maps function name -> FunctionDef (e.g., "count_up" -> FunctionDef)
+    lowered_generators: FnvFuncDefMap,
+
+    // Locals of the current function that hold a generator frame
+    // Maps variable name -> generator name (e.g., "g" -> "count_up"); keys not owned
+    generator_frame_vars: FnvStringMap,
+
     // Track functions with varargs (*args)
     // Maps function name -> void (e.g., "func" -> {})
     vararg_functions: FnvVoidMap,
@@ -342,6 +354,10 @@ pub const NativeCodegen = struct {
     // Used to distinguish true mutations from just type-change reassignments
     func_local_aug_assigns: FnvVoidMap,
 
+    // Track function-local loop accumulators (`x += ...` inside a for/while body)
+    // String accumulators append into a growable buffer instead of concatenating
+    func_loop_accumulators: FnvVoidMap,
+
     // Track function-local used variables (populated before genFunctionBody)
     // Maps variable name -> void for variables that are read (not just assigned) within current function
     // Used to prevent false "unused variable" detection for local variables
@@ -671,7 +687,10 @@ pub const NativeCodegen = struct {
             .from_import_needs_allocator = FnvVoidMap.init(allocator),
             .functions_needing_allocator = FnvVoidMap.init(allocator),
             .async_functions = FnvVoidMap.init(allocator),
+            .memoized_functions = FnvVoidMap.init(allocator),
             .async_function_defs = FnvFuncDefMap.init(allocator),
+            .lowered_generators = FnvFuncDefMap.init(allocator),
+            .generator_frame_vars = FnvStringMap.init(allocator),
             .vararg_functions = FnvVoidMap.init(allocator),
             .vararg_params = FnvVoidMap.init(allocator),
             .kwarg_functions = FnvVoidMap.init(allocator),
@@ -690,6 +709,7 @@ pub const NativeCodegen = struct {
             .intern_counter = 0,
             .func_local_mutations = FnvVoidMap.init(allocator),
             .func_local_aug_assigns = FnvVoidMap.init(allocator),
+            .func_loop_accumulators = FnvVoidMap.init(allocator),
             .func_local_uses = FnvVoidMap.init(allocator),
             .global_vars = FnvVoidMap.init(allocator),
             .module_level_funcs = FnvVoidMap.init(allocator),
@@ -1346,6 +1366,11 @@ pub const NativeCodegen = struct {
         return self.func_local_aug_assigns.contains(var_name);
     }
 
+    /// Check if a variable is a loop accumulator (`x += ...` inside a loop)
+    pub fn isLoopAccumulator(self: *NativeCodegen, var_name: []const u8) bool {
+        return self.func_loop_accumulators.contains(var_name);
+    }
+
     /// Check if a variable is unused (assigned but never read)
     /// For function-local variables, check func_local_uses first (if populated)
     /// This prevents false "unused" detection for variables used within function bodies
@@ -4,10 +4,13 @@ const ast = @import("ast");
 const core = @import("core.zig");
 const NativeCodegen = core.NativeCodegen;
 const CodegenError = core.CodegenError;
+const DecoratedFunction = core.DecoratedFunction;
 const imports = @import("imports.zig");
 const from_imports_gen = @import("from_imports.zig");
 const analyzer = @import("../analyzer.zig");
 const statements = @import("../statements.zig");
+const memoize = @import("../statements/functions/generators/memoize.zig");
+const generator_state_machine = @import("../generator_state_machine.zig");
 const expressions = @import("../expressions.zig");
 const import_resolver = @import("../../../import_resolver.zig");
 const zig_keywords = @import("zig_keywords");
@@ -320,6 +323,10 @@ pub fn generate(self: *NativeCodegen, module: ast.Node.Module) ![]const u8 {
     // This allows the function signature to reference the closure type by name
     try genClosureWrapperTypes(self, module);
 
+    // PHASE 4.55: Pick generator functions that compile to resumable frames
+    // Must run before any call site is generated so loops can drive the frames
+    try generator_state_machine.registerGenerators(self, module);
+
     // PHASE 4.6: Analyze functions that return test classes (factory pattern)
     // This enables unittest discovery for classes assigned via tuple unpacking
     try analyzeTestFactories(self, module);
@@ -363,6 +370,7 @@ pub fn generate(self: *NativeCodegen, module: ast.Node.Module) ![]const u8 {
         } else if (stmt == .function_def) {
             // Record debug line mapping for function definitions
             self.recordLineMappingForName(stmt.function_def.name);
+            try generator_state_machine.genGeneratorFrame(self, stmt.function_def);
             if (self.mode == .module) {
                 // In module mode, make functions pub
                 try self.emitIndent();
@@ -1108,6 +1116,10 @@ pub fn generate(self: *NativeCodegen, module: ast.Node.Module) ![]const u8 {
     }
     self.indent();
 
+    // print() writes into a process-wide buffer - drain it on every exit path out of main
+    try self.emitIndent();
+    try self.emit("defer runtime.stdout.flush();\n");
+
     // Setup allocator only if needed (skip for pure functions - smaller WASM)
     // Strategy: c_allocator in release (fast, OS cleanup), GPA in debug/WASM (safe)
     if (analysis.needs_allocator) {
@@ -1194,27 +1206,29 @@ pub fn generate(self: *NativeCodegen, module: ast.Node.Module) ![]const u8 {
     // This populates func_local_mutations with aug_assign and multi-assign info
     try statements.analyzeModuleLevelMutations(self, module.body);
 
+    // Generators bound to a name and only driven via next()/send()/for
+    // live on main()'s stack as frames
+    try generator_state_machine.collectFrameVars(self, module.body, &.{});
+
     for (module.body) |stmt| {
-        if (stmt != .function_def and stmt != .class_def and stmt != .import_stmt and stmt != .import_from) {
+        if (stmt == .function_def) {
+            // Python applies decorators where the def executes, so e.g. Flask
+            // routes are registered before a later app.run() blocks
+            if (takeDecorated(self, stmt.function_def.name)) |decorated_func| {
+                try applyDecorators(self, decorated_func);
+            }
+        } else if (stmt != .class_def and stmt != .import_stmt and stmt != .import_from) {
             try self.generateStmt(stmt);
         }
     }
 
-    // PHASE 7.5: Apply decorators (after statements so variables like 'app' are defined)
+    // PHASE 7.5: Apply decorators of functions not defined at module level
     if (self.decorated_functions.items.len > 0) {
         try self.emit("\n");
         try self.emitIndent();
         try self.emit("// Apply decorators\n");
         for (self.decorated_functions.items) |decorated_func| {
-            for (decorated_func.decorators) |decorator| {
-                try self.emitIndent();
-                try self.emit("_ = ");
-                try self.genExpr(decorator);
-                // Use .call() method to apply decorator (works for Flask route decorators)
-                try self.emit(".call(&");
-                try self.emit(decorated_func.name);
-                try self.emit(");\n");
-            }
+            try applyDecorators(self, decorated_func);
         }
     }
 
@@ -1453,6 +1467,30 @@ pub fn genExpr(self: *NativeCodegen, node: ast.Node) CodegenError!void {
     try expressions.genExpr(self, node);
 }
 
+/// Remove and return the registered decorators of module-level function `name`
+fn takeDecorated(self: *NativeCodegen, name: []const u8) ?DecoratedFunction {
+    for (self.decorated_functions.items, 0..) |decorated_func, i| {
+        if (std.mem.eql(u8, decorated_func.name, name)) return self.decorated_functions.orderedRemove(i);
+    }
+    return null;
+}
+
+/// Apply a module-level function's decorators at runtime (`_ = dec.call(&func)`)
+fn applyDecorators(self: *NativeCodegen, decorated_func: DecoratedFunction) CodegenError!void {
+    const is_memoized = self.memoized_functions.contains(decorated_func.name);
+    for (decorated_func.decorators) |decorator| {
+        // @lru_cache / @cache were lowered into the function itself
+        if (is_memoized and memoize.isMemoDecorator(self, decorator)) continue;
+        try self.emitIndent();
+        try self.emit("_ = ");
+        try self.genExpr(decorator);
+        // Use .call() method to apply decorator (works for Flask route decorators)
+        try self.emit(".call(&");
+        try self.emit(decorated_func.name);
+        try self.emit(");\n");
+    }
+}
+
 /// Pre-generate closure wrapper types for functions that return closures.
 /// This runs BEFORE function generation so the types exist when we need them.
 /// For zero-capture closures, we generate the entire implementation at module level.
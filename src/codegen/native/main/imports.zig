@@ -7,6 +7,7 @@ const statements = @import("../statements.zig");
 const import_resolver = @import("../../../import_resolver.zig");
 const fnv_hash = @import("fnv_hash");
 const build_dirs = @import("../../../build_dirs.zig");
+const module_interface = @import("../../../analysis/module_interface.zig");
 
 const hashmap_helper = @import("hashmap_helper");
 const FnvVoidMap = hashmap_helper.StringHashMap(void);
@@ -14,18 +15,6 @@ const FnvStringMap = hashmap_helper.StringHashMap([]const u8);
 const cleanup = @import("cleanup.zig");
 const freeMapKeys = cleanup.freeMapKeys;
 
-/// Infer return type from type string
-fn inferReturnTypeFromString(
-    type_name: []const u8,
-) @import("../../../analysis/native_types.zig").NativeType {
-    if (std.mem.eql(u8, type_name, "int")) return .{ .int = .bounded };
-    if (std.mem.eql(u8, type_name, "float")) return .float;
-    if (std.mem.eql(u8, type_name, "str")) return .{ .string = .runtime };
-    if (std.mem.eql(u8, type_name, "bool")) return .bool;
-
-    return .{ .int = .bounded };
-}
-
 /// Compile a Python module as an inlined Zig struct
 /// Returns Zig code as a string (caller must free)
 /// parent_module_prefix: For submodules, the full parent path (e.g. "testpkg.submod")
@@ -129,25 +118,8 @@ fn compileModuleAsStructWithPrefix(
 
     // Register function return types in main type inferrer
     if (main_type_inferrer) |type_inf| {
-        for (tree.module.body) |stmt| {
-            if (stmt == .function_def) {
-                const func = stmt.function_def;
-                // Infer return type from function
-                const return_type = if (func.return_type) |ret_type_name|
-                    inferReturnTypeFromString(ret_type_name)
-                else
-                    native_types_mod.NativeType{ .int = .bounded };
-
-                // Format: "module.function" or "parent.module.function" -> return type
-                const qualified_name = if (parent_prefix) |prefix|
-                    try std.fmt.allocPrint(allocator, "{s}.{s}.{s}", .{ prefix, module_name, func.name })
-                else
-                    try std.fmt.allocPrint(allocator, "{s}.{s}", .{ module_name, func.name });
-
-                try type_inf.func_return_types.put(qualified_name, return_type);
-                // Note: qualified_name is kept allocated for the lifetime of the map
-            }
-        }
+        const iface = try module_interface.ModuleInterface.fromModule(aa, tree.module);
+        try iface.register(type_inf, allocator, parent_prefix, module_name);
     }
 
     // Use full code generation for the module
@@ -55,7 +55,7 @@ pub const genClear = list.genClear;
 pub const genCopy = list.genCopy;
 pub const genIndex = list.genIndex;
 
-// Deque methods (using ArrayList as underlying type)
+// Deque methods (runtime._collections.Deque - ArrayList-compatible, O(1) at both ends)
 pub const genAppendleft = list.genAppendleft;
 pub const genPopleft = list.genPopleft;
 pub const genExtendleft = list.genExtendleft;
@@ -77,6 +77,10 @@ pub const genDictSetdefault = dict.genSetdefault;
 pub const genFileRead = file.genFileRead;
 pub const genFileWrite = file.genFileWrite;
 pub const genFileClose = file.genFileClose;
+pub const genFileFlush = file.genFileFlush;
+pub const genFileReadline = file.genFileReadline;
+pub const genFileReadlines = file.genFileReadlines;
+pub const genFileFileno = file.genFileFileno;
 
 // Set methods
 const set = @import("methods/set.zig");
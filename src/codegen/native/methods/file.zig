@@ -10,9 +10,9 @@ pub fn genFileRead(self: *NativeCodegen, obj: ast.Node, args: []ast.Node) Codege
         // read(n) - read n bytes
         try self.emit("try runtime.PyFile.readN(");
         try self.genExpr(obj);
-        try self.emit(", ");
+        try self.emit(", __global_allocator, @intCast(");
         try self.genExpr(args[0]);
-        try self.emit(", __global_allocator)");
+        try self.emit("))");
     } else {
         // read() - read all
         try self.emit("try runtime.PyFile.read(");
@@ -36,21 +36,13 @@ pub fn genFileClose(self: *NativeCodegen, obj: ast.Node, args: []ast.Node) Codeg
 /// Generate code for file.readline(size=-1)
 pub fn genFileReadline(self: *NativeCodegen, obj: ast.Node, args: []ast.Node) CodegenError!void {
     _ = args; // size parameter ignored for now
-    try self.emit("readline_blk: { const _f = "); try self.genExpr(obj);
-    try self.emit("; var _line: std.ArrayListUnmanaged(u8) = .{}; const _reader = _f.file.reader(); ");
-    try self.emit("while (_reader.readByte()) |c| { _line.append(__global_allocator, c) catch break; if (c == '\\n') break; } else |_| {} ");
-    try self.emit("break :readline_blk _line.items; }");
+    try self.emit("try runtime.PyFile.readline("); try self.genExpr(obj); try self.emit(", __global_allocator)");
 }
 
 /// Generate code for file.readlines(hint=-1)
 pub fn genFileReadlines(self: *NativeCodegen, obj: ast.Node, args: []ast.Node) CodegenError!void {
     _ = args;
-    try self.emit("readlines_blk: { const _f = "); try self.genExpr(obj);
-    try self.emit("; var _lines: std.ArrayListUnmanaged([]const u8) = .{}; const _reader = _f.file.reader(); ");
-    try self.emit("while (true) { var _line: std.ArrayListUnmanaged(u8) = .{}; var _got_data = false; ");
-    try self.emit("while (_reader.readByte()) |c| { _got_data = true; _line.append(__global_allocator, c) catch break; if (c == '\\n') break; } else |_| {} ");
-    try self.emit("if (!_got_data) break; _lines.append(__global_allocator, _line.items) catch continue; } ");
-    try self.emit("break :readlines_blk _lines.items; }");
+    try self.emit("(try runtime.PyFile.readlines("); try self.genExpr(obj); try self.emit(", __global_allocator)).items");
 }
 
 /// Generate code for file.writelines(lines)
@@ -86,8 +78,7 @@ pub fn genFileTell(self: *NativeCodegen, obj: ast.Node, args: []ast.Node) Codege
 /// Generate code for file.flush()
 pub fn genFileFlush(self: *NativeCodegen, obj: ast.Node, args: []ast.Node) CodegenError!void {
     _ = args;
-    try self.emit("flush_blk: { const _f = "); try self.genExpr(obj);
-    try self.emit("; _ = _f; break :flush_blk {}; }"); // Zig auto-flushes on write
+    try self.emit("runtime.PyFile.flush("); try self.genExpr(obj); try self.emit(")");
 }
 
 /// Generate code for file.truncate(size=None)
@@ -123,8 +114,7 @@ pub fn genFileSeekable(self: *NativeCodegen, obj: ast.Node, args: []ast.Node) Co
 /// Generate code for file.fileno()
 pub fn genFileFileno(self: *NativeCodegen, obj: ast.Node, args: []ast.Node) CodegenError!void {
     _ = args;
-    try self.emit("fileno_blk: { const _f = "); try self.genExpr(obj);
-    try self.emit("; break :fileno_blk @as(i64, @intCast(_f.file.handle)); }");
+    try self.emit("(try runtime.PyFile.fileno("); try self.genExpr(obj); try self.emit("))");
 }
 
 /// Generate code for file.isatty()
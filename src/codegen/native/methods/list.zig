@@ -288,26 +288,27 @@ pub fn genCount(self: *NativeCodegen, obj: ast.Node, args: []ast.Node) CodegenEr
 }
 
 /// Generate code for deque.appendleft(item)
-/// Inserts item at the beginning (index 0)
+/// O(1): runtime._collections.Deque keeps free room before its first element
 pub fn genAppendleft(self: *NativeCodegen, obj: ast.Node, args: []ast.Node) CodegenError!void {
     if (args.len != 1) return;
 
-    // Generate: try deque.insert(__global_allocator, 0, item)
+    // Generate: try deque.appendleft(__global_allocator, item)
     try self.emit("try ");
     try emitObjExpr(self, obj);
-    try self.emit(".insert(__global_allocator, 0, ");
+    try self.emit(".appendleft(__global_allocator, ");
     try self.genExpr(args[0]);
     try self.emit(")");
 }
 
 /// Generate code for deque.popleft()
-/// Removes and returns the first item
+/// Removes and returns the first item; IndexError when the deque is empty
 pub fn genPopleft(self: *NativeCodegen, obj: ast.Node, args: []ast.Node) CodegenError!void {
     _ = args;
 
-    // Generate: deque.orderedRemove(0)
-    try self.genExpr(obj);
-    try self.emit(".orderedRemove(0)");
+    // Generate: (deque.popleft() orelse return error.IndexError)
+    try self.emit("(");
+    try emitObjExpr(self, obj);
+    try self.emit(".popleft() orelse return error.IndexError)");
 }
 
 /// Generate code for deque.extendleft(iterable)
@@ -319,38 +320,33 @@ pub fn genExtendleft(self: *NativeCodegen, obj: ast.Node, args: []ast.Node) Code
 
     // Check if argument is a list literal - use & slice syntax
     if (arg == .list) {
-        // Array literals: iterate directly with &
-        try self.emit("{ for (&");
+        // Array literals: pass as slice
+        try self.emit("try ");
+        try emitObjExpr(self, obj);
+        try self.emit(".extendleft(__global_allocator, &");
         try self.genExpr(arg);
-        try self.emit(") |__ext_item| { try ");
-        try self.genExpr(obj);
-        try self.emit(".insert(__global_allocator, 0, __ext_item); } }");
+        try self.emit(")");
     } else {
         // ArrayList variable: use .items
         try self.emit("{ const __ext_temp = ");
         try self.genExpr(arg);
-        try self.emit(".items; for (__ext_temp) |__ext_item| { try ");
-        try self.genExpr(obj);
-        try self.emit(".insert(__global_allocator, 0, __ext_item); } }");
+        try self.emit(".items; try ");
+        try emitObjExpr(self, obj);
+        try self.emit(".extendleft(__global_allocator, __ext_temp); }");
     }
 }
 
 /// Generate code for deque.rotate(n)
-/// Rotates deque n steps to the right (negative = left)
+/// Rotates deque n steps to the right (negative = left), O(min(n, len - n)) amortized
 pub fn genRotate(self: *NativeCodegen, obj: ast.Node, args: []ast.Node) CodegenError!void {
-    // Generate: std.mem.rotate(T, deque.items, n)
-    // Note: std.mem.rotate rotates left, so we need to negate for Python's right rotation
-    try self.emit("std.mem.rotate(@TypeOf(");
-    try self.genExpr(obj);
-    try self.emit(".items[0]), ");
-    try self.genExpr(obj);
-    try self.emit(".items, @as(usize, @intCast(");
-    try self.genExpr(obj);
-    try self.emit(".items.len)) -% @as(usize, @intCast(");
+    // Generate: try deque.rotate(__global_allocator, n)
+    try self.emit("try ");
+    try emitObjExpr(self, obj);
+    try self.emit(".rotate(__global_allocator, @intCast(");
     if (args.len > 0) {
         try self.genExpr(args[0]);
     } else {
         try self.emit("1");
     }
-    try self.emit(")))");
+    try self.emit("))");
 }
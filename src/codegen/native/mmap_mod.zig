@@ -1,14 +1,235 @@
 /// Python mmap module - Memory-mapped file support
 const std = @import("std");
+const ast = @import("ast");
 const h = @import("mod_helper.zig");
+const CodegenError = h.CodegenError;
+const NativeCodegen = h.NativeCodegen;
 
 pub const Funcs = std.StaticStringMap(h.H).initComptime(.{
-    .{ "mmap", h.c("struct { _data: []u8 = &[_]u8{}, _pos: usize = 0, _closed: bool = false, pub fn close(__self: *@This()) void { __self._closed = true; } pub fn closed(__self: *@This()) bool { return __self._closed; } pub fn find(__self: *@This(), sub: []const u8, start: ?usize, end: ?usize) isize { const s = start orelse 0; const e = end orelse __self._data.len; if (std.mem.indexOf(u8, __self._data[s..e], sub)) |idx| return @intCast(s + idx); return -1; } pub fn rfind(__self: *@This(), sub: []const u8, start: ?usize, end: ?usize) isize { const s = start orelse 0; const e = end orelse __self._data.len; if (std.mem.lastIndexOf(u8, __self._data[s..e], sub)) |idx| return @intCast(s + idx); return -1; } pub fn flush(__self: *@This(), offset: ?usize, size: ?usize) void { _ = __self; _ = offset; _ = size; } pub fn move(__self: *@This(), dest: usize, src: usize, count: usize) void { std.mem.copyBackwards(u8, __self._data[dest..dest+count], __self._data[src..src+count]); } pub fn read(__self: *@This(), n: ?usize) []const u8 { const count = n orelse (__self._data.len - __self._pos); const e = @min(__self._pos + count, __self._data.len); const result = __self._data[__self._pos..e]; __self._pos = e; return result; } pub fn read_byte(__self: *@This()) ?u8 { if (__self._pos >= __self._data.len) return null; const b = __self._data[__self._pos]; __self._pos += 1; return b; } pub fn readline(__self: *@This()) []const u8 { const start = __self._pos; while (__self._pos < __self._data.len and __self._data[__self._pos] != '\\n') __self._pos += 1; if (__self._pos < __self._data.len) __self._pos += 1; return __self._data[start..__self._pos]; } pub fn resize(__self: *@This(), newsize: usize) void { _ = __self; _ = newsize; } pub fn seek(__self: *@This(), pos: usize, whence: ?i32) void { const w = whence orelse 0; if (w == 0) __self._pos = pos else if (w == 1) __self._pos = @min(__self._pos + pos, __self._data.len) else if (w == 2) __self._pos = if (pos > __self._data.len) 0 else __self._data.len - pos; } pub fn size(__self: *@This()) usize { return __self._data.len; } pub fn tell(__self: *@This()) usize { return __self._pos; } pub fn write(__self: *@This(), data: []const u8) usize { const count = @min(data.len, __self._data.len - __self._pos); @memcpy(__self._data[__self._pos..__self._pos+count], data[0..count]); __self._pos += count; return count; } pub fn write_byte(__self: *@This(), byte: u8) void { if (__self._pos < __self._data.len) { __self._data[__self._pos] = byte; __self._pos += 1; } } }{}") },
+    .{ "mmap", genMmap },
     .{ "ACCESS_READ", h.I32(1) }, .{ "ACCESS_WRITE", h.I32(2) },
     .{ "ACCESS_COPY", h.I32(3) }, .{ "ACCESS_DEFAULT", h.I32(0) },
     .{ "MAP_SHARED", h.I32(0x01) }, .{ "MAP_PRIVATE", h.I32(0x02) }, .{ "MAP_ANONYMOUS", h.I32(0x20) },
     .{ "PROT_READ", h.I32(0x01) }, .{ "PROT_WRITE", h.I32(0x02) }, .{ "PROT_EXEC", h.I32(0x04) },
-    .{ "PAGESIZE", h.c("@as(usize, 4096)") }, .{ "ALLOCATIONGRANULARITY", h.c("@as(usize, 4096)") },
+    .{ "PAGESIZE", h.c("std.heap.pageSize()") }, .{ "ALLOCATIONGRANULARITY", h.c("std.heap.pageSize()") },
     .{ "MADV_NORMAL", h.I32(0) }, .{ "MADV_RANDOM", h.I32(1) }, .{ "MADV_SEQUENTIAL", h.I32(2) },
     .{ "MADV_WILLNEED", h.I32(3) }, .{ "MADV_DONTNEED", h.I32(4) },
 });
+
+/// mmap.mmap(fileno, length, flags=, prot=, access=, offset=) with keyword arguments
+pub fn tryDispatchKw(self: *NativeCodegen, func_name: []const u8, call: ast.Node.Call) CodegenError!bool {
+    if (call.keyword_args.len == 0 or !std.mem.eql(u8, func_name, "mmap")) return false;
+    if (call.args.len < 2) return false;
+    var access: ?ast.Node = null;
+    var prot: ?ast.Node = if (call.args.len > 3) call.args[3] else null;
+    var offset: ?ast.Node = if (call.args.len > 5) call.args[5] else null;
+    for (call.keyword_args) |kw| {
+        if (std.mem.eql(u8, kw.name, "access")) access = kw.value;
+        if (std.mem.eql(u8, kw.name, "prot")) prot = kw.value;
+        if (std.mem.eql(u8, kw.name, "offset")) offset = kw.value;
+    }
+    try emitMmap(self, call.args[0], call.args[1], access, prot, offset);
+    return true;
+}
+
+fn genMmap(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
+    if (args.len < 2) {
+        try self.emit("runtime.mmap.MMap{}");
+        return;
+    }
+    try emitMmap(self, args[0], args[1], if (args.len > 4) args[4] else null, if (args.len > 3) args[3] else null, if (args.len > 5) args[5] else null);
+}
+
+/// Emit runtime.mmap.MMap.init; a prot without PROT_WRITE maps read-only
+fn emitMmap(self: *NativeCodegen, fileno: ast.Node, length: ast.Node, access: ?ast.Node, prot: ?ast.Node, offset: ?ast.Node) CodegenError!void {
+    try self.emit("(try runtime.mmap.MMap.init(@intCast(");
+    try self.genExpr(fileno);
+    try self.emit("), @intCast(");
+    try self.genExpr(length);
+    try self.emit("), ");
+    if (access) |a| {
+        try self.emit("@intCast(");
+        try self.genExpr(a);
+        try self.emit(")");
+    } else if (prot) |p| {
+        try self.emit("if (@as(i64, @intCast(");
+        try self.genExpr(p);
+        try self.emit(")) & 0x02 == 0) runtime.mmap.ACCESS_READ else runtime.mmap.ACCESS_DEFAULT");
+    } else {
+        try self.emit("runtime.mmap.ACCESS_DEFAULT");
+    }
+    try self.emit(", ");
+    if (offset) |o| {
+        try self.emit("@intCast(");
+        try self.genExpr(o);
+        try self.emit(")");
+    } else {
+        try self.emit("0");
+    }
+    try self.emit("))");
+}
+
+/// Emit an optional offset argument: null when omitted, else a usize
+fn emitOptUsize(self: *NativeCodegen, arg: ?ast.Node) CodegenError!void {
+    if (arg) |a| {
+        try self.emit("@as(usize, @intCast(");
+        try self.genExpr(a);
+        try self.emit("))");
+    } else {
+        try self.emit("null");
+    }
+}
+
+fn argAt(args: []ast.Node, i: usize) ?ast.Node {
+    return if (i < args.len) args[i] else null;
+}
+
+fn emitCall(self: *NativeCodegen, obj: ast.Node, method: []const u8) CodegenError!void {
+    try self.genExpr(obj);
+    try self.emit(method);
+}
+
+/// Methods on a value inferred as .mmap. Omitted optional arguments are
+/// passed as null; reads come back as PyBytes views of the mapping.
+pub fn genMmapMethod(self: *NativeCodegen, obj: ast.Node, method_name: []const u8, call: ast.Node.Call) CodegenError!bool {
+    const args = call.args;
+
+    if (std.mem.eql(u8, method_name, "find") or std.mem.eql(u8, method_name, "rfind")) {
+        // find(sub, start=None, end=None) -> int
+        if (args.len == 0) return false;
+        try self.emit("@as(i64, ");
+        try emitCall(self, obj, if (method_name[0] == 'r') ".rfind(" else ".find(");
+        try self.genExpr(args[0]);
+        try self.emit(", ");
+        try emitOptUsize(self, argAt(args, 1));
+        try self.emit(", ");
+        try emitOptUsize(self, argAt(args, 2));
+        try self.emit("))");
+        return true;
+    }
+    if (std.mem.eql(u8, method_name, "read")) {
+        // read(n=None) -> bytes
+        try self.emit("runtime.builtins.PyBytes.init(");
+        try emitCall(self, obj, ".read(");
+        try emitOptUsize(self, argAt(args, 0));
+        try self.emit("))");
+        return true;
+    }
+    if (std.mem.eql(u8, method_name, "readline")) {
+        try self.emit("runtime.builtins.PyBytes.init(");
+        try emitCall(self, obj, ".readline())");
+        return true;
+    }
+    if (std.mem.eql(u8, method_name, "read_byte")) {
+        // ValueError at end of the mapping, like CPython
+        try self.emit("@as(i64, ");
+        try emitCall(self, obj, ".read_byte() orelse return error.ValueError)");
+        return true;
+    }
+    if (std.mem.eql(u8, method_name, "size") or std.mem.eql(u8, method_name, "tell")) {
+        try self.emit("@as(i64, @intCast(");
+        try self.genExpr(obj);
+        try self.emitFmt(".{s}()))", .{method_name});
+        return true;
+    }
+    if (std.mem.eql(u8, method_name, "write")) {
+        if (args.len != 1) return false;
+        try self.emit("@as(i64, @intCast(");
+        try emitCall(self, obj, ".write(");
+        try self.genExpr(args[0]);
+        try self.emit(")))");
+        return true;
+    }
+    if (std.mem.eql(u8, method_name, "write_byte")) {
+        if (args.len != 1) return false;
+        try emitCall(self, obj, ".write_byte(@intCast(");
+        try self.genExpr(args[0]);
+        try self.emit("))");
+        return true;
+    }
+    if (std.mem.eql(u8, method_name, "seek")) {
+        // seek(pos, whence=0)
+        if (args.len == 0) return false;
+        try emitCall(self, obj, ".seek(@intCast(");
+        try self.genExpr(args[0]);
+        try self.emit("), ");
+        if (argAt(args, 1)) |w| {
+            try self.emit("@intCast(");
+            try self.genExpr(w);
+            try self.emit(")");
+        } else {
+            try self.emit("null");
+        }
+        try self.emit(")");
+        return true;
+    }
+    if (std.mem.eql(u8, method_name, "flush")) {
+        // flush(offset=None, size=None)
+        try emitCall(self, obj, ".flush(");
+        try emitOptUsize(self, argAt(args, 0));
+        try self.emit(", ");
+        try emitOptUsize(self, argAt(args, 1));
+        try self.emit(")");
+        return true;
+    }
+    if (std.mem.eql(u8, method_name, "madvise")) {
+        // madvise(option, start=None, length=None)
+        if (args.len == 0) return false;
+        try emitCall(self, obj, ".madvise(@intCast(");
+        try self.genExpr(args[0]);
+        try self.emit("), ");
+        try emitOptUsize(self, argAt(args, 1));
+        try self.emit(", ");
+        try emitOptUsize(self, argAt(args, 2));
+        try self.emit(")");
+        return true;
+    }
+    if (std.mem.eql(u8, method_name, "move")) {
+        if (args.len != 3) return false;
+        try emitCall(self, obj, ".move(");
+        for (args, 0..) |a, i| {
+            if (i > 0) try self.emit(", ");
+            try self.emit("@intCast(");
+            try self.genExpr(a);
+            try self.emit(")");
+        }
+        try self.emit(")");
+        return true;
+    }
+    if (std.mem.eql(u8, method_name, "close")) {
+        try emitCall(self, obj, ".close()");
+        return true;
+    }
+    return false;
+}
+
+/// m[i] (byte as int) and m[a:b] (PyBytes view of the mapping, no copy)
+pub fn genMmapSubscript(self: *NativeCodegen, subscript: ast.Node.Subscript) CodegenError!bool {
+    switch (subscript.slice) {
+        .index => |index| {
+            try self.emit("(try ");
+            try self.genExpr(subscript.value.*);
+            try self.emit(".byteAt(@intCast(");
+            try self.genExpr(index.*);
+            try self.emit(")))");
+        },
+        .slice => |range| {
+            if (range.step != null) return false;
+            try self.emit("runtime.builtins.PyBytes.init(");
+            try self.genExpr(subscript.value.*);
+            try self.emit(".slice(");
+            for ([_]?*ast.Node{ range.lower, range.upper }, 0..) |bound, i| {
+                if (i > 0) try self.emit(", ");
+                if (bound) |b| {
+                    try self.emit("@as(i64, @intCast(");
+                    try self.genExpr(b.*);
+                    try self.emit("))");
+                } else {
+                    try self.emit("null");
+                }
+            }
+            try self.emit("))");
+        },
+    }
+    return true;
+}
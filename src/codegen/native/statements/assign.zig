@@ -10,6 +10,7 @@ const deferCleanup = @import("assign_defer.zig");
 const typeHandling = @import("assign/type_handling.zig");
 const valueGen = @import("assign/value_generation.zig");
 const zig_keywords = @import("zig_keywords");
+const generator_state_machine = @import("../generator_state_machine.zig");
 
 // Re-export submodules
 pub const genAugAssign = @import("assign/aug_assign.zig").genAugAssign;
@@ -114,6 +115,9 @@ pub fn genAssign(self: *NativeCodegen, assign: ast.Node.Assign) CodegenError!voi
         return;
     }
 
+    // g = gen(...) where g is only driven via next()/send()/for: declare the frame
+    if (try generator_state_machine.genFrameAssign(self, assign)) return;
+
     // Infer type from the current value expression
     var value_type = try self.inferExprScoped(assign.value.*);
     const original_expr_type = value_type; // Keep for class_instance shadowing detection
@@ -836,6 +836,16 @@ pub fn genAugAssign(self: *NativeCodegen, aug: ast.Node.AugAssign) CodegenError!
     const is_string_concat = target_type == .string or value_type == .string or is_fstring or
         (target_type == .unknown and (value_type == .string or is_fstring));
     if (aug.op == .Add and is_string_concat) {
+        // Accumulator in a loop: append into a per-site growable buffer
+        // (amortized O(1)) instead of copying the whole string every iteration
+        if (aug.target.* == .name and self.isLoopAccumulator(aug.target.name.id)) {
+            try self.emit("try struct { threadlocal var acc: runtime.string_utils.StringAccumulator = .{}; }.acc.append(__global_allocator, ");
+            try self.genExpr(aug.target.*);
+            try self.emit(", ");
+            try self.genExpr(aug.value.*);
+            try self.emit(");\n");
+            return;
+        }
         try self.emit("try std.mem.concat(__global_allocator, u8, &.{");
         try self.genExpr(aug.target.*);
         try self.emit(", ");
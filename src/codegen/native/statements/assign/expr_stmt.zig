@@ -29,8 +29,8 @@ pub fn genExprStmt(self: *NativeCodegen, expr: ast.Node) CodegenError!void {
     if (expr == .call and expr.call.func.* == .name) {
         const func_name = expr.call.func.name.id;
         if (std.mem.eql(u8, func_name, "print")) {
-            const genPrint = @import("../misc.zig").genPrint;
-            try genPrint(self, expr.call.args);
+            const genPrintCall = @import("../misc.zig").genPrintCall;
+            try genPrintCall(self, expr.call);
             return;
         }
     }
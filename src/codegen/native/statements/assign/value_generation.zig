@@ -443,11 +443,12 @@ pub fn emitVarDeclaration(
     // This checks both module-level analysis AND function-local mutations
     const is_mutated = self.isVarMutated(var_name);
 
-    // Check if value type is deque - deques need var because std.ArrayListUnmanaged methods (append, etc.)
+    // Check if value type is deque - deques need var because Deque/ArrayList methods (append, etc.)
     // take *Self, not self pointer. Unlike hashmaps which use *Self parameters and can be const.
     // NOTE: counter/hash_object/defaultdict use hashmaps which take *Self in method signatures,
     // so they can be const unless reassigned (like dicts). Only deque needs var for ArrayList API.
-    const is_mutable_collection = (value_type == .deque);
+    // mmap objects track a file position, so read/seek/close take *MMap as well.
+    const is_mutable_collection = (value_type == .deque or value_type == .mmap);
 
     // Iterators need var because next() mutates them
     // Note: hash_object types can use const unless explicitly mutated (is_mutated check)
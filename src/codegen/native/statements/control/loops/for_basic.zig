@@ -7,6 +7,7 @@ const for_special = @import("for_special.zig");
 const genEnumerateLoop = for_special.genEnumerateLoop;
 const genZipLoop = for_special.genZipLoop;
 const zig_keywords = @import("zig_keywords");
+const generator_state_machine = @import("../../../generator_state_machine.zig");
 const producesBlockExpression = @import("../../../expressions.zig").producesBlockExpression;
 const triggerDeferredClosureInstantiations = @import("../../assign.zig").triggerDeferredClosureInstantiations;
 
@@ -249,6 +250,208 @@ pub fn varUsedInBody(body: []ast.Node, var_name: []const u8) bool {
     return false;
 }
 
+/// Check if a file loop's line could outlive the iteration that produced it.
+/// Conservative: any use other than conditions, print(), or len()/int()/float()
+/// conversions counts as an escape, so the line gets its own allocation.
+fn lineEscapesBody(body: []ast.Node, var_name: []const u8) bool {
+    for (body) |stmt| {
+        if (lineEscapesStmt(stmt, var_name)) return true;
+    }
+    return false;
+}
+
+fn lineEscapesStmt(stmt: ast.Node, var_name: []const u8) bool {
+    return switch (stmt) {
+        .expr_stmt => |e| blk: {
+            if (e.value.* == .call and e.value.call.func.* == .name and
+                std.mem.eql(u8, e.value.call.func.name.id, "print"))
+            {
+                break :blk false;
+            }
+            break :blk exprUsesVar(e.value.*, var_name);
+        },
+        .assign => |a| blk: {
+            for (a.targets) |t| {
+                if (exprUsesVar(t, var_name)) break :blk true;
+            }
+            break :blk lineEscapesValue(a.value.*, var_name);
+        },
+        .aug_assign => |a| exprUsesVar(a.target.*, var_name) or lineEscapesValue(a.value.*, var_name),
+        .if_stmt => |i| lineEscapesBody(i.body, var_name) or lineEscapesBody(i.else_body, var_name),
+        .while_stmt => |w| lineEscapesBody(w.body, var_name),
+        .for_stmt => |f| exprUsesVar(f.iter.*, var_name) or lineEscapesBody(f.body, var_name),
+        .assert_stmt => false,
+        else => stmtUsesVar(stmt, var_name),
+    };
+}
+
+fn lineEscapesValue(value: ast.Node, var_name: []const u8) bool {
+    if (value == .call and value.call.func.* == .name) {
+        const func_name = value.call.func.name.id;
+        if (std.mem.eql(u8, func_name, "len") or std.mem.eql(u8, func_name, "int") or
+            std.mem.eql(u8, func_name, "float") or std.mem.eql(u8, func_name, "bool"))
+        {
+            return false;
+        }
+    }
+    return exprUsesVar(value, var_name);
+}
+
+fn isJsonIterload(iter: ast.Node) bool {
+    if (iter != .call or iter.call.func.* != .attribute) return false;
+    const attr = iter.call.func.attribute;
+    return attr.value.* == .name and std.mem.eql(u8, attr.value.name.id, "json") and
+        std.mem.eql(u8, attr.attr, "iterload") and iter.call.args.len == 1;
+}
+
+/// for rec in json.iterload(f): -> while (try __records_N.next()) |rec| { ... }
+/// Each record is a new reference, released when its iteration ends.
+fn genJsonRecordsLoop(self: *NativeCodegen, var_name: []const u8, for_stmt: ast.Node.For) CodegenError!void {
+    try genPullLoop(self, var_name, for_stmt, .{
+        .prefix = "records",
+        .init_open = "try runtime.json.RecordIterator.init(__global_allocator, ",
+        .init_close = ")",
+        .fallible = true,
+        .owned_items = true,
+    });
+}
+
+/// Could a json.iterload record be referenced after its iteration ends?
+/// Containers take their own reference (PyList.append increfs), so only
+/// aliasing the record or a part of it counts: `x = rec`, `x = rec["k"]`,
+/// `return rec`, `yield rec`, or capturing it in a nested def/class.
+fn recordOutlivesBody(body: []ast.Node, var_name: []const u8) bool {
+    for (body) |stmt| {
+        if (recordOutlivesStmt(stmt, var_name)) return true;
+    }
+    return false;
+}
+
+fn recordOutlivesStmt(stmt: ast.Node, var_name: []const u8) bool {
+    return switch (stmt) {
+        .assign => |a| borrowsFrom(a.value.*, var_name),
+        .ann_assign => |a| if (a.value) |v| borrowsFrom(v.*, var_name) else false,
+        .return_stmt => |r| if (r.value) |v| borrowsFrom(v.*, var_name) else false,
+        .yield_stmt => |y| if (y.value) |v| borrowsFrom(v.*, var_name) else false,
+        .if_stmt => |i| recordOutlivesBody(i.body, var_name) or recordOutlivesBody(i.else_body, var_name),
+        .while_stmt => |w| recordOutlivesBody(w.body, var_name),
+        .for_stmt => |f| recordOutlivesBody(f.body, var_name),
+        .with_stmt => |w| recordOutlivesBody(w.body, var_name),
+        .try_stmt => |t| blk: {
+            if (recordOutlivesBody(t.body, var_name)) break :blk true;
+            for (t.handlers) |h| {
+                if (recordOutlivesBody(h.body, var_name)) break :blk true;
+            }
+            break :blk recordOutlivesBody(t.else_body, var_name) or recordOutlivesBody(t.finalbody, var_name);
+        },
+        .function_def, .class_def => stmtUsesVar(stmt, var_name),
+        else => false,
+    };
+}
+
+/// Is `node` the record itself, or an item/attribute looked up inside it?
+fn borrowsFrom(node: ast.Node, var_name: []const u8) bool {
+    return switch (node) {
+        .name => |n| std.mem.eql(u8, n.id, var_name),
+        .subscript => |sub| borrowsFrom(sub.value.*, var_name),
+        .attribute => |attr| borrowsFrom(attr.value.*, var_name),
+        else => false,
+    };
+}
+
+/// A for loop that pulls one item per iteration from a runtime iterator:
+/// `{ var __<prefix>_N = <init>(<iter arg>); defer __<prefix>_N.deinit();
+///    while (<next>) |item| { body } }`
+const PullLoop = struct {
+    /// Iterator variable stem: "records" -> __records_N
+    prefix: []const u8,
+    /// Emitted before and after the iter call's first argument
+    init_open: []const u8,
+    init_close: []const u8,
+    /// next() returns an error union
+    fallible: bool,
+    /// Items are new references, decref'd as each iteration ends (unless
+    /// the body keeps one alive, see recordOutlivesBody)
+    owned_items: bool = false,
+};
+
+fn genPullLoop(self: *NativeCodegen, var_name: []const u8, for_stmt: ast.Node.For, loop: PullLoop) CodegenError!void {
+    const label_id = self.block_label_counter;
+    self.block_label_counter += 1;
+    const target_name = for_stmt.target.name.id;
+    const release = loop.owned_items and !recordOutlivesBody(for_stmt.body, target_name);
+
+    try self.emit("{\n");
+    self.indent();
+    try self.emitIndent();
+    try self.output.writer(self.allocator).print("var __{s}_{d} = {s}", .{ loop.prefix, label_id, loop.init_open });
+    try self.genExpr(for_stmt.iter.call.args[0]);
+    try self.emit(loop.init_close);
+    try self.emit(";\n");
+    try self.emitIndent();
+    try self.output.writer(self.allocator).print("defer __{s}_{d}.deinit();\n", .{ loop.prefix, label_id });
+    try self.emitIndent();
+    try self.output.writer(self.allocator).print("while ({s}__{s}_{d}.next()) |", .{ if (loop.fallible) "try " else "", loop.prefix, label_id });
+    const used = varUsedInBody(for_stmt.body, target_name);
+    if (used) {
+        try zig_keywords.writeEscapedIdent(self.output.writer(self.allocator), var_name);
+    } else if (release) {
+        try self.output.writer(self.allocator).print("__item_{d}", .{label_id});
+    } else {
+        try self.emit("_");
+    }
+    try self.emit("| {\n");
+
+    self.indent();
+    if (release) {
+        try self.emitIndent();
+        try self.emit("defer runtime.decref(");
+        if (used) {
+            try zig_keywords.writeEscapedIdent(self.output.writer(self.allocator), var_name);
+        } else {
+            try self.output.writer(self.allocator).print("__item_{d}", .{label_id});
+        }
+        try self.emit(", __global_allocator);\n");
+    }
+    try self.pushScope();
+    try self.loop_capture_vars.put(var_name, {});
+    for (for_stmt.body) |stmt| {
+        try self.generateStmt(stmt);
+    }
+    _ = self.loop_capture_vars.swapRemove(var_name);
+    _ = self.var_renames.swapRemove(var_name);
+    self.popScope();
+    self.dedent();
+
+    try self.emitIndent();
+    try self.emit("}\n");
+    self.dedent();
+    try self.emitIndent();
+    try self.emit("}\n");
+}
+
+/// as_completed(fs) / concurrent.futures.as_completed(fs), not a user function of that name
+fn isAsCompleted(self: *NativeCodegen, iter: ast.Node) bool {
+    if (iter != .call or iter.call.args.len == 0) return false;
+    return switch (iter.call.func.*) {
+        .name => |n| std.mem.eql(u8, n.id, "as_completed") and !self.module_level_funcs.contains(n.id),
+        .attribute => |attr| std.mem.eql(u8, attr.attr, "as_completed") and
+            (attr.value.* == .attribute or (attr.value.* == .name and std.mem.eql(u8, attr.value.name.id, "futures"))),
+        else => false,
+    };
+}
+
+/// for f in as_completed(fs): -> while (__completed_N.next()) |f| { ... }
+/// Each future reaches the body as soon as it finishes, not after the slowest one.
+fn genAsCompletedLoop(self: *NativeCodegen, var_name: []const u8, for_stmt: ast.Node.For) CodegenError!void {
+    try genPullLoop(self, var_name, for_stmt, .{
+        .prefix = "completed",
+        .init_open = "try runtime.concurrent_futures.asCompleted(__global_allocator, runtime.iterSlice(",
+        .init_close = "))",
+        .fallible = false,
+    });
+}
+
 /// Check if a variable is reassigned in a list of statements
 /// This is used to determine if tuple unpacking should use `var` instead of `const`
 fn varIsReassignedInBody(body: []ast.Node, var_name: []const u8) bool {
@@ -532,6 +735,21 @@ pub fn genFor(self: *NativeCodegen, for_stmt: ast.Node.For) CodegenError!void {
     }
     const var_name = sanitizeVarName(for_stmt.target.name.id);
 
+    // json.iterload(f): pull one parsed record per iteration
+    if (isJsonIterload(for_stmt.iter.*)) {
+        try genJsonRecordsLoop(self, var_name, for_stmt);
+        return;
+    }
+
+    // as_completed(fs): wait for the next finished future each iteration
+    if (isAsCompleted(self, for_stmt.iter.*)) {
+        try genAsCompletedLoop(self, var_name, for_stmt);
+        return;
+    }
+
+    // Lowered generator: resume its frame once per iteration
+    if (try generator_state_machine.genFusedFor(self, var_name, for_stmt)) return;
+
     // Check iter type first (needed for tuple special case)
     const iter_type = try self.type_inferrer.inferExpr(for_stmt.iter.*);
 
@@ -757,13 +975,22 @@ pub fn genFor(self: *NativeCodegen, for_stmt: ast.Node.For) CodegenError!void {
         return;
     }
 
-    // Handle file iteration - read lines using while loop with runtime.PyFile.readlines
-    // Python: for line in file: -> Zig: for ((try runtime.PyFile.readlines(file, alloc)).items) |line|
+    // Handle file iteration - lazy line reads through the file's buffered reader
+    // Python: for line in file: -> Zig: while (try __lines_N.next()) |line|
+    // Lines are slices into the read buffer unless the body lets them escape
     if (iter_type == .file) {
-        // Generate: for ((try runtime.PyFile.readlines(file, allocator)).items) |line| {
-        try self.emit("for ((try runtime.PyFile.readlines(");
+        const label_id = self.block_label_counter;
+        self.block_label_counter += 1;
+        // Reading from the same file inside the body would refill the buffer under the line
+        const reads_file = for_stmt.iter.* == .name and varUsedInBody(for_stmt.body, for_stmt.iter.name.id);
+        const owned = reads_file or lineEscapesBody(for_stmt.body, for_stmt.target.name.id) or
+            self.deferred_closure_instantiations.contains(for_stmt.target.name.id);
+
+        try self.output.writer(self.allocator).print("var __lines_{d} = try runtime.PyFile.lineIterator(", .{label_id});
         try self.genExpr(for_stmt.iter.*);
-        try self.emit(", __global_allocator)).items) |");
+        try self.emit(", __global_allocator);\n");
+        try self.emitIndent();
+        try self.output.writer(self.allocator).print("while (try __lines_{d}.{s}()) |", .{ label_id, if (owned) "nextOwned" else "next" });
         if (!tuple_var_used) {
             try self.emit("_");
         } else {
@@ -11,6 +11,8 @@ const signature = @import("generators/signature.zig");
 const body = @import("generators/body.zig");
 const builtin_types = @import("generators/builtin_types.zig");
 const test_skip = @import("generators/test_skip.zig");
+const memoize = @import("generators/memoize.zig");
+const generator_state_machine = @import("../../generator_state_machine.zig");
 const shared = @import("../../shared_maps.zig");
 const PyBuiltinTypes = shared.PythonBuiltinTypes;
 
@@ -107,6 +109,14 @@ pub fn genFunctionDef(self: *NativeCodegen, func: ast.Node.FunctionDef) CodegenE
     // Generate function signature
     try signature.genFunctionSignature(self, func, needs_allocator);
 
+    // @lru_cache / @cache: consult the memo table before running the body
+    const memo_spec = memoize.getMemoSpec(self, func);
+    var memo_params: ?memoize.MemoParams = null;
+    if (memo_spec != null) {
+        memo_params = try memoize.emitPrologue(self, func, needs_allocator);
+    }
+    defer if (memo_params) |p| p.deinit(self.allocator);
+
     // Set current function name for tail-call optimization detection
     self.current_function_name = func.name;
 
@@ -116,12 +126,27 @@ pub fn genFunctionDef(self: *NativeCodegen, func: ast.Node.FunctionDef) CodegenE
     // Clear local variable types (new function scope)
     self.clearLocalVarTypes();
 
+    // Locals holding a lowered generator are kept as frames
+    const saved_frame_vars = self.generator_frame_vars.move();
+    defer {
+        self.generator_frame_vars.deinit();
+        self.generator_frame_vars = saved_frame_vars;
+    }
+    try generator_state_machine.collectFrameVars(self, func.body, func.args);
+
     // Generate function body
-    try body.genFunctionBody(self, func, needs_allocator, actually_uses_allocator);
+    if (generator_state_machine.isLowered(self, func)) {
+        // The body lives in NAME__Gen (emitted before this function)
+        try generator_state_machine.genEagerBody(self, func);
+    } else {
+        try body.genFunctionBody(self, func, needs_allocator, actually_uses_allocator);
+    }
 
     // Clear current function name after body generation
     self.current_function_name = null;
 
+    if (memo_params) |p| try memoize.emitTable(self, func, memo_spec.?, p);
+
     // Register decorated functions for application in main()
     if (func.decorators.len > 0) {
         const decorated_func = DecoratedFunction{
@@ -498,6 +523,10 @@ pub fn genClassDef(self: *NativeCodegen, class: ast.Node.ClassDef) CodegenError!
     var saved_func_local_aug_assigns = hashmap_helper.StringHashMap(void).init(self.allocator);
     defer saved_func_local_aug_assigns.deinit();
 
+    // Also save func_loop_accumulators - for string += codegen in the parent method
+    var saved_func_loop_accumulators = hashmap_helper.StringHashMap(void).init(self.allocator);
+    defer saved_func_loop_accumulators.deinit();
+
     // Also save nested_class_names - nested class methods will clear it
     // This prevents parent method's nested class tracking from being lost
     // (e.g., MyIndexable defined in outer scope, used later after nested class's methods are generated)
@@ -544,6 +573,12 @@ pub fn genClassDef(self: *NativeCodegen, class: ast.Node.ClassDef) CodegenError!
             try saved_func_local_aug_assigns.put(entry.key_ptr.*, {});
         }
 
+        // Copy current func_loop_accumulators
+        var acc_it = self.func_loop_accumulators.iterator();
+        while (acc_it.next()) |entry| {
+            try saved_func_loop_accumulators.put(entry.key_ptr.*, {});
+        }
+
         // Copy current nested_class_names
         var ncn_it = self.nested_class_names.iterator();
         while (ncn_it.next()) |entry| {
@@ -1144,6 +1179,13 @@ pub fn genClassDef(self: *NativeCodegen, class: ast.Node.ClassDef) CodegenError!
             try self.func_local_aug_assigns.put(entry.key_ptr.*, {});
         }
 
+        // Also restore func_loop_accumulators for string += codegen
+        self.func_loop_accumulators.clearRetainingCapacity();
+        var restore_acc_it = saved_func_loop_accumulators.iterator();
+        while (restore_acc_it.next()) |entry| {
+            try self.func_loop_accumulators.put(entry.key_ptr.*, {});
+        }
+
         // Also restore nested_class_names so parent method's class tracking works correctly
         // (e.g., MyIndexable used after this nested class definition completes)
         self.nested_class_names.clearRetainingCapacity();
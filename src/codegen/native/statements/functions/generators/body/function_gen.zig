@@ -438,6 +438,7 @@ pub fn genFunctionBody(
     // This populates func_local_mutations so emitVarDeclaration can make correct var/const decisions
     self.func_local_mutations.clearRetainingCapacity();
     self.func_local_aug_assigns.clearRetainingCapacity();
+    self.func_loop_accumulators.clearRetainingCapacity();
     self.hoisted_vars.clearRetainingCapacity();
     self.nested_class_instances.clearRetainingCapacity();
     self.class_instance_aliases.clearRetainingCapacity();
@@ -859,6 +860,7 @@ pub fn genFunctionBody(
     // Clear function-local state after exiting function
     self.func_local_mutations.clearRetainingCapacity();
     self.func_local_aug_assigns.clearRetainingCapacity();
+    self.func_loop_accumulators.clearRetainingCapacity();
     self.func_local_vars.clearRetainingCapacity();
 
     // Clear nested class tracking (names and bases) after exiting function
@@ -898,6 +900,7 @@ pub fn genAsyncFunctionBody(
     // This populates func_local_mutations so emitVarDeclaration can make correct var/const decisions
     self.func_local_mutations.clearRetainingCapacity();
     self.func_local_aug_assigns.clearRetainingCapacity();
+    self.func_loop_accumulators.clearRetainingCapacity();
     self.hoisted_vars.clearRetainingCapacity();
     self.nested_class_instances.clearRetainingCapacity();
     self.class_instance_aliases.clearRetainingCapacity();
@@ -1069,6 +1072,7 @@ fn genMethodBodyWithAllocatorInfoAndContext(
     // This populates func_local_mutations so emitVarDeclaration can make correct var/const decisions
     self.func_local_mutations.clearRetainingCapacity();
     self.func_local_aug_assigns.clearRetainingCapacity();
+    self.func_loop_accumulators.clearRetainingCapacity();
 
     // Save parent's hoisted vars when generating nested class methods inside a function
     // Nested classes (like `class usub` inside an if block) call genMethodBody for their methods,
@@ -1456,6 +1460,7 @@ fn genMethodBodyWithAllocatorInfoAndContext(
     // Clear function-local mutations after exiting method
     self.func_local_mutations.clearRetainingCapacity();
     self.func_local_aug_assigns.clearRetainingCapacity();
+    self.func_loop_accumulators.clearRetainingCapacity();
 
     // Clear nested class tracking (names and bases) after exiting method
     // This prevents class name collisions between different methods
@@ -385,6 +385,8 @@ pub fn analyzeFunctionLocalMutations(self: *NativeCodegen, func: ast.Node.Functi
             try self.func_local_mutations.put(try self.allocator.dupe(u8, entry.key_ptr.*), {});
         }
     }
+
+    try markLoopAccumulators(self, func.body, false);
 }
 
 /// Analyze module-level code for mutated variables (for script mode main function)
@@ -428,6 +430,40 @@ pub fn analyzeModuleLevelMutations(self: *NativeCodegen, module_body: []const as
             try self.func_local_mutations.put(try self.allocator.dupe(u8, entry.key_ptr.*), {});
         }
     }
+
+    try markLoopAccumulators(self, module_body, false);
+}
+
+/// Record `name += ...` inside loops in func_loop_accumulators.
+/// String accumulators get a growable buffer instead of a concat per
+/// iteration (see NativeCodegen.isLoopAccumulator). Nested functions and
+/// classes are analyzed on their own.
+fn markLoopAccumulators(self: *NativeCodegen, stmts: []const ast.Node, in_loop: bool) !void {
+    for (stmts) |stmt| {
+        switch (stmt) {
+            .aug_assign => |aug| {
+                if (in_loop and aug.op == .Add and aug.target.* == .name) {
+                    try self.func_loop_accumulators.put(aug.target.name.id, {});
+                }
+            },
+            .if_stmt => |if_stmt| {
+                try markLoopAccumulators(self, if_stmt.body, in_loop);
+                try markLoopAccumulators(self, if_stmt.else_body, in_loop);
+            },
+            .while_stmt => |while_stmt| try markLoopAccumulators(self, while_stmt.body, true),
+            .for_stmt => |for_stmt| try markLoopAccumulators(self, for_stmt.body, true),
+            .try_stmt => |try_stmt| {
+                try markLoopAccumulators(self, try_stmt.body, in_loop);
+                for (try_stmt.handlers) |handler| {
+                    try markLoopAccumulators(self, handler.body, in_loop);
+                }
+                try markLoopAccumulators(self, try_stmt.else_body, in_loop);
+                try markLoopAccumulators(self, try_stmt.finalbody, in_loop);
+            },
+            .with_stmt => |with_stmt| try markLoopAccumulators(self, with_stmt.body, in_loop),
+            else => {},
+        }
+    }
 }
 
 /// Count assignments with scope awareness
@@ -0,0 +1,243 @@
+/// @functools.lru_cache / @functools.cache lowering for module-level functions
+///
+/// The decorated function keeps its name and signature. A prologue consults a
+/// static memo table (runtime._functools.Memo) keyed on the parameters' inferred
+/// types, and a module-level `const __lru_<name>` declares that table so
+/// cache_info()/cache_clear() can reach it.
+const std = @import("std");
+const ast = @import("ast");
+const zig_keywords = @import("zig_keywords");
+const NativeCodegen = @import("../../../main.zig").NativeCodegen;
+const CodegenError = @import("../../../main.zig").CodegenError;
+const param_analyzer = @import("../param_analyzer.zig");
+const signature = @import("signature.zig");
+
+/// Parsed decorator arguments
+pub const MemoSpec = struct {
+    /// null = unbounded (functools.cache / lru_cache(maxsize=None))
+    maxsize: ?i64,
+};
+
+/// Parameters of the emitted signature, needed to build the key and re-enter the body
+pub const MemoParams = struct {
+    /// Emitted parameter names in order ("_" for unused parameters)
+    names: [][]const u8,
+    /// Indices into `names` that form the cache key
+    key: []usize,
+    /// Signature returns an error union (`!T`) - result must be unwrapped with try
+    returns_error: bool,
+
+    pub fn deinit(self: MemoParams, allocator: std.mem.Allocator) void {
+        for (self.names) |name| allocator.free(name);
+        allocator.free(self.names);
+        allocator.free(self.key);
+    }
+};
+
+const default_maxsize: i64 = 128;
+
+/// Is this decorator functools.lru_cache / functools.cache (bare, called, or module-qualified)?
+pub fn isMemoDecorator(self: *NativeCodegen, decorator: ast.Node) bool {
+    return parseDecorator(self, decorator) != null;
+}
+
+/// Find a memoizing decorator on a function we know how to memoize
+/// Async functions, generators and *args/**kwargs keep the pass-through behaviour
+pub fn getMemoSpec(self: *NativeCodegen, func: ast.Node.FunctionDef) ?MemoSpec {
+    if (func.is_async or func.vararg != null or func.kwarg != null) return null;
+    if (self.funcIsGenerator(func.name)) return null;
+    for (func.decorators) |decorator| {
+        if (parseDecorator(self, decorator)) |spec| return spec;
+    }
+    return null;
+}
+
+fn parseDecorator(self: *NativeCodegen, decorator: ast.Node) ?MemoSpec {
+    switch (decorator) {
+        .name, .attribute => {
+            const name = memoFuncName(self, decorator) orelse return null;
+            return .{ .maxsize = if (std.mem.eql(u8, name, "cache")) null else default_maxsize };
+        },
+        .call => |call| {
+            const name = memoFuncName(self, call.func.*) orelse return null;
+            if (std.mem.eql(u8, name, "cache")) return .{ .maxsize = null };
+            var spec = MemoSpec{ .maxsize = default_maxsize };
+            if (call.args.len > 0) spec.maxsize = constMaxsize(call.args[0]);
+            for (call.keyword_args) |kw| {
+                if (std.mem.eql(u8, kw.name, "maxsize")) spec.maxsize = constMaxsize(kw.value);
+                // typed= needs no handling: each key slot already has one static type
+            }
+            return spec;
+        },
+        else => return null,
+    }
+}
+
+/// "lru_cache" / "cache" for `lru_cache`, `functools.lru_cache`, ... (null otherwise)
+fn memoFuncName(self: *NativeCodegen, node: ast.Node) ?[]const u8 {
+    const name = switch (node) {
+        .name => |n| blk: {
+            // A user-defined `cache` decorator shadows the functools import
+            if (self.module_level_funcs.contains(n.id)) return null;
+            break :blk n.id;
+        },
+        .attribute => |attr| blk: {
+            if (attr.value.* != .name or !std.mem.eql(u8, attr.value.name.id, "functools")) return null;
+            break :blk attr.attr;
+        },
+        else => return null,
+    };
+    if (std.mem.eql(u8, name, "lru_cache") or std.mem.eql(u8, name, "cache")) return name;
+    return null;
+}
+
+/// maxsize must be known at compile time; anything dynamic falls back to the default
+fn constMaxsize(node: ast.Node) ?i64 {
+    if (node != .constant) return default_maxsize;
+    return switch (node.constant.value) {
+        .int => |n| if (n < 0) 0 else n,
+        .none => null,
+        else => default_maxsize,
+    };
+}
+
+/// Emit the memo prologue right after the function signature.
+/// Parameters come from `func.args` named and typed the way genFunctionSignature
+/// emitted them. Returns null (no prologue) for generic functions - their anytype
+/// parameters have no static type to key on, so they keep the pass-through behaviour.
+pub fn emitPrologue(self: *NativeCodegen, func: ast.Node.FunctionDef, needs_allocator: bool) CodegenError!?MemoParams {
+    for (func.args) |arg| {
+        if (signature.isAnytypeParam(func, arg)) return null;
+    }
+
+    var names = std.ArrayList([]const u8){};
+    defer {
+        for (names.items) |name| self.allocator.free(name);
+        names.deinit(self.allocator);
+    }
+    var key = std.ArrayList(usize){};
+    defer key.deinit(self.allocator);
+
+    // Allocator comes first and doesn't change the result - keep it out of the key
+    if (needs_allocator) {
+        const used = param_analyzer.isNameUsedInBody(func.body, "allocator");
+        try names.append(self.allocator, try self.allocator.dupe(u8, if (used) "allocator" else "_"));
+    }
+    for (func.args) |arg| {
+        // Unused parameters are `_` and don't change the result either
+        const ident = try signature.paramIdent(self, func, arg) orelse {
+            try names.append(self.allocator, try self.allocator.dupe(u8, "_"));
+            continue;
+        };
+        errdefer self.allocator.free(ident);
+        try key.append(self.allocator, names.items.len);
+        try names.append(self.allocator, ident);
+    }
+
+    const returns_error = signature.returnsErrorUnion(self, func, needs_allocator);
+    const owned_names = try names.toOwnedSlice(self.allocator);
+    errdefer {
+        for (owned_names) |name| self.allocator.free(name);
+        self.allocator.free(owned_names);
+    }
+
+    const table = try tableName(self, func.name);
+    defer self.allocator.free(table);
+
+    self.indent();
+    try self.emitIndent();
+    try self.emitFmt("if ({s}.enter()) {{\n", .{table});
+    self.indent();
+    try self.emitIndent();
+    try self.emitFmt("if ({s}.get(", .{table});
+    try emitKey(self, owned_names, key.items);
+    try self.emit(")) |__memo_hit| return __memo_hit;\n");
+    try self.emitIndent();
+    try self.emitFmt("{s}.arm();\n", .{table});
+    try self.emitIndent();
+    try self.emitFmt("return {s}.put(", .{table});
+    try emitKey(self, owned_names, key.items);
+    try self.emit(if (returns_error) ", try " else ", ");
+    try emitFuncName(self, func.name);
+    try self.emit("(");
+    for (owned_names, 0..) |name, idx| {
+        if (idx > 0) try self.emit(", ");
+        // Unused parameters are `_` - the body never reads them
+        try self.emit(if (std.mem.eql(u8, name, "_")) "undefined" else name);
+    }
+    try self.emit("));\n");
+    self.dedent();
+    try self.emitIndent();
+    try self.emit("}\n");
+    self.dedent();
+
+    return .{
+        .names = owned_names,
+        .key = try key.toOwnedSlice(self.allocator),
+        .returns_error = returns_error,
+    };
+}
+
+fn emitKey(self: *NativeCodegen, names: []const []const u8, key: []const usize) CodegenError!void {
+    try self.emit(".{");
+    for (key, 0..) |idx, i| {
+        try self.emit(if (i > 0) ", " else " ");
+        try self.emit(names[idx]);
+    }
+    try self.emit(if (key.len > 0) " }" else "}");
+}
+
+fn emitFuncName(self: *NativeCodegen, name: []const u8) CodegenError!void {
+    if (std.mem.eql(u8, name, "main")) {
+        try self.emit("__user_main");
+    } else {
+        try zig_keywords.writeEscapedIdent(self.output.writer(self.allocator), name);
+    }
+}
+
+fn tableName(self: *NativeCodegen, func_name: []const u8) CodegenError![]const u8 {
+    return std.fmt.allocPrint(self.allocator, "__lru_{s}", .{func_name});
+}
+
+/// Emit `const __lru_<name> = runtime._functools.Memo(<name>, &.{ key indices }, maxsize);`
+/// after the function body and register the function for cache_info()/cache_clear()
+pub fn emitTable(self: *NativeCodegen, func: ast.Node.FunctionDef, spec: MemoSpec, params: MemoParams) CodegenError!void {
+    const table = try tableName(self, func.name);
+    defer self.allocator.free(table);
+
+    try self.emitIndent();
+    try self.emitFmt("const {s} = runtime._functools.Memo(", .{table});
+    try emitFuncName(self, func.name);
+    try self.emit(", &.{");
+    for (params.key, 0..) |idx, i| {
+        if (i > 0) try self.emit(",");
+        try self.emitFmt(" {d}", .{idx});
+    }
+    try self.emit(if (params.key.len > 0) " }, " else "}, ");
+    if (spec.maxsize) |n| {
+        try self.emitFmt("{d}", .{n});
+    } else {
+        try self.emit("null");
+    }
+    try self.emit(");\n");
+
+    if (!self.memoized_functions.contains(func.name)) {
+        try self.memoized_functions.put(try self.allocator.dupe(u8, func.name), {});
+    }
+}
+
+/// fib.cache_info() / fib.cache_clear() on a memoized function
+pub fn genMemoMethod(self: *NativeCodegen, func_name: []const u8, method_name: []const u8) CodegenError!bool {
+    if (!self.memoized_functions.contains(func_name)) return false;
+    const table = try tableName(self, func_name);
+    defer self.allocator.free(table);
+
+    if (std.mem.eql(u8, method_name, "cache_info")) {
+        try self.emitFmt("{s}.cache_info()", .{table});
+    } else if (std.mem.eql(u8, method_name, "cache_clear")) {
+        try self.emitFmt("{s}.cache_clear()", .{table});
+    } else {
+        return false;
+    }
+    return true;
+}
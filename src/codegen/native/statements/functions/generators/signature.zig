@@ -574,101 +574,22 @@ pub fn genFunctionSignature(
         }
     }
 
-    // Check if this is a generator function (has yield statements) - generators
-    // have their bodies transformed, so all params may appear unused in generated code
-    const is_generator = hasYieldStatement(func.body);
-
     // Generate parameters
     for (func.args, 0..) |arg, i| {
         if (i > 0) try self.emit(", ");
 
-        // Check if parameter name shadows a module-level function or imported module
-        // If so, we need to rename it to avoid Zig shadowing errors
-        // Also check zig_keywords.wouldShadowModule for common Python stdlib modules that
-        // get aliased at module level (e.g., `const types = std;`)
-        const shadows_module_func = self.module_level_funcs.contains(arg.name) or
-            self.imported_modules.contains(arg.name) or
-            zig_keywords.wouldShadowModule(arg.name);
-
-        // Check if parameter name shadows a sibling method in the same class
-        // e.g., def __release_buffer__(self, buffer): ... where 'buffer' is also a method
-        const shadows_class_method = if (self.current_class_body) |class_body| blk: {
-            for (class_body) |stmt| {
-                if (stmt == .function_def) {
-                    if (std.mem.eql(u8, stmt.function_def.name, arg.name)) {
-                        break :blk true;
-                    }
-                }
-            }
-            break :blk false;
-        } else false;
-
-        // Check if parameter is used in function body - prefix unused with "_"
-        // Also check if parameter is captured by any nested class (used via closure)
-        // Note: When parameter shadows module-level function, body uses the renamed
-        // version (e.g., indices__local), so we must check for that usage too
-        // For generators, always mark params as used since yield body isn't properly generated
-        const is_used_directly = if (is_generator) true else param_analyzer.isNameUsedInBody(func.body, arg.name);
-        const is_captured = self.isVarCapturedByAnyNestedClass(arg.name);
-        const is_used = is_used_directly or is_captured or shadows_module_func or shadows_class_method;
-
-        // For unused parameters, use "_" (anonymous) instead of "_name" in Zig 0.15+
-        // "_name" still triggers unused warnings - only "_" fully ignores
-        if (!is_used) {
-            try self.emit("_: ");
-            // Skip straight to type - no name, no suffix
+        // Unused parameters become "_" (anonymous) - "_name" still triggers
+        // unused warnings in Zig 0.15+, only "_" fully ignores
+        if (try paramIdent(self, func, arg)) |ident| {
+            defer self.allocator.free(ident);
+            try self.emit(ident);
         } else {
-            // Add suffix for parameters that shadow module-level functions, imported modules, or class methods
-            // When adding suffix, don't use escaped form (@"name") because @"name"__local is invalid
-            // Instead use: name__local (suffix makes it a valid non-keyword identifier)
-            if (shadows_module_func or shadows_class_method) {
-                try self.emit(arg.name);
-                try self.emit("__local");
-            } else {
-                // Only escape reserved keywords if we're NOT adding a suffix
-                try zig_keywords.writeEscapedIdent(self.output.writer(self.allocator), arg.name);
-            }
-
-            // Parameters with defaults become optional (suffix with '_param')
-            if (arg.default != null) {
-                try self.emit("_param");
-            }
-            try self.emit(": ");
+            try self.emit("_");
         }
+        try self.emit(": ");
 
-        // Check if this parameter is used as a function (called or returned - decorator pattern)
-        // For decorators, use anytype to accept any function type
-        const is_func = param_analyzer.isParameterUsedAsFunction(func.body, arg.name);
-        const is_iter = param_analyzer.isParameterUsedAsIterator(func.body, arg.name);
-        const is_type_check = param_analyzer.isParameterUsedInTypeCheck(func.body, arg.name);
-        const is_passed_to_callable = param_analyzer.isParameterPassedToCallableParam(func.body, arg.name, func.args);
-        // Check if function has any callable parameter - if so, all other params need anytype
-        // since they may be passed (directly or indirectly) to the callable
-        const has_callable_param = blk: {
-            for (func.args) |p| {
-                if (param_analyzer.isParameterUsedAsFunction(func.body, p.name)) {
-                    break :blk true;
-                }
-            }
-            break :blk false;
-        };
-        if (is_func and arg.default == null) {
-            try self.emit("anytype"); // For decorators and higher-order functions (without defaults)
-            try self.anytype_params.put(arg.name, {});
-        } else if (is_iter and arg.type_annotation == null) {
-            // Parameter used as iterator (for x in param:) - use anytype for slice inference
-            // Note: ?anytype is not valid in Zig, so we don't add ? prefix for anytype params
-            try self.emit("anytype");
-            try self.anytype_params.put(arg.name, {});
-        } else if (is_type_check and arg.type_annotation == null) {
-            // Parameter used in isinstance() type check - use anytype for runtime type checking
-            // e.g., def isint(x): return isinstance(x, int)
-            try self.emit("anytype");
-            try self.anytype_params.put(arg.name, {});
-        } else if ((is_passed_to_callable or has_callable_param) and arg.type_annotation == null) {
-            // Parameter passed to another param that is called as a function, OR
-            // function has a callable param (may be passed indirectly)
-            // e.g., def foo(fxn, arg, x): fxn(arg); y = (x,) - all non-callable need anytype
+        if (isAnytypeParam(func, arg)) {
+            // Decorators, higher-order functions, iterables and isinstance() checks
             try self.emit("anytype");
             try self.anytype_params.put(arg.name, {});
         } else if (arg.type_annotation) |_| {
@@ -787,6 +708,82 @@ pub fn genFunctionSignature(
     try genReturnType(self, func, needs_allocator);
 }
 
+/// Identifier genFunctionSignature emits for a parameter, or null when the
+/// body never reads it and it is emitted as `_`. Caller owns the result.
+pub fn paramIdent(self: *NativeCodegen, func: ast.Node.FunctionDef, arg: ast.Arg) CodegenError!?[]const u8 {
+    // Check if parameter name shadows a module-level function or imported module
+    // If so, we need to rename it to avoid Zig shadowing errors
+    // Also check zig_keywords.wouldShadowModule for common Python stdlib modules that
+    // get aliased at module level (e.g., `const types = std;`)
+    const shadows_module_func = self.module_level_funcs.contains(arg.name) or
+        self.imported_modules.contains(arg.name) or
+        zig_keywords.wouldShadowModule(arg.name);
+
+    // Check if parameter name shadows a sibling method in the same class
+    // e.g., def __release_buffer__(self, buffer): ... where 'buffer' is also a method
+    const shadows_class_method = if (self.current_class_body) |class_body| blk: {
+        for (class_body) |stmt| {
+            if (stmt == .function_def) {
+                if (std.mem.eql(u8, stmt.function_def.name, arg.name)) {
+                    break :blk true;
+                }
+            }
+        }
+        break :blk false;
+    } else false;
+
+    // Check if parameter is used in function body - prefix unused with "_"
+    // Also check if parameter is captured by any nested class (used via closure)
+    // Note: When parameter shadows module-level function, body uses the renamed
+    // version (e.g., indices__local), so we must check for that usage too
+    // Generators have their bodies transformed, so all params may appear unused
+    // in generated code - always mark them as used
+    const is_used_directly = if (hasYieldStatement(func.body)) true else param_analyzer.isNameUsedInBody(func.body, arg.name);
+    const is_captured = self.isVarCapturedByAnyNestedClass(arg.name);
+    if (!(is_used_directly or is_captured or shadows_module_func or shadows_class_method)) return null;
+
+    var ident = std.ArrayList(u8){};
+    errdefer ident.deinit(self.allocator);
+    // Add suffix for parameters that shadow module-level functions, imported modules, or class methods
+    // When adding suffix, don't use escaped form (@"name") because @"name"__local is invalid
+    // Instead use: name__local (suffix makes it a valid non-keyword identifier)
+    if (shadows_module_func or shadows_class_method) {
+        try ident.appendSlice(self.allocator, arg.name);
+        try ident.appendSlice(self.allocator, "__local");
+    } else {
+        // Only escape reserved keywords if we're NOT adding a suffix
+        try zig_keywords.writeEscapedIdent(ident.writer(self.allocator), arg.name);
+    }
+    // Parameters with defaults become optional (suffix with '_param')
+    if (arg.default != null) try ident.appendSlice(self.allocator, "_param");
+    return try ident.toOwnedSlice(self.allocator);
+}
+
+/// Does genFunctionSignature give this parameter the `anytype` type?
+pub fn isAnytypeParam(func: ast.Node.FunctionDef, arg: ast.Arg) bool {
+    // Parameter used as a function (called or returned - decorator pattern)
+    if (param_analyzer.isParameterUsedAsFunction(func.body, arg.name) and arg.default == null) return true;
+    if (arg.type_annotation != null) return false;
+    // Parameter used as iterator (for x in param:) - anytype for slice inference
+    // Note: ?anytype is not valid in Zig, so we don't add ? prefix for anytype params
+    if (param_analyzer.isParameterUsedAsIterator(func.body, arg.name)) return true;
+    // Parameter used in isinstance() type check - e.g., def isint(x): return isinstance(x, int)
+    if (param_analyzer.isParameterUsedInTypeCheck(func.body, arg.name)) return true;
+    // Parameter passed to another param that is called as a function, OR function
+    // has a callable param (may be passed indirectly)
+    // e.g., def foo(fxn, arg, x): fxn(arg); y = (x,) - all non-callable need anytype
+    if (param_analyzer.isParameterPassedToCallableParam(func.body, arg.name, func.args)) return true;
+    for (func.args) |p| {
+        if (param_analyzer.isParameterUsedAsFunction(func.body, p.name)) return true;
+    }
+    return false;
+}
+
+/// Does genFunctionSignature give this (non-async) function an error union return type?
+pub fn returnsErrorUnion(self: *NativeCodegen, func: ast.Node.FunctionDef, needs_allocator: bool) bool {
+    return needs_allocator or self.funcNeedsErrorUnion(func.name);
+}
+
 /// Generate async function signature that spawns green threads
 fn genAsyncFunctionSignature(
     self: *NativeCodegen,
@@ -913,7 +910,7 @@ fn genAsyncFunctionSignature(
 fn genReturnType(self: *NativeCodegen, func: ast.Node.FunctionDef, needs_allocator: bool) CodegenError!void {
     // Check if function needs error union via function_traits analysis
     // This detects: raise, assert, try/except, int/float conversion, etc.
-    const needs_error = needs_allocator or self.funcNeedsErrorUnion(func.name);
+    const needs_error = returnsErrorUnion(self, func, needs_allocator);
 
     // For generator functions, return []runtime.PyValue (eager evaluation)
     if (self.in_generator_function) {
@@ -362,13 +362,17 @@ pub fn genStandardClosure(
     // Closures need their own mutation analysis to determine var vs const
     const saved_func_local_mutations = self.func_local_mutations;
     const saved_func_local_aug_assigns = self.func_local_aug_assigns;
+    const saved_func_loop_accumulators = self.func_loop_accumulators;
     self.func_local_mutations = hashmap_helper.StringHashMap(void).init(self.allocator);
     self.func_local_aug_assigns = hashmap_helper.StringHashMap(void).init(self.allocator);
+    self.func_loop_accumulators = hashmap_helper.StringHashMap(void).init(self.allocator);
     defer {
         self.func_local_mutations.deinit();
         self.func_local_aug_assigns.deinit();
+        self.func_loop_accumulators.deinit();
         self.func_local_mutations = saved_func_local_mutations;
         self.func_local_aug_assigns = saved_func_local_aug_assigns;
+        self.func_loop_accumulators = saved_func_loop_accumulators;
     }
 
     // Analyze closure body for local mutations (determines var vs const)
@@ -12,6 +12,7 @@ const hashmap_helper = @import("hashmap_helper");
 
 // Re-export print statement generation
 pub const genPrint = @import("print.zig").genPrint;
+pub const genPrintCall = @import("print.zig").genPrintCall;
 
 /// Check if a return value is a tail-recursive call to the current function
 /// A tail call is: return func_name(args) where func_name == current function
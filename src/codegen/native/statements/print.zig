@@ -1,4 +1,5 @@
 /// Print statement code generation (starred, concat, lists, dicts, tuples, bools, None, PyObject)
+/// Output goes through runtime.stdout (buffered, flushed on exit / flush=True)
 const std = @import("std");
 const ast = @import("ast");
 const main = @import("../main.zig");
@@ -39,10 +40,30 @@ fn isAllocatingMethodCall(self: *NativeCodegen, node: ast.Node) bool {
     return AllocatingMethods.has(attr.attr);
 }
 
+/// Generate print() statement including keyword args
+/// flush=True drains the buffered stdout right after the write
+pub fn genPrintCall(self: *NativeCodegen, call: ast.Node.Call) CodegenError!void {
+    try genPrint(self, call.args);
+    for (call.keyword_args) |kw| {
+        if (!std.mem.eql(u8, kw.name, "flush")) continue;
+        if (kw.value == .constant and kw.value.constant.value == .bool) {
+            if (kw.value.constant.value.bool) {
+                try self.emitIndent();
+                try self.emit("runtime.stdout.flush();\n");
+            }
+        } else {
+            try self.emitIndent();
+            try self.emit("if (runtime.toBool(");
+            try self.genExpr(kw.value);
+            try self.emit(")) runtime.stdout.flush();\n");
+        }
+    }
+}
+
 /// Generate print() function call
 pub fn genPrint(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
     if (args.len == 0) {
-        try self.emit("std.debug.print(\"\\n\", .{});\n");
+        try self.emit("runtime.stdout.print(\"\\n\", .{});\n");
         return;
     }
 
@@ -81,13 +102,13 @@ pub fn genPrint(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
                 } else {
                     try self.emit("    for (__starred) |__elem| {\n");
                 }
-                try self.emit("        if (!__print_first) std.debug.print(\" \", .{});\n");
+                try self.emit("        if (!__print_first) runtime.stdout.print(\" \", .{});\n");
                 try self.emit("        __print_first = false;\n");
-                try self.emit("        std.debug.print(\"{d}\", .{__elem});\n");
+                try self.emit("        runtime.stdout.print(\"{d}\", .{__elem});\n");
                 try self.emit("    }\n");
             } else {
                 // Regular argument
-                try self.emit("    if (!__print_first) std.debug.print(\" \", .{});\n");
+                try self.emit("    if (!__print_first) runtime.stdout.print(\" \", .{});\n");
                 try self.emit("    __print_first = false;\n");
 
                 const arg_type = try self.type_inferrer.inferExpr(arg);
@@ -95,11 +116,11 @@ pub fn genPrint(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
                 const fmt = if (arg_type == .bool) "{s}" else arg_type.getPrintFormat();
 
                 if (arg_type == .bool) {
-                    try self.emit("    std.debug.print(\"{s}\", .{if (");
+                    try self.emit("    runtime.stdout.print(\"{s}\", .{if (");
                     try self.genExpr(arg);
                     try self.emit(") \"True\" else \"False\"});\n");
                 } else {
-                    try self.emit("    std.debug.print(\"");
+                    try self.emit("    runtime.stdout.print(\"");
                     try self.emit(fmt);
                     try self.emit("\", .{");
                     try self.genExpr(arg);
@@ -108,7 +129,7 @@ pub fn genPrint(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
             }
         }
 
-        try self.emit("    std.debug.print(\"\\n\", .{});\n");
+        try self.emit("    runtime.stdout.print(\"\\n\", .{});\n");
         try self.emit("}\n");
         return;
     }
@@ -209,7 +230,7 @@ fn genPrintComplex(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
             try genPrintDict(self, arg);
         } else if (arg_type == .bytes) {
             // PyBytes - print with b'...' repr format
-            try self.emit("std.debug.print(\"{s}\", .{runtime.builtins.bytesRepr(__global_allocator, (");
+            try self.emit("runtime.stdout.print(\"{s}\", .{runtime.builtins.bytesRepr(__global_allocator, (");
             try self.genExpr(arg);
             try self.emit(").data) catch \"<bytes>\"});\n");
         } else if (arg_type == .unknown) {
@@ -220,32 +241,35 @@ fn genPrintComplex(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
         } else if (arg_type == .pyobject) {
             // C extension PyObjects - print address
             // Full string conversion requires unified type system (future work)
-            try self.emit("std.debug.print(\"<C extension object at {*}>\", .{");
+            try self.emit("runtime.stdout.print(\"<C extension object at {*}>\", .{");
             try self.genExpr(arg);
             try self.emit("});\n");
         } else if (arg_type == .sqlite_row) {
-            // SQLite Row - use its print method
+            // SQLite Row - format values inline so output shares the stdout buffer
+            try self.emit("runtime.stdout.print(\"(\", .{});\n");
+            try self.emit("for (");
             try self.genExpr(arg);
-            try self.emit(".print();\n");
+            try self.emit(".values, 0..) |__v, __i| runtime.stdout.print(\"{s}'{s}'\", .{ if (__i == 0) \"\" else \", \", __v });\n");
+            try self.emit("runtime.stdout.print(\")\", .{});\n");
         } else if (arg_type == .sqlite_rows) {
             // SQLite Rows slice - print each row on its own line (handled in for loop)
             // This case shouldn't normally be hit directly, but handle it anyway
             try self.emit("for (");
             try self.genExpr(arg);
-            try self.emit(") |__row| { __row.print(); std.debug.print(\"\\n\", .{}); }\n");
+            try self.emit(") |__row| { runtime.stdout.print(\"(\", .{}); for (__row.values, 0..) |__v, __i| runtime.stdout.print(\"{s}'{s}'\", .{ if (__i == 0) \"\" else \", \", __v }); runtime.stdout.print(\")\\n\", .{}); }\n");
         } else if (arg_type == .bool) {
             // Print booleans as Python-style True/False
-            try self.emit("std.debug.print(\"{s}\", .{if (");
+            try self.emit("runtime.stdout.print(\"{s}\", .{if (");
             try self.genExpr(arg);
             try self.emit(") \"True\" else \"False\"});\n");
         } else if (arg_type == .none) {
             // Print None
-            try self.emit("std.debug.print(\"None\", .{});\n");
+            try self.emit("runtime.stdout.print(\"None\", .{});\n");
         } else {
-            // For non-list/tuple/bool args in mixed print, use std.debug.print
+            // Other args in a mixed print: format by inferred type
             // Note: unknown types try {s} (works for string constants)
             const fmt = if (arg_type == .unknown) "{s}" else arg_type.getPrintFormat();
-            try self.emit("std.debug.print(\"");
+            try self.emit("runtime.stdout.print(\"");
             try self.emit(fmt);
             try self.emit("\", .{");
             try self.genExpr(arg);
@@ -253,11 +277,11 @@ fn genPrintComplex(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
         }
         // Print space between args (except last)
         if (i < args.len - 1) {
-            try self.emit("std.debug.print(\" \", .{});\n");
+            try self.emit("runtime.stdout.print(\" \", .{});\n");
         }
     }
     // Print newline at end
-    try self.emit("std.debug.print(\"\\n\", .{});\n");
+    try self.emit("runtime.stdout.print(\"\\n\", .{});\n");
 }
 
 /// Generate print for list/array types
@@ -273,7 +297,7 @@ fn genPrintList(self: *NativeCodegen, arg: ast.Node, arg_type: anytype) CodegenE
     try self.emit("    const __list = ");
     try self.genExpr(arg);
     try self.emit(";\n");
-    try self.emit("    std.debug.print(\"[\", .{});\n");
+    try self.emit("    runtime.stdout.print(\"[\", .{});\n");
 
     // ArrayList uses .items, plain arrays and slices iterate directly
     if (is_arraylist) {
@@ -285,7 +309,7 @@ fn genPrintList(self: *NativeCodegen, arg: ast.Node, arg_type: anytype) CodegenE
         try self.emit("    for (__list.items, 0..) |__elem, __idx| {\n");
     }
 
-    try self.emit("        if (__idx > 0) std.debug.print(\", \", .{});\n");
+    try self.emit("        if (__idx > 0) runtime.stdout.print(\", \", .{});\n");
 
     // Get element format based on element type
     const elem_fmt = if (arg_type == .list) blk: {
@@ -298,11 +322,11 @@ fn genPrintList(self: *NativeCodegen, arg: ast.Node, arg_type: anytype) CodegenE
         break :blk elem_type.getPrintFormat();
     } else "{d}"; // Default to integer format
 
-    try self.emit("        std.debug.print(\"");
+    try self.emit("        runtime.stdout.print(\"");
     try self.emit(elem_fmt);
     try self.emit("\", .{__elem});\n");
     try self.emit("    }\n");
-    try self.emit("    std.debug.print(\"]\", .{});\n");
+    try self.emit("    runtime.stdout.print(\"]\", .{});\n");
     try self.emit("}\n");
 }
 
@@ -313,12 +337,12 @@ fn genPrintTuple(self: *NativeCodegen, arg: ast.Node, arg_type: anytype) Codegen
     try self.emit("    const __tuple = ");
     try self.genExpr(arg);
     try self.emit(";\n");
-    try self.emit("    std.debug.print(\"(\", .{});\n");
+    try self.emit("    runtime.stdout.print(\"(\", .{});\n");
     // Get tuple type to know how many elements
     if (arg_type.tuple.len > 0) {
         for (0..arg_type.tuple.len) |elem_idx| {
             if (elem_idx > 0) {
-                try self.emit("    std.debug.print(\", \", .{});\n");
+                try self.emit("    runtime.stdout.print(\", \", .{});\n");
             }
             // Determine format based on element type
             const elem_type = arg_type.tuple[elem_idx];
@@ -326,13 +350,13 @@ fn genPrintTuple(self: *NativeCodegen, arg: ast.Node, arg_type: anytype) Codegen
             const fmt = if (elem_type == .bool) "{s}" else elem_type.getPrintFormat();
             if (elem_type == .bool) {
                 // Boolean elements need conditional formatting
-                try self.emitFmt("    std.debug.print(\"{{s}}\", .{{if (__tuple.@\"{d}\") \"True\" else \"False\"}});\n", .{elem_idx});
+                try self.emitFmt("    runtime.stdout.print(\"{{s}}\", .{{if (__tuple.@\"{d}\") \"True\" else \"False\"}});\n", .{elem_idx});
             } else {
-                try self.emitFmt("    std.debug.print(\"{s}\", .{{__tuple.@\"{d}\"}});\n", .{ fmt, elem_idx });
+                try self.emitFmt("    runtime.stdout.print(\"{s}\", .{{__tuple.@\"{d}\"}});\n", .{ fmt, elem_idx });
             }
         }
     }
-    try self.emit("    std.debug.print(\")\", .{});\n");
+    try self.emit("    runtime.stdout.print(\")\", .{});\n");
     try self.emit("}\n");
 }
 
@@ -346,20 +370,20 @@ fn genPrintDict(self: *NativeCodegen, arg: ast.Node) CodegenError!void {
     try self.emit(";\n");
     try self.emit("    var __dict_iter = __dict.iterator();\n");
     try self.emit("    var __dict_idx: usize = 0;\n");
-    try self.emit("    std.debug.print(\"{{\", .{});\n");
+    try self.emit("    runtime.stdout.print(\"{{\", .{});\n");
     try self.emit("    while (__dict_iter.next()) |__entry| {\n");
-    try self.emit("        if (__dict_idx > 0) std.debug.print(\", \", .{});\n");
+    try self.emit("        if (__dict_idx > 0) runtime.stdout.print(\", \", .{});\n");
     // Use comptime to detect key type: string keys get 'quotes', int keys don't
     try self.emit("        const __key = __entry.key_ptr.*;\n");
     try self.emit("        if (comptime @typeInfo(@TypeOf(__key)) == .pointer) {\n");
-    try self.emit("            std.debug.print(\"'{s}': \", .{__key});\n");
+    try self.emit("            runtime.stdout.print(\"'{s}': \", .{__key});\n");
     try self.emit("        } else {\n");
-    try self.emit("            std.debug.print(\"{d}: \", .{__key});\n");
+    try self.emit("            runtime.stdout.print(\"{d}: \", .{__key});\n");
     try self.emit("        }\n");
     try self.emit("        runtime.printValue(__entry.value_ptr.*);\n");
     try self.emit("        __dict_idx += 1;\n");
     try self.emit("    }\n");
-    try self.emit("    std.debug.print(\"}}\", .{});\n");
+    try self.emit("    runtime.stdout.print(\"}}\", .{});\n");
     try self.emit("}\n");
 }
 
@@ -415,7 +439,7 @@ fn genPrintWithTempVars(self: *NativeCodegen, args: []ast.Node) CodegenError!voi
 
     // Emit print statement
     try self.emitIndent();
-    try self.emit("std.debug.print(\"");
+    try self.emit("runtime.stdout.print(\"");
 
     // Generate format string
     for (args, 0..) |arg, i| {
@@ -465,7 +489,7 @@ fn genPrintWithTempVars(self: *NativeCodegen, args: []ast.Node) CodegenError!voi
 /// Generate simple print (no string concatenation or complex types)
 fn genPrintSimple(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
     try self.emitIndent();
-    try self.emit("std.debug.print(\"");
+    try self.emit("runtime.stdout.print(\"");
 
     // Generate format string
     for (args, 0..) |arg, i| {
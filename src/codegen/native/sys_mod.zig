@@ -5,7 +5,7 @@ const h = @import("mod_helper.zig");
 pub const Funcs = std.StaticStringMap(h.H).initComptime(.{
     // sys.argv references mutable global __sys_argv (initialized in main, can be assigned)
     .{ "argv", h.c("__sys_argv") },
-    .{ "exit", h.wrap("blk: { const _code: u8 = @intCast(", "); std.process.exit(_code); break :blk; }", "blk: { std.process.exit(0); break :blk; }") },
+    .{ "exit", h.wrap("blk: { const _code: u8 = @intCast(", "); runtime.stdout.flush(); std.process.exit(_code); break :blk; }", "blk: { runtime.stdout.flush(); std.process.exit(0); break :blk; }") },
     .{ "path", h.c("&[_][]const u8{\".\" }") },
     .{ "platform", h.c("blk: { const _b = @import(\"builtin\"); break :blk switch (_b.os.tag) { .linux => \"linux\", .macos => \"darwin\", .windows => \"win32\", .freebsd => \"freebsd\", else => \"unknown\" }; }") },
     .{ "version", h.c("\"3.12.0 (metal0 compiled)\"") },
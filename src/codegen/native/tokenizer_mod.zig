@@ -16,6 +16,7 @@ const ModuleHandler = *const fn (*NativeCodegen, []ast.Node) CodegenError!void;
 /// Tokenizer module functions
 pub const Funcs = std.StaticStringMap(ModuleHandler).initComptime(.{
     .{ "encode", handleEncode },
+    .{ "encode_batch", handleEncodeBatch },
     .{ "decode", handleDecode },
     .{ "count_tokens", handleCountTokens },
     .{ "load", handleLoad },
@@ -51,6 +52,37 @@ fn handleEncode(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
     try self.emit("break :blk __enc_list; })");
 }
 
+/// Generate code for tokenizer.encode_batch(texts) -> list[list[int]]
+/// Texts are encoded in parallel into one flat buffer, then wrapped per text
+fn handleEncodeBatch(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
+    if (args.len == 0) return;
+    const arg_type = self.type_inferrer.inferExpr(args[0]) catch .unknown;
+
+    try self.emit("(blk: { ");
+    if (arg_type == .list) {
+        // Native list of strings - items are already []const u8
+        try self.emit("const __encb_texts = (");
+        try self.genExpr(args[0]);
+        try self.emit(").items; ");
+    } else {
+        // PyList of PyString
+        try self.emit("const __encb_src = ");
+        try self.genExpr(args[0]);
+        try self.emit("; ");
+        try self.emit("const __encb_texts = try __global_allocator.alloc([]const u8, runtime.PyList.len(__encb_src)); ");
+        try self.emit("defer __global_allocator.free(__encb_texts); ");
+        try self.emit("for (__encb_texts, 0..) |*__encb_text, __encb_i| { __encb_text.* = runtime.PyString.getValue(try runtime.PyList.getItem(__encb_src, __encb_i)); } ");
+    }
+    try self.emit("var __encb_batch = try runtime.tokenizer.encodeBatch(__global_allocator, __encb_texts); ");
+    try self.emit("defer __encb_batch.deinit(); ");
+    try self.emit("const __encb_list = try runtime.PyList.create(__global_allocator); ");
+    try self.emit("for (0..__encb_batch.len()) |__encb_j| { ");
+    try self.emit("const __encb_row = try runtime.PyList.create(__global_allocator); ");
+    try self.emit("for (__encb_batch.get(__encb_j)) |__encb_tok| { try runtime.PyList.append(__encb_row, try runtime.PyInt.create(__global_allocator, @intCast(__encb_tok))); } ");
+    try self.emit("try runtime.PyList.append(__encb_list, __encb_row); } ");
+    try self.emit("break :blk __encb_list; })");
+}
+
 /// Generate code for tokenizer.decode(tokens)
 /// Converts PyList of PyInt to []u32 before calling runtime decode
 fn handleDecode(self: *NativeCodegen, args: []ast.Node) CodegenError!void {
@@ -112,6 +112,9 @@ pub fn setupRuntimeFiles(allocator: std.mem.Allocator) !void {
     // Copy h2 package to build dir (for http module)
     try compiler_utils.copyH2Package(aa, build_dir);
 
+    // Copy HTTP/1.1 server to build dir (for flask module)
+    try compiler_utils.copyHttpServer(aa, build_dir);
+
     // Copy utils directory to build dir (for hashmap_helper, wyhash)
     try compiler_utils.copySrcUtilsDir(aa, build_dir);
 }
@@ -225,6 +228,9 @@ pub fn compileZigWithOptions(allocator: std.mem.Allocator, zig_code: []const u8,
     // Copy h2 package to build dir (for http module)
     try compiler_utils.copyH2Package(aa, build_dir);
 
+    // Copy HTTP/1.1 server to build dir (for flask module)
+    try compiler_utils.copyHttpServer(aa, build_dir);
+
     // Copy utils directory to build dir (for hashmap_helper, wyhash)
     try compiler_utils.copySrcUtilsDir(aa, build_dir);
 
@@ -86,6 +86,8 @@ pub fn copyRuntimeDir(allocator: std.mem.Allocator, dir_name: []const u8, build_
                 } else {
                     content = try std.mem.replaceOwned(u8, allocator, content, "@import(\"json_simd\")", "@import(\"simd/dispatch.zig\")");
                 }
+                // Shared record scanner is copied next to the runtime's json/ files (see copyJsonSimd)
+                content = try std.mem.replaceOwned(u8, allocator, content, "@import(\"json_stream\")", "@import(\"json/stream.zig\")");
                 // Fix parse_direct import in subdirectories
                 content = try std.mem.replaceOwned(u8, allocator, content, "@import(\"../parse_direct.zig\")", "@import(\"../parse_direct.zig\")");
 
@@ -94,6 +96,11 @@ pub fn copyRuntimeDir(allocator: std.mem.Allocator, dir_name: []const u8, build_
                 if (std.mem.indexOf(u8, dir_name, "Lib/http") != null) {
                     content = try std.mem.replaceOwned(u8, allocator, content, "@import(\"h2\")", "@import(\"../../h2/h2.zig\")");
                 }
+
+                // http_server is at cache root (cache/http_server.zig), see copyHttpServer
+                if (std.mem.eql(u8, dir_name, "Lib")) {
+                    content = try std.mem.replaceOwned(u8, allocator, content, "@import(\"http_server\")", "@import(\"../http_server.zig\")");
+                }
             }
 
             try dst_file.writeAll(content);
@@ -126,7 +133,8 @@ pub fn copyRuntimeFile(allocator: std.mem.Allocator, filename: []const u8, build
     try dst_file.writeAll(content);
 }
 
-/// Copy JSON SIMD files from shared/json/simd to cache/Lib/json/simd
+/// Copy JSON SIMD files from shared/json/simd to cache/Lib/json/simd,
+/// plus shared/json/stream.zig to cache/Lib/json/stream.zig
 pub fn copyJsonSimd(allocator: std.mem.Allocator, build_dir: []const u8) !void {
     const src_dir_path = "packages/shared/json/simd";
     const dst_dir_path = try std.fmt.allocPrint(allocator, "{s}/Lib/json/simd", .{build_dir});
@@ -161,6 +169,15 @@ pub fn copyJsonSimd(allocator: std.mem.Allocator, build_dir: []const u8) !void {
             try dst_file.writeAll(content);
         }
     }
+
+    // Incremental record scanner (imported as "json_stream" by Lib/json.zig)
+    const stream_src = try std.fs.cwd().readFileAlloc(allocator, "packages/shared/json/stream.zig", 1024 * 1024);
+    defer allocator.free(stream_src);
+    const stream_content = try std.mem.replaceOwned(u8, allocator, stream_src, "@import(\"json_simd\")", "@import(\"simd/dispatch.zig\")");
+    defer allocator.free(stream_content);
+    const stream_dst = try std.fmt.allocPrint(allocator, "{s}/Lib/json/stream.zig", .{build_dir});
+    defer allocator.free(stream_dst);
+    try std.fs.cwd().writeFile(.{ .sub_path = stream_dst, .data = stream_content });
 }
 
 /// Copy c_interop directory to cache for C library interop
@@ -369,6 +386,20 @@ pub fn copyH2Package(allocator: std.mem.Allocator, build_dir: []const u8) !void
     }
 }
 
+/// Copy the HTTP/1.1 server to cache/http_server.zig (for the flask module)
+pub fn copyHttpServer(allocator: std.mem.Allocator, build_dir: []const u8) !void {
+    const dst_path = try std.fmt.allocPrint(allocator, "{s}/http_server.zig", .{build_dir});
+    defer allocator.free(dst_path);
+
+    // std-only, so no import patching
+    const content = std.fs.cwd().readFileAlloc(allocator, "packages/shared/http/server.zig", 2 * 1024 * 1024) catch |err| {
+        if (err == error.FileNotFound) return;
+        return err;
+    };
+    defer allocator.free(content);
+    try std.fs.cwd().writeFile(.{ .sub_path = dst_path, .data = content });
+}
+
 /// Recursively copy directory
 pub fn copyDirRecursive(allocator: std.mem.Allocator, src_path: []const u8, dst_path: []const u8) !void {
     defer allocator.free(dst_path);
@@ -12,6 +12,7 @@ pub const ModuleInfo = struct {
     module_name: []const u8, // Logical module name (e.g., "mypackage" for mypackage/__init__.py)
     imports: [][]const u8, // List of imported modules
     compiled_path: ?[]const u8, // Path to compiled .so
+    content_hash: [32]u8, // SHA-256 of the source (build cache key)
 
     pub fn deinit(self: *ModuleInfo, allocator: std.mem.Allocator) void {
         allocator.free(self.path);
@@ -154,6 +155,9 @@ pub const ImportGraph = struct {
         };
         defer self.allocator.free(source);
 
+        var content_hash: [32]u8 = undefined;
+        std.crypto.hash.sha2.Sha256.hash(source, &content_hash, .{});
+
         // Parse to find imports
         const imports = try extractImports(self.allocator, source);
         errdefer {
@@ -190,6 +194,7 @@ pub const ImportGraph = struct {
             .module_name = mod_name,
             .imports = imports,
             .compiled_path = null,
+            .content_hash = content_hash,
         });
 
         // Recursively scan imports
@@ -69,6 +69,5 @@ pub const runSharedLib = utils.runSharedLib;
 pub const printUsage = utils.printUsage;
 
 pub const computeHash = cache.computeHash;
-pub const getCachePath = cache.getCachePath;
-pub const shouldRecompile = cache.shouldRecompile;
-pub const updateCache = cache.updateCache;
+pub const Manifest = cache.Manifest;
+pub const isUpToDate = cache.isUpToDate;
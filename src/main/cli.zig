@@ -379,16 +379,25 @@ fn cmdInstall(allocator: std.mem.Allocator, args: []const []const u8) !void {
     const total_elapsed = @as(f64, @floatFromInt(std.time.nanoTimestamp() - start_time)) / 1_000_000_000.0;
 
     std.debug.print("\n", .{});
-    if (install_results.len > 0) {
+    var installed_count: usize = 0;
+    for (install_results) |r| {
+        if (r.err) |err| {
+            printError("Failed to install {s} {s}: {any}", .{ r.name, r.version, err });
+        } else {
+            installed_count += 1;
+        }
+    }
+    if (installed_count > 0) {
         var total_files: usize = 0;
         var total_size: u64 = 0;
         for (install_results) |r| {
+            if (r.err != null) continue;
             total_files += r.files_installed;
             total_size += r.size_bytes;
         }
         printSuccess("Installed {s}{d}{s} packages ({d} files, {d:.1} MB) in {s}{d:.2}s{s}", .{
             Color.bold,
-            install_results.len,
+            installed_count,
             Color.reset,
             total_files,
             @as(f64, @floatFromInt(total_size)) / (1024.0 * 1024.0),
@@ -396,7 +405,7 @@ fn cmdInstall(allocator: std.mem.Allocator, args: []const []const u8) !void {
             total_elapsed,
             Color.reset,
         });
-    } else {
+    } else if (install_results.len == 0) {
         printWarn("No packages were installed (no wheel URLs available)", .{});
     }
 }
@@ -25,105 +25,27 @@ const zig_keywords = @import("zig_keywords");
 // Submodules
 const cache = @import("compile/cache.zig");
 const output = @import("compile/output.zig");
+const modules = @import("compile/modules.zig");
 
 /// Get module output path for a compiled .so file (delegates to output module)
 fn getModuleOutputPath(allocator: std.mem.Allocator, module_path: []const u8) ![]const u8 {
     return output.getModuleOutputPath(allocator, module_path);
 }
 
+/// Compile a single imported module to cache/<name>.zig (top-level exports)
+/// compileFile compiles the whole import graph in parallel via modules.ModuleSet
 pub fn compileModule(allocator: std.mem.Allocator, module_path: []const u8, module_name: []const u8) !void {
-    // Use arena allocator for all intermediate allocations to avoid leaks on parse errors
-    var arena = std.heap.ArenaAllocator.init(allocator);
-    defer arena.deinit();
-    const aa = arena.allocator();
-
-    // Read module source (handle absolute paths)
-    const source = blk: {
-        if (std.fs.path.isAbsolute(module_path)) {
-            const file = try std.fs.openFileAbsolute(module_path, .{});
-            defer file.close();
-            break :blk try file.readToEndAlloc(aa, 10 * 1024 * 1024);
-        } else {
-            break :blk try std.fs.cwd().readFileAlloc(aa, module_path, 10 * 1024 * 1024);
-        }
+    var parsed = modules.ParsedModule{
+        .path = module_path,
+        .module_name = module_name,
+        .imports = &.{},
+        .content_hash = undefined,
+        .arena = std.heap.ArenaAllocator.init(allocator),
     };
-    // No defer needed - arena handles cleanup
-
-    // Use provided module_name if not empty, otherwise derive from path
-    const mod_name = if (module_name.len > 0) module_name else blk: {
-        const basename = std.fs.path.basename(module_path);
-        // For __init__.py, use parent directory name
-        if (std.mem.eql(u8, basename, "__init__.py")) {
-            if (std.fs.path.dirname(module_path)) |dir| {
-                break :blk std.fs.path.basename(dir);
-            }
-        }
-        // Regular module: strip .py extension
-        if (std.mem.lastIndexOf(u8, basename, ".")) |idx|
-            break :blk basename[0..idx]
-        else
-            break :blk basename;
-    };
-
-    // Generate Zig code for this module
-    std.debug.print("  Generating Zig for module: {s}\n", .{module_path});
-
-    // Use existing compilation pipeline
-    const lexer_mod = @import("../lexer.zig");
-    const parser_mod = @import("../parser.zig");
-
-    var lex = try lexer_mod.Lexer.init(aa, source);
-    defer lex.deinit();
-    const tokens = try lex.tokenize();
-    // No defer needed for tokens - arena handles cleanup
-
-    var p = parser_mod.Parser.init(aa, tokens);
-    defer p.deinit();
-    const tree = try p.parse();
-    // No defer needed for tree - arena handles cleanup
-
-    // Perform semantic analysis
-    const semantic_types_mod = @import("../analysis/types.zig");
-    const lifetime_analysis_mod = @import("../analysis/lifetime.zig");
-    const native_types_mod = @import("../analysis/native_types.zig");
-
-    var semantic_info = semantic_types_mod.SemanticInfo.init(aa);
-    defer semantic_info.deinit();
-    _ = try lifetime_analysis_mod.analyzeLifetimes(&semantic_info, tree, 1);
-
-    var type_inferrer = try native_types_mod.TypeInferrer.init(aa);
-    defer type_inferrer.deinit();
-    if (tree == .module) {
-        try type_inferrer.analyze(tree.module);
-    }
+    defer parsed.arena.deinit();
 
-    // Generate Zig code in module mode (top-level exports, no struct wrapper)
-    var codegen = try native_codegen.NativeCodegen.init(aa, &type_inferrer, &semantic_info);
-    defer codegen.deinit();
-
-    codegen.mode = .module;
-    codegen.module_name = null; // No struct wrapper - export functions at top level
-
-    // Build call graph for unified function analysis
-    if (tree == .module) {
-        try codegen.buildCallGraph(tree.module);
-    }
-
-    const zig_code = if (tree == .module)
-        try codegen.generate(tree.module)
-    else
-        return error.InvalidAST;
-    // zig_code allocated by arena - no defer needed
-
-    // Save to cache/module_name.zig (use arena)
-    const output_path = try std.fmt.allocPrint(aa, build_dirs.CACHE ++ "/{s}.zig", .{mod_name});
-    // output_path allocated by arena - no defer needed
-
-    const file = try std.fs.cwd().createFile(output_path, .{});
-    defer file.close();
-    try file.writeAll(zig_code);
-
-    std.debug.print("  ✓ Module Zig generated: {s}\n", .{output_path});
+    try modules.parseModule(&parsed);
+    try modules.generateModuleZig(&parsed);
 }
 
 /// Compile a Jupyter notebook (.ipynb file)
@@ -357,8 +279,11 @@ pub fn compileFile(allocator: std.mem.Allocator, opts: CompileOptions) !void {
     // Determine output path
     const bin_path = try output.getFileOutputPath(aa, opts.input_file, opts.output_file, opts.binary);
 
-    // Check if binary is up-to-date using content hash (unless --force)
-    const should_compile = opts.force or try cache.shouldRecompile(aa, source, bin_path);
+    // Check if binary is up-to-date (unless --force): compiler, runtime and flags
+    // fingerprint plus the content hash of every module the last build used
+    const fingerprint = try cache.Fingerprint.compute(aa, opts);
+    const previous_manifest = if (opts.force) null else cache.Manifest.read(aa, bin_path);
+    const should_compile = opts.force or !cache.isUpToDate(aa, previous_manifest, fingerprint, bin_path);
 
     if (!should_compile) {
         // Output is up-to-date, skip compilation
@@ -437,26 +362,28 @@ pub fn compileFile(allocator: std.mem.Allocator, opts: CompileOptions) !void {
         std.debug.print("\x1b[0m to install them.\n\n", .{});
     }
 
-    // Compile each imported module in dependency order
+    // Compile imported modules: parse each once, then codegen in dependency waves
     // Ensure build directories exist
     try build_dirs.init();
-    std.debug.print("Compiling {d} imported modules...\n", .{import_graph.modules.count()});
-    var iter = import_graph.modules.iterator();
-    while (iter.next()) |entry| {
-        const module_path = entry.key_ptr.*;
-        const module_info = entry.value_ptr.*;
-
-        // Skip the main file itself
-        if (std.mem.eql(u8, module_path, opts.input_file)) continue;
-
-        // Compile module using the proper module name
-        std.debug.print("  Compiling module: {s} (as {s})\n", .{ module_path, module_info.module_name });
-        compileModule(aa, module_path, module_info.module_name) catch |err| {
-            std.debug.print("  Warning: Failed to compile module {s}: {}\n", .{ module_path, err });
-            continue;
-        };
+    // Module arenas are touched from pool threads, so back them with the
+    // thread-safe base allocator rather than this function's arena
+    var module_set = try modules.ModuleSet.init(allocator, &import_graph, opts.input_file);
+    defer module_set.deinit();
+
+    // Reuse generated Zig when neither the module nor its imports changed since the last build
+    for (module_set.modules) |*m| {
+        const module_info = import_graph.modules.get(m.path) orelse continue;
+        const zig_path = try cache.moduleZigPath(aa, m.path, m.module_name);
+        const deps_hash = try cache.dependencyHash(aa, &import_graph, m.path);
+        if (cache.isModuleFresh(aa, previous_manifest, fingerprint, m.path, module_info.content_hash, deps_hash, zig_path)) {
+            std.debug.print("  Module up-to-date: {s}\n", .{m.path});
+            m.fresh = true;
+        }
     }
 
+    std.debug.print("Compiling {d} imported modules...\n", .{module_set.modules.len});
+    try module_set.compileAll();
+
     // PHASE 2.5: C Library Import Detection
     var import_ctx = c_interop.ImportContext.init(aa);
     try utils.detectImports(&import_ctx, tree);
@@ -500,6 +427,20 @@ pub fn compileFile(allocator: std.mem.Allocator, opts: CompileOptions) !void {
                 }
             }
 
+            // Reuse the interface from module compilation when there is one
+            if (module_set.find(module_name)) |parsed| {
+                if (parsed.err != null) {
+                    try failed_modules.put(module_name, {});
+                    continue;
+                }
+                if (parsed.interface) |iface| {
+                    if (!parsed.isPackage()) {
+                        try iface.register(&type_inferrer, aa, null, module_name);
+                        continue;
+                    }
+                }
+            }
+
             const compiled = imports_mod.compileModuleAsStruct(module_name, source_file_dir, aa, &type_inferrer) catch |err| {
                 std.debug.print("Warning: Could not pre-compile module {s}: {}\n", .{ module_name, err });
                 // Track this failed module so codegen can skip it
@@ -585,8 +526,9 @@ pub fn compileFile(allocator: std.mem.Allocator, opts: CompileOptions) !void {
 
     std.debug.print("✓ Compiled successfully to: {s}\n", .{bin_path});
 
-    // Update cache with new hash
-    try cache.updateCache(aa, source, bin_path);
+    // Record what this binary was built from
+    const manifest = try cache.Manifest.fromGraph(aa, &import_graph, fingerprint, opts.input_file);
+    try manifest.write(aa, bin_path);
 
     // Write debug info file (if --debug flag set)
     if (debug_writer) |*dw| {
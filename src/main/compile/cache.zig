@@ -4,69 +4,429 @@
 /// - {module}.zig   - Generated Zig source
 /// - {module}.o     - Compiled object file
 /// - {module}.o.hash - Source hash for incremental detection
+///
+/// Each output binary has a manifest ({bin}.manifest) recording what it was
+/// built from: a fingerprint of the compiler, runtime sources and build
+/// flags, plus the content hash of every module in the import graph. A build
+/// is skipped only when all of them still match, and an imported module's
+/// generated .zig is reused when neither its source nor any module it
+/// imports has changed.
 const std = @import("std");
 const build_dirs = @import("../../build_dirs.zig");
+const import_scanner = @import("../../import_scanner.zig");
+const incremental = @import("incremental.zig");
+const CompileOptions = @import("../../main.zig").CompileOptions;
+
+const Sha256 = std.crypto.hash.sha2.Sha256;
+
+pub const Hash = [32]u8;
+
+/// Bump when the manifest layout changes - old manifests then read as missing
+const manifest_version = "metal0-manifest 2";
+
+/// Runtime sources copied into every build (see compiler.setupRuntimeFiles)
+const runtime_source_dirs = [_][]const u8{ "packages/runtime/src", "packages/bigint/src" };
 
 /// Compute SHA256 hash of source content
-pub fn computeHash(source: []const u8) [32]u8 {
-    var hash: [32]u8 = undefined;
-    std.crypto.hash.sha2.Sha256.hash(source, &hash, .{});
+pub fn computeHash(source: []const u8) Hash {
+    var hash: Hash = undefined;
+    Sha256.hash(source, &hash, .{});
     return hash;
 }
 
-/// Get cache file path for a binary
-pub fn getCachePath(allocator: std.mem.Allocator, bin_path: []const u8) ![]const u8 {
-    // Cache file in .metal0/cache/: {name}.hash
-    return try std.fmt.allocPrint(allocator, "{s}.hash", .{bin_path});
+/// Everything besides module sources that changes the output binary
+pub const Fingerprint = struct {
+    compiler: Hash,
+    runtime: Hash,
+    flags: Hash,
+
+    pub fn compute(allocator: std.mem.Allocator, opts: CompileOptions) !Fingerprint {
+        return .{
+            .compiler = compilerHash(allocator),
+            .runtime = try runtimeHash(allocator),
+            .flags = flagsHash(opts),
+        };
+    }
+
+    pub fn eql(a: Fingerprint, b: Fingerprint) bool {
+        return std.mem.eql(u8, &a.compiler, &b.compiler) and
+            std.mem.eql(u8, &a.runtime, &b.runtime) and
+            std.mem.eql(u8, &a.flags, &b.flags);
+    }
+};
+
+/// The running metal0 executable, by size and mtime (re-hashing a large
+/// binary on every build would cost more than the check saves)
+fn compilerHash(allocator: std.mem.Allocator) Hash {
+    var h = Sha256.init(.{});
+    const exe_path = std.fs.selfExePathAlloc(allocator) catch return h.finalResult();
+    defer allocator.free(exe_path);
+    h.update(exe_path);
+    if (std.fs.cwd().statFile(exe_path)) |st| {
+        hashStat(&h, st);
+    } else |_| {}
+    return h.finalResult();
 }
 
-/// Check if recompilation is needed (compare source hash with cached hash)
-pub fn shouldRecompile(allocator: std.mem.Allocator, source: []const u8, bin_path: []const u8) !bool {
-    // Check if binary exists
-    std.fs.cwd().access(bin_path, .{}) catch return true; // Binary missing, must compile
+/// Runtime sources and the prebuilt runtime archive, by path, size and mtime
+fn runtimeHash(allocator: std.mem.Allocator) !Hash {
+    var arena = std.heap.ArenaAllocator.init(allocator);
+    defer arena.deinit();
+    const aa = arena.allocator();
 
-    // Compute current source hash
-    const current_hash = computeHash(source);
+    var files = std.ArrayList([]const u8){};
+    for (runtime_source_dirs) |dir_path| {
+        var dir = std.fs.cwd().openDir(dir_path, .{ .iterate = true }) catch continue;
+        defer dir.close();
+        var walker = try dir.walk(aa);
+        defer walker.deinit();
+        while (try walker.next()) |entry| {
+            if (entry.kind != .file) continue;
+            try files.append(aa, try std.fs.path.join(aa, &.{ dir_path, entry.path }));
+        }
+    }
+    try files.append(aa, incremental.RUNTIME_ARCHIVE_PATH);
 
-    // Read cached hash
-    const cache_path = try getCachePath(allocator, bin_path);
-    defer allocator.free(cache_path);
+    // Directory iteration order is not stable - sort so the hash is
+    std.mem.sort([]const u8, files.items, {}, struct {
+        fn lessThan(_: void, a: []const u8, b: []const u8) bool {
+            return std.mem.lessThan(u8, a, b);
+        }
+    }.lessThan);
 
-    const cached_hash_hex = std.fs.cwd().readFileAlloc(allocator, cache_path, 1024) catch {
-        return true; // Cache missing, must compile
-    };
-    defer allocator.free(cached_hash_hex);
+    var h = Sha256.init(.{});
+    for (files.items) |path| {
+        const st = std.fs.cwd().statFile(path) catch continue;
+        h.update(path);
+        hashStat(&h, st);
+    }
+    return h.finalResult();
+}
+
+/// Options that change the produced artifact (not the input/output paths)
+fn flagsHash(opts: CompileOptions) Hash {
+    var h = Sha256.init(.{});
+    const produces_exe = opts.binary or !std.mem.eql(u8, opts.mode, "build");
+    h.update(&[_]u8{
+        @intFromBool(produces_exe),
+        @intFromBool(opts.wasm),
+        @intFromBool(opts.debug),
+        @intFromBool(opts.pgo_generate),
+        @intFromEnum(opts.target),
+    });
+    if (opts.pgo_use) |profile| {
+        h.update(profile);
+        if (std.fs.cwd().statFile(profile)) |st| hashStat(&h, st) else |_| {}
+    }
+    return h.finalResult();
+}
+
+fn hashStat(h: *Sha256, st: std.fs.File.Stat) void {
+    var buf: [24]u8 = undefined;
+    std.mem.writeInt(u64, buf[0..8], st.size, .little);
+    std.mem.writeInt(i128, buf[8..24], st.mtime, .little);
+    h.update(&buf);
+}
+
+/// One module of the import graph (the main file included)
+pub const ModuleEntry = struct {
+    path: []const u8,
+    source_hash: Hash,
+    /// Source hashes of every module it imports (see dependencyHash)
+    deps_hash: Hash,
+    /// Hash of the generated .zig (zeroes for the main file, which is compiled inline)
+    zig_hash: Hash,
+};
+
+/// What an output binary was built from
+pub const Manifest = struct {
+    fingerprint: Fingerprint,
+    modules: []ModuleEntry,
+
+    /// Build a manifest from the scanned import graph
+    pub fn fromGraph(
+        allocator: std.mem.Allocator,
+        graph: *import_scanner.ImportGraph,
+        fingerprint: Fingerprint,
+        main_path: []const u8,
+    ) !Manifest {
+        var modules = std.ArrayList(ModuleEntry){};
+        errdefer modules.deinit(allocator);
+
+        var iter = graph.modules.iterator();
+        while (iter.next()) |entry| {
+            const info = entry.value_ptr.*;
+            var zig_hash = std.mem.zeroes(Hash);
+            if (!std.mem.eql(u8, info.path, main_path)) {
+                const zig_path = try moduleZigPath(allocator, info.path, info.module_name);
+                defer allocator.free(zig_path);
+                zig_hash = hashFile(allocator, zig_path) orelse continue; // Module failed to generate
+            }
+            try modules.append(allocator, .{
+                .path = info.path,
+                .source_hash = info.content_hash,
+                .deps_hash = try dependencyHash(allocator, graph, info.path),
+                .zig_hash = zig_hash,
+            });
+        }
+        return .{ .fingerprint = fingerprint, .modules = try modules.toOwnedSlice(allocator) };
+    }
+
+    /// Read {bin}.manifest; null when missing, unreadable or from another format version
+    pub fn read(allocator: std.mem.Allocator, bin_path: []const u8) ?Manifest {
+        const manifest_path = getManifestPath(allocator, bin_path) catch return null;
+        defer allocator.free(manifest_path);
+        const content = std.fs.cwd().readFileAlloc(allocator, manifest_path, 16 * 1024 * 1024) catch return null;
+        defer allocator.free(content);
+        return parse(allocator, content) catch null;
+    }
+
+    fn parse(allocator: std.mem.Allocator, content: []const u8) !Manifest {
+        var lines = std.mem.splitScalar(u8, content, '\n');
+        if (!std.mem.eql(u8, lines.next() orelse "", manifest_version)) return error.InvalidManifest;
+
+        var fingerprint: Fingerprint = undefined;
+        var seen_fields: u8 = 0;
+        var modules = std.ArrayList(ModuleEntry){};
+        errdefer {
+            for (modules.items) |m| allocator.free(m.path);
+            modules.deinit(allocator);
+        }
+
+        while (lines.next()) |line| {
+            if (line.len == 0) continue;
+            var fields = std.mem.splitScalar(u8, line, ' ');
+            const tag = fields.next().?;
+            if (std.mem.eql(u8, tag, "module")) {
+                // module <source hash> <deps hash> <zig hash> <path> (path may contain spaces)
+                const source_hash = try parseHash(fields.next() orelse return error.InvalidManifest);
+                const deps_hash = try parseHash(fields.next() orelse return error.InvalidManifest);
+                const zig_hash = try parseHash(fields.next() orelse return error.InvalidManifest);
+                const path = fields.rest();
+                if (path.len == 0) return error.InvalidManifest;
+                try modules.append(allocator, .{
+                    .path = try allocator.dupe(u8, path),
+                    .source_hash = source_hash,
+                    .deps_hash = deps_hash,
+                    .zig_hash = zig_hash,
+                });
+                continue;
+            }
+            const hash = try parseHash(fields.next() orelse return error.InvalidManifest);
+            if (std.mem.eql(u8, tag, "compiler")) {
+                fingerprint.compiler = hash;
+                seen_fields |= 1;
+            } else if (std.mem.eql(u8, tag, "runtime")) {
+                fingerprint.runtime = hash;
+                seen_fields |= 2;
+            } else if (std.mem.eql(u8, tag, "flags")) {
+                fingerprint.flags = hash;
+                seen_fields |= 4;
+            }
+        }
+        if (seen_fields != 7) return error.InvalidManifest;
+        return .{ .fingerprint = fingerprint, .modules = try modules.toOwnedSlice(allocator) };
+    }
+
+    /// Write {bin}.manifest
+    pub fn write(self: Manifest, allocator: std.mem.Allocator, bin_path: []const u8) !void {
+        const text = try self.serialize(allocator);
+        defer allocator.free(text);
 
-    // Convert hex string back to bytes
-    if (cached_hash_hex.len != 64) return true; // Invalid cache
+        const manifest_path = try getManifestPath(allocator, bin_path);
+        defer allocator.free(manifest_path);
+        const file = try std.fs.cwd().createFile(manifest_path, .{});
+        defer file.close();
+        try file.writeAll(text);
+    }
+
+    fn serialize(self: Manifest, allocator: std.mem.Allocator) ![]u8 {
+        var out = std.ArrayList(u8){};
+        errdefer out.deinit(allocator);
+        const w = out.writer(allocator);
+
+        try w.print("{s}\n", .{manifest_version});
+        try w.print("compiler {s}\n", .{&std.fmt.bytesToHex(self.fingerprint.compiler, .lower)});
+        try w.print("runtime {s}\n", .{&std.fmt.bytesToHex(self.fingerprint.runtime, .lower)});
+        try w.print("flags {s}\n", .{&std.fmt.bytesToHex(self.fingerprint.flags, .lower)});
+        for (self.modules) |m| {
+            try w.print("module {s} {s} {s} {s}\n", .{
+                &std.fmt.bytesToHex(m.source_hash, .lower),
+                &std.fmt.bytesToHex(m.deps_hash, .lower),
+                &std.fmt.bytesToHex(m.zig_hash, .lower),
+                m.path,
+            });
+        }
+        return out.toOwnedSlice(allocator);
+    }
 
-    var cached_hash: [32]u8 = undefined;
-    for (0..32) |i| {
-        cached_hash[i] = std.fmt.parseInt(u8, cached_hash_hex[i * 2 .. i * 2 + 2], 16) catch return true;
+    pub fn find(self: Manifest, path: []const u8) ?ModuleEntry {
+        for (self.modules) |m| {
+            if (std.mem.eql(u8, m.path, path)) return m;
+        }
+        return null;
     }
+};
+
+fn parseHash(hex: []const u8) !Hash {
+    var hash: Hash = undefined;
+    if (hex.len != hash.len * 2) return error.InvalidManifest;
+    _ = std.fmt.hexToBytes(&hash, hex) catch return error.InvalidManifest;
+    return hash;
+}
+
+fn hashFile(allocator: std.mem.Allocator, path: []const u8) ?Hash {
+    const content = std.fs.cwd().readFileAlloc(allocator, path, 100_000_000) catch return null;
+    defer allocator.free(content);
+    return computeHash(content);
+}
+
+/// Get manifest path for a binary
+pub fn getManifestPath(allocator: std.mem.Allocator, bin_path: []const u8) ![]const u8 {
+    return try std.fmt.allocPrint(allocator, "{s}.manifest", .{bin_path});
+}
+
+/// Generated Zig path for an imported module: cache/{module name}.zig
+pub fn moduleZigPath(allocator: std.mem.Allocator, module_path: []const u8, module_name: []const u8) ![]const u8 {
+    return moduleCachePath(allocator, module_path, module_name, ".zig");
+}
+
+/// Type interface path for an imported module: cache/{module name}.mi
+pub fn moduleInterfacePath(allocator: std.mem.Allocator, module_path: []const u8, module_name: []const u8) ![]const u8 {
+    return moduleCachePath(allocator, module_path, module_name, ".mi");
+}
 
-    // Compare hashes
-    return !std.mem.eql(u8, &current_hash, &cached_hash);
+/// Module name falls back to the file name (package name for __init__.py)
+fn moduleCachePath(allocator: std.mem.Allocator, module_path: []const u8, module_name: []const u8, comptime ext: []const u8) ![]const u8 {
+    const mod_name = if (module_name.len > 0) module_name else blk: {
+        const basename = std.fs.path.basename(module_path);
+        // For __init__.py, use parent directory name
+        if (std.mem.eql(u8, basename, "__init__.py")) {
+            if (std.fs.path.dirname(module_path)) |dir| {
+                break :blk std.fs.path.basename(dir);
+            }
+        }
+        // Regular module: strip .py extension
+        if (std.mem.lastIndexOf(u8, basename, ".")) |idx|
+            break :blk basename[0..idx]
+        else
+            break :blk basename;
+    };
+    return std.fmt.allocPrint(allocator, build_dirs.CACHE ++ "/{s}" ++ ext, .{mod_name});
 }
 
-/// Update cache with new source hash
-pub fn updateCache(allocator: std.mem.Allocator, source: []const u8, bin_path: []const u8) !void {
-    const hash = computeHash(source);
+/// Fast path: is the binary current without scanning imports?
+/// Re-hashes only the files the previous build recorded - if none changed,
+/// the import graph they produce can't have changed either.
+pub fn isUpToDate(
+    allocator: std.mem.Allocator,
+    previous: ?Manifest,
+    fingerprint: Fingerprint,
+    bin_path: []const u8,
+) bool {
+    const manifest = previous orelse return false;
+    std.fs.cwd().access(bin_path, .{}) catch return false; // Binary missing, must compile
+    if (!manifest.fingerprint.eql(fingerprint)) return false;
 
-    // Convert hash to hex string (manually)
-    var hex_buf: [64]u8 = undefined;
-    const hex_chars = "0123456789abcdef";
-    for (hash, 0..) |byte, i| {
-        hex_buf[i * 2] = hex_chars[byte >> 4];
-        hex_buf[i * 2 + 1] = hex_chars[byte & 0x0F];
+    for (manifest.modules) |m| {
+        const current = hashFile(allocator, m.path) orelse return false;
+        if (!std.mem.eql(u8, &current, &m.source_hash)) return false;
+    }
+    return manifest.modules.len > 0;
+}
+
+/// Hash of the sources of every module `path` imports, directly or transitively
+/// Codegen of a module reads the interfaces of the modules it imports, so a
+/// changed dependency must invalidate the module's generated .zig too.
+pub fn dependencyHash(allocator: std.mem.Allocator, graph: *import_scanner.ImportGraph, path: []const u8) !Hash {
+    var seen = std.StringHashMap(void).init(allocator);
+    defer seen.deinit();
+    var deps = std.ArrayList(*const import_scanner.ModuleInfo){};
+    defer deps.deinit(allocator);
+    var stack = std.ArrayList([]const u8){};
+    defer stack.deinit(allocator);
+
+    try seen.put(path, {});
+    try stack.append(allocator, path);
+    while (stack.pop()) |current| {
+        const info = graph.modules.getPtr(current) orelse continue;
+        for (info.imports) |import_name| {
+            const dep = findModule(graph, import_name) orelse continue; // stdlib / runtime module
+            const gop = try seen.getOrPut(dep.path);
+            if (gop.found_existing) continue;
+            try deps.append(allocator, dep);
+            try stack.append(allocator, dep.path);
+        }
     }
 
-    // Write to cache file
-    const cache_path = try getCachePath(allocator, bin_path);
-    defer allocator.free(cache_path);
+    // Graph iteration order is arbitrary; hash in path order
+    std.mem.sort(*const import_scanner.ModuleInfo, deps.items, {}, struct {
+        fn lessThan(_: void, a: *const import_scanner.ModuleInfo, b: *const import_scanner.ModuleInfo) bool {
+            return std.mem.lessThan(u8, a.path, b.path);
+        }
+    }.lessThan);
+    var h = Sha256.init(.{});
+    for (deps.items) |dep| {
+        h.update(dep.path);
+        h.update(&dep.content_hash);
+    }
+    return h.finalResult();
+}
 
-    const file = try std.fs.cwd().createFile(cache_path, .{});
-    defer file.close();
+/// Scanned module an import statement refers to (relative imports drop their dots)
+fn findModule(graph: *import_scanner.ImportGraph, import_name: []const u8) ?*const import_scanner.ModuleInfo {
+    const name = std.mem.trimLeft(u8, import_name, ".");
+    for (graph.modules.values()) |*info| {
+        if (std.mem.eql(u8, info.module_name, name)) return info;
+    }
+    return null;
+}
 
-    try file.writeAll(&hex_buf);
+/// Can the generated .zig of an imported module be reused?
+/// Same compiler, same source and same sources for everything it imports
+/// means the same output. The .zig is also checked against the recorded
+/// hash, since cache/ is shared between projects.
+pub fn isModuleFresh(
+    allocator: std.mem.Allocator,
+    previous: ?Manifest,
+    fingerprint: Fingerprint,
+    module_path: []const u8,
+    source_hash: Hash,
+    deps_hash: Hash,
+    zig_path: []const u8,
+) bool {
+    const manifest = previous orelse return false;
+    if (!std.mem.eql(u8, &manifest.fingerprint.compiler, &fingerprint.compiler)) return false;
+    const entry = manifest.find(module_path) orelse return false;
+    if (!std.mem.eql(u8, &entry.source_hash, &source_hash)) return false;
+    if (!std.mem.eql(u8, &entry.deps_hash, &deps_hash)) return false;
+    const zig_hash = hashFile(allocator, zig_path) orelse return false;
+    return std.mem.eql(u8, &zig_hash, &entry.zig_hash);
+}
+
+test "manifest round-trips through its text format" {
+    const allocator = std.testing.allocator;
+    var modules = [_]ModuleEntry{
+        .{ .path = "app.py", .source_hash = computeHash("print(1)"), .deps_hash = computeHash("lib dir/util.py"), .zig_hash = std.mem.zeroes(Hash) },
+        .{ .path = "lib dir/util.py", .source_hash = computeHash("x = 1"), .deps_hash = std.mem.zeroes(Hash), .zig_hash = computeHash("pub const x = 1;") },
+    };
+    const manifest = Manifest{
+        .fingerprint = .{ .compiler = computeHash("c"), .runtime = computeHash("r"), .flags = computeHash("f") },
+        .modules = &modules,
+    };
+
+    const text = try manifest.serialize(allocator);
+    defer allocator.free(text);
+
+    const parsed = try Manifest.parse(allocator, text);
+    defer {
+        for (parsed.modules) |m| allocator.free(m.path);
+        allocator.free(parsed.modules);
+    }
+    try std.testing.expect(parsed.fingerprint.eql(manifest.fingerprint));
+    try std.testing.expectEqual(@as(usize, 2), parsed.modules.len);
+    const util = parsed.find("lib dir/util.py").?;
+    try std.testing.expectEqualSlices(u8, &modules[1].zig_hash, &util.zig_hash);
+    try std.testing.expectEqualSlices(u8, &modules[0].deps_hash, &parsed.find("app.py").?.deps_hash);
+    try std.testing.expectError(error.InvalidManifest, Manifest.parse(allocator, "metal0-manifest 0\n"));
 }
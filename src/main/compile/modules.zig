@@ -0,0 +1,328 @@
+/// Parallel compilation of imported modules
+/// Every module in the import graph is read and parsed at most once. The parsed
+/// tree feeds module codegen (cache/<name>.zig), and its interface feeds the
+/// main file's type inference, which used to re-parse each import. Unchanged
+/// modules skip parsing entirely: their interface is loaded from cache/<name>.mi.
+const std = @import("std");
+const ast = @import("ast");
+const hashmap_helper = @import("hashmap_helper");
+const lexer = @import("../../lexer.zig");
+const parser = @import("../../parser.zig");
+const native_types = @import("../../analysis/native_types.zig");
+const semantic_types = @import("../../analysis/types.zig");
+const lifetime_analysis = @import("../../analysis/lifetime.zig");
+const native_codegen = @import("../../codegen/native/main.zig");
+const module_interface = @import("../../analysis/module_interface.zig");
+const import_scanner = @import("../../import_scanner.zig");
+const cache = @import("cache.zig");
+
+pub const ModuleInterface = module_interface.ModuleInterface;
+
+const unassigned_wave = std.math.maxInt(usize);
+
+/// One imported module, parsed once and shared between compile phases
+pub const ParsedModule = struct {
+    path: []const u8,
+    module_name: []const u8,
+    imports: []const []const u8,
+    content_hash: [32]u8,
+    /// Owns source, tokens, tree and interface (backed by a thread-safe allocator)
+    arena: std.heap.ArenaAllocator,
+    /// Null when the module was not parsed (interface loaded from cache)
+    tree: ?ast.Node.Module = null,
+    interface: ?ModuleInterface = null,
+    /// Generated .zig is still current, skip codegen (see cache.isModuleFresh)
+    fresh: bool = false,
+    wave: usize = unassigned_wave,
+    /// First error from parse or codegen
+    err: ?anyerror = null,
+
+    /// Packages inline their submodules (compileModuleAsStruct), the interface
+    /// of __init__.py alone is not enough for them
+    pub fn isPackage(self: *const ParsedModule) bool {
+        return std.mem.eql(u8, std.fs.path.basename(self.path), "__init__.py");
+    }
+};
+
+/// All imported modules of one compileFile call
+pub const ModuleSet = struct {
+    allocator: std.mem.Allocator,
+    modules: []ParsedModule,
+    by_name: hashmap_helper.StringHashMap(usize),
+    wave_count: usize = 0,
+
+    /// Collect every module of the graph except the main file, sorted by path
+    /// so that logs and wave contents are deterministic
+    pub fn init(allocator: std.mem.Allocator, graph: *import_scanner.ImportGraph, main_path: []const u8) !ModuleSet {
+        var list = std.ArrayList(ParsedModule){};
+        errdefer {
+            for (list.items) |*m| m.arena.deinit();
+            list.deinit(allocator);
+        }
+
+        var iter = graph.modules.iterator();
+        while (iter.next()) |entry| {
+            const info = entry.value_ptr.*;
+            if (std.mem.eql(u8, entry.key_ptr.*, main_path)) continue;
+            try list.append(allocator, .{
+                .path = info.path,
+                .module_name = info.module_name,
+                .imports = info.imports,
+                .content_hash = info.content_hash,
+                .arena = std.heap.ArenaAllocator.init(allocator),
+            });
+        }
+
+        const modules = try list.toOwnedSlice(allocator);
+        std.mem.sort(ParsedModule, modules, {}, lessThanPath);
+
+        var by_name = hashmap_helper.StringHashMap(usize).init(allocator);
+        errdefer by_name.deinit();
+        for (modules, 0..) |m, i| {
+            try by_name.put(m.module_name, i);
+        }
+
+        return .{ .allocator = allocator, .modules = modules, .by_name = by_name };
+    }
+
+    pub fn deinit(self: *ModuleSet) void {
+        for (self.modules) |*m| m.arena.deinit();
+        self.allocator.free(self.modules);
+        self.by_name.deinit();
+    }
+
+    /// Look up a module by the name it is imported as
+    pub fn find(self: *const ModuleSet, module_name: []const u8) ?*const ParsedModule {
+        const idx = self.by_name.get(module_name) orelse return null;
+        return &self.modules[idx];
+    }
+
+    /// Parse (or load the interface of) all modules, then generate Zig for the
+    /// stale ones wave by wave.
+    /// A module's wave is one past the deepest of its imports; modules in an
+    /// import cycle share the last wave.
+    pub fn compileAll(self: *ModuleSet) !void {
+        if (self.modules.len == 0) return;
+
+        var pool: std.Thread.Pool = undefined;
+        try pool.init(.{ .allocator = self.allocator });
+        defer pool.deinit();
+
+        var wg: std.Thread.WaitGroup = .{};
+        for (self.modules) |*m| {
+            pool.spawnWg(&wg, parseWorker, .{m});
+        }
+        pool.waitAndWork(&wg);
+
+        try self.assignWaves();
+
+        for (0..self.wave_count) |wave| {
+            wg.reset();
+            for (self.modules) |*m| {
+                if (m.wave != wave or m.fresh or m.err != null) continue;
+                pool.spawnWg(&wg, codegenWorker, .{m});
+            }
+            pool.waitAndWork(&wg);
+        }
+
+        for (self.modules) |m| {
+            if (m.err) |err| {
+                std.debug.print("  Warning: Failed to compile module {s}: {}\n", .{ m.path, err });
+            }
+        }
+    }
+
+    /// Kahn's algorithm over the in-graph imports; leftovers are cycles
+    fn assignWaves(self: *ModuleSet) !void {
+        const n = self.modules.len;
+        const pending = try self.allocator.alloc(usize, n);
+        defer self.allocator.free(pending);
+        @memset(pending, 0);
+
+        const dependents = try self.allocator.alloc(std.ArrayList(usize), n);
+        defer {
+            for (dependents) |*d| d.deinit(self.allocator);
+            self.allocator.free(dependents);
+        }
+        @memset(dependents, .{});
+
+        for (self.modules, 0..) |m, i| {
+            for (m.imports) |import_name| {
+                const dep = self.by_name.get(std.mem.trimLeft(u8, import_name, ".")) orelse continue;
+                if (dep == i) continue;
+                pending[i] += 1;
+                try dependents[dep].append(self.allocator, i);
+            }
+        }
+
+        var current = std.ArrayList(usize){};
+        defer current.deinit(self.allocator);
+        var next = std.ArrayList(usize){};
+        defer next.deinit(self.allocator);
+
+        for (pending, 0..) |count, i| {
+            if (count == 0) try current.append(self.allocator, i);
+        }
+
+        var wave: usize = 0;
+        while (current.items.len > 0) : (wave += 1) {
+            next.clearRetainingCapacity();
+            for (current.items) |i| {
+                self.modules[i].wave = wave;
+                for (dependents[i].items) |d| {
+                    pending[d] -= 1;
+                    if (pending[d] == 0) try next.append(self.allocator, d);
+                }
+            }
+            std.mem.swap(std.ArrayList(usize), &current, &next);
+        }
+
+        var has_cycle = false;
+        for (self.modules) |*m| {
+            if (m.wave == unassigned_wave) {
+                m.wave = wave;
+                has_cycle = true;
+            }
+        }
+        self.wave_count = if (has_cycle) wave + 1 else wave;
+    }
+};
+
+fn lessThanPath(_: void, a: ParsedModule, b: ParsedModule) bool {
+    return std.mem.lessThan(u8, a.path, b.path);
+}
+
+fn parseWorker(m: *ParsedModule) void {
+    // Fresh modules need no codegen, so a still-valid interface is all we need
+    if (m.fresh and loadInterface(m)) return;
+    parseModule(m) catch |err| {
+        m.err = err;
+        return;
+    };
+    // Best effort - a missing interface only costs a parse next time
+    writeInterface(m) catch |err| {
+        std.debug.print("  Warning: Could not write interface for {s}: {}\n", .{ m.path, err });
+    };
+}
+
+fn loadInterface(m: *ParsedModule) bool {
+    const aa = m.arena.allocator();
+    const path = cache.moduleInterfacePath(aa, m.path, m.module_name) catch return false;
+    m.interface = ModuleInterface.readFile(aa, path, m.content_hash) orelse return false;
+    return true;
+}
+
+fn writeInterface(m: *ParsedModule) !void {
+    const iface = m.interface orelse return;
+    const aa = m.arena.allocator();
+    const path = try cache.moduleInterfacePath(aa, m.path, m.module_name);
+    try iface.writeFile(aa, path, m.content_hash);
+}
+
+fn codegenWorker(m: *ParsedModule) void {
+    generateModuleZig(m) catch |err| {
+        m.err = err;
+    };
+}
+
+/// Read, lex and parse into the module's arena, then collect its interface
+pub fn parseModule(m: *ParsedModule) !void {
+    const aa = m.arena.allocator();
+
+    // Read module source (handle absolute paths)
+    const source = blk: {
+        if (std.fs.path.isAbsolute(m.path)) {
+            const file = try std.fs.openFileAbsolute(m.path, .{});
+            defer file.close();
+            break :blk try file.readToEndAlloc(aa, 10 * 1024 * 1024);
+        } else {
+            break :blk try std.fs.cwd().readFileAlloc(aa, m.path, 10 * 1024 * 1024);
+        }
+    };
+
+    // Lexer/parser scratch lives in the arena alongside the tree, no deinit
+    var lex = try lexer.Lexer.init(aa, source);
+    const tokens = try lex.tokenize();
+
+    var p = parser.Parser.init(aa, tokens);
+    const tree = try p.parse();
+    if (tree != .module) return error.InvalidAST;
+
+    m.tree = tree.module;
+    m.interface = try ModuleInterface.fromModule(aa, tree.module);
+}
+
+/// Generate top-level module Zig (no struct wrapper) into cache/<name>.zig
+/// Analysis and codegen scratch use a per-call arena, only the tree is shared
+pub fn generateModuleZig(m: *const ParsedModule) !void {
+    const module = m.tree orelse return error.InvalidAST;
+
+    var arena = std.heap.ArenaAllocator.init(m.arena.child_allocator);
+    defer arena.deinit();
+    const aa = arena.allocator();
+
+    std.debug.print("  Generating Zig for module: {s} (as {s})\n", .{ m.path, m.module_name });
+
+    var semantic_info = semantic_types.SemanticInfo.init(aa);
+    defer semantic_info.deinit();
+    _ = try lifetime_analysis.analyzeLifetimes(&semantic_info, .{ .module = module }, 1);
+
+    var type_inferrer = try native_types.TypeInferrer.init(aa);
+    defer type_inferrer.deinit();
+    try type_inferrer.analyze(module);
+
+    var codegen = try native_codegen.NativeCodegen.init(aa, &type_inferrer, &semantic_info);
+    defer codegen.deinit();
+
+    codegen.mode = .module;
+    codegen.module_name = null; // No struct wrapper - export functions at top level
+
+    // Build call graph for unified function analysis
+    try codegen.buildCallGraph(module);
+
+    const zig_code = try codegen.generate(module);
+
+    // Save to cache/module_name.zig
+    const output_path = try cache.moduleZigPath(aa, m.path, m.module_name);
+    const file = try std.fs.cwd().createFile(output_path, .{});
+    defer file.close();
+    try file.writeAll(zig_code);
+
+    std.debug.print("  ✓ Module Zig generated: {s}\n", .{output_path});
+}
+
+test "ModuleSet waves follow imports and put cycles last" {
+    const allocator = std.testing.allocator;
+
+    const no_imports = [_][]const u8{};
+    const imports_base = [_][]const u8{"base"};
+    const imports_mid = [_][]const u8{ "mid", "base" };
+    const imports_b = [_][]const u8{".cyc_b"};
+    const imports_a = [_][]const u8{"cyc_a"};
+
+    var modules = [_]ParsedModule{
+        .{ .path = "base.py", .module_name = "base", .imports = &no_imports, .content_hash = undefined, .arena = std.heap.ArenaAllocator.init(allocator) },
+        .{ .path = "mid.py", .module_name = "mid", .imports = &imports_base, .content_hash = undefined, .arena = std.heap.ArenaAllocator.init(allocator) },
+        .{ .path = "top.py", .module_name = "top", .imports = &imports_mid, .content_hash = undefined, .arena = std.heap.ArenaAllocator.init(allocator) },
+        .{ .path = "cyc_a.py", .module_name = "cyc_a", .imports = &imports_b, .content_hash = undefined, .arena = std.heap.ArenaAllocator.init(allocator) },
+        .{ .path = "cyc_b.py", .module_name = "cyc_b", .imports = &imports_a, .content_hash = undefined, .arena = std.heap.ArenaAllocator.init(allocator) },
+    };
+    defer for (&modules) |*m| m.arena.deinit();
+
+    var set = ModuleSet{
+        .allocator = allocator,
+        .modules = &modules,
+        .by_name = hashmap_helper.StringHashMap(usize).init(allocator),
+    };
+    defer set.by_name.deinit();
+    for (modules, 0..) |m, i| try set.by_name.put(m.module_name, i);
+
+    try set.assignWaves();
+
+    try std.testing.expectEqual(@as(usize, 0), modules[0].wave);
+    try std.testing.expectEqual(@as(usize, 1), modules[1].wave);
+    try std.testing.expectEqual(@as(usize, 2), modules[2].wave);
+    try std.testing.expectEqual(@as(usize, 3), modules[3].wave);
+    try std.testing.expectEqual(@as(usize, 3), modules[4].wave);
+    try std.testing.expectEqual(@as(usize, 4), set.wave_count);
+}
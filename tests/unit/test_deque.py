@@ -0,0 +1,49 @@
+# Test collections.deque: O(1) appends and pops at both ends, maxlen, rotate
+from collections import deque
+
+d = deque([1, 2, 3])
+d.append(4)
+d.appendleft(0)
+print(len(d))  # Should print 5
+print(d[0])  # Should print 0
+print(d[4])  # Should print 4
+
+print(d.popleft())  # Should print 0
+print(d.pop())  # Should print 4
+print(len(d))  # Should print 3
+
+# Many operations at the front stay cheap and keep order
+q = deque()
+for i in range(10000):
+    q.appendleft(i)
+total = 0
+while len(q) > 0:
+    total += q.popleft()
+print(total)  # Should print 49995000
+
+# maxlen: appending to a full deque drops from the other end
+window = deque([], 3)
+for i in range(6):
+    window.append(i)
+print(len(window))  # Should print 3
+print(window[0])  # Should print 3
+
+# rotate(k) moves k elements from one end to the other
+r = deque([1, 2, 3, 4, 5])
+r.rotate(2)
+print(r[0])  # Should print 4
+r.rotate(-3)
+print(r[0])  # Should print 2
+
+r.extendleft([7, 8])
+print(r[0])  # Should print 8
+
+for x in deque([10, 20, 30]):
+    print(x)  # Should print 10, 20, 30
+
+# popleft() on an empty deque raises IndexError
+empty = deque()
+try:
+    empty.popleft()
+except IndexError:
+    print("IndexError")  # Should print IndexError
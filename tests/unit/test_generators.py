@@ -0,0 +1,59 @@
+# Test generator functions (resumable frames and the eager fallback)
+
+# Locals live across yields: each resume sees the values from before it
+def running(n: int):
+    a = 1
+    b = 2
+    yield a + b
+    a = a * 10
+    yield a + b
+    c = a + b + n
+    yield c
+
+for v in running(100):
+    print(v)  # Should print 3, 12, 112
+
+# for-loop fusion: the loop drives the frame one value at a time,
+# including generators that loop over other generators
+def count(n: int):
+    i = 0
+    while i < n:
+        yield i
+        i += 1
+
+def squares(n: int):
+    for x in count(n):
+        yield x * x
+
+total = 0
+for s in squares(5):
+    total += s
+print(total)  # Should print 30
+
+# Breaking out early leaves the rest of the generator unrun
+for i in count(1000000):
+    if i == 3:
+        break
+print(i)  # Should print 3
+
+# send(): the sent value is the result of the paused yield
+def accumulate():
+    total = 0
+    while True:
+        x = yield total
+        total += x
+
+acc = accumulate()
+print(next(acc))  # Should print 0
+print(acc.send(5))  # Should print 5
+print(acc.send(7))  # Should print 12
+
+# A closed generator yields nothing more
+c = count(10)
+print(next(c))  # Should print 0
+c.close()
+for x in c:
+    print(x)
+print("closed")  # Should print closed
+
+print(sum(count(5)))  # Should print 10
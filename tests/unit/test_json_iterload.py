@@ -0,0 +1,38 @@
+# Test json.iterload (metal0 extension): records of a JSON array or
+# JSON Lines file, parsed one at a time while the file is read in chunks
+import json
+
+path = "/tmp/metal0_test_iterload.json"
+w = open(path, "w")
+w.write('[{"n": 1, "tag": "a"}, {"n": 2, "tag": "b"}, {"n": 3, "tag": "c"}]')
+w.close()
+
+# Records used only inside the loop are released every iteration
+f = open(path, "r")
+count = 0
+for rec in json.iterload(f):
+    count += 1
+    print(rec["tag"])  # Should print a, b, c
+f.close()
+print(count)  # Should print 3
+
+# Records kept in a list stay alive after their iteration
+lines = "/tmp/metal0_test_iterload.jsonl"
+w = open(lines, "w")
+w.write('{"n": 10}\n{"n": 20}\n\n{"n": 30}\n')
+w.close()
+
+f = open(lines, "r")
+kept = []
+for rec in json.iterload(f):
+    kept.append(rec)
+f.close()
+print(len(kept))  # Should print 3
+print(kept[2]["n"])  # Should print 30
+
+# Outside a for loop the records are collected into a list
+f = open(lines, "r")
+records = json.iterload(f)
+f.close()
+print(len(records))  # Should print 3
+print(records[0]["n"])  # Should print 10
@@ -0,0 +1,41 @@
+# Test @functools.lru_cache / @functools.cache on compiled functions
+# (memoized through a static table keyed on the parameter values)
+import functools
+
+calls = 0
+
+@functools.lru_cache(maxsize=None)
+def fib(n: int) -> int:
+    if n < 2:
+        return n
+    return fib(n - 1) + fib(n - 2)
+
+print(fib(80))  # Should print 23416728348467685
+
+@functools.cache
+def slow_square(n: int) -> int:
+    global calls
+    calls += 1
+    return n * n
+
+print(slow_square(12))  # Should print 144
+print(slow_square(12))  # Should print 144
+print(calls)  # Should print 1
+
+# String keys are copied into the table, not borrowed from the caller
+@functools.lru_cache(maxsize=2)
+def shout(word: str) -> str:
+    global calls
+    calls += 1
+    return word.upper() + "!"
+
+calls = 0
+for w in ["hi", "yo", "hi", "hey", "hi"]:
+    print(shout(w))  # Should print HI!, YO!, HI!, HEY!, HI!
+print(calls)  # Should print 3
+
+# cache_info() and cache_clear()
+info = shout.cache_info()
+print(info.hits)  # Should print 2
+shout.cache_clear()
+print(shout.cache_info().currsize)  # Should print 0
@@ -0,0 +1,33 @@
+# Test mmap.mmap over a file: reads and slices are views of the mapping
+import mmap
+
+path = "/tmp/metal0_test_mmap.txt"
+w = open(path, "w")
+w.write("alpha\nbeta\ngamma\n")
+w.close()
+
+f = open(path, "rb")
+m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+print(len(m))  # Should print 17
+
+# find/rfind with and without the optional start/end
+print(m.find(b"beta"))  # Should print 6
+print(m.find(b"a", 7))  # Should print 9
+print(m.rfind(b"a"))  # Should print 15
+print(m.find(b"zeta"))  # Should print -1
+
+# Indexing gives the byte value, slicing gives bytes
+print(m[0])  # Should print 97
+print(m[-2])  # Should print 97
+print(m[6:10])  # Should print b'beta'
+print(m[-6:])  # Should print b'gamma\n'
+
+# Reads advance the position
+print(m.readline())  # Should print b'alpha\n'
+print(m.read(4))  # Should print b'beta'
+print(m.tell())  # Should print 10
+print(m.read())  # Should print b'\ngamma\n'
+m.seek(0)
+print(m.read_byte())  # Should print 97
+m.close()
+f.close()
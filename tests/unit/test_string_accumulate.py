@@ -0,0 +1,50 @@
+# Test string += inside loops (amortized accumulator) and str.join
+# `s += ...` in a loop appends into a growable buffer instead of
+# concatenating the whole string every iteration
+
+def build(n: int) -> str:
+    s = ""
+    for i in range(n):
+        s += "ab"
+    return s
+
+print(len(build(1000)))  # Should print 2000
+
+# Aliases taken mid-loop must keep their value
+def alias() -> str:
+    s = "x"
+    t = ""
+    for i in range(3):
+        s += "y"
+        if i == 0:
+            t = s
+    return t + "|" + s
+
+print(alias())  # Should print xy|xyyy
+
+# Reassigning the accumulator restarts it from the new value
+def reset() -> str:
+    s = ""
+    i = 0
+    while i < 4:
+        s += "a"
+        if i == 1:
+            s = "b"
+        i += 1
+    return s
+
+print(reset())  # Should print baa
+
+# The same name accumulating in two functions, and in a nested loop
+def twice() -> str:
+    s = ""
+    for i in range(2):
+        for j in range(2):
+            s += "c"
+    return s
+
+print(build(2) + twice())  # Should print ababcccc
+
+parts = ["a", "b", "c"]
+print("-".join(parts))  # Should print a-b-c
+print(",".join(["solo"]))  # Should print solo
@@ -0,0 +1,33 @@
+# Test concurrent.futures.ThreadPoolExecutor: submit/result, ordered map,
+# and as_completed delivering each future as it finishes
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+def square(n: int) -> int:
+    return n * n
+
+with ThreadPoolExecutor(max_workers=4) as executor:
+    fut = executor.submit(square, 7)
+    print(fut.result())  # Should print 49
+
+    # map() keeps input order whatever order the workers finish in
+    total = 0
+    for v in executor.map(square, [1, 2, 3, 4, 5]):
+        total += v
+    print(total)  # Should print 55
+
+    futures = []
+    for i in range(20):
+        futures.append(executor.submit(square, i))
+
+    # Completion order varies; the sum and count do not
+    done = 0
+    acc = 0
+    for f in as_completed(futures):
+        acc += f.result()
+        done += 1
+    print(done)  # Should print 20
+    print(acc)  # Should print 2470
+
+executor2 = ThreadPoolExecutor(max_workers=2)
+print(executor2.submit(square, 9).result())  # Should print 81
+executor2.shutdown(wait=True)
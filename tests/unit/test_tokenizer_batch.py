@@ -0,0 +1,31 @@
+# Test tokenizer.encode_batch (parallel batch encoding on the shared pool)
+from metal0 import tokenizer
+
+tokenizer.init("packages/tokenizer/dist/cl100k_base_full.json")
+
+texts = ["hello world", "", "   hello", "0123456789", "hello   world"]
+batch = tokenizer.encode_batch(texts)
+print(len(batch))  # Should print 5
+
+# Each row matches encoding the text on its own
+same = True
+for i in range(len(texts)):
+    if len(batch[i]) != len(tokenizer.encode(texts[i])):
+        same = False
+    if tokenizer.decode(batch[i]) != texts[i]:
+        same = False
+print(same)  # Should print True
+
+# Large enough to split across several pool workers; run it twice so the
+# second batch reuses the same threads (and their warm caches)
+big = []
+for i in range(4000):
+    big.append("the quick brown fox jumps over the lazy dog " + str(i))
+
+for attempt in range(2):
+    rows = tokenizer.encode_batch(big)
+    ok = len(rows) == len(big)
+    for i in range(len(big)):
+        if tokenizer.decode(rows[i]) != big[i]:
+            ok = False
+    print(ok)  # Should print True, True